@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import mimetypes
 from pathlib import Path
-from typing import Literal
+from typing import Annotated, Literal
 
 from fastapi import APIRouter, Cookie, Depends, File, Header, Query, Request, Response, UploadFile
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.application import ApplicationServices
@@ -308,6 +307,12 @@ class SpeechSynthesisCreate(StrictModel):
     instructions: str | None = None
 
 
+class TranscriptionStreamCreate(StrictModel):
+    rate: int = Field(ge=8000, le=48000)
+    width: int = Field(default=2, ge=1, le=4)
+    channels: int = Field(default=1, ge=1, le=2)
+
+
 class BackupCreate(StrictModel):
     include_media: bool = False
 
@@ -339,6 +344,17 @@ class ResourceCoordinationUpdate(StrictModel):
     authorizations: list[ResourceControlAuthorizationUpdate] = Field(default_factory=list, max_length=3)
 
 
+class JobQueueWorkersUpdate(StrictModel):
+    interactive: int | None = Field(default=None, ge=1, le=16)
+    media: int | None = Field(default=None, ge=1, le=16)
+    background: int | None = Field(default=None, ge=1, le=16)
+
+
+class JobQueueUpdate(StrictModel):
+    workers: JobQueueWorkersUpdate = Field(default_factory=JobQueueWorkersUpdate)
+    provider_limits: dict[Literal["ollama"], Annotated[int, Field(ge=1, le=16)]] = Field(default_factory=dict)
+
+
 TurnState = Literal["queued", "running", "completed", "failed", "cancelled"]
 CapabilityState = Literal[
     "pending_confirmation",
@@ -404,6 +420,7 @@ class ChatListResponse(BaseModel):
 class ChatDetailResponse(BaseModel):
     chat: ChatRepresentation
     messages: list[MessageRepresentation]
+    next_before: str | None = None
 
 
 class TurnErrorRepresentation(BaseModel):
@@ -424,6 +441,14 @@ class TurnContextRepresentation(BaseModel):
     degraded_reason: str | None = None
 
 
+class TurnPhasesRepresentation(BaseModel):
+    context_plan_ms: int | None = None
+    provider_connect_ms: int | None = None
+    first_token_ms: int | None = None
+    streaming_ms: int | None = None
+    commit_ms: int | None = None
+
+
 class ConversationSummaryRepresentation(BaseModel):
     id: str
     through_message_id: str
@@ -461,6 +486,7 @@ class TurnRepresentation(BaseModel):
     started_at: int | None = None
     completed_at: int | None = None
     context: TurnContextRepresentation | None = None
+    phases: TurnPhasesRepresentation | None = None
 
 
 class JobRepresentation(BaseModel):
@@ -1494,8 +1520,14 @@ def create_chat(body: ChatCreate, request: Request, context: AuthContext = Depen
 
 
 @router.get("/chats/{chat_id}", response_model=ChatDetailResponse, tags=["chats"])
-def get_chat(chat_id: str, request: Request, context: AuthContext = Depends(current_user)):
-    value = services(request).conversations.get_chat(context.user_id, chat_id)
+def get_chat(
+    chat_id: str,
+    request: Request,
+    before: str | None = Query(default=None, min_length=1, max_length=64),
+    limit: int | None = Query(default=None, ge=1, le=500),
+    context: AuthContext = Depends(current_user),
+):
+    value = services(request).conversations.get_chat(context.user_id, chat_id, before=before, limit=limit)
     if not value:
         raise NotFoundError("chat not found")
     return value
@@ -1589,12 +1621,9 @@ def turn_events(
     except ValueError:
         cursor = None
 
-    def stream():
-        for event in app_services.broker.subscribe(turn_id, snapshot, cursor):
-            if event is None:
-                yield ": heartbeat\n\n"
-                continue
-            yield f"id: {event.sequence}\nevent: {event.event}\ndata: {json.dumps(event.data, separators=(',', ':'), default=str)}\n\n"
+    async def stream():
+        async for event in app_services.broker.subscribe_async(turn_id, snapshot, cursor):
+            yield b": heartbeat\n\n" if event is None else event.frame()
 
     return StreamingResponse(
         stream(),
@@ -1604,8 +1633,22 @@ def turn_events(
 
 
 @router.get("/jobs/{job_id}", response_model=JobRepresentation, tags=["jobs"])
-def get_job(job_id: str, request: Request, context: AuthContext = Depends(current_user)):
-    value = services(request).jobs.get(context.user_id, job_id)
+async def get_job(
+    job_id: str,
+    request: Request,
+    wait: float = Query(default=0, ge=0, le=60),
+    context: AuthContext = Depends(current_user),
+):
+    """Return the job, or with `wait`, hold the request until it settles or `wait` seconds pass."""
+
+    jobs = services(request).jobs
+    if wait:
+        try:
+            value = await jobs.wait_async(context.user_id, job_id, timeout=wait)
+        except TimeoutError:
+            value = await asyncio.to_thread(jobs.get, context.user_id, job_id)
+    else:
+        value = await asyncio.to_thread(jobs.get, context.user_id, job_id)
     if not value:
         raise NotFoundError()
     return value
@@ -2298,8 +2341,55 @@ async def transcribe(
     file: UploadFile = File(...),
     context: AuthContext = Depends(current_user),
 ):
-    content = await file.read()
-    return services(request).speech.transcribe(context.user_id, file.filename or "audio.webm", content)
+    # The upload was spooled to a temporary file as it arrived, and is handed
+    # over as that file rather than read into memory. Transcription blocks, so
+    # it runs on a worker thread rather than holding up every other request.
+    speech = services(request).speech
+    return await asyncio.to_thread(speech.transcribe, context.user_id, file.filename or "audio.webm", file.file)
+
+
+# A transcription fed while somebody is still speaking: opened before the first
+# word, sent raw PCM as the browser records it, and asked for its transcript
+# once they stop. By then the service has heard everything but the last piece,
+# so the wait is for that piece rather than for the whole recording. Only a
+# Wyoming service can take audio this way. See ADR 0043.
+@router.post("/speech/transcriptions/streams", status_code=201, tags=["speech"])
+def open_transcription_stream(
+    body: TranscriptionStreamCreate,
+    request: Request,
+    context: AuthContext = Depends(current_user),
+):
+    return services(request).speech.open_transcription(context.user_id, body.model_dump())
+
+
+@router.post("/speech/transcriptions/streams/{stream_id}/audio", tags=["speech"])
+async def send_transcription_audio(
+    stream_id: str,
+    request: Request,
+    context: AuthContext = Depends(current_user),
+):
+    frames = await request.body()
+    speech = services(request).speech
+    return await asyncio.to_thread(speech.transcription_audio, context.user_id, stream_id, frames)
+
+
+@router.post("/speech/transcriptions/streams/{stream_id}/finish", tags=["speech"])
+def finish_transcription_stream(
+    stream_id: str,
+    request: Request,
+    context: AuthContext = Depends(current_user),
+):
+    return services(request).speech.finish_transcription(context.user_id, stream_id)
+
+
+@router.delete("/speech/transcriptions/streams/{stream_id}", status_code=204, tags=["speech"])
+def cancel_transcription_stream(
+    stream_id: str,
+    request: Request,
+    context: AuthContext = Depends(current_user),
+):
+    services(request).speech.cancel_transcription(context.user_id, stream_id)
+    return Response(status_code=204)
 
 
 @router.get("/media", response_model=MediaLibraryListResponse, tags=["media"])
@@ -2585,9 +2675,37 @@ def observability(request: Request, context: AuthContext = Depends(current_user)
     value["queues"] = app_services.jobs.operational_snapshot()
     value["storage"] = app_services.operations.storage_report()
     value["readiness"] = app_services.operations.readiness()
+    value["memory_embedding"] = app_services.memory.embedding_status()
     return value
 
 
+@router.get("/admin/metrics", tags=["admin"], response_class=PlainTextResponse)
+def prometheus_metrics(request: Request, context: AuthContext = Depends(current_user)):
+    app_services = services(request)
+    app_services.resources.require_admin(context)
+    return PlainTextResponse(
+        app_services.runtime.metrics.prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/admin/job-queue", tags=["admin"])
+def job_queue(request: Request, context: AuthContext = Depends(current_user)):
+    app_services = services(request)
+    app_services.resources.require_admin(context)
+    return app_services.jobs.operational_snapshot()
+
+
+@router.put("/admin/job-queue", tags=["admin"])
+def update_job_queue(body: JobQueueUpdate, request: Request, context: AuthContext = Depends(current_user)):
+    app_services = services(request)
+    app_services.resources.require_admin(context)
+    return app_services.jobs.configure_workers(
+        worker_counts=body.workers.model_dump(exclude_none=True),
+        provider_limits=dict(body.provider_limits),
+    )
+
+
 @router.get("/admin/resource-coordination", tags=["admin"])
 def resource_coordination(request: Request, context: AuthContext = Depends(current_user)):
     app_services = services(request)
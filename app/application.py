@@ -8,8 +8,9 @@ from app.capability_service import CapabilityService
 from app.conversation_service import ConversationService
 from app.context_service import ContextPolicy, ContextService
 from app.compreface_identity_provider import CompreFaceIdentityProvider
+from app.http_pool import pooled_opener
 from app.identity_service import IdentityService
-from app.job_service import JobService
+from app.job_service import OLLAMA_POOL, JobService
 from app.memory_service import MemoryService
 from app.media_adapters import LocalImageProvider, OpenAIImageProvider, OpenAIVideoProvider
 from app.media_catalog_service import MediaCatalogService
@@ -32,7 +33,7 @@ from app.secret_store import SecretStore
 from app.security import LoginThrottle, ProviderUrlPolicy
 from app.speech_service import SpeechService
 from app.task_model_service import TaskModelService
-from app.turn_events import TurnEventBroker
+from app.turn_events import DeltaCoalescing, TurnEventBroker
 
 
 @dataclass
@@ -68,6 +69,8 @@ class ApplicationServices:
         self.operations.start()
         self.resource_coordination.start()
         self.jobs.start()
+        self.jobs.resume_interrupted()
+        self.speech.start()
         # Last: it asks the job queue whether the machine is busy, so the queue
         # has to be running before the first question is worth anything.
         self.scene_production.start()
@@ -75,6 +78,7 @@ class ApplicationServices:
     def stop(self):
         self.scene_production.stop()
         self.jobs.stop()
+        self.speech.stop()
         self.operations.stop()
         self.resource_coordination.stop()
         self.broker.stop()
@@ -90,8 +94,12 @@ def build_services(
     resource_providers: dict | None = None,
     password_hasher=hash_password,
     password_verifier=verify_password,
+    http_opener=None,
 ) -> ApplicationServices:
     runtime = AppRuntime(config, secret_store=secret_store)
+    # The local providers' clients send through this, so their plain-HTTP
+    # requests reuse connections. See `app/http_pool.py`.
+    http_opener = http_opener or pooled_opener()
     provider_url_policy = ProviderUrlPolicy(config.provider_allowed_hosts)
     for label, endpoint in (
         ("Ollama", config.ollama_base_url),
@@ -111,11 +119,12 @@ def build_services(
                 timeout_seconds=config.generation_timeout_seconds,
                 health_timeout_seconds=config.provider_timeout_seconds,
                 metrics=runtime.metrics,
+                opener=http_opener,
             )
         },
         media_providers={
             "openai-image": OpenAIImageProvider(),
-            "local-image": LocalImageProvider(),
+            "local-image": LocalImageProvider(opener=http_opener),
             "openai-video": OpenAIVideoProvider(),
         },
         # Both, deliberately. Every default is local; cloud stays available to
@@ -127,6 +136,7 @@ def build_services(
                 timeout_seconds=config.generation_timeout_seconds,
                 health_timeout_seconds=config.provider_timeout_seconds,
                 metrics=runtime.metrics,
+                opener=http_opener,
             ),
             "openai": OpenAITaskModelProvider(),
         },
@@ -139,22 +149,34 @@ def build_services(
         runtime.logger,
         providers=resource_providers,
         provider_url_policy=provider_url_policy,
+        opener=http_opener,
     )
+    # Ollama serves this many requests at once, so that many turns can stream
+    # together. The pool holds turns and follow-ups to it between them.
+    text_parallelism = max(config.interactive_workers, config.ollama_num_parallel)
     jobs = JobService(
         runtime.session_factory,
         runtime.secret_store,
         broker,
         runtime.logger,
-        {"interactive": config.interactive_workers, "media": config.media_workers},
+        {
+            "interactive": text_parallelism,
+            "media": config.media_workers,
+            "background": config.background_workers,
+        },
         resource_coordinator=resource_coordination,
         metrics=runtime.metrics,
+        provider_limits={OLLAMA_POOL: text_parallelism},
+        background_quiet_seconds=config.background_quiet_seconds,
     )
     identity = IdentityService(
         runtime.session_factory,
         runtime.secret_store,
         config,
         jobs,
-        identity_providers if identity_providers is not None else {"compreface": CompreFaceIdentityProvider()},
+        identity_providers
+        if identity_providers is not None
+        else {"compreface": CompreFaceIdentityProvider(opener=http_opener)},
         runtime.logger,
         provider_url_policy=provider_url_policy,
     )
@@ -257,6 +279,8 @@ def build_services(
         config.memory_candidate_min_confidence,
         embedding_model=config.memory_embedding_model,
         embedding_base_url=config.ollama_base_url,
+        metrics=runtime.metrics,
+        opener=http_opener,
     )
     context = ContextService(
         runtime.session_factory,
@@ -276,6 +300,11 @@ def build_services(
         memory,
         capabilities,
         task_models,
+        delta_coalescing=DeltaCoalescing(
+            max_bytes=config.delta_coalesce_bytes,
+            max_seconds=config.delta_coalesce_ms / 1000,
+        ),
+        metrics=runtime.metrics,
     )
     speech = SpeechService(
         runtime.session_factory,
@@ -284,6 +313,7 @@ def build_services(
         runtime.logger,
         provider_url_policy=provider_url_policy,
         metrics=runtime.metrics,
+        opener=http_opener,
     )
     operations = OperationsService(config, runtime.logger, memory_maintenance=memory.prune_discarded)
     # Built after the capability service exists, because producing a scene goes
@@ -304,6 +334,11 @@ def build_services(
         memories=memory,
         resources=resources,
     )
+    for kind in ("image", "video"):
+        jobs.register_resumption(kind, capabilities.resume_interrupted)
+    jobs.register_resumption("identity_validation", identity.resume_interrupted)
+    for kind in conversations.RESUMABLE_FOLLOWUPS:
+        jobs.register_resumption(kind, conversations.resume_interrupted)
     return ApplicationServices(
         runtime=runtime,
         providers=registry,
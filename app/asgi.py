@@ -21,6 +21,15 @@ from app.service_errors import RateLimitError, ServiceError
 
 
 class RequestBodyLimitMiddleware:
+    """Refuses a request body over its route's limit without holding it.
+
+    A declared Content-Length over the limit is refused before the route runs.
+    A body with no length, or one that lied about it, is counted as the route
+    reads it: each piece passes straight through, and the piece that crosses
+    the limit ends the request with the same 413 instead. Nothing is buffered
+    here, so what a large upload costs is what its route does with it.
+    """
+
     def __init__(self, app, *, json_limit: int, upload_limit: int):
         self.app = app
         self.json_limit = json_limit
@@ -43,24 +52,37 @@ class RequestBodyLimitMiddleware:
             except ValueError:
                 return await self._reject(scope, receive, send, path, limit, "invalid Content-Length")
         received = 0
-        messages = []
-        while True:
+        exceeded = False
+        started = False
+
+        async def counted_receive():
+            nonlocal received, exceeded
             message = await receive()
-            messages.append(message)
-            if message["type"] != "http.request":
-                break
-            received += len(message.get("body", b""))
-            if received > limit:
-                return await self._reject(scope, receive, send, path, limit)
-            if not message.get("more_body", False):
-                break
-
-        async def replay_receive():
-            if messages:
-                return messages.pop(0)
-            return {"type": "http.disconnect"}
-
-        return await self.app(scope, replay_receive, send)
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    # Whatever the route was parsing fails here. FastAPI turns
+                    # a parse failure into a 400 unless it is an HTTPException,
+                    # and the response is replaced below in any case.
+                    raise HTTPException(status_code=413, detail="request body too large")
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if exceeded and not started:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, counted_receive, guarded_send)
+        except HTTPException:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._reject(scope, receive, send, path, limit)
 
     @staticmethod
     async def _reject(scope, receive, send, _path, limit, message="request body too large"):
@@ -115,6 +137,7 @@ def create_app(
     resource_providers=None,
     password_hasher=None,
     password_verifier=None,
+    http_opener=None,
 ) -> FastAPI:
     config = config or AppConfig.from_env()
     # Before anything is built: a second process would hold its own replay
@@ -131,6 +154,7 @@ def create_app(
         providers=providers,
         identity_providers=identity_providers,
         resource_providers=resource_providers,
+        http_opener=http_opener,
         **service_kwargs,
     )
 
@@ -0,0 +1,137 @@
+"""Keeping the newest synthesized speech hot and archiving the rest.
+
+Replay reads from the hot audio directory, which holds at most
+`audio_hot_limit` clips; older ones move to the archive, where retention
+eventually removes them. Rotation used to run after every synthesis, listing
+the whole hot directory and reading every file's modification time to find the
+oldest, then opening a transaction per clip it moved. Every spoken reply paid
+for a directory scan that grew with the limit.
+
+The hot directory is now listed once, when the process starts, into an index
+ordered oldest first. Each stored clip is appended to it, so finding what to
+archive is taking from the front. The moves happen on a background thread,
+woken when the index goes over the limit, and the rows that point at the moved
+files are updated together in one transaction.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+import shutil
+import threading
+
+
+class AudioRotator:
+    """Archives the oldest clips once there are more than `limit` of them.
+
+    `relocate` is given every move of a pass as (old path, new path) pairs and
+    records them in one transaction. If it fails, the files are moved back, so
+    a row never points at where a clip no longer is.
+    """
+
+    def __init__(self, hot_dir: Path, archive_dir: Path, limit: int, relocate, logger):
+        self.hot_dir = hot_dir
+        self.archive_dir = archive_dir
+        self.limit = max(0, int(limit))
+        self.relocate = relocate
+        self.logger = logger
+        self._hot: OrderedDict[Path, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._seed()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="audio-rotation", daemon=True)
+        self._thread.start()
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def stored(self, path: Path) -> None:
+        """Note a clip that was just written to the hot directory."""
+
+        with self._lock:
+            self._hot[Path(path)] = None
+            self._hot.move_to_end(Path(path))
+            over = len(self._hot) > self.limit
+        if over:
+            self._wake.set()
+
+    def rotate(self) -> int:
+        """Archive everything past the limit, oldest first. Returns how many moved."""
+
+        with self._lock:
+            excess = list(self._hot)[: max(0, len(self._hot) - self.limit)]
+        if not excess:
+            return 0
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        moves: list[tuple[Path, Path]] = []
+        gone: list[Path] = []
+        for source in excess:
+            target = self.archive_dir / source.name
+            try:
+                shutil.move(str(source), target)
+            except FileNotFoundError:
+                # Removed by something else; there is nothing left to archive.
+                gone.append(source)
+                continue
+            except OSError as exc:
+                self.logger.warning("audio archive rotation failed error=%s", exc.__class__.__name__)
+                break
+            moves.append((source, target))
+        try:
+            if moves:
+                self.relocate([(str(source), str(target)) for source, target in moves])
+        except Exception as exc:  # noqa: BLE001 - cache rotation cannot invalidate completed synthesis
+            for source, target in moves:
+                try:
+                    shutil.move(str(target), source)
+                except OSError:
+                    pass
+            self.logger.warning("audio archive rotation failed error=%s", exc.__class__.__name__)
+            moves = []
+        with self._lock:
+            for source in gone + [source for source, _ in moves]:
+                self._hot.pop(source, None)
+        return len(moves)
+
+    def _seed(self) -> None:
+        found = []
+        for path in self.hot_dir.glob("*"):
+            if not path.is_file():
+                continue
+            if path.name.startswith("."):
+                # A clip still being written is hidden until it is renamed into
+                # place. One here at startup belonged to a process that stopped
+                # mid-stream, and will never be finished.
+                path.unlink(missing_ok=True)
+                continue
+            found.append(path)
+        found.sort(key=lambda path: path.stat().st_mtime)
+        with self._lock:
+            # Anything stored before this ran is newer than what was on disk.
+            stored = list(self._hot)
+            self._hot = OrderedDict.fromkeys(found)
+            for path in stored:
+                self._hot[path] = None
+                self._hot.move_to_end(path)
+
+    def _loop(self) -> None:
+        while True:
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            try:
+                self.rotate()
+            except Exception as exc:  # noqa: BLE001 - the next stored clip retries
+                self.logger.warning("audio archive rotation failed error=%s", exc.__class__.__name__)
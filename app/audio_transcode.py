@@ -0,0 +1,236 @@
+"""Decoding a recorded turn into the audio the transcription services take.
+
+Every spoken turn used to write its upload into the data directory, start
+`ffmpeg` to turn that file into a WAV file beside it, read the WAV back in
+full, and delete both. That was three trips through the disk and a process
+start between somebody stopping speaking and the transcription service
+hearing them.
+
+Now the upload is written to ffmpeg's stdin and 16 kHz mono PCM is read from
+its stdout, which is the format every Whisper service resamples to anyway, so
+nothing reaches the disk. ffmpeg decodes one input per process, so there is
+no process to keep for every recording. Instead, processes are started ahead
+of need: each one is already waiting on stdin when a recording arrives, and a
+replacement is started in the background once it has been taken.
+
+MP4 is the exception. A recording whose index sits after its audio cannot be
+decoded from a pipe, so an MP4 upload is still written to a temporary file
+for ffmpeg to read, while its decoded audio still arrives on the pipe.
+
+A recording can be handed over as bytes or as the file an upload was spooled
+to. A file is copied to ffmpeg a piece at a time, so a long recording is never
+held in memory in its encoded form as well as its decoded one.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+import io
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import BinaryIO
+import wave
+
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+TRANSCODE_TIMEOUT_SECONDS = 60
+# How much of a spooled upload is in flight to ffmpeg at once.
+FEED_BYTES = 64 * 1024
+# How long the feeder is waited for once ffmpeg has exited.
+FEED_JOIN_SECONDS = 5
+_OUTPUT = ["-f", "s16le", "-acodec", "pcm_s16le", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE), "pipe:1"]
+
+
+def ffmpeg_command(source: str = "pipe:0") -> list[str]:
+    # Reading a file, ffmpeg would otherwise watch stdin for keyboard commands.
+    keyboard = [] if source == "pipe:0" else ["-nostdin"]
+    return ["ffmpeg", "-hide_banner", "-loglevel", "error", *keyboard, "-i", source, *_OUTPUT]
+
+
+class TranscodeFailed(Exception):
+    """ffmpeg could not be started, or could not decode what it was given."""
+
+
+@dataclass(frozen=True)
+class PcmAudio:
+    """Raw little-endian samples and what it takes to read them."""
+
+    frames: bytes
+    rate: int = SAMPLE_RATE
+    width: int = SAMPLE_WIDTH
+    channels: int = CHANNELS
+
+    @property
+    def format(self) -> dict:
+        return {"rate": self.rate, "width": self.width, "channels": self.channels}
+
+    @property
+    def seconds(self) -> float:
+        return len(self.frames) / (self.rate * self.width * self.channels)
+
+    def wav(self) -> bytes:
+        """The same samples with a WAV header, for services that take a file."""
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as handle:
+            handle.setnchannels(self.channels)
+            handle.setsampwidth(self.width)
+            handle.setframerate(self.rate)
+            handle.writeframes(self.frames)
+        return buffer.getvalue()
+
+
+class Transcoder:
+    """Hands each recording to an ffmpeg that is already running."""
+
+    def __init__(
+        self,
+        warm: int = 1,
+        *,
+        temp_dir: Path | None = None,
+        timeout: float = TRANSCODE_TIMEOUT_SECONDS,
+        spawn=None,
+    ):
+        self.warm = max(0, int(warm))
+        self.temp_dir = temp_dir
+        self.timeout = timeout
+        self._spawn = spawn or _spawn_ffmpeg
+        self._ready: deque = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._closed = False
+
+    def start(self) -> None:
+        """Have the first recording find an ffmpeg waiting for it, too."""
+
+        self._refill()
+
+    def transcode(self, content: bytes | BinaryIO, container: str = "") -> PcmAudio:
+        """Decode a recording given as bytes, or as a file positioned at its start."""
+
+        if str(container).lower() == ".mp4":
+            return self._transcode_file(content, container)
+        process = self._take()
+        self._refill()
+        return self._finish(process, content)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            ready, self._ready = list(self._ready), deque()
+        for process in ready:
+            _stop(process)
+
+    def _take(self):
+        with self._lock:
+            while self._ready:
+                process = self._ready.popleft()
+                # One that has exited while it waited cannot take input.
+                if process.poll() is None:
+                    return process
+                _stop(process)
+        return self._start()
+
+    def _start(self, source: str = "pipe:0"):
+        try:
+            return self._spawn(ffmpeg_command(source))
+        except OSError as exc:
+            raise TranscodeFailed("ffmpeg could not be started") from exc
+
+    def _refill(self) -> None:
+        with self._lock:
+            if self._refilling or self._closed or len(self._ready) >= self.warm:
+                return
+            self._refilling = True
+        threading.Thread(target=self._fill, name="ffmpeg-warm", daemon=True).start()
+
+    def _fill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if self._closed or len(self._ready) >= self.warm:
+                        return
+                try:
+                    process = self._start()
+                except TranscodeFailed:
+                    return
+                with self._lock:
+                    if self._closed:
+                        _stop(process)
+                        return
+                    self._ready.append(process)
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def _transcode_file(self, content: bytes | BinaryIO, suffix: str) -> PcmAudio:
+        descriptor, name = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=self.temp_dir)
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                if isinstance(content, (bytes, bytearray)):
+                    handle.write(content)
+                else:
+                    shutil.copyfileobj(content, handle, FEED_BYTES)
+            return self._finish(self._start(name), b"")
+        finally:
+            Path(name).unlink(missing_ok=True)
+
+    def _finish(self, process, content: bytes | BinaryIO) -> PcmAudio:
+        feeder = None
+        if not isinstance(content, (bytes, bytearray)):
+            # communicate() only takes input as one bytes object. Feeding the
+            # file from beside it, with stdin taken out of its hands, keeps the
+            # timeout and the draining of stdout and stderr it already does.
+            stdin, process.stdin = process.stdin, None
+            feeder = threading.Thread(target=_feed, args=(stdin, content), name="ffmpeg-feed", daemon=True)
+            feeder.start()
+            content = None
+        try:
+            frames, _errors = process.communicate(content, timeout=self.timeout)
+        except subprocess.TimeoutExpired as exc:
+            _stop(process)
+            raise TranscodeFailed("ffmpeg did not finish in time") from exc
+        except (OSError, ValueError) as exc:
+            _stop(process)
+            raise TranscodeFailed("ffmpeg stopped before it had the recording") from exc
+        finally:
+            if feeder is not None:
+                # The caller rewinds and copies the same file once this
+                # returns. ffmpeg has exited by now, so the feeder's next
+                # write fails and it lets go of the file straight away.
+                feeder.join(FEED_JOIN_SECONDS)
+        if process.returncode != 0:
+            raise TranscodeFailed("ffmpeg could not decode the recording")
+        return PcmAudio(frames or b"")
+
+
+def _spawn_ffmpeg(command: list[str]):
+    return subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def _feed(stdin, source: BinaryIO) -> None:
+    try:
+        shutil.copyfileobj(source, stdin, FEED_BYTES)
+    except (OSError, ValueError):
+        # ffmpeg exited early; its return code is what reports why.
+        pass
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def _stop(process) -> None:
+    try:
+        process.kill()
+        process.communicate(timeout=5)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        pass
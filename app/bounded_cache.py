@@ -0,0 +1,65 @@
+"""A small, thread-safe cache with a size bound and an age bound.
+
+For values that are expensive to produce, cheap to hold, and safe to serve a
+little stale - never for anything whose staleness would be a correctness bug
+unless every write that changes it also invalidates it. Least recently used
+entries go first when it is full, and an entry older than its time to live is
+treated as absent rather than served.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class BoundedCache:
+    def __init__(self, max_entries: int, ttl_seconds: float, *, clock=time.monotonic):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self.clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The cached value, or None when it is absent or too old."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate) -> int:
+        """Drop every entry for which `predicate(key, value)` holds, and say how many went."""
+
+        with self._lock:
+            doomed = [key for key, (_stored_at, value) in self._entries.items() if predicate(key, value)]
+            for key in doomed:
+                del self._entries[key]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
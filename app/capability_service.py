@@ -986,6 +986,12 @@ class CapabilityService:
             self._submit(request_id, job.id, kind, user_id, chat_id, values)
         return response
 
+    def resume_interrupted(self, job) -> None:
+        """Submit a picture or video a restart put back in the queue."""
+
+        if job.capability_request_id:
+            self.submit_queued(job.user_id, job.capability_request_id)
+
     def fail_queued_submission(self, user_id: str, request_id: str) -> dict | None:
         with self._uow() as uow:
             row = uow.repo.capability_request(user_id, request_id)
@@ -0,0 +1,340 @@
+"""ComfyUI's own account of a prompt, pushed over its websocket.
+
+A picture used to be found finished by asking `/history` once a second, which
+added up to a second to every image and gave up after two minutes. ComfyUI
+already announces every sampling step and the end of every prompt on
+`/ws?clientId=`, to the client that submitted the prompt. One listener per
+endpoint holds that socket for every job sent there, under one client id, and
+keeps what it heard per prompt for the job to wait on.
+
+The listener is an optimisation, never a dependency. It connects in the
+background, so a job never waits for it, and a job whose listener is not
+connected polls `/history` at an interval that starts short and grows. A
+listening job still asks `/history` every few seconds, because a message
+sent before the socket connected, or lost with it, is not sent again.
+
+A websocket is an HTTP upgrade followed by small framed messages, and only a
+client's side of it is needed here, so this speaks it with the standard
+library rather than adding a dependency, like `app/wyoming_client.py`.
+"""
+
+from __future__ import annotations
+
+import base64
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import hashlib
+import json
+import os
+import secrets
+import socket
+import ssl
+import struct
+import threading
+import time
+import urllib.parse
+
+
+CONNECT_TIMEOUT_SECONDS = 5
+# A listener that could not connect is not tried again for this long.
+RETRY_SECONDS = 30
+# What a listener remembers: enough for every prompt a queue could be running.
+REMEMBERED_PROMPTS = 256
+# A websocket message larger than this is a confused or hostile peer.
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+_ACCEPT_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class WebSocketClosed(Exception):
+    """The connection ended, cleanly or not."""
+
+
+@dataclass(frozen=True)
+class PromptProgress:
+    """What ComfyUI has said about one prompt so far."""
+
+    # Bumped on every message, so a waiter can tell it has news.
+    sequence: int = 0
+    value: int = 0
+    maximum: int = 0
+    node: str | None = None
+    finished: bool = False
+    error: str | None = None
+
+
+class ComfyUIEvents:
+    """One listening socket per ComfyUI endpoint, shared by every job sent there."""
+
+    def __init__(self, base_url: str, headers: dict | None = None, *, connect=None, clock=time.monotonic):
+        self.base_url = str(base_url).rstrip("/")
+        self.headers = dict(headers or {})
+        # ComfyUI sends a prompt's events only to the client id it was submitted with.
+        self.client_id = f"nice-assistant-{secrets.token_hex(8)}"
+        self._connect = connect or open_websocket
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._prompts: OrderedDict[str, PromptProgress] = OrderedDict()
+        self._listening = False
+        self._thread: threading.Thread | None = None
+        self._socket = None
+        self._retry_at = 0.0
+
+    @property
+    def listening(self) -> bool:
+        with self._condition:
+            return self._listening
+
+    def start(self) -> None:
+        """Begin listening in the background, unless it is already, or failed too recently."""
+
+        with self._condition:
+            if self._thread is not None or self._clock() < self._retry_at:
+                return
+            self._thread = threading.Thread(target=self._listen, name="comfyui-events", daemon=True)
+            self._thread.start()
+
+    def progress(self, prompt_id: str) -> PromptProgress:
+        with self._condition:
+            return self._prompts.get(str(prompt_id)) or PromptProgress()
+
+    def wait(self, prompt_id: str, after: int, timeout: float, cancellation=None) -> PromptProgress:
+        """Return once there is news newer than `after`, the job is cancelled, or `timeout` passes."""
+
+        prompt_id = str(prompt_id)
+        deadline = self._clock() + max(0.0, timeout)
+        with self._condition:
+            while True:
+                current = self._prompts.get(prompt_id) or PromptProgress()
+                remaining = deadline - self._clock()
+                if current.sequence > after or remaining <= 0:
+                    return current
+                if cancellation is not None and cancellation.cancelled:
+                    return current
+                self._condition.wait(remaining)
+
+    def wake(self) -> None:
+        """Release every waiter to look again, as a cancelled job needs."""
+
+        with self._condition:
+            self._condition.notify_all()
+
+    def forget(self, prompt_id: str) -> None:
+        with self._condition:
+            self._prompts.pop(str(prompt_id), None)
+
+    def close(self) -> None:
+        with self._condition:
+            sock, self._socket = self._socket, None
+        if sock is not None:
+            sock.close()
+
+    def _listen(self) -> None:
+        scheme = "wss" if self.base_url.startswith("https://") else "ws"
+        address = self.base_url.split("://", 1)[-1]
+        url = f"{scheme}://{address}/ws?{urllib.parse.urlencode({'clientId': self.client_id})}"
+        try:
+            connection = self._connect(url, self.headers, CONNECT_TIMEOUT_SECONDS)
+        except (OSError, WebSocketClosed, ValueError):
+            with self._condition:
+                self._thread = None
+                self._retry_at = self._clock() + RETRY_SECONDS
+                self._condition.notify_all()
+            return
+        with self._condition:
+            self._socket = connection
+            self._listening = True
+        try:
+            while True:
+                message = connection.receive()
+                if isinstance(message, str):
+                    self._handle(message)
+        except (OSError, WebSocketClosed, ValueError):
+            pass
+        finally:
+            connection.close()
+            with self._condition:
+                self._socket = None
+                self._listening = False
+                self._thread = None
+                self._condition.notify_all()
+
+    def _handle(self, message: str) -> None:
+        try:
+            event = json.loads(message)
+        except ValueError:
+            return
+        data = event.get("data") if isinstance(event, dict) else None
+        if not isinstance(data, dict) or not data.get("prompt_id"):
+            # Queue status and binary previews carry no prompt.
+            return
+        kind = event.get("type")
+        prompt_id = str(data["prompt_id"])
+        with self._condition:
+            current = self._prompts.pop(prompt_id, None) or PromptProgress()
+            changes = {"sequence": current.sequence + 1}
+            if kind == "progress":
+                changes.update(value=int(data.get("value") or 0), maximum=int(data.get("max") or 0))
+                changes["node"] = str(data["node"]) if data.get("node") is not None else current.node
+            elif kind == "executing":
+                # Older ComfyUI says a prompt is done by executing no node at all.
+                if data.get("node") is None:
+                    changes["finished"] = True
+                else:
+                    changes["node"] = str(data["node"])
+            elif kind == "execution_success":
+                changes["finished"] = True
+            elif kind in {"execution_error", "execution_interrupted"}:
+                changes["finished"] = True
+                changes["error"] = str(data.get("exception_message") or "").strip() or kind.replace("_", " ")
+            self._prompts[prompt_id] = replace(current, **changes)
+            while len(self._prompts) > REMEMBERED_PROMPTS:
+                self._prompts.popitem(last=False)
+            self._condition.notify_all()
+
+
+_LISTENERS: dict[tuple, ComfyUIEvents] = {}
+_LISTENERS_LOCK = threading.Lock()
+
+
+def comfyui_events(base_url: str, headers: dict | None = None) -> ComfyUIEvents:
+    """The listener for this endpoint and these credentials, started if it is not already."""
+
+    key = (str(base_url).rstrip("/"), tuple(sorted((headers or {}).items())))
+    with _LISTENERS_LOCK:
+        events = _LISTENERS.get(key)
+        if events is None:
+            events = _LISTENERS[key] = ComfyUIEvents(base_url, headers)
+    events.start()
+    return events
+
+
+class WebSocketConnection:
+    """The client side of RFC 6455: text and binary messages in, control frames answered."""
+
+    def __init__(self, sock: socket.socket, buffered: bytes = b""):
+        self._sock = sock
+        self._buffer = bytearray(buffered)
+        self._send_lock = threading.Lock()
+
+    def receive(self) -> str | bytes:
+        parts: list[bytes] = []
+        opcode = None
+        size = 0
+        while True:
+            final, frame_opcode, payload = self._frame()
+            if frame_opcode == 0x8:
+                self._send(0x8, payload[:2])
+                raise WebSocketClosed("the server closed the connection")
+            if frame_opcode == 0x9:
+                self._send(0xA, payload)
+                continue
+            if frame_opcode == 0xA:
+                continue
+            if frame_opcode != 0x0:
+                opcode = frame_opcode
+            size += len(payload)
+            if size > MAX_MESSAGE_BYTES:
+                raise ValueError("websocket message is too large")
+            parts.append(payload)
+            if final:
+                content = b"".join(parts)
+                return content.decode("utf-8") if opcode == 0x1 else content
+
+    def close(self) -> None:
+        try:
+            self._send(0x8, struct.pack("!H", 1000))
+        except OSError:
+            pass
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _frame(self) -> tuple[bool, int, bytes]:
+        first, second = self._read(2)
+        length = second & 0x7F
+        if length == 126:
+            (length,) = struct.unpack("!H", self._read(2))
+        elif length == 127:
+            (length,) = struct.unpack("!Q", self._read(8))
+        if length > MAX_MESSAGE_BYTES:
+            raise ValueError("websocket frame is too large")
+        mask = self._read(4) if second & 0x80 else None
+        payload = self._read(length)
+        if mask:
+            payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+        return bool(first & 0x80), first & 0x0F, payload
+
+    def _read(self, count: int) -> bytes:
+        while len(self._buffer) < count:
+            chunk = self._sock.recv(max(65536, count - len(self._buffer)))
+            if not chunk:
+                raise WebSocketClosed("the connection ended")
+            self._buffer.extend(chunk)
+        content = bytes(self._buffer[:count])
+        del self._buffer[:count]
+        return content
+
+    def _send(self, opcode: int, payload: bytes) -> None:
+        # A client masks everything it sends; the standard requires it.
+        mask = os.urandom(4)
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([0x80 | len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([0x80 | 126]) + struct.pack("!H", len(payload))
+        else:
+            header += bytes([0x80 | 127]) + struct.pack("!Q", len(payload))
+        masked = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+        with self._send_lock:
+            self._sock.sendall(header + mask + masked)
+
+
+def open_websocket(url: str, headers: dict | None = None, timeout: float = CONNECT_TIMEOUT_SECONDS):
+    """Connect and upgrade. The returned connection blocks on reads until a message arrives."""
+
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in {"ws", "wss"} or not parsed.hostname:
+        raise ValueError("a websocket URL must be ws:// or wss://")
+    port = parsed.port or (443 if parsed.scheme == "wss" else 80)
+    sock = socket.create_connection((parsed.hostname, port), timeout=timeout)
+    try:
+        if parsed.scheme == "wss":
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parsed.hostname)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        target = parsed.path or "/"
+        if parsed.query:
+            target = f"{target}?{parsed.query}"
+        lines = [
+            f"GET {target} HTTP/1.1",
+            f"Host: {parsed.netloc}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13",
+            *(f"{name}: {value}" for name, value in (headers or {}).items()),
+        ]
+        sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        response = bytearray()
+        while b"\r\n\r\n" not in response:
+            chunk = sock.recv(4096)
+            if not chunk or len(response) > 65536:
+                raise WebSocketClosed("the server did not accept the upgrade")
+            response.extend(chunk)
+        head, _, buffered = bytes(response).partition(b"\r\n\r\n")
+        status, *header_lines = head.decode("latin-1").split("\r\n")
+        if status.split(" ")[1:2] != ["101"]:
+            raise WebSocketClosed(f"the server answered the upgrade with {status!r}")
+        received = {}
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            received[name.strip().lower()] = value.strip()
+        expected = base64.b64encode(hashlib.sha1((key + _ACCEPT_GUID).encode("ascii")).digest()).decode("ascii")
+        if received.get("sec-websocket-accept") != expected:
+            raise WebSocketClosed("the server's upgrade answer does not match this request")
+        sock.settimeout(None)
+        return WebSocketConnection(sock, buffered)
+    except BaseException:
+        sock.close()
+        raise
@@ -42,6 +42,9 @@ class CompreFaceIdentityProvider:
 
     name = "compreface"
 
+    def __init__(self, opener=None):
+        self.opener = opener or urlopen
+
     def health(self, base_url: str, api_key: str, timeout_seconds: float) -> ProviderHealth:
         started = time.monotonic()
         try:
@@ -53,7 +56,7 @@ class CompreFaceIdentityProvider:
                 method="POST",
                 headers={"Content-Type": content_type, "x-api-key": api_key, "Accept": "application/json"},
             )
-            with urlopen(request, timeout=timeout_seconds):
+            with self.opener(request, timeout=timeout_seconds):
                 pass
             status = ProviderStatus.READY
             message = "CompreFace verification endpoint is reachable."
@@ -97,7 +100,7 @@ class CompreFaceIdentityProvider:
         )
         response = None
         try:
-            response = urlopen(http_request, timeout=request.timeout_seconds)
+            response = self.opener(http_request, timeout=request.timeout_seconds)
             cancellation.register(response.close)
             raw = response.read(2 * 1024 * 1024)
             cancellation.raise_if_cancelled()
@@ -5,6 +5,7 @@ import hashlib
 import json
 import math
 
+from app.bounded_cache import BoundedCache
 from app.capability_contracts import CapabilityRegistry, capability_tool_result
 from app.context_policy import ContextPolicy, TokenEstimator, prompt_budget_tokens, safety_reserve_tokens
 from app.memory_service import memory_search_query, normalize_memory_content
@@ -17,6 +18,11 @@ from app.task_contracts import CONVERSATION_SUMMARY, SummaryTaskInput
 
 
 SUMMARY_PROMPT_VERSION = "conversation-summary-task-v2"
+# Prepared history is held for the chats somebody is actually talking in. A chat
+# that goes quiet for half an hour is rebuilt from the database on its next turn,
+# which is exactly what every turn did before the cache existed.
+PREPARED_HISTORY_CHATS = 64
+PREPARED_HISTORY_SECONDS = 1800
 SCOPE_PRIORITY = {"global": 0, "workspace": 1, "persona": 2, "chat": 3}
 
 # Droppable sections yield in reverse authority order so the conversation itself keeps a
@@ -103,6 +109,10 @@ class ContextService:
         self.memories = memories
         self.estimator = TokenEstimator()
         self.capability_registry = CapabilityRegistry()
+        # chat id -> {(item id, revision): prepared history item}. Only the
+        # sanitizing, serializing and estimating is cached; which items belong
+        # in the history is still decided by the database on every turn.
+        self._prepared_history = BoundedCache(PREPARED_HISTORY_CHATS, PREPARED_HISTORY_SECONDS)
 
     def _uow(self):
         return UnitOfWork(self.session_factory, self.secret_store)
@@ -132,7 +142,7 @@ class ContextService:
         cancellation.raise_if_cancelled()
         context_window, output_tokens, prompt_budget = self._token_budget(provider, model, preferences, model_settings)
 
-        current, history, memories, summary = self._load_context(
+        current, history, memories, summary, skipped = self._load_context(
             turn_id=turn_id,
             user_id=user_id,
             chat_id=chat_id,
@@ -147,7 +157,7 @@ class ContextService:
                 code="context_missing",
                 user_message="The conversation context could not be prepared.",
             )
-        source_history_count = len(history)
+        source_history_count = skipped + len(history)
 
         summary, history, degraded = self._compact_if_needed(
             turn_id=turn_id,
@@ -172,7 +182,7 @@ class ContextService:
                 user_message="The current request and persona instructions exceed the selected model context window.",
             )
 
-        transcript_norms = {normalize_memory_content(item["text"]) for item in history}
+        transcript_norms = {item["normalized"] for item in history}
         transcript_norms.add(normalize_memory_content(current["text"]))
         selected_memories, omitted_memories = self._select_memories(
             memories,
@@ -392,6 +402,14 @@ class ContextService:
             if turn:
                 turn.prompt_tokens_actual = max(0, int(count))
 
+    def record_commit_time(self, turn_id: str, milliseconds: int) -> None:
+        """Store the last phase of a turn's timeline, which ends after the reply's own write."""
+
+        with self._uow() as uow:
+            turn = uow.repo.turn_by_id(turn_id)
+            if turn:
+                turn.commit_ms = max(0, int(milliseconds))
+
     def record_reply_truncated(self, turn_id: str) -> None:
         """Note that a reply stopped because it ran out of room.
 
@@ -440,93 +458,16 @@ class ContextService:
         with self._uow() as uow:
             current = uow.repo.message(current_message_id)
             if not current or current.chat_id != chat_id:
-                return None, [], [], None
+                return None, [], [], None, 0
             current_turn = uow.repo.turn(user_id, turn_id)
-            all_prior_turns = [
-                row
-                for row in uow.repo.turns_for_chat(user_id, chat_id)
-                if current_turn and row.sequence_number < current_turn.sequence_number
-            ]
-            prior_turns = [row for row in all_prior_turns if row.status == "completed"]
-            base_rows = uow.repo.messages_before(chat_id, current.created_at)
-            referenced_ids = {
-                message_id
-                for turn in all_prior_turns
-                for message_id in (turn.user_message_id, turn.assistant_message_id)
-                if message_id
-            }
-            ordered_rows = [row for row in base_rows if row.id not in referenced_ids]
-            for prior_turn in prior_turns:
-                user_message = uow.repo.message(prior_turn.user_message_id)
-                assistant_message = (
-                    uow.repo.message(prior_turn.assistant_message_id) if prior_turn.assistant_message_id else None
-                )
-                if user_message:
-                    ordered_rows.append(user_message)
-                if assistant_message:
-                    capability_rows = uow.repo.capability_requests_for_turn(prior_turn.id)
-                    tool_calls = []
-                    for capability in capability_rows:
-                        definition = self.capability_registry.by_key(capability.capability_key)
-                        stored_arguments = json.loads(capability.arguments_json)
-                        tool_calls.append(
-                            {
-                                "type": "function",
-                                "function": {
-                                    "name": definition.tool_name,
-                                    "arguments": {"prompt": str(stored_arguments.get("prompt") or "")},
-                                },
-                            }
-                        )
-                    ordered_rows.append((assistant_message, tool_calls, capability_rows))
-            history = []
-            for item in ordered_rows:
-                if isinstance(item, tuple):
-                    row, tool_calls, capability_rows = item
-                else:
-                    row, tool_calls, capability_rows = item, [], []
-                row_text = safe_persona_output_text(row.text) if row.role == "assistant" else row.text
-                provider_message = {"role": row.role, "content": row_text}
-                if tool_calls:
-                    provider_message["tool_calls"] = tool_calls
-                history.append(
-                    {
-                        "id": row.id,
-                        "role": row.role,
-                        "text": row_text,
-                        "created_at": row.created_at,
-                        "provider_message": provider_message,
-                    }
-                )
-                for capability in capability_rows:
-                    definition = self.capability_registry.by_key(capability.capability_key)
-                    capability_payload = {
-                        "capability_key": capability.capability_key,
-                        "status": capability.status,
-                        "result": json.loads(capability.result_json) if capability.result_json else None,
-                        "error": (
-                            {
-                                "code": capability.error_code or "failed",
-                                "message": capability.error_message or "Capability failed.",
-                            }
-                            if capability.error_code or capability.error_message
-                            else None
-                        ),
-                    }
-                    tool_text = capability_tool_result(capability_payload)
-                    history.append(
-                        {
-                            "id": f"capability:{capability.id}",
-                            "role": "tool",
-                            "text": tool_text,
-                            "created_at": capability.requested_at,
-                            "provider_message": {
-                                "role": "tool",
-                                "tool_name": definition.tool_name,
-                                "content": tool_text,
-                            },
-                        }
-                    )
+            durable = uow.repo.latest_summary(user_id, chat_id)
+            safe_summary = _safe_summary_content(durable.content).strip() if durable else ""
+            summary = (
+                _SummarySnapshot(durable.id, durable.through_message_id, safe_summary)
+                if durable and safe_summary
+                else None
+            )
+            history, skipped = self._load_history(uow.repo, user_id, chat_id, current, current_turn, summary)
             memories = []
             if memory_mode != "off":
                 memories = [
@@ -547,17 +488,196 @@ class ContextService:
                             # None when no embedding model is pulled, which
                             # leaves retrieval exactly as it was.
                             query_vector=self.memories.question_vector(current.text) if self.memories else None,
+                            embedding_model=self.memories.embedding_model if self.memories else None,
                         )
                     )
                 ]
-            durable = uow.repo.latest_summary(user_id, chat_id)
-            safe_summary = _safe_summary_content(durable.content).strip() if durable else ""
-            summary = (
-                _SummarySnapshot(durable.id, durable.through_message_id, safe_summary)
-                if durable and safe_summary
-                else None
+            return {"id": current.id, "text": current.text}, history, memories, summary, skipped
+
+    def _load_history(self, repo, user_id, chat_id, current, current_turn, summary):
+        """Prompt history before the current turn, read in a fixed number of statements.
+
+        A usable summary already stands in for everything up to the item it was
+        written through, so only the turn holding that item and the turns after
+        it are read. What comes before is counted, not loaded, so the omitted
+        count stays what it would have been.
+        """
+
+        previous = self._prepared_history.get(chat_id) or {}
+        prepared = {}
+
+        def items(row, capability_rows):
+            return self._history_items(row, capability_rows, previous, prepared)
+
+        if current_turn is None:
+            rows = repo.messages_before(chat_id, current.created_at)
+            history = [item for row in rows for item in items(row, [])]
+            self._prepared_history.put(chat_id, prepared)
+            return history, 0
+        before = current_turn.sequence_number
+        start = self._summary_window_start(repo, user_id, chat_id, before, summary)
+        if start is None:
+            history = [
+                item
+                for row in repo.unthreaded_messages_before(user_id, chat_id, current.created_at, before)
+                for item in items(row, [])
+            ]
+            skipped = 0
+        else:
+            history = []
+            skipped = repo.history_items_before(user_id, chat_id, current.created_at, before, start)
+        turns = repo.turns_before(user_id, chat_id, before, from_sequence=start)
+        messages = repo.turn_messages_before(user_id, chat_id, before, from_sequence=start)
+        capabilities = repo.capability_requests_before(user_id, chat_id, before, from_sequence=start)
+        for prior_turn in turns:
+            if prior_turn.status != "completed":
+                continue
+            user_message = messages.get(prior_turn.user_message_id)
+            if user_message:
+                history.extend(items(user_message, []))
+            assistant_message = (
+                messages.get(prior_turn.assistant_message_id) if prior_turn.assistant_message_id else None
+            )
+            if assistant_message:
+                history.extend(items(assistant_message, capabilities.get(prior_turn.id, [])))
+        # Replaced rather than merged, so items that fell behind a summary or
+        # belonged to deleted messages leave with this turn.
+        self._prepared_history.put(chat_id, prepared)
+        return history, skipped
+
+    @staticmethod
+    def _summary_window_start(repo, user_id, chat_id, before_sequence, summary):
+        """The sequence number of the completed turn a usable summary was written through."""
+
+        if summary is None:
+            return None
+        through = summary.through_message_id
+        if through.startswith("capability:"):
+            capability = repo.capability_request(user_id, through.removeprefix("capability:"))
+            holder = repo.turn_by_id(capability.turn_id) if capability and capability.turn_id else None
+            if holder and not holder.assistant_message_id:
+                holder = None
+        else:
+            holder = repo.turn_for_history_item(user_id, chat_id, through)
+        if (
+            holder is None
+            or holder.chat_id != chat_id
+            or holder.status != "completed"
+            or holder.sequence_number >= before_sequence
+        ):
+            return None
+        return holder.sequence_number
+
+    def _history_items(self, row, capability_rows, previous, prepared):
+        """A message and the capability results that travel with it, prepared once.
+
+        Message text never changes after it is written, so a message is keyed by
+        its id and the requests attached to its reply; a capability result is
+        keyed by the fields that move as the request runs.
+        """
+
+        message_key = (row.id, tuple(capability.id for capability in capability_rows))
+        items = [self._reuse(message_key, previous, prepared, lambda: self._message_item(row, capability_rows))]
+        for capability in capability_rows:
+            capability_key = (
+                f"capability:{capability.id}",
+                capability.status,
+                capability.completed_at,
+                capability.error_code,
+                capability.error_message,
+            )
+            items.append(
+                self._reuse(
+                    capability_key,
+                    previous,
+                    prepared,
+                    lambda capability=capability: self._capability_item(capability),
+                )
+            )
+        return items
+
+    @staticmethod
+    def _reuse(key, previous, prepared, build):
+        item = previous.get(key)
+        if item is None:
+            item = build()
+        prepared[key] = item
+        return item
+
+    def _prepared_item(self, item: dict) -> dict:
+        item["tokens"] = self.estimator.message(item["provider_message"])
+        item["text_tokens"] = self.estimator.text(item["text"])
+        item["normalized"] = normalize_memory_content(item["text"])
+        return item
+
+    def _message_item(self, row, capability_rows) -> dict:
+        tool_calls = []
+        for capability in capability_rows:
+            definition = self.capability_registry.by_key(capability.capability_key)
+            stored_arguments = json.loads(capability.arguments_json)
+            tool_calls.append(
+                {
+                    "type": "function",
+                    "function": {
+                        "name": definition.tool_name,
+                        "arguments": {"prompt": str(stored_arguments.get("prompt") or "")},
+                    },
+                }
             )
-            return {"id": current.id, "text": current.text}, history, memories, summary
+        row_text = safe_persona_output_text(row.text) if row.role == "assistant" else row.text
+        provider_message = {"role": row.role, "content": row_text}
+        if tool_calls:
+            provider_message["tool_calls"] = tool_calls
+        return self._prepared_item(
+            {
+                "id": row.id,
+                "role": row.role,
+                "text": row_text,
+                "created_at": row.created_at,
+                "provider_message": provider_message,
+            }
+        )
+
+    def _capability_item(self, capability) -> dict:
+        definition = self.capability_registry.by_key(capability.capability_key)
+        capability_payload = {
+            "capability_key": capability.capability_key,
+            "status": capability.status,
+            "result": json.loads(capability.result_json) if capability.result_json else None,
+            "error": (
+                {
+                    "code": capability.error_code or "failed",
+                    "message": capability.error_message or "Capability failed.",
+                }
+                if capability.error_code or capability.error_message
+                else None
+            ),
+        }
+        tool_text = capability_tool_result(capability_payload)
+        return self._prepared_item(
+            {
+                "id": f"capability:{capability.id}",
+                "role": "tool",
+                "text": tool_text,
+                "created_at": capability.requested_at,
+                "provider_message": {
+                    "role": "tool",
+                    "tool_name": definition.tool_name,
+                    "content": tool_text,
+                },
+            }
+        )
+
+    def forget_history(self, chat_id: str) -> None:
+        """Drop a chat's prepared history, for when the chat itself is gone."""
+
+        self._prepared_history.discard(chat_id)
+
+    @staticmethod
+    def _history_tokens(items) -> int:
+        """What `TokenEstimator.messages` would say, from the costs prepared with each item."""
+
+        return 3 + sum(item["tokens"] for item in items)
 
     def _compact_if_needed(
         self,
@@ -571,7 +691,7 @@ class ContextService:
         cancellation,
     ):
         remaining = self._history_after_summary(history, summary)
-        projected = self.estimator.messages([self._provider_message(item) for item in remaining])
+        projected = self._history_tokens(remaining)
         threshold = int(prompt_budget * self.policy.summary_trigger_ratio)
         passes = 0
         degraded = None
@@ -586,7 +706,7 @@ class ContextService:
             chunk_budget = max(256, prompt_budget // 2)
             used = self.estimator.text(summary.content) if summary else 0
             for item in eligible:
-                cost = self.estimator.text(item["text"]) + 8
+                cost = item["text_tokens"] + 8
                 if chunk and used + cost > chunk_budget:
                     break
                 chunk.append(item)
@@ -609,7 +729,7 @@ class ContextService:
                 break
             passes += 1
             remaining = self._history_after_summary(history, summary)
-            projected = self.estimator.messages([self._provider_message(item) for item in remaining])
+            projected = self._history_tokens(remaining)
         if projected > threshold and len(remaining) > self.policy.recent_messages_to_preserve:
             degraded = degraded or "summary_catchup_limited"
         return summary, remaining, degraded
@@ -663,8 +783,17 @@ class ContextService:
                 estimated_tokens=self.estimator.text(content),
             )
             snapshot = _SummarySnapshot(row.id, row.through_message_id, row.content)
+        self._forget_prepared(chat_id, {item["id"] for item in chunk})
         return snapshot
 
+    def _forget_prepared(self, chat_id: str, item_ids: set[str]) -> None:
+        """Drop prepared items a new summary now stands in for."""
+
+        prepared = self._prepared_history.get(chat_id)
+        if prepared:
+            kept = {key: item for key, item in prepared.items() if key[0] not in item_ids}
+            self._prepared_history.put(chat_id, kept)
+
     @staticmethod
     def _history_after_summary(history, summary):
         if not summary or not summary.content.strip():
@@ -732,8 +861,8 @@ class ContextService:
         selected_groups = []
         used = 0
         for group in reversed(groups):
+            cost = self._history_tokens(group)
             messages = [self._provider_message(item) for item in group]
-            cost = self.estimator.messages(messages)
             if used + cost <= budget:
                 selected_groups.append(messages)
                 used += cost
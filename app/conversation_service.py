@@ -38,12 +38,14 @@ from app.task_contracts import (
     is_high_confidence_image_action_request,
     is_high_confidence_media_action_request,
 )
-from app.turn_events import TurnEventBroker
+from app.turn_events import DeltaCoalescing, TurnEventBroker
 from app.turn_pipeline import TurnContext, TurnPipeline
 
 
 # One provider serves persona conversation. Named rather than repeated.
 PERSONA_PROVIDER = "ollama"
+# Messages in one page of a chat when a page is asked for without a size.
+CHAT_PAGE_SIZE = 100
 
 
 def _persona_mapping(persona):
@@ -103,6 +105,9 @@ class ConversationService:
         memory: MemoryService,
         capabilities,
         task_models,
+        *,
+        delta_coalescing: DeltaCoalescing = DeltaCoalescing(),
+        metrics=None,
     ):
         self.session_factory = session_factory
         self.secret_store = secret_store
@@ -114,6 +119,8 @@ class ConversationService:
         self.memory = memory
         self.capabilities = capabilities
         self.task_models = task_models
+        self.delta_coalescing = delta_coalescing
+        self.metrics = metrics
 
     def _uow(self):
         return UnitOfWork(self.session_factory, self.secret_store)
@@ -130,23 +137,40 @@ class ConversationService:
                 raise NotFoundError(str(exc)) from exc
             return _chat_response(chat)
 
-    def get_chat(self, user_id: str, chat_id: str) -> dict | None:
+    def get_chat(
+        self, user_id: str, chat_id: str, *, before: str | None = None, limit: int | None = None
+    ) -> dict | None:
+        """A chat and its transcript, or one page of it.
+
+        Without `before` or `limit` the whole transcript comes back, as it always
+        has. With either, the newest `limit` messages older than `before` come
+        back and `next_before` names the cursor for the page before them, so
+        opening a long chat reads what is shown rather than everything said.
+        """
+
         with self._uow() as uow:
             chat = uow.repo.chat(user_id, chat_id)
             if not chat:
                 return None
+            paged = before is not None or limit is not None
+            if paged:
+                anchor = uow.repo.message(before) if before else None
+                if before and (anchor is None or anchor.chat_id != chat_id):
+                    raise RequestError("The message cursor does not belong to this chat.", 400)
+                rows, more = uow.repo.message_page(chat_id, before=anchor, limit=limit or CHAT_PAGE_SIZE)
+            else:
+                rows, more = uow.repo.messages(chat_id), False
+            message_ids = [row.id for row in rows] if paged else None
+            attachment_rows = uow.repo.chat_attachments(user_id, chat_id, message_ids=message_ids)
+            frames = uow.repo.frames_for_attachments(row.id for row in attachment_rows)
             attachments = {}
-            for row in uow.repo.chat_attachments(user_id, chat_id):
+            for row in attachment_rows:
                 attachments.setdefault(row.assistant_message_id, []).append(
-                    attachment_response(row, uow.repo.attachment_frames(row.id))
+                    attachment_response(row, frames.get(row.id, []))
                 )
             # A reply produced with reduced context stays explainable after a reload, so the
             # reason travels with the message it produced rather than only with the live turn.
-            degraded = {
-                turn.assistant_message_id: turn.context_degraded_reason
-                for turn in uow.repo.turns_for_chat(user_id, chat_id)
-                if turn.assistant_message_id and turn.context_degraded_reason
-            }
+            degraded = uow.repo.degraded_reasons(user_id, chat_id, message_ids=message_ids)
             messages = [
                 {
                     "id": row.id,
@@ -156,9 +180,13 @@ class ConversationService:
                     "attachments": attachments.get(row.id, []),
                     "degraded_reason": degraded.get(row.id),
                 }
-                for row in uow.repo.messages(chat_id)
+                for row in rows
             ]
-            return {"chat": _chat_response(chat), "messages": messages}
+            return {
+                "chat": _chat_response(chat),
+                "messages": messages,
+                "next_before": rows[0].id if more and rows else None,
+            }
 
     def update_chat(self, user_id: str, chat_id: str, values: dict) -> dict | None:
         with self._uow() as uow:
@@ -194,7 +222,8 @@ class ConversationService:
             if uow.repo.active_jobs_for_chats(user_id, [chat_id]):
                 raise ConflictError("Cancel active work before permanently deleting this chat.")
             uow.repo.delete_chat(chat)
-            return True
+        self.context.forget_history(chat_id)
+        return True
 
     def bulk_chat_action(self, user_id: str, action: str, chat_ids: list[str]) -> dict:
         ids = self._bulk_ids(chat_ids)
@@ -215,6 +244,7 @@ class ConversationService:
                     raise ConflictError("Cancel active work before permanently deleting the selected chats.")
                 for row in rows:
                     uow.repo.delete_chat(row)
+                    self.context.forget_history(row.id)
                 affected = len(rows)
             else:
                 raise RequestError("invalid chat bulk action", 400)
@@ -259,6 +289,7 @@ class ConversationService:
             turn_id=ctx.turn_id,
             latency_class="interactive",
             model_key=f"chat:{ctx.model}",
+            provider_pool=ctx.provider_name,
             execution=TurnPipeline(self, ctx).execution(),
         )
         return turn_payload, job_payload
@@ -350,6 +381,51 @@ class ConversationService:
         }
         return ctx, turn_response(turn, job.id), job_payload
 
+    # The follow-ups a restart can run again, by job kind, and the key
+    # `TurnPipeline.after_generated` reads each one's job id from.
+    RESUMABLE_FOLLOWUPS = {"title_followup": "title_job_id", "memory_extraction": "memory_extraction_job_id"}
+
+    def resume_interrupted(self, job) -> None:
+        """Submit a title or memory follow-up a restart put back in the queue.
+
+        The turn's context is rebuilt from the rows the reply committed: its
+        user message, and the chat that owns the persona and workspace binding.
+        The deterministic title is a function of that message, so the title
+        follow-up still only replaces the title this turn wrote.
+        """
+
+        key = self.RESUMABLE_FOLLOWUPS.get(job.kind)
+        if not key or not job.source_turn_id:
+            return
+        with self._uow() as uow:
+            turn = uow.repo.turn(job.user_id, job.source_turn_id)
+            chat = uow.repo.chat(job.user_id, turn.chat_id) if turn else None
+            message = uow.repo.message(turn.user_message_id) if turn else None
+            if not turn or not chat or not message or turn.status != "completed":
+                return
+            ctx = TurnContext(
+                user_id=job.user_id,
+                chat_id=chat.id,
+                text=message.text,
+                provider_name=turn.provider,
+                model=turn.model,
+                memory_mode=chat.memory_mode or "saved",
+                workspace_id=chat.workspace_id,
+                persona_id=chat.persona_id,
+                persona_name="",
+                persona_instructions="",
+                example_dialogue="",
+                owner_profile="",
+                allow_persona_image_sends=False,
+                explicit_image_request=False,
+                turn_id=turn.id,
+                job_id="",
+                user_message_id=message.id,
+                should_generate_title=True,
+                deterministic_title=generate_chat_title_from_first_user_message(message.text),
+            )
+        TurnPipeline(self, ctx).after_generated({key: job.id})
+
     def get_turn(self, user_id: str, turn_id: str) -> dict | None:
         with self._uow() as uow:
             turn = uow.repo.turn(user_id, turn_id)
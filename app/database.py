@@ -336,7 +336,69 @@ def _reconcile_inflight_generated_media(conn, data_dir: Path, stamp: int) -> Non
             )
 
 
-def initialize_database(path, session_ttl_seconds, secret_store=None):
+# Work that can run again from its durable rows without doing anything twice: a
+# picture or video whose result was never recorded, an identity check, and the
+# title and memory follow-ups of a reply that already committed. A reply is not
+# here, because it streams to a listener the restart disconnected, and nor is
+# capability planning, which creates requests as it goes. Background scenes are
+# left out too: what happens when one settles was held by the process that died.
+RESUMABLE_JOB_KINDS = ("image", "video", "identity_validation", "memory_extraction", "title_followup")
+DEFAULT_JOB_MAX_ATTEMPTS = 3
+
+
+def _requeue_resumable_jobs(conn, stamp, max_attempts):
+    """Put interrupted work that is safe to repeat back in the queue, and remember which.
+
+    The ids go into a temporary table the failure updates then skip. A job that
+    has already started `max_attempts` times is failed like any other, so work
+    that keeps taking the process down with it stops being retried.
+    """
+
+    conn.execute("CREATE TEMP TABLE resumed_jobs(id TEXT PRIMARY KEY, capability_request_id TEXT)")
+    if max_attempts <= 0:
+        return
+    conn.execute(
+        "INSERT INTO resumed_jobs(id,capability_request_id) "
+        "SELECT jobs.id,jobs.capability_request_id FROM async_jobs AS jobs "
+        "WHERE jobs.status IN ('queued','running') AND COALESCE(jobs.cancel_requested,0)=0 "
+        "AND COALESCE(jobs.attempts,0)<? AND ("
+        "(jobs.kind IN ('image','video') AND EXISTS ("
+        "SELECT 1 FROM capability_requests AS requests WHERE requests.id=jobs.capability_request_id "
+        "AND requests.status IN ('queued','running') AND requests.idempotency_key NOT LIKE 'scene:%')) "
+        "OR (jobs.kind='identity_validation' AND EXISTS ("
+        "SELECT 1 FROM persona_identity_validations AS validations WHERE validations.job_id=jobs.id "
+        "AND validations.status IN ('queued','running'))) "
+        "OR (jobs.kind IN ('memory_extraction','title_followup') AND jobs.source_turn_id IS NOT NULL))",
+        (max_attempts,),
+    )
+    conn.execute(
+        "UPDATE async_jobs SET status='queued', progress='Queued again after a restart', started_at=NULL, updated_at=? "
+        "WHERE id IN (SELECT id FROM resumed_jobs)",
+        (stamp,),
+    )
+    conn.execute(
+        "UPDATE capability_requests SET status='queued', started_at=NULL "
+        "WHERE status='running' AND id IN (SELECT capability_request_id FROM resumed_jobs)"
+    )
+    conn.execute(
+        "UPDATE chat_attachments SET status='queued', updated_at=? "
+        "WHERE status='running' AND capability_request_id IN (SELECT capability_request_id FROM resumed_jobs)",
+        (stamp,),
+    )
+    conn.execute(
+        "UPDATE persona_identity_validations SET status='queued', started_at=NULL "
+        "WHERE status='running' AND job_id IN (SELECT id FROM resumed_jobs)"
+    )
+
+
+def initialize_database(
+    path,
+    session_ttl_seconds,
+    secret_store=None,
+    *,
+    resume_jobs=False,
+    job_max_attempts=DEFAULT_JOB_MAX_ATTEMPTS,
+):
     secret_store = secret_store or SECRET_STORE
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     upgrade_database(path)
@@ -348,8 +410,11 @@ def initialize_database(path, session_ttl_seconds, secret_store=None):
         "UPDATE sessions SET expires_at=created_at+? WHERE expires_at IS NULL",
         (session_ttl_seconds,),
     )
+    # Everything resumed here is submitted again by `JobService.resume_interrupted`
+    # once the queue is running; everything else unfinished fails as before.
+    _requeue_resumable_jobs(conn, stamp, job_max_attempts if resume_jobs else 0)
     conn.execute(
-        "UPDATE async_jobs SET status='failed', error='interrupted by server restart', completed_at=?, updated_at=? WHERE status IN ('queued','running')",
+        "UPDATE async_jobs SET status='failed', error='interrupted by server restart', completed_at=?, updated_at=? WHERE status IN ('queued','running') AND id NOT IN (SELECT id FROM resumed_jobs)",
         (stamp, stamp),
     )
     conn.execute(
@@ -357,11 +422,11 @@ def initialize_database(path, session_ttl_seconds, secret_store=None):
         (stamp,),
     )
     conn.execute(
-        "UPDATE capability_requests SET status='failed', error_code='interrupted', error_message='interrupted by server restart', completed_at=? WHERE status IN ('queued','running')",
+        "UPDATE capability_requests SET status='failed', error_code='interrupted', error_message='interrupted by server restart', completed_at=? WHERE status IN ('queued','running') AND id NOT IN (SELECT capability_request_id FROM resumed_jobs WHERE capability_request_id IS NOT NULL)",
         (stamp,),
     )
     conn.execute(
-        "UPDATE chat_attachments SET status='failed', safe_error='Image generation was interrupted by a restart.', retry_available=1, completed_at=?, updated_at=? WHERE status IN ('queued','running')",
+        "UPDATE chat_attachments SET status='failed', safe_error='Image generation was interrupted by a restart.', retry_available=1, completed_at=?, updated_at=? WHERE status IN ('queued','running') AND capability_request_id NOT IN (SELECT capability_request_id FROM resumed_jobs WHERE capability_request_id IS NOT NULL)",
         (stamp, stamp),
     )
     conn.execute(
@@ -369,7 +434,7 @@ def initialize_database(path, session_ttl_seconds, secret_store=None):
         (stamp,),
     )
     conn.execute(
-        "UPDATE persona_identity_validations SET status='error', error_code='interrupted', error_message='interrupted by server restart', completed_at=? WHERE status IN ('queued','running')",
+        "UPDATE persona_identity_validations SET status='error', error_code='interrupted', error_message='interrupted by server restart', completed_at=? WHERE status IN ('queued','running') AND (job_id IS NULL OR job_id NOT IN (SELECT id FROM resumed_jobs))",
         (stamp,),
     )
     conn.execute(
@@ -5,11 +5,14 @@ words with a memory never found it. This is the part that fixes that: a small
 local model turns each memory into a vector when it is written, the question is
 turned into one when it is asked, and the two are compared by direction.
 
-There is no numpy here and none is wanted for this. Every vector is normalised
-to unit length when it is stored, which turns the comparison into a plain dot
-product - no square roots, no per-query normalisation - and the candidate set is
-bounded, so the worst case is a fixed cost rather than one that grows with how
-much the assistant remembers.
+Nothing here needs numpy. When it happens to be installed, scoring a batch of
+stored vectors uses it, and the answer is exactly the one the plain path gives;
+it is never a dependency. Every vector is normalised to unit length when it is
+stored, which turns the comparison into a plain dot
+product - no square roots, no per-query normalisation. Vectors are filed in
+cells by direction, so a question is compared with the cell centres and then
+with the few cells it is nearest, rather than with everything the assistant
+remembers.
 
 The model runs on the same machine as everything else. Conversation text does
 not leave it; see `docs/task-models.md`.
@@ -18,19 +21,38 @@ not leave it; see `docs/task-models.md`.
 from __future__ import annotations
 
 from array import array
+import heapq
 import json
 from operator import mul
+import urllib.error
 import urllib.request
 
+try:  # optional: only ever a faster route to the same answer
+    import numpy
+except ImportError:  # pragma: no cover - depends on what the image installed
+    numpy = None
+
 
 # Room for the usual small embedding models - 384 for all-minilm, 768 for
 # nomic-embed-text, 1024 for mxbai-embed-large - and a refusal past that, since
 # a vector this large is a misconfiguration rather than a better answer.
 MAX_DIMENSIONS = 4096
-# How many stored vectors one question is compared against. Comparison is a few
-# microseconds each, so this is the ceiling on the whole added cost rather than
-# a quality limit; beyond it, recency has already decided.
+# How many vectors not yet filed in the index one question is compared against
+# directly. Filing happens in the background pass that computes the vectors, so
+# this is only ever the short tail that pass has not reached yet.
 MAX_CANDIDATES = 400
+# The index. Every stored vector is filed in the cell whose centre it points
+# closest to, and a cell that outgrows its limit is split in two. The limit is
+# this or the square root of how many vectors the owner has filed, whichever is
+# larger, so the number of cells grows with that square root too. A question is
+# scored against every centre in one batch and then only against the memories
+# in the few closest cells, so both halves of its work grow with the square
+# root of what is remembered rather than with all of it.
+MAX_CELL_SIZE = 128
+# How many of the closest cells a question looks inside. A right answer near a
+# cell boundary can sit in the second or third closest; six is generous for
+# that and still bounds the comparisons at a few hundred.
+PROBED_CELLS = 6
 # Measured, not guessed. Against twelve ordinary memories and nine questions on
 # a real nomic-embed-text, right answers scored 0.42 to 0.64 and wrong ones had
 # a median of 0.36. A floor of 0.55 - the value reasoned out before measuring -
@@ -42,6 +64,17 @@ SIMILARITY_FLOOR = 0.40
 # out the clearly unrelated; this keeps a handful of plausible-but-wrong ones
 # from crowding out memories that are merely recent.
 MAX_SEMANTIC_MATCHES = 6
+# How many memories go to the model in one request. Ollama runs a batch as one
+# forward pass, so this is where a backfill gets its speed; much past a few
+# dozen the request just gets long enough to hit its timeout on a slow GPU.
+EMBED_BATCH_SIZE = 32
+# Below this many candidates, building the numpy matrix costs more than the
+# plain loop it would replace.
+NUMPY_MIN_BATCH = 32
+# How far a numpy score may be from the plain one. Both are double precision
+# over the same float32 values and differ only in summation order, which is
+# many orders of magnitude inside this.
+NUMPY_TOLERANCE = 1e-9
 
 
 class EmbeddingUnavailable(Exception):
@@ -111,11 +144,156 @@ def rank(
         score = similarity(query_vector, vector)
         if score >= floor:
             scored.append((identifier, score))
-    scored.sort(key=lambda item: (-item[1], item[0]))
+    scored.sort(key=_best_first)
     return scored[: max(1, int(limit))]
 
 
-def ollama_embed(base_url: str, model: str, text: str, timeout: float = 30.0) -> list[float]:
+def rank_packed(
+    query_vector,
+    candidates,
+    *,
+    floor: float = SIMILARITY_FLOOR,
+    limit: int = MAX_SEMANTIC_MATCHES,
+) -> list[tuple[str, float]]:
+    """`rank`, for vectors still in the form they were stored in.
+
+    `candidates` is an iterable of `(identifier, packed)`. Every blob of the
+    question's width goes into one contiguous float32 buffer and is scored in a
+    single pass, without a Python list per row, and only the best few are kept
+    rather than sorting everything. Returns exactly what `rank` returns for the
+    same vectors unpacked, including the zero a vector of another width scores.
+    """
+
+    if not query_vector:
+        return []
+    limit = max(1, int(limit))
+    width = len(query_vector) * array("f").itemsize
+    identifiers, blobs, mismatched = [], [], []
+    for identifier, raw in candidates:
+        if raw and len(raw) == width:
+            identifiers.append(identifier)
+            blobs.append(raw)
+        else:
+            mismatched.append(identifier)
+    matrix = array("f")
+    matrix.frombytes(b"".join(blobs))
+    if numpy is not None and len(identifiers) >= NUMPY_MIN_BATCH:
+        scored = _numpy_scored(query_vector, identifiers, matrix, floor, limit)
+    else:
+        scored = _plain_scored(query_vector, identifiers, matrix, range(len(identifiers)), floor)
+    if floor <= 0.0:
+        scored.extend((identifier, 0.0) for identifier in mismatched)
+    return heapq.nsmallest(limit, scored, key=_best_first)
+
+
+def _best_first(item):
+    return (-item[1], item[0])
+
+
+def _plain_scored(query_vector, identifiers, matrix, indexes, floor) -> list[tuple[str, float]]:
+    # The same products in the same order as `similarity`, read straight out of
+    # the shared buffer, so the scores are bit-for-bit the ones `rank` computes.
+    dimensions = len(query_vector)
+    view = memoryview(matrix)
+    scored = []
+    for index in indexes:
+        score = float(sum(map(mul, query_vector, view[index * dimensions : (index + 1) * dimensions])))
+        if score >= floor:
+            scored.append((identifiers[index], score))
+    return scored
+
+
+def _numpy_scored(query_vector, identifiers, matrix, floor, limit) -> list[tuple[str, float]]:
+    # Every candidate in one matrix product, then a partial selection of the
+    # few that could make the cut. Those few are scored again the plain way, so
+    # a tie decided by the last bit is decided the way `rank` decides it.
+    vectors = numpy.frombuffer(matrix, dtype=numpy.float32).reshape(len(identifiers), len(query_vector))
+    approximate = vectors.astype(numpy.float64) @ numpy.asarray(query_vector, dtype=numpy.float64)
+    shortlist = numpy.flatnonzero(approximate >= floor - NUMPY_TOLERANCE)
+    if len(shortlist) > limit:
+        cutoff = numpy.partition(approximate[shortlist], -limit)[-limit]
+        shortlist = shortlist[approximate[shortlist] >= cutoff - NUMPY_TOLERANCE]
+    return _plain_scored(query_vector, identifiers, matrix, shortlist.tolist(), floor)
+
+
+def accumulate(total, vector) -> list[float]:
+    """Add a vector into a cell's running total.
+
+    The total, not its average, is what a cell stores: its direction is the
+    cell's centre, and adding one more member never needs the others.
+    """
+
+    if not total or len(total) != len(vector):
+        return [float(value) for value in vector]
+    return [left + right for left, right in zip(total, vector)]
+
+
+def withdraw(total, vector) -> list[float]:
+    """Take a vector back out of a cell's running total."""
+
+    if not total or len(total) != len(vector):
+        return list(total or [])
+    return [left - right for left, right in zip(total, vector)]
+
+
+def direction(total) -> list[float]:
+    """A cell total scaled to unit length, or empty when it has none."""
+
+    length = sum(value * value for value in total) ** 0.5 if total else 0.0
+    if not length:
+        return []
+    return [value / length for value in total]
+
+
+def nearest_cells(query_vector, cells, count: int = PROBED_CELLS) -> list:
+    """The cells whose centres point closest to the question, best first.
+
+    `cells` is an iterable of `(identifier, centre)`, each centre packed at
+    unit length as it is stored, so they are all scored in one batch the way
+    memories are. There is no floor here: a cell is a place to look, not an
+    answer, and the floor is applied to what is found inside it.
+    """
+
+    if not query_vector:
+        return []
+    ranked = rank_packed(query_vector, cells, floor=float("-inf"), limit=max(1, int(count)))
+    return [identifier for identifier, _score in ranked]
+
+
+def bisect(vectors, iterations: int = 4) -> list[int]:
+    """Split one overfull cell's vectors into two groups, labelled 0 and 1.
+
+    Two-way k-means on directions. Seeded with the member least like the first
+    and then the member least like that one, which puts the two seeds at
+    opposite ends of the cell rather than wherever the first two rows happen to
+    be. Vectors that are all the same have no better split than alternating.
+    """
+
+    if len(vectors) < 2:
+        return [0] * len(vectors)
+    left = min(vectors, key=lambda vector: similarity(vectors[0], vector))
+    right = min(vectors, key=lambda vector: similarity(left, vector))
+    labels = [0] * len(vectors)
+    for _ in range(max(1, int(iterations))):
+        labels = [0 if similarity(vector, left) >= similarity(vector, right) else 1 for vector in vectors]
+        if len(set(labels)) < 2:
+            return [index % 2 for index in range(len(vectors))]
+        groups = ([], [])
+        for vector, label in zip(vectors, labels):
+            groups[label].append(vector)
+        left = direction(sum_vectors(groups[0]))
+        right = direction(sum_vectors(groups[1]))
+    return labels
+
+
+def sum_vectors(vectors) -> list[float]:
+    total: list[float] = []
+    for vector in vectors:
+        total = accumulate(total, vector)
+    return total
+
+
+def ollama_embed(base_url: str, model: str, text: str, timeout: float = 30.0, opener=None) -> list[float]:
     """Ask the local model for a vector, normalised and ready to store.
 
     The text is sent as written. nomic-embed-text documents `search_query:` and
@@ -125,19 +303,49 @@ def ollama_embed(base_url: str, model: str, text: str, timeout: float = 30.0) ->
     documentation would have been the reasonable thing to do and the wrong one.
     """
 
-    payload = json.dumps({"model": model, "prompt": text}).encode()
-    request = urllib.request.Request(
-        f"{str(base_url or '').rstrip('/')}/api/embeddings",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
     try:
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            body = json.loads(response.read().decode("utf-8", errors="replace"))
+        body = _ollama_post(base_url, "/api/embeddings", {"model": model, "prompt": text}, timeout, opener)
     except Exception as exc:  # noqa: BLE001 - every failure means the same thing here
         raise EmbeddingUnavailable(f"The embedding model could not be reached ({exc.__class__.__name__}).") from exc
     values = body.get("embedding") if isinstance(body, dict) else None
     if not isinstance(values, list):
         raise EmbeddingUnavailable("The embedding model did not return a vector.")
     return normalize(values)
+
+
+def ollama_embed_batch(base_url: str, model: str, texts, timeout: float = 120.0, opener=None) -> list[list[float]]:
+    """Vectors for several texts from one request, in the order given.
+
+    `/api/embed` takes a list and runs it as one batch on the model, which is
+    what makes a full re-embed take minutes rather than hours. An Ollama from
+    before that endpoint existed answers 404, and is asked one text at a time
+    instead. A reply that does not account for every text is refused whole:
+    pairing the wrong vector with a memory is worse than no vector.
+    """
+
+    texts = [str(text) for text in texts]
+    if not texts:
+        return []
+    try:
+        body = _ollama_post(base_url, "/api/embed", {"model": model, "input": texts}, timeout, opener)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 404:
+            return [ollama_embed(base_url, model, text, timeout=timeout, opener=opener) for text in texts]
+        raise EmbeddingUnavailable(f"The embedding model could not be reached (HTTP {exc.code}).") from exc
+    except Exception as exc:  # noqa: BLE001 - every failure means the same thing here
+        raise EmbeddingUnavailable(f"The embedding model could not be reached ({exc.__class__.__name__}).") from exc
+    values = body.get("embeddings") if isinstance(body, dict) else None
+    if not isinstance(values, list) or len(values) != len(texts) or not all(isinstance(v, list) for v in values):
+        raise EmbeddingUnavailable("The embedding model did not return a vector for every text.")
+    return [normalize(vector) for vector in values]
+
+
+def _ollama_post(base_url: str, path: str, payload: dict, timeout: float, opener=None):
+    request = urllib.request.Request(
+        f"{str(base_url or '').rstrip('/')}{path}",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with (opener or urllib.request.urlopen)(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8", errors="replace"))
@@ -0,0 +1,232 @@
+"""Keep-alive connections to the HTTP services this application calls.
+
+`urllib.request.urlopen` opens a TCP connection for every request and asks the
+server to close it afterwards. Ollama's model probe, every embedding, every
+ComfyUI history poll and every speech request paid for that handshake, and
+the chat request paid for it on the way to its first token.
+
+`pooled_opener` returns an opener that takes a connection from a pool kept
+per endpoint and puts it back once its response has been read to the end.
+`build_services` hands it to the clients of the local providers, which call it
+where they called `urllib.request.urlopen`; nothing else in the process is
+affected. HTTP errors, redirects and proxies are still handled by urllib. Only
+plain `http://` is pooled. Cloud providers are reached over HTTPS and keep
+urllib's own handler.
+
+A response closed before its end, such as a cancelled stream, takes its
+connection with it, because what the server is still sending would arrive
+at the start of the next response. At most `max_per_host` requests to one
+endpoint are in flight at once; the next waits, up to its own timeout, for
+one of them to finish. At most `max_idle` connections per endpoint wait for
+reuse, and one idle for longer than `idle_seconds` is closed rather than
+trusted, since the server may already have dropped it.
+"""
+
+from __future__ import annotations
+
+import http.client
+import select
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+MAX_CONNECTIONS_PER_HOST = 8
+MAX_IDLE_CONNECTIONS = 8
+IDLE_SECONDS = 30.0
+
+# A reused connection the server has just closed fails like this before any
+# response arrives, and the request can be sent again on a fresh one.
+_STALE = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class _PooledResponse(http.client.HTTPResponse):
+    _release = None
+    _abandoned = False
+
+    def close(self):
+        # Closing before the body has been read to the end abandons it.
+        self._abandoned = self.fp is not None
+        super().close()
+        self._finish(reusable=False)
+
+    def _close_conn(self):
+        super()._close_conn()
+        self._finish(reusable=not self._abandoned and not self.will_close)
+
+    def _finish(self, reusable: bool) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release(reusable)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        max_idle: int = MAX_IDLE_CONNECTIONS,
+        idle_seconds: float = IDLE_SECONDS,
+        *,
+        max_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        clock=time.monotonic,
+    ):
+        self.max_idle = max(0, int(max_idle))
+        self.idle_seconds = max(0.0, float(idle_seconds))
+        self.max_per_host = max(1, int(max_per_host))
+        self.clock = clock
+        self._idle: dict[str, list[tuple[http.client.HTTPConnection, float]]] = {}
+        self._in_use: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)
+        self._opened = 0
+        self._reused = 0
+
+    def open(self, request: urllib.request.Request) -> http.client.HTTPResponse:
+        """Send `request` on a pooled connection, the way `HTTPHandler.do_open` would."""
+
+        host = request.host
+        if not host:
+            raise urllib.error.URLError("no host given")
+        headers = dict(request.unredirected_hdrs)
+        headers.update((name, value) for name, value in request.headers.items() if name not in headers)
+        headers = {name.title(): value for name, value in headers.items()}
+        # A body urllib cannot send twice must not be retried on a fresh connection.
+        retry = request.data is None or isinstance(request.data, (bytes, bytearray))
+        self._claim(host, request.timeout)
+        try:
+            while True:
+                connection, reused = self._acquire(host, request.timeout)
+                try:
+                    connection.request(
+                        request.get_method(),
+                        request.selector,
+                        request.data,
+                        headers,
+                        encode_chunked=request.has_header("Transfer-encoding"),
+                    )
+                    response = connection.getresponse()
+                except _STALE as error:
+                    connection.close()
+                    if reused and retry:
+                        continue
+                    raise urllib.error.URLError(error) from error
+                except OSError as error:
+                    connection.close()
+                    raise urllib.error.URLError(error) from error
+                break
+        except BaseException:
+            self._vacate(host)
+            raise
+        response.url = request.get_full_url()
+        response.msg = response.reason
+        # The slot is held until the response is read to its end or closed.
+        response._release = lambda reusable: self._release(host, connection, reusable)
+        return response
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "opened": self._opened,
+                "reused": self._reused,
+                "idle": sum(len(connections) for connections in self._idle.values()),
+                "in_use": sum(self._in_use.values()),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _released_at in connections:
+                connection.close()
+
+    def _claim(self, host: str, timeout) -> None:
+        """Wait, up to the request's own timeout, for a slot on `host`."""
+
+        if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+            timeout = socket.getdefaulttimeout()
+        with self._freed:
+            if not self._freed.wait_for(lambda: self._in_use.get(host, 0) < self.max_per_host, timeout):
+                raise urllib.error.URLError(f"every connection to {host} stayed busy")
+            self._in_use[host] = self._in_use.get(host, 0) + 1
+
+    def _vacate(self, host: str) -> None:
+        with self._freed:
+            remaining = self._in_use.get(host, 0) - 1
+            if remaining > 0:
+                self._in_use[host] = remaining
+            else:
+                self._in_use.pop(host, None)
+            self._freed.notify()
+
+    def _acquire(self, host: str, timeout) -> tuple[http.client.HTTPConnection, bool]:
+        now = self.clock()
+        discarded = []
+        found = None
+        with self._lock:
+            connections = self._idle.get(host) or []
+            while connections:
+                connection, released_at = connections.pop()
+                if now - released_at <= self.idle_seconds and _still_open(connection):
+                    found = connection
+                    self._reused += 1
+                    break
+                discarded.append(connection)
+            if found is None:
+                self._opened += 1
+        for connection in discarded:
+            connection.close()
+        if found is None:
+            found = http.client.HTTPConnection(host, timeout=timeout)
+            found.response_class = _PooledResponse
+            return found, False
+        found.timeout = timeout
+        if found.sock is not None:
+            found.sock.settimeout(socket.getdefaulttimeout() if timeout is socket._GLOBAL_DEFAULT_TIMEOUT else timeout)
+        return found, True
+
+    def _release(self, host: str, connection: http.client.HTTPConnection, reusable: bool) -> None:
+        kept = False
+        if reusable and connection.sock is not None:
+            with self._lock:
+                connections = self._idle.setdefault(host, [])
+                if len(connections) < self.max_idle:
+                    connections.append((connection, self.clock()))
+                    kept = True
+        if not kept:
+            connection.close()
+        self._vacate(host)
+
+
+def _still_open(connection: http.client.HTTPConnection) -> bool:
+    # An idle connection has nothing to read. If it has, the server closed it
+    # or sent something no request asked for, and it cannot be reused.
+    if connection.sock is None:
+        return False
+    try:
+        if hasattr(select, "poll"):
+            poller = select.poll()
+            poller.register(connection.sock, select.POLLIN)
+            return not poller.poll(0)
+        readable, _writable, _errors = select.select([connection.sock], [], [], 0)
+    except (OSError, ValueError):
+        return False
+    return not readable
+
+
+class KeepAliveHTTPHandler(urllib.request.HTTPHandler):
+    def __init__(self, pool: ConnectionPool):
+        super().__init__()
+        self.pool = pool
+
+    def http_open(self, req):
+        return self.pool.open(req)
+
+
+POOL = ConnectionPool()
+
+
+def pooled_opener(pool: ConnectionPool = POOL):
+    """Return a drop-in for `urllib.request.urlopen` that sends plain HTTP through `pool`."""
+
+    return urllib.request.build_opener(KeepAliveHTTPHandler(pool)).open
@@ -534,19 +534,17 @@ class IdentityService:
             self.logger.warning("inline identity validation failed error=%s", exc.__class__.__name__)
             return {"status": "error", "claim_status": "unverified", "validation": public}
 
-    def validate_media(self, user_id: str, persona_id: str, media_id: str) -> dict:  # noqa: C901
+    def validate_media(self, user_id: str, persona_id: str, media_id: str) -> dict:
         provider_settings = self._provider_settings(user_id)
         if provider_settings["provider"] == "disabled":
             raise ConflictError("Visual identity validation is disabled.")
-        provider = self.providers.get(provider_settings["provider"])
-        if not provider:
+        if not self.providers.get(provider_settings["provider"]):
             raise ConflictError("The configured visual identity provider is not installed.")
         with self._uow() as uow:
             identity = self._identity(uow.repo, user_id, persona_id, create=False)
             if not identity or identity.consent_status != "granted" or identity.status != "active":
                 raise ConflictError("An active, consented visual identity profile is required.")
-            references = uow.repo.approved_identity_references(user_id, identity.id)
-            if not references:
+            if not uow.repo.approved_identity_references(user_id, identity.id):
                 raise ConflictError("Approve at least one identity reference before validation.")
             media = uow.repo.media(user_id, media_id)
             if not media or media.kind != "image":
@@ -571,10 +569,48 @@ class IdentityService:
                 created_at=now_ts(),
             )
             uow.repo.add_identity_event(identity, "validation_queued", validation_id=validation.id)
-            reference_paths = [(row.id, Path(row.local_path)) for row in references if row.local_path]
-            candidate_path = Path(media.local_path)
             validation_id = validation.id
             response = {"validation": self._validation_response(validation), "job": job_response(job)}
+        self._submit_validation(user_id, validation_id, raise_on_failure=True)
+        return response
+
+    def resume_interrupted(self, job) -> None:
+        """Submit a validation a restart put back in the queue, from its durable record."""
+
+        with self._uow() as uow:
+            validation = uow.repo.identity_validation_for_job(job.id)
+            validation_id = validation.id if validation and validation.status == "queued" else None
+        if validation_id:
+            self._submit_validation(job.user_id, validation_id, raise_on_failure=False)
+
+    def _validation_work(self, user_id: str, validation_id: str):
+        """What a queued validation needs to run, re-read and re-checked from its rows.
+
+        Consent, the profile and the references are checked again here rather
+        than trusted from when the validation was asked for, because a resumed
+        validation may run long after that.
+        """
+
+        provider_settings = self._provider_settings(user_id)
+        provider = self.providers.get(provider_settings["provider"])
+        with self._uow() as uow:
+            validation = uow.repo.identity_validation_by_id(validation_id)
+            if not validation or validation.status != "queued":
+                raise ConflictError("This identity validation is no longer queued.")
+            if provider_settings["provider"] != validation.provider or not provider:
+                raise ConflictError("The visual identity provider changed before validation could run.")
+            identity = uow.repo.visual_identity_by_id(validation.identity_id)
+            if not identity or identity.consent_status != "granted" or identity.status != "active":
+                raise ConflictError("An active, consented visual identity profile is required.")
+            references = uow.repo.approved_identity_references(user_id, identity.id)
+            media = uow.repo.media(user_id, validation.candidate_media_id)
+            if not media or media.kind != "image":
+                raise NotFoundError("candidate image not found")
+            reference_paths = [(row.id, Path(row.local_path)) for row in references if row.local_path]
+            candidate_path = Path(media.local_path)
+            threshold = validation.threshold
+            job_id = validation.job_id
+            chat_id = media.chat_id
 
         def execute(cancellation: CancellationToken):
             if not candidate_path.is_file():
@@ -609,9 +645,9 @@ class IdentityService:
             reference_id, result = best
             return {
                 "validation_id": validation_id,
-                "status": "passed" if result.similarity >= identity.acceptance_threshold else "failed",
+                "status": "passed" if result.similarity >= threshold else "failed",
                 "score": result.similarity,
-                "threshold": identity.acceptance_threshold,
+                "threshold": threshold,
                 "matched_reference_id": reference_id,
                 "source_face_count": result.source_face_count,
                 "target_face_count": result.target_face_count,
@@ -619,6 +655,9 @@ class IdentityService:
                 "request_id": result.request_id,
             }
 
+        return job_id, chat_id, execute
+
+    def _submit_validation(self, user_id: str, validation_id: str, *, raise_on_failure: bool) -> None:
         def on_start(repo):
             row = repo.identity_validation_by_id(validation_id)
             if row:
@@ -663,12 +702,14 @@ class IdentityService:
                 profile = repo.visual_identity_by_id(row.identity_id)
                 repo.add_identity_event(profile, "validation_cancelled", validation_id=row.id)
 
+        job_id = None
         try:
+            job_id, chat_id, execute = self._validation_work(user_id, validation_id)
             self.jobs.submit(
-                job_id=job.id,
+                job_id=job_id,
                 job_type="identity_validation",
                 user_id=user_id,
-                chat_id=media.chat_id,
+                chat_id=chat_id,
                 turn_id=None,
                 latency_class="media",
                 model_key="identity-verifier",
@@ -681,9 +722,14 @@ class IdentityService:
                 ),
             )
         except Exception:
-            self.jobs.fail_unsubmitted(job.id, "Identity validation could not be queued.", on_failure)
-            raise
-        return response
+            if job_id is None:
+                with self._uow() as uow:
+                    row = uow.repo.identity_validation_by_id(validation_id)
+                    job_id = row.job_id if row else None
+            if job_id:
+                self.jobs.fail_unsubmitted(job_id, "Identity validation could not be queued.", on_failure)
+            if raise_on_failure:
+                raise
 
     def validations(self, user_id: str, persona_id: str, limit: int = 50) -> list[dict]:
         with self._uow() as uow:
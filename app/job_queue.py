@@ -1,9 +1,11 @@
+import heapq
+import itertools
 import threading
 import time
 import uuid
-from collections import Counter
+from collections import Counter, deque
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 
 
 DEFAULT_MAX_WAIT_SECONDS = {
@@ -21,8 +23,8 @@ LATENCY_PRIORITY = {
 JOB_TYPE_LANES = {
     "chat": "interactive",
     "text": "interactive",
-    "memory_extraction": "interactive",
-    "task_model": "interactive",
+    "memory_extraction": "background",
+    "task_model": "background",
     "image": "media",
     "video": "media",
 }
@@ -30,8 +32,22 @@ JOB_TYPE_LANES = {
 DEFAULT_WORKER_COUNTS = {
     "interactive": 1,
     "media": 1,
+    "background": 1,
 }
 
+# Follow-ups nobody is watching. This lane starts a job only while no
+# interactive job is ready to start, and never takes the last slot of a
+# provider pool that has more than one, so it cannot put itself between a user
+# and their reply.
+BACKGROUND_LANE = "background"
+# A pool of one has no spare slot, and follow-ups still have to run somewhere.
+# The background lane borrows the only slot once no other lane has used the
+# pool for this long: after a reply has finished, rather than in the moment
+# somebody is most likely to answer it.
+BACKGROUND_QUIET_SECONDS = 2.0
+# The most workers one lane may be given at runtime.
+MAX_LANE_WORKERS = 16
+
 
 @dataclass
 class JobResult:
@@ -70,6 +86,36 @@ class Job:
         return self.result.value
 
 
+# How long a worker with admission-blocked work waits before asking again on its
+# own. Everything that changes admission wakes the queue; this only covers an
+# admission check that changes its answer without saying so.
+ADMISSION_RECHECK_SECONDS = 2.0
+
+
+class _LaneIndex:
+    """The jobs one lane could start now, ordered every way a worker asks for them.
+
+    A job is here once it is free to run: it has no ordering key, or it is the
+    oldest job of a key nothing is running. Entries are never removed from the
+    middle of a heap. A job that leaves is forgotten in `JobQueue._ready`, and a
+    stale entry is dropped when it reaches the top.
+    """
+
+    def __init__(self):
+        # latency class -> heap of (arrival, sequence, job): the overdue check
+        # and the priority order both only look at each class's oldest job.
+        self.by_class: Dict[str, list] = {}
+        # model key -> heap of (arrival, sequence, job), for model affinity.
+        self.by_model: Dict[str, list] = {}
+        self.ready = 0
+        # Heap entries, live and stale, so the heaps can be rebuilt before stale
+        # ones outnumber the jobs they stand for.
+        self.entries = 0
+        # Refused by the admission check or by a full provider pool; offered
+        # again when the queue is woken or a pool slot frees.
+        self.parked: List[Job] = []
+
+
 class JobQueue:
     def __init__(
         self,
@@ -78,31 +124,48 @@ class JobQueue:
         admission_check: Callable[[Job], bool] | None = None,
         on_selected: Callable[[Job], None] | None = None,
         serialize_resources: Callable[[], bool] | None = None,
+        provider_limits: Optional[Dict[str, int]] = None,
+        background_quiet_seconds: float = BACKGROUND_QUIET_SECONDS,
     ):
         self.max_wait_seconds = {**DEFAULT_MAX_WAIT_SECONDS, **(max_wait_seconds or {})}
         self.worker_counts = self._normalize_worker_counts(worker_counts)
+        # provider pool -> how many of its jobs may run at once, across lanes.
+        self.provider_limits = self._normalize_provider_limits(provider_limits)
         self.admission_check = admission_check or (lambda _job: True)
         self.on_selected = on_selected or (lambda _job: None)
         self.serialize_resources = serialize_resources or (lambda: False)
-        self._pending: List[Job] = []
+        self.background_quiet_seconds = max(0.0, float(background_quiet_seconds))
+        # Every accepted job no worker has taken, in submission order.
+        self._pending: Dict[str, Job] = {}
+        self._lane_by_job: Dict[str, str] = {}
+        self._pending_by_lane: Counter = Counter()
+        self._lanes: Dict[str, _LaneIndex] = {}
+        # job id -> sequence of its live heap entries, for ready jobs only.
+        self._ready: Dict[str, int] = {}
+        self._sequence = itertools.count()
+        # ordering key -> its pending jobs in submission order; only the first runs.
+        self._chains: Dict[str, Deque[Job]] = {}
+        self._groups: Dict[str, Dict[str, Job]] = {}
+        self._coordinated_interactive = 0
         self._lock = threading.Lock()
+        # Idle and shutdown waiters; each lane's workers wait on their own condition.
         self._cv = threading.Condition(self._lock)
+        self._lane_cv = {lane: threading.Condition(self._lock) for lane in self.worker_counts}
         self._stop = False
         self._current_model_key_by_lane: Dict[str, Optional[str]] = {}
         self._active_by_lane: Dict[str, int] = {}
         self._active_ordering_keys: set[str] = set()
+        self._active_by_provider: Counter = Counter()
+        # provider pool -> when a job outside the background lane last left it.
+        self._provider_used_at: Dict[str, float] = {}
         self._workers: List[threading.Thread] = []
+        self._live_workers: Counter = Counter()
+        self._worker_names: Dict[str, Any] = {}
         self._stopped_pending: List[Job] = []
-        for lane, count in self.worker_counts.items():
-            for idx in range(count):
-                worker = threading.Thread(
-                    target=self._run,
-                    args=(lane,),
-                    name=f"job-queue-{lane}-{idx + 1}",
-                    daemon=True,
-                )
-                worker.start()
-                self._workers.append(worker)
+        with self._lock:
+            for lane, count in self.worker_counts.items():
+                for _ in range(count):
+                    self._spawn_locked(lane)
 
     def _normalize_worker_counts(self, worker_counts: Optional[Dict[str, int]]) -> Dict[str, int]:
         normalized = {**DEFAULT_WORKER_COUNTS}
@@ -116,12 +179,68 @@ class JobQueue:
             normalized["interactive"] = 1
         return {lane: count for lane, count in normalized.items() if count > 0}
 
+    @staticmethod
+    def _normalize_provider_limits(provider_limits: Optional[Dict[str, int]]) -> Dict[str, int]:
+        normalized = {}
+        for provider, limit in (provider_limits or {}).items():
+            try:
+                normalized[str(provider)] = max(1, int(limit))
+            except (TypeError, ValueError):
+                continue
+        return normalized
+
+    def _spawn_locked(self, lane: str) -> None:
+        if lane not in self._lane_cv:
+            self._lane_cv[lane] = threading.Condition(self._lock)
+        names = self._worker_names.setdefault(lane, itertools.count(1))
+        worker = threading.Thread(
+            target=self._run,
+            args=(lane,),
+            name=f"job-queue-{lane}-{next(names)}",
+            daemon=True,
+        )
+        self._live_workers[lane] += 1
+        worker.start()
+        self._workers.append(worker)
+
+    def set_worker_counts(self, worker_counts: Dict[str, int]) -> Dict[str, int]:
+        """Grow or shrink lane pools while the queue runs.
+
+        A new worker starts at once. A surplus one finishes the job it holds
+        and then leaves, so nothing running is interrupted. A lane keeps at
+        least one worker, because the work it has accepted would otherwise
+        never start.
+        """
+        with self._cv:
+            if self._stop:
+                raise RuntimeError("job queue stopped")
+            for lane, count in worker_counts.items():
+                target = min(MAX_LANE_WORKERS, max(1, int(count)))
+                self.worker_counts[lane] = target
+                for _ in range(target - self._live_workers[lane]):
+                    self._spawn_locked(lane)
+                # A worker over the target notices when it next looks for work.
+                self._lane_cv[lane].notify_all()
+            return dict(self.worker_counts)
+
+    def set_provider_limits(self, provider_limits: Dict[str, Optional[int]]) -> Dict[str, int]:
+        """Change how many jobs each provider pool may run at once; `None` lifts a limit."""
+        with self._cv:
+            for provider, limit in provider_limits.items():
+                if limit is None:
+                    self.provider_limits.pop(provider, None)
+                else:
+                    self.provider_limits.update(self._normalize_provider_limits({provider: limit}))
+            for lane in list(self._lanes):
+                self._unpark_locked(lane)
+            self._notify_all_locked()
+            return dict(self.provider_limits)
+
     def submit(self, job: Job) -> Job:
         with self._cv:
             if self._stop:
                 raise RuntimeError("job queue stopped")
-            self._pending.append(job)
-            self._cv.notify_all()
+            self._add_locked(job)
         return job
 
     def submit_group(self, jobs: List[Job]) -> List[Job]:
@@ -132,51 +251,59 @@ class JobQueue:
         with self._cv:
             if self._stop:
                 raise RuntimeError("job queue stopped")
-            self._pending.extend(jobs)
-            self._cv.notify_all()
+            for job in jobs:
+                self._add_locked(job)
         return jobs
 
     def wake(self) -> None:
+        """Offer admission-blocked work again: something it was waiting for changed."""
         with self._cv:
-            self._cv.notify_all()
+            for lane in list(self._lanes):
+                self._unpark_locked(lane)
+            self._notify_all_locked()
 
     def queue_position_for_metadata(self, key: str, value: Any) -> Optional[int]:
         with self._lock:
-            target_lane = None
-            for job in self._pending:
-                if job.metadata.get(key) == value:
-                    target_lane = self._lane_for_job(job)
-                    break
-            if target_lane is None:
+            target = next((job for job in self._pending.values() if job.metadata.get(key) == value), None)
+            if target is None:
                 return None
-            lane_jobs = [job for job in self._pending if self._lane_for_job(job) == target_lane]
-            for idx, job in enumerate(lane_jobs):
-                if job.metadata.get(key) == value:
-                    return idx
+            target_lane = self._lane_by_job[target.id]
+            position = 0
+            for job in self._pending.values():
+                if job is target:
+                    return position
+                if self._lane_by_job[job.id] == target_lane:
+                    position += 1
         return None
 
     def cancel_pending_for_metadata(self, key: str, value: Any) -> bool:
         """Remove a queued job before a worker starts it."""
         with self._cv:
-            for job in list(self._pending):
-                if job.metadata.get(key) != value:
-                    continue
-                self._pending.remove(job)
-                job.mark_done(error=RuntimeError("job cancelled"))
-                self._cv.notify_all()
-                return True
-        return False
+            job = next((job for job in self._pending.values() if job.metadata.get(key) == value), None)
+            if job is None:
+                return False
+            self._remove_locked(job)
+            job.mark_done(error=RuntimeError("job cancelled"))
+            self._cv.notify_all()
+            return True
 
     def close_and_detach_pending(self) -> List[Job]:
         """Atomically reject new work and detach jobs no worker has selected."""
         with self._cv:
             self._stop = True
-            pending = list(self._pending)
+            pending = list(self._pending.values())
             self._pending.clear()
+            self._lane_by_job.clear()
+            self._pending_by_lane.clear()
+            self._lanes.clear()
+            self._ready.clear()
+            self._chains.clear()
+            self._groups.clear()
+            self._coordinated_interactive = 0
             self._stopped_pending.extend(pending)
             for job in pending:
                 job.mark_done(error=RuntimeError("job queue stopped"))
-            self._cv.notify_all()
+            self._notify_all_locked()
         return pending
 
     def join_stopped_workers(self, wait=True) -> List[Job]:
@@ -222,12 +349,15 @@ class JobQueue:
 
     def snapshot(self) -> dict:
         with self._lock:
-            pending = Counter(self._lane_for_job(job) for job in self._pending)
             active = dict(self._active_by_lane)
             return {
-                "pending": {lane: int(pending.get(lane, 0)) for lane in sorted(self.worker_counts)},
+                "pending": {lane: int(self._pending_by_lane.get(lane, 0)) for lane in sorted(self.worker_counts)},
                 "active": {lane: int(active.get(lane, 0)) for lane in sorted(self.worker_counts)},
                 "workers": dict(self.worker_counts),
+                "providers": {
+                    provider: {"limit": limit, "active": int(self._active_by_provider.get(provider, 0))}
+                    for provider, limit in sorted(self.provider_limits.items())
+                },
             }
 
     def _lane_for_job(self, job: Job) -> str:
@@ -241,18 +371,29 @@ class JobQueue:
         return "media"
 
     def _run(self, lane: str):
+        cv = self._lane_cv[lane]
         while True:
             with self._cv:
-                while not self._eligible_pending_for_lane_locked(lane) and not self._stop:
-                    self._cv.wait(timeout=0.5)
+                job = None
+                while not self._stop:
+                    if self._live_workers[lane] > self.worker_counts.get(lane, 0):
+                        self._live_workers[lane] -= 1
+                        return
+                    job = self._select_locked(lane)
+                    if job is not None:
+                        break
+                    if not cv.wait(timeout=ADMISSION_RECHECK_SECONDS):
+                        self._unpark_locked(lane)
                 if self._stop:
+                    self._live_workers[lane] -= 1
                     return
-                job = self._pick_next_job_locked(lane)
                 self.on_selected(job)
                 self._active_by_lane[lane] = self._active_by_lane.get(lane, 0) + 1
                 ordering_key = str(job.metadata.get("ordering_key") or "")
-                if ordering_key:
-                    self._active_ordering_keys.add(ordering_key)
+                provider = str(job.metadata.get("provider_pool") or "")
+                # Another worker of this lane can take what is left.
+                if self._lanes[lane].ready:
+                    cv.notify()
             try:
                 value = job.execute()
                 job.mark_done(value=value)
@@ -263,86 +404,236 @@ class JobQueue:
                     self._active_by_lane[lane] = max(0, self._active_by_lane.get(lane, 1) - 1)
                     if ordering_key:
                         self._active_ordering_keys.discard(ordering_key)
+                        chain = self._chains.get(ordering_key)
+                        if chain and not self._stop:
+                            self._release_locked(chain[0])
+                    if provider:
+                        self._active_by_provider[provider] -= 1
+                        if lane != BACKGROUND_LANE:
+                            self._provider_used_at[provider] = time.monotonic()
+                        if provider in self.provider_limits:
+                            # A slot is free: whatever waited for one may start.
+                            for parked_lane in list(self._lanes):
+                                self._unpark_locked(parked_lane)
                     self._cv.notify_all()
 
-    def _pending_for_lane_locked(self, lane: str) -> List[Job]:
-        return [job for job in self._pending if self._lane_for_job(job) == lane]
-
-    def _eligible_pending_for_lane_locked(self, lane: str) -> List[Job]:
-        if lane == "media" and self.serialize_resources():
-            interactive_waiting = any(
-                bool(job.metadata.get("coordinated_resource")) for job in self._pending_for_lane_locked("interactive")
-            )
-            if interactive_waiting:
-                return []
-        eligible = []
-        seen_ordering_keys = set()
-        for job in sorted(self._pending_for_lane_locked(lane), key=lambda item: item.arrival_time):
-            if not self.admission_check(job):
-                continue
-            ordering_key = str(job.metadata.get("ordering_key") or "")
-            if not ordering_key:
-                eligible.append(job)
+    # -- the indexes -------------------------------------------------------
+
+    def _add_locked(self, job: Job) -> None:
+        lane = self._lane_for_job(job)
+        self._pending[job.id] = job
+        self._lane_by_job[job.id] = lane
+        self._pending_by_lane[lane] += 1
+        self._lanes.setdefault(lane, _LaneIndex())
+        if lane != "media" and job.metadata.get("coordinated_resource"):
+            self._coordinated_interactive += 1
+        if job.group_id:
+            self._groups.setdefault(job.group_id, {})[job.id] = job
+        ordering_key = str(job.metadata.get("ordering_key") or "")
+        if ordering_key:
+            chain = self._chains.setdefault(ordering_key, deque())
+            chain.append(job)
+            if len(chain) > 1 or ordering_key in self._active_ordering_keys:
+                return
+        self._release_locked(job)
+
+    def _release_locked(self, job: Job) -> None:
+        """Make a pending job one its lane's workers can select."""
+        if job.id in self._ready or job.id not in self._pending:
+            return
+        lane = self._lane_by_job[job.id]
+        index = self._lanes[lane]
+        sequence = next(self._sequence)
+        self._ready[job.id] = sequence
+        entry = (job.arrival_time, sequence, job)
+        heapq.heappush(index.by_class.setdefault(job.latency_class, []), entry)
+        index.entries += 1
+        if job.model_key:
+            heapq.heappush(index.by_model.setdefault(job.model_key, []), entry)
+            index.entries += 1
+        index.ready += 1
+        if index.entries > 4 * index.ready + 256:
+            self._compact_locked(index)
+        cv = self._lane_cv.get(lane)
+        if cv:
+            cv.notify()
+
+    def _compact_locked(self, index: _LaneIndex) -> None:
+        """Rebuild a lane's heaps from their live entries; amortized over the pushes that staled them."""
+        index.entries = 0
+        for heaps in (index.by_class, index.by_model):
+            for key in list(heaps):
+                live = [entry for entry in heaps[key] if self._ready.get(entry[2].id) == entry[1]]
+                if live:
+                    heapq.heapify(live)
+                    heaps[key] = live
+                    index.entries += len(live)
+                else:
+                    del heaps[key]
+
+    def _unready_locked(self, job: Job) -> None:
+        if self._ready.pop(job.id, None) is not None:
+            lane = self._lane_by_job[job.id]
+            index = self._lanes[lane]
+            index.ready -= 1
+            if lane == "interactive" and not index.ready and BACKGROUND_LANE in self._lane_cv:
+                self._lane_cv[BACKGROUND_LANE].notify()
+
+    def _unpark_locked(self, lane: str) -> None:
+        index = self._lanes.get(lane)
+        if not index or not index.parked:
+            return
+        parked, index.parked = index.parked, []
+        for job in parked:
+            self._release_locked(job)
+
+    def _remove_locked(self, job: Job) -> None:
+        """Forget a job that was selected or cancelled, and free the next of its key."""
+        self._unready_locked(job)
+        self._pending.pop(job.id, None)
+        lane = self._lane_by_job.pop(job.id)
+        self._pending_by_lane[lane] -= 1
+        if lane != "media" and job.metadata.get("coordinated_resource"):
+            self._coordinated_interactive -= 1
+            if not self._coordinated_interactive and "media" in self._lane_cv:
+                self._lane_cv["media"].notify_all()
+        if job.group_id:
+            group = self._groups.get(job.group_id, {})
+            group.pop(job.id, None)
+            if not group:
+                self._groups.pop(job.group_id, None)
+        ordering_key = str(job.metadata.get("ordering_key") or "")
+        chain = self._chains.get(ordering_key) if ordering_key else None
+        if chain is None:
+            return
+        was_first = chain[0] is job
+        if was_first:
+            chain.popleft()
+        else:
+            chain.remove(job)
+        if not chain:
+            self._chains.pop(ordering_key, None)
+        elif was_first and ordering_key not in self._active_ordering_keys:
+            self._release_locked(chain[0])
+
+    def _notify_all_locked(self) -> None:
+        self._cv.notify_all()
+        for cv in self._lane_cv.values():
+            cv.notify_all()
+
+    # -- selecting ---------------------------------------------------------
+
+    def _admitted_head(self, lane: str, index: _LaneIndex, heap: list) -> Optional[tuple]:
+        """The oldest live entry of `heap` its provider pool and the admission check accept.
+
+        Stale entries are dropped, and a refused job is parked, so neither is
+        looked at again until something wakes the queue.
+        """
+        while heap:
+            entry = heap[0]
+            job = entry[2]
+            if self._ready.get(job.id) != entry[1]:
+                heapq.heappop(heap)
+                index.entries -= 1
                 continue
-            if ordering_key in seen_ordering_keys:
-                continue
-            seen_ordering_keys.add(ordering_key)
-            if ordering_key not in self._active_ordering_keys:
-                eligible.append(job)
-        return eligible
-
-    def _pick_next_job_locked(self, lane: str) -> Job:
-        lane_pending = self._eligible_pending_for_lane_locked(lane)
-        queue_depth = len(lane_pending)
+            if self._provider_has_room_locked(lane, job) and self.admission_check(job):
+                return entry
+            heapq.heappop(heap)
+            index.entries -= 1
+            self._unready_locked(job)
+            index.parked.append(job)
+        return None
+
+    def _provider_has_room_locked(self, lane: str, job: Job) -> bool:
+        provider = str(job.metadata.get("provider_pool") or "")
+        limit = self.provider_limits.get(provider) if provider else None
+        if not limit:
+            return True
+        if lane == BACKGROUND_LANE and limit > 1:
+            # The last slot is kept for a turn that has not arrived yet.
+            limit -= 1
+        elif lane == BACKGROUND_LANE:
+            used_at = self._provider_used_at.get(provider)
+            if used_at is not None and time.monotonic() - used_at < self.background_quiet_seconds:
+                # Refused jobs are parked and offered again on the next
+                # recheck, which is after the quiet period has passed.
+                return False
+        return self._active_by_provider[provider] < limit
+
+    def _user_work_ready_locked(self) -> bool:
+        index = self._lanes.get("interactive")
+        return bool(index and index.ready and self.worker_counts.get("interactive"))
+
+    def _select_locked(self, lane: str) -> Optional[Job]:
+        if lane == "media" and self._coordinated_interactive and self.serialize_resources():
+            return None
+        if lane == BACKGROUND_LANE and self._user_work_ready_locked():
+            return None
+        index = self._lanes.get(lane)
+        if not index or not index.ready:
+            return None
+        heads = []
+        for latency_class, heap in index.by_class.items():
+            entry = self._admitted_head(lane, index, heap)
+            if entry is not None:
+                heads.append((latency_class, entry))
+        if not heads:
+            return None
+        queue_depth = index.ready
         now = time.time()
 
-        # Starvation prevention: promote jobs that exceeded max wait.
-        overdue_candidates: List[Job] = []
-        for job in lane_pending:
-            wait_limit = self.max_wait_seconds.get(job.latency_class, self.max_wait_seconds["standard"])
-            if now - job.arrival_time >= wait_limit:
-                overdue_candidates.append(job)
-        if overdue_candidates:
-            selected = min(overdue_candidates, key=lambda j: j.arrival_time)
-            self._pending.remove(selected)
-            return selected
+        # Starvation prevention: promote jobs that exceeded max wait. The oldest
+        # job of each class is its most overdue one.
+        overdue = [
+            entry
+            for latency_class, entry in heads
+            if now - entry[0] >= self.max_wait_seconds.get(latency_class, self.max_wait_seconds["standard"])
+        ]
+        if overdue:
+            return self._take_locked(min(overdue)[2])
 
         # Grouped completion optimization: for text+image groups, schedule slower image first.
         group = self._next_text_image_group(lane)
         if group:
             image_job = next((j for j in group if j.job_type == "image"), None)
             if image_job:
-                self._pending.remove(image_job)
                 self._current_model_key_by_lane[lane] = image_job.model_key
-                return image_job
+                return self._take_locked(image_job)
 
         current_model_key = self._current_model_key_by_lane.get(lane)
-        if queue_depth > 1 and current_model_key:
-            for job in lane_pending:
-                if job.model_key and job.model_key == current_model_key:
-                    self._pending.remove(job)
-                    return job
-
-        selected = min(
-            lane_pending,
-            key=lambda j: (LATENCY_PRIORITY.get(j.latency_class, 1), j.arrival_time),
+        if queue_depth > 1 and current_model_key and current_model_key in index.by_model:
+            entry = self._admitted_head(lane, index, index.by_model[current_model_key])
+            if not index.by_model[current_model_key]:
+                index.by_model.pop(current_model_key, None)
+            if entry is not None:
+                return self._take_locked(entry[2])
+
+        _latency_class, entry = min(
+            heads,
+            key=lambda item: (LATENCY_PRIORITY.get(item[0], 1), item[1][0], item[1][1]),
         )
-        self._pending.remove(selected)
-        self._current_model_key_by_lane[lane] = selected.model_key
-        return selected
+        self._current_model_key_by_lane[lane] = entry[2].model_key
+        return self._take_locked(entry[2])
+
+    def _take_locked(self, job: Job) -> Job:
+        # The key is taken before the job leaves its chain, so the next job of
+        # the key waits for this one instead of being released in its place.
+        ordering_key = str(job.metadata.get("ordering_key") or "")
+        if ordering_key:
+            self._active_ordering_keys.add(ordering_key)
+        provider = str(job.metadata.get("provider_pool") or "")
+        if provider:
+            self._active_by_provider[provider] += 1
+        self._remove_locked(job)
+        return job
 
     def _next_text_image_group(self, lane: str) -> Optional[List[Job]]:
         if lane != "media":
             return None
-        groups: Dict[str, List[Job]] = {}
-        for job in self._pending:
-            if not job.group_id:
-                continue
-            groups.setdefault(job.group_id, []).append(job)
-        for jobs in groups.values():
-            types = {j.job_type for j in jobs}
+        for jobs in self._groups.values():
+            types = {j.job_type for j in jobs.values()}
             if "text" in types and "image" in types:
-                return sorted(jobs, key=lambda j: j.arrival_time)
+                return sorted(jobs.values(), key=lambda j: j.arrival_time)
         return None
 
 
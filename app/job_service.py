@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 import json
 import threading
 import time
 
 from app.auth import redact_sensitive_text
-from app.job_queue import JobQueue, new_job
+from app.job_queue import BACKGROUND_QUIET_SECONDS, JobQueue, new_job
 from app.provider_contracts import CancellationToken, ProviderError
 from app.repositories import UnitOfWork, now_ts
 from app.service_errors import ServiceError
@@ -22,6 +23,21 @@ LEGAL_TRANSITIONS = {
     "cancelled": set(),
 }
 
+# The provider pool local text work counts against: chat turns, and the
+# task-model follow-ups whose default profiles run on the same Ollama.
+OLLAMA_POOL = "ollama"
+
+
+def followup_ordering_key(chat_id: str | None) -> str:
+    """The key a chat's background follow-ups run in order under.
+
+    They stay in order among themselves, but not behind or ahead of the chat's
+    turns. Sharing the chat's own key put the next turn behind a follow-up in
+    a lane that only starts once no turn is waiting, and neither could move.
+    """
+
+    return f"chat-followups:{chat_id}"
+
 
 @dataclass
 class JobExecution:
@@ -33,6 +49,19 @@ class JobExecution:
     after_success: object | None = None
 
 
+@dataclass(frozen=True)
+class InterruptedJob:
+    """A job a restart put back in the queue, as its durable row describes it."""
+
+    id: str
+    kind: str
+    user_id: str
+    chat_id: str | None
+    capability_request_id: str | None
+    source_turn_id: str | None
+    attempts: int
+
+
 class InvalidJobTransition(RuntimeError):
     pass
 
@@ -110,6 +139,13 @@ def turn_response(turn, job_id: str | None = None, accumulated_text: str = "", e
         "summary_id": turn.context_summary_id,
         "degraded_reason": turn.context_degraded_reason,
     }
+    phases = {
+        "context_plan_ms": turn.context_plan_ms,
+        "provider_connect_ms": turn.provider_connect_ms,
+        "first_token_ms": turn.first_token_ms,
+        "streaming_ms": turn.streaming_ms,
+        "commit_ms": turn.commit_ms,
+    }
     return {
         "id": turn.id,
         "chat_id": turn.chat_id,
@@ -128,6 +164,7 @@ def turn_response(turn, job_id: str | None = None, accumulated_text: str = "", e
         "started_at": turn.started_at,
         "completed_at": turn.completed_at,
         "context": context if any(value is not None for value in context.values()) else None,
+        "phases": phases if any(value is not None for value in phases.values()) else None,
     }
 
 
@@ -141,18 +178,26 @@ class JobService:
         worker_counts: dict[str, int],
         resource_coordinator=None,
         metrics=None,
+        provider_limits: dict[str, int] | None = None,
+        background_quiet_seconds: float = BACKGROUND_QUIET_SECONDS,
     ):
         self.session_factory = session_factory
         self.secret_store = secret_store
         self.broker = broker
         self.logger = logger
-        self.worker_counts = worker_counts
+        self.worker_counts = dict(worker_counts)
+        self.provider_limits = dict(provider_limits or {})
+        self.background_quiet_seconds = background_quiet_seconds
         self.resource_coordinator = resource_coordinator
         self.metrics = metrics
         self.queue: JobQueue | None = None
         self._tokens: dict[str, CancellationToken] = {}
         self._done: dict[str, threading.Event] = {}
         self._executions: dict[str, JobExecution] = {}
+        self._resumptions: dict[str, object] = {}
+        # job id -> callbacks to run once when the job may have settled. Waiters
+        # read the row again only when one fires, never on a timer.
+        self._waiters: dict[str, list] = {}
         self._lock = threading.Lock()
         self._lifecycle_cv = threading.Condition()
         self._accepting_submissions = False
@@ -171,6 +216,8 @@ class JobService:
             if self.queue is None:
                 self.queue = JobQueue(
                     worker_counts=self.worker_counts,
+                    provider_limits=self.provider_limits,
+                    background_quiet_seconds=self.background_quiet_seconds,
                     admission_check=(self.resource_coordinator.can_start if self.resource_coordinator else None),
                     on_selected=(self.resource_coordinator.reserve if self.resource_coordinator else None),
                     serialize_resources=(lambda: self.resource_coordinator.enabled)
@@ -289,6 +336,7 @@ class JobService:
                     self._done.pop(job_id, None)
             if done:
                 done.set()
+            self._announce(job_id)
             queue.acknowledge_stopped_pending(queue_job.id)
 
     def submit(
@@ -305,8 +353,10 @@ class JobService:
         estimated_vram_mb: int = 0,
         resource_request=None,
         ordering_key: str | None = None,
+        provider_pool: str | None = None,
+        queue_lane: str | None = None,
     ) -> None:
-        token = CancellationToken()
+        token = CancellationToken(on_progress=lambda progress: self._report_progress(job_id, progress))
         done = threading.Event()
 
         coordinated_resource = job_type in {"chat", "text", "task_model", "memory_extraction"}
@@ -323,6 +373,8 @@ class JobService:
                 "turn_id": turn_id,
                 "ordering_key": ordering_key or (f"chat:{chat_id}" if turn_id and chat_id else ""),
                 "coordinated_resource": coordinated_resource,
+                "provider_pool": provider_pool or "",
+                "queue_lane": queue_lane or "",
             },
             execute=lambda: self._run(queue_job.id, job_id, turn_id, token, execution),
         )
@@ -352,8 +404,70 @@ class JobService:
                     failed_done = self._done.pop(job_id, None)
                 if failed_done:
                     failed_done.set()
+                self._announce(job_id)
                 raise
 
+    def register_resumption(self, kind: str, resume) -> None:
+        """Name the service that can submit an interrupted job of `kind` again.
+
+        `resume` receives an `InterruptedJob` and rebuilds the execution from the
+        rows that job points at, exactly as the original submission would have.
+        """
+
+        self._resumptions[kind] = resume
+
+    def resume_interrupted(self) -> list[str]:
+        """Submit again the work startup left queued, and fail what cannot be.
+
+        Runs once, after `start` and before anything else can submit, so every
+        queued row is one the restart requeued. A job nothing knows how to
+        resume, or whose resumption finds its inputs gone, fails the way every
+        interrupted job used to rather than waiting for a worker forever.
+        """
+
+        with self._uow() as uow:
+            interrupted = [
+                InterruptedJob(
+                    id=row.id,
+                    kind=row.kind,
+                    user_id=row.user_id,
+                    chat_id=row.chat_id,
+                    capability_request_id=row.capability_request_id,
+                    source_turn_id=row.source_turn_id,
+                    attempts=row.attempts or 0,
+                )
+                for row in uow.repo.queued_jobs()
+            ]
+        resumed = []
+        for job in interrupted:
+            resume = self._resumptions.get(job.kind)
+            if resume:
+                try:
+                    resume(job)
+                except Exception as exc:  # noqa: BLE001 - one job's inputs cannot stop the rest resuming
+                    self.logger.warning(
+                        "interrupted job could not resume job_id=%s error=%s",
+                        job.id,
+                        exc.__class__.__name__,
+                    )
+            with self._lock:
+                submitted = job.id in self._done
+            if submitted:
+                resumed.append(job.id)
+            else:
+                self._fail(
+                    job.id,
+                    None,
+                    "interrupted",
+                    "interrupted by server restart",
+                    lambda repo, _code, message, job=job: repo.fail_interrupted_work(
+                        job.id, job.capability_request_id, message
+                    ),
+                )
+        if resumed:
+            self.logger.info("resumed interrupted jobs count=%s", len(resumed))
+        return resumed
+
     def _run(
         self,
         queue_job_id: str,
@@ -412,6 +526,7 @@ class JobService:
                     done = self._done.get(job_id)
                 if done:
                     done.set()
+                self._announce(job_id)
 
     def _begin(self, job_id: str, turn_id: str | None, on_start=None) -> bool:
         with self._uow() as uow:
@@ -419,6 +534,7 @@ class JobService:
             if not job or job.status == "cancelled" or job.cancel_requested:
                 return False
             transition_job(job, "running", progress="Running")
+            job.attempts = (job.attempts or 0) + 1
             if turn_id:
                 turn = uow.repo.turn_by_id(turn_id)
                 if turn:
@@ -446,6 +562,7 @@ class JobService:
                     event = {"id": turn_id, "status": "completed"}
             else:
                 event = None
+        self._announce(job_id)
         if turn_id:
             self.broker.publish(turn_id, "turn.completed", event)
         return True, result
@@ -466,6 +583,7 @@ class JobService:
                     event = turn_response(turn, job_id, self.broker.accumulated_text(turn_id))
             if on_failure:
                 on_failure(uow.repo, code, safe_message)
+        self._announce(job_id)
         if turn_id:
             self.broker.publish(turn_id, "turn.failed", event or {"id": turn_id, "status": "failed"})
 
@@ -489,6 +607,8 @@ class JobService:
                     changed = True
             if on_cancel and changed:
                 on_cancel(uow.repo)
+        if changed:
+            self._announce(job_id)
         if turn_id and changed:
             self.broker.publish(turn_id, "turn.cancelled", event or {"id": turn_id, "status": "cancelled"})
 
@@ -517,6 +637,13 @@ class JobService:
                 job.progress = progress
                 job.updated_at = now_ts()
 
+    def _report_progress(self, job_id: str, progress: str) -> None:
+        with self._uow() as uow:
+            job = uow.repo.job_by_id(job_id)
+            if job and job.status == "running":
+                job.progress = progress
+                job.updated_at = now_ts()
+
     def _admission_reject(self, job_id: str, code: str, message: str, execution: JobExecution) -> None:
         if self.queue:
             self.queue.cancel_pending_for_metadata("async_job_id", job_id)
@@ -527,6 +654,7 @@ class JobService:
             done = self._done.get(job_id)
         if done:
             done.set()
+        self._announce(job_id)
 
     def cancel(self, user_id: str, job_id: str) -> dict | None:
         turn_id = None
@@ -566,6 +694,8 @@ class JobService:
                 self._executions.pop(job_id, None)
         if done:
             done.set()
+        if changed or done:
+            self._announce(job_id)
         if turn_id and changed:
             self.broker.publish(
                 turn_id,
@@ -583,21 +713,109 @@ class JobService:
 
     def operational_snapshot(self) -> dict:
         if not self.queue:
-            return {"pending": {}, "active": {}, "workers": {}}
+            return {"pending": {}, "active": {}, "workers": {}, "providers": {}}
         return self.queue.snapshot()
 
+    def configure_workers(
+        self,
+        worker_counts: dict[str, int] | None = None,
+        provider_limits: dict[str, int | None] | None = None,
+    ) -> dict:
+        """Resize lane pools and provider limits now, and for any later start.
+
+        Nothing is persisted: a restart returns to the configured counts.
+        """
+
+        with self._lifecycle_cv:
+            if worker_counts:
+                self.worker_counts.update({lane: int(count) for lane, count in worker_counts.items()})
+            for provider, limit in (provider_limits or {}).items():
+                if limit is None:
+                    self.provider_limits.pop(provider, None)
+                else:
+                    self.provider_limits[provider] = int(limit)
+            queue = self.queue
+        if queue:
+            if worker_counts:
+                queue.set_worker_counts(worker_counts)
+            if provider_limits:
+                queue.set_provider_limits(provider_limits)
+        return self.operational_snapshot()
+
     def wait(self, user_id: str, job_id: str, timeout: float = 180.0) -> dict | None:
+        """Block until the job settles: its row is terminal and no worker still holds it.
+
+        The row is read once up front and again each time the job announces a
+        change, so a waiter costs no reads while the job runs.
+        """
+
         deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            current = self.get(user_id, job_id)
-            if not current:
-                return current
-            with self._lock:
-                event = self._done.get(job_id)
-            if current["status"] in TERMINAL_STATES and (not event or event.is_set()):
-                return current
-            if event:
-                event.wait(timeout=min(0.25, max(0.0, deadline - time.monotonic())))
-            else:
-                time.sleep(0.05)
-        raise TimeoutError(f"job timed out: {job_id}")
+        while True:
+            changed = threading.Event()
+            self._listen(job_id, changed.set)
+            try:
+                current = self.get(user_id, job_id)
+                if not current or self._settled(job_id, current):
+                    return current
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not changed.wait(remaining):
+                    raise TimeoutError(f"job timed out: {job_id}")
+            finally:
+                self._unlisten(job_id, changed.set)
+
+    async def wait_async(self, user_id: str, job_id: str, timeout: float = 180.0) -> dict | None:
+        """`wait` for an event loop: nothing is held while the job runs, not even a thread."""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            changed = asyncio.Event()
+
+            def wake(changed=changed):
+                try:
+                    loop.call_soon_threadsafe(changed.set)
+                except RuntimeError:
+                    # The loop closed under an abandoned waiter; nobody is left to wake.
+                    pass
+
+            self._listen(job_id, wake)
+            try:
+                current = await asyncio.to_thread(self.get, user_id, job_id)
+                if not current or self._settled(job_id, current):
+                    return current
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"job timed out: {job_id}")
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"job timed out: {job_id}") from None
+            finally:
+                self._unlisten(job_id, wake)
+
+    def _settled(self, job_id: str, current: dict) -> bool:
+        if current["status"] not in TERMINAL_STATES:
+            return False
+        with self._lock:
+            done = self._done.get(job_id)
+        return not done or done.is_set()
+
+    def _listen(self, job_id: str, callback) -> None:
+        with self._lock:
+            self._waiters.setdefault(job_id, []).append(callback)
+
+    def _unlisten(self, job_id: str, callback) -> None:
+        with self._lock:
+            callbacks = self._waiters.get(job_id)
+            if callbacks and callback in callbacks:
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self._waiters[job_id]
+
+    def _announce(self, job_id: str) -> None:
+        """Wake everyone waiting on `job_id`; each reads the row to see what changed."""
+
+        with self._lock:
+            callbacks = self._waiters.pop(job_id, ())
+        for callback in callbacks:
+            callback()
@@ -31,6 +31,9 @@ class OpenAIImageProvider:
 class LocalImageProvider:
     name = "local-image"
 
+    def __init__(self, opener=None):
+        self.opener = opener
+
     def health(self):
         return ProviderHealth(self.name, ProviderStatus.DEGRADED, "Use the selected backend provider check.")
 
@@ -48,6 +51,8 @@ class LocalImageProvider:
                 options.get("base_url"),
                 options.get("local_settings"),
                 cancellation,
+                request.on_progress,
+                opener=self.opener,
             )
         else:
             if operation != "generate":
@@ -59,6 +64,7 @@ class LocalImageProvider:
                 bool(options.get("allow_nsfw")),
                 options.get("base_url"),
                 options.get("local_settings"),
+                opener=self.opener,
             )
         cancellation.raise_if_cancelled()
         return MediaArtifact("image", content, ".png", "image/png")
@@ -10,6 +10,7 @@ import urllib.error
 import urllib.parse
 import urllib.request
 
+from app.comfyui_events import comfyui_events
 from app.media import (
     _coerce_number,
     adjust_prompt_for_local_sd,
@@ -27,6 +28,16 @@ from app.media import (
 from app.identity_images import MAX_REFERENCE_BYTES, read_identity_image_file
 
 
+# How long a submitted ComfyUI prompt may take, queueing included. Cancelling
+# the job ends the wait sooner.
+COMFYUI_COMPLETION_SECONDS = 1800
+# Without the event listener, `/history` is asked after this long, then at
+# intervals that grow to the ceiling; with it, only at the listening interval.
+COMFYUI_FIRST_POLL_SECONDS = 0.25
+COMFYUI_MAX_POLL_SECONDS = 2.0
+COMFYUI_LISTENING_POLL_SECONDS = 5.0
+
+
 def auth_headers(value: str | None) -> dict:
     raw = str(value or "").strip()
     if not raw:
@@ -220,7 +231,7 @@ def openai_video(prompt, size, seconds, api_key, model="sora-2", input_reference
     return content, extension
 
 
-def automatic1111_image(prompt, size, quality, allow_nsfw, base_url, local_settings=None):
+def automatic1111_image(prompt, size, quality, allow_nsfw, base_url, local_settings=None, opener=None):
     settings = local_settings or {}
     width, height = parse_image_size(size, allow_custom=True)
     compiled = settings.get("compiled_prompt")
@@ -254,7 +265,7 @@ def automatic1111_image(prompt, size, quality, allow_nsfw, base_url, local_setti
         headers={"Content-Type": "application/json", **auth_headers(settings.get("api_auth"))},
         method="POST",
     )
-    with urllib.request.urlopen(request, timeout=240) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=240) as response:
         data = json.loads(response.read().decode())
     images = data.get("images") or []
     if not images:
@@ -275,16 +286,50 @@ def _read_provider_response(response, cancellation) -> bytes:
     return content
 
 
-def _cancellable_pause(cancellation, seconds: float) -> None:
-    remaining = seconds
-    while remaining > 0:
-        _cancelled(cancellation)
-        interval = min(0.1, remaining)
-        time.sleep(interval)
-        remaining -= interval
+def _comfyui_history(base_url, settings, prompt_id, cancellation, opener=None) -> dict:
+    request = urllib.request.Request(
+        f"{base_url}/history/{urllib.parse.quote(str(prompt_id))}",
+        headers=auth_headers(settings.get("api_auth")),
+        method="GET",
+    )
+    with (opener or urllib.request.urlopen)(request, timeout=30) as response:
+        return json.loads(_read_provider_response(response, cancellation).decode())
+
 
+def _await_comfyui_history(base_url, settings, prompt_id, events, cancellation, on_progress, opener=None) -> dict:
+    """Wait for the prompt's history entry, woken by its events where the listener has them."""
 
-def _comfyui_upload_identity_references(base_url, settings, cancellation) -> list[str]:
+    if cancellation is not None:
+        cancellation.register(events.wake)
+    deadline = time.monotonic() + COMFYUI_COMPLETION_SECONDS
+    interval = COMFYUI_FIRST_POLL_SECONDS
+    progress = events.progress(prompt_id)
+    reported = (0, 0)
+    ask_at = time.monotonic()
+    while True:
+        _cancelled(cancellation)
+        if on_progress is not None and progress.maximum and (progress.value, progress.maximum) != reported:
+            reported = (progress.value, progress.maximum)
+            on_progress(*reported)
+        if progress.error:
+            raise ValueError(f"ComfyUI could not finish the prompt: {progress.error}")
+        now = time.monotonic()
+        if progress.finished or now >= ask_at:
+            history = _comfyui_history(base_url, settings, prompt_id, cancellation, opener)
+            if history:
+                return history
+            if now >= deadline:
+                raise TimeoutError("ComfyUI did not finish the prompt in time")
+            if events.listening and not progress.finished:
+                interval = COMFYUI_LISTENING_POLL_SECONDS
+            else:
+                # A finished prompt's history can lag its announcement by a moment.
+                interval = min(COMFYUI_MAX_POLL_SECONDS, interval * 1.5)
+            ask_at = time.monotonic() + interval
+        progress = events.wait(prompt_id, progress.sequence, max(0.0, ask_at - time.monotonic()), cancellation)
+
+
+def _comfyui_upload_identity_references(base_url, settings, cancellation, opener=None) -> list[str]:
     """Upload every approved reference photo, in order.
 
     A graph declares how many photos it can take by how many image inputs it
@@ -313,12 +358,13 @@ def _comfyui_upload_identity_references(base_url, settings, cancellation) -> lis
                 digest,
                 settings.get("api_auth"),
                 role="identity_reference",
+                opener=opener,
             )
         )
     return uploaded
 
 
-def _comfyui_upload_bound_image(base_url, settings, cancellation, *, role: str) -> str | None:
+def _comfyui_upload_bound_image(base_url, settings, cancellation, *, role: str, opener=None) -> str | None:
     path_value = settings.get(f"{role}_path")
     bindings = settings.get(f"{role}_bindings")
     if role == "identity_reference" and not bindings:
@@ -337,10 +383,13 @@ def _comfyui_upload_bound_image(base_url, settings, cancellation, *, role: str)
         settings.get(f"{role}_sha256"),
         settings.get("api_auth"),
         role=role,
+        opener=opener,
     )
 
 
-def _comfyui_upload_image(base_url, cancellation, path_value, expected_digest, api_auth, *, role: str) -> str:
+def _comfyui_upload_image(
+    base_url, cancellation, path_value, expected_digest, api_auth, *, role: str, opener=None
+) -> str:
     """Send one image to the provider and return the name it stored it under."""
 
     _cancelled(cancellation)
@@ -379,7 +428,7 @@ def _comfyui_upload_image(base_url, cancellation, path_value, expected_digest, a
         },
         method="POST",
     )
-    with urllib.request.urlopen(request, timeout=120) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=120) as response:
         result = json.loads(_read_provider_response(response, cancellation).decode())
     name = str((result or {}).get("name") or "").strip()
     subfolder = str((result or {}).get("subfolder") or "").replace("\\", "/").strip("/")
@@ -481,7 +530,9 @@ def _comfyui_bound_workflow(workflow_patch, settings, *, prompt, negative, seed,
     return workflow
 
 
-def comfyui_image(prompt, size, quality, allow_nsfw, base_url, local_settings=None, cancellation=None):
+def comfyui_image(
+    prompt, size, quality, allow_nsfw, base_url, local_settings=None, cancellation=None, on_progress=None, opener=None
+):
     settings = local_settings or {}
     width, height = parse_image_size(size, allow_custom=True)
     loras = _normalized_loras(settings.get("loras"))
@@ -517,6 +568,8 @@ def comfyui_image(prompt, size, quality, allow_nsfw, base_url, local_settings=No
             settings,
             base_url,
             cancellation,
+            on_progress,
+            opener,
         )
     workflow = {
         "3": {
@@ -568,16 +621,19 @@ def comfyui_image(prompt, size, quality, allow_nsfw, base_url, local_settings=No
     workflow["6"]["inputs"]["clip"] = clip_ref
     workflow["7"]["inputs"]["clip"] = clip_ref
     workflow.update(workflow_patch)
-    return _run_comfyui_workflow(workflow, settings, base_url, cancellation)
+    return _run_comfyui_workflow(workflow, settings, base_url, cancellation, on_progress, opener)
 
 
-def _run_comfyui_workflow(workflow: dict, settings: dict, base_url, cancellation):
-    """Upload declared images, submit the graph, and return the produced bytes."""
+def _run_comfyui_workflow(workflow: dict, settings: dict, base_url, cancellation, on_progress=None, opener=None):
+    """Upload declared images, submit the graph, and return the produced bytes.
+
+    `on_progress(value, maximum)` hears each sampling step ComfyUI announces.
+    """
 
     base_url = str(base_url).rstrip("/")
     identity_bindings = settings.get("identity_reference_bindings") or settings.get("identity_image_bindings") or []
     if identity_bindings:
-        names = _comfyui_upload_identity_references(base_url, settings, cancellation)
+        names = _comfyui_upload_identity_references(base_url, settings, cancellation, opener)
         if names:
             # Each slot gets its own photo where there is one, and repeats from
             # the start where there are fewer photos than slots. A duplicate is
@@ -586,35 +642,25 @@ def _run_comfyui_workflow(workflow: dict, settings: dict, base_url, cancellation
             for index, binding in enumerate(identity_bindings):
                 _inject_comfyui_bound_image(workflow, [binding], names[index % len(names)], role="identity_reference")
     for role in ("source_image", "mask_image"):
-        uploaded = _comfyui_upload_bound_image(base_url, settings, cancellation, role=role)
+        uploaded = _comfyui_upload_bound_image(base_url, settings, cancellation, role=role, opener=opener)
         if uploaded:
             _inject_comfyui_bound_image(workflow, settings.get(f"{role}_bindings"), uploaded, role=role)
     _cancelled(cancellation)
+    events = comfyui_events(base_url, auth_headers(settings.get("api_auth")))
     request = urllib.request.Request(
         f"{base_url}/prompt",
-        data=json.dumps({"prompt": workflow, "client_id": f"nice-assistant-{secrets.token_hex(8)}"}).encode(),
+        data=json.dumps({"prompt": workflow, "client_id": events.client_id}).encode(),
         headers={"Content-Type": "application/json", **auth_headers(settings.get("api_auth"))},
         method="POST",
     )
-    with urllib.request.urlopen(request, timeout=120) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=120) as response:
         prompt_id = (json.loads(_read_provider_response(response, cancellation).decode()) or {}).get("prompt_id")
     if not prompt_id:
         raise ValueError("ComfyUI did not return a prompt_id")
-    history = None
-    for _ in range(120):
-        _cancelled(cancellation)
-        request = urllib.request.Request(
-            f"{base_url}/history/{urllib.parse.quote(str(prompt_id))}",
-            headers=auth_headers(settings.get("api_auth")),
-            method="GET",
-        )
-        with urllib.request.urlopen(request, timeout=30) as response:
-            history = json.loads(_read_provider_response(response, cancellation).decode())
-        if history:
-            break
-        _cancellable_pause(cancellation, 1)
-    if not history:
-        raise TimeoutError("ComfyUI history polling timed out")
+    try:
+        history = _await_comfyui_history(base_url, settings, prompt_id, events, cancellation, on_progress, opener)
+    finally:
+        events.forget(prompt_id)
     outputs = (history.get(str(prompt_id)) or {}).get("outputs") or {}
     image = next((item for output in outputs.values() for item in (output.get("images") or [])), None)
     if not image:
@@ -631,5 +677,5 @@ def _run_comfyui_workflow(workflow: dict, settings: dict, base_url, cancellation
         headers=auth_headers(settings.get("api_auth")),
         method="GET",
     )
-    with urllib.request.urlopen(request, timeout=120) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=120) as response:
         return _read_provider_response(response, cancellation)
@@ -589,7 +589,15 @@ class MediaService:
             started = time.monotonic()
             outcome = "failed"
             try:
-                artifact = provider.generate(MediaRequest("image", prompt, options), cancellation)
+                artifact = provider.generate(
+                    MediaRequest(
+                        "image",
+                        prompt,
+                        options,
+                        on_progress=self._provider_progress(selected, cancellation, recorder),
+                    ),
+                    cancellation,
+                )
                 outcome = "completed"
                 recorder.record(
                     "provider_response",
@@ -623,6 +631,38 @@ class MediaService:
                 request_id=request_id or None,
             ) from exc
 
+    def _provider_progress(self, selected, cancellation, recorder):
+        """Relay a provider's step reports to the job and the journal without flooding either.
+
+        The job's progress is rewritten at most once a second, and the journal
+        gains a stage each quarter of the way through a sampler, since a graph
+        may run several samplers one after another.
+        """
+
+        state = {"reported_at": None, "value": 0, "quarter": -1}
+
+        def report(value: int, maximum: int) -> None:
+            now = time.monotonic()
+            if value < state["value"]:
+                state["quarter"] = -1
+            state["value"] = value
+            if value >= maximum or state["reported_at"] is None or now - state["reported_at"] >= 1:
+                state["reported_at"] = now
+                try:
+                    cancellation.report_progress(f"Rendering step {value} of {maximum}")
+                except Exception:
+                    self.logger.warning("image job progress could not be recorded")
+            quarter = min(4, value * 4 // max(1, maximum))
+            if quarter > state["quarter"]:
+                state["quarter"] = quarter
+                recorder.record(
+                    "provider_progress",
+                    summary=f"{selected} at step {value} of {maximum}",
+                    detail={"value": value, "maximum": maximum},
+                )
+
+        return report
+
     def _persist_image(self, user_id, chat_id, generation_plan_id, artifact, cancellation, recorder=None):
         filename = f"{user_id}_{secrets.token_hex(8)}{artifact.extension}"
         target = self.config.image_dir / filename
@@ -2,18 +2,32 @@ from __future__ import annotations
 
 import json
 import re
+import time
 import unicodedata
 
 from sqlalchemy.exc import IntegrityError
 
 from app.auth import redact_sensitive_text
-from app.job_service import JobExecution, JobService
+from app.bounded_cache import BoundedCache
+from app.job_service import OLLAMA_POOL, JobExecution, JobService, followup_ordering_key
 from app.provider_contracts import ProviderError
-from app.embedding import EmbeddingUnavailable, ollama_embed
+from app.embedding import EMBED_BATCH_SIZE, EmbeddingUnavailable, ollama_embed, ollama_embed_batch, unpack
 
 # A local model that cannot answer this fast is not going to improve the turn,
 # and keyword recall is already waiting.
 QUESTION_EMBED_TIMEOUT_SECONDS = 2.0
+# Recently asked questions, by model and normalised text. A retry, a
+# regeneration and a summary pass all ask about the same words within moments,
+# and each one was a model round trip in front of the first token.
+QUESTION_VECTOR_CACHE_SIZE = 256
+QUESTION_VECTOR_CACHE_SECONDS = 600
+# Filing an existing vector in the index is a few comparisons and no model
+# call, so a pass can afford far more of it than of embedding.
+VECTOR_FILING_BATCH = 500
+# How long one background pass may spend embedding before handing the thread
+# back. The runner comes straight back while a backlog remains, so this bounds
+# how long anything else on that thread waits, not how fast the backlog clears.
+EMBEDDING_PASS_SECONDS = 20.0
 
 from app.repositories import UnitOfWork, now_ts
 from app.service_errors import ConflictError, NotFoundError, RequestError
@@ -119,14 +133,20 @@ class MemoryService:
         candidate_min_confidence: float = 0.6,
         embedding_model: str = "",
         embedding_base_url: str = "",
+        metrics=None,
+        opener=None,
     ):
         self.embedding_model = str(embedding_model or "").strip()
         self.embedding_base_url = str(embedding_base_url or "").strip()
+        self.opener = opener
         # The reply path never goes looking for the embedding model. It asks
         # only once a background pass has actually reached it, so a deployment
         # that never pulled one pays nothing at all rather than a failed
         # connection per turn - or, worse, a timeout per turn.
         self._embedding_ready = False
+        self.last_embedding_pass: dict | None = None
+        self._question_vectors = BoundedCache(QUESTION_VECTOR_CACHE_SIZE, QUESTION_VECTOR_CACHE_SECONDS)
+        self.metrics = metrics
         self.session_factory = session_factory
         self.secret_store = secret_store
         self.task_models = task_models
@@ -156,13 +176,30 @@ class MemoryService:
         turn. And a failure stops it being asked again for a while, so a
         deployment without the model pays one failed connection rather than one
         per turn forever.
+
+        A question asked again - a retry, a regeneration - is answered from a
+        small cache keyed by model and normalised text, so it costs no round
+        trip at all. Only vectors are cached; a failure is not, because the
+        pause above already covers that.
         """
 
         if not self._embedding_ready or not str(text or "").strip():
             return None
+        key = (self.embedding_model, normalize_memory_content(text))
+        cached = self._question_vectors.get(key)
+        if self.metrics:
+            self.metrics.cache("question_vector", cached is not None)
+        if cached is not None:
+            return cached
         try:
-            return ollama_embed(
-                self.embedding_base_url, self.embedding_model, str(text), timeout=QUESTION_EMBED_TIMEOUT_SECONDS
+            vector = tuple(
+                ollama_embed(
+                    self.embedding_base_url,
+                    self.embedding_model,
+                    str(text),
+                    timeout=QUESTION_EMBED_TIMEOUT_SECONDS,
+                    opener=self.opener,
+                )
             )
         except EmbeddingUnavailable as exc:
             # It was there and now is not. Stop asking until a background pass
@@ -170,35 +207,111 @@ class MemoryService:
             self._embedding_ready = False
             self.logger.info("semantic memory recall paused error=%s", exc)
             return None
+        self._question_vectors.put(key, vector)
+        return vector
 
-    def embed_pending(self, limit: int = 25) -> dict:
+    def embed_pending(
+        self,
+        *,
+        batch_size: int = EMBED_BATCH_SIZE,
+        time_budget_seconds: float = EMBEDDING_PASS_SECONDS,
+    ) -> dict:
         """Give vectors to memories that have none, or whose text has moved on.
 
         Runs in the background rather than when a memory is written: a person
         approving a fact should not wait for a model, and a model that is down
-        should not stop them approving it. Returns what happened so a quiet pass
-        can be told apart from a broken one.
+        should not stop them approving it.
+
+        Works through the backlog a batch at a time until it is empty or the
+        pass has used its time. Each batch is read, sent to the model and
+        written in its own short transaction, so nothing holds the database
+        while the model works, and a pass that stops - a restart, a model that
+        went away - loses at most the batch in flight. There is no cursor to
+        keep: what still needs a vector is the cursor.
+
+        Returns what happened, including throughput and what is left, so a
+        quiet pass can be told apart from a broken one.
         """
 
         if not self.semantic_recall_configured:
             return {"embedded": 0, "pending": 0, "reason": "no embedding model configured"}
+        started = time.monotonic()
+        batch_size = max(1, int(batch_size))
         embedded = 0
+        batches = 0
+        reason = ""
         with self._uow() as uow:
-            pending = uow.repo.memories_needing_embedding(self.embedding_model, limit)
-            for row in pending:
-                try:
-                    vector = ollama_embed(self.embedding_base_url, self.embedding_model, row.content)
-                except EmbeddingUnavailable as exc:
-                    # The model is unreachable, so the rest of this pass would
-                    # fail the same way. Leave them for the next one.
-                    self._embedding_ready = False
-                    self.logger.info("memory embedding paused error=%s", exc)
-                    return {"embedded": embedded, "pending": len(pending) - embedded, "reason": str(exc)}
-                uow.repo.save_memory_embedding(row, vector, self.embedding_model)
-                embedded += 1
-                # Reached on this pass, so questions may use it now.
-                self._embedding_ready = True
-        return {"embedded": embedded, "pending": max(0, len(pending) - embedded), "reason": ""}
+            # Vectors stored before the index existed are filed here, and cells
+            # left behind by a previous model are dropped. Neither needs the
+            # model, so both happen even on a pass that cannot reach it.
+            uow.repo.prune_vector_cells(self.embedding_model)
+            for row in uow.repo.memories_needing_filing(self.embedding_model, VECTOR_FILING_BATCH):
+                uow.repo.file_memory_vector(row, unpack(row.embedding))
+        while time.monotonic() - started < time_budget_seconds:
+            with self._uow() as uow:
+                batch = [
+                    (row.user_id, row.id, row.content)
+                    for row in uow.repo.memories_needing_embedding(self.embedding_model, batch_size)
+                ]
+            if not batch:
+                break
+            try:
+                vectors = ollama_embed_batch(
+                    self.embedding_base_url,
+                    self.embedding_model,
+                    [content for _user_id, _memory_id, content in batch],
+                    opener=self.opener,
+                )
+            except EmbeddingUnavailable as exc:
+                # The model is unreachable, so the rest of this pass would
+                # fail the same way. Leave them for the next one.
+                self._embedding_ready = False
+                self.logger.info("memory embedding paused error=%s", exc)
+                reason = str(exc)
+                break
+            with self._uow() as uow:
+                for (user_id, memory_id, _content), vector in zip(batch, vectors):
+                    row = uow.repo.memory(user_id, memory_id)
+                    # Deleted while the model was working; nothing to store.
+                    if row:
+                        uow.repo.save_memory_embedding(row, vector, self.embedding_model)
+            embedded += len(batch)
+            batches += 1
+            # Reached on this pass, so questions may use it now.
+            self._embedding_ready = True
+            if len(batch) < batch_size:
+                break
+        with self._uow() as uow:
+            pending = uow.repo.count_memories_needing_embedding(self.embedding_model)
+        seconds = max(0.0, time.monotonic() - started)
+        report = {
+            "embedded": embedded,
+            "pending": pending,
+            "reason": reason,
+            "batches": batches,
+            "seconds": round(seconds, 3),
+            "per_second": round(embedded / seconds, 1) if embedded and seconds else 0.0,
+            "finished_at": now_ts(),
+        }
+        self.last_embedding_pass = report
+        if embedded:
+            self.logger.info(
+                "memory embedding pass embedded=%s pending=%s per_second=%s",
+                embedded,
+                pending,
+                report["per_second"],
+            )
+        return report
+
+    def embedding_status(self) -> dict:
+        """What the background backfill last did, for the operator view."""
+
+        return {
+            "model": self.embedding_model or None,
+            "configured": self.semantic_recall_configured,
+            "ready": self._embedding_ready,
+            "last_pass": dict(self.last_embedding_pass) if self.last_embedding_pass else None,
+        }
 
     def prune_discarded(self, retention_days: int) -> int:
         """Permanently remove rejected and forgotten memories older than the window.
@@ -549,13 +662,14 @@ class MemoryService:
                 "events": [memory_event_response(event) for event in uow.repo.memory_events(user_id, memory_id)],
             }
 
-    def prepare_extraction_job(self, repo, *, user_id: str, chat_id: str) -> str:
+    def prepare_extraction_job(self, repo, *, user_id: str, chat_id: str, turn_id: str | None = None) -> str:
         return repo.add_job(
             user_id=user_id,
             chat_id=chat_id,
             turn_id=None,
             kind="memory_extraction",
             progress="Queued for memory review",
+            source_turn_id=turn_id,
         ).id
 
     def submit_extraction(
@@ -674,7 +788,8 @@ class MemoryService:
                 turn_id=None,
                 latency_class="standard",
                 model_key=f"task:{MEMORY_EXTRACTION}",
-                ordering_key=f"chat:{chat_id}",
+                ordering_key=followup_ordering_key(chat_id),
+                provider_pool=OLLAMA_POOL,
                 execution=JobExecution(execute=execute, on_success=on_success),
             )
         except Exception:
@@ -115,6 +115,7 @@ class Chat(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("idx_messages_chat_created", "chat_id", "created_at", "id"),)
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     chat_id: Mapped[str] = mapped_column(ForeignKey("chats.id", ondelete="CASCADE"), nullable=False)
     role: Mapped[str] = mapped_column(Text, nullable=False)
@@ -161,6 +162,15 @@ class ConversationTurn(Base):
     included_memory_count: Mapped[int | None] = mapped_column(Integer)
     omitted_memory_count: Mapped[int | None] = mapped_column(Integer)
     context_degraded_reason: Mapped[str | None] = mapped_column(Text)
+    # The turn's timeline in milliseconds. First token counts from the request
+    # to the provider, so it includes connecting; streaming runs from there to
+    # the last chunk, and commit from storing the reply to its transaction
+    # having been written.
+    context_plan_ms: Mapped[int | None] = mapped_column(Integer)
+    provider_connect_ms: Mapped[int | None] = mapped_column(Integer)
+    first_token_ms: Mapped[int | None] = mapped_column(Integer)
+    streaming_ms: Mapped[int | None] = mapped_column(Integer)
+    commit_ms: Mapped[int | None] = mapped_column(Integer)
 
 
 class ConversationSummary(Base):
@@ -187,6 +197,28 @@ class ConversationSummary(Base):
     created_at: Mapped[int] = mapped_column(Integer, nullable=False)
 
 
+class MemoryVectorCell(Base):
+    """One cell of an owner's memory vector index.
+
+    `total` is the sum of every vector filed here and not since taken out,
+    stored like a vector; `centre` is that total at unit length, kept beside it
+    so a question can score every centre in one batch. Membership lives on the
+    memory row, so a memory that is forgotten leaves the index by the same
+    write that changes it, and the status filter at query time does the rest.
+    A deleted or re-embedded memory is taken out of the total and the count.
+    """
+
+    __tablename__ = "memory_vector_cells"
+    __table_args__ = (Index("idx_memory_vector_cells_owner_model", "user_id", "model"),)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    total: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    centre: Mapped[bytes | None] = mapped_column(LargeBinary)
+    member_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
 class Memory(Base):
     __tablename__ = "memories"
     __table_args__ = (
@@ -206,6 +238,7 @@ class Memory(Base):
         Index("idx_memories_user_status_updated", "user_id", "status", "updated_at"),
         Index("idx_memories_user_scope_status", "user_id", "tier", "tier_ref_id", "status"),
         Index("idx_memories_source_turn", "source_turn_id"),
+        Index("idx_memories_embedding_cell", "user_id", "embedding_cell"),
     )
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -229,6 +262,9 @@ class Memory(Base):
     embedding: Mapped[bytes | None] = mapped_column(LargeBinary)
     embedding_model: Mapped[str | None] = mapped_column(Text)
     embedding_updated_at: Mapped[int | None] = mapped_column(Integer)
+    # Which index cell the vector is filed in. Null until the background pass
+    # files it; an unfiled vector is still compared, directly.
+    embedding_cell: Mapped[int | None] = mapped_column(ForeignKey("memory_vector_cells.id", ondelete="SET NULL"))
     created_at: Mapped[int] = mapped_column(Integer, nullable=False)
     updated_at: Mapped[int] = mapped_column(Integer, nullable=False)
     reviewed_at: Mapped[int | None] = mapped_column(Integer)
@@ -1125,6 +1161,7 @@ class AsyncJob(Base):
         Index("idx_async_jobs_user_status", "user_id", "status", "created_at"),
         Index("idx_async_jobs_turn", "turn_id"),
         Index("idx_async_jobs_capability_request", "capability_request_id"),
+        Index("idx_async_jobs_status", "status", "created_at"),
     )
     id: Mapped[str] = mapped_column(Text, primary_key=True)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -1143,3 +1180,7 @@ class AsyncJob(Base):
     progress: Mapped[str | None] = mapped_column(Text)
     result_json: Mapped[str | None] = mapped_column(Text)
     error: Mapped[str | None] = mapped_column(Text)
+    # How many times the job has started. Startup resumes only work under the cap.
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # The turn a follow-up belongs to; `turn_id` is the reply's own job.
+    source_turn_id: Mapped[str | None] = mapped_column(ForeignKey("conversation_turns.id", ondelete="SET NULL"))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from collections import Counter
 from contextvars import ContextVar
 from datetime import datetime, timezone
@@ -35,65 +36,259 @@ class RedactedJsonFormatter(logging.Formatter):
         return json.dumps(payload, separators=(",", ":"), ensure_ascii=True)
 
 
+# Upper bounds of the latency buckets, in milliseconds. Roughly three per
+# decade, from a cached read to a long image render; anything slower lands in
+# the last, unbounded bucket.
+LATENCY_BUCKETS_MS = (
+    1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000, 300000, 600000,
+)  # fmt: skip
+_BUCKETS = len(LATENCY_BUCKETS_MS) + 1
+# After the bucket counts: how many, their sum, and the largest.
+_COUNT, _SUM, _MAX = _BUCKETS, _BUCKETS + 1, _BUCKETS + 2
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+
+
+class _ThreadShards:
+    """Counters each thread writes without a lock, added together when read.
+
+    Recording is on the path of every request, job and provider call, so it
+    touches only the calling thread's own dictionary. Reading copies every
+    thread's dictionary and adds them up. A thread that has ended has its
+    dictionary folded into one total, so short-lived threads do not pile up.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        # What threads that have since ended had written.
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._retire_locked()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def merged(self) -> tuple[Counter, dict[tuple, list[int]]]:
+        with self._lock:
+            self._retire_locked()
+            shards = [self._retired, *(dict(shard) for _thread, shard in self._shards)]
+        return _add_shards(shards)
+
+    def _retire_locked(self) -> None:
+        ended = [shard for thread, shard in self._shards if not thread.is_alive()]
+        if ended:
+            counts, histograms = _add_shards([self._retired, *ended])
+            self._retired = {**counts, **histograms}
+            self._shards = [(thread, shard) for thread, shard in self._shards if thread.is_alive()]
+
+
+def _add_shards(shards) -> tuple[Counter, dict[tuple, list[int]]]:
+    counts: Counter = Counter()
+    histograms: dict[tuple, list[int]] = {}
+    for shard in shards:
+        for key, value in shard.items():
+            if isinstance(value, list):
+                _add_histogram(histograms.setdefault(key, [0] * (_MAX + 1)), value)
+            else:
+                counts[key] += value
+    return counts, histograms
+
+
 class MetricsRegistry:
     def __init__(self, clock=time.monotonic):
         self.clock = clock
         self.started_at = int(time.time())
         self.started_monotonic = clock()
-        self._request_counts = Counter()
-        self._request_latency_ms = Counter()
-        self._job_counts = Counter()
-        self._job_latency_ms = Counter()
-        self._provider_counts = Counter()
-        self._provider_latency_ms = Counter()
-        self._lock = threading.Lock()
+        self._shards = _ThreadShards()
 
-    def request(self, method: str, status: int, latency_ms: int) -> None:
-        key = f"{method.upper()}:{int(status)}"
-        with self._lock:
-            self._request_counts[key] += 1
-            self._request_latency_ms["count"] += 1
-            self._request_latency_ms["sum"] += max(0, int(latency_ms))
-            self._request_latency_ms["max"] = max(self._request_latency_ms["max"], int(latency_ms))
+    def request(self, method: str, status: int, latency_ms: int, route: str = "") -> None:
+        """Count a request by status and time it by its route template, never by its raw path."""
+
+        method = method.upper()
+        self._count(("requests", f"{method}:{int(status)}"))
+        self._observe(("requests", method, route or "unmatched"), latency_ms)
 
     def job(self, kind: str, status: str, latency_ms: int) -> None:
-        key = f"{str(kind or 'unknown')}:{status}"
-        with self._lock:
-            self._job_counts[key] += 1
-            self._job_latency_ms["count"] += 1
-            self._job_latency_ms["sum"] += max(0, int(latency_ms))
-            self._job_latency_ms["max"] = max(self._job_latency_ms["max"], int(latency_ms))
+        kind = str(kind or "unknown")
+        self._count(("jobs", f"{kind}:{status}"))
+        self._observe(("jobs", kind), latency_ms)
 
     def provider(self, provider: str, operation: str, status: str, latency_ms: int) -> None:
-        key = f"{provider}:{operation}:{status}"
-        with self._lock:
-            self._provider_counts[key] += 1
-            self._provider_latency_ms["count"] += 1
-            self._provider_latency_ms["sum"] += max(0, int(latency_ms))
-            self._provider_latency_ms["max"] = max(self._provider_latency_ms["max"], int(latency_ms))
+        self._count(("providers", f"{provider}:{operation}:{status}"))
+        self._observe(("providers", provider, operation), latency_ms)
+
+    def turn_phase(self, phase: str, latency_ms: int) -> None:
+        self._observe(("turns", phase), latency_ms)
+
+    def cache(self, name: str, hit: bool) -> None:
+        self._count(("caches", f"{name}:{'hit' if hit else 'miss'}"))
+
+    def _count(self, key: tuple) -> None:
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0) + 1
+
+    def _observe(self, key: tuple, latency_ms) -> None:
+        value = max(0, int(latency_ms))
+        shard = self._shards.mine()
+        histogram = shard.get(key)
+        if histogram is None:
+            histogram = shard[key] = [0] * (_MAX + 1)
+        histogram[bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+        histogram[_COUNT] += 1
+        histogram[_SUM] += value
+        if value > histogram[_MAX]:
+            histogram[_MAX] = value
 
     def snapshot(self) -> dict:
-        with self._lock:
-            requests = dict(sorted(self._request_counts.items()))
-            request_latency = dict(self._request_latency_ms)
-            jobs = dict(sorted(self._job_counts.items()))
-            job_latency = dict(self._job_latency_ms)
-            providers = dict(sorted(self._provider_counts.items()))
-            provider_latency = dict(self._provider_latency_ms)
-        return {
+        counts, histograms = self._shards.merged()
+        response = {
             "started_at": self.started_at,
             "uptime_seconds": max(0, int(self.clock() - self.started_monotonic)),
-            "requests": {"counts": requests, "latency_ms": _latency_response(request_latency)},
-            "jobs": {"counts": jobs, "latency_ms": _latency_response(job_latency)},
-            "providers": {"counts": providers, "latency_ms": _latency_response(provider_latency)},
         }
+        for family in ("requests", "jobs", "providers"):
+            by_key = {key[1:]: histogram for key, histogram in histograms.items() if key[0] == family}
+            response[family] = {
+                "counts": _family_counts(counts, family),
+                "latency_ms": _latency_response(_combined(by_key.values())),
+                "by_key": {" ".join(key): _latency_response(by_key[key]) for key in sorted(by_key)},
+            }
+        response["turn_phases"] = {
+            key[1]: _latency_response(histograms[key]) for key in sorted(histograms) if key[0] == "turns"
+        }
+        response["caches"] = _cache_response(_family_counts(counts, "caches"))
+        return response
+
+    def prometheus(self) -> str:
+        """Everything in `snapshot`, in Prometheus's text exposition format."""
+
+        counts, histograms = self._shards.merged()
+        lines = [
+            "# HELP nice_assistant_uptime_seconds Seconds since the process started.",
+            "# TYPE nice_assistant_uptime_seconds gauge",
+            f"nice_assistant_uptime_seconds {max(0, int(self.clock() - self.started_monotonic))}",
+        ]
+        for family, name, labels, description in _PROMETHEUS_COUNTERS:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for key, value in sorted(_family_counts(counts, family).items()):
+                lines.append(f"{name}{_labels(zip(labels, key.rsplit(':', len(labels) - 1)))} {value}")
+        for family, name, labels, description in _PROMETHEUS_HISTOGRAMS:
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for key in sorted(key for key in histograms if key[0] == family):
+                histogram = histograms[key]
+                pairs = list(zip(labels, key[1:]))
+                cumulative = 0
+                for index, bound in enumerate((*LATENCY_BUCKETS_MS, None)):
+                    cumulative += histogram[index]
+                    le = "+Inf" if bound is None else _seconds(bound)
+                    lines.append(f"{name}_bucket{_labels([*pairs, ('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_seconds(histogram[_SUM])}")
+                lines.append(f"{name}_count{_labels(pairs)} {histogram[_COUNT]}")
+        return "\n".join(lines) + "\n"
+
+
+_PROMETHEUS_COUNTERS = (
+    ("requests", "nice_assistant_http_requests_total", ("method", "status"), "HTTP requests by status."),
+    ("jobs", "nice_assistant_jobs_total", ("kind", "status"), "Finished jobs by outcome."),
+    (
+        "providers",
+        "nice_assistant_provider_calls_total",
+        ("provider", "operation", "status"),
+        "Provider calls by outcome.",
+    ),
+    ("caches", "nice_assistant_cache_lookups_total", ("cache", "result"), "Cache lookups by result."),
+)
+_PROMETHEUS_HISTOGRAMS = (
+    (
+        "requests",
+        "nice_assistant_http_request_duration_seconds",
+        ("method", "route"),
+        "HTTP request latency by route template.",
+    ),
+    ("jobs", "nice_assistant_job_duration_seconds", ("kind",), "Job latency by kind."),
+    ("turns", "nice_assistant_turn_phase_duration_seconds", ("phase",), "Time spent in each phase of a turn."),
+    (
+        "providers",
+        "nice_assistant_provider_duration_seconds",
+        ("provider", "operation"),
+        "Provider call latency by operation.",
+    ),
+)
+
+
+def _family_counts(counts: Counter, family: str) -> dict:
+    return dict(sorted((key[1], value) for key, value in counts.items() if key[0] == family))
+
+
+def _add_histogram(total: list[int], histogram: list[int]) -> None:
+    for index in range(_MAX):
+        total[index] += histogram[index]
+    total[_MAX] = max(total[_MAX], histogram[_MAX])
+
+
+def _combined(histograms) -> list[int]:
+    total = [0] * (_MAX + 1)
+    for histogram in histograms:
+        _add_histogram(total, histogram)
+    return total
+
+
+def _quantile(histogram: list[int], quantile: float) -> float | None:
+    """Estimate a quantile by interpolating inside the bucket that holds it."""
+
+    count = histogram[_COUNT]
+    if not count:
+        return None
+    rank = quantile * count
+    seen = 0
+    for index in range(_BUCKETS):
+        in_bucket = histogram[index]
+        if in_bucket and seen + in_bucket >= rank:
+            lower = LATENCY_BUCKETS_MS[index - 1] if index else 0
+            upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else histogram[_MAX]
+            estimate = lower + (upper - lower) * (rank - seen) / in_bucket
+            return round(min(estimate, histogram[_MAX]), 2)
+        seen += in_bucket
+    return float(histogram[_MAX])
+
+
+def _seconds(milliseconds: int) -> str:
+    return format(milliseconds / 1000, "g")
+
+
+def _labels(pairs) -> str:
+    rendered = []
+    for name, value in pairs:
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        rendered.append(f'{name}="{escaped}"')
+    return "{" + ",".join(rendered) + "}" if rendered else ""
+
+
+def _cache_response(values: dict) -> dict:
+    names = sorted({key.rsplit(":", 1)[0] for key in values})
+    response = {}
+    for name in names:
+        hits = int(values.get(f"{name}:hit", 0))
+        misses = int(values.get(f"{name}:miss", 0))
+        response[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+    return response
 
 
-def _latency_response(values: dict) -> dict:
-    count = int(values.get("count", 0))
-    total = int(values.get("sum", 0))
-    return {
+def _latency_response(histogram: list[int]) -> dict:
+    count = histogram[_COUNT]
+    response = {
         "count": count,
-        "average": round(total / count, 2) if count else None,
-        "max": int(values.get("max", 0)) if count else None,
+        "average": round(histogram[_SUM] / count, 2) if count else None,
+        "max": histogram[_MAX] if count else None,
     }
+    for name, quantile in QUANTILES:
+        response[name] = _quantile(histogram, quantile)
+    return response
@@ -117,6 +117,8 @@ class OllamaChatProvider:
         try:
             response = self.opener(http_request, timeout=request.timeout_seconds or self.timeout_seconds)
             cancellation.register(response.close)
+            if request.on_connected is not None:
+                request.on_connected()
             while True:
                 cancellation.raise_if_cancelled()
                 raw = response.readline()
@@ -188,6 +190,9 @@ class OllamaChatProvider:
                 )
                 if done:
                     outcome = "completed"
+                    # The body ends right behind the last frame. Reading that
+                    # end puts a pooled connection back instead of closing it.
+                    response.readline()
                     return
             if not cancellation.cancelled:
                 raise ProviderError(
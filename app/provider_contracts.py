@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import threading
 import time
-from typing import Iterable, Protocol
+from typing import Callable, Iterable, Protocol
 
 
 class ProviderStatus(str, Enum):
@@ -54,10 +54,11 @@ class ProviderError(RuntimeError):
 
 
 class CancellationToken:
-    def __init__(self):
+    def __init__(self, on_progress: Callable[[str], None] | None = None):
         self._event = threading.Event()
         self._callbacks: list = []
         self._lock = threading.Lock()
+        self._on_progress = on_progress
 
     @property
     def cancelled(self) -> bool:
@@ -83,6 +84,12 @@ class CancellationToken:
                 return
         callback()
 
+    def report_progress(self, progress: str) -> None:
+        """Tell whoever runs this work how far it has got, if anyone is listening."""
+
+        if self._on_progress is not None and not self.cancelled:
+            self._on_progress(progress)
+
     def raise_if_cancelled(self) -> None:
         if self.cancelled:
             raise ProviderError(
@@ -100,6 +107,8 @@ class ChatRequest:
     tools: list[dict] = field(default_factory=list)
     response_format: dict | str | None = None
     timeout_seconds: float = 120.0
+    # Called by a provider once the model has answered and before its first chunk.
+    on_connected: Callable[[], None] | None = field(default=None, compare=False)
 
 
 @dataclass(frozen=True)
@@ -131,6 +140,8 @@ class MediaRequest:
     kind: str
     prompt: str
     options: dict = field(default_factory=dict)
+    # Called as `on_progress(value, maximum)` by a provider that reports steps.
+    on_progress: Callable[[int, int], None] | None = field(default=None, compare=False)
 
 
 @dataclass(frozen=True)
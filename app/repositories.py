@@ -2,13 +2,27 @@ from __future__ import annotations
 
 from contextlib import AbstractContextManager
 import json
+import math
 import secrets
 import time
 
 from sqlalchemy import and_, delete, func, or_, select, text as sql_text, update
 from sqlalchemy.exc import IntegrityError
 
-from app.embedding import MAX_CANDIDATES, pack, rank, unpack
+from app.embedding import (
+    MAX_CANDIDATES,
+    MAX_CELL_SIZE,
+    PROBED_CELLS,
+    accumulate,
+    bisect,
+    direction,
+    nearest_cells,
+    pack,
+    rank_packed,
+    sum_vectors,
+    unpack,
+    withdraw,
+)
 from app.models import (
     AppSetting,
     AsyncJob,
@@ -32,6 +46,7 @@ from app.models import (
     MediaResourceCompatibility,
     Memory,
     MemoryEvent,
+    MemoryVectorCell,
     Message,
     Persona,
     PersonaImageLibraryEntry,
@@ -57,6 +72,7 @@ from app.models import (
 from app.persona_card import CARD_STORED_FIELDS
 from app.service_errors import ConflictError
 from app.secret_store import SecretStore
+from app.settings_snapshots import SETTINGS_GENERATION, SETTINGS_WRITTEN, settings_snapshots
 from app.task_contracts import TASK_DEFINITIONS, TASK_ROLES
 from app.persona_voice import dump as dump_voice_preferences
 from app.typed_settings import value_type
@@ -75,6 +91,8 @@ class UnitOfWork(AbstractContextManager):
 
     def __enter__(self):
         self.session = self.session_factory()
+        # Noted before the transaction reads anything; see app/settings_snapshots.py.
+        self.session.info[SETTINGS_GENERATION] = settings_snapshots(self.session.get_bind()).generation
         self.repo = ApplicationRepository(self.session, self.secret_store)
         return self
 
@@ -85,6 +103,11 @@ class UnitOfWork(AbstractContextManager):
             else:
                 self.session.commit()
         finally:
+            written = self.session.info.pop(SETTINGS_WRITTEN, ())
+            if written:
+                snapshots = settings_snapshots(self.session.get_bind())
+                for user_id in written:
+                    snapshots.invalidate(user_id)
             self.session.close()
         return False
 
@@ -144,6 +167,23 @@ class ApplicationRepository:
 
     # Settings
     def settings(self, user_id: str) -> dict | None:
+        """The user's settings, from the shared snapshot when one is current.
+
+        The caller gets its own copy. Inside a transaction that wrote this
+        user's settings the snapshot is bypassed, because it describes the
+        committed state and the caller is looking at its own uncommitted one.
+        """
+
+        if user_id in self.session.info.get(SETTINGS_WRITTEN, ()):
+            return self._stored_settings(user_id)
+        snapshots = settings_snapshots(self.session.get_bind())
+        snapshot = snapshots.get(user_id)
+        if snapshot is None:
+            generation = self.session.info.get(SETTINGS_GENERATION)
+            snapshot = snapshots.offer(user_id, generation, self._stored_settings(user_id))
+        return snapshot.copy()
+
+    def _stored_settings(self, user_id: str) -> dict | None:
         row = self.session.get(AppSetting, user_id)
         if not row:
             return None
@@ -179,6 +219,7 @@ class ApplicationRepository:
         }
 
     def save_settings(self, user_id: str, values: dict, preserve_secret: bool = False) -> dict:
+        self.session.info.setdefault(SETTINGS_WRITTEN, set()).add(user_id)
         row = self.session.get(AppSetting, user_id)
         if not row:
             row = AppSetting(user_id=user_id)
@@ -845,6 +886,24 @@ class ApplicationRepository:
             query = query.limit(limit)
         return self.session.scalars(query).all()
 
+    def message_page(self, chat_id: str, *, before=None, limit: int):
+        """Up to `limit` messages older than `before`, oldest first, and whether older ones remain.
+
+        The cursor is the transcript order itself, `(created_at, id)`, so a page
+        is a range read on the chat index however long the chat has grown.
+        """
+
+        query = select(Message).where(Message.chat_id == chat_id)
+        if before is not None:
+            query = query.where(
+                or_(
+                    Message.created_at < before.created_at,
+                    and_(Message.created_at == before.created_at, Message.id < before.id),
+                )
+            )
+        rows = self.session.scalars(query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)).all()
+        return list(reversed(rows[:limit])), len(rows) > limit
+
     def message(self, message_id: str):
         return self.session.get(Message, message_id)
 
@@ -897,6 +956,7 @@ class ApplicationRepository:
         chat_id: str,
         search_query: str | None = None,
         query_vector=None,
+        embedding_model: str | None = None,
         limit: int = 40,
     ):
         """Memories worth putting in front of the model, best first.
@@ -926,41 +986,37 @@ class ApplicationRepository:
                 .limit(limit)
             ).all()
         )
-        semantic_ids = self._semantic_memory_ids(user_id, query_vector, recent, limit)
-        if not search_query:
-            if not semantic_ids:
-                return recent
-            by_recent = {row.id: row for row in recent}
-            ranked = [by_recent[memory_id] for memory_id in semantic_ids if memory_id in by_recent]
-            ranked.extend(row for row in recent if row.id not in set(semantic_ids))
-            return ranked[:limit]
-
-        clauses = ["m.tier='global'"]
-        params = {"user_id": user_id, "query": search_query, "limit": limit}
-        if workspace_id:
-            clauses.append("(m.tier='workspace' AND m.tier_ref_id=:workspace_id)")
-            params["workspace_id"] = workspace_id
-        if persona_id:
-            clauses.append("(m.tier='persona' AND m.tier_ref_id=:persona_id)")
-            params["persona_id"] = persona_id
-        clauses.append("(m.tier='chat' AND m.tier_ref_id=:chat_id)")
-        params["chat_id"] = chat_id
-        matched_ids = list(
-            self.session.scalars(
-                sql_text(
-                    "SELECT m.id FROM memory_fts "
-                    "JOIN memories m ON m.id=memory_fts.memory_id "
-                    "WHERE memory_fts MATCH :query AND m.user_id=:user_id AND m.status='active' "
-                    f"AND ({' OR '.join(clauses)}) "
-                    "ORDER BY bm25(memory_fts),m.updated_at DESC,m.id DESC LIMIT :limit"
-                ),
-                params,
-            ).all()
-        )
+        semantic_ids = self._semantic_memory_ids(user_id, query_vector, scopes, embedding_model)[:limit]
+        matched_ids = []
+        if search_query:
+            clauses = ["m.tier='global'"]
+            params = {"user_id": user_id, "query": search_query, "limit": limit}
+            if workspace_id:
+                clauses.append("(m.tier='workspace' AND m.tier_ref_id=:workspace_id)")
+                params["workspace_id"] = workspace_id
+            if persona_id:
+                clauses.append("(m.tier='persona' AND m.tier_ref_id=:persona_id)")
+                params["persona_id"] = persona_id
+            clauses.append("(m.tier='chat' AND m.tier_ref_id=:chat_id)")
+            params["chat_id"] = chat_id
+            matched_ids = list(
+                self.session.scalars(
+                    sql_text(
+                        "SELECT m.id FROM memory_fts "
+                        "JOIN memories m ON m.id=memory_fts.memory_id "
+                        "WHERE memory_fts MATCH :query AND m.user_id=:user_id AND m.status='active' "
+                        f"AND ({' OR '.join(clauses)}) "
+                        "ORDER BY bm25(memory_fts),m.updated_at DESC,m.id DESC LIMIT :limit"
+                    ),
+                    params,
+                ).all()
+            )
         ordered_ids = list(matched_ids)
         ordered_ids.extend(memory_id for memory_id in semantic_ids if memory_id not in set(matched_ids))
         if not ordered_ids:
             return recent
+        # A semantic match may be far older than anything recency fetched, so
+        # the rows are loaded by id rather than picked out of `recent`.
         matched_rows = list(
             self.session.scalars(select(Memory).where(Memory.user_id == user_id, Memory.id.in_(ordered_ids))).all()
         )
@@ -970,19 +1026,33 @@ class ApplicationRepository:
         ranked.extend(row for row in recent if row.id not in seen)
         return ranked[:limit]
 
-    def _semantic_memory_ids(self, user_id: str, query_vector, recent, limit: int) -> list[str]:
+    def _semantic_memory_ids(self, user_id: str, query_vector, scopes, model: str | None) -> list[str]:
         """Memory ids whose meaning is close to the question, best first.
 
-        Only the memories already in scope are considered, and only a bounded
-        number of them, so this costs the same whether the assistant remembers a
-        hundred things or ten thousand. A vector from a different model scores
-        zero rather than raising: one stale row must not break a retrieval.
+        Every active memory in scope can be found, however old. The question is
+        compared with the owner's cell centres, then with the memories filed in
+        the few nearest cells, plus a bounded tail the background pass has not
+        filed yet. A vector from a different model scores zero rather than
+        raising: one stale row must not break a retrieval.
         """
 
         if not query_vector:
             return []
-        candidates = [(row.id, unpack(row.embedding)) for row in recent[:MAX_CANDIDATES] if row.embedding]
-        return [memory_id for memory_id, _score in rank(query_vector, candidates)][:limit]
+        cells = select(MemoryVectorCell.id, MemoryVectorCell.centre).where(MemoryVectorCell.user_id == user_id)
+        if model:
+            cells = cells.where(MemoryVectorCell.model == model)
+        probed = nearest_cells(query_vector, self.session.execute(cells))
+        candidates = (
+            select(Memory.id, Memory.embedding)
+            .where(Memory.user_id == user_id, Memory.status == "active", or_(*scopes), Memory.embedding.is_not(None))
+            .order_by(Memory.updated_at.desc(), Memory.id.desc())
+        )
+        if model:
+            candidates = candidates.where(Memory.embedding_model == model)
+        rows = list(self.session.execute(candidates.where(Memory.embedding_cell.is_(None)).limit(MAX_CANDIDATES)))
+        if probed:
+            rows.extend(self.session.execute(candidates.where(Memory.embedding_cell.in_(probed))))
+        return [memory_id for memory_id, _score in rank_packed(query_vector, rows)]
 
     def memories_needing_embedding(self, model: str, limit: int = 50):
         """Active memories with no usable vector, oldest first.
@@ -995,24 +1065,184 @@ class ApplicationRepository:
         return list(
             self.session.scalars(
                 select(Memory)
-                .where(
-                    Memory.status == "active",
-                    or_(
-                        Memory.embedding.is_(None),
-                        Memory.embedding_model != model,
-                        Memory.embedding_updated_at < Memory.updated_at,
-                    ),
-                )
+                .where(*self._needs_embedding(model))
                 .order_by(Memory.updated_at.asc(), Memory.id.asc())
                 .limit(max(1, int(limit)))
             ).all()
         )
 
+    def count_memories_needing_embedding(self, model: str) -> int:
+        """How much backfill is left, across every owner."""
+
+        return int(
+            self.session.scalar(select(func.count()).select_from(Memory).where(*self._needs_embedding(model))) or 0
+        )
+
+    @staticmethod
+    def _needs_embedding(model: str):
+        return (
+            Memory.status == "active",
+            or_(
+                Memory.embedding.is_(None),
+                Memory.embedding_model != model,
+                Memory.embedding_updated_at < Memory.updated_at,
+            ),
+        )
+
     def save_memory_embedding(self, row, vector, model: str) -> None:
+        self._unfile_memory_vector(row)
         row.embedding = pack(vector)
         row.embedding_model = model
-        row.embedding_updated_at = now_ts()
+        # Never earlier than the row's own stamp. Rows written in a burst are
+        # stamped a second apart into the future, and a vector dated before its
+        # text would count as stale and be recomputed on every pass.
+        row.embedding_updated_at = max(now_ts(), int(row.updated_at or 0))
+        row.embedding_cell = None
         self.session.flush()
+        self.file_memory_vector(row, vector)
+
+    def file_memory_vector(self, row, vector) -> None:
+        """Put a stored vector in the owner's nearest index cell.
+
+        The first vector for an owner and model starts the first cell. Only the
+        centres are read to choose a cell, and only the chosen cell is loaded.
+        A cell that grows past the limit is split in two straight away, which
+        costs a comparison per member of that one cell and nothing anywhere else.
+        """
+
+        stamp = now_ts()
+        centres = list(
+            self.session.execute(
+                select(MemoryVectorCell.id, MemoryVectorCell.centre).where(
+                    MemoryVectorCell.user_id == row.user_id, MemoryVectorCell.model == row.embedding_model
+                )
+            )
+        )
+        if not centres:
+            cell = MemoryVectorCell(
+                user_id=row.user_id,
+                model=row.embedding_model,
+                total=pack(vector),
+                centre=pack(direction(vector)),
+                member_count=1,
+                updated_at=stamp,
+            )
+            self.session.add(cell)
+            self.session.flush()
+            row.embedding_cell = cell.id
+            self.session.flush()
+            return
+        cell = self.session.get(MemoryVectorCell, nearest_cells(vector, centres, count=1)[0])
+        self._set_cell_total(cell, accumulate(unpack(cell.total), vector), int(cell.member_count or 0) + 1, stamp)
+        row.embedding_cell = cell.id
+        self.session.flush()
+        if cell.member_count > self._cell_size_limit(row.user_id, row.embedding_model):
+            self._split_vector_cell(cell)
+
+    def _unfile_memory_vector(self, row) -> None:
+        """Take a memory's current vector out of the cell it is filed in.
+
+        A cell's count decides when it splits, and its total decides where new
+        vectors go, so a vector that is deleted or replaced has to leave both.
+        A cell left with nothing in it is removed.
+        """
+
+        if row.embedding_cell is None:
+            return
+        cell = self.session.get(MemoryVectorCell, row.embedding_cell)
+        row.embedding_cell = None
+        if cell is None:
+            return
+        remaining = int(cell.member_count or 0) - 1
+        if remaining <= 0:
+            self.session.delete(cell)
+        else:
+            self._set_cell_total(cell, withdraw(unpack(cell.total), unpack(row.embedding)), remaining, now_ts())
+        self.session.flush()
+
+    @staticmethod
+    def _set_cell_total(cell, total, member_count: int, stamp: int) -> None:
+        cell.total = pack(total)
+        cell.centre = pack(direction(total))
+        cell.member_count = member_count
+        cell.updated_at = stamp
+
+    def _cell_size_limit(self, user_id: str, model: str) -> int:
+        filed = self.session.scalar(
+            select(func.coalesce(func.sum(MemoryVectorCell.member_count), 0)).where(
+                MemoryVectorCell.user_id == user_id, MemoryVectorCell.model == model
+            )
+        )
+        return max(MAX_CELL_SIZE, math.isqrt(int(filed or 0)))
+
+    def _split_vector_cell(self, cell) -> None:
+        members = list(
+            self.session.execute(
+                select(Memory.id, Memory.embedding).where(
+                    Memory.user_id == cell.user_id,
+                    Memory.embedding_cell == cell.id,
+                    Memory.embedding.is_not(None),
+                )
+            )
+        )
+        vectors = [unpack(embedding) for _memory_id, embedding in members]
+        stamp = now_ts()
+        if len(members) <= self._cell_size_limit(cell.user_id, cell.model):
+            # A count that drifted from the rows - a vector removed by a path
+            # that bypassed this repository - is corrected rather than split.
+            self._set_cell_total(cell, sum_vectors(vectors) or unpack(cell.total), len(members), stamp)
+            self.session.flush()
+            return
+        labels = bisect(vectors)
+        kept = [vector for vector, label in zip(vectors, labels) if label == 0]
+        moved = [vector for vector, label in zip(vectors, labels) if label == 1]
+        moved_total = sum_vectors(moved)
+        sibling = MemoryVectorCell(
+            user_id=cell.user_id,
+            model=cell.model,
+            total=pack(moved_total),
+            centre=pack(direction(moved_total)),
+            member_count=len(moved),
+            updated_at=stamp,
+        )
+        self.session.add(sibling)
+        self.session.flush()
+        self._set_cell_total(cell, sum_vectors(kept), len(kept), stamp)
+        moved_ids = [memory_id for (memory_id, _embedding), label in zip(members, labels) if label == 1]
+        self.session.execute(
+            update(Memory).where(Memory.id.in_(moved_ids)).values(embedding_cell=sibling.id),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        self.session.flush()
+
+    def memories_needing_filing(self, model: str, limit: int = 50):
+        """Memories with a current vector that is not in the index yet.
+
+        Only vectors from before the index existed are ever in this state;
+        anything embedded since is filed as it is stored.
+        """
+
+        return list(
+            self.session.scalars(
+                select(Memory)
+                .where(
+                    Memory.embedding.is_not(None),
+                    Memory.embedding_model == model,
+                    Memory.embedding_cell.is_(None),
+                )
+                .order_by(Memory.updated_at.desc(), Memory.id.desc())
+                .limit(max(1, int(limit)))
+            ).all()
+        )
+
+    def prune_vector_cells(self, model: str) -> int:
+        """Drop index cells that belong to a model no longer in use.
+
+        Their members are vectors that are about to be recomputed anyway, and
+        cells from another model would never be probed by a current question.
+        """
+
+        return int(self.session.execute(delete(MemoryVectorCell).where(MemoryVectorCell.model != model)).rowcount or 0)
 
     def memory(self, user_id: str, memory_id: str):
         return self.session.scalar(select(Memory).where(Memory.id == memory_id, Memory.user_id == user_id))
@@ -1023,6 +1253,7 @@ class ApplicationRepository:
         return self.session.scalars(select(Memory).where(Memory.user_id == user_id, Memory.id.in_(memory_ids))).all()
 
     def delete_memory(self, row: Memory) -> None:
+        self._unfile_memory_vector(row)
         self.session.delete(row)
 
     def discarded_memories_before(self, cutoff: int) -> list[Memory]:
@@ -1300,6 +1531,9 @@ class ApplicationRepository:
     def identity_validation_by_id(self, validation_id: str):
         return self.session.get(PersonaIdentityValidation, validation_id)
 
+    def identity_validation_for_job(self, job_id: str):
+        return self.session.scalar(select(PersonaIdentityValidation).where(PersonaIdentityValidation.job_id == job_id))
+
     def latest_media_identity_validation(self, user_id: str, media_id: str):
         return self.session.scalar(
             select(PersonaIdentityValidation)
@@ -1386,6 +1620,51 @@ class ApplicationRepository:
     def job_by_id(self, job_id: str):
         return self.session.get(AsyncJob, job_id)
 
+    def queued_jobs(self):
+        """Every job still waiting, oldest first: at startup, the work a restart put back."""
+
+        return self.session.scalars(
+            select(AsyncJob).where(AsyncJob.status == "queued").order_by(AsyncJob.created_at, AsyncJob.id)
+        ).all()
+
+    def fail_interrupted_work(self, job_id: str, capability_request_id: str | None, message: str) -> None:
+        """Fail what a requeued job was doing, as startup fails work it does not requeue.
+
+        Startup put these rows back to queued for the job to pick up. When the
+        job cannot be resumed after all, nothing else will ever move them on.
+        """
+
+        stamp = now_ts()
+        if capability_request_id:
+            self.session.execute(
+                update(CapabilityRequest)
+                .where(
+                    CapabilityRequest.id == capability_request_id, CapabilityRequest.status.in_(("queued", "running"))
+                )
+                .values(status="failed", error_code="interrupted", error_message=message, completed_at=stamp)
+            )
+            self.session.execute(
+                update(ChatAttachment)
+                .where(
+                    ChatAttachment.capability_request_id == capability_request_id,
+                    ChatAttachment.status.in_(("queued", "running")),
+                )
+                .values(
+                    status="failed",
+                    safe_error="Image generation was interrupted by a restart.",
+                    retry_available=1,
+                    completed_at=stamp,
+                    updated_at=stamp,
+                )
+            )
+        self.session.execute(
+            update(PersonaIdentityValidation)
+            .where(
+                PersonaIdentityValidation.job_id == job_id, PersonaIdentityValidation.status.in_(("queued", "running"))
+            )
+            .values(status="error", error_code="interrupted", error_message=message, completed_at=stamp)
+        )
+
     def turn(self, user_id: str, turn_id: str):
         return self.session.scalar(
             select(ConversationTurn).where(
@@ -1404,6 +1683,143 @@ class ApplicationRepository:
             .order_by(ConversationTurn.sequence_number)
         ).all()
 
+    def _turn_window(self, user_id: str, chat_id: str, before_sequence: int, from_sequence: int | None):
+        query = select(ConversationTurn.id).where(
+            ConversationTurn.user_id == user_id,
+            ConversationTurn.chat_id == chat_id,
+            ConversationTurn.sequence_number < before_sequence,
+        )
+        if from_sequence is not None:
+            query = query.where(ConversationTurn.sequence_number >= from_sequence)
+        return query
+
+    def turns_before(self, user_id: str, chat_id: str, before_sequence: int, *, from_sequence: int | None = None):
+        window = self._turn_window(user_id, chat_id, before_sequence, from_sequence)
+        return self.session.scalars(
+            select(ConversationTurn).where(ConversationTurn.id.in_(window)).order_by(ConversationTurn.sequence_number)
+        ).all()
+
+    def turn_messages_before(
+        self, user_id: str, chat_id: str, before_sequence: int, *, from_sequence: int | None = None
+    ) -> dict:
+        """Every message a window of turns refers to, in one statement, keyed by id."""
+
+        window = self._turn_window(user_id, chat_id, before_sequence, from_sequence)
+        referenced = (
+            select(ConversationTurn.user_message_id)
+            .where(ConversationTurn.id.in_(window))
+            .union(
+                select(ConversationTurn.assistant_message_id).where(
+                    ConversationTurn.id.in_(window),
+                    ConversationTurn.assistant_message_id.is_not(None),
+                )
+            )
+        )
+        rows = self.session.scalars(select(Message).where(Message.id.in_(referenced))).all()
+        return {row.id: row for row in rows}
+
+    def capability_requests_before(
+        self, user_id: str, chat_id: str, before_sequence: int, *, from_sequence: int | None = None
+    ) -> dict:
+        """Capability requests for a window of turns, grouped by turn in request order."""
+
+        window = self._turn_window(user_id, chat_id, before_sequence, from_sequence)
+        grouped: dict[str, list] = {}
+        for row in self.session.scalars(
+            select(CapabilityRequest)
+            .where(CapabilityRequest.turn_id.in_(window))
+            .order_by(CapabilityRequest.requested_at, CapabilityRequest.id)
+        ):
+            grouped.setdefault(row.turn_id, []).append(row)
+        return grouped
+
+    def unthreaded_messages_before(self, user_id: str, chat_id: str, created_at: int, before_sequence: int):
+        """Messages older than a point that no earlier turn claims, such as imported history."""
+
+        return self.session.scalars(
+            select(Message)
+            .where(*self._unthreaded(user_id, chat_id, created_at, before_sequence))
+            .order_by(Message.created_at, Message.id)
+        ).all()
+
+    def _unthreaded(self, user_id: str, chat_id: str, created_at: int, before_sequence: int):
+        claimed = self._turn_window(user_id, chat_id, before_sequence, None)
+        return (
+            Message.chat_id == chat_id,
+            Message.created_at < created_at,
+            Message.id.not_in(select(ConversationTurn.user_message_id).where(ConversationTurn.id.in_(claimed))),
+            Message.id.not_in(
+                select(ConversationTurn.assistant_message_id).where(
+                    ConversationTurn.id.in_(claimed),
+                    ConversationTurn.assistant_message_id.is_not(None),
+                )
+            ),
+        )
+
+    def history_items_before(
+        self, user_id: str, chat_id: str, created_at: int, before_sequence: int, from_sequence: int
+    ) -> int:
+        """How many prompt-history items precede a turn window, counted without loading them.
+
+        Mirrors what the context loader would have built from those rows: the
+        unthreaded messages, then each completed turn's user message, its reply,
+        and the capability results that travel with the reply.
+        """
+
+        earlier = (
+            select(ConversationTurn)
+            .where(
+                ConversationTurn.user_id == user_id,
+                ConversationTurn.chat_id == chat_id,
+                ConversationTurn.status == "completed",
+                ConversationTurn.sequence_number < from_sequence,
+            )
+            .subquery()
+        )
+        unthreaded = (
+            select(func.count(Message.id))
+            .where(*self._unthreaded(user_id, chat_id, created_at, before_sequence))
+            .scalar_subquery()
+        )
+        asked = select(func.count(Message.id)).join(earlier, Message.id == earlier.c.user_message_id).scalar_subquery()
+        answered = (
+            select(func.count(Message.id)).join(earlier, Message.id == earlier.c.assistant_message_id).scalar_subquery()
+        )
+        tools = (
+            select(func.count(CapabilityRequest.id))
+            .join(earlier, CapabilityRequest.turn_id == earlier.c.id)
+            .join(Message, Message.id == earlier.c.assistant_message_id)
+            .scalar_subquery()
+        )
+        counts = self.session.execute(select(unthreaded, asked, answered, tools)).one()
+        return sum(int(value or 0) for value in counts)
+
+    def degraded_reasons(self, user_id: str, chat_id: str, *, message_ids=None) -> dict:
+        """The recorded context degradation for each reply in a chat that has one."""
+
+        query = select(ConversationTurn.assistant_message_id, ConversationTurn.context_degraded_reason).where(
+            ConversationTurn.user_id == user_id,
+            ConversationTurn.chat_id == chat_id,
+            ConversationTurn.assistant_message_id.is_not(None),
+            ConversationTurn.context_degraded_reason.is_not(None),
+            ConversationTurn.context_degraded_reason != "",
+        )
+        if message_ids is not None:
+            query = query.where(ConversationTurn.assistant_message_id.in_(list(message_ids)))
+        return {message_id: reason for message_id, reason in self.session.execute(query)}
+
+    def turn_for_history_item(self, user_id: str, chat_id: str, message_id: str):
+        return self.session.scalar(
+            select(ConversationTurn).where(
+                ConversationTurn.user_id == user_id,
+                ConversationTurn.chat_id == chat_id,
+                or_(
+                    ConversationTurn.user_message_id == message_id,
+                    ConversationTurn.assistant_message_id == message_id,
+                ),
+            )
+        )
+
     def add_turn(self, *, user_id: str, chat_id: str, message_id: str, provider: str, model: str):
         sequence = self.session.scalar(
             update(Chat)
@@ -1493,6 +1909,7 @@ class ApplicationRepository:
         kind: str,
         progress: str,
         capability_request_id: str | None = None,
+        source_turn_id: str | None = None,
     ):
         stamp = now_ts()
         row = AsyncJob(
@@ -1501,9 +1918,11 @@ class ApplicationRepository:
             chat_id=chat_id,
             turn_id=turn_id,
             capability_request_id=capability_request_id,
+            source_turn_id=source_turn_id,
             kind=kind,
             status="queued",
             cancel_requested=0,
+            attempts=0,
             created_at=stamp,
             updated_at=stamp,
             progress=progress,
@@ -1671,12 +2090,11 @@ class ApplicationRepository:
             )
         )
 
-    def chat_attachments(self, user_id: str, chat_id: str):
-        return self.session.scalars(
-            select(ChatAttachment)
-            .where(ChatAttachment.user_id == user_id, ChatAttachment.chat_id == chat_id)
-            .order_by(ChatAttachment.created_at, ChatAttachment.id)
-        ).all()
+    def chat_attachments(self, user_id: str, chat_id: str, *, message_ids=None):
+        query = select(ChatAttachment).where(ChatAttachment.user_id == user_id, ChatAttachment.chat_id == chat_id)
+        if message_ids is not None:
+            query = query.where(ChatAttachment.assistant_message_id.in_(list(message_ids)))
+        return self.session.scalars(query.order_by(ChatAttachment.created_at, ChatAttachment.id)).all()
 
     def editable_chat_attachments(self, user_id: str, chat_id: str, *, limit: int = 5):
         """Completed owner-scoped image attachments in one chat, newest first.
@@ -1723,8 +2141,10 @@ class ApplicationRepository:
     def audio(self, user_id: str, audio_id: str):
         return self.session.scalar(select(AudioFile).where(AudioFile.id == audio_id, AudioFile.user_id == user_id))
 
-    def audio_by_path(self, local_path: str):
-        return self.session.scalar(select(AudioFile).where(AudioFile.local_path == local_path))
+    def audio_by_paths(self, local_paths: list[str]) -> list[AudioFile]:
+        if not local_paths:
+            return []
+        return list(self.session.scalars(select(AudioFile).where(AudioFile.local_path.in_(local_paths))))
 
     def add_audio(
         self,
@@ -2014,6 +2434,19 @@ class ApplicationRepository:
             )
         self.session.flush()
 
+    def frames_for_attachments(self, attachment_ids) -> dict:
+        grouped: dict[str, list] = {}
+        ids = list(attachment_ids)
+        if not ids:
+            return grouped
+        for row in self.session.scalars(
+            select(ChatAttachmentFrame)
+            .where(ChatAttachmentFrame.attachment_id.in_(ids))
+            .order_by(ChatAttachmentFrame.attachment_id, ChatAttachmentFrame.position)
+        ):
+            grouped.setdefault(row.attachment_id, []).append(row)
+        return grouped
+
     def attachment_frames(self, attachment_id: str):
         return self.session.scalars(
             select(ChatAttachmentFrame)
@@ -78,15 +78,16 @@ class ResourceCoordinator:
         logger,
         providers: dict | None = None,
         provider_url_policy=None,
+        opener=None,
     ):
         self.session_factory = session_factory
         self.secret_store = secret_store
         self.config = config
         self.logger = logger
         self.providers = providers or {
-            "ollama": OllamaResourceProvider(config.provider_timeout_seconds),
-            "comfyui": ComfyUIResourceProvider(config.provider_timeout_seconds),
-            "automatic1111": Automatic1111ResourceProvider(config.provider_timeout_seconds),
+            "ollama": OllamaResourceProvider(config.provider_timeout_seconds, opener=opener),
+            "comfyui": ComfyUIResourceProvider(config.provider_timeout_seconds, opener=opener),
+            "automatic1111": Automatic1111ResourceProvider(config.provider_timeout_seconds, opener=opener),
         }
         self.provider_url_policy = provider_url_policy
         self._policy = {
@@ -26,13 +26,14 @@ def _request_json(
     timeout: float,
     api_auth: str | None = None,
     payload: dict | None = None,
+    opener=None,
 ) -> dict:
     body = json.dumps(payload).encode() if payload is not None else None
     headers = {**_auth_headers(api_auth)}
     if body is not None:
         headers["Content-Type"] = "application/json"
     request = urllib.request.Request(url, data=body, headers=headers, method="POST" if body is not None else "GET")
-    with urllib.request.urlopen(request, timeout=timeout) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=timeout) as response:
         content = response.read()
     if not content:
         return {}
@@ -54,8 +55,9 @@ def _mb(value) -> int | None:
 class ComfyUIResourceProvider:
     name = "comfyui"
 
-    def __init__(self, timeout_seconds: float = 10.0):
+    def __init__(self, timeout_seconds: float = 10.0, opener=None):
         self.timeout_seconds = timeout_seconds
+        self.opener = opener
 
     def capabilities(self, endpoint: str, api_auth: str | None = None) -> ProviderRuntimeCapabilities:
         # /free is a core route on supported ComfyUI versions. A release call is
@@ -65,13 +67,17 @@ class ComfyUIResourceProvider:
     def snapshot(self, endpoint: str, api_auth: str | None = None) -> ProviderCapacitySnapshot:
         base = endpoint.rstrip("/")
         try:
-            stats = _request_json(f"{base}/system_stats", timeout=self.timeout_seconds, api_auth=api_auth)
+            stats = _request_json(
+                f"{base}/system_stats", timeout=self.timeout_seconds, api_auth=api_auth, opener=self.opener
+            )
             devices = stats.get("devices") if isinstance(stats.get("devices"), list) else []
             device = next((item for item in devices if isinstance(item, dict) and item.get("type") != "cpu"), None)
             queue_depth = None
             active_jobs = None
             try:
-                queue = _request_json(f"{base}/queue", timeout=self.timeout_seconds, api_auth=api_auth)
+                queue = _request_json(
+                    f"{base}/queue", timeout=self.timeout_seconds, api_auth=api_auth, opener=self.opener
+                )
                 running = queue.get("queue_running") if isinstance(queue.get("queue_running"), list) else []
                 pending = queue.get("queue_pending") if isinstance(queue.get("queue_pending"), list) else []
                 active_jobs = len(running)
@@ -103,6 +109,7 @@ class ComfyUIResourceProvider:
         _request_json(
             f"{endpoint.rstrip('/')}/free",
             timeout=self.timeout_seconds,
+            opener=self.opener,
             api_auth=api_auth,
             payload={"unload_models": True, "free_memory": True},
         )
@@ -112,8 +119,9 @@ class ComfyUIResourceProvider:
 class Automatic1111ResourceProvider:
     name = "automatic1111"
 
-    def __init__(self, timeout_seconds: float = 10.0):
+    def __init__(self, timeout_seconds: float = 10.0, opener=None):
         self.timeout_seconds = timeout_seconds
+        self.opener = opener
 
     def capabilities(self, endpoint: str, api_auth: str | None = None) -> ProviderRuntimeCapabilities:
         return ProviderRuntimeCapabilities(self.name, True, False, True, False)
@@ -123,6 +131,7 @@ class Automatic1111ResourceProvider:
             payload = _request_json(
                 f"{endpoint.rstrip('/')}/sdapi/v1/memory",
                 timeout=self.timeout_seconds,
+                opener=self.opener,
                 api_auth=api_auth,
             )
             cuda = payload.get("cuda") if isinstance(payload.get("cuda"), dict) else {}
@@ -150,6 +159,7 @@ class Automatic1111ResourceProvider:
         _request_json(
             f"{endpoint.rstrip('/')}/sdapi/v1/unload-checkpoint",
             timeout=self.timeout_seconds,
+            opener=self.opener,
             api_auth=api_auth,
             payload={},
         )
@@ -159,15 +169,16 @@ class Automatic1111ResourceProvider:
 class OllamaResourceProvider:
     name = "ollama"
 
-    def __init__(self, timeout_seconds: float = 10.0):
+    def __init__(self, timeout_seconds: float = 10.0, opener=None):
         self.timeout_seconds = timeout_seconds
+        self.opener = opener
 
     def capabilities(self, endpoint: str, api_auth: str | None = None) -> ProviderRuntimeCapabilities:
         return ProviderRuntimeCapabilities(self.name, False, False, True, False)
 
     def snapshot(self, endpoint: str, api_auth: str | None = None) -> ProviderCapacitySnapshot:
         try:
-            payload = _request_json(f"{endpoint.rstrip('/')}/api/ps", timeout=self.timeout_seconds)
+            payload = _request_json(f"{endpoint.rstrip('/')}/api/ps", timeout=self.timeout_seconds, opener=self.opener)
             values = payload.get("models") if isinstance(payload.get("models"), list) else []
             loaded = []
             for value in values:
@@ -202,6 +213,7 @@ class OllamaResourceProvider:
             _request_json(
                 f"{endpoint.rstrip('/')}/api/generate",
                 timeout=self.timeout_seconds,
+                opener=self.opener,
                 payload={"model": model, "keep_alive": 0, "stream": False},
             )
             released.append(model)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 import json
 from pathlib import Path
+import threading
 
 from app.auth import hash_password, is_masked_secret, mask_secret, verify_password
 from app.persona_voice import parse as parse_voice_preferences
@@ -26,6 +28,7 @@ from app.persona_card import (
 )
 from sqlalchemy import select
 
+from app.bounded_cache import BoundedCache
 from app.avatar_store import AvatarUnavailable, avatar_file, is_served, refresh_from_file, snapshot
 from app.models import Persona
 from app.repositories import UnitOfWork, now_ts
@@ -45,6 +48,22 @@ from app.service_errors import (
 )
 
 
+# Sessions checked against the database within the last minute are trusted
+# without asking again, and a sliding expiry is written at most that often. A
+# session may therefore lapse up to a minute before a strict slide would have
+# ended it, which is the price of not taking the writer lock on every request.
+SESSION_CACHE_ENTRIES = 1024
+SESSION_REVALIDATE_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class _VerifiedSession:
+    user_id: str
+    is_admin: bool
+    auto_logout: bool
+    expires_at: int | None
+
+
 class AuthContext:
     def __init__(
         self,
@@ -162,6 +181,16 @@ class ResourceService:
         self.media_catalog = media_catalog
         self.avatar_dir = Path(avatar_dir) if avatar_dir else None
         self.avatar_fetch = avatar_fetch
+        # token -> _VerifiedSession. Never outlives half a session, so a slide
+        # that was not written yet cannot let the stored expiry pass first.
+        self._sessions = BoundedCache(
+            SESSION_CACHE_ENTRIES,
+            min(SESSION_REVALIDATE_SECONDS, max(1, session_ttl_seconds // 2)),
+        )
+        # Bumped by every revocation, so a lookup that read a session just
+        # before it was deleted cannot put it back into the cache afterwards.
+        self._session_revision = 0
+        self._session_lock = threading.Lock()
 
     def _uow(self):
         return UnitOfWork(self.session_factory, self.secret_store)
@@ -202,8 +231,21 @@ class ResourceService:
             }
 
     def authenticate(self, token: str | None) -> AuthContext:
+        """Resolve a session token, sliding its expiry when auto-logout is on.
+
+        Every API call passes through here. A session verified recently is
+        answered from memory; otherwise the database is asked, and that same
+        visit writes the slide, so the write happens at most once a revalidation
+        period per session rather than once per request.
+        """
+
         if not token:
             raise AuthenticationError()
+        verified = self._sessions.get(token)
+        if verified and not (verified.auto_logout and verified.expires_at and verified.expires_at <= now_ts()):
+            return AuthContext(verified.user_id, token, verified.expires_at, verified.is_admin, verified.auto_logout)
+        self._sessions.discard(token)
+        revision = self._session_revision
         with self._uow() as uow:
             pair = uow.repo.session_record(token)
             if not pair:
@@ -217,11 +259,28 @@ class ResourceService:
                 raise AuthenticationError("session expired")
             if auto_logout:
                 session.expires_at = stamp + self.session_ttl_seconds
-            return AuthContext(user.id, token, session.expires_at, bool(user.is_admin), auto_logout)
+            verified = _VerifiedSession(user.id, bool(user.is_admin), auto_logout, session.expires_at)
+        # Cached only once the slide is committed, so memory never runs ahead of the database.
+        with self._session_lock:
+            if revision == self._session_revision:
+                self._sessions.put(token, verified)
+        return AuthContext(verified.user_id, token, verified.expires_at, verified.is_admin, verified.auto_logout)
 
     def logout(self, token: str) -> None:
+        self._revoke(lambda cached_token, _verified: cached_token == token)
         with self._uow() as uow:
             uow.repo.delete_session(token)
+        self._revoke(lambda cached_token, _verified: cached_token == token)
+
+    def forget_sessions(self, user_id: str) -> None:
+        """Make every cached session for an account ask the database again on its next request."""
+
+        self._revoke(lambda _token, verified: verified.user_id == user_id)
+
+    def _revoke(self, predicate) -> None:
+        with self._session_lock:
+            self._session_revision += 1
+            self._sessions.discard_where(predicate)
 
     def get_settings(self, user_id: str) -> dict:
         with self._uow() as uow:
@@ -281,7 +340,10 @@ class ResourceService:
                     previous_preferences,
                     preferences,
                 )
-            return settings_response(saved)
+            response = settings_response(saved)
+        # Auto-logout decides whether a session slides, and cached sessions carry it.
+        self.forget_sessions(user_id)
+        return response
 
     def list_workspaces(self, user_id: str) -> list[dict]:
         with self._uow() as uow:
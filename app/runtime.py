@@ -13,7 +13,7 @@ from app.context_policy import (
     DEFAULT_MAX_COMPACTION_PASSES,
     DEFAULT_SUMMARY_TRIGGER_RATIO,
 )
-from app.database import build_engine, initialize_database
+from app.database import DEFAULT_JOB_MAX_ATTEMPTS, build_engine, initialize_database
 from app.observability import MetricsRegistry, RedactedJsonFormatter
 from app.secret_store import SecretStore
 
@@ -38,6 +38,8 @@ class AppConfig:
     session_ttl_seconds: int = 1800
     allow_public_signup: bool = False
     audio_hot_limit: int = 200
+    # ffmpeg processes kept waiting for the next recording; 0 starts one per recording.
+    transcode_warm_workers: int = 1
     backup_snapshot_limit: int = 10
     provider_timeout_seconds: float = 10.0
     generation_timeout_seconds: float = 120.0
@@ -46,6 +48,22 @@ class AppConfig:
     max_tts_text_chars: int = 20_000
     interactive_workers: int = 1
     media_workers: int = 1
+    # Title and memory follow-ups run here, behind every turn a user waits on.
+    background_workers: int = 1
+    # The `OLLAMA_NUM_PARALLEL` the Ollama server was started with. Ollama does
+    # not report it, so the operator states it once for both.
+    ollama_num_parallel: int = 1
+    # With a pool of one, follow-ups wait until no turn has used Ollama for this long.
+    background_quiet_seconds: float = 2.0
+    # Streamed reply text is published in pieces of about this many bytes, or
+    # whatever arrived within this many milliseconds. Zero bytes sends every
+    # provider chunk as its own event.
+    delta_coalesce_bytes: int = 64
+    delta_coalesce_ms: int = 30
+    # Pictures, identity checks and reply follow-ups that a restart interrupted
+    # are queued again rather than failed, each up to this many starts in all.
+    resume_interrupted_jobs: bool = True
+    job_max_attempts: int = DEFAULT_JOB_MAX_ATTEMPTS
     default_context_window_tokens: int = DEFAULT_CONTEXT_WINDOW_TOKENS
     context_summary_trigger_ratio: float = DEFAULT_SUMMARY_TRIGGER_RATIO
     context_max_compaction_passes: int = DEFAULT_MAX_COMPACTION_PASSES
@@ -91,6 +109,7 @@ class AppConfig:
             session_ttl_seconds=int(os.getenv("SESSION_TTL_SECONDS", "1800")),
             allow_public_signup=os.getenv("ALLOW_PUBLIC_SIGNUP", "0").strip().lower() in {"1", "true", "yes", "on"},
             audio_hot_limit=int(os.getenv("AUDIO_HOT_LIMIT", "200")),
+            transcode_warm_workers=min(8, max(0, int(os.getenv("TRANSCODE_WARM_WORKERS", "1")))),
             backup_snapshot_limit=int(os.getenv("BACKUP_SNAPSHOT_LIMIT", "10")),
             provider_timeout_seconds=float(os.getenv("PROVIDER_TEST_TIMEOUT_SECONDS", "10")),
             generation_timeout_seconds=float(os.getenv("GENERATION_TIMEOUT_SECONDS", "120")),
@@ -102,6 +121,13 @@ class AppConfig:
             max_tts_text_chars=max(1, int(os.getenv("MAX_TTS_TEXT_CHARS", "20000"))),
             interactive_workers=max(1, int(os.getenv("JOB_QUEUE_INTERACTIVE_WORKERS", "1"))),
             media_workers=max(1, int(os.getenv("JOB_QUEUE_MEDIA_WORKERS", "1"))),
+            background_workers=max(1, int(os.getenv("JOB_QUEUE_BACKGROUND_WORKERS", "1"))),
+            ollama_num_parallel=max(1, int(os.getenv("OLLAMA_NUM_PARALLEL", "1"))),
+            background_quiet_seconds=max(0.0, float(os.getenv("JOB_QUEUE_BACKGROUND_QUIET_SECONDS", "2"))),
+            delta_coalesce_bytes=max(0, int(os.getenv("DELTA_COALESCE_BYTES", "64"))),
+            delta_coalesce_ms=max(0, int(os.getenv("DELTA_COALESCE_MS", "30"))),
+            resume_interrupted_jobs=_env_bool("RESUME_INTERRUPTED_JOBS", True),
+            job_max_attempts=max(1, int(os.getenv("JOB_MAX_ATTEMPTS", str(DEFAULT_JOB_MAX_ATTEMPTS)))),
             default_context_window_tokens=max(
                 2048, int(os.getenv("DEFAULT_CONTEXT_WINDOW_TOKENS", str(DEFAULT_CONTEXT_WINDOW_TOKENS)))
             ),
@@ -213,6 +239,8 @@ class AppRuntime:
             self.config.database_path,
             self.config.session_ttl_seconds,
             secret_store=self.secret_store,
+            resume_jobs=self.config.resume_interrupted_jobs,
+            job_max_attempts=self.config.job_max_attempts,
         )
         log_path = self.config.log_dir / "events.log"
         handler = RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=8, encoding="utf-8")
@@ -12,9 +12,14 @@ that never enables it never starts a thread it does not use.
 from __future__ import annotations
 
 import threading
+import time
 
 
 DEFAULT_POLL_SECONDS = 300
+# How soon the loop comes back while memory vectors are still catching up. A
+# re-embed after changing models is thousands of rows; at one pass per poll
+# interval it would take hours.
+EMBEDDING_CATCH_UP_SECONDS = 1.0
 
 
 class SceneProductionRunner:
@@ -41,6 +46,7 @@ class SceneProductionRunner:
         self.enabled = bool(enabled)
         self._stop = threading.Event()
         self._thread: threading.Thread | None = None
+        self._embedding_behind = False
 
     def start(self) -> None:
         # Two kinds of background work share this thread. Producing approved
@@ -66,9 +72,13 @@ class SceneProductionRunner:
         if not self.memories:
             return
         try:
-            self.memories.embed_pending()
+            report = self.memories.embed_pending() or {}
         except Exception:  # noqa: BLE001 - a missing model must not stop pictures
             self.logger.warning("memory embedding pass failed", exc_info=True)
+            report = {}
+        # Behind only while passes are making progress. A model that is away
+        # leaves a backlog too, and spinning on it would help nobody.
+        self._embedding_behind = bool(report.get("embedded")) and bool(report.get("pending"))
 
     def _snapshot_avatars(self) -> None:
         """Adopt avatars the product does not own copies of yet.
@@ -120,5 +130,16 @@ class SceneProductionRunner:
         # Wait first: a restart is the least likely moment for the machine to be
         # idle, and the recovery sweep has only just returned entries to the
         # queue.
-        while not self._stop.wait(self.interval_seconds):
-            self.run_once()
+        next_run = time.monotonic() + self.interval_seconds
+        while not self._stop.wait(self._wait_seconds(next_run)):
+            if time.monotonic() >= next_run:
+                self.run_once()
+                next_run = time.monotonic() + self.interval_seconds
+            else:
+                self._embed_pending()
+
+    def _wait_seconds(self, next_run: float) -> float:
+        remaining = max(0.0, next_run - time.monotonic())
+        if self._embedding_behind:
+            return min(EMBEDDING_CATCH_UP_SECONDS, remaining)
+        return remaining
@@ -202,7 +202,9 @@ class SecurityObservabilityMiddleware:
             return await self.app(scope, receive, observed_send)
         finally:
             latency_ms = int((time.monotonic() - started) * 1000)
-            self.metrics.request(method, status, latency_ms)
+            # The matched route's template, so `/turns/{turn_id}` is one series rather than one per turn.
+            route = str(getattr(scope.get("route"), "path", "") or "")
+            self.metrics.request(method, status, latency_ms, route)
             self.logger.info(
                 "http.request method=%s path=%s status=%s latency_ms=%s",
                 method,
@@ -0,0 +1,90 @@
+"""Per-user settings, read once and shared until something changes them.
+
+`ApplicationRepository.settings` is asked for from authentication, speech,
+transcription, media, identity checks and turn creation, often several times
+in one request, and every answer cost a handful of rows, a JSON decode per
+preference and a decrypt. A snapshot holds that answer per user per database,
+so a repeated question costs neither SQL nor a decrypt.
+
+Every committed settings write bumps a generation counter. A unit of work
+notes the generation before it reads anything, and what it reads is stored
+only if no write committed since, because a transaction may be looking at the
+state from before that write. A snapshot is therefore never older than the
+last committed write. Writes are rare, so almost every read qualifies. The
+age bound is only a backstop for edits made outside the application, such as
+an operator with a SQLite shell.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+import threading
+import weakref
+
+from app.bounded_cache import BoundedCache
+
+
+SNAPSHOT_ENTRIES = 512
+SNAPSHOT_SECONDS = 300
+
+# Keys in `Session.info`: the users whose settings the open transaction wrote,
+# whose snapshots are bypassed inside it and invalidated once it ends; and the
+# generation noted when the unit of work began.
+SETTINGS_WRITTEN = "nice_assistant_settings_written"
+SETTINGS_GENERATION = "nice_assistant_settings_generation"
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    user_id: str
+    generation: int
+    values: dict | None
+
+    def copy(self) -> dict | None:
+        """A private copy for a caller that may change what it was given."""
+
+        return copy.deepcopy(self.values)
+
+
+class SettingsSnapshots:
+    def __init__(self, max_entries: int = SNAPSHOT_ENTRIES, ttl_seconds: float = SNAPSHOT_SECONDS):
+        self._cache = BoundedCache(max_entries, ttl_seconds)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, user_id: str) -> SettingsSnapshot | None:
+        return self._cache.get(user_id)
+
+    def offer(self, user_id: str, generation: int | None, values: dict | None) -> SettingsSnapshot:
+        """Keep what a read found, unless a write committed after its transaction could see."""
+
+        snapshot = SettingsSnapshot(user_id, generation or 0, values)
+        with self._lock:
+            if generation == self._generation:
+                self._cache.put(user_id, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.discard(user_id)
+
+
+# One set per database, so two applications in one process - the test suite
+# runs dozens - never answer from each other's settings.
+_BY_ENGINE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_BY_ENGINE_LOCK = threading.Lock()
+
+
+def settings_snapshots(engine) -> SettingsSnapshots:
+    with _BY_ENGINE_LOCK:
+        snapshots = _BY_ENGINE.get(engine)
+        if snapshots is None:
+            snapshots = _BY_ENGINE[engine] = SettingsSnapshots()
+        return snapshots
@@ -131,12 +131,12 @@ def _kokoro_speech_request(base_url, text, voice, fmt, model, speed, stream):
     )
 
 
-def kokoro_speech_stream(text, voice, fmt, base_url, model="kokoro", speed="1", cancelled=None):
+def kokoro_speech_stream(text, voice, fmt, base_url, model="kokoro", speed="1", cancelled=None, opener=None):
     """Yield Kokoro audio as it is generated rather than after it is complete."""
 
     base_url = normalized_kokoro_base_url(base_url)
     request = _kokoro_speech_request(base_url, text, voice, fmt, model, speed, True)
-    with urllib.request.urlopen(request, timeout=300) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=300) as response:
         content_type = (response.headers.get("Content-Type") or "").lower()
         if not content_type.startswith("audio/") and fmt != "pcm":
             # The completed-file path knows how to follow a download link. A
@@ -146,10 +146,10 @@ def kokoro_speech_stream(text, voice, fmt, base_url, model="kokoro", speed="1",
         yield from _iter_cancellable(response, cancelled)
 
 
-def kokoro_speech(text, voice, fmt, base_url, model="kokoro", speed="1", cancelled=None):
+def kokoro_speech(text, voice, fmt, base_url, model="kokoro", speed="1", cancelled=None, opener=None):
     base_url = normalized_kokoro_base_url(base_url)
     request = _kokoro_speech_request(base_url, text, voice, fmt, model, speed, False)
-    with urllib.request.urlopen(request, timeout=300) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=300) as response:
         body = _read_cancellable(response, cancelled)
         content_type = (response.headers.get("Content-Type") or "").lower()
     if content_type.startswith("audio/") or fmt == "pcm":
@@ -164,7 +164,7 @@ def kokoro_speech(text, voice, fmt, base_url, model="kokoro", speed="1", cancell
             urllib.parse.urljoin(f"{base_url}/", download_url.lstrip("/")),
             method="GET",
         )
-        with urllib.request.urlopen(request, timeout=120) as response:
+        with (opener or urllib.request.urlopen)(request, timeout=120) as response:
             return _read_cancellable(response, cancelled)
     audio = parsed.get("audio_base64") or parsed.get("audio")
     if audio:
@@ -172,9 +172,9 @@ def kokoro_speech(text, voice, fmt, base_url, model="kokoro", speed="1", cancell
     raise ValueError("Kokoro response did not include audio bytes.")
 
 
-def kokoro_list_voices(base_url):
+def kokoro_list_voices(base_url, opener=None):
     request = urllib.request.Request(f"{normalized_kokoro_base_url(base_url)}/v1/audio/voices", method="GET")
-    with urllib.request.urlopen(request, timeout=30) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=30) as response:
         payload = json.loads(response.read().decode("utf-8", errors="replace"))
     voices = []
     if isinstance(payload, list):
@@ -191,11 +191,15 @@ def kokoro_list_voices(base_url):
     return sorted({voice for voice in voices if voice})
 
 
-def _transcription_body(filepath, model, language) -> tuple[bytes, str]:
-    """The multipart body every OpenAI-shaped transcription endpoint takes."""
+def _transcription_body(audio, model, language) -> tuple[bytes, str]:
+    """The multipart body every OpenAI-shaped transcription endpoint takes.
+
+    `audio` is a WAV recording, or the path of one.
+    """
 
     boundary = "----NiceAssistantBoundary" + secrets.token_hex(8)
-    audio = Path(filepath).read_bytes()
+    if not isinstance(audio, (bytes, bytearray)):
+        audio = Path(audio).read_bytes()
     parts = []
 
     def add(name, value, filename=None, content_type="text/plain"):
@@ -215,8 +219,8 @@ def _transcription_body(filepath, model, language) -> tuple[bytes, str]:
     return b"".join(parts), boundary
 
 
-def openai_stt(filepath, api_key, language="auto"):
-    body, boundary = _transcription_body(filepath, "whisper-1", language)
+def openai_stt(audio, api_key, language="auto"):
+    body, boundary = _transcription_body(audio, "whisper-1", language)
     request = urllib.request.Request(
         "https://api.openai.com/v1/audio/transcriptions",
         data=body,
@@ -234,7 +238,7 @@ def normalized_stt_base_url(raw_url):
     return str(raw_url or DEFAULT_STT_BASE_URL).strip().rstrip("/")
 
 
-def local_stt(filepath, base_url, model=DEFAULT_STT_MODEL, language="auto"):
+def local_stt(audio, base_url, model=DEFAULT_STT_MODEL, language="auto", opener=None):
     """Transcribe against a Whisper service on this network, not OpenAI's.
 
     The request is the shape OpenAI documents, because that is what the
@@ -247,14 +251,14 @@ def local_stt(filepath, base_url, model=DEFAULT_STT_MODEL, language="auto"):
     be a different kind of thing than this is for.
     """
 
-    body, boundary = _transcription_body(filepath, model, language)
+    body, boundary = _transcription_body(audio, model, language)
     request = urllib.request.Request(
         f"{normalized_stt_base_url(base_url)}/v1/audio/transcriptions",
         data=body,
         headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
         method="POST",
     )
-    with urllib.request.urlopen(request, timeout=120) as response:
+    with (opener or urllib.request.urlopen)(request, timeout=120) as response:
         payload = response.read().decode("utf-8", errors="replace")
     try:
         parsed = json.loads(payload)
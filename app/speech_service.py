@@ -1,20 +1,25 @@
 from __future__ import annotations
 
+import contextlib
 import secrets
 import shutil
-import subprocess
 import time
+from typing import BinaryIO
 
+from app.audio_rotation import AudioRotator
+from app.audio_transcode import PcmAudio, TranscodeFailed, Transcoder
 from app.provider_contracts import ProviderError
 from app.providers import user_safe_provider_error
 from app.persona_voice import parse as parse_voice_preferences, preference as voice_preference
+from app.transcription_streams import TranscriptionStreams
 from app.wyoming_client import (
+    WyomingStream,
     WyomingUnavailable,
     parse_address as parse_wyoming_address,
-    wyoming_transcribe,
+    wyoming_transcribe_audio,
 )
 from app.repositories import UnitOfWork
-from app.service_errors import NotFoundError, RequestError
+from app.service_errors import NotFoundError, RequestError, StorageCapacityError
 from app.speech_clients import (
     STREAMABLE_FORMATS,
     SpeechCancelled,
@@ -28,20 +33,47 @@ from app.speech_clients import (
     openai_speech_stream,
     openai_stt,
 )
-from app.storage import write_artifact_atomic
+from app.storage import ArtifactWriter, write_artifact_atomic
 
 
 FORMATS = {"mp3", "opus", "aac", "flac", "wav", "pcm"}
 
 
 class SpeechService:
-    def __init__(self, session_factory, secret_store, config, logger, provider_url_policy=None, metrics=None):
+    def __init__(
+        self,
+        session_factory,
+        secret_store,
+        config,
+        logger,
+        provider_url_policy=None,
+        metrics=None,
+        transcoder: Transcoder | None = None,
+        opener=None,
+    ):
         self.session_factory = session_factory
         self.secret_store = secret_store
         self.config = config
         self.logger = logger
         self.provider_url_policy = provider_url_policy
         self.metrics = metrics
+        self.opener = opener
+        self.transcoder = transcoder or Transcoder(config.transcode_warm_workers, temp_dir=config.data_dir)
+        self.transcription_streams = TranscriptionStreams()
+        self.audio_rotator = AudioRotator(
+            config.audio_dir, config.archive_dir / "audio", config.audio_hot_limit, self._relocate_audio, logger
+        )
+        self.open_stream = WyomingStream
+
+    def start(self) -> None:
+        self.transcoder.start()
+        self.audio_rotator.start()
+        self.transcription_streams.start()
+
+    def stop(self) -> None:
+        self.audio_rotator.stop()
+        self.transcription_streams.close()
+        self.transcoder.close()
 
     def _uow(self):
         return UnitOfWork(self.session_factory, self.secret_store)
@@ -57,7 +89,7 @@ class SpeechService:
         try:
             if self.provider_url_policy:
                 url = self.provider_url_policy.normalize(url or "http://127.0.0.1:8880", label="Local speech service")
-            result = kokoro_list_voices(url)
+            result = kokoro_list_voices(url, opener=self.opener)
             outcome = "completed"
             return result
         except Exception as exc:
@@ -90,8 +122,9 @@ class SpeechService:
         Returns the id the finished audio will be stored under, its format, and
         an iterator of audio pieces. The id is known before the first byte so a
         caller can name the artifact in a response header and still let the
-        browser start playing; the artifact itself is written only when the last
-        piece has been produced, so an abandoned stream leaves nothing behind.
+        browser start playing; the artifact is written as the pieces pass but
+        appears under its name only when the last one has been produced, so an
+        abandoned stream leaves nothing behind.
         """
 
         plan = self._speech_plan(user_id, values)
@@ -107,27 +140,51 @@ class SpeechService:
     def _streamed_audio(self, user_id: str, plan: dict, audio_id: str, cancelled):
         started = time.monotonic()
         outcome = "failed"
-        collected = []
+        # Each piece goes to disk as it is passed on, so a long reply holds one
+        # piece in memory rather than the whole clip, and storing it at the end
+        # is a rename rather than a write. Keeping the clip for replay comes
+        # second to the listener hearing it: a disk that fails halfway through
+        # stops the file, never the playback.
+        artifact = ArtifactWriter(self._audio_path(plan, audio_id))
+        kept = True
         try:
-            for piece in self._provider_stream(plan, cancelled):
-                collected.append(piece)
-                yield piece
-            outcome = "completed"
-        except SpeechCancelled:
-            outcome = "cancelled"
-            raise
-        except RequestError:
-            raise
-        except Exception as exc:
-            raise self._provider_failure(plan["provider"], exc) from exc
+            try:
+                for piece in self._provider_stream(plan, cancelled):
+                    if kept:
+                        kept = self._kept(artifact, audio_id, artifact.write, piece)
+                    yield piece
+                outcome = "completed"
+            except SpeechCancelled:
+                outcome = "cancelled"
+                raise
+            except RequestError:
+                raise
+            except Exception as exc:
+                raise self._provider_failure(plan["provider"], exc) from exc
+            finally:
+                if self.metrics:
+                    self.metrics.provider(
+                        plan["provider"], "speech_stream", outcome, int((time.monotonic() - started) * 1000)
+                    )
+            if kept:
+                kept = self._kept(artifact, audio_id, artifact.commit)
         finally:
-            if self.metrics:
-                self.metrics.provider(
-                    plan["provider"], "speech_stream", outcome, int((time.monotonic() - started) * 1000)
-                )
-        # Only a stream that finished becomes a file. One the browser walked
-        # away from leaves nothing to store and nothing to rotate for.
-        self._store_audio(user_id, plan, audio_id, b"".join(collected))
+            # Only a stream that finished becomes a file. One the browser walked
+            # away from leaves nothing to store and nothing to rotate for.
+            artifact.discard()
+        if kept:
+            self._record_audio(user_id, plan, audio_id)
+
+    def _kept(self, artifact: ArtifactWriter, audio_id: str, step, *args) -> bool:
+        """Run one step of storing a streamed clip; False once storing has failed."""
+
+        try:
+            step(*args)
+        except StorageCapacityError:
+            artifact.discard()
+            self.logger.warning("tts audio not stored audio_id=%s", audio_id)
+            return False
+        return True
 
     def _provider_stream(self, plan: dict, cancelled):
         if plan["provider"] == "openai":
@@ -152,6 +209,7 @@ class SpeechService:
                 plan["model"],
                 plan["speed"],
                 cancelled,
+                opener=self.opener,
             )
         raise RequestError("Unknown TTS provider", 400)
 
@@ -263,6 +321,7 @@ class SpeechService:
                     plan["model"],
                     plan["speed"],
                     cancelled,
+                    opener=self.opener,
                 )
             else:
                 raise RequestError("Unknown TTS provider", 400)
@@ -279,9 +338,15 @@ class SpeechService:
             if self.metrics:
                 self.metrics.provider(plan["provider"], "speech", outcome, int((time.monotonic() - started) * 1000))
 
+    def _audio_path(self, plan: dict, audio_id: str):
+        return self.config.audio_dir / f"{audio_id}.{plan['format']}"
+
     def _store_audio(self, user_id: str, plan: dict, audio_id: str, audio: bytes) -> dict:
-        target = self.config.audio_dir / f"{audio_id}.{plan['format']}"
-        write_artifact_atomic(target, audio)
+        write_artifact_atomic(self._audio_path(plan, audio_id), audio)
+        return self._record_audio(user_id, plan, audio_id)
+
+    def _record_audio(self, user_id: str, plan: dict, audio_id: str) -> dict:
+        target = self._audio_path(plan, audio_id)
         with self._uow() as uow:
             uow.repo.add_audio(
                 audio_id=audio_id,
@@ -291,10 +356,16 @@ class SpeechService:
                 fmt=plan["format"],
                 local_path=str(target),
             )
-        self._rotate_audio()
+        self.audio_rotator.stored(target)
         return {"audio_id": audio_id, "format": plan["format"]}
 
-    def transcribe(self, user_id: str, filename: str, content: bytes) -> dict:
+    def transcribe(self, user_id: str, filename: str, content: bytes | BinaryIO) -> dict:
+        """Transcribe a recording, given as bytes or as the file it was spooled to.
+
+        A file is read a piece at a time, by ffmpeg and again if the recording
+        is kept, so an upload of any length costs the same memory.
+        """
+
         with self._uow() as uow:
             settings = uow.repo.settings(user_id)
         provider = (settings or {}).get("stt_provider")
@@ -311,25 +382,88 @@ class SpeechService:
             extension = ".mp4"
         elif lowered.endswith(".ogg"):
             extension = ".ogg"
-        raw = self.config.data_dir / f"upload_{secrets.token_hex(6)}{extension}"
-        wav = self.config.data_dir / f"upload_{secrets.token_hex(6)}.wav"
         try:
-            raw.write_bytes(content)
-            completed = subprocess.run(
-                ["ffmpeg", "-y", "-i", str(raw), str(wav)],
-                check=False,
-                capture_output=True,
+            audio = self.transcoder.transcode(content, extension)
+        except TranscodeFailed as exc:
+            self.logger.warning("audio conversion failed error=%s", exc)
+            raise RequestError("Audio conversion failed. Please try again.", 500) from exc
+        result = self._transcribe_with(provider, settings, audio, api_key)
+        if bool(settings["preferences"].get("stt_store_recordings", False)):
+            stored = self.config.stt_recordings_dir / f"{user_id}_{secrets.token_hex(6)}{extension}"
+            if isinstance(content, (bytes, bytearray)):
+                stored.write_bytes(content)
+            else:
+                content.seek(0)
+                with stored.open("wb") as handle:
+                    shutil.copyfileobj(content, handle)
+        return {"text": result.get("text", ""), "language": result.get("language")}
+
+    def open_transcription(self, user_id: str, values: dict) -> dict:
+        """Connect to the transcription service before there is anything to send.
+
+        Only Wyoming can take audio as it is spoken; the HTTP services want a
+        finished file, so asking for a stream with one of those selected is a
+        settings problem and says where to send the recording instead.
+        """
+
+        with self._uow() as uow:
+            settings = uow.repo.settings(user_id)
+        provider = (settings or {}).get("stt_provider")
+        if not settings or provider == "disabled":
+            raise RequestError("STT disabled", 400)
+        if provider != "local" or self._local_backend(settings) != "wyoming":
+            raise RequestError(
+                "Streaming transcription needs a Wyoming transcription service. "
+                "Send the finished recording to /speech/transcriptions instead.",
+                400,
             )
-            if completed.returncode != 0 or not wav.exists():
-                raise RequestError("Audio conversion failed. Please try again.", 500)
-            result = self._transcribe_with(provider, settings, str(wav), api_key)
-            if bool(settings["preferences"].get("stt_store_recordings", False)):
-                stored = self.config.stt_recordings_dir / f"{user_id}_{secrets.token_hex(6)}{extension}"
-                shutil.copy2(raw, stored)
-            return {"text": result.get("text", ""), "language": result.get("language")}
+        audio = {"rate": values["rate"], "width": values.get("width") or 2, "channels": values.get("channels") or 1}
+        address = self._wyoming_address(settings)
+        language = settings["preferences"].get("stt_language") or "auto"
+        try:
+            stream = self.open_stream(address, audio, language)
+        except Exception as exc:
+            if self.metrics:
+                self.metrics.provider(provider, "stt", "error", 0)
+            raise self._transcription_failure(provider, exc) from exc
+        return {"id": self.transcription_streams.add(user_id, stream), **audio}
+
+    def transcription_audio(self, user_id: str, stream_id: str, frames: bytes) -> dict:
+        """Forward one piece of audio and report what has been recognised so far."""
+
+        stream = self.transcription_streams.use(user_id, stream_id)
+        frame = stream.audio["width"] * stream.audio["channels"]
+        if len(frames) % frame:
+            raise RequestError(f"Audio must arrive in whole frames of {frame} bytes.", 400)
+        try:
+            stream.send(frames)
+        except Exception as exc:
+            # The connection is gone either way; keeping the id would only
+            # have the next piece fail the same way.
+            with contextlib.suppress(NotFoundError):
+                self.cancel_transcription(user_id, stream_id)
+            raise self._transcription_failure("local", exc) from exc
+        return {"partial": stream.partial}
+
+    def finish_transcription(self, user_id: str, stream_id: str) -> dict:
+        stream = self.transcription_streams.remove(user_id, stream_id)
+        # Timed from the end of the audio rather than from the connection:
+        # somebody speaking is not the service being slow, and the wait after
+        # they stop is the one this exists to shorten.
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            result = stream.finish()
+            outcome = "ok"
+        except Exception as exc:
+            raise self._transcription_failure("local", exc) from exc
         finally:
-            raw.unlink(missing_ok=True)
-            wav.unlink(missing_ok=True)
+            if self.metrics:
+                self.metrics.provider("local", "stt", outcome, int((time.monotonic() - started) * 1000))
+        return {"text": result.get("text", ""), "language": result.get("language")}
+
+    def cancel_transcription(self, user_id: str, stream_id: str) -> None:
+        self.transcription_streams.remove(user_id, stream_id).close()
 
     def _transcription_target(self, settings: dict) -> tuple[str, str]:
         """The address and model of the Whisper service on this network."""
@@ -363,7 +497,7 @@ class SpeechService:
             raise RequestError(str(exc), 400) from exc
         return f"{host}:{port}"
 
-    def _transcribe_with(self, provider: str, settings: dict, wav: str, api_key) -> dict:
+    def _transcribe_with(self, provider: str, settings: dict, audio: PcmAudio, api_key) -> dict:
         """Hand the audio to whichever service is selected, cloud or local.
 
         The two paths differ only in where the request goes. Either failure is
@@ -372,18 +506,16 @@ class SpeechService:
         """
 
         language = settings["preferences"].get("stt_language") or "auto"
-        label = "local transcription service" if provider == "local" else "OpenAI"
-
         started = time.monotonic()
         outcome = "error"
         try:
             if provider == "local" and self._local_backend(settings) == "wyoming":
-                result = wyoming_transcribe(self._wyoming_address(settings), wav, language)
+                result = wyoming_transcribe_audio(self._wyoming_address(settings), audio.frames, audio.format, language)
             elif provider == "local":
                 base_url, model = self._transcription_target(settings)
-                result = local_stt(wav, base_url, model, language)
+                result = local_stt(audio.wav(), base_url, model, language, opener=self.opener)
             else:
-                result = openai_stt(wav, api_key, language)
+                result = openai_stt(audio.wav(), api_key, language)
             outcome = "ok"
             return result
         except RequestError:
@@ -391,51 +523,36 @@ class SpeechService:
             # send somebody looking at a service that was never contacted.
             raise
         except Exception as exc:
-            self.logger.warning("stt provider failed provider=%s error=%s", provider, exc.__class__.__name__)
-            raise ProviderError(
-                provider=provider,
-                code="transcription_failed",
-                # Wyoming failures are already sentences somebody can act on -
-                # wrong kind of service, no answer in time - and they are
-                # authored here rather than echoed from a response body, so
-                # there is nothing in them to leak. Every other failure goes
-                # through the generic phrasing that assumes there might be.
-                user_message=(
-                    f"STT failed in the {label}. {exc}"
-                    if isinstance(exc, WyomingUnavailable)
-                    else user_safe_provider_error("STT", label, exc)
-                ),
-                retryable=True,
-            ) from exc
+            raise self._transcription_failure(provider, exc) from exc
         finally:
             if self.metrics:
                 self.metrics.provider(provider, "stt", outcome, int((time.monotonic() - started) * 1000))
 
+    def _transcription_failure(self, provider: str, exc: Exception) -> ProviderError:
+        label = "local transcription service" if provider == "local" else "OpenAI"
+        self.logger.warning("stt provider failed provider=%s error=%s", provider, exc.__class__.__name__)
+        return ProviderError(
+            provider=provider,
+            code="transcription_failed",
+            # Wyoming failures are already sentences somebody can act on -
+            # wrong kind of service, no answer in time - and they are
+            # authored here rather than echoed from a response body, so
+            # there is nothing in them to leak. Every other failure goes
+            # through the generic phrasing that assumes there might be.
+            user_message=(
+                f"STT failed in the {label}. {exc}"
+                if isinstance(exc, WyomingUnavailable)
+                else user_safe_provider_error("STT", label, exc)
+            ),
+            retryable=True,
+        )
+
     @staticmethod
     def _local_backend(settings: dict) -> str:
         return str(settings["preferences"].get("stt_local_backend") or "openai_api").strip().lower()
 
-    def _rotate_audio(self) -> None:
-        files = sorted(
-            (path for path in self.config.audio_dir.glob("*") if path.is_file()),
-            key=lambda path: path.stat().st_mtime,
-        )
-        archive = self.config.archive_dir / "audio"
-        archive.mkdir(parents=True, exist_ok=True)
-        while len(files) > self.config.audio_hot_limit:
-            source = files.pop(0)
-            target = archive / source.name
-            try:
-                shutil.move(str(source), target)
-                with self._uow() as uow:
-                    row = uow.repo.audio_by_path(str(source))
-                    if row:
-                        row.local_path = str(target)
-            except Exception as exc:  # noqa: BLE001 - cache rotation cannot invalidate completed synthesis
-                if target.exists() and not source.exists():
-                    try:
-                        shutil.move(str(target), source)
-                    except OSError:
-                        pass
-                self.logger.warning("audio archive rotation failed error=%s", exc.__class__.__name__)
-                break
+    def _relocate_audio(self, moves: list[tuple[str, str]]) -> None:
+        targets = dict(moves)
+        with self._uow() as uow:
+            for row in uow.repo.audio_by_paths(list(targets)):
+                row.local_path = targets[row.local_path]
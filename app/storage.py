@@ -15,31 +15,74 @@ from app.service_errors import InvalidArtifactError, StorageCapacityError
 BACKUP_NAME_RE = r"^nice-assistant-snapshot-\d{8}_\d{6}-[a-f0-9]{8}\.zip$"
 
 
+class ArtifactWriter:
+    """An artifact written a piece at a time that appears only when complete.
+
+    Pieces go to a hidden temporary file beside the target, so memory holds
+    one piece at a time however long the artifact is. `commit` flushes it to
+    disk and renames it into place; `discard` removes whatever was written and
+    does nothing once committed, so it belongs in a `finally`.
+    """
+
+    def __init__(self, path: Path, *, mode: int | None = None):
+        if mode is not None and not 0 <= mode <= 0o777:
+            raise ValueError("artifact mode must contain only file permission bits")
+        self.path = path
+        self.mode = mode
+        self._handle = None
+        self._temporary: Path | None = None
+        self._written = 0
+
+    def write(self, piece: bytes) -> None:
+        try:
+            if self._handle is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = tempfile.NamedTemporaryFile(
+                    prefix=f".{self.path.name}.", suffix=".tmp", dir=self.path.parent, delete=False
+                )
+                self._temporary = Path(self._handle.name)
+            self._handle.write(piece)
+        except OSError as exc:
+            self.discard()
+            raise StorageCapacityError() from exc
+        self._written += len(piece)
+
+    def commit(self) -> None:
+        if not self._written:
+            self.discard()
+            raise InvalidArtifactError()
+        try:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+            if self.mode is not None:
+                os.chmod(self._temporary, self.mode)
+            os.replace(self._temporary, self.path)
+        except OSError as exc:
+            self.discard()
+            raise StorageCapacityError() from exc
+        self._handle = self._temporary = None
+
+    def discard(self) -> None:
+        handle, temporary, self._handle, self._temporary = self._handle, self._temporary, None, None
+        try:
+            if handle is not None:
+                handle.close()
+            if temporary is not None:
+                temporary.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
 def write_artifact_atomic(path: Path, content: bytes, *, mode: int | None = None) -> None:
     if not content:
         raise InvalidArtifactError()
-    if mode is not None and not 0 <= mode <= 0o777:
-        raise ValueError("artifact mode must contain only file permission bits")
-    temporary = None
+    artifact = ArtifactWriter(path, mode=mode)
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with tempfile.NamedTemporaryFile(
-            prefix=f".{path.name}.", suffix=".tmp", dir=path.parent, delete=False
-        ) as handle:
-            temporary = Path(handle.name)
-            handle.write(content)
-            handle.flush()
-            os.fsync(handle.fileno())
-        if mode is not None:
-            os.chmod(temporary, mode)
-        os.replace(temporary, path)
-    except OSError as exc:
-        if temporary:
-            try:
-                temporary.unlink(missing_ok=True)
-            except OSError:
-                pass
-        raise StorageCapacityError() from exc
+        artifact.write(content)
+        artifact.commit()
+    finally:
+        artifact.discard()
 
 
 def read_json(path: Path, default):
@@ -0,0 +1,124 @@
+"""Transcriptions that are still being spoken.
+
+A streamed transcription lives across several requests: one opens it, each
+piece of audio arrives in its own request, and the last one asks for the
+transcript. Between them the open connection to the transcription service is
+held here, under an id only its owner can use.
+
+Nothing guarantees the last request comes. A tab closed mid-sentence would
+otherwise hold a socket to the transcription service until the process
+restarts, so a background sweep closes any stream that has heard nothing for
+a while, whether or not anybody else is transcribing, and each person can
+only hold a few at once.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import secrets
+import threading
+import time
+
+from app.service_errors import ConflictError, NotFoundError
+
+
+IDLE_SECONDS = 30
+SWEEP_SECONDS = 5
+STREAMS_PER_USER = 2
+
+
+@dataclass
+class _Open:
+    user_id: str
+    stream: object
+    used: float
+
+
+class TranscriptionStreams:
+    def __init__(
+        self,
+        idle_seconds: float = IDLE_SECONDS,
+        per_user: int = STREAMS_PER_USER,
+        clock=time.monotonic,
+        sweep_seconds: float = SWEEP_SECONDS,
+    ):
+        self.idle_seconds = idle_seconds
+        self.per_user = per_user
+        self.clock = clock
+        self.sweep_seconds = sweep_seconds
+        self._open: dict[str, _Open] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sweep, name="transcription-expiry", daemon=True)
+        self._thread.start()
+
+    def add(self, user_id: str, stream) -> str:
+        with self._lock:
+            expired = self._expire_locked()
+            if sum(1 for item in self._open.values() if item.user_id == user_id) >= self.per_user:
+                full = True
+            else:
+                full = False
+                stream_id = secrets.token_urlsafe(16)
+                self._open[stream_id] = _Open(user_id, stream, self.clock())
+        self._close(expired)
+        if full:
+            stream.close()
+            raise ConflictError("Too many transcriptions are already open. Finish one before starting another.")
+        return stream_id
+
+    def use(self, user_id: str, stream_id: str):
+        with self._lock:
+            expired = self._expire_locked()
+            item = self._open.get(stream_id)
+            if item and item.user_id == user_id:
+                item.used = self.clock()
+        self._close(expired)
+        # Somebody else's stream is not found, rather than forbidden, so an id
+        # says nothing about whether it exists.
+        if not item or item.user_id != user_id:
+            raise NotFoundError("Transcription not found")
+        return item.stream
+
+    def remove(self, user_id: str, stream_id: str):
+        with self._lock:
+            item = self._open.get(stream_id)
+            if not item or item.user_id != user_id:
+                raise NotFoundError("Transcription not found")
+            del self._open[stream_id]
+        return item.stream
+
+    def expire(self) -> int:
+        """Close every stream that has been quiet too long. Returns how many."""
+
+        with self._lock:
+            expired = self._expire_locked()
+        self._close(expired)
+        return len(expired)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        with self._lock:
+            remaining, self._open = list(self._open.values()), {}
+        self._close(remaining)
+
+    def _sweep(self) -> None:
+        while not self._stop.wait(self.sweep_seconds):
+            self.expire()
+
+    def _expire_locked(self) -> list[_Open]:
+        cutoff = self.clock() - self.idle_seconds
+        expired = [stream_id for stream_id, item in self._open.items() if item.used < cutoff]
+        return [self._open.pop(stream_id) for stream_id in expired]
+
+    @staticmethod
+    def _close(items) -> None:
+        for item in items:
+            item.stream.close()
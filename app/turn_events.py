@@ -1,13 +1,21 @@
 from __future__ import annotations
 
-from collections import deque
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
+import heapq
+import itertools
 import json
+import logging
 import threading
 import time
 
 
 TERMINAL_EVENTS = {"turn.completed", "turn.failed", "turn.cancelled"}
+HEARTBEAT_SECONDS = 15
+
+
+def _encode(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
 
 
 @dataclass(frozen=True)
@@ -15,12 +23,159 @@ class TurnEvent:
     sequence: int
     event: str
     data: dict
+    # `data` as sent, serialized once when the event is published and reused for
+    # retention accounting and for every subscriber's frame.
+    payload: bytes = field(default=b"", repr=False, compare=False)
+
+    def frame(self) -> bytes:
+        """The event as one server-sent-events frame."""
+
+        payload = self.payload or _encode(self.data)
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self.sequence, self.event.encode("utf-8"), payload)
+
+
+@dataclass(frozen=True)
+class DeltaCoalescing:
+    """How much reply text to gather into one `assistant.delta`.
+
+    A provider chunk is often a few characters, and each event costs a lock, an
+    encode and an SSE frame. Zero bytes publishes every chunk as it comes.
+    """
+
+    max_bytes: int = 64
+    max_seconds: float = 0.03
+
+
+class DeltaCoalescer:
+    """Gathers streamed text and hands it on in fewer, larger pieces.
+
+    The first piece goes out at once, so coalescing never delays the first
+    token. After that, text is held until it reaches `max_bytes` or the oldest
+    held text is `max_seconds` old. The age is checked as each chunk arrives,
+    and a model that pauses mid-reply has its held text published by the
+    shared `_DeadlineTimer` when the window closes. `close` sends whatever is
+    left.
+    """
+
+    def __init__(self, publish, policy: DeltaCoalescing, clock=time.monotonic):
+        self._publish = publish
+        self._policy = policy
+        self._clock = clock
+        self._held: list[str] = []
+        self._held_bytes = 0
+        self._held_since: float | None = None
+        self._published = False
+        # Publishing happens under this lock too, so pieces from the stream and
+        # from the timer go out in the order they were said.
+        self._lock = threading.Lock()
+        self._closed = False
+        self._waiting = False
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            now = self._clock()
+            if self._held_since is None:
+                self._held_since = now
+            self._held.append(text)
+            self._held_bytes += len(text.encode("utf-8"))
+            if (
+                not self._published
+                or self._held_bytes >= self._policy.max_bytes
+                or now - self._held_since >= self._policy.max_seconds
+            ):
+                self._flush_locked()
+            elif not self._waiting and not self._closed:
+                self._waiting = True
+                DEADLINES.schedule(self._held_since + self._policy.max_seconds - now, self)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._closed = True
+
+    def _flush_locked(self) -> None:
+        if not self._held:
+            return
+        text = "".join(self._held)
+        self._held.clear()
+        self._held_bytes = 0
+        self._held_since = None
+        self._published = True
+        self._publish(text)
+
+    def _expire(self) -> None:
+        with self._lock:
+            self._waiting = False
+            if self._closed or self._held_since is None:
+                return
+            remaining = self._held_since + self._policy.max_seconds - self._clock()
+            if remaining > 0:
+                self._waiting = True
+                DEADLINES.schedule(remaining, self)
+                return
+            self._flush_locked()
+
+
+class _DeadlineTimer:
+    """One thread that closes every coalescer's window on time.
+
+    Replies stream concurrently, and a window lasts a few dozen milliseconds,
+    so a thread per reply would be started and stopped on the hottest path in
+    the application. Deadlines from all of them wait in one heap instead.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._due: list[tuple[float, int, DeltaCoalescer]] = []
+        self._order = itertools.count()
+        self._changed = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, delay: float, coalescer: DeltaCoalescer) -> None:
+        with self._changed:
+            heapq.heappush(self._due, (self._clock() + max(0.0, delay), next(self._order), coalescer))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="delta-deadlines", daemon=True)
+                self._thread.start()
+            self._changed.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._changed:
+                if not self._due:
+                    self._changed.wait()
+                    continue
+                remaining = self._due[0][0] - self._clock()
+                if remaining > 0:
+                    self._changed.wait(remaining)
+                    continue
+                _due, _order, coalescer = heapq.heappop(self._due)
+            # Outside the timer's lock: a coalescer takes its own lock to
+            # publish and may schedule again.
+            try:
+                coalescer._expire()
+            except Exception:
+                # One reply failing to publish must not stop every other
+                # reply's window from closing.
+                logging.getLogger(__name__).exception("publishing held reply text failed")
+
+
+DEADLINES = _DeadlineTimer()
 
 
 class _TurnStream:
     def __init__(self, max_events: int, max_bytes: int):
         self.condition = threading.Condition()
-        self.events: deque[TurnEvent] = deque()
+        # Retained events are `events[head:]`. Sequences are contiguous, so the
+        # event after a cursor is found by arithmetic rather than by a scan.
+        self.events: list[TurnEvent] = []
+        self.head = 0
         self.max_events = max_events
         self.max_bytes = max_bytes
         self.bytes = 0
@@ -29,22 +184,44 @@ class _TurnStream:
         self.accumulated_text = ""
         # Sequence of the last delta already folded into accumulated_text.
         self.text_sequence = 0
+        # One-shot callbacks that wake async subscribers on their own loops.
+        self.async_waiters: set = set()
+
+    def wake_async_locked(self) -> None:
+        waiters, self.async_waiters = self.async_waiters, set()
+        for wake in waiters:
+            wake()
+
+    def since_locked(self, cursor: int) -> list[TurnEvent]:
+        """Retained events with a sequence after `cursor`."""
+
+        if self.head >= len(self.events):
+            return []
+        first = self.events[self.head].sequence
+        return self.events[self.head + max(0, cursor + 1 - first) :]
 
     def publish(self, event: str, data: dict) -> TurnEvent:
+        payload = _encode(data)
         with self.condition:
-            item = TurnEvent(self.next_sequence, event, data)
+            item = TurnEvent(self.next_sequence, event, data, payload)
             self.next_sequence += 1
             self.events.append(item)
             if event == "assistant.delta":
                 self.accumulated_text += str(data.get("text") or "")
                 self.text_sequence = item.sequence
-            self.bytes += len(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"))
-            while len(self.events) > self.max_events or self.bytes > self.max_bytes:
-                removed = self.events.popleft()
-                self.bytes -= len(json.dumps(removed.data, separators=(",", ":"), default=str).encode("utf-8"))
+            self.bytes += len(payload)
+            while len(self.events) - self.head > self.max_events or self.bytes > self.max_bytes:
+                self.bytes -= len(self.events[self.head].payload)
+                self.head += 1
+            # Drop evicted events once they are most of the list, so trimming the
+            # front costs amortized constant time per event.
+            if self.head * 2 > len(self.events):
+                del self.events[: self.head]
+                self.head = 0
             if event in TERMINAL_EVENTS:
                 self.terminal_at = time.monotonic()
             self.condition.notify_all()
+            self.wake_async_locked()
             return item
 
 
@@ -70,29 +247,20 @@ class TurnEventBroker:
     def subscribe(self, turn_id: str, snapshot: dict, last_event_id: int | None = None):
         stream = self._stream(turn_id)
         cursor = max(0, int(last_event_id or 0))
-        # A subscriber applies the snapshot's accumulated_text as authoritative, so any
-        # delta already folded into it would be rendered a second time if replayed. State
-        # events carry no text and are still delivered, and this also covers deltas that
-        # bounded retention has already evicted.
-        text_cursor = max(0, int(snapshot.get("event_cursor") or 0))
-
-        def covered(event: TurnEvent) -> bool:
-            return event.event == "assistant.delta" and event.sequence <= text_cursor
+        covered = self._text_covered(snapshot)
 
         yield TurnEvent(0, "turn.snapshot", snapshot)
-        with stream.condition:
-            replay_available = any(event.sequence > cursor and not covered(event) for event in stream.events)
-        if snapshot.get("status") in {"completed", "failed", "cancelled"} and not replay_available:
+        if not self._replay_needed(stream, snapshot, cursor, covered):
             return
         while not self._stopped:
             heartbeat = False
             with stream.condition:
-                available = [event for event in stream.events if event.sequence > cursor and not covered(event)]
+                available = self._available_locked(stream, cursor, covered)
                 if not available:
                     if stream.terminal_at is not None:
                         return
-                    stream.condition.wait(timeout=15)
-                    available = [event for event in stream.events if event.sequence > cursor and not covered(event)]
+                    stream.condition.wait(timeout=HEARTBEAT_SECONDS)
+                    available = self._available_locked(stream, cursor, covered)
                     if not available:
                         heartbeat = True
             if heartbeat:
@@ -104,6 +272,82 @@ class TurnEventBroker:
                 if event.event in TERMINAL_EVENTS:
                     return
 
+    async def subscribe_async(
+        self,
+        turn_id: str,
+        snapshot: dict,
+        last_event_id: int | None = None,
+        *,
+        heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    ):
+        """`subscribe` for an event loop. An idle subscriber holds no thread.
+
+        A subscriber with nothing to send leaves a one-shot callback on the
+        stream, and the publishing worker wakes it through its own loop.
+        """
+
+        stream = self._stream(turn_id)
+        cursor = max(0, int(last_event_id or 0))
+        covered = self._text_covered(snapshot)
+        loop = asyncio.get_running_loop()
+
+        yield TurnEvent(0, "turn.snapshot", snapshot)
+        if not self._replay_needed(stream, snapshot, cursor, covered):
+            return
+        while not self._stopped:
+            changed = asyncio.Event()
+
+            def wake(changed=changed):
+                try:
+                    loop.call_soon_threadsafe(changed.set)
+                except RuntimeError:
+                    # The subscriber's loop closed before it unsubscribed.
+                    pass
+
+            with stream.condition:
+                available = self._available_locked(stream, cursor, covered)
+                if not available:
+                    if stream.terminal_at is not None:
+                        return
+                    stream.async_waiters.add(wake)
+            if not available:
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                finally:
+                    with stream.condition:
+                        stream.async_waiters.discard(wake)
+                continue
+            for event in available:
+                cursor = event.sequence
+                yield event
+                if event.event in TERMINAL_EVENTS:
+                    return
+
+    @staticmethod
+    def _text_covered(snapshot: dict):
+        # A subscriber applies the snapshot's accumulated_text as authoritative, so any
+        # delta already folded into it would be rendered a second time if replayed. State
+        # events carry no text and are still delivered, and this also covers deltas that
+        # bounded retention has already evicted.
+        text_cursor = max(0, int(snapshot.get("event_cursor") or 0))
+
+        def covered(event: TurnEvent) -> bool:
+            return event.event == "assistant.delta" and event.sequence <= text_cursor
+
+        return covered
+
+    @staticmethod
+    def _available_locked(stream: _TurnStream, cursor: int, covered) -> list[TurnEvent]:
+        return [event for event in stream.since_locked(cursor) if not covered(event)]
+
+    def _replay_needed(self, stream: _TurnStream, snapshot: dict, cursor: int, covered) -> bool:
+        if snapshot.get("status") not in {"completed", "failed", "cancelled"}:
+            return True
+        with stream.condition:
+            return any(not covered(event) for event in stream.since_locked(cursor))
+
     def stop(self) -> None:
         self._stopped = True
         with self._lock:
@@ -111,6 +355,7 @@ class TurnEventBroker:
         for stream in streams:
             with stream.condition:
                 stream.condition.notify_all()
+                stream.wake_async_locked()
 
     def accumulated_text(self, turn_id: str) -> str:
         stream = self._stream(turn_id)
@@ -13,10 +13,11 @@ ones that were here before, moved rather than rewritten.
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+import time
 
 from app.chat import parse_model_options
-from app.job_service import JobExecution
+from app.job_service import OLLAMA_POOL, JobExecution, followup_ordering_key
 from app.media_scene import EMPTY_SCENE
 from app.persona_output import PERSONA_OUTPUT_REMOVED_FALLBACK, PersonaOutputStreamFilter
 from app.provider_contracts import ChatRequest, ProviderError
@@ -31,6 +32,7 @@ from app.task_contracts import (
     is_explicit_text_only_request,
     is_high_confidence_media_action_request,
 )
+from app.turn_events import DeltaCoalescer
 
 
 MEDIA_CLAIM_INSTRUCTION = (
@@ -79,6 +81,30 @@ class TurnContext:
     lore_entries: list = field(default_factory=list)
 
 
+@dataclass
+class TurnPhases:
+    """How long each part of one turn took, in milliseconds.
+
+    Measured by the pipeline as the turn runs and stored on the turn row, so a
+    slow reply can be attributed to a phase rather than guessed at. A phase
+    the turn never reached, or a provider that does not say when it
+    connected, leaves its value unset.
+    """
+
+    context_plan_ms: int | None = None
+    provider_connect_ms: int | None = None
+    first_token_ms: int | None = None
+    streaming_ms: int | None = None
+    commit_ms: int | None = None
+
+    def measured(self) -> dict[str, int]:
+        return {item.name: getattr(self, item.name) for item in fields(self) if getattr(self, item.name) is not None}
+
+
+def _elapsed_ms(started: float, ended: float) -> int:
+    return max(0, int((ended - started) * 1000))
+
+
 class TurnPipeline:
     """Generation and follow-ups for one turn."""
 
@@ -91,7 +117,12 @@ class TurnPipeline:
         self.memory = service.memory
         self.jobs = service.jobs
         self.broker = service.broker
+        self.delta_coalescing = service.delta_coalescing
         self.generation_timeout_seconds = service.generation_timeout_seconds
+        self.metrics = service.metrics
+        self.clock = time.monotonic
+        self.phases = TurnPhases()
+        self._commit_started: float | None = None
 
     # -- generating the reply ---------------------------------------------
 
@@ -120,6 +151,7 @@ class TurnPipeline:
             allow_images=ctx.allow_persona_image_sends,
             allow_edits=True,
         )
+        planning_started = self.clock()
         plan = self.context.plan(
             turn_id=ctx.turn_id,
             user_id=ctx.user_id,
@@ -140,6 +172,7 @@ class TurnPipeline:
             model_settings=parse_model_options(ctx.model_settings),
             cancellation=token,
         )
+        self.phases.context_plan_ms = _elapsed_ms(planning_started, self.clock())
         raw_reply, actual_prompt_tokens, finish_reason = self._stream(provider, plan, token)
         reply, media_claim_guarded = guard_premature_media_completion_claim(
             ctx.text,
@@ -179,35 +212,54 @@ class TurnPipeline:
         chunks: list[str] = []
         actual_prompt_tokens = None
         finish_reason = None
+        first_token_at = None
+        requested = self.clock()
+
+        def connected():
+            self.phases.provider_connect_ms = _elapsed_ms(requested, self.clock())
+
         request = ChatRequest(
             model=ctx.model,
             messages=plan.messages,
             options=plan.options,
             timeout_seconds=self.generation_timeout_seconds,
+            on_connected=connected,
         )
-        for delta in provider.stream(request, token):
-            if delta.tool_calls:
-                raise ProviderError(
-                    provider=ctx.provider_name,
-                    code="persona_tool_call_disallowed",
-                    user_message="Persona models are not permitted to execute platform capabilities.",
-                )
-            if delta.metadata.get("prompt_eval_count") is not None:
-                actual_prompt_tokens = delta.metadata.get("prompt_eval_count")
-            if delta.finish_reason:
-                finish_reason = delta.finish_reason
-            if not delta.text:
-                continue
-            sanitized = output_filter.feed(delta.text)
-            if sanitized.text:
-                chunks.append(sanitized.text)
+        # Provider chunks are often a few characters; subscribers get them
+        # gathered into fewer events. Whatever is held when the stream ends or
+        # fails is still published, so a failed turn shows what it said.
+        deltas = DeltaCoalescer(self._publish, self.delta_coalescing)
+        try:
+            for delta in provider.stream(request, token):
+                if delta.tool_calls:
+                    raise ProviderError(
+                        provider=ctx.provider_name,
+                        code="persona_tool_call_disallowed",
+                        user_message="Persona models are not permitted to execute platform capabilities.",
+                    )
+                if delta.metadata.get("prompt_eval_count") is not None:
+                    actual_prompt_tokens = delta.metadata.get("prompt_eval_count")
+                if delta.finish_reason:
+                    finish_reason = delta.finish_reason
+                if not delta.text:
+                    continue
+                if first_token_at is None:
+                    first_token_at = self.clock()
+                    self.phases.first_token_ms = _elapsed_ms(requested, first_token_at)
+                sanitized = output_filter.feed(delta.text)
+                if sanitized.text:
+                    chunks.append(sanitized.text)
+                    if not guard_media_claims:
+                        deltas.feed(sanitized.text)
+            sanitized_tail = output_filter.finish()
+            if sanitized_tail.text:
+                chunks.append(sanitized_tail.text)
                 if not guard_media_claims:
-                    self._publish(sanitized.text)
-        sanitized_tail = output_filter.finish()
-        if sanitized_tail.text:
-            chunks.append(sanitized_tail.text)
-            if not guard_media_claims:
-                self._publish(sanitized_tail.text)
+                    deltas.feed(sanitized_tail.text)
+        finally:
+            deltas.close()
+        if first_token_at is not None:
+            self.phases.streaming_ms = _elapsed_ms(first_token_at, self.clock())
         raw_reply = "".join(chunks)
         if output_filter.protected_content_removed and not raw_reply.strip():
             raw_reply = PERSONA_OUTPUT_REMOVED_FALLBACK
@@ -219,10 +271,14 @@ class TurnPipeline:
 
     def on_generated(self, repo, result) -> dict:
         ctx = self.ctx
+        self._commit_started = self.clock()
         reply = str((result or {}).get("text") or "")
         assistant = repo.add_message(ctx.chat_id, "assistant", reply)
         durable_turn = repo.turn_by_id(ctx.turn_id)
         durable_turn.assistant_message_id = assistant.id
+        # Written with the reply, so the completed turn already carries them.
+        for name, value in self.phases.measured().items():
+            setattr(durable_turn, name, value)
         durable_chat = repo.chat(ctx.user_id, ctx.chat_id)
         durable_chat.updated_at = now_ts()
         output = dict(result or {})
@@ -245,6 +301,7 @@ class TurnPipeline:
                 repo,
                 user_id=ctx.user_id,
                 chat_id=ctx.chat_id,
+                turn_id=ctx.turn_id,
             )
         return output
 
@@ -255,10 +312,13 @@ class TurnPipeline:
             turn_id=None,
             kind=kind,
             progress=progress,
+            source_turn_id=self.ctx.turn_id,
         ).id
 
     def after_generated(self, result) -> None:
         ctx = self.ctx
+        if self._commit_started is not None:
+            self.phases.commit_ms = _elapsed_ms(self._commit_started, self.clock())
         values = result or {}
         self._submit_followup(
             values.get("title_job_id"),
@@ -266,6 +326,8 @@ class TurnPipeline:
             JobExecution(execute=self.run_title, on_success=self.on_title),
             "Title follow-up could not start.",
         )
+        # Planning decides whether the picture the user asked for is made, so
+        # it waits with the turns rather than in the background lane.
         self._submit_followup(
             values.get("capability_planning_job_id"),
             "task:capability_planning",
@@ -275,6 +337,7 @@ class TurnPipeline:
                 after_success=self.after_planning,
             ),
             "Capability planning could not start.",
+            queue_lane="interactive",
         )
         extraction_job_id = values.get("memory_extraction_job_id")
         if extraction_job_id:
@@ -288,8 +351,24 @@ class TurnPipeline:
                 workspace_id=ctx.workspace_id,
                 persona_id=ctx.persona_id,
             )
-
-    def _submit_followup(self, job_id, model_key: str, execution: JobExecution, failure_message: str) -> None:
+        # Recorded after the follow-ups are on their way, which matter more.
+        self._record_phases()
+
+    def _record_phases(self) -> None:
+        if self.metrics:
+            for name, value in self.phases.measured().items():
+                self.metrics.turn_phase(name.removesuffix("_ms"), value)
+        if self.phases.commit_ms is not None:
+            self.context.record_commit_time(self.ctx.turn_id, self.phases.commit_ms)
+
+    def _submit_followup(
+        self,
+        job_id,
+        model_key: str,
+        execution: JobExecution,
+        failure_message: str,
+        queue_lane: str | None = None,
+    ) -> None:
         if not job_id:
             return
         try:
@@ -301,7 +380,13 @@ class TurnPipeline:
                 turn_id=None,
                 latency_class="standard",
                 model_key=model_key,
-                ordering_key=f"chat:{self.ctx.chat_id}",
+                ordering_key=(
+                    f"chat:{self.ctx.chat_id}"
+                    if queue_lane == "interactive"
+                    else followup_ordering_key(self.ctx.chat_id)
+                ),
+                provider_pool=OLLAMA_POOL,
+                queue_lane=queue_lane,
                 execution=execution,
             )
         except Exception:
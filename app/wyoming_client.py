@@ -15,6 +15,7 @@ from __future__ import annotations
 
 import json
 import socket
+import threading
 import wave
 
 # One event's JSON. Real ones are a few hundred bytes; this only exists so a
@@ -61,37 +62,61 @@ def _send(sock: socket.socket, kind: str, data=None, payload: bytes = b"") -> No
     sock.sendall((json.dumps(header) + "\n").encode() + payload)
 
 
-def _read_event(sock: socket.socket) -> tuple[str, dict]:
-    """One event, header and any out-of-band data block, as a type and a dict."""
+class _EventReader:
+    """Events off one socket, keeping whatever arrived past the end of the last.
+
+    A server that is still being fed audio can send several events in one
+    packet, so bytes read beyond one event belong to the next rather than being
+    dropped. Nothing is consumed until a whole event is buffered, which lets a
+    read that timed out be retried without losing its place.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = b""
 
-    buffer = b""
-    while b"\n" not in buffer:
-        piece = sock.recv(4096)
+    def _fill(self) -> None:
+        piece = self.sock.recv(4096)
         if not piece:
             raise WyomingUnavailable("The transcription service closed the connection.")
-        buffer += piece
-        if len(buffer) > MAX_EVENT_BYTES:
+        self.buffer += piece
+
+    def read(self) -> tuple[str, dict]:
+        while b"\n" not in self.buffer:
+            if len(self.buffer) > MAX_EVENT_BYTES:
+                raise WyomingUnavailable("The transcription service sent an oversized event.")
+            self._fill()
+        line = self.buffer.split(b"\n", 1)[0]
+        if len(line) > MAX_EVENT_BYTES:
             raise WyomingUnavailable("The transcription service sent an oversized event.")
-    line, rest = buffer.split(b"\n", 1)
-    try:
-        header = json.loads(line)
-    except ValueError as exc:
-        raise WyomingUnavailable("The transcription service sent something that is not Wyoming.") from exc
-    data = header.get("data") if isinstance(header.get("data"), dict) else {}
-    length = int(header.get("data_length") or 0)
-    if length > MAX_EVENT_BYTES:
-        raise WyomingUnavailable("The transcription service sent an oversized event.")
-    while len(rest) < length:
-        piece = sock.recv(4096)
-        if not piece:
-            raise WyomingUnavailable("The transcription service closed the connection.")
-        rest += piece
-    if length:
         try:
-            data = json.loads(rest[:length])
+            header = json.loads(line)
         except ValueError as exc:
-            raise WyomingUnavailable("The transcription service sent malformed event data.") from exc
-    return str(header.get("type") or ""), data if isinstance(data, dict) else {}
+            raise WyomingUnavailable("The transcription service sent something that is not Wyoming.") from exc
+        if not isinstance(header, dict):
+            raise WyomingUnavailable("The transcription service sent something that is not Wyoming.")
+        length = int(header.get("data_length") or 0)
+        payload = int(header.get("payload_length") or 0)
+        if length > MAX_EVENT_BYTES or payload > MAX_EVENT_BYTES:
+            raise WyomingUnavailable("The transcription service sent an oversized event.")
+        start = len(line) + 1
+        while len(self.buffer) < start + length + payload:
+            self._fill()
+        block = self.buffer[start : start + length]
+        self.buffer = self.buffer[start + length + payload :]
+        data = header.get("data") if isinstance(header.get("data"), dict) else {}
+        if length:
+            try:
+                data = json.loads(block)
+            except ValueError as exc:
+                raise WyomingUnavailable("The transcription service sent malformed event data.") from exc
+        return str(header.get("type") or ""), data if isinstance(data, dict) else {}
+
+
+def _read_event(sock: socket.socket) -> tuple[str, dict]:
+    """One event, header and any out-of-band data block, as a type and a dict."""
+
+    return _EventReader(sock).read()
 
 
 def _connect(host: str, port: int, timeout: float) -> socket.socket:
@@ -136,7 +161,6 @@ def wyoming_transcribe(address, wav_path: str, language: str = "auto", timeout:
     library, and doing it twice would only lose something.
     """
 
-    host, port = parse_address(address)
     try:
         with wave.open(str(wav_path), "rb") as handle:
             audio = {
@@ -147,9 +171,18 @@ def wyoming_transcribe(address, wav_path: str, language: str = "auto", timeout:
             frames = handle.readframes(handle.getnframes())
     except (OSError, wave.Error) as exc:
         raise WyomingUnavailable("The recording could not be read for transcription.") from exc
+    return wyoming_transcribe_audio(address, frames, audio, language, timeout)
+
+
+def wyoming_transcribe_audio(
+    address, frames: bytes, audio: dict, language: str = "auto", timeout: float = 120.0
+) -> dict:
+    """Send raw samples, described by `audio`'s rate, width and channels, and read back what was said."""
+
+    host, port = parse_address(address)
     if not frames:
         return {"text": "", "language": None}
-
+    audio = {"rate": int(audio["rate"]), "width": int(audio["width"]), "channels": int(audio["channels"])}
     sock = _connect(host, port, timeout)
     try:
         # "auto" is this product's word for saying nothing, not a language code.
@@ -158,8 +191,9 @@ def wyoming_transcribe(address, wav_path: str, language: str = "auto", timeout:
         for offset in range(0, len(frames), CHUNK_BYTES):
             _send(sock, "audio-chunk", {**audio, "timestamp": 0}, frames[offset : offset + CHUNK_BYTES])
         _send(sock, "audio-stop", {"timestamp": 0})
+        reader = _EventReader(sock)
         while True:
-            kind, data = _read_event(sock)
+            kind, data = reader.read()
             if kind == "transcript":
                 return {"text": str(data.get("text") or "").strip(), "language": data.get("language")}
             if kind == "error":
@@ -168,3 +202,132 @@ def wyoming_transcribe(address, wav_path: str, language: str = "auto", timeout:
         raise WyomingUnavailable("The transcription service did not answer in time.") from exc
     finally:
         sock.close()
+
+
+class WyomingStream:
+    """One transcription fed while somebody is still speaking.
+
+    `wyoming_transcribe_audio` has the whole recording before it connects. This
+    connects first and sends audio as it is handed over, so by the time the
+    last piece arrives the server has already heard, and decoded, everything
+    before it. Servers that transcribe as they go say so with `transcript-chunk`
+    events; those are collected as the partial transcript while audio is still
+    being sent. Servers that only transcribe on `audio-stop` never send them,
+    and the partial stays empty until the final transcript replaces it.
+    """
+
+    def __init__(self, address, audio: dict, language: str = "auto", timeout: float = 120.0, connect=None):
+        host, port = parse_address(address)
+        self.audio = {"rate": int(audio["rate"]), "width": int(audio["width"]), "channels": int(audio["channels"])}
+        self.timeout = timeout
+        self._sock = (connect or _connect)(host, port, timeout)
+        self._send_lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._partial = ""
+        self._result: dict | None = None
+        self._error: WyomingUnavailable | None = None
+        self._stopped = False
+        self._closed = False
+        try:
+            # "auto" is this product's word for saying nothing, not a language code.
+            _send(self._sock, "transcribe", {"language": language} if language and language != "auto" else {})
+            _send(self._sock, "audio-start", {**self.audio, "timestamp": 0})
+        except OSError as exc:
+            self._sock.close()
+            raise WyomingUnavailable("The transcription service closed the connection.") from exc
+        threading.Thread(target=self._listen, name="wyoming-stream", daemon=True).start()
+
+    @property
+    def partial(self) -> str:
+        with self._changed:
+            return self._partial.strip()
+
+    def send(self, frames: bytes) -> None:
+        """Forward samples in the format given at the start."""
+
+        with self._changed:
+            if self._error:
+                raise self._error
+        try:
+            with self._send_lock:
+                if self._stopped:
+                    raise WyomingUnavailable("This transcription has already finished.")
+                for offset in range(0, len(frames), CHUNK_BYTES):
+                    _send(
+                        self._sock, "audio-chunk", {**self.audio, "timestamp": 0}, frames[offset : offset + CHUNK_BYTES]
+                    )
+        except socket.timeout as exc:
+            raise WyomingUnavailable("The transcription service did not answer in time.") from exc
+        except OSError as exc:
+            raise WyomingUnavailable("The transcription service closed the connection.") from exc
+
+    def finish(self) -> dict:
+        """Say the audio has ended and wait for what was said."""
+
+        try:
+            try:
+                with self._send_lock:
+                    if not self._stopped:
+                        self._stopped = True
+                        _send(self._sock, "audio-stop", {"timestamp": 0})
+            except OSError as exc:
+                raise WyomingUnavailable("The transcription service closed the connection.") from exc
+            with self._changed:
+                self._changed.wait_for(lambda: self._result is not None or self._error is not None, self.timeout)
+                if self._result is not None:
+                    return dict(self._result)
+                if self._error is not None:
+                    raise self._error
+            raise WyomingUnavailable("The transcription service did not answer in time.")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self._changed:
+            if self._closed:
+                return
+            self._closed = True
+            self._changed.notify_all()
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _listen(self) -> None:
+        reader = _EventReader(self._sock)
+        try:
+            while True:
+                try:
+                    kind, data = reader.read()
+                except socket.timeout:
+                    # Quiet while somebody is still talking is not a failure;
+                    # `finish` is what bounds the wait for an answer.
+                    if self._closed:
+                        return
+                    continue
+                with self._changed:
+                    if kind == "transcript-start":
+                        self._partial = ""
+                    elif kind == "transcript-chunk":
+                        self._partial += str(data.get("text") or "")
+                    elif kind == "transcript":
+                        self._result = {"text": str(data.get("text") or "").strip(), "language": data.get("language")}
+                        return
+                    elif kind == "error":
+                        self._error = WyomingUnavailable(
+                            str(data.get("text") or "The transcription service reported an error.")
+                        )
+                        return
+                    self._changed.notify_all()
+        except (WyomingUnavailable, OSError) as exc:
+            with self._changed:
+                if not self._closed and self._result is None:
+                    self._error = (
+                        exc
+                        if isinstance(exc, WyomingUnavailable)
+                        else WyomingUnavailable("The transcription service closed the connection.")
+                    )
+        finally:
+            with self._changed:
+                self._changed.notify_all()
@@ -103,6 +103,13 @@ export interface PersonaLoreInput {
   enabled: boolean;
 }
 
+export interface TranscriptionStream {
+  id: string;
+  rate: number;
+  width: number;
+  channels: number;
+}
+
 // The workspace and persona a turn runs under come from the chat it belongs to,
 // which is bound once at creation. The API still accepts both fields for
 // compatibility and refuses any value that differs, so this client stops
@@ -427,8 +434,12 @@ export class ApiClient {
     return this.request('/chats', { method: 'POST', body: JSON.stringify(input) });
   }
 
-  chat(id: string): Promise<ChatDetail> {
-    return this.request(`/chats/${encodeURIComponent(id)}`);
+  chat(id: string, page: { before?: string; limit?: number } = {}): Promise<ChatDetail> {
+    const query = new URLSearchParams();
+    if (page.before) query.set('before', page.before);
+    if (page.limit) query.set('limit', String(page.limit));
+    const suffix = query.toString() ? `?${query.toString()}` : '';
+    return this.request(`/chats/${encodeURIComponent(id)}${suffix}`);
   }
 
   updateChat(id: string, input: Partial<Pick<Chat, 'title' | 'model_override' | 'memory_mode' | 'persona_id' | 'hidden_in_ui'>>): Promise<Chat> {
@@ -785,6 +796,31 @@ export class ApiClient {
     return this.request('/speech/transcriptions', { method: 'POST', body: form });
   }
 
+  /**
+   * A transcription fed while somebody is still speaking. Only a Wyoming
+   * service takes one; anything else answers 400 and the recording goes to
+   * `transcribe` as a file instead. See ADR 0043.
+   */
+  openTranscriptionStream(rate: number): Promise<TranscriptionStream> {
+    return this.request('/speech/transcriptions/streams', { method: 'POST', body: JSON.stringify({ rate }) });
+  }
+
+  sendTranscriptionAudio(id: string, frames: ArrayBuffer): Promise<{ partial: string }> {
+    return this.request(`/speech/transcriptions/streams/${encodeURIComponent(id)}/audio`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/octet-stream' },
+      body: frames,
+    });
+  }
+
+  finishTranscriptionStream(id: string): Promise<{ text: string; language?: string | null }> {
+    return this.request(`/speech/transcriptions/streams/${encodeURIComponent(id)}/finish`, { method: 'POST' });
+  }
+
+  cancelTranscriptionStream(id: string): Promise<unknown> {
+    return this.request(`/speech/transcriptions/streams/${encodeURIComponent(id)}`, { method: 'DELETE' });
+  }
+
   backups(): Promise<{ items: BackupItem[] }> {
     return this.request('/admin/backups');
   }
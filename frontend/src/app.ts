@@ -3,7 +3,7 @@ import { AuthView } from './auth_view';
 import { ChatController } from './chat';
 import { avatarSource } from './avatar';
 import { clickDismissesDrawer, ChatDrawer } from './chat_drawer';
-import { coverNewestImage, ChatRenderer, modelNickname } from './chat_rendering';
+import { coverNewestImage, ChatRenderer, modelNickname, olderMessagesButton } from './chat_rendering';
 import { CapabilityController } from './capabilities';
 import { composerState } from './composer_state';
 import { captureFocus, captureScroll, el, errorMessage, restoreFocus, restoreScroll } from './dom';
@@ -265,7 +265,7 @@ function shell(): HTMLElement {
       onscroll: onMessageScroll,
       'data-testid': 'message-pane',
     },
-    [...messageNodes, ...unanchoredRequests],
+    [olderMessagesButton(state, () => void chat.loadOlder()), ...messageNodes, ...unanchoredRequests],
   );
   return el('div', { class: 'app-shell' }, [
     chatDrawer.node(),
@@ -1,7 +1,7 @@
 import { api, type ApiClient } from './api';
 import { el, errorMessage, markdown } from './dom';
 import { extractImageUrl, extractVideoUrl } from './media';
-import { machine, state, type ClientStateMachine } from './state';
+import { CHAT_PAGE_SIZE, machine, showLatestPage, state, type ClientStateMachine } from './state';
 import type { AppState, CapabilityRequest, IdentitySetupIntent } from './types';
 
 export class CapabilityController {
@@ -236,10 +236,9 @@ export class CapabilityController {
 
   private async refreshChat(chatId: string | null): Promise<void> {
     if (!chatId || this.appState.currentChat?.id !== chatId) return;
-    const detail = await this.client.chat(chatId);
+    const detail = await this.client.chat(chatId, { limit: CHAT_PAGE_SIZE });
     if (this.appState.currentChat?.id !== chatId) return;
-    this.appState.currentChat = detail.chat;
-    this.appState.messages = detail.messages;
+    showLatestPage(this.appState, detail);
   }
 }
 
@@ -3,7 +3,7 @@ import { clientId } from './client_id';
 import { errorMessage } from './dom';
 import { waitForJob } from './media';
 import { modelSettings } from './settings';
-import { clearIdentitySetupContextForChat, machine, state, type ClientStateMachine } from './state';
+import { CHAT_PAGE_SIZE, clearIdentitySetupContextForChat, machine, showLatestPage, state, type ClientStateMachine } from './state';
 import type { AppState, CapabilityRequest, Chat, Job, Message, TurnEvent } from './types';
 import type { PlaybackController } from './playback';
 
@@ -39,12 +39,13 @@ export class ChatController {
     this.onChange();
     try {
       const [detail, capabilities] = await Promise.all([
-        this.client.chat(chatId),
+        this.client.chat(chatId, { limit: CHAT_PAGE_SIZE }),
         this.client.capabilityRequests(chatId),
       ]);
       clearIdentitySetupContextForChat(this.appState, detail.chat.id);
       this.appState.currentChat = detail.chat;
       this.appState.messages = detail.messages;
+      this.appState.olderMessagesBefore = detail.next_before ?? null;
       this.appState.capabilityRequests = capabilities.items;
       this.appState.selectedPersonaId = detail.chat.persona_id;
       this.appState.selectedModel = detail.chat.model_override;
@@ -60,6 +61,28 @@ export class ChatController {
     }
   }
 
+  async loadOlder(): Promise<void> {
+    const chatId = this.appState.currentChat?.id;
+    const before = this.appState.olderMessagesBefore;
+    if (!chatId || !before || this.appState.loadingOlderMessages) return;
+    this.appState.loadingOlderMessages = true;
+    this.onChange();
+    try {
+      const detail = await this.client.chat(chatId, { before, limit: CHAT_PAGE_SIZE });
+      if (this.appState.currentChat?.id !== chatId || this.appState.olderMessagesBefore !== before) return;
+      const shown = new Set(this.appState.messages.map((message) => message.id));
+      this.appState.messages = [...detail.messages.filter((message) => !shown.has(message.id)), ...this.appState.messages];
+      this.appState.olderMessagesBefore = detail.next_before ?? null;
+      // Reading back is the opposite of following the newest message.
+      this.appState.stickMessagesToBottom = false;
+    } catch (error) {
+      this.appState.uiError = errorMessage(error, 'Earlier messages could not be loaded.');
+    } finally {
+      this.appState.loadingOlderMessages = false;
+      this.onChange();
+    }
+  }
+
   async create(personaId?: string | null): Promise<Chat> {
     const persona = this.appState.personas.find((item) => item.id === (personaId ?? this.appState.selectedPersonaId));
     const settings = this.requiredSettings();
@@ -74,6 +97,7 @@ export class ChatController {
     clearIdentitySetupContextForChat(this.appState, chat.id);
     this.appState.currentChat = chat;
     this.appState.messages = [];
+    this.appState.olderMessagesBefore = null;
     this.appState.capabilityRequests = [];
     this.appState.selectedPersonaId = chat.persona_id;
     this.appState.selectedModel = chat.model_override;
@@ -266,11 +290,8 @@ export class ChatController {
   }
 
   private async reconcileChat(chatId: string) {
-    const detail = await this.client.chat(chatId);
-    if (this.appState.currentChat?.id === chatId) {
-      this.appState.currentChat = detail.chat;
-      this.appState.messages = detail.messages;
-    }
+    const detail = await this.client.chat(chatId, { limit: CHAT_PAGE_SIZE });
+    if (this.appState.currentChat?.id === chatId) showLatestPage(this.appState, detail);
     this.mergeChat(detail.chat);
     try {
       const capabilities = await this.client.capabilityRequests(chatId);
@@ -286,7 +307,8 @@ export class ChatController {
 
   private async reconcileAcceptedTitle(chatId: string): Promise<void> {
     try {
-      const detail = await this.client.chat(chatId);
+      // Only the chat's own fields are wanted here, so one message is enough.
+      const detail = await this.client.chat(chatId, { limit: 1 });
       if (this.appState.currentChat?.id === chatId) this.appState.currentChat = detail.chat;
       this.mergeChat(detail.chat);
       this.onChange();
@@ -328,10 +350,9 @@ export class ChatController {
           ...this.appState.capabilityRequests.filter((item) => item.id !== current.id),
           current,
         ].sort((left, right) => left.requested_at - right.requested_at);
-        const detail = await this.client.chat(chatId);
+        const detail = await this.client.chat(chatId, { limit: CHAT_PAGE_SIZE });
         if (this.appState.currentChat?.id !== chatId) break;
-        this.appState.currentChat = detail.chat;
-        this.appState.messages = detail.messages;
+        showLatestPage(this.appState, detail);
         this.onChange();
         if (!['queued', 'running'].includes(current.status)) break;
         await new Promise((resolve) => window.setTimeout(resolve, 500));
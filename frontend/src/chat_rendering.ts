@@ -3,7 +3,7 @@ import { avatarErrorFallback, avatarSource } from './avatar';
 import { degradationSuggestsMoreContext, describeContextDegradation, replyWasTruncated } from './context_notice';
 import { copyText, downloadUrl, el, markdown } from './dom';
 import { extractImageUrl, extractVideoUrl, illustratedPassage, speechText, stripVideoLinks } from './media';
-import { state } from './state';
+import { CHAT_PAGE_SIZE, showLatestPage, state } from './state';
 import type { AppState, ChatAttachment, CapabilityRequest, Message } from './types';
 import type { MediaController } from './media';
 import type { PlaybackController } from './playback';
@@ -356,12 +356,11 @@ export class ChatRenderer {
     const chatId = this.appState.currentChat?.id;
     if (!chatId) return;
     const [detail, capabilities] = await Promise.all([
-      this.client.chat(chatId),
+      this.client.chat(chatId, { limit: CHAT_PAGE_SIZE }),
       this.client.capabilityRequests(chatId),
     ]);
     if (this.appState.currentChat?.id !== chatId) return;
-    this.appState.currentChat = detail.chat;
-    this.appState.messages = detail.messages;
+    showLatestPage(this.appState, detail);
     this.appState.capabilityRequests = capabilities.items;
   }
 
@@ -437,3 +436,15 @@ export function coverNewestImage(root: HTMLElement, revealed: Record<string, boo
   newest.title = 'Tap to reveal image';
   newest.setAttribute('aria-label', 'Reveal image');
 }
+
+/** A long conversation opens at its newest page; earlier ones are a tap away. */
+export function olderMessagesButton(appState: AppState, loadOlder: () => void): HTMLElement | null {
+  if (!appState.currentChat || !appState.olderMessagesBefore) return null;
+  return el('button', {
+    class: 'pill-btn older-messages',
+    textContent: appState.loadingOlderMessages ? 'Loading earlier messages…' : 'Load earlier messages',
+    disabled: appState.loadingOlderMessages,
+    'data-testid': 'load-older-messages',
+    onclick: loadOlder,
+  });
+}
@@ -0,0 +1,106 @@
+import type { ApiClient } from './api';
+import { openPcmCapture, type PcmCapture } from './pcm_capture';
+import type { Settings } from './types';
+
+/**
+ * A transcription the service hears while the recording is still being made.
+ *
+ * Pieces of PCM are posted in the order they were captured, each behind the
+ * one before it and all of them behind the request that opened the stream.
+ * Anything going wrong along the way - the stream refused, a piece lost, the
+ * transcript not coming back - ends with `finish` answering null, and the
+ * recorder sends the file it kept alongside instead. See ADR 0043.
+ */
+export class LiveTranscription {
+  private capture: PcmCapture | null = null;
+  private id: string | null = null;
+  private failed = false;
+  private sending: Promise<void>;
+  private opened: () => void = () => undefined;
+
+  private constructor(
+    private readonly client: ApiClient,
+    private onPartial: (partial: string) => void,
+  ) {
+    this.sending = new Promise<void>((resolve) => {
+      this.opened = resolve;
+    });
+  }
+
+  /** Only a Wyoming service can hear a recording while it is being made. */
+  static hears(settings: Settings | null | undefined): boolean {
+    return settings?.stt_provider === 'local' && settings.stt_local_backend === 'wyoming';
+  }
+
+  /** Start feeding `stream` to a new transcription, or null if this browser cannot. */
+  static async open(
+    stream: MediaStream,
+    client: ApiClient,
+    onPartial: (partial: string) => void,
+    openCapture: typeof openPcmCapture = openPcmCapture,
+  ): Promise<LiveTranscription | null> {
+    const live = new LiveTranscription(client, onPartial);
+    try {
+      live.capture = await openCapture(stream, (frames) => live.feed(frames));
+    } catch {
+      live.capture = null;
+    }
+    if (!live.capture) return null;
+    client
+      .openTranscriptionStream(live.capture.rate)
+      .then(
+        (opened) => {
+          live.id = opened.id;
+        },
+        () => {
+          live.failed = true;
+        },
+      )
+      .finally(live.opened);
+    return live;
+  }
+
+  /** Hand over what the microphone still holds. Partials stop here; the transcript is next. */
+  release(): Promise<void> {
+    this.onPartial = () => undefined;
+    const capture = this.capture;
+    this.capture = null;
+    return capture ? capture.close() : Promise.resolve();
+  }
+
+  /** The transcript of everything fed, or null if the file has to be sent after all. */
+  async finish(): Promise<string | null> {
+    await this.release();
+    await this.sending;
+    if (!this.id || this.failed) {
+      this.abandon();
+      return null;
+    }
+    try {
+      return (await this.client.finishTranscriptionStream(this.id)).text;
+    } catch {
+      return null;
+    }
+  }
+
+  abandon(): void {
+    this.failed = true;
+    void this.release();
+    void this.sending.then(() => {
+      if (this.id) void this.client.cancelTranscriptionStream(this.id).catch(() => undefined);
+    });
+  }
+
+  private feed(frames: ArrayBuffer): void {
+    this.sending = this.sending.then(async () => {
+      if (this.failed || !this.id) return;
+      try {
+        const { partial } = await this.client.sendTranscriptionAudio(this.id, frames);
+        if (partial) this.onPartial(partial);
+      } catch {
+        // The server has closed its side already; nothing after this is sent.
+        this.failed = true;
+      }
+    });
+  }
+}
@@ -1,7 +1,7 @@
 import { api, type ApiClient, type MediaJobInput } from './api';
 import { errorMessage } from './dom';
 import { speechText } from './speech_text';
-import { machine, state, type ClientStateMachine } from './state';
+import { CHAT_PAGE_SIZE, machine, showLatestPage, state, type ClientStateMachine } from './state';
 import type { AppState, CapabilityRequest, Job, Message } from './types';
 
 const IMAGE_MARKDOWN = /!\[[^\]]*\]\(([^)]+)\)/i;
@@ -101,12 +101,11 @@ export class MediaController {
   private async refreshChat(chatId: string | null, includeCapabilities = true): Promise<void> {
     if (!chatId || this.appState.currentChat?.id !== chatId) return;
     const [detail, capabilities] = await Promise.all([
-      this.client.chat(chatId),
+      this.client.chat(chatId, { limit: CHAT_PAGE_SIZE }),
       includeCapabilities ? this.client.capabilityRequests(chatId) : Promise.resolve(null),
     ]);
     if (this.appState.currentChat?.id !== chatId) return;
-    this.appState.currentChat = detail.chat;
-    this.appState.messages = detail.messages;
+    showLatestPage(this.appState, detail);
     if (capabilities) this.appState.capabilityRequests = capabilities.items;
   }
 
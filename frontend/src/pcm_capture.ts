@@ -0,0 +1,124 @@
+/**
+ * The microphone as raw samples, for a transcription fed while it is spoken.
+ *
+ * `MediaRecorder` produces a compressed container that only decodes as a whole
+ * file. A Wyoming service takes 16-bit PCM, and PCM can be handed over a piece
+ * at a time with nothing to decode on the server. An audio worklet sees every
+ * sample the microphone delivers, so it packs them into little pieces and
+ * posts them out as they fill.
+ *
+ * Null from `openPcmCapture` means this browser cannot do it, and the caller
+ * records the completed file instead. See ADR 0043.
+ */
+
+export interface PcmCapture {
+  /** Samples per second, which the transcription has to be opened with. */
+  readonly rate: number;
+  /** Hand over what has not been sent yet, then let go of the microphone. */
+  close(): Promise<void>;
+}
+
+// Whisper listens at 16 kHz. Asking for that saves sending three times the
+// samples only to have the service throw two thirds of them away.
+const PREFERRED_RATE = 16000;
+// A quarter of a second per piece: the same rhythm the recorder already uses.
+const PIECES_PER_SECOND = 4;
+const FLUSH_TIMEOUT_MS = 1000;
+
+const PROCESSOR = 'nice-assistant-pcm';
+const WORKLET_SOURCE = `
+class PcmPieces extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.pending = new Int16Array(Math.round(sampleRate / ${PIECES_PER_SECOND}));
+    this.filled = 0;
+    this.port.onmessage = () => {
+      const last = this.pending.slice(0, this.filled);
+      this.filled = 0;
+      this.port.postMessage({ last: last.buffer }, [last.buffer]);
+    };
+  }
+
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (!channel) return true;
+    for (let index = 0; index < channel.length; index += 1) {
+      const sample = Math.max(-1, Math.min(1, channel[index]));
+      this.pending[this.filled] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+      this.filled += 1;
+      if (this.filled === this.pending.length) {
+        const piece = this.pending;
+        this.pending = new Int16Array(piece.length);
+        this.filled = 0;
+        this.port.postMessage(piece.buffer, [piece.buffer]);
+      }
+    }
+    return true;
+  }
+}
+registerProcessor('${PROCESSOR}', PcmPieces);
+`;
+
+/**
+ * Start handing `onFrames` little-endian 16-bit mono PCM from `stream`.
+ *
+ * Every browser this runs in is little-endian, so an `Int16Array`'s bytes are
+ * already in the order Wyoming expects.
+ */
+export async function openPcmCapture(
+  stream: MediaStream,
+  onFrames: (frames: ArrayBuffer) => void,
+): Promise<PcmCapture | null> {
+  const AudioContextClass = (globalThis as { AudioContext?: typeof AudioContext }).AudioContext;
+  if (!AudioContextClass || typeof AudioWorkletNode === 'undefined') return null;
+  let context: AudioContext;
+  try {
+    context = new AudioContextClass({ sampleRate: PREFERRED_RATE });
+  } catch {
+    // Some browsers will not resample a microphone into a context at another
+    // rate. The service resamples instead.
+    context = new AudioContextClass();
+  }
+  const url = URL.createObjectURL(new Blob([WORKLET_SOURCE], { type: 'text/javascript' }));
+  try {
+    await context.audioWorklet.addModule(url);
+  } catch {
+    void context.close();
+    return null;
+  } finally {
+    URL.revokeObjectURL(url);
+  }
+  const source = context.createMediaStreamSource(stream);
+  const node = new AudioWorkletNode(context, PROCESSOR, { numberOfInputs: 1, numberOfOutputs: 1, channelCount: 1 });
+  let flushed: (() => void) | null = null;
+  node.port.onmessage = (event: MessageEvent<ArrayBuffer | { last: ArrayBuffer }>) => {
+    const data = event.data;
+    if (data instanceof ArrayBuffer) {
+      onFrames(data);
+      return;
+    }
+    if (data.last.byteLength) onFrames(data.last);
+    flushed?.();
+  };
+  source.connect(node);
+  // A node nothing pulls from is never run. Its output is silence.
+  node.connect(context.destination);
+  return {
+    rate: context.sampleRate,
+    async close(): Promise<void> {
+      await new Promise<void>((resolve) => {
+        flushed = resolve;
+        node.port.postMessage('flush');
+        setTimeout(resolve, FLUSH_TIMEOUT_MS);
+      });
+      node.port.onmessage = null;
+      try {
+        source.disconnect();
+        node.disconnect();
+        await context.close();
+      } catch {
+        // Torn down already; the samples that mattered have been handed over.
+      }
+    },
+  };
+}
@@ -1,5 +1,7 @@
 import { api, type ApiClient } from './api';
 import { errorMessage } from './dom';
+import { LiveTranscription } from './live_transcription';
+import { openPcmCapture } from './pcm_capture';
 import { machine, state, type ClientStateMachine } from './state';
 import {
   EndOfTurnDetector,
@@ -30,8 +32,13 @@ export class RecordingController {
   private mimeType = '';
   private onChange: () => void = () => undefined;
   private onTranscript: (text: string) => Promise<void> = async () => undefined;
+  private readonly showPartial = (text: string): void => {
+    this.appState.partialTranscript = text;
+    this.onChange();
+  };
   private meter: LevelMeter | null = null;
   private listener: ReturnType<typeof setInterval> | null = null;
+  private live: LiveTranscription | null = null;
   private readonly detector: EndOfTurnDetector;
   private readonly pauses: PauseDetector;
   private readonly segments = new TranscriptSegments();
@@ -43,6 +50,7 @@ export class RecordingController {
     private readonly openMeter: (stream: MediaStream) => LevelMeter = createLevelMeter,
     private readonly now: () => number = () => Date.now(),
     detection: TurnDetectorOptions = {},
+    private readonly openCapture: typeof openPcmCapture = openPcmCapture,
   ) {
     this.detector = new EndOfTurnDetector(detection);
     this.pauses = new PauseDetector(detection);
@@ -97,6 +105,7 @@ export class RecordingController {
       this.appState.recordingStartedAt = this.now();
       this.stateMachine.transition('recording');
       if (handsFree) this.listenForTheEnd();
+      if (LiveTranscription.hears(this.appState.settings)) this.goLive(this.stream, this.recorder);
     } catch (error) {
       this.cleanup();
       this.appState.uiError = errorMessage(error, 'Microphone access was denied or unavailable.');
@@ -132,9 +141,9 @@ export class RecordingController {
         return;
       }
       // A pause is where the earlier part of a long answer can start being
-      // transcribed while the rest is still being said. It never ends a turn;
-      // that decision stays with the detector above, unchanged.
-      if (this.streaming && this.pauses.observe(meter.level(), this.now())) void this.cutSegment();
+      // transcribed while the rest is still being said, unless the service is
+      // already hearing it. It never ends a turn; the detector above decides.
+      if (this.streaming && !this.live && this.pauses.observe(meter.level(), this.now())) void this.cutSegment();
     }, LEVEL_SAMPLE_MS);
   }
 
@@ -154,13 +163,19 @@ export class RecordingController {
     if (!blob.size) return;
     this.segments.claim(
       async () => (await this.client.transcribe(blob, recordingFilename(blob.type))).text,
-      (joined) => {
-        this.appState.partialTranscript = joined;
-        this.onChange();
-      },
+      this.showPartial,
     );
   }
 
+  /** Feed the service while recording; the file made alongside is the fallback. */
+  private goLive(stream: MediaStream, recorder: MediaRecorder): void {
+    void LiveTranscription.open(stream, this.client, this.showPartial, this.openCapture).then((live) => {
+      // Released before the service answered: the file is sent instead.
+      if (this.recorder === recorder && recorder.state === 'recording') this.live = live;
+      else live?.abandon();
+    });
+  }
+
   private openRecorder(): void {
     if (!this.stream) return;
     this.chunks = [];
@@ -185,6 +200,8 @@ export class RecordingController {
   async stop(): Promise<void> {
     const recorder = this.recorder;
     if (!recorder || recorder.state !== 'recording') return;
+    const live = this.live;
+    this.live = null;
     this.stopListening();
     const blob = await new Promise<Blob>((resolve) => {
       recorder.addEventListener(
@@ -196,6 +213,7 @@ export class RecordingController {
     });
     this.cleanup();
     if (!blob.size && this.segments.empty) {
+      live?.abandon();
       this.appState.partialTranscript = '';
       this.stateMachine.transition('idle');
       this.onChange();
@@ -204,10 +222,11 @@ export class RecordingController {
     this.stateMachine.transition('transcribing');
     this.onChange();
     try {
-      const result = await this.client.transcribe(blob, recordingFilename(blob.type));
+      const heard = live ? await live.finish() : null;
+      const text = heard ?? (await this.client.transcribe(blob, recordingFilename(blob.type))).text;
       // Whatever was cut at pauses is already transcribed or on its way; this
       // is only the tail, and it is the sole part anybody waited for.
-      const transcript = await this.segments.finish(result.text);
+      const transcript = await this.segments.finish(text);
       this.appState.partialTranscript = '';
       if (transcript) await this.onTranscript(transcript);
       else if (this.appState.phase === 'transcribing') this.stateMachine.transition('idle');
@@ -236,6 +255,8 @@ export class RecordingController {
   }
 
   private cleanup(): void {
+    this.live?.abandon();
+    this.live = null;
     this.stopListening();
     for (const track of this.stream?.getTracks() ?? []) track.stop();
     this.stream = null;
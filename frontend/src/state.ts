@@ -1,4 +1,4 @@
-import type { AppState, ClientPhase } from './types';
+import type { AppState, ChatDetail, ClientPhase } from './types';
 
 const LEGAL_PHASES: Record<ClientPhase, ReadonlySet<ClientPhase>> = {
   signed_out: new Set(['onboarding', 'idle', 'error']),
@@ -21,6 +21,8 @@ export function createState(): AppState {
     chats: [],
     currentChat: null,
     messages: [],
+    olderMessagesBefore: null,
+    loadingOlderMessages: false,
     capabilityRequests: [],
     personas: [],
     workspaces: [],
@@ -118,6 +120,27 @@ export function clearIdentitySetupContextForChat(appState: AppState, chatId: str
   if (intent && intent.chat_id !== chatId) clearIdentitySetupContext(appState);
 }
 
+// Messages in one page of a conversation. Older pages are read when asked for.
+export const CHAT_PAGE_SIZE = 100;
+
+/**
+ * Show the newest page of a chat without dropping older pages already read.
+ *
+ * Refreshing after a reply or a picture asks only for the newest page. Pages
+ * somebody went back to read stay in front of it rather than disappearing
+ * under them, and so does the cursor for the page before those.
+ */
+export function showLatestPage(appState: AppState, detail: ChatDetail): void {
+  const loaded = appState.currentChat?.id === detail.chat.id ? appState.messages : [];
+  // Everything shown ahead of the page's first message is older than the page.
+  const first = detail.messages[0];
+  const start = first ? loaded.findIndex((message) => message.id === first.id) : -1;
+  const older = start > 0 ? loaded.slice(0, start) : [];
+  appState.currentChat = detail.chat;
+  appState.messages = [...older, ...detail.messages];
+  appState.olderMessagesBefore = older.length ? appState.olderMessagesBefore : detail.next_before ?? null;
+}
+
 export class ClientStateMachine {
   constructor(private readonly state: AppState) {}
 
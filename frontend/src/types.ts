@@ -358,6 +358,8 @@ export interface ChatAttachment {
 export interface ChatDetail {
   chat: Chat;
   messages: Message[];
+  // Cursor for the page before this one; null when nothing older remains or the whole transcript was asked for.
+  next_before?: string | null;
 }
 
 export interface Memory {
@@ -1023,6 +1025,9 @@ export interface AppState {
   chats: Chat[];
   currentChat: Chat | null;
   messages: Message[];
+  // Cursor for the page before the oldest message shown; null once the start of the chat is on screen.
+  olderMessagesBefore: Id | null;
+  loadingOlderMessages: boolean;
   capabilityRequests: CapabilityRequest[];
   personas: Persona[];
   workspaces: Workspace[];
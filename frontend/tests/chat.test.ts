@@ -3,7 +3,7 @@ import { describe, expect, it, vi } from 'vitest';
 import type { ApiClient } from '../src/api';
 import { ChatController } from '../src/chat';
 import type { PlaybackController } from '../src/playback';
-import { ClientStateMachine, createState } from '../src/state';
+import { CHAT_PAGE_SIZE, ClientStateMachine, createState } from '../src/state';
 import type { Chat, Settings } from '../src/types';
 
 function chatWithTitle(title: string): Chat {
@@ -225,4 +225,45 @@ describe('ChatController', () => {
     expect(appState.messageAudioErrors['assistant-1']).toContain('speaker unavailable');
     expect(client.clientEvent).toHaveBeenCalledWith('tts.playback_error', expect.stringContaining('speaker unavailable'));
   });
+
+  it('opens a chat at its newest page and loads earlier pages from the cursor', async () => {
+    const appState = createState();
+    appState.phase = 'idle';
+    const chat = chatWithTitle('Long chat');
+    const client = {
+      chat: vi.fn()
+        .mockResolvedValueOnce({
+          chat,
+          messages: [{ id: 'message-3', role: 'user', text: 'Newest', created_at: 3 }],
+          next_before: 'message-3',
+        })
+        .mockResolvedValueOnce({
+          chat,
+          messages: [
+            { id: 'message-1', role: 'user', text: 'First', created_at: 1 },
+            { id: 'message-2', role: 'assistant', text: 'Second', created_at: 2 },
+          ],
+          next_before: null,
+        }),
+      capabilityRequests: vi.fn().mockResolvedValue({ items: [] }),
+    } as unknown as ApiClient;
+    const controller = new ChatController(
+      {} as PlaybackController,
+      appState,
+      new ClientStateMachine(appState),
+      client,
+    );
+
+    await controller.open('chat-1');
+
+    expect(client.chat).toHaveBeenCalledWith('chat-1', { limit: CHAT_PAGE_SIZE });
+    expect(appState.messages.map((message) => message.id)).toEqual(['message-3']);
+    expect(appState.olderMessagesBefore).toBe('message-3');
+
+    await controller.loadOlder();
+
+    expect(client.chat).toHaveBeenLastCalledWith('chat-1', { before: 'message-3', limit: CHAT_PAGE_SIZE });
+    expect(appState.messages.map((message) => message.id)).toEqual(['message-1', 'message-2', 'message-3']);
+    expect(appState.olderMessagesBefore).toBeNull();
+  });
 });
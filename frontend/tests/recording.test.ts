@@ -0,0 +1,162 @@
+import { afterEach, describe, expect, it, vi } from 'vitest';
+
+import type { ApiClient } from '../src/api';
+import type { PcmCapture } from '../src/pcm_capture';
+import { RecordingController } from '../src/recording';
+import { ClientStateMachine, createState } from '../src/state';
+import type { Settings } from '../src/types';
+
+const WYOMING = { stt_provider: 'local', stt_local_backend: 'wyoming' } as Settings;
+
+class FakeRecorder {
+  static isTypeSupported = () => false;
+  state = 'inactive';
+  mimeType = 'audio/webm';
+  private handlers: Record<string, ((event: unknown) => void)[]> = {};
+  addEventListener(name: string, handler: (event: unknown) => void) {
+    (this.handlers[name] ??= []).push(handler);
+  }
+  start() { this.state = 'recording'; }
+  stop() {
+    this.state = 'inactive';
+    for (const handler of this.handlers.dataavailable ?? []) handler({ data: new Blob(['recorded']) });
+    for (const handler of this.handlers.stop ?? []) handler({});
+  }
+}
+
+function setup(settings: Settings, client: object) {
+  const appState = createState();
+  appState.phase = 'idle';
+  appState.settings = settings;
+  const stream = { getTracks: () => [{ stop: vi.fn() }] } as unknown as MediaStream;
+  vi.stubGlobal('navigator', { mediaDevices: { getUserMedia: vi.fn().mockResolvedValue(stream) } });
+  vi.stubGlobal('MediaRecorder', FakeRecorder);
+
+  const capture: { feed: (frames: ArrayBuffer) => void; closed: boolean } = { feed: () => undefined, closed: false };
+  const tail = new ArrayBuffer(4);
+  const openCapture = vi.fn(async (_stream: MediaStream, onFrames: (frames: ArrayBuffer) => void) => {
+    capture.feed = onFrames;
+    return {
+      rate: 16000,
+      async close() {
+        // What was still in the worklet arrives as it is let go.
+        onFrames(tail);
+        capture.closed = true;
+      },
+    } satisfies PcmCapture;
+  });
+  const transcripts: string[] = [];
+  const controller = new RecordingController(
+    appState,
+    new ClientStateMachine(appState),
+    client as ApiClient,
+    () => ({ level: () => 0, close: () => undefined }),
+    () => 0,
+    {},
+    openCapture,
+  );
+  controller.configure(() => undefined, async (text) => { transcripts.push(text); });
+  return { appState, controller, capture, openCapture, tail, transcripts };
+}
+
+type Overrides = Partial<Record<'openTranscriptionStream' | 'sendTranscriptionAudio', ReturnType<typeof vi.fn>>>;
+
+function wyomingClient(overrides: Overrides = {}) {
+  return {
+    transcribe: vi.fn().mockResolvedValue({ text: 'from the file' }),
+    openTranscriptionStream: vi.fn().mockResolvedValue({ id: 'stream-1', rate: 16000, width: 2, channels: 1 }),
+    sendTranscriptionAudio: vi.fn().mockResolvedValue({ partial: 'what do' }),
+    finishTranscriptionStream: vi.fn().mockResolvedValue({ text: 'what do I drive' }),
+    cancelTranscriptionStream: vi.fn().mockResolvedValue(undefined),
+    ...overrides,
+  };
+}
+
+afterEach(() => {
+  vi.unstubAllGlobals();
+});
+
+describe('Recording fed to the transcription service as it is spoken', () => {
+  it('sends pieces while recording and asks for the transcript when it stops', async () => {
+    const client = wyomingClient();
+    const { appState, controller, capture, tail, transcripts } = setup(WYOMING, client);
+    await controller.start();
+    await vi.waitFor(() => expect(client.openTranscriptionStream).toHaveBeenCalledWith(16000));
+
+    const piece = new ArrayBuffer(8000);
+    capture.feed(piece);
+    await vi.waitFor(() => expect(client.sendTranscriptionAudio).toHaveBeenCalledWith('stream-1', piece));
+    await vi.waitFor(() => expect(appState.partialTranscript).toBe('what do'));
+
+    await controller.stop();
+
+    // The last piece goes before the question, or the transcript would miss it.
+    expect(client.sendTranscriptionAudio).toHaveBeenLastCalledWith('stream-1', tail);
+    expect(client.sendTranscriptionAudio.mock.invocationCallOrder.at(-1)).toBeLessThan(
+      client.finishTranscriptionStream.mock.invocationCallOrder[0] ?? 0,
+    );
+    expect(client.finishTranscriptionStream).toHaveBeenCalledWith('stream-1');
+    expect(client.transcribe).not.toHaveBeenCalled();
+    expect(capture.closed).toBe(true);
+    expect(transcripts).toEqual(['what do I drive']);
+  });
+
+  it('sends the recorded file when the service will not take a stream', async () => {
+    const client = wyomingClient({ openTranscriptionStream: vi.fn().mockRejectedValue(new Error('400')) });
+    const { controller, capture, transcripts } = setup(WYOMING, client);
+    await controller.start();
+    await vi.waitFor(() => expect(client.openTranscriptionStream).toHaveBeenCalled());
+    capture.feed(new ArrayBuffer(8000));
+
+    await controller.stop();
+
+    expect(client.sendTranscriptionAudio).not.toHaveBeenCalled();
+    expect(client.finishTranscriptionStream).not.toHaveBeenCalled();
+    expect(transcripts).toEqual(['from the file']);
+  });
+
+  it('gives the stream up and sends the file when a piece fails on the way', async () => {
+    const client = wyomingClient({ sendTranscriptionAudio: vi.fn().mockRejectedValue(new Error('502')) });
+    const { controller, capture, transcripts } = setup(WYOMING, client);
+    await controller.start();
+    await vi.waitFor(() => expect(client.openTranscriptionStream).toHaveBeenCalled());
+    capture.feed(new ArrayBuffer(8000));
+    await vi.waitFor(() => expect(client.sendTranscriptionAudio).toHaveBeenCalledOnce());
+
+    await controller.stop();
+
+    // Nothing after the failure is sent; half a recording would be a wrong transcript.
+    expect(client.sendTranscriptionAudio).toHaveBeenCalledOnce();
+    expect(client.finishTranscriptionStream).not.toHaveBeenCalled();
+    await vi.waitFor(() => expect(client.cancelTranscriptionStream).toHaveBeenCalledWith('stream-1'));
+    expect(transcripts).toEqual(['from the file']);
+  });
+
+  it('abandons the stream when the recording is cancelled', async () => {
+    const client = wyomingClient();
+    const { controller, capture } = setup(WYOMING, client);
+    await controller.start();
+    await vi.waitFor(() => expect(client.openTranscriptionStream).toHaveBeenCalled());
+
+    controller.cancel();
+
+    await vi.waitFor(() => expect(client.cancelTranscriptionStream).toHaveBeenCalledWith('stream-1'));
+    expect(client.finishTranscriptionStream).not.toHaveBeenCalled();
+    expect(capture.closed).toBe(true);
+  });
+
+  it('never opens one for a service that only takes finished files', async () => {
+    const client = wyomingClient();
+    const { controller, openCapture, transcripts } = setup(
+      { stt_provider: 'local', stt_local_backend: 'openai_api' } as Settings,
+      client,
+    );
+    await controller.start();
+
+    await controller.stop();
+
+    expect(openCapture).not.toHaveBeenCalled();
+    expect(client.openTranscriptionStream).not.toHaveBeenCalled();
+    expect(transcripts).toEqual(['from the file']);
+  });
+});
@@ -1,6 +1,7 @@
 import { describe, expect, it } from 'vitest';
 
-import { clearIdentitySetupContext, ClientStateMachine, createState } from '../src/state';
+import { clearIdentitySetupContext, ClientStateMachine, createState, showLatestPage } from '../src/state';
+import type { Chat } from '../src/types';
 
 describe('ClientStateMachine', () => {
   it('models the voice-ready conversation lifecycle explicitly', () => {
@@ -39,4 +40,27 @@ describe('ClientStateMachine', () => {
 
     expect(state.mediaCatalogIdentitySetupIntent).toBeNull();
   });
+
+  it('keeps earlier pages in front of a refreshed newest page', () => {
+    const state = createState();
+    const chat = { id: 'chat-1', title: 'Chat' } as Chat;
+    state.currentChat = chat;
+    state.messages = [
+      { id: 'message-1', role: 'user', text: 'Earlier', created_at: 1 },
+      { id: 'message-2', role: 'assistant', text: 'Newest', created_at: 2 },
+    ];
+    state.olderMessagesBefore = 'message-0';
+
+    showLatestPage(state, {
+      chat,
+      messages: [
+        { id: 'message-2', role: 'assistant', text: 'Newest', created_at: 2 },
+        { id: 'message-3', role: 'user', text: 'Reply', created_at: 3 },
+      ],
+      next_before: 'message-2',
+    });
+
+    expect(state.messages.map((message) => message.id)).toEqual(['message-1', 'message-2', 'message-3']);
+    expect(state.olderMessagesBefore).toBe('message-0');
+  });
 });
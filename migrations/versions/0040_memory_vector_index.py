@@ -0,0 +1,51 @@
+"""File memory vectors in cells, so a question can reach every memory.
+
+Semantic recall compared the question with the forty most recently updated
+memories only. An old memory that matched by meaning was invisible once forty
+newer ones existed, which is exactly the memory recall is for.
+
+The index is an inverted file: each owner's vectors are grouped into cells by
+direction, a cell's centre is stored beside it, and a question looks only
+inside the few cells it is nearest. It lives in the database rather than in
+memory because it has to survive a restart without a rebuild, and because
+membership on the memory row means a status change needs no second write.
+
+Cell ids are global rather than per model, so a vector can never be filed in
+another model's cell by accident. Existing vectors start unfiled; the
+background pass files them, and until then they are compared directly.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0040_memory_vector_index"
+down_revision = "0039_wider_default_context_window"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE TABLE memory_vector_cells (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            model TEXT NOT NULL,
+            total BLOB NOT NULL,
+            member_count INTEGER NOT NULL DEFAULT 0,
+            updated_at INTEGER NOT NULL
+        )
+        """
+    )
+    op.execute("CREATE INDEX idx_memory_vector_cells_owner_model ON memory_vector_cells(user_id, model)")
+    op.execute(
+        "ALTER TABLE memories ADD COLUMN embedding_cell INTEGER REFERENCES memory_vector_cells(id) ON DELETE SET NULL"
+    )
+    op.execute("CREATE INDEX idx_memories_embedding_cell ON memories(user_id, embedding_cell)")
+
+
+def downgrade():
+    # Production recovery is restore-based; migrations are intentionally forward-only.
+    pass
@@ -0,0 +1,30 @@
+"""Index messages by chat in transcript order.
+
+Every read of a conversation filters `messages` by chat and orders by
+`(created_at, id)`: opening a chat, loading history for a prompt, and the
+newest-timestamp lookup each new message makes. No index covered the chat
+column, so each of those scanned the whole table, and the cost of opening a
+chat grew with every other chat on the instance.
+
+The index carries the full transcript order so a page of a chat is a range
+scan from its cursor rather than a sort.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0041_message_chat_order_index"
+down_revision = "0040_memory_vector_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS idx_messages_chat_created ON messages(chat_id, created_at, id)")
+
+
+def downgrade():
+    # Production recovery is restore-based; migrations are intentionally forward-only.
+    pass
@@ -0,0 +1,37 @@
+"""Let a job survive a restart when running it again is safe.
+
+Startup used to fail every queued or running job, so a deploy threw away the
+whole queue of pending pictures along with the one step that was actually
+interrupted. Some kinds of work can simply be run again from their durable
+rows, and these two columns are what that needs.
+
+`attempts` counts how often a job has started, so work that keeps dying with
+the process - a model that crashes the machine, say - stops being retried.
+`source_turn_id` records the turn a follow-up was scheduled for. The job's own
+`turn_id` is unique and belongs to the reply, so a title or memory follow-up had
+no durable way back to the message it was about.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0042_resumable_jobs"
+down_revision = "0041_message_chat_order_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("ALTER TABLE async_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    op.execute(
+        "ALTER TABLE async_jobs ADD COLUMN source_turn_id TEXT REFERENCES conversation_turns(id) ON DELETE SET NULL"
+    )
+    # Startup looks for unfinished work by status; before this nothing needed to.
+    op.execute("CREATE INDEX IF NOT EXISTS idx_async_jobs_status ON async_jobs(status, created_at)")
+
+
+def downgrade():
+    # Production recovery is restore-based; migrations are intentionally forward-only.
+    pass
@@ -0,0 +1,30 @@
+"""Record how long each phase of a turn took.
+
+A turn kept only its job's total latency, in whole seconds, which cannot say
+whether a slow reply was spent assembling context, waiting for the model to
+answer, streaming, or writing the result. These columns hold that timeline in
+milliseconds, beside the context figures the same turn already records.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0043_turn_phase_timings"
+down_revision = "0042_resumable_jobs"
+branch_labels = None
+depends_on = None
+
+
+PHASE_COLUMNS = ("context_plan_ms", "provider_connect_ms", "first_token_ms", "streaming_ms", "commit_ms")
+
+
+def upgrade():
+    for column in PHASE_COLUMNS:
+        op.execute(f"ALTER TABLE conversation_turns ADD COLUMN {column} INTEGER")
+
+
+def downgrade():
+    # Production recovery is restore-based; migrations are intentionally forward-only.
+    pass
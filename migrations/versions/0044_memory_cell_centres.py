@@ -0,0 +1,45 @@
+"""Keep each memory index cell's centre beside its total.
+
+A question was compared with every cell by normalising each stored total in
+Python first, one cell at a time. Storing the centre at unit length, as every
+memory vector already is, lets all of them be scored in one batch by the same
+path that scores memories. Existing cells get theirs from their totals here.
+"""
+
+from __future__ import annotations
+
+from array import array
+
+from alembic import op
+from sqlalchemy import text
+
+
+revision = "0044_memory_cell_centres"
+down_revision = "0043_turn_phase_timings"
+branch_labels = None
+depends_on = None
+
+
+def _centre(total: bytes) -> bytes:
+    values = array("f")
+    values.frombytes(total or b"")
+    length = sum(value * value for value in values) ** 0.5
+    if not length:
+        return b""
+    return array("f", [value / length for value in values]).tobytes()
+
+
+def upgrade():
+    op.execute("ALTER TABLE memory_vector_cells ADD COLUMN centre BLOB")
+    connection = op.get_bind()
+    cells = connection.execute(text("SELECT id, total FROM memory_vector_cells")).fetchall()
+    for cell_id, total in cells:
+        connection.execute(
+            text("UPDATE memory_vector_cells SET centre=:centre WHERE id=:id"),
+            {"centre": _centre(total), "id": cell_id},
+        )
+
+
+def downgrade():
+    # Production recovery is restore-based; migrations are intentionally forward-only.
+    pass
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compare per-row and batched similarity scoring at common embedding widths."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app import embedding
+from app.embedding import normalize, pack, rank, rank_packed, unpack
+
+
+WIDTHS = (384, 768, 1024)
+
+
+def _timed(function, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    result = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=2000, help="stored vectors scored per question")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=39)
+    args = parser.parse_args()
+    generator = random.Random(args.seed)
+    installed = embedding.numpy
+    print(f"candidates={args.candidates} numpy={'yes' if installed is not None else 'no'}")
+    print(f"{'width':>6} {'per-row ms':>11} {'batched ms':>11} {'numpy ms':>9} {'speed-up':>9}")
+    for width in WIDTHS:
+        query = normalize([generator.gauss(0, 1) for _ in range(width)])
+        rows = [
+            (f"m{index}", pack(normalize([generator.gauss(0, 1) for _ in range(width)])))
+            for index in range(args.candidates)
+        ]
+        # A floor of zero keeps about half the candidates, which is the most
+        # selection work either path will ever do.
+        baseline, expected = _timed(
+            lambda: rank(query, [(key, unpack(raw)) for key, raw in rows], floor=0.0), args.repeat
+        )
+        embedding.numpy = None
+        try:
+            plain, plain_result = _timed(lambda: rank_packed(query, rows, floor=0.0), args.repeat)
+        finally:
+            embedding.numpy = installed
+        numpy_seconds, numpy_result = (None, expected)
+        if installed is not None:
+            numpy_seconds, numpy_result = _timed(lambda: rank_packed(query, rows, floor=0.0), args.repeat)
+        if plain_result != expected or numpy_result != expected:
+            raise SystemExit(f"batched scoring disagreed with rank at {width} dimensions")
+        fastest = min(value for value in (plain, numpy_seconds) if value is not None)
+        numpy_label = f"{numpy_seconds * 1000:9.2f}" if numpy_seconds is not None else f"{'-':>9}"
+        print(f"{width:>6} {baseline * 1000:11.2f} {plain * 1000:11.2f} {numpy_label} {baseline / fastest:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
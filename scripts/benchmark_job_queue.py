@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measure how long JobQueue holds its lock to accept and to select work as the backlog grows.
+
+Every worker and every submission shares that lock, so its hold time is what a
+deep queue of background pictures costs a user waiting on a reply. The cost of
+a submission and of a selection should stay flat from a hundred pending jobs
+to ten thousand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.job_queue import JobQueue, new_job
+
+
+SIZES = (100, 1000, 10000)
+LATENCY_CLASSES = ("interactive", "standard", "bulk")
+
+
+def _jobs(count: int, generator: random.Random) -> list:
+    return [
+        new_job(
+            job_type="image",
+            user_id="u",
+            chat_id=f"c{index % 50}",
+            estimated_vram_mb=0,
+            latency_class=generator.choice(LATENCY_CLASSES),
+            model_key=f"image:model-{generator.randrange(8)}",
+            metadata={"ordering_key": f"chat:c{index % 50}" if index % 3 == 0 else ""},
+            execute=lambda: None,
+        )
+        for index in range(count)
+    ]
+
+
+def _measure(size: int, selections: int, generator: random.Random) -> tuple[float, float, float]:
+    # No media worker, so nothing but this measurement selects media work.
+    queue = JobQueue(worker_counts={"interactive": 1, "media": 0})
+    try:
+        jobs = _jobs(size, generator)
+        started = time.perf_counter()
+        for job in jobs:
+            queue.submit(job)
+        submit_seconds = (time.perf_counter() - started) / size
+        holds = []
+        for _ in range(min(selections, size)):
+            started = time.perf_counter()
+            with queue._lock:
+                queue._select_locked("media")
+            holds.append(time.perf_counter() - started)
+        return submit_seconds, sum(holds) / len(holds), max(holds)
+    finally:
+        queue.stop()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--selections", type=int, default=500, help="jobs selected per backlog size")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    generator = random.Random(args.seed)
+    print(f"{'pending':>8} {'submit us':>10} {'select us':>10} {'max hold us':>12}")
+    for size in SIZES:
+        submit_seconds, average_hold, longest_hold = _measure(size, args.selections, generator)
+        print(f"{size:>8} {submit_seconds * 1e6:10.1f} {average_hold * 1e6:10.1f} {longest_hold * 1e6:12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
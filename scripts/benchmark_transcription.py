@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure what decoding a spoken turn costs before the transcription service hears it.
+
+The old path wrote the upload to disk, ran ffmpeg from file to WAV file, read
+the WAV back, and deleted both. The new one hands the upload to an ffmpeg
+already waiting on a pipe. Both decode the same recording, which this makes
+with ffmpeg itself as a browser would send it: Opus in WebM where this ffmpeg
+can encode that, WAV where it cannot. Recordings arrive seconds apart in use,
+so each measurement starts once the next warm ffmpeg is ready.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import secrets
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import wave
+
+from app.audio_transcode import Transcoder
+
+
+def _recording(folder: Path, seconds: float) -> tuple[bytes, str]:
+    tone = ["-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}:sample_rate=48000"]
+    for extension, codec in ((".webm", ["-c:a", "libopus"]), (".wav", [])):
+        target = folder / f"source{extension}"
+        completed = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *tone, *codec, str(target)],
+            capture_output=True,
+            check=False,
+        )
+        if completed.returncode == 0:
+            return target.read_bytes(), extension
+    raise SystemExit("ffmpeg could not make a test recording")
+
+
+def _through_files(folder: Path, content: bytes, extension: str) -> float:
+    started = time.perf_counter()
+    raw = folder / f"upload_{secrets.token_hex(6)}{extension}"
+    wav = folder / f"upload_{secrets.token_hex(6)}.wav"
+    try:
+        raw.write_bytes(content)
+        subprocess.run(["ffmpeg", "-y", "-i", str(raw), str(wav)], check=True, capture_output=True)
+        with wave.open(str(wav), "rb") as handle:
+            handle.readframes(handle.getnframes())
+    finally:
+        raw.unlink(missing_ok=True)
+        wav.unlink(missing_ok=True)
+    return time.perf_counter() - started
+
+
+def _through_pipes(transcoder: Transcoder, content: bytes, extension: str) -> float:
+    deadline = time.monotonic() + 5
+    while len(transcoder._ready) < transcoder.warm and time.monotonic() < deadline:
+        time.sleep(0.01)
+    started = time.perf_counter()
+    transcoder.transcode(content, extension)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--utterances", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=4.0, help="length of each recording")
+    args = parser.parse_args()
+    if not shutil.which("ffmpeg"):
+        print("ffmpeg is not installed; there is nothing to measure.")
+        return 1
+    with tempfile.TemporaryDirectory() as name:
+        folder = Path(name)
+        content, extension = _recording(folder, args.seconds)
+        transcoder = Transcoder(warm=1, temp_dir=folder)
+        transcoder.start()
+        try:
+            files = [_through_files(folder, content, extension) for _ in range(args.utterances)]
+            pipes = [_through_pipes(transcoder, content, extension) for _ in range(args.utterances)]
+        finally:
+            transcoder.close()
+    print(f"{args.seconds:g} s {extension[1:]} recording, {args.utterances} utterances")
+    print(f"{'path':>8} {'median ms':>10} {'p90 ms':>8}")
+    for label, timings in (("files", files), ("pipes", pipes)):
+        ordered = sorted(timings)
+        p90 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+        print(f"{label:>8} {statistics.median(timings) * 1000:10.1f} {p90 * 1000:8.1f}")
+    saved = statistics.median(files) - statistics.median(pipes)
+    print(f"saved per utterance: {saved * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
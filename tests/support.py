@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 import threading
 import time
+import urllib.request
 
 from fastapi.testclient import TestClient
 
@@ -31,6 +32,11 @@ def fast_verify(password, stored):
     return stored == fast_hash(password)
 
 
+def urlopen(*args, **kwargs):
+    # Looked up on every call, so a test that patches urllib sees its requests.
+    return urllib.request.urlopen(*args, **kwargs)
+
+
 class FakeChatProvider:
     name = "ollama"
 
@@ -146,6 +152,61 @@ class FakeChatProvider:
         return content[len(marker) :].split(".", 1)[0]
 
 
+class FakeFfmpeg:
+    """Stands in for the ffmpeg process a recording is decoded by.
+
+    ffmpeg is a real dependency of transcription and not what these tests are
+    about, so the decode is stood in for and the request around it is not.
+    """
+
+    def __init__(self, frames: bytes = b"\x00\x00" * 1600, returncode: int = 0):
+        self.frames = frames
+        self.returncode_when_done = returncode
+        self.commands: list[list[str]] = []
+        self.inputs: list[bytes] = []
+
+    def __call__(self, command, **_kwargs):
+        self.commands.append(list(command))
+        fake = self
+
+        class Stdin:
+            def __init__(self):
+                self.written = bytearray()
+                self.closed = threading.Event()
+
+            def write(self, data):
+                self.written.extend(data)
+                return len(data)
+
+            def close(self):
+                self.closed.set()
+
+        class Process:
+            returncode = None
+
+            def __init__(self):
+                self.pipe = self.stdin = Stdin()
+
+            def poll(self):
+                return self.returncode
+
+            def communicate(self, content=b"", timeout=None):
+                if self.returncode is not None:
+                    return b"", b""
+                if content is None:
+                    # Fed from a file by another thread, as ffmpeg's stdin would be.
+                    self.pipe.closed.wait(timeout or 5)
+                    content = bytes(self.pipe.written)
+                fake.inputs.append(content)
+                self.returncode = fake.returncode_when_done
+                return fake.frames, b""
+
+            def kill(self):
+                self.returncode = -9
+
+        return Process()
+
+
 class TestApp:
     def __init__(
         self,
@@ -166,6 +227,11 @@ class TestApp:
             max_json_body_bytes=json_limit,
             max_upload_body_bytes=max(json_limit, 2 * 1024 * 1024),
             interactive_workers=interactive_workers,
+            # A warm ffmpeg started before a test stands one in would never see it.
+            transcode_warm_workers=0,
+            # Follow-ups start as soon as the pool is free; the quiet period has
+            # its own tests in test_job_queue.
+            background_quiet_seconds=0,
         )
         self.app = create_app(
             self.config,
@@ -175,6 +241,7 @@ class TestApp:
             resource_providers=resource_providers,
             password_hasher=fast_hash,
             password_verifier=fast_verify,
+            http_opener=urlopen,
         )
         self.context = TestClient(self.app)
         self.client = None
@@ -207,7 +274,8 @@ class TestApp:
         deadline = time.monotonic() + timeout
         latest = None
         while time.monotonic() < deadline:
-            response = self.client.get("/api/v1/jobs/" + job_id)
+            remaining = max(0.0, deadline - time.monotonic())
+            response = self.client.get("/api/v1/jobs/" + job_id, params={"wait": min(5.0, remaining)})
             assert response.status_code == 200, response.text
             latest = response.json()
             if latest["status"] in {"completed", "failed", "cancelled"}:
@@ -2,6 +2,9 @@ import tempfile
 import unittest
 from pathlib import Path
 
+from sqlalchemy import text as sql_text
+
+from app.repositories import UnitOfWork
 from tests.support import TestApp
 
 
@@ -115,7 +118,7 @@ class BrowserApiContractTests(unittest.TestCase):
         self.assertEqual(chat.status_code, 200, chat.text)
         chat_id = chat.json()["id"]
         detail = self.client.get(f"/api/v1/chats/{chat_id}").json()
-        self.assertEqual(set(detail), {"chat", "messages"})
+        self.assertEqual(set(detail), {"chat", "messages", "next_before"})
         self.assertEqual(detail["chat"]["workspace_id"], workspace_id)
         self.assertEqual(detail["messages"], [])
 
@@ -134,6 +137,47 @@ class BrowserApiContractTests(unittest.TestCase):
         self.assertEqual(revised.status_code, 200, revised.text)
         self.assertEqual(revised.json()["content"], "Revised.")
 
+    def test_chat_detail_pages_backwards_from_a_message_cursor(self):
+        self.running.create_and_login()
+        chat_id = self.client.post("/api/v1/chats", json={"title": "Long"}).json()["id"]
+        other_id = self.client.post("/api/v1/chats", json={"title": "Other"}).json()["id"]
+        with UnitOfWork(
+            self.running.services.runtime.session_factory, self.running.services.runtime.secret_store
+        ) as uow:
+            for index in range(250):
+                uow.repo.add_message(chat_id, "user" if index % 2 == 0 else "assistant", f"message {index}")
+            stranger = uow.repo.add_message(other_id, "user", "elsewhere").id
+            indexes = {
+                row[0]
+                for row in uow.session.execute(
+                    sql_text("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='messages'")
+                )
+            }
+        self.assertIn("idx_messages_chat_created", indexes)
+
+        whole = self.client.get(f"/api/v1/chats/{chat_id}").json()
+        self.assertEqual(len(whole["messages"]), 250)
+        self.assertIsNone(whole["next_before"])
+
+        pages = []
+        cursor = None
+        while True:
+            query = f"?limit=100&before={cursor}" if cursor else "?limit=100"
+            page = self.client.get(f"/api/v1/chats/{chat_id}{query}")
+            self.assertEqual(page.status_code, 200, page.text)
+            pages.append(page.json()["messages"])
+            cursor = page.json()["next_before"]
+            if cursor is None:
+                break
+        self.assertEqual([len(page) for page in pages], [100, 100, 50])
+        self.assertEqual(pages[0][-1]["text"], "message 249")
+        stitched = [message for page in reversed(pages) for message in page]
+        self.assertEqual(stitched, whole["messages"])
+
+        self.assertEqual(self.client.get(f"/api/v1/chats/{chat_id}?before={stranger}").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/v1/chats/{chat_id}?before=missing").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/v1/chats/{chat_id}?limit=0").status_code, 422)
+
     def test_jobs_are_owner_scoped_and_use_the_typed_shape(self):
         self.running.create_and_login("owner")
         started = self.client.post("/api/v1/media/image-jobs", json={"prompt": "draw a cat"})
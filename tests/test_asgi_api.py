@@ -135,6 +135,30 @@ class AsgiApiTests(unittest.TestCase):
         self.assertEqual(response.status_code, 413)
         self.assertEqual(response.json()["error"]["message"], "request body too large")
 
+    def test_asgi_counts_a_body_without_a_length_as_the_route_reads_it(self):
+        self.test_app.__exit__(None, None, None)
+        self.test_app = TestApp(Path(self.tmp.name) / "limited", json_limit=1024)
+        self.running = self.test_app.__enter__()
+        self.client = self.running.client
+
+        def pieces():
+            # Chunked, so there is no Content-Length to refuse it by.
+            yield b'{"username": "owner", "password": "'
+            for _ in range(8):
+                yield b"x" * 256
+            yield b'"}'
+
+        response = self.client.post("/api/v1/users", content=pieces(), headers={"Content-Type": "application/json"})
+        within = self.client.post(
+            "/api/v1/users",
+            content=iter([b'{"username": "owner", ', b'"password": "correct horse battery staple"}']),
+            headers={"Content-Type": "application/json"},
+        )
+
+        self.assertEqual(response.status_code, 413, response.text)
+        self.assertEqual(response.json()["error"], {"code": 413, "message": "request body too large", "maxBytes": 1024})
+        self.assertNotEqual(within.status_code, 413, within.text)
+
 
 if __name__ == "__main__":
     unittest.main()
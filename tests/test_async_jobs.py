@@ -1,3 +1,4 @@
+import asyncio
 import json
 import tempfile
 import threading
@@ -8,6 +9,8 @@ from types import SimpleNamespace
 
 from sqlalchemy import func, select
 
+from app import database
+
 from app.job_service import JobExecution, LEGAL_TRANSITIONS, InvalidJobTransition, transition_job, transition_turn
 from app.models import MediaFile
 from app.provider_contracts import ChatToolCall, MediaArtifact, ProviderError
@@ -165,11 +168,51 @@ class AsyncJobTests(unittest.TestCase):
             self.assertEqual(title_job["status"], "completed")
             capability_job = running.wait_job(primary["result"]["capability_planning_job_id"])
             self.assertEqual(capability_job["status"], "completed")
-            self.assertEqual(
+            # Planning waits with the chat's turns and the title runs in the
+            # background lane under its own key, so either may reach the model first.
+            self.assertCountEqual(
                 [provider._task_role(request) for request in provider.task_requests],
                 [TITLE_GENERATION, CAPABILITY_PLANNING],
             )
 
+    def test_a_chats_next_turn_does_not_wait_for_its_title_followup(self):
+        title_gate = threading.Event()
+        provider = FakeChatProvider(
+            ["Noted."],
+            task_outputs={TITLE_GENERATION: {"title": "Garden Plans"}},
+            task_gates={TITLE_GENERATION: title_gate},
+        )
+        self.addCleanup(title_gate.set)
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            TestApp(Path(tmp), chat_provider=provider, interactive_workers=2) as running,
+        ):
+            running.create_and_login()
+            chat = running.client.post("/api/v1/chats", json={"title": "New chat", "memory_mode": "off"}).json()
+            first = running.client.post(
+                f"/api/v1/chats/{chat['id']}/turns",
+                json={"text": "Help me plan a garden", "memory_mode": "off"},
+            ).json()
+            self.assertTrue(provider.task_started[TITLE_GENERATION].wait(5))
+            second = running.client.post(
+                f"/api/v1/chats/{chat['id']}/turns",
+                json={"text": "Start with tomatoes", "memory_mode": "off"},
+            ).json()
+            deadline = time.monotonic() + 5
+            turn = None
+            while time.monotonic() < deadline:
+                turn = running.client.get(f"/api/v1/jobs/{second['job']['id']}").json()
+                if turn["status"] == "completed":
+                    break
+                time.sleep(0.01)
+            title_job_id = running.client.get(f"/api/v1/jobs/{first['job']['id']}").json()["result"]["title_job_id"]
+            title = running.client.get(f"/api/v1/jobs/{title_job_id}").json()
+
+            self.assertEqual(turn["status"], "completed")
+            self.assertEqual(title["status"], "running")
+            title_gate.set()
+            self.assertEqual(running.wait_job(title_job_id)["status"], "completed")
+
     def test_persona_reply_completes_before_nonessential_capability_planning(self):
         planning_gate = threading.Event()
         provider = FakeChatProvider(
@@ -775,5 +818,226 @@ class AsyncJobTests(unittest.TestCase):
                             transition_turn(turn, target)
 
 
+class JobResumptionTests(unittest.TestCase):
+    """Work a restart interrupted is submitted again when repeating it is safe."""
+
+    def _interrupted_title(self, base: Path, *, attempts: int) -> tuple[str, str]:
+        provider = FakeChatProvider(["A reply."], task_outputs={TITLE_GENERATION: {"title": "Garden Plans"}})
+        with TestApp(base, chat_provider=provider) as running:
+            running.create_and_login()
+            chat = running.client.post("/api/v1/chats", json={"title": "New chat", "memory_mode": "off"}).json()
+            accepted = running.client.post(
+                f"/api/v1/chats/{chat['id']}/turns",
+                json={"text": "Help me plan a garden", "memory_mode": "off"},
+            ).json()
+            primary = running.wait_job(accepted["job"]["id"])
+            title_job_id = primary["result"]["title_job_id"]
+            database_path = running.config.database_path
+        # The process died while the title model was thinking.
+        conn = database.connect_sqlite(database_path)
+        conn.execute(
+            "UPDATE async_jobs SET status='running', attempts=?, result_json=NULL, completed_at=NULL WHERE id=?",
+            (attempts, title_job_id),
+        )
+        conn.execute("UPDATE chats SET title='Help me plan a garden' WHERE id=?", (chat["id"],))
+        conn.commit()
+        conn.close()
+        return chat["id"], title_job_id
+
+    def test_a_restart_runs_an_interrupted_title_followup_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            chat_id, title_job_id = self._interrupted_title(Path(tmp), attempts=1)
+            provider = FakeChatProvider(task_outputs={TITLE_GENERATION: {"title": "Garden Plans"}})
+            with TestApp(Path(tmp), chat_provider=provider) as restarted:
+                restarted.client.post("/api/v1/session", json={"username": "owner", "password": "pass1234"})
+                job = restarted.wait_job(title_job_id)
+                chat = restarted.client.get(f"/api/v1/chats/{chat_id}").json()
+                with restarted.services.jobs._uow() as uow:
+                    attempts = uow.repo.job_by_id(title_job_id).attempts
+
+            self.assertEqual(job["status"], "completed")
+            self.assertEqual(attempts, 2)
+            self.assertEqual(chat["chat"]["title"], "Garden Plans")
+
+    def test_a_job_at_its_attempt_cap_fails_instead_of_resuming(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            _chat_id, title_job_id = self._interrupted_title(Path(tmp), attempts=3)
+            with TestApp(Path(tmp)) as restarted:
+                restarted.client.post("/api/v1/session", json={"username": "owner", "password": "pass1234"})
+                job = restarted.client.get(f"/api/v1/jobs/{title_job_id}").json()
+
+            self.assertEqual((job["status"], job["error"]), ("failed", "interrupted by server restart"))
+
+    def test_a_queued_job_nothing_can_resume_fails_rather_than_waiting(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            jobs = running.services.jobs
+            with jobs._uow() as uow:
+                orphan = uow.repo.add_job(
+                    user_id=user_id, chat_id=None, turn_id=None, kind="title_followup", progress="Queued"
+                )
+
+            self.assertEqual(jobs.resume_interrupted(), [])
+            job = running.client.get(f"/api/v1/jobs/{orphan.id}").json()
+
+        self.assertEqual((job["status"], job["error"]), ("failed", "interrupted by server restart"))
+
+    def test_a_picture_that_cannot_resume_fails_its_request_and_attachment(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            chat = running.client.post("/api/v1/chats", json={"title": "Pictures"}).json()
+            jobs = running.services.jobs
+            with jobs._uow() as uow:
+                message = uow.repo.add_message(chat["id"], "assistant", "Here it comes.")
+                request, _ = uow.repo.add_capability_request(
+                    user_id=user_id,
+                    chat_id=chat["id"],
+                    turn_id=None,
+                    capability_key="media.generate_image",
+                    arguments={"prompt": "a lighthouse"},
+                    status="queued",
+                    permission_mode="auto",
+                    idempotency_key="resume-fails",
+                )
+                uow.repo.add_chat_attachment(
+                    user_id=user_id,
+                    chat_id=chat["id"],
+                    assistant_message_id=message.id,
+                    capability_request_id=request.id,
+                    kind="image",
+                    status="queued",
+                )
+                job = uow.repo.add_job(
+                    user_id=user_id,
+                    chat_id=chat["id"],
+                    turn_id=None,
+                    kind="image",
+                    progress="Queued again after a restart",
+                    capability_request_id=request.id,
+                )
+                request_id, job_id = request.id, job.id
+
+            def broken(_job):
+                raise RuntimeError("its inputs went away")
+
+            jobs.register_resumption("image", broken)
+            self.assertEqual(jobs.resume_interrupted(), [])
+            with jobs._uow() as uow:
+                request = uow.repo.capability_request_by_id(request_id)
+                attachment = uow.repo.chat_attachment_for_capability(user_id, request_id)
+                job = uow.repo.job_by_id(job_id)
+                settled = (
+                    job.status,
+                    request.status,
+                    request.error_code,
+                    attachment.status,
+                    attachment.retry_available,
+                )
+
+        self.assertEqual(settled, ("failed", "failed", "interrupted", "failed", 1))
+
+
+class JobWaitTests(unittest.TestCase):
+    """Waiting on a job reads its row when it changes, not on a timer."""
+
+    def _blocked_job(self, running, user_id):
+        jobs = running.services.jobs
+        with jobs._uow() as uow:
+            job_id = uow.repo.add_job(
+                user_id=user_id, chat_id=None, turn_id=None, kind="task_model", progress="Queued"
+            ).id
+        release = threading.Event()
+        jobs.submit(
+            job_id=job_id,
+            job_type="task_model",
+            user_id=user_id,
+            chat_id=None,
+            turn_id=None,
+            latency_class="standard",
+            model_key="task:test",
+            execution=JobExecution(execute=lambda _token: release.wait(5) and {"ok": True}),
+        )
+        return job_id, release
+
+    def test_wait_reads_the_job_only_when_it_changes(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            jobs = running.services.jobs
+            job_id, release = self._blocked_job(running, user_id)
+            reads = []
+            original_get = jobs.get
+            jobs.get = lambda *args: reads.append(args) or original_get(*args)
+            threading.Timer(0.6, release.set).start()
+
+            job = jobs.wait(user_id, job_id, timeout=5)
+
+        self.assertEqual(job["status"], "completed")
+        self.assertLessEqual(len(reads), 3)
+
+    def test_wait_async_completes_from_a_worker_thread_and_times_out_cleanly(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            jobs = running.services.jobs
+            job_id, release = self._blocked_job(running, user_id)
+
+            with self.assertRaises(TimeoutError):
+                asyncio.run(jobs.wait_async(user_id, job_id, timeout=0.1))
+            threading.Timer(0.1, release.set).start()
+            job = asyncio.run(jobs.wait_async(user_id, job_id, timeout=5))
+
+            self.assertEqual(job["status"], "completed")
+            self.assertEqual(jobs._waiters, {})
+            self.assertIsNone(asyncio.run(jobs.wait_async("someone-else", job_id, timeout=1)))
+
+    def test_job_route_holds_the_request_until_the_job_settles(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            job_id, release = self._blocked_job(running, user_id)
+
+            pending = running.client.get(f"/api/v1/jobs/{job_id}", params={"wait": 0.1}).json()
+            threading.Timer(0.1, release.set).start()
+            settled = running.client.get(f"/api/v1/jobs/{job_id}", params={"wait": 5}).json()
+
+        self.assertIn(pending["status"], {"queued", "running"})
+        self.assertEqual(settled["status"], "completed")
+
+
+class JobProgressTests(unittest.TestCase):
+    def test_running_work_reports_progress_through_its_token(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            jobs = running.services.jobs
+            with jobs._uow() as uow:
+                job_id = uow.repo.add_job(
+                    user_id=user_id, chat_id=None, turn_id=None, kind="task_model", progress="Queued"
+                ).id
+            reported = threading.Event()
+            release = threading.Event()
+
+            def execute(token):
+                token.report_progress("Rendering step 3 of 20")
+                reported.set()
+                release.wait(5)
+                return {"ok": True}
+
+            jobs.submit(
+                job_id=job_id,
+                job_type="task_model",
+                user_id=user_id,
+                chat_id=None,
+                turn_id=None,
+                latency_class="standard",
+                model_key="task:test",
+                execution=JobExecution(execute=execute),
+            )
+            self.assertTrue(reported.wait(5))
+            during = jobs.get(user_id, job_id)
+            release.set()
+            after = running.wait_job(job_id)
+
+        self.assertEqual(during["progress"], "Rendering step 3 of 20")
+        self.assertEqual(after["progress"], "Completed")
+
+
 if __name__ == "__main__":
     unittest.main()
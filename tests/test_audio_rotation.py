@@ -0,0 +1,84 @@
+"""Archiving the oldest synthesized speech without listing the hot directory.
+
+What matters is that the oldest clips go first, whether they were on disk at
+startup or stored since, that one pass records all of its moves together, and
+that a pass whose record fails leaves every clip where its row says it is.
+"""
+
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from app.audio_rotation import AudioRotator
+
+
+class AudioRotatorTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.hot = Path(self.tmp.name) / "audio"
+        self.archive = Path(self.tmp.name) / "archive"
+        self.hot.mkdir()
+        self.relocated: list[list[tuple[str, str]]] = []
+
+    def _clip(self, name: str, age: int = 0) -> Path:
+        path = self.hot / name
+        path.write_bytes(b"audio")
+        if age:
+            stamp = path.stat().st_mtime - age
+            os.utime(path, (stamp, stamp))
+        return path
+
+    def _rotator(self, limit: int, relocate=None) -> AudioRotator:
+        return AudioRotator(self.hot, self.archive, limit, relocate or self.relocated.append, logging.getLogger("test"))
+
+    def test_clips_found_at_startup_are_archived_oldest_first_and_recorded_together(self):
+        for name, age in (("b.mp3", 20), ("a.mp3", 30), ("c.mp3", 10)):
+            self._clip(name, age)
+        rotator = self._rotator(limit=1)
+        rotator._seed()
+
+        moved = rotator.rotate()
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(sorted(path.name for path in self.archive.iterdir()), ["a.mp3", "b.mp3"])
+        self.assertEqual([path.name for path in self.hot.iterdir()], ["c.mp3"])
+        # One transaction for the pass, not one per clip.
+        self.assertEqual(len(self.relocated), 1)
+        self.assertEqual([Path(target).name for _, target in self.relocated[0]], ["a.mp3", "b.mp3"])
+
+    def test_a_stored_clip_wakes_the_rotator_without_a_directory_listing(self):
+        self._clip("old.mp3", 30)
+        rotator = self._rotator(limit=1)
+        rotator.start()
+        self.addCleanup(rotator.stop)
+        with mock.patch.object(Path, "glob", side_effect=AssertionError("listed the hot directory")):
+            rotator.stored(self._clip("new.mp3"))
+            for _ in range(200):
+                if (self.archive / "old.mp3").exists():
+                    break
+                threading.Event().wait(0.01)
+
+        self.assertTrue((self.archive / "old.mp3").exists())
+        self.assertTrue((self.hot / "new.mp3").exists())
+
+    def test_a_failed_record_puts_every_clip_of_the_pass_back(self):
+        def refuse(_moves):
+            raise RuntimeError("database is locked")
+
+        for name, age in (("a.mp3", 30), ("b.mp3", 20), ("c.mp3", 10)):
+            self._clip(name, age)
+        rotator = self._rotator(limit=1, relocate=refuse)
+        rotator._seed()
+
+        self.assertEqual(rotator.rotate(), 0)
+        self.assertEqual(sorted(path.name for path in self.hot.iterdir()), ["a.mp3", "b.mp3", "c.mp3"])
+        self.assertEqual(list(self.archive.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
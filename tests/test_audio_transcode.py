@@ -0,0 +1,148 @@
+"""Decoding recordings through ffmpeg's pipes.
+
+What matters is that a recording finds an ffmpeg already waiting, that one is
+waiting again for the next, that MP4 still works, and that nothing is left on
+disk either way.
+"""
+
+import io
+from pathlib import Path
+import shutil
+import struct
+import tempfile
+import threading
+import unittest
+import wave
+
+from app.audio_transcode import PcmAudio, TranscodeFailed, Transcoder
+from tests.support import FakeFfmpeg
+
+
+def _wait_for(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        threading.Event().wait(0.01)
+
+
+class TranscoderTests(unittest.TestCase):
+    def test_a_recording_is_handed_to_the_waiting_ffmpeg_and_another_is_started(self):
+        ffmpeg = FakeFfmpeg(b"\x01\x00" * 16000)
+        transcoder = Transcoder(warm=1, spawn=ffmpeg)
+        transcoder.start()
+        _wait_for(lambda: len(transcoder._ready) == 1)
+        self.assertEqual(len(ffmpeg.commands), 1)
+
+        audio = transcoder.transcode(b"webm bytes", ".webm")
+        _wait_for(lambda: len(transcoder._ready) == 1 and len(ffmpeg.commands) == 2)
+        transcoder.close()
+
+        self.assertEqual(ffmpeg.inputs, [b"webm bytes"])
+        self.assertEqual(ffmpeg.commands[0][ffmpeg.commands[0].index("-i") + 1], "pipe:0")
+        self.assertEqual((audio.rate, audio.channels, audio.seconds), (16000, 1, 1.0))
+        self.assertEqual(len(ffmpeg.commands), 2)
+        self.assertEqual(len(transcoder._ready), 0)
+
+    def test_an_mp4_is_read_from_a_temporary_file_that_is_removed_afterwards(self):
+        seen = []
+        ffmpeg = FakeFfmpeg()
+
+        def spawn(command):
+            source = Path(command[command.index("-i") + 1])
+            seen.append((source, source.read_bytes()))
+            return ffmpeg(command)
+
+        with tempfile.TemporaryDirectory() as folder:
+            transcoder = Transcoder(warm=0, temp_dir=Path(folder), spawn=spawn)
+            transcoder.transcode(b"mp4 bytes", ".mp4")
+            leftovers = list(Path(folder).iterdir())
+
+        self.assertEqual(seen[0][1], b"mp4 bytes")
+        self.assertEqual(seen[0][0].suffix, ".mp4")
+        self.assertIn("-nostdin", ffmpeg.commands[0])
+        self.assertEqual(leftovers, [])
+
+    def test_a_spooled_upload_is_fed_to_ffmpeg_from_its_file(self):
+        ffmpeg = FakeFfmpeg(b"\x00\x00" * 160)
+        recording = b"webm" * 50000
+        with tempfile.SpooledTemporaryFile(max_size=1024) as upload:
+            upload.write(recording)
+            upload.seek(0)
+            Transcoder(warm=0, spawn=ffmpeg).transcode(upload, ".webm")
+
+        self.assertEqual(ffmpeg.inputs, [recording])
+
+    def test_the_upload_is_let_go_of_before_a_failed_conversion_returns(self):
+        feeding = threading.Event()
+        fed = []
+
+        class SlowStdin:
+            def write(self, data):
+                feeding.set()
+                threading.Event().wait(0.2)
+                fed.append(data)
+                return len(data)
+
+            def close(self):
+                fed.append(None)
+
+        class GivesUp:
+            # ffmpeg decides the recording is not audio while it is still being fed.
+            returncode = None
+            stdin = SlowStdin()
+
+            def poll(self):
+                return self.returncode
+
+            def communicate(self, content=None, timeout=None):
+                feeding.wait(5)
+                self.returncode = 1
+                return b"", b""
+
+        with tempfile.SpooledTemporaryFile(max_size=1024) as upload:
+            upload.write(b"webm" * 500)
+            upload.seek(0)
+            with self.assertRaises(TranscodeFailed):
+                Transcoder(warm=0, spawn=lambda _command: GivesUp()).transcode(upload, ".webm")
+
+            # The caller may rewind and copy it now; nothing else is reading it.
+            self.assertEqual(fed[-1:], [None])
+            self.assertFalse(any(thread.name == "ffmpeg-feed" for thread in threading.enumerate()))
+
+    def test_a_recording_ffmpeg_cannot_decode_or_an_ffmpeg_that_is_missing_fails_the_conversion(self):
+        with self.assertRaises(TranscodeFailed):
+            Transcoder(warm=0, spawn=FakeFfmpeg(b"", returncode=1)).transcode(b"noise")
+
+        def missing(_command):
+            raise FileNotFoundError("ffmpeg")
+
+        transcoder = Transcoder(warm=1, spawn=missing)
+        transcoder.start()
+        with self.assertRaises(TranscodeFailed):
+            transcoder.transcode(b"noise")
+
+    def test_pcm_becomes_a_wav_any_reader_accepts(self):
+        frames = struct.pack("<4h", 0, 1, -1, 2)
+        with wave.open(io.BytesIO(PcmAudio(frames).wav()), "rb") as handle:
+            self.assertEqual((handle.getframerate(), handle.getnchannels(), handle.getsampwidth()), (16000, 1, 2))
+            self.assertEqual(handle.readframes(4), frames)
+
+    @unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is not installed")
+    def test_real_ffmpeg_decodes_from_its_pipe_to_sixteen_kilohertz_mono(self):
+        source = io.BytesIO()
+        with wave.open(source, "wb") as handle:
+            handle.setnchannels(2)
+            handle.setsampwidth(2)
+            handle.setframerate(44100)
+            handle.writeframes(b"\x00\x00" * 2 * 44100)
+        transcoder = Transcoder(warm=1)
+        try:
+            audio = transcoder.transcode(source.getvalue(), ".wav")
+        finally:
+            transcoder.close()
+
+        self.assertAlmostEqual(audio.seconds, 1.0, places=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""The cache in front of things that are expensive to ask twice.
+
+What matters is what it refuses to serve: an entry past its age, and the least
+recently used entry once it is full.
+"""
+
+import unittest
+
+from app.bounded_cache import BoundedCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class BoundedCacheTests(unittest.TestCase):
+    def test_an_entry_past_its_age_is_absent_rather_than_stale(self):
+        clock = Clock()
+        cache = BoundedCache(4, 10, clock=clock)
+        cache.put("question", (1.0, 0.0))
+
+        clock.now += 9
+        self.assertEqual(cache.get("question"), (1.0, 0.0))
+        clock.now += 2
+        self.assertIsNone(cache.get("question"))
+        self.assertEqual(len(cache), 0)
+
+    def test_the_least_recently_used_entry_goes_first(self):
+        cache = BoundedCache(2, 60, clock=Clock())
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+    def test_entries_can_be_dropped_by_key_or_by_rule(self):
+        cache = BoundedCache(8, 60, clock=Clock())
+        for key in (("u1", "x"), ("u1", "y"), ("u2", "x")):
+            cache.put(key, key)
+
+        cache.discard(("u2", "x"))
+        self.assertEqual(cache.discard_where(lambda key, _value: key[0] == "u1"), 2)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
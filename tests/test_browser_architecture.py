@@ -18,6 +18,7 @@ class BrowserArchitectureTests(unittest.TestCase):
             "home_cards.ts",
             "home_controls.ts",
             "home_view.ts",
+            "live_transcription.ts",
             "onboarding.ts",
             "chat_rendering.ts",
             "capabilities.ts",
@@ -32,6 +33,7 @@ class BrowserArchitectureTests(unittest.TestCase):
             "persona_card_view.ts",
             "persona_lore_copy_view.ts",
             "persona_lore_view.ts",
+            "pcm_capture.ts",
             "preset_settings_view.ts",
             "playback.ts",
             "recording.ts",
@@ -75,6 +77,8 @@ class BrowserArchitectureTests(unittest.TestCase):
         self.assertLess((SOURCE / "streaming_audio.ts").read_text(encoding="utf-8").count("\n"), 150)
         self.assertLess((SOURCE / "turn_detection.ts").read_text(encoding="utf-8").count("\n"), 220)
         self.assertLess((SOURCE / "recording.ts").read_text(encoding="utf-8").count("\n"), 280)
+        self.assertLess((SOURCE / "live_transcription.ts").read_text(encoding="utf-8").count("\n"), 150)
+        self.assertLess((SOURCE / "pcm_capture.ts").read_text(encoding="utf-8").count("\n"), 150)
         self.assertLess((SOURCE / "transcript_segments.ts").read_text(encoding="utf-8").count("\n"), 120)
         self.assertLess((SOURCE / "playback.ts").read_text(encoding="utf-8").count("\n"), 250)
         self.assertLess((SOURCE / "identity_workflow_setup_view.ts").read_text(encoding="utf-8").count("\n"), 520)
@@ -0,0 +1,297 @@
+"""ComfyUI's pushed progress, and the polling that stands in when it is absent.
+
+What matters is that a finished prompt is noticed as soon as ComfyUI says so,
+that nothing breaks when the socket cannot be had, and that the websocket is
+spoken correctly enough to talk to a real server.
+"""
+
+import base64
+import hashlib
+import json
+import queue
+import socket
+import struct
+import threading
+import unittest
+from unittest import mock
+
+from app import media_clients
+from app.comfyui_events import ComfyUIEvents, WebSocketClosed, open_websocket
+from app.provider_contracts import CancellationToken
+
+
+def _text_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    if len(payload) < 126:
+        return bytes([0x80 | opcode, len(payload)]) + payload
+    return bytes([0x80 | opcode, 126]) + struct.pack("!H", len(payload)) + payload
+
+
+class _WebSocketServer:
+    """Accepts one upgrade, then sends whatever frames the test queues."""
+
+    def __init__(self):
+        self._socket = socket.socket()
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(1)
+        self.address = f"127.0.0.1:{self._socket.getsockname()[1]}"
+        self.frames: queue.Queue = queue.Queue()
+        self.request = b""
+        self.received = b""
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        connection, _ = self._socket.accept()
+        with connection:
+            while b"\r\n\r\n" not in self.request:
+                self.request += connection.recv(4096)
+            key = next(
+                line.split(b":", 1)[1].strip()
+                for line in self.request.split(b"\r\n")
+                if line.lower().startswith(b"sec-websocket-key")
+            )
+            accept = base64.b64encode(hashlib.sha1(key + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11").digest())
+            connection.sendall(
+                b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+            )
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    break
+                connection.sendall(frame)
+            connection.settimeout(1)
+            try:
+                while chunk := connection.recv(4096):
+                    self.received += chunk
+            except OSError:
+                pass
+
+    def send(self, message: dict):
+        self.frames.put(_text_frame(json.dumps(message).encode()))
+
+    def close(self):
+        self.frames.put(None)
+        self._socket.close()
+
+
+class _Listener:
+    """A connection that hands over scripted messages, then ends."""
+
+    def __init__(self, messages):
+        self.messages = queue.Queue()
+        for message in messages:
+            self.messages.put(message)
+
+    def receive(self):
+        message = self.messages.get()
+        if message is None:
+            raise WebSocketClosed("done")
+        return json.dumps(message)
+
+    def close(self):
+        pass
+
+
+class WebSocketClientTests(unittest.TestCase):
+    def test_messages_arrive_and_pings_are_answered_with_a_masked_pong(self):
+        server = _WebSocketServer()
+        connection = open_websocket(f"ws://{server.address}/ws?clientId=abc", {"Authorization": "Bearer t"})
+        try:
+            server.frames.put(_text_frame(b"hi", opcode=0x9))
+            server.send({"type": "status", "data": {}})
+            big = {"type": "progress", "data": {"prompt_id": "p", "text": "x" * 500}}
+            server.send(big)
+            self.assertEqual(json.loads(connection.receive()), {"type": "status", "data": {}})
+            self.assertEqual(json.loads(connection.receive()), big)
+        finally:
+            server.close()
+            connection.close()
+
+        self.assertIn(b"GET /ws?clientId=abc HTTP/1.1", server.request)
+        self.assertIn(b"Authorization: Bearer t", server.request)
+        # A pong (0xA) carrying the ping's payload, masked as a client must.
+        self.assertEqual(server.received[0], 0x8A)
+        self.assertEqual(server.received[1], 0x80 | 2)
+        mask = server.received[2:6]
+        self.assertEqual(bytes(byte ^ mask[index % 4] for index, byte in enumerate(server.received[6:8])), b"hi")
+
+    def test_a_server_that_refuses_the_upgrade_is_not_a_websocket(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+
+        def refuse():
+            connection, _ = listener.accept()
+            with connection:
+                connection.recv(4096)
+                connection.sendall(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+
+        threading.Thread(target=refuse, daemon=True).start()
+        try:
+            with self.assertRaises(WebSocketClosed):
+                open_websocket(f"ws://127.0.0.1:{listener.getsockname()[1]}/ws")
+        finally:
+            listener.close()
+
+
+class ComfyUIEventsTests(unittest.TestCase):
+    def test_progress_and_completion_are_kept_per_prompt(self):
+        server = _WebSocketServer()
+        events = ComfyUIEvents(f"http://{server.address}")
+        events.start()
+        try:
+            server.send({"type": "status", "data": {"status": {"exec_info": {"queue_remaining": 1}}}})
+            server.send({"type": "progress", "data": {"prompt_id": "p1", "node": "3", "value": 4, "max": 20}})
+            server.send({"type": "executing", "data": {"prompt_id": "p1", "node": None}})
+            server.send({"type": "execution_error", "data": {"prompt_id": "p2", "exception_message": "no VRAM"}})
+            finished = events.wait("p1", 1, 5)
+            failed = events.wait("p2", 0, 5)
+        finally:
+            server.close()
+            events.close()
+
+        self.assertEqual((finished.value, finished.maximum, finished.node, finished.finished), (4, 20, "3", True))
+        self.assertEqual((failed.finished, failed.error), (True, "no VRAM"))
+        self.assertIn(f"clientId={events.client_id}".encode(), server.request)
+
+    def test_an_unreachable_socket_is_not_retried_by_every_job(self):
+        attempts = []
+
+        def unreachable(*_args):
+            attempts.append(1)
+            raise ConnectionRefusedError()
+
+        events = ComfyUIEvents("http://c.invalid:8188", connect=unreachable)
+        events.start()
+        for _ in range(50):
+            if events._thread is None and attempts:
+                break
+            threading.Event().wait(0.01)
+        events.start()
+
+        self.assertEqual(len(attempts), 1)
+        self.assertFalse(events.listening)
+
+
+class ComfyUIHistoryWaitTests(unittest.TestCase):
+    HISTORY = {"prompt-1": {"outputs": {"9": {"images": [{"filename": "out.png"}]}}}}
+
+    def _history_transport(self, ready):
+        asked = []
+
+        class Response:
+            def __init__(self, payload):
+                self.payload = payload
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *_args):
+                return False
+
+            def close(self):
+                return None
+
+            def read(self, *_size):
+                return json.dumps(self.payload).encode()
+
+        def fake_urlopen(request, timeout=0):
+            asked.append(request.full_url)
+            return Response(self.HISTORY if ready() else {})
+
+        return asked, fake_urlopen
+
+    def test_a_listening_job_asks_for_history_when_the_prompt_finishes(self):
+        release = threading.Event()
+        messages = [
+            {"type": "progress", "data": {"prompt_id": "prompt-1", "value": 1, "max": 4}},
+            {"type": "progress", "data": {"prompt_id": "prompt-1", "value": 4, "max": 4}},
+            {"type": "execution_success", "data": {"prompt_id": "prompt-1"}},
+        ]
+
+        def connect(*_args):
+            listener = _Listener([])
+
+            def deliver():
+                release.wait(5)
+                for message in messages:
+                    listener.messages.put(message)
+
+            threading.Thread(target=deliver, daemon=True).start()
+            return listener
+
+        events = ComfyUIEvents("http://comfy.test", connect=connect)
+        events.start()
+        for _ in range(100):
+            if events.listening:
+                break
+            threading.Event().wait(0.01)
+        reported = []
+        asked, fake_urlopen = self._history_transport(release.is_set)
+        with mock.patch("app.media_clients.urllib.request.urlopen", side_effect=fake_urlopen):
+            threading.Timer(0.1, release.set).start()
+            history = media_clients._await_comfyui_history(
+                "http://comfy.test",
+                {},
+                "prompt-1",
+                events,
+                CancellationToken(),
+                lambda value, maximum: reported.append((value, maximum)),
+            )
+
+        self.assertEqual(history, self.HISTORY)
+        # Once straight away, then once when ComfyUI said it was done.
+        self.assertEqual(len(asked), 2)
+        self.assertEqual(reported[-1], (4, 4))
+
+    def test_without_a_listener_history_is_polled_at_growing_intervals(self):
+        def unreachable(*_args):
+            raise ConnectionRefusedError()
+
+        events = ComfyUIEvents("http://comfy.test", connect=unreachable)
+        asked, fake_urlopen = self._history_transport(lambda: len(asked) > 3)
+        with (
+            mock.patch("app.media_clients.urllib.request.urlopen", side_effect=fake_urlopen),
+            mock.patch.object(media_clients, "COMFYUI_FIRST_POLL_SECONDS", 0.01),
+            mock.patch.object(media_clients, "COMFYUI_MAX_POLL_SECONDS", 0.05),
+        ):
+            history = media_clients._await_comfyui_history(
+                "http://comfy.test", {}, "prompt-1", events, CancellationToken(), None
+            )
+
+        self.assertEqual(history, self.HISTORY)
+        self.assertEqual(len(asked), 4)
+
+    def test_a_prompt_comfyui_failed_fails_without_waiting_for_history(self):
+        events = ComfyUIEvents(
+            "http://comfy.test",
+            connect=lambda *_args: _Listener(
+                [{"type": "execution_error", "data": {"prompt_id": "prompt-1", "exception_message": "bad graph"}}]
+            ),
+        )
+        events.start()
+        events.wait("prompt-1", 0, 5)
+        asked, fake_urlopen = self._history_transport(lambda: False)
+        with mock.patch("app.media_clients.urllib.request.urlopen", side_effect=fake_urlopen):
+            with self.assertRaisesRegex(ValueError, "bad graph"):
+                media_clients._await_comfyui_history(
+                    "http://comfy.test", {}, "prompt-1", events, CancellationToken(), None
+                )
+        self.assertEqual(asked, [])
+
+    def test_cancelling_the_job_ends_the_wait(self):
+        events = ComfyUIEvents("http://comfy.test", connect=lambda *_args: _Listener([]))
+        events.start()
+        token = CancellationToken()
+        threading.Timer(0.1, token.cancel).start()
+        asked, fake_urlopen = self._history_transport(lambda: False)
+        with mock.patch("app.media_clients.urllib.request.urlopen", side_effect=fake_urlopen):
+            with self.assertRaises(Exception) as raised:
+                media_clients._await_comfyui_history("http://comfy.test", {}, "prompt-1", events, token, None)
+
+        self.assertEqual(getattr(raised.exception, "code", None), "cancelled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,10 +4,13 @@ import threading
 import time
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from sqlalchemy import func, select
+from sqlalchemy import event, func, select
 
+from app.context_policy import TokenEstimator
 from app.models import Memory
+from app.persona_output import safe_persona_output_text
 from app.provider_contracts import ChatDelta, ProviderError
 from app.repositories import UnitOfWork
 from tests.support import FakeChatProvider, TestApp
@@ -64,6 +67,20 @@ class FailFirstTurnProvider(FakeChatProvider):
         yield ChatDelta("reply to the current request", done=True)
 
 
+class ConnectingProvider(FakeChatProvider):
+    """Says when it connected, the way the Ollama adapter does, then streams slowly."""
+
+    def stream(self, request, cancellation):
+        self.requests.append(request)
+        time.sleep(0.02)
+        request.on_connected()
+        time.sleep(0.02)
+        yield ChatDelta("", metadata={"prompt_eval_count": 12})
+        yield ChatDelta("first ")
+        time.sleep(0.05)
+        yield ChatDelta("and last", done=True)
+
+
 class ContextServiceTests(unittest.TestCase):
     def test_browser_exposes_truthful_saved_memory_and_context_controls(self):
         source_root = Path(__file__).resolve().parents[1] / "frontend" / "src"
@@ -143,6 +160,28 @@ class ContextServiceTests(unittest.TestCase):
             transcript = running.client.get(f"/api/v1/chats/{chat['id']}").json()["messages"]
             self.assertIn("send a garden selfie", [message["text"] for message in transcript])
 
+    def test_a_turn_records_how_long_each_phase_took(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp), chat_provider=ConnectingProvider()) as running:
+            running.create_and_login()
+            chat = running.client.post("/api/v1/chats", json={"title": "Timeline"}).json()
+            started = running.client.post(f"/api/v1/chats/{chat['id']}/turns", json={"text": "time me"}).json()
+            self.assertEqual(running.wait_job(started["job"]["id"])["status"], "completed")
+            # The commit is timed once its transaction is done, so it lands just after the job.
+            for _ in range(200):
+                phases = running.client.get(f"/api/v1/turns/{started['turn']['id']}").json()["phases"]
+                if phases["commit_ms"] is not None:
+                    break
+                time.sleep(0.01)
+
+            self.assertGreaterEqual(phases["provider_connect_ms"], 20)
+            self.assertGreaterEqual(phases["first_token_ms"], phases["provider_connect_ms"] + 20)
+            self.assertGreaterEqual(phases["streaming_ms"], 50)
+            self.assertIsNotNone(phases["context_plan_ms"])
+            self.assertIsNotNone(phases["commit_ms"])
+            report = running.services.runtime.metrics.snapshot()["turn_phases"]
+            self.assertEqual(sorted(report), ["commit", "context_plan", "first_token", "provider_connect", "streaming"])
+            self.assertEqual(report["first_token"]["count"], 1)
+
     def test_context_window_is_sent_and_accounted(self):
         provider = CausalProvider()
         provider.first_release.set()
@@ -457,10 +496,6 @@ class ContextServiceTests(unittest.TestCase):
             self.assertEqual([message["role"] for message in detail["messages"]], ["user"])
 
 
-if __name__ == "__main__":
-    unittest.main()
-
-
 class ContextDegradationVisibilityTests(unittest.TestCase):
     """A reply produced with reduced context has to stay explainable after a reload."""
 
@@ -489,3 +524,146 @@ class ContextDegradationVisibilityTests(unittest.TestCase):
                 self.assertEqual(assistant["degraded_reason"], "history_floor_dropped:summary,memory")
                 user_message = next(item for item in messages if item["role"] == "user")
                 self.assertIsNone(user_message["degraded_reason"])
+
+
+class _SeededChat:
+    def _seed(self, running, user_id, turns):
+        chat = running.client.post("/api/v1/chats", json={"title": f"{turns} turns"}).json()
+        with UnitOfWork(running.services.runtime.session_factory, running.services.runtime.secret_store) as uow:
+            for number in range(turns):
+                asked = uow.repo.add_message(chat["id"], "user", f"question {number}")
+                turn = uow.repo.add_turn(
+                    user_id=user_id, chat_id=chat["id"], message_id=asked.id, provider="ollama", model="fake"
+                )
+                turn.assistant_message_id = uow.repo.add_message(chat["id"], "assistant", f"answer {number}").id
+                turn.status = "completed"
+            current = uow.repo.add_message(chat["id"], "user", "the current question")
+            turn = uow.repo.add_turn(
+                user_id=user_id, chat_id=chat["id"], message_id=current.id, provider="ollama", model="fake"
+            )
+            return chat["id"], turn.id, current.id
+
+    def _load(self, running, user_id, chat_id, turn_id, message_id):
+        statements = []
+
+        def count(*_args):
+            statements.append(1)
+
+        engine = running.services.runtime.engine
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            loaded = running.services.context._load_context(
+                turn_id=turn_id,
+                user_id=user_id,
+                chat_id=chat_id,
+                current_message_id=message_id,
+                workspace_id=None,
+                persona_id=None,
+                memory_mode="off",
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        return loaded, len(statements)
+
+
+class ContextLoadQueryTests(_SeededChat, unittest.TestCase):
+    """Reading a long chat back for a prompt costs the same handful of statements as a short one."""
+
+    def test_statement_count_does_not_grow_with_the_chat(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            short = self._seed(running, user_id, 5)
+            long = self._seed(running, user_id, 400)
+            (_current, short_history, _memories, _summary, _skipped), short_count = self._load(running, user_id, *short)
+            (_current, long_history, _memories, _summary, _skipped), long_count = self._load(running, user_id, *long)
+            self.assertEqual(len(short_history), 10)
+            self.assertEqual(len(long_history), 800)
+            self.assertEqual(long_history[-1]["text"], "answer 399")
+            self.assertEqual(short_count, long_count)
+            self.assertLessEqual(long_count, 8)
+
+    def test_summary_bounds_what_is_read_without_changing_the_prompt(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            chat_id, turn_id, message_id = self._seed(running, user_id, 60)
+            with UnitOfWork(running.services.runtime.session_factory, running.services.runtime.secret_store) as uow:
+                through = uow.repo.turns_before(user_id, chat_id, 10_000)[49]
+                full, _skipped = running.services.context._load_history(
+                    uow.repo, user_id, chat_id, uow.repo.message(message_id), uow.repo.turn(user_id, turn_id), None
+                )
+                uow.repo.add_summary(
+                    user_id=user_id,
+                    chat_id=chat_id,
+                    previous_summary_id=None,
+                    through_message_id=through.user_message_id,
+                    provider="task-fallback",
+                    model="none",
+                    prompt_version="test",
+                    source_digest="digest",
+                    source_message_count=99,
+                    content="The first fifty questions were answered.",
+                    estimated_tokens=10,
+                )
+            (_current, history, _memories, summary, skipped), _count = self._load(
+                running, user_id, chat_id, turn_id, message_id
+            )
+            self.assertEqual(skipped, 98)
+            self.assertEqual(len(history), 22)
+            self.assertEqual(skipped + len(history), len(full))
+            after = running.services.context._history_after_summary
+            self.assertEqual(after(history, summary), after(full, summary))
+            self.assertEqual(after(history, summary)[0]["text"], "answer 49")
+
+
+class PreparedHistoryTests(_SeededChat, unittest.TestCase):
+    """A turn prepares only the history that is new since the chat's last turn."""
+
+    def test_unchanged_history_is_not_prepared_again(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            chat_id, turn_id, message_id = self._seed(running, user_id, 50)
+            with mock.patch("app.context_service.safe_persona_output_text", wraps=safe_persona_output_text) as sanitize:
+                (_current, first, *_rest), _count = self._load(running, user_id, chat_id, turn_id, message_id)
+                self.assertEqual(sanitize.call_count, 50)
+                (_current, second, *_rest), _count = self._load(running, user_id, chat_id, turn_id, message_id)
+                self.assertEqual(sanitize.call_count, 50)
+            self.assertEqual(first, second)
+            self.assertTrue(all(before is after for before, after in zip(first, second)))
+            self.assertEqual(first[-1]["tokens"], TokenEstimator().message(first[-1]["provider_message"]))
+
+    def test_next_turn_prepares_only_the_new_exchange(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            chat_id, turn_id, message_id = self._seed(running, user_id, 30)
+            self._load(running, user_id, chat_id, turn_id, message_id)
+            with UnitOfWork(running.services.runtime.session_factory, running.services.runtime.secret_store) as uow:
+                turn = uow.repo.turn_by_id(turn_id)
+                turn.assistant_message_id = uow.repo.add_message(chat_id, "assistant", "the current answer").id
+                turn.status = "completed"
+                following = uow.repo.add_message(chat_id, "user", "a follow-up")
+                next_turn = uow.repo.add_turn(
+                    user_id=user_id, chat_id=chat_id, message_id=following.id, provider="ollama", model="fake"
+                )
+                next_turn_id, next_message_id = next_turn.id, following.id
+            with mock.patch("app.context_service.safe_persona_output_text", wraps=safe_persona_output_text) as sanitize:
+                (_current, history, *_rest), _count = self._load(
+                    running, user_id, chat_id, next_turn_id, next_message_id
+                )
+            self.assertEqual(sanitize.call_count, 1)
+            self.assertEqual([item["text"] for item in history[-2:]], ["the current question", "the current answer"])
+
+    def test_deleting_a_chat_drops_its_prepared_history(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            chat_id, turn_id, message_id = self._seed(running, user_id, 3)
+            self._load(running, user_id, chat_id, turn_id, message_id)
+            context = running.services.context
+            self.assertIsNotNone(context._prepared_history.get(chat_id))
+            with UnitOfWork(running.services.runtime.session_factory, running.services.runtime.secret_store) as uow:
+                uow.repo.turn_by_id(turn_id).status = "completed"
+            self.assertEqual(running.client.delete(f"/api/v1/chats/{chat_id}").status_code, 200)
+            self.assertIsNone(context._prepared_history.get(chat_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -42,7 +42,7 @@ class DatabaseFoundationTests(unittest.TestCase):
             journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
             conn.close()
 
-            self.assertEqual(version, "0039_wider_default_context_window")
+            self.assertEqual(version, "0044_memory_cell_centres")
             self.assertIn("setting_values", tables)
             self.assertIn("conversation_turns", tables)
             self.assertIn("conversation_summaries", tables)
@@ -918,6 +918,78 @@ class DatabaseFoundationTests(unittest.TestCase):
             )
             self.assertIsNotNone(attachment[3])
 
+    def test_restart_recovery_requeues_repeatable_work_under_its_attempt_cap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "resume.db"
+            database.initialize_database(path, 1800)
+            conn = database.connect_sqlite(path)
+            conn.execute("INSERT INTO users(id,username,password_hash,is_admin,created_at) VALUES('u','owner','h',1,1)")
+            conn.execute("INSERT INTO chats(id,user_id,title,created_at,updated_at) VALUES('c','u','Chat',1,1)")
+            conn.execute("INSERT INTO messages(id,chat_id,role,text,created_at) VALUES('m','c','user','hello',1)")
+            conn.execute("INSERT INTO messages(id,chat_id,role,text,created_at) VALUES('a','c','assistant','hi',2)")
+            conn.execute(
+                "INSERT INTO conversation_turns("
+                "id,user_id,chat_id,user_message_id,sequence_number,provider,model,status,created_at,started_at"
+                ") VALUES('t','u','c','m',1,'ollama','model','completed',1,1)"
+            )
+            for request_id, key in (("cap", "conversation"), ("scene-cap", "scene:entry")):
+                conn.execute(
+                    "INSERT INTO capability_requests("
+                    "id,user_id,chat_id,capability_key,arguments_json,status,permission_mode,idempotency_key,"
+                    "requested_at,started_at"
+                    ") VALUES(?,'u','c','media.generate_image','{}','running','explicit',?,1,1)",
+                    (request_id, key),
+                )
+                conn.execute(
+                    "INSERT INTO chat_attachments("
+                    "id,user_id,chat_id,assistant_message_id,capability_request_id,kind,status,identity_state,"
+                    "retry_available,created_at,updated_at"
+                    ") VALUES(?,'u','c','a',?,'image','running','not_applicable',0,1,1)",
+                    (f"{request_id}-attachment", request_id),
+                )
+            jobs = (
+                # id, kind, status, attempts, capability request, source turn
+                ("image-job", "image", "running", 1, "cap", None),
+                ("scene-job", "image", "running", 1, "scene-cap", None),
+                ("title-job", "title_followup", "queued", 0, None, "t"),
+                ("spent-job", "memory_extraction", "running", 2, None, "t"),
+                ("planning-job", "capability_followup", "running", 1, None, "t"),
+            )
+            for job_id, kind, status, attempts, request_id, turn_id in jobs:
+                conn.execute(
+                    "INSERT INTO async_jobs("
+                    "id,user_id,chat_id,capability_request_id,source_turn_id,kind,status,cancel_requested,attempts,"
+                    "created_at,started_at,updated_at"
+                    ") VALUES(?,'u','c',?,?,?,?,0,?,1,1,1)",
+                    (job_id, request_id, turn_id, kind, status, attempts),
+                )
+            conn.commit()
+            conn.close()
+
+            database.initialize_database(path, 1800, resume_jobs=True, job_max_attempts=2)
+            conn = database.connect_sqlite(path)
+            job_states = dict(conn.execute("SELECT id,status FROM async_jobs").fetchall())
+            request_states = dict(conn.execute("SELECT id,status FROM capability_requests").fetchall())
+            attachment_states = dict(
+                conn.execute("SELECT capability_request_id,status FROM chat_attachments").fetchall()
+            )
+            resumed = conn.execute("SELECT progress,started_at FROM async_jobs WHERE id='image-job'").fetchone()
+            conn.close()
+
+            self.assertEqual(
+                job_states,
+                {
+                    "image-job": "queued",
+                    "scene-job": "failed",
+                    "title-job": "queued",
+                    "spent-job": "failed",
+                    "planning-job": "failed",
+                },
+            )
+            self.assertEqual(request_states, {"cap": "queued", "scene-cap": "failed"})
+            self.assertEqual(attachment_states, {"cap": "queued", "scene-cap": "failed"})
+            self.assertEqual(tuple(resumed), ("Queued again after a restart", None))
+
     def test_pre_alembic_preferences_are_migrated_to_typed_rows(self):
         with tempfile.TemporaryDirectory() as tmp:
             path = Path(tmp) / "legacy.db"
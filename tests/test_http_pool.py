@@ -0,0 +1,213 @@
+"""Keep-alive connections behind urllib.
+
+What matters is when a connection is not reused: after a body nobody finished
+reading, after it has been idle too long, and after the server dropped it. And
+how many are open at once: never more per endpoint than the pool allows.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from app.compreface_identity_provider import CompreFaceIdentityProvider
+from app.http_pool import ConnectionPool, KeepAliveHTTPHandler, pooled_opener
+from app.identity_contracts import IdentityVerificationRequest
+from app.ollama_provider import OllamaChatProvider
+from app.provider_contracts import CancellationToken, ChatRequest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        if self.path == "/missing":
+            self._reply(404, b'{"error":"not found"}')
+        elif self.path == "/long":
+            self._reply(200, b"x" * 256 * 1024)
+        elif self.path == "/once":
+            # Keeps the connection looking reusable, then drops it anyway.
+            self._reply(200, b"once")
+            self.close_connection = True
+        else:
+            self._reply(200, b"ok")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/api/chat":
+            self._stream(
+                [
+                    b'{"message":{"content":"one "},"done":false}\n',
+                    b'{"message":{"content":"two"},"done":true,"done_reason":"stop"}\n',
+                ]
+            )
+        elif self.path.startswith("/api/v1/verification/verify"):
+            self._reply(200, b'{"result":[{"face_matches":[{"similarity":0.9}]}]}')
+        else:
+            self._reply(200, body)
+
+    def _reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, frames: list[bytes]):
+        # As Ollama answers: one chunk per frame, then the end of the body.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for frame in frames:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(frame), frame))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class KeepAliveHTTPHandlerTests(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.clock = Clock()
+        self.pool = ConnectionPool(max_idle=2, idle_seconds=30, clock=self.clock)
+        self.opener = urllib.request.build_opener(KeepAliveHTTPHandler(self.pool))
+
+    def tearDown(self):
+        self.pool.clear()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get(self, path: str) -> bytes:
+        with self.opener.open(f"{self.base}{path}", timeout=5) as response:
+            return response.read()
+
+    def test_requests_read_to_the_end_share_one_connection(self):
+        self.assertEqual([self._get("/") for _ in range(5)], [b"ok"] * 5)
+        request = urllib.request.Request(f"{self.base}/echo", data=b'{"a":1}', method="POST")
+        with self.opener.open(request, timeout=5) as response:
+            self.assertEqual(response.read(), b'{"a":1}')
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.snapshot(), {"opened": 1, "reused": 5, "idle": 1, "in_use": 0})
+
+    def test_an_error_status_is_still_urllibs_http_error_and_keeps_the_connection(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self._get("/missing")
+        self.assertEqual(raised.exception.code, 404)
+        self.assertEqual(raised.exception.read(), b'{"error":"not found"}')
+        raised.exception.close()
+
+        self.assertEqual(self._get("/"), b"ok")
+        self.assertEqual(self.server.connections, 1)
+
+    def test_a_body_closed_before_its_end_takes_its_connection_with_it(self):
+        with self.opener.open(f"{self.base}/long", timeout=5) as response:
+            response.read(10)
+
+        self.assertEqual(self._get("/"), b"ok")
+        self.assertEqual(self.server.connections, 2)
+
+    def test_a_streamed_chat_gives_its_connection_back(self):
+        provider = OllamaChatProvider(self.base, opener=pooled_opener(self.pool))
+        request = ChatRequest(model="fake", messages=[{"role": "user", "content": "hello"}], timeout_seconds=5)
+        for _ in range(2):
+            self.assertEqual(provider.generate(request, CancellationToken()), "one two")
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.snapshot(), {"opened": 1, "reused": 1, "idle": 1, "in_use": 0})
+
+    def test_a_face_comparison_gives_its_connection_back(self):
+        provider = CompreFaceIdentityProvider(opener=pooled_opener(self.pool))
+        request = IdentityVerificationRequest(self.base, "key", 5, b"reference", b"candidate")
+        for _ in range(2):
+            self.assertEqual(provider.verify(request, CancellationToken()).similarity, 0.9)
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.snapshot(), {"opened": 1, "reused": 1, "idle": 1, "in_use": 0})
+
+    def test_a_connection_idle_too_long_is_not_trusted(self):
+        self._get("/")
+        self.clock.now += 31
+
+        self.assertEqual(self._get("/"), b"ok")
+        self.assertEqual(self.server.connections, 2)
+
+    def test_a_connection_the_server_dropped_is_replaced(self):
+        self.assertEqual(self._get("/once"), b"once")
+
+        self.assertEqual(self._get("/"), b"ok")
+        self.assertEqual(self.server.connections, 2)
+
+    def test_a_request_waits_for_a_connection_to_come_free(self):
+        self.pool.max_per_host = 1
+        first = self.opener.open(f"{self.base}/long", timeout=5)
+        answered = []
+        waiting = threading.Thread(target=lambda: answered.append(self._get("/")))
+        waiting.start()
+        waiting.join(0.2)
+        self.assertEqual(answered, [])
+        self.assertEqual(self.pool.snapshot()["in_use"], 1)
+
+        first.read()
+        first.close()
+        waiting.join(5)
+
+        self.assertEqual(answered, [b"ok"])
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.snapshot()["in_use"], 0)
+
+    def test_a_request_that_cannot_get_a_connection_in_time_is_a_url_error(self):
+        self.pool.max_per_host = 1
+        with self.opener.open(f"{self.base}/long", timeout=5):
+            with self.assertRaises(urllib.error.URLError):
+                self.opener.open(f"{self.base}/", timeout=0.1)
+
+        self.assertEqual(self._get("/"), b"ok")
+
+    def test_a_failed_request_gives_its_connection_back(self):
+        self.pool.max_per_host = 1
+        self.server.shutdown()
+        self.server.server_close()
+        for _ in range(2):
+            with self.assertRaises(urllib.error.URLError):
+                self.opener.open(f"{self.base}/", timeout=1)
+
+        self.assertEqual(self.pool.snapshot()["in_use"], 0)
+
+    def test_the_pooled_opener_leaves_urllib_alone(self):
+        opener = pooled_opener(self.pool)
+        with opener(f"{self.base}/", timeout=5) as response:
+            self.assertEqual(response.read(), b"ok")
+
+        installed = getattr(urllib.request._opener, "handlers", [])
+        self.assertFalse(any(isinstance(handler, KeepAliveHTTPHandler) for handler in installed))
+        self.assertEqual(self.pool.snapshot()["opened"], 1)
+
+    def test_an_unreachable_endpoint_is_a_url_error(self):
+        self.server.shutdown()
+        self.server.server_close()
+        with self.assertRaises(urllib.error.URLError):
+            self._get("/")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import threading
+import time
 import unittest
 from unittest.mock import Mock
 
@@ -549,5 +550,199 @@ class JobServiceLifecycleTests(unittest.TestCase):
         service._cancel_terminal.assert_called_once_with("blocked-pending", None, None)
 
 
+class JobQueueSelectionTests(unittest.TestCase):
+    """What a media worker would take next, asked directly of a queue with no media worker."""
+
+    def _queue(self, **kwargs):
+        queue = JobQueue(worker_counts={"interactive": 1, "media": 0}, **kwargs)
+        self.addCleanup(queue.stop)
+        return queue
+
+    def _image(self, queue, latency_class="standard", *, model_key=None, arrival=None, ordering_key=""):
+        job = new_job(
+            job_type="image",
+            user_id="u",
+            chat_id=None,
+            estimated_vram_mb=0,
+            latency_class=latency_class,
+            model_key=model_key,
+            metadata={"ordering_key": ordering_key},
+            execute=lambda: None,
+        )
+        if arrival is not None:
+            job.arrival_time = arrival
+        return queue.submit(job)
+
+    def _select(self, queue):
+        with queue._lock:
+            return queue._select_locked("media")
+
+    def test_selection_follows_priority_then_overdue_work_then_model_affinity(self):
+        queue = self._queue(max_wait_seconds={"bulk": 60.0, "standard": 60.0})
+        now = time.time()
+        overdue = self._image(queue, "bulk", model_key="image:b", arrival=now - 120)
+        standard = self._image(queue, "standard", model_key="image:a", arrival=now - 1)
+        same_model = self._image(queue, "bulk", model_key="image:a", arrival=now)
+        other = self._image(queue, "standard", model_key="image:c", arrival=now)
+
+        self.assertIs(self._select(queue), overdue)
+        self.assertIs(self._select(queue), standard)
+        # The model just selected stays loaded, so its next job goes first.
+        self.assertIs(self._select(queue), same_model)
+        self.assertIs(self._select(queue), other)
+        self.assertIsNone(self._select(queue))
+
+    def test_one_ordering_key_is_selected_once_at_a_time_in_submission_order(self):
+        queue = self._queue()
+        first = self._image(queue, ordering_key="chat:a")
+        second = self._image(queue, ordering_key="chat:a")
+
+        self.assertIs(self._select(queue), first)
+        self.assertIsNone(self._select(queue))
+        self.assertEqual(list(queue._pending), [second.id])
+
+    def test_selection_does_not_ask_admission_about_the_whole_backlog(self):
+        checked = []
+        queue = self._queue(admission_check=lambda job: checked.append(job.id) or True)
+        for _ in range(2000):
+            self._image(queue, "bulk")
+
+        selected = self._select(queue)
+
+        self.assertIsNotNone(selected)
+        self.assertLess(len(checked), 10)
+
+    def test_refused_work_waits_for_a_wake_instead_of_being_asked_again(self):
+        admitted = set()
+        checked = []
+
+        def admission(job):
+            checked.append(job.id)
+            return job.id in admitted
+
+        queue = self._queue(admission_check=admission)
+        blocked = self._image(queue)
+        self.assertIsNone(self._select(queue))
+        self.assertIsNone(self._select(queue))
+        self.assertEqual(checked, [blocked.id])
+
+        admitted.add(blocked.id)
+        queue.wake()
+        self.assertIs(self._select(queue), blocked)
+
+
+class JobQueuePoolTests(unittest.TestCase):
+    """Lane pools, the background lane and provider pools."""
+
+    def _queue(self, **kwargs):
+        queue = JobQueue(**kwargs)
+        self.addCleanup(queue.stop)
+        return queue
+
+    @staticmethod
+    def _job(job_type, execute=lambda: None, **metadata):
+        return new_job(
+            job_type=job_type,
+            user_id="u",
+            chat_id=None,
+            estimated_vram_mb=0,
+            latency_class="interactive" if job_type == "chat" else "standard",
+            metadata=metadata,
+            execute=execute,
+        )
+
+    def test_background_followup_waits_while_a_turn_is_ready_to_start(self):
+        queue = self._queue(worker_counts={"interactive": 1, "media": 0, "background": 0})
+        release = threading.Event()
+        started = threading.Event()
+
+        def running_turn():
+            started.set()
+            release.wait(2)
+
+        queue.submit(self._job("chat", running_turn))
+        self.assertTrue(started.wait(1))
+        waiting_turn = queue.submit(self._job("chat"))
+        followup = queue.submit(self._job("task_model"))
+
+        with queue._lock:
+            self.assertIsNone(queue._select_locked("background"))
+        release.set()
+        waiting_turn.wait(2)
+        with queue._lock:
+            self.assertIs(queue._select_locked("background"), followup)
+
+    def test_provider_pool_bounds_jobs_across_workers(self):
+        queue = self._queue(worker_counts={"interactive": 2, "media": 0}, provider_limits={"ollama": 1})
+        release = threading.Event()
+        first_started = threading.Event()
+        second_started = threading.Event()
+
+        def first():
+            first_started.set()
+            release.wait(2)
+
+        queue.submit(self._job("chat", first, provider_pool="ollama"))
+        queue.submit(self._job("chat", second_started.set, provider_pool="ollama"))
+        self.assertTrue(first_started.wait(1))
+        self.assertFalse(second_started.wait(0.2))
+        self.assertEqual(queue.snapshot()["providers"], {"ollama": {"limit": 1, "active": 1}})
+
+        release.set()
+        self.assertTrue(second_started.wait(1))
+
+    def test_background_lane_leaves_the_last_provider_slot_for_a_turn(self):
+        queue = self._queue(
+            worker_counts={"interactive": 1, "media": 0, "background": 0}, provider_limits={"ollama": 2}
+        )
+        first = queue.submit(self._job("task_model", provider_pool="ollama"))
+        queue.submit(self._job("task_model", provider_pool="ollama"))
+
+        with queue._lock:
+            self.assertIs(queue._select_locked("background"), first)
+            self.assertIsNone(queue._select_locked("background"))
+
+    def test_background_lane_waits_for_a_pool_of_one_to_go_quiet(self):
+        queue = self._queue(
+            worker_counts={"interactive": 1, "media": 0, "background": 0},
+            provider_limits={"ollama": 1},
+            background_quiet_seconds=0.3,
+        )
+        queue.submit(self._job("chat", provider_pool="ollama")).wait(2)
+        followup = queue.submit(self._job("task_model", provider_pool="ollama"))
+
+        with queue._lock:
+            # The only slot is free, but a turn has only just left it.
+            self.assertIsNone(queue._select_locked("background"))
+        time.sleep(0.35)
+        with queue._lock:
+            queue._unpark_locked("background")
+            self.assertIs(queue._select_locked("background"), followup)
+
+    def test_lane_pools_grow_and_shrink_at_runtime(self):
+        queue = self._queue(worker_counts={"interactive": 1, "media": 0, "background": 0})
+        release = threading.Event()
+        running = threading.Semaphore(0)
+
+        def hold():
+            running.release()
+            release.wait(2)
+
+        self.assertEqual(queue.set_worker_counts({"interactive": 3})["interactive"], 3)
+        for _ in range(3):
+            queue.submit(self._job("chat", hold))
+        for _ in range(3):
+            self.assertTrue(running.acquire(timeout=1))
+
+        queue.set_worker_counts({"interactive": 1})
+        release.set()
+        self.assertTrue(queue.wait_until_idle(timeout=2))
+        deadline = time.monotonic() + 2
+        while queue._live_workers["interactive"] > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(queue._live_workers["interactive"], 1)
+        self.assertEqual(queue.snapshot()["workers"]["interactive"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -16,7 +16,7 @@ import unittest
 from unittest import mock
 
 from app.speech_clients import local_stt, normalized_stt_base_url
-from tests.support import TestApp
+from tests.support import FakeFfmpeg, TestApp
 
 
 class _Response:
@@ -99,17 +99,11 @@ class LocalTranscriptionServiceTests(unittest.TestCase):
     def _transcribe(self, running: TestApp, body: bytes) -> tuple[object, object]:
         captured = {}
 
-        def fake_run(command, **_kwargs):
-            # ffmpeg is a real dependency of this path and not what is under
-            # test; the conversion is stood in for so the request is not.
-            Path(command[-1]).write_bytes(b"RIFFfake")
-            return mock.Mock(returncode=0)
-
         def fake_urlopen(request, timeout=None):
             captured["request"] = request
             return _Response(body)
 
-        with mock.patch("app.speech_service.subprocess.run", side_effect=fake_run):
+        with mock.patch("app.audio_transcode.subprocess.Popen", FakeFfmpeg()):
             with mock.patch("app.speech_clients.urllib.request.urlopen", side_effect=fake_urlopen):
                 response = running.client.post(
                     "/api/v1/speech/transcriptions",
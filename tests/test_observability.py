@@ -0,0 +1,76 @@
+"""Latency histograms: the percentiles they report and the text Prometheus scrapes."""
+
+import threading
+import unittest
+
+from app.observability import MetricsRegistry
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_percentiles_fall_inside_the_bucket_that_holds_them(self):
+        metrics = MetricsRegistry()
+        for latency in [3] * 90 + [400] * 9 + [7000]:
+            metrics.request("GET", 200, latency, "/api/v1/turns/{turn_id}")
+
+        latency = metrics.snapshot()["requests"]["by_key"]["GET /api/v1/turns/{turn_id}"]
+
+        self.assertEqual((latency["count"], latency["max"]), (100, 7000))
+        self.assertTrue(2 < latency["p50"] <= 5)
+        self.assertTrue(2 < latency["p90"] <= 5)
+        self.assertTrue(250 < latency["p99"] <= 500)
+
+    def test_requests_are_grouped_by_route_template_and_unmatched_paths_share_one(self):
+        metrics = MetricsRegistry()
+        metrics.request("get", 200, 5, "/api/v1/turns/{turn_id}")
+        metrics.request("GET", 404, 1)
+        metrics.job("image", "completed", 2000)
+        metrics.provider("comfyui", "image", "completed", 1500)
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual(snapshot["requests"]["counts"], {"GET:200": 1, "GET:404": 1})
+        self.assertEqual(sorted(snapshot["requests"]["by_key"]), ["GET /api/v1/turns/{turn_id}", "GET unmatched"])
+        self.assertEqual(snapshot["requests"]["latency_ms"]["count"], 2)
+        self.assertEqual(snapshot["jobs"]["by_key"]["image"]["max"], 2000)
+        self.assertEqual(snapshot["providers"]["by_key"]["comfyui image"]["count"], 1)
+
+    def test_what_every_thread_recorded_is_counted_even_after_it_ends(self):
+        metrics = MetricsRegistry()
+
+        def record():
+            for _ in range(500):
+                metrics.provider("ollama", "chat", "completed", 20)
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics.provider("ollama", "chat", "failed", 20)
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual(snapshot["providers"]["counts"]["ollama:chat:completed"], 4000)
+        self.assertEqual(snapshot["providers"]["by_key"]["ollama chat"]["count"], 4001)
+
+    def test_prometheus_exposition_has_cumulative_buckets_in_seconds(self):
+        metrics = MetricsRegistry()
+        metrics.request("GET", 200, 3, '/odd"route')
+        metrics.request("GET", 200, 40, '/odd"route')
+        metrics.cache("catalog", True)
+
+        text = metrics.prometheus()
+
+        self.assertIn("# TYPE nice_assistant_http_request_duration_seconds histogram", text)
+        labels = 'method="GET",route="/odd\\"route"'
+        self.assertIn(f'nice_assistant_http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1', text)
+        self.assertIn(f'nice_assistant_http_request_duration_seconds_bucket{{{labels},le="0.05"}} 2', text)
+        self.assertIn(f'nice_assistant_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text)
+        self.assertIn(f"nice_assistant_http_request_duration_seconds_sum{{{labels}}} 0.043", text)
+        self.assertIn('nice_assistant_http_requests_total{method="GET",status="200"} 2', text)
+        self.assertIn('nice_assistant_cache_lookups_total{cache="catalog",result="hit"} 1', text)
+        self.assertTrue(text.endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
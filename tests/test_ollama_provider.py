@@ -48,6 +48,28 @@ class OllamaProviderTests(unittest.TestCase):
         self.assertEqual(deltas[-1].metadata["eval_count"], 2)
         self.assertTrue(response.closed)
 
+    def test_stream_says_it_connected_before_its_first_chunk_and_not_when_it_could_not(self):
+        events = []
+        request = ChatRequest(
+            model="fake",
+            messages=[{"role": "user", "content": "hello"}],
+            timeout_seconds=1,
+            on_connected=lambda: events.append("connected"),
+        )
+        response = FakeResponse([b'{"message":{"content":"hi"},"done":true}\n'])
+        provider = OllamaChatProvider("http://ollama", opener=lambda *_args, **_kwargs: response)
+        for delta in provider.stream(request, CancellationToken()):
+            events.append(delta.text)
+        self.assertEqual(events, ["connected", "hi"])
+
+        events.clear()
+        provider = OllamaChatProvider(
+            "http://ollama", opener=lambda *_args, **_kwargs: (_ for _ in ()).throw(OSError("down"))
+        )
+        with self.assertRaises(ProviderError):
+            list(provider.stream(request, CancellationToken()))
+        self.assertEqual(events, [])
+
     def test_stream_sends_tool_schema_and_parses_tool_calls(self):
         captured = {}
         response = FakeResponse(
@@ -7,14 +7,16 @@ import unittest
 from unittest import mock
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from app.asgi import create_app
 from app.provider_registry import ProviderRegistry
-from app.runtime import AppConfig
+from app.repositories import UnitOfWork
+from app.runtime import SESSION_COOKIE, AppConfig
 from app.secret_store import SecretStore
 from app.security import LoginThrottle, ProviderUrlPolicy
 from app.storage import write_artifact_atomic
-from app.service_errors import InvalidArtifactError, RateLimitError, StorageCapacityError
+from app.service_errors import AuthenticationError, InvalidArtifactError, RateLimitError, StorageCapacityError
 from tests.support import FakeChatProvider, TestApp, fast_hash, fast_verify
 
 
@@ -101,6 +103,45 @@ class ProductionHardeningTests(unittest.TestCase):
             self.assertIn("HttpOnly", cookie)
             self.assertNotIn("Max-Age", cookie)
 
+    def test_session_expiry_is_written_once_per_revalidation_not_per_request(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login()
+            writes = []
+
+            def record(_conn, _cursor, statement, *_args):
+                if statement.lstrip().upper().startswith("UPDATE SESSIONS"):
+                    writes.append(statement)
+
+            engine = running.services.runtime.engine
+            event.listen(engine, "before_cursor_execute", record)
+            try:
+                for _ in range(25):
+                    self.assertEqual(running.client.get("/api/v1/session").status_code, 200)
+            finally:
+                event.remove(engine, "before_cursor_execute", record)
+            self.assertLessEqual(len(writes), 1)
+
+    def test_logout_and_revocation_take_effect_before_revalidation(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            resources = running.services.resources
+            token = running.client.cookies.get(SESSION_COOKIE)
+            self.assertEqual(resources.authenticate(token).user_id, user_id)
+            self.assertEqual(running.client.delete("/api/v1/session").status_code, 200)
+            with self.assertRaises(AuthenticationError):
+                resources.authenticate(token)
+
+            running.client.post("/api/v1/session", json={"username": "owner", "password": "pass1234"})
+            token = running.client.cookies.get(SESSION_COOKIE)
+            self.assertEqual(resources.authenticate(token).user_id, user_id)
+            with UnitOfWork(running.services.runtime.session_factory, running.services.runtime.secret_store) as uow:
+                uow.repo.delete_session(token)
+            # Still answered from memory until told otherwise, which is the point of the cache.
+            self.assertEqual(resources.authenticate(token).user_id, user_id)
+            resources.forget_sessions(user_id)
+            with self.assertRaises(AuthenticationError):
+                resources.authenticate(token)
+
     def test_login_throttle_is_keyed_and_reports_retry_after(self):
         now = [100.0]
         throttle = LoginThrottle(max_attempts=2, window_seconds=60, lockout_seconds=30, clock=lambda: now[0])
@@ -178,8 +219,38 @@ class ProductionHardeningTests(unittest.TestCase):
             self.assertIn("queues", report.json())
             self.assertEqual(report.json()["providers"]["counts"]["openai:speech:completed"], 1)
             self.assertIn("retention", report.json()["storage"])
+            self.assertIn("POST /api/v1/speech/syntheses", report.json()["requests"]["by_key"])
+            exposition = running.client.get("/api/v1/admin/metrics")
+            self.assertEqual(exposition.status_code, 200)
+            self.assertTrue(exposition.headers["content-type"].startswith("text/plain; version=0.0.4"))
+            self.assertIn(
+                'nice_assistant_provider_duration_seconds_count{provider="openai",operation="speech"} 1',
+                exposition.text,
+            )
             running.create_and_login("member")
             self.assertEqual(running.client.get("/api/v1/admin/observability").status_code, 403)
+            self.assertEqual(running.client.get("/api/v1/admin/metrics").status_code, 403)
+
+    def test_admin_resizes_job_queue_pools_at_runtime(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login("owner")
+            before = running.client.get("/api/v1/admin/job-queue")
+            self.assertEqual(before.status_code, 200)
+            self.assertEqual(before.json()["workers"], {"background": 1, "interactive": 1, "media": 1})
+            self.assertEqual(before.json()["providers"]["ollama"]["limit"], 1)
+
+            resized = running.client.put(
+                "/api/v1/admin/job-queue",
+                json={"workers": {"interactive": 3}, "provider_limits": {"ollama": 3}},
+            )
+            self.assertEqual(resized.status_code, 200, resized.text)
+            self.assertEqual(resized.json()["workers"]["interactive"], 3)
+            self.assertEqual(resized.json()["providers"]["ollama"]["limit"], 3)
+            rejected = running.client.put("/api/v1/admin/job-queue", json={"workers": {"media": 0}})
+            self.assertEqual(rejected.status_code, 422)
+
+            running.create_and_login("member")
+            self.assertEqual(running.client.get("/api/v1/admin/job-queue").status_code, 403)
 
     def test_retention_prunes_only_expired_configured_artifacts(self):
         with tempfile.TemporaryDirectory() as tmp:
@@ -251,9 +322,14 @@ class ProductionHardeningTests(unittest.TestCase):
                     second = client.post("/api/v1/speech/syntheses", json={"text": "second"})
                 self.assertEqual(first.status_code, 200, first.text)
                 self.assertEqual(second.status_code, 200, second.text)
+                # Rotation runs beside the request rather than inside it.
+                archive = app.state.services.runtime.config.archive_dir / "audio"
+                deadline = time.monotonic() + 5
+                while not (archive.exists() and any(archive.iterdir())) and time.monotonic() < deadline:
+                    time.sleep(0.05)
                 self.assertEqual(client.get(first.json()["audio_url"]).content, b"audio")
                 self.assertEqual(client.get(second.json()["audio_url"]).content, b"audio")
-                self.assertEqual(len(list((app.state.services.runtime.config.archive_dir / "audio").iterdir())), 1)
+                self.assertEqual(len(list(archive.iterdir())), 1)
 
     def test_backup_restore_drill_and_corrupt_snapshot_failure_are_safe(self):
         with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
@@ -306,6 +306,29 @@ class ProductionRunnerTests(unittest.TestCase):
 
         self.assertEqual(results, [{"user_id": "owner", "started": [], "reason": "a conversation is waiting"}])
 
+    def test_it_comes_straight_back_while_memory_vectors_are_catching_up(self):
+        class Memories:
+            def __init__(self, reports):
+                self.reports = list(reports)
+
+            def embed_pending(self):
+                return self.reports.pop(0)
+
+        runner = SceneProductionRunner(
+            None,
+            None,
+            enabled=False,
+            memories=Memories([{"embedded": 32, "pending": 900}, {"embedded": 0, "pending": 900}]),
+        )
+        next_run = __import__("time").monotonic() + 300
+
+        runner._embed_pending()
+        self.assertLessEqual(runner._wait_seconds(next_run), 1.0)
+        # No progress means the model is away; waiting a second at a time for
+        # it would only spin.
+        runner._embed_pending()
+        self.assertGreater(runner._wait_seconds(next_run), 200)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,6 +9,7 @@ anything when no embedding model is installed, or stop working because one
 stored vector came from a different model.
 """
 
+import contextlib
 from pathlib import Path
 import tempfile
 import unittest
@@ -17,13 +18,20 @@ from unittest import mock
 from app.embedding import (
     MAX_CANDIDATES,
     EmbeddingUnavailable,
+    bisect,
+    direction,
+    nearest_cells,
     normalize,
     ollama_embed,
+    ollama_embed_batch,
     pack,
     rank,
+    rank_packed,
     similarity,
     unpack,
 )
+from sqlalchemy import text as sql_text
+
 from tests.support import TestApp
 
 
@@ -65,6 +73,65 @@ class VectorTests(unittest.TestCase):
     def test_no_question_vector_means_no_semantic_opinion(self):
         self.assertEqual(rank(None, [("a", normalize([1.0, 0.0]))]), [])
 
+    def test_a_question_looks_in_the_cells_it_points_at(self):
+        cells = [
+            (identifier, pack(direction(total)))
+            for identifier, total in ((1, [2.0, 0.0]), (2, [0.0, 3.0]), (3, [-1.0, 0.1]))
+        ]
+
+        self.assertEqual(nearest_cells(normalize([1.0, 0.2]), cells, count=2), [1, 2])
+        self.assertEqual(nearest_cells(None, cells), [])
+
+    def test_an_overfull_cell_splits_along_its_widest_direction(self):
+        east = [normalize([1.0, 0.1 * index]) for index in range(3)]
+        north = [normalize([0.1 * index, 1.0]) for index in range(3)]
+
+        labels = bisect(east + north)
+
+        self.assertEqual(len(set(labels[:3])), 1)
+        self.assertEqual(len(set(labels[3:])), 1)
+        self.assertNotEqual(labels[0], labels[3])
+        # Identical vectors have no better split than alternating, and still
+        # have to leave both halves smaller than the cell was.
+        self.assertEqual(bisect([normalize([1.0, 0.0])] * 4), [0, 1, 0, 1])
+
+
+class BatchedScoringTests(unittest.TestCase):
+    """Scoring stored vectors in one buffer must change the cost, not the answer."""
+
+    def _rows(self, width=16, count=80, seed=7):
+        import random
+
+        generator = random.Random(seed)
+        query = normalize([generator.gauss(0, 1) for _ in range(width)])
+        rows = [
+            (f"m{index:03d}", pack(normalize([generator.gauss(0, 1) for _ in range(width)]))) for index in range(count)
+        ]
+        # One vector from another model, and one stored twice to force a tie.
+        rows.append(("other-model", pack(normalize([1.0, 0.0, 0.0]))))
+        rows.append(("twin", rows[0][1]))
+        return query, rows
+
+    def _expected(self, query, rows, **options):
+        return rank(query, [(identifier, unpack(raw)) for identifier, raw in rows], **options)
+
+    def test_the_plain_path_returns_exactly_what_rank_returns(self):
+        query, rows = self._rows()
+        with mock.patch("app.embedding.numpy", None):
+            for options in ({}, {"floor": 0.0, "limit": 20}, {"floor": -1.0, "limit": 200}, {"floor": 0.9}):
+                self.assertEqual(rank_packed(query, rows, **options), self._expected(query, rows, **options))
+
+    @unittest.skipUnless(__import__("importlib").util.find_spec("numpy"), "numpy is optional")
+    def test_the_numpy_path_returns_exactly_what_rank_returns(self):
+        query, rows = self._rows(count=200)
+        for options in ({}, {"floor": 0.0, "limit": 20}, {"floor": -1.0, "limit": 300}):
+            self.assertEqual(rank_packed(query, rows, **options), self._expected(query, rows, **options))
+
+    def test_no_question_means_no_opinion(self):
+        _query, rows = self._rows(count=3)
+        self.assertEqual(rank_packed(None, rows), [])
+        self.assertEqual(rank_packed(normalize([1.0, 0.0]), []), [])
+
 
 class EmbeddingClientTests(unittest.TestCase):
     class Response:
@@ -101,6 +168,44 @@ class EmbeddingClientTests(unittest.TestCase):
         # nothing else.
         self.assertAlmostEqual(sum(value * value for value in vector), 1.0, places=5)
 
+    def test_a_batch_is_one_request_and_comes_back_in_order(self):
+        captured = {}
+
+        def fake_urlopen(request, timeout=None):
+            import json
+
+            captured["url"] = request.full_url
+            captured["payload"] = json.loads(request.data.decode())
+            return self.Response({"embeddings": [[3.0, 4.0], [0.0, 2.0]]})
+
+        with mock.patch("app.embedding.urllib.request.urlopen", side_effect=fake_urlopen):
+            vectors = ollama_embed_batch("http://127.0.0.1:11434", "nomic-embed-text", ["a red car", "a cat"])
+
+        self.assertTrue(captured["url"].endswith("/api/embed"))
+        self.assertEqual(captured["payload"]["input"], ["a red car", "a cat"])
+        self.assertAlmostEqual(vectors[0][0], 0.6, places=5)
+        self.assertEqual(vectors[1], [0.0, 1.0])
+
+    def test_a_batch_reply_missing_a_vector_is_refused_whole(self):
+        with mock.patch(
+            "app.embedding.urllib.request.urlopen", return_value=self.Response({"embeddings": [[1.0, 0.0]]})
+        ):
+            with self.assertRaises(EmbeddingUnavailable):
+                ollama_embed_batch("http://127.0.0.1:11434", "nomic-embed-text", ["one", "two"])
+
+    def test_an_ollama_without_the_batch_endpoint_is_asked_one_at_a_time(self):
+        import urllib.error
+
+        def fake_urlopen(request, timeout=None):
+            if request.full_url.endswith("/api/embed"):
+                raise urllib.error.HTTPError(request.full_url, 404, "not found", {}, None)
+            return self.Response({"embedding": [1.0, 0.0]})
+
+        with mock.patch("app.embedding.urllib.request.urlopen", side_effect=fake_urlopen):
+            vectors = ollama_embed_batch("http://127.0.0.1:11434", "nomic-embed-text", ["one", "two"])
+
+        self.assertEqual(vectors, [[1.0, 0.0], [1.0, 0.0]])
+
     def test_an_unreachable_model_is_reported_rather_than_raised_raw(self):
         with mock.patch("app.embedding.urllib.request.urlopen", side_effect=OSError("refused")):
             with self.assertRaises(EmbeddingUnavailable):
@@ -127,6 +232,29 @@ class SemanticRecallTests(unittest.TestCase):
             return normalize([0.0, 1.0, 0.0])
         return normalize([0.0, 0.0, 1.0])
 
+    def _fake_model(self):
+        stack = contextlib.ExitStack()
+        stack.enter_context(
+            mock.patch(
+                "app.memory_service.ollama_embed", side_effect=lambda _u, _m, text, **_kw: self._vector_for(text)
+            )
+        )
+        stack.enter_context(
+            mock.patch(
+                "app.memory_service.ollama_embed_batch",
+                side_effect=lambda _u, _m, texts, **_kw: [self._vector_for(text) for text in texts],
+            )
+        )
+        return stack
+
+    def _unreachable_model(self, reason: str):
+        stack = contextlib.ExitStack()
+        stack.enter_context(mock.patch("app.memory_service.ollama_embed", side_effect=EmbeddingUnavailable(reason)))
+        stack.enter_context(
+            mock.patch("app.memory_service.ollama_embed_batch", side_effect=EmbeddingUnavailable(reason))
+        )
+        return stack
+
     def _running(self, tmp):
         running = TestApp(Path(tmp))
         return running
@@ -145,9 +273,7 @@ class SemanticRecallTests(unittest.TestCase):
             self._memory(running, "Owns a 2019 Tacoma")
             self._memory(running, "Has a cat called Biscuit")
 
-            with mock.patch(
-                "app.memory_service.ollama_embed", side_effect=lambda _u, _m, text, **_kw: self._vector_for(text)
-            ):
+            with self._fake_model():
                 report = memories.embed_pending()
                 self.assertEqual(report["embedded"], 2)
                 question = memories.question_vector("what do I drive")
@@ -191,7 +317,7 @@ class SemanticRecallTests(unittest.TestCase):
             memories.embedding_base_url = "http://127.0.0.1:11434"
             self._memory(running, "Owns a 2019 Tacoma")
 
-            with mock.patch("app.memory_service.ollama_embed", side_effect=EmbeddingUnavailable("model not pulled")):
+            with self._unreachable_model("model not pulled"):
                 report = memories.embed_pending()
                 self.assertIsNone(memories.question_vector("what do I drive"))
 
@@ -213,9 +339,7 @@ class SemanticRecallTests(unittest.TestCase):
             self._memory(running, "Owns a 2019 Tacoma")
             self._memory(running, "Biscuit the cat sleeps on the car")
 
-            with mock.patch(
-                "app.memory_service.ollama_embed", side_effect=lambda _u, _m, text, **_kw: self._vector_for(text)
-            ):
+            with self._fake_model():
                 memories.embed_pending()
                 question = memories.question_vector("tell me about Biscuit")
 
@@ -256,9 +380,7 @@ class SemanticRecallTests(unittest.TestCase):
             memories.embedding_base_url = "http://127.0.0.1:11434"
             self._memory(running, "Owns a 2019 Tacoma")
 
-            with mock.patch(
-                "app.memory_service.ollama_embed", side_effect=lambda _u, _m, text, **_k: self._vector_for(text)
-            ):
+            with self._fake_model():
                 memories.embed_pending()
             with mock.patch("app.memory_service.ollama_embed", side_effect=EmbeddingUnavailable("gone")):
                 self.assertIsNone(memories.question_vector("what do I drive"))
@@ -270,6 +392,35 @@ class SemanticRecallTests(unittest.TestCase):
                 self.assertIsNone(memories.question_vector("what do I drive"))
             self.assertEqual(calls, [])
 
+    def test_a_question_asked_again_skips_the_model(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            self._memory(running, "Owns a 2019 Tacoma")
+            with self._fake_model():
+                memories.embed_pending()
+
+            asked = []
+            with mock.patch(
+                "app.memory_service.ollama_embed",
+                side_effect=lambda _u, _m, text, **_kw: asked.append(text) or self._vector_for(text),
+            ):
+                first = memories.question_vector("What do I drive?")
+                # A regeneration sends the same words, give or take spacing
+                # and case; neither changes what is being asked.
+                again = memories.question_vector("  what do I  DRIVE? ")
+                memories.embedding_model = "other-embed"
+                other_model = memories.question_vector("What do I drive?")
+
+            self.assertEqual(asked, ["What do I drive?", "What do I drive?"])
+            self.assertEqual(first, again)
+            self.assertEqual(other_model, first)
+            caches = running.services.runtime.metrics.snapshot()["caches"]
+            self.assertEqual(caches["question_vector"]["hits"], 1)
+            self.assertEqual(caches["question_vector"]["misses"], 2)
+
     def test_keeping_vectors_current_does_not_need_the_picture_scheduler(self):
         from app.scene_production import SceneProductionRunner
 
@@ -311,6 +462,208 @@ class SemanticRecallTests(unittest.TestCase):
         self.assertLessEqual(SIMILARITY_FLOOR, 0.42)
         self.assertGreater(SIMILARITY_FLOOR, 0.36)
 
+    def test_an_old_memory_is_found_however_many_newer_ones_exist(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            self._memory(running, "Owns a 2019 Tacoma")
+            with memories._uow() as uow:
+                for index in range(60):
+                    uow.repo.create_memory(
+                        user_id=user_id,
+                        scope="global",
+                        scope_id=None,
+                        content=f"Mentioned chore number {index}",
+                        normalized_content=f"mentioned chore number {index}",
+                        status="active",
+                        source_type="manual",
+                    )
+
+            with (
+                mock.patch("app.repositories.MAX_CELL_SIZE", 8),
+                self._fake_model(),
+            ):
+                while memories.embed_pending()["embedded"]:
+                    pass
+                question = memories.question_vector("what do I drive")
+
+            with memories._uow() as uow:
+                cells = uow.session.execute(sql_text("SELECT COUNT(*) FROM memory_vector_cells")).scalar()
+                found = uow.repo.relevant_memories(
+                    user_id,
+                    workspace_id=None,
+                    persona_id=None,
+                    chat_id="none",
+                    query_vector=question,
+                    embedding_model="fake-embed",
+                )
+
+            # Sixty newer memories used to push this one out of the forty that
+            # were compared at all.
+            self.assertGreater(cells, 1)
+            self.assertEqual(found[0].content, "Owns a 2019 Tacoma")
+
+    def test_a_forgotten_memory_leaves_the_index_with_its_status(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            truck = self._memory(running, "Owns a 2019 Tacoma")
+
+            with self._fake_model():
+                memories.embed_pending()
+                question = memories.question_vector("what do I drive")
+            self.assertEqual(running.client.post(f"/api/v1/memories/{truck['id']}/forget").status_code, 200)
+
+            with memories._uow() as uow:
+                found = uow.repo.relevant_memories(
+                    user_id, workspace_id=None, persona_id=None, chat_id="none", query_vector=question
+                )
+
+            self.assertEqual(found, [])
+
+    def test_vectors_from_before_the_index_are_filed_by_the_next_pass(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            self._memory(running, "Owns a 2019 Tacoma")
+            with self._fake_model():
+                memories.embed_pending()
+            with memories._uow() as uow:
+                uow.session.execute(sql_text("UPDATE memories SET embedding_cell=NULL"))
+                uow.session.execute(sql_text("DELETE FROM memory_vector_cells"))
+
+            with self._unreachable_model("down"):
+                memories.embed_pending()
+
+            with memories._uow() as uow:
+                unfiled = uow.session.execute(
+                    sql_text("SELECT COUNT(*) FROM memories WHERE embedding_cell IS NULL")
+                ).scalar()
+            # Filing needs no model, so it is not held up by one being away.
+            self.assertEqual(unfiled, 0)
+
+    def _cells(self, running):
+        with running.services.memory._uow() as uow:
+            counts = dict(uow.session.execute(sql_text("SELECT id, member_count FROM memory_vector_cells")).all())
+            members = dict(
+                uow.session.execute(
+                    sql_text(
+                        "SELECT embedding_cell, COUNT(*) FROM memories "
+                        "WHERE embedding_cell IS NOT NULL GROUP BY embedding_cell"
+                    )
+                ).all()
+            )
+        return counts, members
+
+    def test_cells_grow_with_the_square_root_of_what_is_filed(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            self._add_memories(running, user_id, 64)
+
+            with mock.patch("app.repositories.MAX_CELL_SIZE", 2), self._fake_model():
+                memories.embed_pending()
+            counts, members = self._cells(running)
+
+            # A fixed limit of two would have made at least thirty-two cells,
+            # and a question would score every one of their centres.
+            self.assertLess(len(counts), 32)
+            self.assertLessEqual(max(counts.values()), 8)
+            self.assertEqual(counts, members)
+
+    def test_a_deleted_or_re_embedded_memory_leaves_its_cell_count(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            truck = self._memory(running, "Owns a 2019 Tacoma")
+            cat = self._memory(running, "Has a cat called Biscuit")
+            self._memory(running, "Likes hiking")
+            with self._fake_model():
+                memories.embed_pending()
+
+            self.assertEqual(running.client.delete(f"/api/v1/memories/{truck['id']}").status_code, 200)
+            with memories._uow() as uow:
+                row = uow.repo.memory(user_id, cat["id"])
+                uow.repo.save_memory_embedding(row, normalize([0.0, 0.0, 1.0]), "fake-embed")
+            counts, members = self._cells(running)
+
+            # Counts decide when a cell splits; left high, cells split early and
+            # their centres drift toward vectors that no longer exist.
+            self.assertEqual(sum(counts.values()), 2)
+            self.assertEqual(counts, members)
+
+    def _add_memories(self, running, user_id, count):
+        with running.services.memory._uow() as uow:
+            for index in range(count):
+                uow.repo.create_memory(
+                    user_id=user_id,
+                    scope="global",
+                    scope_id=None,
+                    content=f"Backlog fact {index}",
+                    normalized_content=f"backlog fact {index}",
+                    status="active",
+                    source_type="manual",
+                )
+
+    def test_a_backlog_goes_to_the_model_in_batches_and_reports_its_rate(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            self._add_memories(running, user_id, 70)
+
+            with (
+                mock.patch(
+                    "app.memory_service.ollama_embed_batch",
+                    side_effect=lambda _u, _m, texts, **_kw: [self._vector_for(text) for text in texts],
+                ) as batch,
+            ):
+                report = memories.embed_pending(batch_size=32)
+
+            self.assertEqual(report["embedded"], 70)
+            self.assertEqual(report["batches"], 3)
+            self.assertEqual([len(call.args[2]) for call in batch.call_args_list], [32, 32, 6])
+            self.assertEqual(report["pending"], 0)
+            self.assertGreater(report["per_second"], 0)
+            self.assertEqual(memories.embedding_status()["last_pass"]["embedded"], 70)
+
+    def test_a_pass_that_stops_halfway_keeps_what_it_finished(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            memories = running.services.memory
+            memories.embedding_model = "fake-embed"
+            memories.embedding_base_url = "http://127.0.0.1:11434"
+            self._add_memories(running, user_id, 10)
+            calls = []
+
+            def flaky(_url, _model, texts, **_kw):
+                calls.append(texts)
+                if len(calls) > 1:
+                    raise EmbeddingUnavailable("went away")
+                return [self._vector_for(text) for text in texts]
+
+            with mock.patch("app.memory_service.ollama_embed_batch", side_effect=flaky):
+                first = memories.embed_pending(batch_size=4)
+            with self._fake_model():
+                second = memories.embed_pending(batch_size=4)
+
+            # The first batch was committed before the model went away, and the
+            # next pass starts from what is still missing rather than the top.
+            self.assertEqual((first["embedded"], first["pending"]), (4, 6))
+            self.assertIn("went away", first["reason"])
+            self.assertEqual((second["embedded"], second["pending"]), (6, 0))
+
     def test_the_work_is_bounded_however_much_is_remembered(self):
         # The ceiling on comparisons is what keeps this a fixed cost rather than
         # one that grows with how much the assistant knows.
@@ -0,0 +1,104 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import event
+
+from app.repositories import UnitOfWork
+from app.settings_snapshots import settings_snapshots
+from tests.support import TestApp
+
+
+class SettingsSnapshotTests(unittest.TestCase):
+    def _uow(self, running):
+        return UnitOfWork(running.services.runtime.session_factory, running.services.runtime.secret_store)
+
+    def _login_with_settings(self, running):
+        user_id = running.create_and_login()
+        saved = running.client.put("/api/v1/settings", json={"default_memory_mode": "saved"})
+        self.assertEqual(saved.status_code, 200, saved.text)
+        return user_id
+
+    def _statements(self, running):
+        statements = []
+
+        def record(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        return statements, record
+
+    def test_repeated_reads_cost_no_sql_and_no_decrypt(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = running.create_and_login()
+            saved = running.client.put("/api/v1/settings", json={"openai_api_key": "sk-snapshot123456"})
+            self.assertEqual(saved.status_code, 200, saved.text)
+            with self._uow(running) as uow:
+                first = uow.repo.settings(user_id)
+            statements, record = self._statements(running)
+            engine = running.services.runtime.engine
+            secret_store = running.services.runtime.secret_store
+            event.listen(engine, "before_cursor_execute", record)
+            try:
+                with mock.patch.object(secret_store, "decrypt", wraps=secret_store.decrypt) as decrypt:
+                    for _ in range(5):
+                        with self._uow(running) as uow:
+                            again = uow.repo.settings(user_id)
+            finally:
+                event.remove(engine, "before_cursor_execute", record)
+            self.assertEqual(statements, [])
+            self.assertEqual(decrypt.call_count, 0)
+            self.assertEqual(again, first)
+            self.assertEqual(again["openai_api_key"], "sk-snapshot123456")
+
+    def test_callers_get_private_copies(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = self._login_with_settings(running)
+            with self._uow(running) as uow:
+                uow.repo.settings(user_id)["preferences"]["general_auto_logout"] = "scribbled"
+            with self._uow(running) as uow:
+                self.assertNotEqual(uow.repo.settings(user_id)["preferences"].get("general_auto_logout"), "scribbled")
+
+    def test_a_save_is_visible_to_the_next_read_and_inside_its_own_transaction(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = self._login_with_settings(running)
+            with self._uow(running) as uow:
+                self.assertEqual(uow.repo.settings(user_id)["default_memory_mode"], "saved")
+            with self._uow(running) as uow:
+                current = uow.repo.settings(user_id)
+                uow.repo.save_settings(user_id, {**current, "default_memory_mode": "off"}, preserve_secret=True)
+                self.assertEqual(uow.repo.settings(user_id)["default_memory_mode"], "off")
+            with self._uow(running) as uow:
+                self.assertEqual(uow.repo.settings(user_id)["default_memory_mode"], "off")
+            self.assertEqual(running.client.get("/api/v1/settings").json()["default_memory_mode"], "off")
+
+    def test_a_read_that_began_before_a_save_does_not_cache_what_it_saw(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = self._login_with_settings(running)
+            saved = threading.Event()
+            with self._uow(running) as uow:
+                uow.repo.user(user_id)
+
+                def save():
+                    with self._uow(running) as writer:
+                        current = writer.repo.settings(user_id)
+                        writer.repo.save_settings(
+                            user_id, {**current, "default_memory_mode": "off"}, preserve_secret=True
+                        )
+                    saved.set()
+
+                thread = threading.Thread(target=save)
+                thread.start()
+                self.assertTrue(saved.wait(5))
+                thread.join()
+                # Whatever this transaction can see, it began before the save
+                # committed, so it must not become the shared answer.
+                uow.repo.settings(user_id)
+                self.assertIsNone(settings_snapshots(running.services.runtime.engine).get(user_id))
+            with self._uow(running) as uow:
+                self.assertEqual(uow.repo.settings(user_id)["default_memory_mode"], "off")
+
+
+if __name__ == "__main__":
+    unittest.main()
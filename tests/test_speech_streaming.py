@@ -6,6 +6,7 @@ is still written at the end - replay is unchanged - but it is no longer what the
 listening waits on. See ADR 0037.
 """
 
+import errno
 from pathlib import Path
 import tempfile
 import threading
@@ -20,6 +21,10 @@ from tests.support import TestApp
 from tests.test_speech_barge_in import SlowResponse
 
 
+def _no_space():
+    raise OSError(errno.ENOSPC, "No space left on device")
+
+
 class StreamingClientTests(unittest.TestCase):
     def test_audio_is_yielded_as_it_arrives(self):
         response = SlowResponse([b"one", b"two", b"three"], content_type="audio/mpeg")
@@ -98,6 +103,23 @@ class StreamingServiceTests(unittest.TestCase):
             self.assertTrue(stored.exists())
             self.assertEqual(stored.read_bytes(), b"onetwo")
 
+    def test_pieces_are_written_as_they_pass_and_appear_only_once_complete(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = self._ready(running)
+            response = SlowResponse([b"one", b"two"], content_type="audio/mpeg")
+            with mock.patch("app.speech_clients.urllib.request.urlopen", return_value=response):
+                audio_id, _fmt, pieces = running.services.speech.stream_synthesis(user_id, {"text": "hello"})
+                iterator = iter(pieces)
+                next(iterator)
+                pending = list(running.config.audio_dir.glob(f".{audio_id}.mp3.*.tmp"))
+                # Nothing collects the clip in memory; what has been sent goes to
+                # a hidden file that is not yet replayable under its name.
+                self.assertEqual(len(pending), 1)
+                self.assertFalse((running.config.audio_dir / f"{audio_id}.mp3").exists())
+                self.assertEqual(list(iterator), [b"two"])
+
+            self.assertEqual([path.name for path in running.config.audio_dir.glob("*")], [f"{audio_id}.mp3"])
+
     def test_an_abandoned_stream_leaves_nothing_behind(self):
         with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
             user_id = self._ready(running)
@@ -111,6 +133,33 @@ class StreamingServiceTests(unittest.TestCase):
 
             self.assertEqual(list(running.config.audio_dir.glob("*")), [])
 
+    def test_a_disk_that_fills_midway_stops_the_file_not_the_playback(self):
+        real_temporary_file = tempfile.NamedTemporaryFile
+
+        def filling_up(*args, **kwargs):
+            # The first piece fits; by the second the disk is full.
+            handle = real_temporary_file(*args, **kwargs)
+            write = handle.write
+            handle.write = lambda piece: _no_space() if handle.tell() else write(piece)
+            return handle
+
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            user_id = self._ready(running)
+            response = SlowResponse([b"one", b"two", b"three"], content_type="audio/mpeg")
+            with (
+                mock.patch("app.speech_clients.urllib.request.urlopen", return_value=response),
+                mock.patch("app.storage.tempfile.NamedTemporaryFile", side_effect=filling_up),
+            ):
+                audio_id, _fmt, pieces = running.services.speech.stream_synthesis(user_id, {"text": "hello"})
+                self.assertEqual(list(pieces), [b"one", b"two", b"three"])
+
+            self.assertEqual(list(running.config.audio_dir.glob("*")), [])
+            self.assertEqual(running.client.get(f"/api/v1/audio/{audio_id}").status_code, 404)
+            # The provider did its part; a full disk is not its failure.
+            counts = running.services.runtime.metrics.snapshot()["providers"]["counts"]
+            self.assertEqual(counts.get("local:speech_stream:completed"), 1)
+            self.assertNotIn("local:speech_stream:failed", counts)
+
     def test_a_format_that_cannot_start_early_is_refused_by_name(self):
         with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
             user_id = self._ready(running, fmt="wav")
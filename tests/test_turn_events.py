@@ -1,6 +1,11 @@
+import asyncio
+import json
+import threading
+import time
 import unittest
+from unittest import mock
 
-from app.turn_events import TurnEventBroker
+from app.turn_events import DeltaCoalescer, DeltaCoalescing, TurnEventBroker
 
 
 class TurnEventBrokerTests(unittest.TestCase):
@@ -35,6 +40,34 @@ class TurnEventBrokerTests(unittest.TestCase):
         self.assertEqual(events[0].event, "turn.snapshot")
         self.assertEqual(events[0].data["accumulated_text"], "durable")
 
+    def test_each_event_is_serialized_once_for_accounting_and_every_frame(self):
+        broker = TurnEventBroker(max_events=2, max_bytes=1000)
+        with mock.patch("app.turn_events.json.dumps", wraps=json.dumps) as dumps:
+            for index in range(5):
+                broker.publish("turn", "assistant.delta", {"text": f"w{index}"})
+            broker.publish("turn", "turn.completed", {})
+            replay = list(broker.subscribe("turn", {"status": "completed"}, 4))[1:]
+            frames = [event.frame() for event in replay]
+        # One per publish, however often events were evicted or framed.
+        self.assertEqual(dumps.call_count, 6)
+        self.assertEqual(
+            frames,
+            [b'id: 5\nevent: assistant.delta\ndata: {"text":"w4"}\n\n', b"id: 6\nevent: turn.completed\ndata: {}\n\n"],
+        )
+
+    def test_replay_resumes_after_the_cursor_across_many_evictions(self):
+        broker = TurnEventBroker(max_events=50, max_bytes=10**6)
+        for index in range(1000):
+            broker.publish("turn", "assistant.delta", {"text": str(index)})
+        broker.publish("turn", "turn.completed", {})
+        stream = broker._stream("turn")
+        self.assertLessEqual(len(stream.events), 100)
+        self.assertEqual(stream.bytes, sum(len(event.payload) for event in stream.events[stream.head :]))
+        for cursor, first in ((0, 952), (975, 976), (1000, 1001)):
+            events = list(broker.subscribe("turn", {"status": "completed"}, cursor))[1:]
+            self.assertEqual(events[0].sequence, first)
+            self.assertEqual([event.sequence for event in events], list(range(first, 1002)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -83,3 +116,137 @@ class ReconnectReplayTests(unittest.TestCase):
         for index in range(4):
             broker.publish("turn", "assistant.delta", {"text": f"w{index} "})
         self.assertEqual(self._client_text(broker, "turn", last_event_id=None), "w0 w1 w2 w3 ")
+
+
+class AsyncSubscriptionTests(unittest.TestCase):
+    """An event-loop subscriber is woken by the publishing thread and holds no thread while idle."""
+
+    def test_idle_async_subscribers_are_woken_by_a_worker_thread(self):
+        broker = TurnEventBroker()
+
+        async def collect():
+            received = []
+            async for event in broker.subscribe_async("turn", {"status": "running"}, heartbeat_seconds=5):
+                if event is not None:
+                    received.append(event.event)
+            return received
+
+        async def scenario():
+            threads = threading.active_count()
+            subscribers = [asyncio.create_task(collect()) for _ in range(200)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(threading.active_count(), threads)
+
+            def produce():
+                broker.publish("turn", "assistant.delta", {"text": "hello"})
+                broker.publish("turn", "turn.completed", {"status": "completed"})
+
+            worker = threading.Thread(target=produce)
+            worker.start()
+            results = await asyncio.wait_for(asyncio.gather(*subscribers), 5)
+            worker.join()
+            return results
+
+        results = asyncio.run(scenario())
+
+        self.assertEqual(results, [["turn.snapshot", "assistant.delta", "turn.completed"]] * 200)
+        self.assertEqual(broker._stream("turn").async_waiters, set())
+
+    def test_async_subscriber_sends_heartbeats_and_stops_with_the_broker(self):
+        broker = TurnEventBroker()
+
+        async def scenario():
+            stream = broker.subscribe_async("turn", {"status": "running"}, heartbeat_seconds=0.01)
+            self.assertEqual((await anext(stream)).event, "turn.snapshot")
+            self.assertIsNone(await anext(stream))
+            broker.stop()
+            return [event async for event in stream]
+
+        self.assertEqual([event for event in asyncio.run(scenario()) if event is not None], [])
+
+
+class DeltaCoalescerTests(unittest.TestCase):
+    def _coalescer(self, **policy):
+        self.now = 0.0
+        self.published = []
+        deltas = DeltaCoalescer(self.published.append, DeltaCoalescing(**policy), clock=lambda: self.now)
+        self.addCleanup(deltas.close)
+        return deltas
+
+    def test_the_first_piece_is_not_held_and_the_rest_gather_to_the_size_threshold(self):
+        deltas = self._coalescer(max_bytes=8, max_seconds=10)
+        for piece in ("He", "llo", " th", "ere", ", fr", "iend"):
+            deltas.feed(piece)
+        self.assertEqual(self.published, ["He", "llo there", ", friend"])
+        deltas.flush()
+        self.assertEqual("".join(self.published), "Hello there, friend")
+
+    def test_held_text_goes_out_once_the_window_has_passed(self):
+        deltas = self._coalescer(max_bytes=1000, max_seconds=0.03)
+        deltas.feed("a")
+        deltas.feed("b")
+        self.now = 0.01
+        deltas.feed("c")
+        self.now = 0.04
+        deltas.feed("d")
+        self.assertEqual(self.published, ["a", "bcd"])
+
+    def test_flush_at_the_end_sends_what_is_held_and_nothing_when_empty(self):
+        deltas = self._coalescer(max_bytes=1000, max_seconds=10)
+        deltas.feed("a")
+        deltas.feed("b")
+        deltas.feed("")
+        deltas.flush()
+        deltas.flush()
+        self.assertEqual(self.published, ["a", "b"])
+
+    def test_held_text_goes_out_when_the_window_closes_without_another_chunk(self):
+        published = []
+        arrived = threading.Event()
+
+        def publish(text):
+            published.append((text, time.monotonic()))
+            arrived.set()
+
+        deltas = DeltaCoalescer(publish, DeltaCoalescing(max_bytes=1000, max_seconds=0.05))
+        self.addCleanup(deltas.close)
+        deltas.feed("Let me think")
+        arrived.clear()
+        held_at = time.monotonic()
+        deltas.feed(" about that.")
+
+        # The model pauses far longer than the window before its next chunk.
+        self.assertTrue(arrived.wait(2))
+        self.assertEqual([text for text, _ in published], ["Let me think", " about that."])
+        # Not early, and not left for the next chunk: a loaded machine gets
+        # slack, but nowhere near the two seconds this waited.
+        self.assertGreaterEqual(published[-1][1] - held_at, 0.05)
+        self.assertLess(published[-1][1] - held_at, 0.5)
+        deltas.feed(" Yes.")
+        deltas.close()
+        self.assertEqual("".join(text for text, _ in published), "Let me think about that. Yes.")
+
+    def test_every_reply_shares_one_timer_thread(self):
+        published = []
+        replies = [
+            DeltaCoalescer(published.append, DeltaCoalescing(max_bytes=1000, max_seconds=0.02)) for _ in range(20)
+        ]
+        for number, deltas in enumerate(replies):
+            self.addCleanup(deltas.close)
+            deltas.feed("first")
+            deltas.feed(f" held {number}")
+
+        timers = [thread for thread in threading.enumerate() if thread.name.startswith("delta-deadline")]
+        self.assertEqual(len(timers), 1)
+        deadline = time.monotonic() + 2
+        while len(published) < 40 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(
+            sorted(text for text in published if text.startswith(" held")), sorted(f" held {n}" for n in range(20))
+        )
+
+    def test_zero_bytes_publishes_every_piece(self):
+        deltas = self._coalescer(max_bytes=0, max_seconds=10)
+        for piece in "abc":
+            deltas.feed(piece)
+        self.assertEqual(self.published, ["a", "b", "c"])
@@ -15,6 +15,7 @@ from app.turn_pipeline import (
     TurnContext,
     TurnPipeline,
 )
+from app.turn_events import DeltaCoalescing
 
 
 def context(**overrides) -> TurnContext:
@@ -48,6 +49,8 @@ class Service:
 
     providers = context_service = capabilities = task_models = memory = jobs = broker = None
     generation_timeout_seconds = 30
+    delta_coalescing = DeltaCoalescing()
+    metrics = None
 
     def __init__(self):
         self.context = None
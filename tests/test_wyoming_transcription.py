@@ -22,24 +22,29 @@ import unittest
 from unittest import mock
 import wave
 
+from app.transcription_streams import TranscriptionStreams
 from app.wyoming_client import (
+    WyomingStream,
     WyomingUnavailable,
     parse_address,
     wyoming_describe,
     wyoming_transcribe,
 )
-from tests.support import TestApp
+from tests.support import FakeFfmpeg, TestApp
 
 
 class FakeWyomingServer:
     """A Wyoming service that records what it was told, and answers.
 
-    `reply` decides the ending: a transcript, or an error event.
+    `reply` decides the ending: a transcript, or an error event. A streaming
+    one also answers each piece of audio with a `transcript-chunk`, as a
+    server that transcribes while it listens does.
     """
 
-    def __init__(self, reply: str = "transcript", text: str = "the lighthouse"):
+    def __init__(self, reply: str = "transcript", text: str = "the lighthouse", streaming: bool = False):
         self.reply = reply
         self.text = text
+        self.streaming = streaming
         self.events: list[tuple[str, dict]] = []
         self.audio = bytearray()
         self._socket = socket.socket()
@@ -82,6 +87,13 @@ class FakeWyomingServer:
             self.events.append((kind, header.get("data") or {}))
             if kind == "audio-chunk":
                 self.audio.extend(payload)
+                if self.streaming:
+                    words = self.text.split()
+                    heard = sum(1 for seen, _ in self.events if seen == "audio-chunk")
+                    if heard <= len(words):
+                        self._send(connection, "transcript-chunk", {"text": words[heard - 1] + " "})
+            elif kind == "audio-start" and self.streaming:
+                self._send(connection, "transcript-start", {})
             elif kind == "describe":
                 self._send(
                     connection,
@@ -220,6 +232,91 @@ class ProtocolTests(unittest.TestCase):
         self.assertEqual(self.server.events, [])
 
 
+def _wait_for(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        threading.Event().wait(0.01)
+
+
+class StreamingTests(unittest.TestCase):
+    AUDIO = {"rate": 16000, "width": 2, "channels": 1}
+
+    def test_audio_is_forwarded_as_it_is_handed_over_and_partials_come_back(self):
+        server = FakeWyomingServer(text="turn the porch light on", streaming=True)
+        self.addCleanup(server.close)
+        stream = WyomingStream(server.address, self.AUDIO, "en")
+        stream.send(b"\x00\x00" * 1600)
+        stream.send(b"\x00\x00" * 1600)
+        # Before the last piece has been sent, the service has already heard,
+        # and said back, what came before it.
+        _wait_for(lambda: stream.partial == "turn the")
+        self.assertEqual(stream.partial, "turn the")
+        self.assertEqual(len(server.audio), 6400)
+
+        result = stream.finish()
+
+        self.assertEqual(result["text"], "turn the porch light on")
+        order = [kind for kind, _ in server.events]
+        self.assertEqual(order, ["transcribe", "audio-start", "audio-chunk", "audio-chunk", "audio-stop"])
+
+    def test_a_service_that_only_transcribes_at_the_end_still_answers(self):
+        server = FakeWyomingServer()
+        self.addCleanup(server.close)
+        stream = WyomingStream(server.address, self.AUDIO)
+        stream.send(b"\x00\x00" * 1600)
+
+        self.assertEqual(stream.partial, "")
+        self.assertEqual(stream.finish()["text"], "the lighthouse")
+
+    def test_an_error_event_fails_the_finish_with_its_reason(self):
+        server = FakeWyomingServer(reply="error")
+        self.addCleanup(server.close)
+        stream = WyomingStream(server.address, self.AUDIO)
+        stream.send(b"\x00\x00" * 160)
+
+        with self.assertRaisesRegex(WyomingUnavailable, "the model is not loaded"):
+            stream.finish()
+
+    def test_a_stream_nobody_finished_is_closed_once_it_has_been_quiet_too_long(self):
+        class Stream:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        now = [0.0]
+        streams = TranscriptionStreams(idle_seconds=30, per_user=1, clock=lambda: now[0])
+        abandoned = Stream()
+        stream_id = streams.add("u1", abandoned)
+        now[0] = 31.0
+        streams.add("u1", Stream())
+
+        # A closed tab never asks for its transcript; the socket it held to the
+        # transcription service must not outlive it by more than a little.
+        self.assertTrue(abandoned.closed)
+        with self.assertRaises(Exception):
+            streams.use("u1", stream_id)
+
+    def test_a_quiet_stream_is_closed_even_if_nobody_else_transcribes(self):
+        class Stream:
+            def __init__(self):
+                self.closed = threading.Event()
+
+            def close(self):
+                self.closed.set()
+
+        now = [0.0]
+        streams = TranscriptionStreams(idle_seconds=30, clock=lambda: now[0], sweep_seconds=0.01)
+        streams.start()
+        self.addCleanup(streams.close)
+        abandoned = Stream()
+        streams.add("u1", abandoned)
+        now[0] = 31.0
+
+        self.assertTrue(abandoned.closed.wait(2))
+
+
 class ThroughTheProductTests(unittest.TestCase):
     """The wire, because the wire is where a settings key gets forgotten."""
 
@@ -245,6 +342,31 @@ class ThroughTheProductTests(unittest.TestCase):
             self.assertEqual(response.status_code, 200, response.text)
             self.assertEqual(response.json()["text"], "what do I drive")
 
+    def test_a_kept_recording_is_copied_from_the_spooled_upload_whole(self):
+        server = FakeWyomingServer()
+        self.addCleanup(server.close)
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login()
+            running.client.put(
+                "/api/v1/settings",
+                json={
+                    "stt_provider": "local",
+                    "preferences": {
+                        "stt_local_backend": "wyoming",
+                        "stt_wyoming_address": server.address,
+                        "stt_store_recordings": True,
+                    },
+                },
+            )
+            # Past what is kept in memory, so the upload reaches the route as a file on disk.
+            recording = b"webm" * 400_000
+
+            response = _transcribe(running, recording)
+
+            self.assertEqual(response.status_code, 200, response.text)
+            kept = list(running.config.stt_recordings_dir.iterdir())
+            self.assertEqual([path.read_bytes() == recording for path in kept], [True])
+
     def test_a_missing_address_is_a_settings_problem_not_a_provider_failure(self):
         with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
             running.create_and_login()
@@ -302,21 +424,50 @@ class ThroughTheProductTests(unittest.TestCase):
 
             self.assertEqual(response.status_code, 400, response.text)
 
+    def test_a_turn_streamed_while_speaking_is_transcribed_when_it_ends(self):
+        server = FakeWyomingServer(text="what do I drive", streaming=True)
+        self.addCleanup(server.close)
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login()
+            running.client.put(
+                "/api/v1/settings",
+                json={
+                    "stt_provider": "local",
+                    "preferences": {"stt_local_backend": "wyoming", "stt_wyoming_address": server.address},
+                },
+            )
+
+            opened = running.client.post("/api/v1/speech/transcriptions/streams", json={"rate": 16000})
+            self.assertEqual(opened.status_code, 201, opened.text)
+            audio_url = f"/api/v1/speech/transcriptions/streams/{opened.json()['id']}/audio"
+            sent = running.client.post(audio_url, content=b"\x00\x00" * 1600)
+            ragged = running.client.post(audio_url, content=b"\x00")
+            finished = running.client.post(f"/api/v1/speech/transcriptions/streams/{opened.json()['id']}/finish")
+            again = running.client.post(audio_url, content=b"\x00\x00")
+
+            self.assertEqual(sent.status_code, 200, sent.text)
+            # Half a sample would shift every sample after it.
+            self.assertEqual(ragged.status_code, 400, ragged.text)
+            self.assertEqual(finished.status_code, 200, finished.text)
+            self.assertEqual(finished.json()["text"], "what do I drive")
+            self.assertEqual(again.status_code, 404, again.text)
+
+    def test_only_a_wyoming_service_can_be_streamed_to(self):
+        with tempfile.TemporaryDirectory() as tmp, TestApp(Path(tmp)) as running:
+            running.create_and_login()
+            running.client.put("/api/v1/settings", json={"stt_provider": "local"})
+
+            response = running.client.post("/api/v1/speech/transcriptions/streams", json={"rate": 16000})
+
+            self.assertEqual(response.status_code, 400, response.text)
+            self.assertIn("/speech/transcriptions", response.json()["error"]["message"])
 
-def _transcribe(running):
-    def fake_run(command, **_kwargs):
-        # ffmpeg is a real dependency of this path and not what is under test.
-        with wave.open(command[-1], "wb") as handle:
-            handle.setnchannels(1)
-            handle.setsampwidth(2)
-            handle.setframerate(16000)
-            handle.writeframes(struct.pack("<h", 0) * 1600)
-        return mock.Mock(returncode=0)
 
-    with mock.patch("app.speech_service.subprocess.run", side_effect=fake_run):
+def _transcribe(running, recording: bytes = b"webm bytes"):
+    with mock.patch("app.audio_transcode.subprocess.Popen", FakeFfmpeg(struct.pack("<h", 0) * 1600)):
         return running.client.post(
             "/api/v1/speech/transcriptions",
-            files={"file": ("turn.webm", b"webm bytes", "audio/webm")},
+            files={"file": ("turn.webm", recording, "audio/webm")},
         )
 
 
@@ -1,15 +1,50 @@
-(function(){let e=document.createElement(`link`).relList;if(e&&e.supports&&e.supports(`modulepreload`))return;for(let e of document.querySelectorAll(`link[rel="modulepreload"]`))n(e);new MutationObserver(e=>{for(let t of e)if(t.type===`childList`)for(let e of t.addedNodes)e.tagName===`LINK`&&e.rel===`modulepreload`&&n(e)}).observe(document,{childList:!0,subtree:!0});function t(e){let t={};return e.integrity&&(t.integrity=e.integrity),e.referrerPolicy&&(t.referrerPolicy=e.referrerPolicy),e.crossOrigin===`use-credentials`?t.credentials=`include`:e.crossOrigin===`anonymous`?t.credentials=`omit`:t.credentials=`same-origin`,t}function n(e){if(e.ep)return;e.ep=!0;let n=t(e);fetch(e.href,n)}})();var e=class extends Error{status;code;constructor(e,t,n){super(e),this.status=t,this.code=n,this.name=`ApiError`}},t=class{base;constructor(e=`/api/v1`){this.base=e}async request(t,n={}){let r=new Headers(n.headers),i=(n.method??`GET`).toUpperCase();[`POST`,`PUT`,`PATCH`,`DELETE`].includes(i)&&r.set(`X-Nice-Assistant-CSRF`,`1`),n.body&&!(n.body instanceof FormData)&&!r.has(`Content-Type`)&&r.set(`Content-Type`,`application/json`);let a=await fetch(`${this.base}${t}`,{credentials:`same-origin`,...n,headers:r}),o=(a.headers.get(`content-type`)??``).includes(`application/json`)?await a.json():await a.text();if(!a.ok){let t=typeof o==`object`&&o?o.error:void 0,n=typeof t==`string`?t:t?.message??`Request failed (${a.status})`,r=typeof t==`object`&&t?.code!==void 0?t.code:a.status;throw a.status===401&&window.dispatchEvent(new CustomEvent(`nice:unauthorized`)),new e(n,a.status,r)}return o}createUser(e,t){return this.request(`/users`,{method:`POST`,body:JSON.stringify({username:e,password:t})})}login(e,t){return this.request(`/session`,{method:`POST`,body:JSON.stringify({username:e,password:t})})}session(){return this.request(`/session`)}logout(){return this.request(`/session`,{method:`DELETE`})}settings(){return this.request(`/settings`)}updateSettings(e){return this.request(`/settings`,{method:`PUT`,body:JSON.stringify(e)})}workspaces(){return this.request(`/workspaces`)}createWorkspace(e){return this.request(`/workspaces`,{method:`POST`,body:JSON.stringify({name:e})})}updateWorkspace(e,t){return this.request(`/workspaces/${encodeURIComponent(e)}`,{method:`PUT`,body:JSON.stringify({name:t})})}deleteWorkspace(e){return this.request(`/workspaces/${encodeURIComponent(e)}`,{method:`DELETE`})}personas(){return this.request(`/personas`)}createPersona(e){return this.request(`/personas`,{method:`POST`,body:JSON.stringify(e)})}updatePersona(e,t){return this.request(`/personas/${encodeURIComponent(e)}`,{method:`PUT`,body:JSON.stringify(t)})}updatePersonaCard(e,t){return this.request(`/personas/${encodeURIComponent(e)}/card`,{method:`PUT`,body:JSON.stringify(t)})}personaLore(e){return this.request(`/personas/${encodeURIComponent(e)}/lore`)}createPersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore`,{method:`POST`,body:JSON.stringify(t)})}updatePersonaLore(e,t,n){return this.request(`/personas/${encodeURIComponent(e)}/lore/${encodeURIComponent(t)}`,{method:`PUT`,body:JSON.stringify(n)})}deletePersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore/${encodeURIComponent(t)}`,{method:`DELETE`})}copyablePersonaLore(e){return this.request(`/personas/${encodeURIComponent(e)}/lore/copyable`)}copyPersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore/copies`,{method:`POST`,body:JSON.stringify({source_entry_id:t})})}previewPersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore/preview`,{method:`POST`,body:JSON.stringify({text:t})})}deletePersona(e){return this.request(`/personas/${encodeURIComponent(e)}`,{method:`DELETE`})}identitySettings(){return this.request(`/identity-validation/settings`)}updateIdentitySettings(e){return this.request(`/identity-validation/settings`,{method:`PUT`,body:JSON.stringify(e)})}checkIdentityProvider(){return this.request(`/identity-validation/check`,{method:`POST`})}dataLocality(){return this.request(`/data-locality`)}workflowTemplates(e){return this.request(`/media-catalog/workflow-templates?model_id=${encodeURIComponent(e)}`)}verifyWorkflowTemplate(e){return this.request(`/media-catalog/workflow-templates/${encodeURIComponent(e)}/verify`,{method:`POST`})}installWorkflowTemplate(e,t,n=``,r=``,i=[]){return this.request(`/media-catalog/workflow-templates/${encodeURIComponent(e)}/installations`,{method:`POST`,body:JSON.stringify({model_id:t,name:n,preset_id:r,asset_choices:i})})}visualIdentity(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity`)}updateVisualIdentity(e,t){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity`,{method:`PUT`,body:JSON.stringify({appearance_description:t.appearance_description,acceptance_threshold:t.acceptance_threshold,max_generation_attempts:t.max_generation_attempts,conditioning_mechanism:t.conditioning_mechanism??`reference_adapter`,comparison_retry_enabled:t.comparison_retry_enabled??!1,preferred_preset_ids:t.preferred_preset_ids??[],failure_policy:t.failure_policy,conditioning_fallback:t.conditioning_fallback??`allow_unconditioned`,revision:t.revision})})}grantIdentityConsent(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/consent`,{method:`POST`,body:JSON.stringify({attested:!0})})}withdrawIdentityConsent(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/consent`,{method:`DELETE`})}uploadIdentityReference(e,t,n){let r=new FormData;return r.append(`file`,t,t.name),r.append(`provenance`,n),r.append(`attested`,`true`),this.request(`/personas/${encodeURIComponent(e)}/visual-identity/references`,{method:`POST`,body:r})}identityReferenceFromMedia(e,t){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/references/from-media`,{method:`POST`,body:JSON.stringify({media_id:t,attested:!0})})}approveIdentityReference(e){return this.request(`/identity-references/${encodeURIComponent(e)}/approval`,{method:`POST`})}rejectIdentityReference(e,t){return this.request(`/identity-references/${encodeURIComponent(e)}/rejection`,{method:`POST`,body:JSON.stringify({reason:t})})}deleteIdentityReference(e){return this.request(`/identity-references/${encodeURIComponent(e)}`,{method:`DELETE`})}validateIdentityMedia(e,t){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/validations`,{method:`POST`,body:JSON.stringify({media_id:t})})}identityValidations(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/validations`)}mediaLibrary(e=`image`,t=100){return this.request(`/media?kind=${encodeURIComponent(e)}&limit=${encodeURIComponent(String(t))}`)}identityHistory(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/history`)}chats(){return this.request(`/chats`)}createChat(e){return this.request(`/chats`,{method:`POST`,body:JSON.stringify(e)})}chat(e){return this.request(`/chats/${encodeURIComponent(e)}`)}updateChat(e,t){return this.request(`/chats/${encodeURIComponent(e)}`,{method:`PUT`,body:JSON.stringify(t)})}hideChat(e){return this.request(`/chats/${encodeURIComponent(e)}/hide`,{method:`POST`})}deleteChat(e){return this.request(`/chats/${encodeURIComponent(e)}`,{method:`DELETE`})}bulkChatAction(e,t){return this.request(`/chats/bulk-actions`,{method:`POST`,body:JSON.stringify({action:e,ids:t})})}createTurn(e,t){return this.request(`/chats/${encodeURIComponent(e)}/turns`,{method:`POST`,body:JSON.stringify(t)})}job(e){return this.request(`/jobs/${encodeURIComponent(e)}`)}cancelJob(e){return this.request(`/jobs/${encodeURIComponent(e)}`,{method:`DELETE`})}capabilityRequests(e){let t=e?`?chat_id=${encodeURIComponent(e)}`:``;return this.request(`/capability-requests${t}`)}capabilityRequest(e){return this.request(`/capability-requests/${encodeURIComponent(e)}`)}libraryEntries(e){let t=e?`?persona_id=${encodeURIComponent(e)}`:``;return this.request(`/media-library${t}`)}deleteLibraryEntry(e){return this.request(`/media-library/${encodeURIComponent(e)}`,{method:`DELETE`})}exportPreset(e){return this.request(`/media-catalog/presets/${encodeURIComponent(e)}/export`)}previewPresetImport(e){return this.request(`/media-catalog/presets/import/preview`,{method:`POST`,body:JSON.stringify({bundle:e})})}importPresets(e){return this.request(`/media-catalog/presets/import`,{method:`POST`,body:JSON.stringify({bundle:e})})}mediaJournals(e=5){return this.request(`/media-journals?limit=${encodeURIComponent(String(e))}`)}sceneBacklog(e){let t=e?`?state=${encodeURIComponent(e)}`:``;return this.request(`/scene-backlog${t}`)}productionReadiness(){return this.request(`/scene-backlog/production-readiness`)}presetSignals(){return this.request(`/preset-signals`)}clearPresetSignals(e){return this.request(`/preset-signals/${encodeURIComponent(e)}`,{method:`DELETE`})}mediaPresets(){return this.request(`/media-catalog/presets`)}updateMediaPreset(e,t){return this.request(`/media-catalog/presets/${encodeURIComponent(e)}`,{method:`PUT`,body:JSON.stringify(t)})}deleteMediaPreset(e){return this.request(`/media-catalog/presets/${encodeURIComponent(e)}`,{method:`DELETE`})}starterPresets(){return this.request(`/media-catalog/starter-presets`)}installStarterPresets(){return this.request(`/media-catalog/starter-presets/install`,{method:`POST`})}previewMediaRouting(e){return this.request(`/media-catalog/routing-previews`,{method:`POST`,body:JSON.stringify({text:e})})}mediaJournalForMedia(e){return this.request(`/media/${encodeURIComponent(e)}/journal`)}mediaJournalExportUrl(e){return`${this.base}/media-journals/${encodeURIComponent(e)}/export`}approveCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/approval`,{method:`POST`})}replanCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/replan`,{method:`POST`})}denyCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/denial`,{method:`POST`})}cancelCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}`,{method:`DELETE`})}retryCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/retry`,{method:`POST`})}mediaReadiness(){return this.request(`/media/readiness`)}mediaCatalog(){return this.request(`/media-catalog`)}updateMediaCatalogSettings(e){return this.request(`/media-catalog/settings`,{method:`PUT`,body:JSON.stringify(e)})}createMediaCatalogResource(e){return this.request(`/media-catalog/resources`,{method:`POST`,body:JSON.stringify(e)})}updateMediaCatalogResource(e){let{id:t,revision:n,created_at:r,updated_at:i,...a}=e;return this.request(`/media-catalog/resources/${encodeURIComponent(t)}`,{method:`PUT`,body:JSON.stringify(a)})}deleteMediaCatalogResource(e){return this.request(`/media-catalog/resources/${encodeURIComponent(e)}`,{method:`DELETE`})}previewMediaPlan(e){return this.request(`/media-catalog/plan-previews`,{method:`POST`,body:JSON.stringify(e)})}comfyuiCheckpoints(){return this.request(`/media-catalog/comfyui-checkpoints`,{method:`POST`,body:JSON.stringify({})})}addModelsFromCheckpoints(e){return this.request(`/media-catalog/models/from-checkpoints`,{method:`POST`,body:JSON.stringify({names:e})})}inspectIdentityWorkflow(e,t={},n=`identity`){return this.request(`/media-catalog/identity-workflows/inspect`,{method:`POST`,body:JSON.stringify({workflow_patch:e,settings:t,role:n})})}taskModels(){return this.request(`/task-models`)}updateTaskModel(e){let t={enabled:e.enabled,provider:e.provider,model:e.model,fallback_provider:e.fallback_provider,fallback_model:e.fallback_model,max_input_tokens:e.max_input_tokens,max_output_tokens:e.max_output_tokens,timeout_seconds:e.timeout_seconds,temperature:e.temperature,fallback_policy:e.fallback_policy};return this.request(`/task-models/${encodeURIComponent(e.role)}`,{method:`PUT`,body:JSON.stringify(t)})}checkTaskModel(e){return this.request(`/task-models/${encodeURIComponent(e)}/check`,{method:`POST`})}taskModelRuns(e,t=50){let n=new URLSearchParams({limit:String(t)});return e&&n.set(`role`,e),this.request(`/task-model-runs?${n.toString()}`)}models(){return this.request(`/models`)}providerCheck(e,t){return this.request(`/provider-checks`,{method:`POST`,body:JSON.stringify({provider:e,settings:t})})}memories(e){let t=e?`?status=${encodeURIComponent(e)}`:``;return this.request(`/memories${t}`)}createMemory(e,t,n){return this.request(`/memories`,{method:`POST`,body:JSON.stringify({scope:e,scope_id:t,content:n})})}proposeMemory(e,t,n,r){return this.request(`/memory-proposals`,{method:`POST`,body:JSON.stringify({scope:e,scope_id:t,content:n,source_message_id:r})})}updateMemory(e,t,n,r){return this.request(`/memories/${encodeURIComponent(e)}`,{method:`PUT`,body:JSON.stringify({scope:t,scope_id:n,content:r})})}memoryAction(e,t){return this.request(`/memories/${encodeURIComponent(e)}/${t}`,{method:`POST`})}deleteMemory(e){return this.request(`/memories/${encodeURIComponent(e)}`,{method:`DELETE`})}bulkMemoryAction(e,t){return this.request(`/memories/bulk-actions`,{method:`POST`,body:JSON.stringify({action:e,ids:t})})}memoryHistory(e){return this.request(`/memories/${encodeURIComponent(e)}/history`)}imageJob(e){return this.request(`/media/image-jobs`,{method:`POST`,body:JSON.stringify(e)})}imageEditJob(e){return this.request(`/media/image-edit-jobs`,{method:`POST`,body:JSON.stringify(e)})}videoJob(e){return this.request(`/media/video-jobs`,{method:`POST`,body:JSON.stringify(e)})}voices(e){return this.request(`/speech/voices?base_url=${encodeURIComponent(e)}`)}synthesize(e,t){return this.request(`/speech/syntheses`,{method:`POST`,body:JSON.stringify(e),...t?{signal:t}:{}})}async streamSpeech(t,n){let r=new Headers({"Content-Type":`application/json`,"X-Nice-Assistant-CSRF":`1`}),i=await fetch(`${this.base}/speech/streams`,{method:`POST`,credentials:`same-origin`,headers:r,body:JSON.stringify(t),...n?{signal:n}:{}});if(!i.ok)throw new e(`Speech stream failed (${i.status})`,i.status,i.status);return i}transcribe(e,t){let n=new FormData;return n.append(`file`,e,t),this.request(`/speech/transcriptions`,{method:`POST`,body:n})}backups(){return this.request(`/admin/backups`)}createBackup(e){return this.request(`/admin/backups`,{method:`POST`,body:JSON.stringify({include_media:e})})}deleteBackup(e){return this.request(`/admin/backups/${encodeURIComponent(e)}`,{method:`DELETE`})}verifyBackup(e){return this.request(`/admin/backups/${encodeURIComponent(e)}/verify`,{method:`POST`})}resourceCoordination(){return this.request(`/admin/resource-coordination`)}saveResourceCoordination(e){return this.request(`/admin/resource-coordination`,{method:`PUT`,body:JSON.stringify({...e.settings,authorizations:e.endpoints.map(e=>({provider:e.provider,exclusive_control:e.authorization.exclusive_control,allow_release:e.authorization.allow_release}))})})}checkResourceCoordination(){return this.request(`/admin/resource-coordination/check`,{method:`POST`})}resourceCoordinationEvents(e=100){return this.request(`/admin/resource-coordination/events?limit=${e}`)}backupDownloadUrl(e){return`${this.base}/admin/backups/${encodeURIComponent(e)}/download`}diagnosticLogUrl(){return`${this.base}/admin/diagnostics/log`}mediaUrl(e){return`${this.base}/media/${encodeURIComponent(e)}`}async clientEvent(e,t,n={}){try{await this.request(`/diagnostics/client-events`,{method:`POST`,body:JSON.stringify({type:e,message:t,details:n})})}catch{}}async streamTurn(t,r,i,a){let o=new Headers({Accept:`text/event-stream`});a!==void 0&&o.set(`Last-Event-ID`,String(a));let s=await fetch(`${this.base}/turns/${encodeURIComponent(t)}/events`,{credentials:`same-origin`,headers:o,signal:i});if(!s.ok||!s.body)throw new e(`Turn stream failed (${s.status})`,s.status,s.status);let c=s.body.getReader(),l=new TextDecoder,u=``;for(;;){let{done:e,value:t}=await c.read();u+=l.decode(t,{stream:!e}),u=u.replace(/\r\n/g,`
-`);let i=u.indexOf(`
+var K=class extends Error{constructor(t,i,n){super(t);this.status=i;this.code=n;this.name="ApiError"}status;code},lt=class{constructor(e="/api/v1"){this.base=e}base;async request(e,t={}){let i=new Headers(t.headers),n=(t.method??"GET").toUpperCase();["POST","PUT","PATCH","DELETE"].includes(n)&&i.set("X-Nice-Assistant-CSRF","1"),t.body&&!(t.body instanceof FormData)&&!i.has("Content-Type")&&i.set("Content-Type","application/json");let r=await fetch(`${this.base}${e}`,{credentials:"same-origin",...t,headers:i}),l=(r.headers.get("content-type")??"").includes("application/json")?await r.json():await r.text();if(!r.ok){let c=typeof l=="object"&&l!==null?l.error:void 0,p=typeof c=="string"?c:c?.message??`Request failed (${r.status})`,g=typeof c=="object"&&c?.code!==void 0?c.code:r.status;throw r.status===401&&window.dispatchEvent(new CustomEvent("nice:unauthorized")),new K(p,r.status,g)}return l}createUser(e,t){return this.request("/users",{method:"POST",body:JSON.stringify({username:e,password:t})})}login(e,t){return this.request("/session",{method:"POST",body:JSON.stringify({username:e,password:t})})}session(){return this.request("/session")}logout(){return this.request("/session",{method:"DELETE"})}settings(){return this.request("/settings")}updateSettings(e){return this.request("/settings",{method:"PUT",body:JSON.stringify(e)})}workspaces(){return this.request("/workspaces")}createWorkspace(e){return this.request("/workspaces",{method:"POST",body:JSON.stringify({name:e})})}updateWorkspace(e,t){return this.request(`/workspaces/${encodeURIComponent(e)}`,{method:"PUT",body:JSON.stringify({name:t})})}deleteWorkspace(e){return this.request(`/workspaces/${encodeURIComponent(e)}`,{method:"DELETE"})}personas(){return this.request("/personas")}createPersona(e){return this.request("/personas",{method:"POST",body:JSON.stringify(e)})}updatePersona(e,t){return this.request(`/personas/${encodeURIComponent(e)}`,{method:"PUT",body:JSON.stringify(t)})}updatePersonaCard(e,t){return this.request(`/personas/${encodeURIComponent(e)}/card`,{method:"PUT",body:JSON.stringify(t)})}personaLore(e){return this.request(`/personas/${encodeURIComponent(e)}/lore`)}createPersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore`,{method:"POST",body:JSON.stringify(t)})}updatePersonaLore(e,t,i){return this.request(`/personas/${encodeURIComponent(e)}/lore/${encodeURIComponent(t)}`,{method:"PUT",body:JSON.stringify(i)})}deletePersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore/${encodeURIComponent(t)}`,{method:"DELETE"})}copyablePersonaLore(e){return this.request(`/personas/${encodeURIComponent(e)}/lore/copyable`)}copyPersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore/copies`,{method:"POST",body:JSON.stringify({source_entry_id:t})})}previewPersonaLore(e,t){return this.request(`/personas/${encodeURIComponent(e)}/lore/preview`,{method:"POST",body:JSON.stringify({text:t})})}deletePersona(e){return this.request(`/personas/${encodeURIComponent(e)}`,{method:"DELETE"})}identitySettings(){return this.request("/identity-validation/settings")}updateIdentitySettings(e){return this.request("/identity-validation/settings",{method:"PUT",body:JSON.stringify(e)})}checkIdentityProvider(){return this.request("/identity-validation/check",{method:"POST"})}dataLocality(){return this.request("/data-locality")}workflowTemplates(e){return this.request(`/media-catalog/workflow-templates?model_id=${encodeURIComponent(e)}`)}verifyWorkflowTemplate(e){return this.request(`/media-catalog/workflow-templates/${encodeURIComponent(e)}/verify`,{method:"POST"})}installWorkflowTemplate(e,t,i="",n="",r=[]){return this.request(`/media-catalog/workflow-templates/${encodeURIComponent(e)}/installations`,{method:"POST",body:JSON.stringify({model_id:t,name:i,preset_id:n,asset_choices:r})})}visualIdentity(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity`)}updateVisualIdentity(e,t){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity`,{method:"PUT",body:JSON.stringify({appearance_description:t.appearance_description,acceptance_threshold:t.acceptance_threshold,max_generation_attempts:t.max_generation_attempts,conditioning_mechanism:t.conditioning_mechanism??"reference_adapter",comparison_retry_enabled:t.comparison_retry_enabled??!1,preferred_preset_ids:t.preferred_preset_ids??[],failure_policy:t.failure_policy,conditioning_fallback:t.conditioning_fallback??"allow_unconditioned",revision:t.revision})})}grantIdentityConsent(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/consent`,{method:"POST",body:JSON.stringify({attested:!0})})}withdrawIdentityConsent(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/consent`,{method:"DELETE"})}uploadIdentityReference(e,t,i){let n=new FormData;return n.append("file",t,t.name),n.append("provenance",i),n.append("attested","true"),this.request(`/personas/${encodeURIComponent(e)}/visual-identity/references`,{method:"POST",body:n})}identityReferenceFromMedia(e,t){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/references/from-media`,{method:"POST",body:JSON.stringify({media_id:t,attested:!0})})}approveIdentityReference(e){return this.request(`/identity-references/${encodeURIComponent(e)}/approval`,{method:"POST"})}rejectIdentityReference(e,t){return this.request(`/identity-references/${encodeURIComponent(e)}/rejection`,{method:"POST",body:JSON.stringify({reason:t})})}deleteIdentityReference(e){return this.request(`/identity-references/${encodeURIComponent(e)}`,{method:"DELETE"})}validateIdentityMedia(e,t){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/validations`,{method:"POST",body:JSON.stringify({media_id:t})})}identityValidations(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/validations`)}mediaLibrary(e="image",t=100){return this.request(`/media?kind=${encodeURIComponent(e)}&limit=${encodeURIComponent(String(t))}`)}identityHistory(e){return this.request(`/personas/${encodeURIComponent(e)}/visual-identity/history`)}chats(){return this.request("/chats")}createChat(e){return this.request("/chats",{method:"POST",body:JSON.stringify(e)})}chat(e,t={}){let i=new URLSearchParams;t.before&&i.set("before",t.before),t.limit&&i.set("limit",String(t.limit));let n=i.toString()?`?${i.toString()}`:"";return this.request(`/chats/${encodeURIComponent(e)}${n}`)}updateChat(e,t){return this.request(`/chats/${encodeURIComponent(e)}`,{method:"PUT",body:JSON.stringify(t)})}hideChat(e){return this.request(`/chats/${encodeURIComponent(e)}/hide`,{method:"POST"})}deleteChat(e){return this.request(`/chats/${encodeURIComponent(e)}`,{method:"DELETE"})}bulkChatAction(e,t){return this.request("/chats/bulk-actions",{method:"POST",body:JSON.stringify({action:e,ids:t})})}createTurn(e,t){return this.request(`/chats/${encodeURIComponent(e)}/turns`,{method:"POST",body:JSON.stringify(t)})}job(e){return this.request(`/jobs/${encodeURIComponent(e)}`)}cancelJob(e){return this.request(`/jobs/${encodeURIComponent(e)}`,{method:"DELETE"})}capabilityRequests(e){let t=e?`?chat_id=${encodeURIComponent(e)}`:"";return this.request(`/capability-requests${t}`)}capabilityRequest(e){return this.request(`/capability-requests/${encodeURIComponent(e)}`)}libraryEntries(e){let t=e?`?persona_id=${encodeURIComponent(e)}`:"";return this.request(`/media-library${t}`)}deleteLibraryEntry(e){return this.request(`/media-library/${encodeURIComponent(e)}`,{method:"DELETE"})}exportPreset(e){return this.request(`/media-catalog/presets/${encodeURIComponent(e)}/export`)}previewPresetImport(e){return this.request("/media-catalog/presets/import/preview",{method:"POST",body:JSON.stringify({bundle:e})})}importPresets(e){return this.request("/media-catalog/presets/import",{method:"POST",body:JSON.stringify({bundle:e})})}mediaJournals(e=5){return this.request(`/media-journals?limit=${encodeURIComponent(String(e))}`)}sceneBacklog(e){let t=e?`?state=${encodeURIComponent(e)}`:"";return this.request(`/scene-backlog${t}`)}productionReadiness(){return this.request("/scene-backlog/production-readiness")}presetSignals(){return this.request("/preset-signals")}clearPresetSignals(e){return this.request(`/preset-signals/${encodeURIComponent(e)}`,{method:"DELETE"})}mediaPresets(){return this.request("/media-catalog/presets")}updateMediaPreset(e,t){return this.request(`/media-catalog/presets/${encodeURIComponent(e)}`,{method:"PUT",body:JSON.stringify(t)})}deleteMediaPreset(e){return this.request(`/media-catalog/presets/${encodeURIComponent(e)}`,{method:"DELETE"})}starterPresets(){return this.request("/media-catalog/starter-presets")}installStarterPresets(){return this.request("/media-catalog/starter-presets/install",{method:"POST"})}previewMediaRouting(e){return this.request("/media-catalog/routing-previews",{method:"POST",body:JSON.stringify({text:e})})}mediaJournalForMedia(e){return this.request(`/media/${encodeURIComponent(e)}/journal`)}mediaJournalExportUrl(e){return`${this.base}/media-journals/${encodeURIComponent(e)}/export`}approveCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/approval`,{method:"POST"})}replanCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/replan`,{method:"POST"})}denyCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/denial`,{method:"POST"})}cancelCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}`,{method:"DELETE"})}retryCapability(e){return this.request(`/capability-requests/${encodeURIComponent(e)}/retry`,{method:"POST"})}mediaReadiness(){return this.request("/media/readiness")}mediaCatalog(){return this.request("/media-catalog")}updateMediaCatalogSettings(e){return this.request("/media-catalog/settings",{method:"PUT",body:JSON.stringify(e)})}createMediaCatalogResource(e){return this.request("/media-catalog/resources",{method:"POST",body:JSON.stringify(e)})}updateMediaCatalogResource(e){let{id:t,revision:i,created_at:n,updated_at:r,...d}=e;return this.request(`/media-catalog/resources/${encodeURIComponent(t)}`,{method:"PUT",body:JSON.stringify(d)})}deleteMediaCatalogResource(e){return this.request(`/media-catalog/resources/${encodeURIComponent(e)}`,{method:"DELETE"})}previewMediaPlan(e){return this.request("/media-catalog/plan-previews",{method:"POST",body:JSON.stringify(e)})}comfyuiCheckpoints(){return this.request("/media-catalog/comfyui-checkpoints",{method:"POST",body:JSON.stringify({})})}addModelsFromCheckpoints(e){return this.request("/media-catalog/models/from-checkpoints",{method:"POST",body:JSON.stringify({names:e})})}inspectIdentityWorkflow(e,t={},i="identity"){return this.request("/media-catalog/identity-workflows/inspect",{method:"POST",body:JSON.stringify({workflow_patch:e,settings:t,role:i})})}taskModels(){return this.request("/task-models")}updateTaskModel(e){let t={enabled:e.enabled,provider:e.provider,model:e.model,fallback_provider:e.fallback_provider,fallback_model:e.fallback_model,max_input_tokens:e.max_input_tokens,max_output_tokens:e.max_output_tokens,timeout_seconds:e.timeout_seconds,temperature:e.temperature,fallback_policy:e.fallback_policy};return this.request(`/task-models/${encodeURIComponent(e.role)}`,{method:"PUT",body:JSON.stringify(t)})}checkTaskModel(e){return this.request(`/task-models/${encodeURIComponent(e)}/check`,{method:"POST"})}taskModelRuns(e,t=50){let i=new URLSearchParams({limit:String(t)});return e&&i.set("role",e),this.request(`/task-model-runs?${i.toString()}`)}models(){return this.request("/models")}providerCheck(e,t){return this.request("/provider-checks",{method:"POST",body:JSON.stringify({provider:e,settings:t})})}memories(e){let t=e?`?status=${encodeURIComponent(e)}`:"";return this.request(`/memories${t}`)}createMemory(e,t,i){return this.request("/memories",{method:"POST",body:JSON.stringify({scope:e,scope_id:t,content:i})})}proposeMemory(e,t,i,n){return this.request("/memory-proposals",{method:"POST",body:JSON.stringify({scope:e,scope_id:t,content:i,source_message_id:n})})}updateMemory(e,t,i,n){return this.request(`/memories/${encodeURIComponent(e)}`,{method:"PUT",body:JSON.stringify({scope:t,scope_id:i,content:n})})}memoryAction(e,t){return this.request(`/memories/${encodeURIComponent(e)}/${t}`,{method:"POST"})}deleteMemory(e){return this.request(`/memories/${encodeURIComponent(e)}`,{method:"DELETE"})}bulkMemoryAction(e,t){return this.request("/memories/bulk-actions",{method:"POST",body:JSON.stringify({action:e,ids:t})})}memoryHistory(e){return this.request(`/memories/${encodeURIComponent(e)}/history`)}imageJob(e){return this.request("/media/image-jobs",{method:"POST",body:JSON.stringify(e)})}imageEditJob(e){return this.request("/media/image-edit-jobs",{method:"POST",body:JSON.stringify(e)})}videoJob(e){return this.request("/media/video-jobs",{method:"POST",body:JSON.stringify(e)})}voices(e){return this.request(`/speech/voices?base_url=${encodeURIComponent(e)}`)}synthesize(e,t){return this.request("/speech/syntheses",{method:"POST",body:JSON.stringify(e),...t?{signal:t}:{}})}async streamSpeech(e,t){let i=new Headers({"Content-Type":"application/json","X-Nice-Assistant-CSRF":"1"}),n=await fetch(`${this.base}/speech/streams`,{method:"POST",credentials:"same-origin",headers:i,body:JSON.stringify(e),...t?{signal:t}:{}});if(!n.ok)throw new K(`Speech stream failed (${n.status})`,n.status,n.status);return n}transcribe(e,t){let i=new FormData;return i.append("file",e,t),this.request("/speech/transcriptions",{method:"POST",body:i})}openTranscriptionStream(e){return this.request("/speech/transcriptions/streams",{method:"POST",body:JSON.stringify({rate:e})})}sendTranscriptionAudio(e,t){return this.request(`/speech/transcriptions/streams/${encodeURIComponent(e)}/audio`,{method:"POST",headers:{"Content-Type":"application/octet-stream"},body:t})}finishTranscriptionStream(e){return this.request(`/speech/transcriptions/streams/${encodeURIComponent(e)}/finish`,{method:"POST"})}cancelTranscriptionStream(e){return this.request(`/speech/transcriptions/streams/${encodeURIComponent(e)}`,{method:"DELETE"})}backups(){return this.request("/admin/backups")}createBackup(e){return this.request("/admin/backups",{method:"POST",body:JSON.stringify({include_media:e})})}deleteBackup(e){return this.request(`/admin/backups/${encodeURIComponent(e)}`,{method:"DELETE"})}verifyBackup(e){return this.request(`/admin/backups/${encodeURIComponent(e)}/verify`,{method:"POST"})}resourceCoordination(){return this.request("/admin/resource-coordination")}saveResourceCoordination(e){return this.request("/admin/resource-coordination",{method:"PUT",body:JSON.stringify({...e.settings,authorizations:e.endpoints.map(t=>({provider:t.provider,exclusive_control:t.authorization.exclusive_control,allow_release:t.authorization.allow_release}))})})}checkResourceCoordination(){return this.request("/admin/resource-coordination/check",{method:"POST"})}resourceCoordinationEvents(e=100){return this.request(`/admin/resource-coordination/events?limit=${e}`)}backupDownloadUrl(e){return`${this.base}/admin/backups/${encodeURIComponent(e)}/download`}diagnosticLogUrl(){return`${this.base}/admin/diagnostics/log`}mediaUrl(e){return`${this.base}/media/${encodeURIComponent(e)}`}async clientEvent(e,t,i={}){try{await this.request("/diagnostics/client-events",{method:"POST",body:JSON.stringify({type:e,message:t,details:i})})}catch{}}async streamTurn(e,t,i,n){let r=new Headers({Accept:"text/event-stream"});n!==void 0&&r.set("Last-Event-ID",String(n));let d=await fetch(`${this.base}/turns/${encodeURIComponent(e)}/events`,{credentials:"same-origin",headers:r,signal:i});if(!d.ok||!d.body)throw new K(`Turn stream failed (${d.status})`,d.status,d.status);let l=d.body.getReader(),c=new TextDecoder,p="";for(;;){let{done:g,value:u}=await l.read();p+=c.decode(u,{stream:!g}),p=p.replace(/\r\n/g,`
+`);let y=p.indexOf(`
 
-`);for(;i>=0;){let e=u.slice(0,i);u=u.slice(i+2);let t=n(e);t&&r(t),i=u.indexOf(`
+`);for(;y>=0;){let S=p.slice(0,y);p=p.slice(y+2);let T=os(S);T&&t(T),y=p.indexOf(`
 
-`)}if(e)break}}};function n(e){if(!e||e.startsWith(`:`))return null;let t=null,n=`message`,r=[];for(let i of e.split(`
-`))i.startsWith(`id:`)?t=Number(i.slice(3).trim()):i.startsWith(`event:`)?n=i.slice(6).trim():i.startsWith(`data:`)&&r.push(i.slice(5).trimStart());if(!r.length)return null;let i=JSON.parse(r.join(`
-`));return{id:Number.isFinite(t)?t:null,event:n,data:typeof i==`object`&&i?i:{value:i}}}var r=new t;function i(e,t={},n=[]){let r=document.createElement(e);for(let[e,n]of Object.entries(t))n==null||n===!1||(e===`class`?r.className=String(n):e===`html`?r.innerHTML=String(n):e===`ariaLabel`?r.setAttribute(`aria-label`,String(n)):e===`ariaHidden`?r.setAttribute(`aria-hidden`,String(n)):e.startsWith(`on`)&&typeof n==`function`?r.addEventListener(e.slice(2),n):e===`style`&&typeof n==`object`?Object.assign(r.style,n):e in r?Reflect.set(r,e,n):r.setAttribute(e,String(n)));let i=Array.isArray(n)?n:[n];for(let e of i)e==null||e===!1||r.append(e instanceof Node?e:document.createTextNode(String(e)));return r}function a(e){return e.replace(/[&<>"']/g,e=>({"&":`&amp;`,"<":`&lt;`,">":`&gt;`,'"':`&quot;`,"'":`&#39;`})[e]??e)}function o(e=``){let t=[],n=e.replace(/```([\s\S]*?)```/g,(e,n)=>(t.push(`<pre><code>${a(n.trim())}</code></pre>`),`__CODE_${t.length-1}__`));return n=a(n).replace(/!\[(.*?)\]\(([^\s)]+)\)/g,`<img src="$2" alt="$1" class="msg-inline-image" loading="lazy" />`).replace(/\[(.*?)\]\((https?:\/\/[^\s)]+)\)/g,`<a href="$2" target="_blank" rel="noreferrer">$1</a>`).replace(/`([^`]+)`/g,`<code>$1</code>`).replace(/^\s*[-*]\s+(.+)$/gm,`<li>$1</li>`),n=n.replace(/(<li>.*<\/li>)/gs,`<ul>$1</ul>`),n=n.split(/\n{2,}/).map(e=>e.startsWith(`<`)?e:`<p>${e.replace(/\n/g,`<br/>`)}</p>`).join(``),t.forEach((e,t)=>{n=n.replace(`__CODE_${t}__`,e)}),n}function s(e){let t=document.querySelector(e);return t?t.scrollTop:null}function c(e,t){if(t===null||t<=0)return;let n=document.querySelector(e);n&&(n.scrollTop=t)}function l(e){let t=document.activeElement;if(!(t instanceof HTMLInputElement||t instanceof HTMLTextAreaElement)||!e.contains(t))return null;let n=[...e.querySelectorAll(`input, textarea`)].indexOf(t);return n<0?null:{selector:`input, textarea`,index:n,start:t.selectionStart,end:t.selectionEnd}}function u(e,t,n){if(!t||n)return;let r=e.querySelectorAll(t.selector).item(t.index);!r||r.disabled||(r.focus(),t.start!==null&&t.end!==null&&r.setSelectionRange(t.start,t.end))}function d(e){return e?new Date(e*1e3).toLocaleString([],{month:`short`,day:`numeric`,hour:`2-digit`,minute:`2-digit`}):``}function f(e=0){if(!e)return`0 B`;let t=[`B`,`KB`,`MB`,`GB`,`TB`],n=Math.min(t.length-1,Math.floor(Math.log(e)/Math.log(1024)));return`${(e/1024**n).toFixed(+!!n)} ${t[n]??`B`}`}function p(e,t){return e instanceof Error&&e.message?e.message:t}async function m(e){if(navigator.clipboard?.writeText){await navigator.clipboard.writeText(e);return}let t=document.createElement(`textarea`);t.value=e,t.style.position=`fixed`,t.style.opacity=`0`,document.body.append(t),t.select();try{if(!document.execCommand(`copy`))throw Error(`Copy is unavailable.`)}finally{t.remove()}}function h(e,t){let n=document.createElement(`a`);n.href=e,n.download=t,n.rel=`noopener`,document.body.append(n),n.click(),n.remove()}var g={signed_out:new Set([`onboarding`,`idle`,`error`]),onboarding:new Set([`idle`,`signed_out`,`error`]),idle:new Set([`loading_chat`,`queued`,`recording`,`speaking`,`signed_out`,`error`]),loading_chat:new Set([`idle`,`signed_out`,`error`]),queued:new Set([`thinking`,`idle`,`signed_out`,`error`]),thinking:new Set([`idle`,`speaking`,`signed_out`,`error`]),recording:new Set([`transcribing`,`idle`,`signed_out`,`error`]),transcribing:new Set([`queued`,`idle`,`signed_out`,`error`]),speaking:new Set([`idle`,`recording`,`signed_out`,`error`]),error:new Set([`idle`,`signed_out`,`loading_chat`,`onboarding`])};function ee(){return{session:null,phase:`signed_out`,phaseBeforeError:`signed_out`,chats:[],currentChat:null,messages:[],capabilityRequests:[],personas:[],workspaces:[],settings:null,models:[],memories:[],taskModels:[],taskModelRuns:[],taskModelChecks:{},taskModelBusy:{},mediaCatalog:null,mediaReadiness:null,mediaCatalogBusy:!1,mediaPlanPreview:null,mediaCatalogIdentitySetupIntent:null,identitySettings:null,identityProfiles:{},identityValidations:{},identityEvents:{},identitySelectedPersonaId:null,identityBusy:!1,route:{kind:`home`},statusText:`Signed out`,uiError:``,authError:``,settingsError:``,drawerOpen:!1,chatSearch:``,stickMessagesToBottom:!0,showJumpBottom:!1,showSettings:!1,settingsSection:`General`,modal:null,generationLog:null,routingPreview:null,selectedPersonaId:null,selectedModel:null,selectedMemoryMode:null,draftMessage:``,showChatControlsMenu:!1,showSystemMessages:!1,showThinkingByDefault:!1,thinkingExpanded:{},showViz:!1,voiceResponsesEnabled:!0,currentAudioMessageId:null,messageAudioById:{},messageAudioErrors:{},pendingRequest:null,recordingStartedAt:0,settingsSaving:!1,settingsSavedAt:0,providerChecks:{},providerChecksRunning:{},backupItems:[],backupsLoading:!1,backupActionRunning:!1,resourceCoordination:null,resourceCoordinationEvents:[],resourceCoordinationBusy:!1,memorySections:{active:!1,pending:!1,activeGlobal:!1,activeWorkspace:!1,activePersona:!1,activeChat:!1,pendingGlobal:!1,pendingWorkspace:!1,pendingPersona:!1,pendingChat:!1,history:!1},personaAvatarPreview:``,chatImagePreview:``,partialTranscript:``,expandedMessageNotes:{},chatImageGallery:[],chatVideoPreview:``,revealedImages:{},showNewChatPersonaModal:!1,newChatPersonaId:null,onboardingRunning:!1,sessionTimer:null,lastActivityAt:Date.now()}}function _(e){e.mediaCatalogIdentitySetupIntent=null}function v(e,t){let n=e.mediaCatalogIdentitySetupIntent;n&&n.chat_id!==t&&_(e)}var te=class{state;constructor(e){this.state=e}transition(e,t){if(e===this.state.phase){t&&(this.state.statusText=t);return}if(!g[this.state.phase].has(e))throw Error(`Illegal client transition: ${this.state.phase} -> ${e}`);e===`error`&&(this.state.phaseBeforeError=this.state.phase),this.state.phase=e,this.state.statusText=t??ne(e)}recover(){let e=this.state.session?`idle`:`signed_out`;this.state.phase!==e&&this.transition(e)}};function ne(e){return{signed_out:`Signed out`,onboarding:`Setup`,idle:`Idle`,loading_chat:`Loading`,queued:`Queued`,thinking:`Thinking`,recording:`Listening`,transcribing:`Transcribing`,speaking:`Speaking`,error:`Error`}[e]}var y=ee(),b=new te(y),re=class{authenticated;renderApp;appState;client;constructor(e,t,n=y,i=r){this.authenticated=e,this.renderApp=t,this.appState=n,this.client=i}node(){return i(`div`,{class:`main-pane glass auth-pane`,"data-testid":`auth-view`},[i(`h2`,{textContent:`Nice Assistant Login`}),this.appState.authError?i(`div`,{class:`error-banner`,textContent:this.appState.authError}):null,this.appState.settingsSavedAt?i(`div`,{class:`success-banner`,textContent:`Account created. Please sign in.`}):null,i(`input`,{id:`username`,class:`search-input`,placeholder:`username`,autocomplete:`username`,"data-testid":`auth-username`}),i(`input`,{id:`password`,class:`search-input`,placeholder:`password`,type:`password`,autocomplete:`current-password`,"data-testid":`auth-password`}),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Create account`,"data-testid":`auth-create`,onclick:()=>void this.createAccount()}),i(`button`,{class:`send-btn`,textContent:`Login`,"data-testid":`auth-login`,onclick:()=>void this.login()})])])}credentials(){return{username:(document.querySelector(`#username`)?.value??``).trim(),password:document.querySelector(`#password`)?.value??``}}async createAccount(){let{username:e,password:t}=this.credentials();this.appState.authError=``;try{await this.client.createUser(e,t),this.appState.settingsSavedAt=Date.now()}catch(e){this.appState.authError=p(e,`Unable to create account.`)}this.renderApp()}async login(){let{username:e,password:t}=this.credentials();this.appState.authError=``;try{await this.authenticated(await this.client.login(e,t))}catch(e){this.appState.authError=p(e,`Wrong username and/or password.`),this.renderApp()}}},ie=0;function ae(e){let t=e.getRandomValues(new Uint8Array(16));t[6]=t[6]&15|64,t[8]=t[8]&63|128;let n=Array.from(t,e=>e.toString(16).padStart(2,`0`)).join(``);return`${n.slice(0,8)}-${n.slice(8,12)}-${n.slice(12,16)}-${n.slice(16,20)}-${n.slice(20)}`}function oe(e,t=globalThis.crypto){return typeof t?.randomUUID==`function`?`${e}-${t.randomUUID()}`:typeof t?.getRandomValues==`function`?`${e}-${ae(t)}`:(ie+=1,`${e}-${Date.now().toString(36)}-${ie.toString(36)}`)}function se(e){return e.replace(/<think>[\s\S]*?<\/think>/gi,` `).replace(/```[\s\S]*?```/g,` `).replace(/!\[[^\]]*\]\([^)]+\)/g,` `).replace(/\[([^\]]+)\]\([^)]+\)/g,`$1`).replace(/`([^`]+)`/g,`$1`).replace(/<[^>]+>/g,` `).replace(/[`*_>#~-]/g,` `).replace(/\s+/g,` `).trim()}var ce=/!\[[^\]]*\]\(([^)]+)\)/i,le=/\[[^\]]*(?:video|download)[^\]]*\]\(([^)]+)\)/i,ue=class{appState;stateMachine;client;onChange=()=>void 0;constructor(e=y,t=b,n=r){this.appState=e,this.stateMachine=t,this.client=n}setChangeHandler(e){this.onChange=e}async generateImage(e,t,n){let r=this.requiredSettings(),i={prompt:e.trim(),...n?.trim()?{illustrate_text:n.trim()}:{},chat_id:t,provider:r.image_provider,size:r.image_size,quality:r.image_quality,backend:r.image_local_backend,base_url:r.image_local_base_url};return this.generate(`image`,i)}async generateVideo(e,t){let n=this.requiredSettings();return this.generate(`video`,{prompt:e.trim(),chat_id:t,provider:n.video_provider,model:n.video_model,size:n.video_size,seconds:n.video_duration})}async generate(e,t){if(!t.prompt)throw Error(`${e} prompt is required`);let n=null;try{let r=e===`image`?await this.client.imageJob(t):await this.client.videoJob(t);for(n=await this.client.capabilityRequest(r.capability_request_id),await this.refreshChat(t.chat_id??null),this.upsert(n),this.onChange();[`queued`,`running`].includes(n.status);){await new Promise(e=>window.setTimeout(e,350));let e=await this.client.capabilityRequest(n.id),r=e.status!==n.status;n=e,this.upsert(e),r&&(await this.refreshChat(t.chat_id??null,!1),this.onChange())}return await this.refreshChat(t.chat_id??null),n.status===`completed`?this.appState.messages.find(e=>e.attachments?.some(e=>e.capability_request_id===n?.id))??null:null}catch(r){if(!n)throw this.appState.uiError=p(r,`${e} generation could not start.`),r;return await this.refreshChat(t.chat_id??null).catch(()=>void 0),null}finally{this.onChange()}}upsert(e){this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(t=>t.id!==e.id),e].sort((e,t)=>e.requested_at-t.requested_at)}async refreshChat(e,t=!0){if(!e||this.appState.currentChat?.id!==e)return;let[n,r]=await Promise.all([this.client.chat(e),t?this.client.capabilityRequests(e):Promise.resolve(null)]);this.appState.currentChat?.id===e&&(this.appState.currentChat=n.chat,this.appState.messages=n.messages,r&&(this.appState.capabilityRequests=r.items))}requiredSettings(){if(!this.appState.settings)throw Error(`Settings are unavailable.`);return this.appState.settings}};async function de(e,t,n,r=350){for(;;){let i=await e.job(t);if(n?.(i),[`completed`,`failed`,`cancelled`].includes(i.status))return i;await new Promise(e=>window.setTimeout(e,r))}}function fe(e){return ce.exec(e)?.[1]??``}function pe(e){return le.exec(e)?.[1]??``}function me(e){return e.replace(le,``).trim()}function he(e){return se(e.text).slice(0,4e3)}var x={global_default_model:``,default_memory_mode:`saved`,stt_provider:`disabled`,tts_provider:`disabled`,tts_format:`wav`,openai_api_key:``,onboarding_done:!1,general_theme:`dark`,general_show_system_messages:!1,general_show_thinking:!1,general_auto_logout:!0,general_voice_responses:!0,general_show_viz:!1,tts_voice_openai:`marin`,tts_model_openai:`gpt-4o-mini-tts`,tts_speed_openai:`1`,tts_instructions_openai:``,tts_voice_local:`af_heart`,tts_model_local:`kokoro`,tts_speed_local:`1`,tts_local_base_url:``,stt_streaming:!1,stt_local_base_url:``,stt_local_backend:`openai_api`,stt_wyoming_address:``,stt_model_local:``,tts_voice_filter_regions:[],tts_voice_filter_genders:[],tts_voice_filter_query:``,stt_language:`auto`,stt_store_recordings:!1,stt_hands_free:!1,image_provider:`disabled`,chat_blur_images:!1,pregeneration_enabled:!1,pregeneration_start_hour:2,pregeneration_end_hour:6,image_size:`1024x1024`,image_quality:`none`,image_local_allow_nsfw:!1,image_local_backend:`automatic1111`,image_local_base_url:``,image_local_api_auth:``,image_local_model:``,image_local_steps:`28`,image_local_sampler_name:`DPM++ 2M Karras`,image_local_scheduler:``,image_local_cfg_scale:`7`,image_local_seed:``,image_local_additional_parameters:``,video_provider:`disabled`,video_model:`sora-2`,video_size:`720x1280`,video_duration:`4`,models_context_window_tokens:`8192`,user_display_name:``,user_profile:``,user_timezone:`local`,personas_default_system_prompt:`Be helpful and concise.`,workspaces_default_workspace_id:``,models_temperature:`0.7`,models_top_p:`1`,models_num_predict:`512`,models_presence_penalty:`0`,models_frequency_penalty:`0`,model_overrides:{}},ge=[`General`,`TTS`,`STT`,`Image Generation`,`Video Generation`,`Memory`,`User`,`Personas`,`Workspaces`,`Models`,`Task Models`,`Media Catalog`,`Persona Pictures`,`GPU Coordination`,`Data`],_e=[{name:`Conversation`,sections:[`General`,`Models`,`Memory`]},{name:`Voice`,sections:[`TTS`,`STT`]},{name:`Pictures`,sections:[`Image Generation`,`Video Generation`,`Media Catalog`,`Persona Pictures`]},{name:`Personas`,sections:[`Personas`,`Workspaces`,`User`]},{name:`System`,sections:[`Task Models`,`GPU Coordination`,`Data`]}],ve={TTS:`Spoken replies`,STT:`Transcription`,User:`Your profile`,"Task Models":`Background models`};function ye(e){return ve[e]??e}var be={General:[`theme`,`dark`,`appearance`,`thinking`,`system messages`,`sign out`,`logout`,`default model`],Models:[`context`,`tokens`,`temperature`,`reply length`,`output`,`ollama`,`sampling`,`window`],Memory:[`remember`,`forget`,`semantic`,`recall`,`saved`,`delete memories`],TTS:[`voice`,`speech`,`speak`,`read aloud`,`kokoro`,`audio`,`speed`,`hear`],STT:[`microphone`,`transcribe`,`whisper`,`wyoming`,`dictation`,`hands-free`,`talk`,`recording`],"Image Generation":[`pictures`,`blur`,`size`,`quality`,`comfyui`,`provider`,`nsfw`,`generate`],"Video Generation":[`video`,`clips`,`duration`],"Media Catalog":[`presets`,`workflows`,`checkpoints`,`lora`,`recipes`,`templates`],"Persona Pictures":[`identity`,`face`,`reference photos`,`likeness`,`overnight`,`scenes`,`pregeneration`],Personas:[`character`,`card`,`lore`,`avatar`,`personality`,`voice preferences`],Workspaces:[`organize`,`separate`,`spaces`],User:[`profile`,`about me`,`name`,`owner`],"Task Models":[`titles`,`summaries`,`extraction`,`capability`,`scene`,`helper models`],"GPU Coordination":[`vram`,`gpu`,`contention`,`graphics`],Data:[`backup`,`restore`,`export`,`retention`,`recordings`,`archive`]};function xe(e){let t=e.trim().toLowerCase();return t?ge.filter(e=>[e,ye(e),...be[e]].some(e=>e.toLowerCase().includes(t))):[...ge]}var Se={General:[`general_theme`,`general_show_system_messages`,`general_show_thinking`,`general_auto_logout`,`global_default_model`],TTS:[`tts_provider`,`tts_format`,`tts_voice_openai`,`tts_model_openai`,`tts_speed_openai`,`tts_instructions_openai`,`tts_voice_local`,`tts_model_local`,`tts_speed_local`,`tts_local_base_url`],STT:[`stt_provider`,`stt_language`,`stt_hands_free`,`stt_store_recordings`,`stt_local_base_url`,`stt_model_local`,`stt_streaming`,`stt_local_backend`,`stt_wyoming_address`],"Image Generation":[`image_provider`,`chat_blur_images`,`image_size`,`image_quality`,`image_local_allow_nsfw`,`image_local_backend`,`image_local_base_url`,`image_local_api_auth`,`image_local_model`,`image_local_steps`,`image_local_sampler_name`,`image_local_scheduler`,`image_local_cfg_scale`,`image_local_seed`,`image_local_additional_parameters`],"Video Generation":[`video_provider`,`video_model`,`video_size`,`video_duration`],Memory:[`default_memory_mode`],User:[`user_display_name`,`user_timezone`],Personas:[`personas_default_system_prompt`],Workspaces:[`workspaces_default_workspace_id`],Models:[`global_default_model`,`models_temperature`,`models_top_p`,`models_num_predict`,`models_context_window_tokens`,`models_presence_penalty`,`models_frequency_penalty`,`model_overrides`],"Task Models":[],"Media Catalog":[],"Persona Pictures":[],"GPU Coordination":[],Data:[]},Ce=new Set([`none`,`low`,`medium`,`high`,`auto`]),we=new Set([`1024x1024`,`1024x1536`,`1536x1024`,`auto`]),Te=new Set([`sora-2`,`sora-2-pro`]),Ee=new Set([`4`,`8`,`12`]),De={"sora-2":[`720x1280`,`1280x720`],"sora-2-pro":[`720x1280`,`1280x720`,`1024x1792`,`1792x1024`]};function Oe(e){let t={...e.preferences};delete t.image_prompt_generation,delete t.image_confirmation_policy;let n=String(t.image_provider??``).trim().toLowerCase();n===`local/automatic1111`?(t.image_provider=`local`,t.image_local_backend=`automatic1111`):n===`local/comfyui`&&(t.image_provider=`local`,t.image_local_backend=`comfyui`);let r={...x,...t,global_default_model:e.global_default_model??``,default_memory_mode:e.default_memory_mode===`off`?`off`:`saved`,stt_provider:e.stt_provider||`disabled`,tts_provider:e.tts_provider||`disabled`,tts_format:e.tts_format||`wav`,openai_api_key:e.openai_api_key??``,onboarding_done:!!e.onboarding_done};return r.image_quality=Ne(r.image_quality),r.image_size=Me(r.image_size),r.image_local_backend=[`automatic1111`,`comfyui`].includes(String(r.image_local_backend).toLowerCase())?String(r.image_local_backend).toLowerCase():x.image_local_backend,r.video_model=Pe(r.video_model),r.video_duration=Le(r.video_duration),r.video_size=Ie(r.video_model,r.video_size),r.tts_voice_filter_regions=Re(r.tts_voice_filter_regions),r.tts_voice_filter_genders=Re(r.tts_voice_filter_genders),r.model_overrides=Be(r.model_overrides)?r.model_overrides:{},r}function S(e){let t={},n=new Set([`global_default_model`,`default_memory_mode`,`stt_provider`,`tts_provider`,`tts_format`,`openai_api_key`,`onboarding_done`]);for(let[r,i]of Object.entries(e))n.has(r)||(t[r]=i);return t.image_size=Me(e.image_size),t.image_quality=Ne(e.image_quality),t.video_model=Pe(e.video_model),t.video_size=Ie(e.video_model,e.video_size),t.video_duration=Le(e.video_duration),{global_default_model:e.global_default_model||null,default_memory_mode:e.default_memory_mode,stt_provider:e.stt_provider,tts_provider:e.tts_provider,tts_format:e.tts_format,openai_api_key:e.openai_api_key||null,onboarding_done:!!e.onboarding_done,preferences:t}}function ke(e,t){for(let n of Se[t])e[n]=structuredClone(x[n])}function Ae(e,t){let n=e.model_overrides[t]??{};return{temperature:C(n.temperature??e.models_temperature,.7),top_p:C(n.top_p??e.models_top_p,1),num_predict:ze(n.num_predict??e.models_num_predict,512),presence_penalty:C(n.presence_penalty??e.models_presence_penalty,0),frequency_penalty:C(n.frequency_penalty??e.models_frequency_penalty,0),context_window_tokens:ze(n.context_window_tokens??e.models_context_window_tokens,8192)}}function je(e,t,n,r){e.model_overrides[t]={...e.model_overrides[t]??{},[n]:r}}function Me(e){let t=String(e??``).trim().toLowerCase();return we.has(t)||/^\d{2,5}x\d{2,5}$/.test(t)?t:x.image_size}function Ne(e){let t=String(e??``).trim().toLowerCase(),n=t===`standard`?`medium`:t===`hd`?`high`:t;return Ce.has(n)?n:x.image_quality}function Pe(e){let t=String(e??``).trim().toLowerCase();return Te.has(t)?t:x.video_model}function Fe(e){return De[Pe(e)]??De[`sora-2`]??[]}function Ie(e,t){let n=Fe(e),r=String(t??``).trim().toLowerCase();return n.includes(r)?r:n[0]??x.video_size}function Le(e){let t=String(e??``).trim();return Ee.has(t)?t:x.video_duration}function Re(e){return Array.isArray(e)?e.map(String):[]}function C(e,t){let n=Number(e);return Number.isFinite(n)?n:t}function ze(e,t){return Math.round(C(e,t))}function Be(e){return typeof e==`object`&&!!e&&!Array.isArray(e)}var Ve=class{playback;appState;stateMachine;client;onChange=()=>void 0;onNavigate=()=>void 0;streamAbort=null;capabilityPolls=new Set;constructor(e,t=y,n=b,i=r){this.playback=e,this.appState=t,this.stateMachine=n,this.client=i}configure(e){this.onChange=e.onChange,this.onNavigate=e.onNavigate}async open(e){if(this.appState.currentChat?.id!==e&&(this.appState.revealedImages={}),!(this.appState.currentChat?.id===e&&this.appState.messages.length)&&(this.appState.phase===`error`&&this.stateMachine.recover(),this.appState.phase===`idle`)){this.stateMachine.transition(`loading_chat`),this.onChange();try{let[t,n]=await Promise.all([this.client.chat(e),this.client.capabilityRequests(e)]);v(this.appState,t.chat.id),this.appState.currentChat=t.chat,this.appState.messages=t.messages,this.appState.capabilityRequests=n.items,this.appState.selectedPersonaId=t.chat.persona_id,this.appState.selectedModel=t.chat.model_override,this.appState.selectedMemoryMode=t.chat.memory_mode,this.appState.uiError=``,this.stateMachine.transition(`idle`),this.resumeCapabilities(t.chat.id,n.items)}catch(e){this.appState.uiError=p(e,`Unable to open this chat.`),this.stateMachine.transition(`error`)}finally{this.onChange()}}}async create(e){let t=this.appState.personas.find(t=>t.id===(e??this.appState.selectedPersonaId)),n=this.requiredSettings(),r=await this.client.createChat({workspace_id:t?.workspace_id??this.appState.workspaces[0]?.id??null,persona_id:t?.id??null,model:t?.default_model??(n.global_default_model||null),memory_mode:n.default_memory_mode,title:`New chat`});return this.appState.chats=[r,...this.appState.chats.filter(e=>e.id!==r.id)],v(this.appState,r.id),this.appState.currentChat=r,this.appState.messages=[],this.appState.capabilityRequests=[],this.appState.selectedPersonaId=r.persona_id,this.appState.selectedModel=r.model_override,this.appState.selectedMemoryMode=r.memory_mode,this.onNavigate(r.id),this.onChange(),r}async send(e){let t=e.trim();if(!t||(this.appState.phase===`speaking`&&this.playback.stop(!1),this.appState.pendingRequest)||(this.appState.phase===`error`&&this.stateMachine.recover(),![`idle`,`transcribing`].includes(this.appState.phase)))return;let n=this.appState.currentChat??await this.create(this.appState.selectedPersonaId),r=this.requiredSettings(),i=this.appState.personas.find(e=>e.id===n.persona_id),a=this.appState.selectedModel??n.model_override??i?.default_model??r.global_default_model,o=this.appState.selectedMemoryMode??n.memory_mode??r.default_memory_mode,s={id:oe(`local-user`),role:`user`,text:t,created_at:Math.floor(Date.now()/1e3)},c={id:oe(`typing`),role:`assistant`,text:``,created_at:s.created_at,isTyping:!0};this.appState.messages.push(s,c),this.appState.draftMessage=``,this.appState.uiError=``,this.stateMachine.transition(`queued`),this.onChange();let l=null,u=null;try{let e=await this.client.createTurn(n.id,{text:t,model:a||null,memory_mode:o,model_settings:Ae(r,a||``)});s.id=e.turn.user_message_id,c.id=`typing-${e.turn.id}`;let i=new AbortController;l=e.job.id,u=i,this.streamAbort=i,this.appState.pendingRequest={jobId:e.job.id,turnId:e.turn.id,progress:e.job.progress||`Queued`,cancel:async()=>{i.abort(),await this.client.cancelJob(e.job.id)}},this.reconcileAcceptedTitle(n.id),await this.consumeTurn(e.turn.id,e.job.id,c,i.signal);let d=await this.client.job(e.job.id);if(d.status!==`completed`)throw Error(d.error||`Turn ${d.status}`);let f=await this.reconcileChat(n.id);this.releaseRequest(l,u),this.stateMachine.transition(`idle`),this.onChange(),(Array.isArray(d.result?.followup_job_ids)?d.result.followup_job_ids.filter(e=>typeof e==`string`&&!!e):typeof d.result?.followup_job_id==`string`&&d.result.followup_job_id?[d.result.followup_job_id]:[]).forEach(e=>void this.reconcileFollowup(n.id,e));let m=[...f.messages].reverse().find(e=>e.role===`assistant`);if(m?.text.trim())try{await this.playback.synthesize(m.text,m.id,n.id,n.persona_id)}catch(e){let t=p(e,`Audio could not be played.`);this.appState.messageAudioErrors[m.id]=t;try{await this.client.clientEvent(`tts.playback_error`,t)}catch{}this.onChange()}}catch(e){let t=u?.signal.aborted||e instanceof DOMException&&e.name===`AbortError`;this.appState.messages=this.appState.messages.filter(e=>e!==c);try{await this.reconcileChat(n.id)}catch{}t?this.appState.phase!==`idle`&&this.stateMachine.transition(`idle`):(this.appState.uiError=p(e,`The conversation turn failed.`),this.stateMachine.transition(`error`))}finally{this.releaseRequest(l,u),this.onChange()}}async cancel(){let e=this.appState.pendingRequest;if(e){try{await e.cancel(),this.streamAbort?.abort(),this.appState.pendingRequest?.jobId===e.jobId&&(this.appState.pendingRequest=null),[`queued`,`thinking`].includes(this.appState.phase)&&this.stateMachine.transition(`idle`)}catch(e){this.appState.uiError=p(e,`The current reply could not be canceled.`)}this.onChange()}}async hide(e){await this.client.hideChat(e.id),this.appState.chats=this.appState.chats.filter(t=>t.id!==e.id),this.appState.currentChat?.id===e.id&&(this.appState.currentChat=null,this.appState.messages=[],this.appState.capabilityRequests=[]),this.onChange()}async rename(e,t){let n=await this.client.updateChat(e.id,{title:t.trim()});this.mergeChat(n),this.appState.currentChat?.id===n.id&&(this.appState.currentChat=n),this.onChange()}async consumeTurn(e,t,n,r){try{await this.client.streamTurn(e,e=>{this.applyTurnEvent(e,n),this.onChange()},r)}catch(e){if(r.aborted)throw e;let n=await de(this.client,t,e=>{this.appState.pendingRequest&&(this.appState.pendingRequest.progress=e.progress),this.onChange()});if(n.status!==`completed`)throw Error(n.error||`Turn ${n.status}`)}}applyTurnEvent(e,t){if(e.event===`turn.snapshot`){let n=e.data.accumulated_text;typeof n==`string`&&(t.text=n),e.data.status===`running`&&this.appState.phase===`queued`&&this.stateMachine.transition(`thinking`)}else if(e.event===`turn.started`)this.appState.phase===`queued`&&this.stateMachine.transition(`thinking`),this.appState.pendingRequest&&(this.appState.pendingRequest.progress=`Thinking…`);else if(e.event===`assistant.delta`){let n=e.data.text;typeof n==`string`&&(t.text+=n),t.isTyping=!0}else if(e.event===`turn.failed`){let t=e.data.error;if(typeof t==`object`&&t&&`message`in t)throw Error(String(t.message))}}mergeChat(e){this.appState.chats=[e,...this.appState.chats.filter(t=>t.id!==e.id)].sort((e,t)=>t.updated_at-e.updated_at)}async reconcileChat(e){let t=await this.client.chat(e);this.appState.currentChat?.id===e&&(this.appState.currentChat=t.chat,this.appState.messages=t.messages),this.mergeChat(t.chat);try{let t=await this.client.capabilityRequests(e);this.appState.currentChat?.id===e&&(this.appState.capabilityRequests=t.items,this.resumeCapabilities(e,t.items))}catch{}return t}async reconcileAcceptedTitle(e){try{let t=await this.client.chat(e);this.appState.currentChat?.id===e&&(this.appState.currentChat=t.chat),this.mergeChat(t.chat),this.onChange()}catch{}}async reconcileFollowup(e,t){try{await de(this.client,t),await this.reconcileChat(e),this.onChange()}catch{}}releaseRequest(e,t){e&&this.appState.pendingRequest?.jobId===e&&(this.appState.pendingRequest=null),t&&this.streamAbort===t&&(this.streamAbort=null)}resumeCapabilities(e,t){t.filter(e=>e.attachment&&[`queued`,`running`].includes(e.status)).forEach(t=>{this.capabilityPolls.has(t.id)||(this.capabilityPolls.add(t.id),this.pollCapability(e,t.id))})}async pollCapability(e,t){try{for(;this.appState.currentChat?.id===e;){let n=await this.client.capabilityRequest(t);this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(e=>e.id!==n.id),n].sort((e,t)=>e.requested_at-t.requested_at);let r=await this.client.chat(e);if(this.appState.currentChat?.id!==e||(this.appState.currentChat=r.chat,this.appState.messages=r.messages,this.onChange(),![`queued`,`running`].includes(n.status)))break;await new Promise(e=>window.setTimeout(e,500))}}catch{}finally{this.capabilityPolls.delete(t)}}requiredSettings(){if(!this.appState.settings)throw Error(`Settings are unavailable.`);return this.appState.settings}},He=[[`#42e8ff`,`#2b7fd9`],[`#a470ff`,`#6d3fd4`],[`#ff7998`,`#d9436e`],[`#ffb45e`,`#e07f2e`],[`#5ee8a4`,`#2eb877`],[`#7f9dff`,`#4a63d9`],[`#ff8fd8`,`#c957a5`],[`#e8d75e`,`#b8a52e`]];function Ue(e){return String(e||``).trim().split(/\s+/).filter(Boolean).slice(0,2).map(e=>e[0]?.toUpperCase()??``).join(``)||`?`}function We(e){let t=0;for(let n of String(e||``))t=t*31+n.codePointAt(0)>>>0;return t%He.length}function Ge(e){let[t,n]=He[We(e)],r=Ue(e),i=`<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 96 96'><defs><linearGradient id='g' x1='0' y1='0' x2='1' y2='1'><stop stop-color='${t}'/><stop offset='1' stop-color='${n}'/></linearGradient></defs><rect width='96' height='96' fill='url(#g)'/><text x='48' y='48' dy='0.36em' text-anchor='middle' font-family='Inter, -apple-system, sans-serif' font-size='${r.length>1?34:42}' font-weight='600' fill='rgba(255,255,255,0.94)'>${r}</text></svg>`;return`data:image/svg+xml;utf8,${encodeURIComponent(i)}`}function w(e,t){return(t||``).trim()||Ge(e)}function Ke(e){return t=>{let n=t.currentTarget;n.dataset.monogram||(n.dataset.monogram=`true`,n.src=Ge(e))}}function qe(e){let t=e.target;return t instanceof Element?!t.closest(`[data-drawer-toggle]`):!0}var Je=class{appState;client;chat;dialogs;callbacks;selectedIds=new Set;selectionMode=!1;constructor(e,t,n,r,i){this.appState=e,this.client=t,this.chat=n,this.dialogs=r,this.callbacks=i}node(){let e=this.appState.chats.filter(e=>(e.title??``).toLowerCase().includes(this.appState.chatSearch.toLowerCase())),t=e.map(e=>this.row(e));return i(`aside`,{class:`drawer glass ${this.appState.drawerOpen?`open`:``}`},[i(`div`,{class:`drawer-head`},[i(`strong`,{textContent:`Chats`}),i(`div`,{class:`chips`},[i(`button`,{class:`icon-btn`,textContent:this.selectionMode?`Done`:`Manage`,disabled:this.appState.chats.length===0,"data-testid":`manage-chats`,onclick:()=>{this.selectionMode=!this.selectionMode,this.selectionMode||this.selectedIds.clear(),this.callbacks.render()}}),i(`button`,{class:`icon-btn`,textContent:`✕`,onclick:()=>{this.appState.drawerOpen=!1,this.callbacks.render()}})])]),i(`button`,{class:`send-btn`,textContent:`+ New Chat`,"data-testid":`new-chat`,onclick:this.callbacks.openNewChat}),i(`input`,{class:`search-input`,placeholder:`Search chats…`,value:this.appState.chatSearch,oninput:e=>{this.appState.chatSearch=e.currentTarget.value,this.callbacks.render()}}),this.selectionMode?this.bulkBar(e):null,i(`div`,{class:`drawer-list`},t.length?t:i(`div`,{class:`meta`,textContent:`No chats yet.`}))])}reset(){this.selectedIds.clear(),this.selectionMode=!1}row(e){return i(`div`,{class:`chat-row ${e.id===this.appState.currentChat?.id?`active`:``} ${this.selectionMode?`selecting`:``}`,onclick:()=>{if(this.selectionMode){this.toggle(e.id);return}this.appState.drawerOpen=!1,this.callbacks.openChat(e.id)}},[this.selectionMode?i(`input`,{type:`checkbox`,checked:this.selectedIds.has(e.id),ariaLabel:`Select ${e.title||`chat`}`,onclick:e=>e.stopPropagation(),onchange:t=>{t.currentTarget.checked?this.selectedIds.add(e.id):this.selectedIds.delete(e.id),this.callbacks.render()}}):null,i(`div`,{class:`title`,textContent:e.title||`Untitled chat`}),i(`div`,{class:`meta`,textContent:d(e.updated_at||e.created_at)}),this.selectionMode?null:i(`div`,{class:`chat-actions`},[i(`button`,{class:`icon-btn`,textContent:`✎`,title:`Rename chat`,onclick:t=>{t.stopPropagation(),this.rename(e)}}),i(`button`,{class:`icon-btn`,textContent:`Hide`,title:`Hide chat`,onclick:t=>{t.stopPropagation(),this.hide(e)}})])])}bulkBar(e){return i(`div`,{class:`chat-bulk-bar`,"data-testid":`chat-bulk-actions`},[i(`div`,{class:`meta`,textContent:`${this.selectedIds.size} selected`}),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Select visible`,disabled:e.length===0,onclick:()=>{e.forEach(e=>this.selectedIds.add(e.id)),this.callbacks.render()}}),i(`button`,{class:`pill-btn`,textContent:`Clear`,disabled:this.selectedIds.size===0,onclick:()=>{this.selectedIds.clear(),this.callbacks.render()}}),i(`button`,{class:`pill-btn`,textContent:`Hide`,disabled:this.selectedIds.size===0,onclick:()=>void this.bulkAction(`hide`)}),i(`button`,{class:`pill-btn danger`,textContent:`Delete`,disabled:this.selectedIds.size===0,onclick:()=>void this.bulkAction(`delete`)})])])}toggle(e){this.selectedIds.has(e)?this.selectedIds.delete(e):this.selectedIds.add(e),this.callbacks.render()}async rename(e){let t=await this.dialogs.prompt(`Rename chat`,`Choose a new title.`,e.title??``);t?.trim()&&await this.chat.rename(e,t)}async hide(e){if(!await this.dialogs.confirm(`Hide chat`,`Hide ${e.title||`this chat`}?`,`Hide`))return;let t=this.appState.currentChat?.id===e.id;if(await this.chat.hide(e),!t)return;let n=this.appState.chats[0];n?this.callbacks.openChat(n.id):this.callbacks.goHome()}async bulkAction(e){let t=[...this.selectedIds];if(t.length&&(e===`delete`?await this.dialogs.confirm(`Permanently delete chats`,`Permanently delete ${t.length} selected ${t.length===1?`chat`:`chats`} and their transcripts? This cannot be undone. Generated media and completed job records are retained.`,`Delete permanently`):await this.dialogs.confirm(`Hide chats`,`Hide ${t.length} selected ${t.length===1?`chat`:`chats`} from the chat list?`,`Hide`))){try{await this.client.bulkChatAction(e,t);let n=new Set(t);this.appState.chats=this.appState.chats.filter(e=>!n.has(e.id)),this.reset(),this.appState.currentChat&&n.has(this.appState.currentChat.id)&&(this.appState.currentChat=null,this.appState.messages=[],this.appState.capabilityRequests=[],this.callbacks.goHome())}catch(t){this.appState.uiError=p(t,`Unable to ${e} the selected chats.`)}this.callbacks.render()}}},Ye=`reply_truncated`,Xe={summary:`the conversation summary`,memory:`saved memories`,lore:`this persona's background notes`,example_dialogue:`this persona's voice examples`};function Ze(e){return e.length<=1?e[0]??``:e.length===2?`${e[0]} and ${e[1]}`:`${e.slice(0,-1).join(`, `)}, and ${e[e.length-1]}`}function Qe(e){let t=e.trim();if(!t)return null;if(t.startsWith(`history_floor_dropped:`)){let e=t.slice(22).split(`,`).map(e=>Xe[e.trim()]).filter(e=>!!e);return e.length?`${Ze(e)} left out to keep recent messages in view.`:`Some saved context was left out to keep recent messages.`}return t===`summary_provider_failed`?`the conversation summary could not be updated, so an older one was used.`:t===`summary_catchup_limited`?`the conversation summary is still catching up on earlier messages.`:t===Ye?`this reply reached its length limit and stopped early.`:null}function $e(e){if(!e)return null;let t=e.split(`;`).map(e=>Qe(e)).filter(e=>!!e);return t.length?`Replied with less context than usual: ${Ze(t)}`:null}function et(e){return!!(e&&e.split(`;`).some(e=>e.trim()===Ye))}function tt(e){return!!(e&&e.includes(`history_floor_dropped:`))}var nt=class{media;playback;renderApp;appState;client;editMemoryProposal;constructor(e,t,n,i=y,a=r,o=async e=>e){this.media=e,this.playback=t,this.renderApp=n,this.appState=i,this.client=a,this.editMemoryProposal=o}message(e,t){let n=e.role===`user`;if(!this.appState.showSystemMessages&&[`system`,`tool`].includes(e.role))return null;let{thinking:r,visibleText:a}=it(e.text),s=!!r&&e.role===`assistant`,c=this.appState.showThinkingByDefault||!!this.appState.thinkingExpanded[e.id],l=this.appState.personas.find(e=>e.id===(t??this.appState.selectedPersonaId)),u=l?.name??`assistant`,d=n?`You`:e.role===`assistant`?u:e.role,f=a||e.text,p=fe(f),g=pe(f),ee=i(`div`,{html:o(g?me(f):f)}),_=(e.attachments??[]).filter(e=>this.appState.capabilityRequests.find(t=>t.id===e.capability_request_id)?.status!==`pending_confirmation`).map(e=>this.attachmentNode(e)),v=i(`div`,{class:`chat-attachments`},_),te=e.role===`assistant`?$e(e.degraded_reason):null;this.bindImagePreviews(ee),this.bindImagePreviews(v);let ne=this.appState.messageAudioById[e.id],y=this.appState.messageAudioErrors[e.id];return i(`div`,{class:`msg-wrap ${n?`user`:``}`,"data-testid":`message-${e.role}`},[!n&&e.role===`assistant`?i(`button`,{class:`image-preview-trigger msg-avatar-trigger`,type:`button`,title:`View ${u}'s full-size avatar`,"aria-label":`View ${u}'s full-size avatar`,onclick:()=>{this.appState.personaAvatarPreview=w(u,l?.avatar_url),this.renderApp()}},[i(`img`,{class:`msg-avatar`,src:w(u,l?.avatar_url),onerror:Ke(u),alt:`${u} avatar`})]):null,i(`article`,{class:`msg ${n?`user`:`assistant`}`},[i(`small`,{textContent:d}),e.isTyping?i(`button`,{class:`typing-indicator ${this.appState.pendingRequest?`clickable`:``}`,textContent:this.appState.pendingRequest?.progress||`typing…`,disabled:!this.appState.pendingRequest,onclick:()=>void this.appState.pendingRequest?.cancel()}):null,s&&c?i(`details`,{class:`think-block`,open:!0},[i(`summary`,{textContent:`Model thinking`}),i(`div`,{class:`think-content`,html:o(r)})]):null,e.isTyping&&!e.text?null:ee,_.length?v:null,te?this.quietNote(e,te):null,y?i(`p`,{class:`message-audio-error`,textContent:y}):null,g?i(`button`,{class:`msg-video-preview`,onclick:()=>{this.appState.chatVideoPreview=g,this.renderApp()}},[i(`video`,{class:`msg-inline-video`,src:g,preload:`metadata`,muted:!0,playsInline:!0}),i(`span`,{class:`msg-video-play`,textContent:`▶`}),i(`span`,{class:`msg-video-label`,textContent:`Play video`})]):null,e.isTyping?null:i(`div`,{class:`msg-actions`},[e.role===`assistant`&&e.text.trim()?i(`button`,{class:`icon-btn`,textContent:`🖼`,title:`Generate an image from this reply`,onclick:()=>void this.generateImage(e)}):null,s?i(`button`,{class:`icon-btn`,textContent:c?`🙈`:`💭`,title:c?`Hide thinking`:`Show thinking`,onclick:()=>{this.appState.thinkingExpanded[e.id]=!c,this.renderApp()}}):null,i(`button`,{class:`icon-btn`,textContent:`⧉`,title:`Copy`,onclick:()=>void m(a||e.text)}),p?i(`button`,{class:`icon-btn`,textContent:`⬇`,title:`Save image`,onclick:()=>h(p,`nice-assistant-image-${Date.now()}.png`)}):null,g?i(`button`,{class:`icon-btn`,textContent:`⬇`,title:`Save video`,onclick:()=>h(g,`nice-assistant-video-${Date.now()}.mp4`)}):null,ne?i(`button`,{class:`icon-btn`,textContent:`⟲`,title:`Replay response audio`,onclick:()=>void this.replayAudio(e.id,ne)}):null,this.appState.currentAudioMessageId===e.id?i(`button`,{class:`icon-btn`,textContent:`■`,title:`Stop audio`,onclick:()=>this.playback.stop()}):null,i(`button`,{class:`icon-btn`,textContent:`🧠`,title:`Propose a memory fact`,onclick:()=>void this.saveMemory(e)})])])])}syntheticSystemMessage(e){let t=this.appState.personas.find(t=>t.id===e);return t?.system_prompt?[{id:`system-${t.id}`,role:`system`,text:t.system_prompt,created_at:t.created_at}]:[]}quietNote(e,t){let n=!!this.appState.expandedMessageNotes[e.id],r=tt(e.degraded_reason)?` Raise the model context allocation in Settings to fit more.`:``,a=et(e.degraded_reason);return i(`div`,{class:`msg-note`},[i(`button`,{class:`msg-note-mark ${a?`truncated`:``}`,type:`button`,textContent:a?`…`:`·`,title:`${t}${r}`,"aria-label":`${t}${r}`,"aria-expanded":String(n),"data-testid":`context-notice-${e.id}`,onclick:()=>{this.appState.expandedMessageNotes[e.id]=!n,this.renderApp()}}),n?i(`p`,{class:`msg-note-detail`,"data-testid":`context-notice-detail-${e.id}`,textContent:`${t}${r}`}):null])}bindImagePreviews(e){let t=[...e.querySelectorAll(`.msg-inline-image`)],n=t.map(e=>e.src);t.forEach(e=>{let t=e.src,r=!!this.appState.settings?.chat_blur_images,i=()=>{if(e.classList.contains(`image-blurred`)){this.appState.revealedImages[t]=!0,e.classList.remove(`image-blurred`),e.title=`Open image preview`,e.setAttribute(`aria-label`,`Open image preview`);return}this.appState.chatImagePreview=t,this.appState.chatImageGallery=n,this.renderApp()};e.tabIndex=0,e.setAttribute(`role`,`button`),r&&!this.appState.revealedImages[t]?(e.classList.add(`image-blurred`),e.title=`Tap to reveal image`,e.setAttribute(`aria-label`,`Reveal image`)):(e.title=`Open image preview`,e.setAttribute(`aria-label`,`Open image preview`)),e.addEventListener(`click`,i),e.addEventListener(`keydown`,e=>{(e.key===`Enter`||e.key===` `)&&(e.preventDefault(),i())})})}attachmentNode(e){let t=this.appState.capabilityRequests.find(t=>t.id===e.capability_request_id),n=e.kind===`image`?`picture`:`video`;if(e.status===`completed`&&e.content_url){let n=e.kind===`image`?i(`img`,{class:`msg-inline-image attachment-image`,src:e.content_url,alt:`Generated picture`}):i(`button`,{class:`msg-video-preview`,onclick:()=>{this.appState.chatVideoPreview=e.content_url??``,this.renderApp()}},[i(`video`,{class:`msg-inline-video`,src:e.content_url,preload:`metadata`,muted:!0,playsInline:!0}),i(`span`,{class:`msg-video-play`,textContent:`▶`}),i(`span`,{class:`msg-video-label`,textContent:`Play video`})]),r=e.kind===`image`?e.frames??[]:[];return i(`section`,{class:`chat-attachment attachment-completed`,"data-testid":`chat-attachment`},[n,r.length?i(`div`,{class:`attachment-frames`,"data-testid":`attachment-frames`},r.map(e=>i(`img`,{class:`msg-inline-image attachment-image attachment-frame`,src:e.content_url,alt:`Frame ${(e.frame_index??0)+1} of the same set`}))):null,e.identity_state===`unconditioned`?i(`p`,{class:`attachment-identity`,textContent:`No identity reference was applied · unverified`}):e.identity_state===`verified`?i(`p`,{class:`attachment-identity`,textContent:`Identity match verified`}):e.identity_state===`unverified`?i(`p`,{class:`attachment-identity`,textContent:`Identity match unverified`}):null,e.media_id?i(`button`,{class:`pill-btn attachment-action attachment-log`,textContent:`Generation log`,title:`See exactly how this was made`,"data-testid":`open-generation-log`,onclick:()=>void this.openGenerationLog(e.media_id)}):null,this.attachmentDetails(t)])}return e.status===`failed`?i(`section`,{class:`chat-attachment attachment-failed`,"data-testid":`chat-attachment`},[i(`span`,{textContent:e.safe_error||`That ${n} could not be made.`}),e.retry_available?i(`button`,{class:`pill-btn attachment-action`,textContent:`Retry`,"data-testid":`retry-chat-attachment`,onclick:()=>void this.retryAttachment(e)}):null,this.attachmentDetails(t)]):e.status===`cancelled`?i(`section`,{class:`chat-attachment attachment-cancelled`,"data-testid":`chat-attachment`},[i(`span`,{textContent:`${rt(n)} canceled.`}),e.retry_available?i(`button`,{class:`pill-btn attachment-action`,textContent:`Retry`,onclick:()=>void this.retryAttachment(e)}):null]):e.status===`retried`?i(`section`,{class:`chat-attachment attachment-retried`,textContent:`${rt(n)} retry started.`}):i(`section`,{class:`chat-attachment attachment-progress`,"data-testid":`chat-attachment`},[i(`span`,{class:`attachment-spinner`,"aria-hidden":`true`}),i(`span`,{textContent:e.status===`running`?`Making that ${n}…`:`${rt(n)} queued…`}),t&&[`queued`,`running`].includes(t.status)?i(`button`,{class:`pill-btn attachment-action`,textContent:`Cancel`,"data-testid":`cancel-chat-attachment`,onclick:()=>void this.cancelAttachment(t)}):null,this.attachmentDetails(t)])}async openGenerationLog(e){try{this.appState.generationLog=await this.client.mediaJournalForMedia(e)}catch{this.appState.uiError=`No generation log was recorded for that picture.`}this.renderApp()}attachmentDetails(e){if(!e)return null;let t=(e.media_plan?.selected_resources??[]).find(e=>e.resource_type===`model`);return i(`details`,{class:`attachment-details`},[i(`summary`,{textContent:`Details`}),e.arguments.prompt?i(`p`,{textContent:String(e.arguments.prompt)}):null,t?i(`p`,{class:`meta`,textContent:`Made with ${t.name} (${t.backend})`}):null])}async cancelAttachment(e){try{await this.client.cancelCapability(e.id),await this.refreshCurrentChat()}catch{this.appState.uiError=`That picture could not be canceled.`}this.renderApp()}async retryAttachment(e){try{await this.client.retryCapability(e.capability_request_id),await this.refreshCurrentChat()}catch{this.appState.uiError=`That picture could not be retried.`}this.renderApp()}async refreshCurrentChat(){let e=this.appState.currentChat?.id;if(!e)return;let[t,n]=await Promise.all([this.client.chat(e),this.client.capabilityRequests(e)]);this.appState.currentChat?.id===e&&(this.appState.currentChat=t.chat,this.appState.messages=t.messages,this.appState.capabilityRequests=n.items)}async generateImage(e){let t=he(e);await this.media.generateImage(t||`a picture for this conversation`,this.appState.currentChat?.id??null,t)}async replayAudio(e,t){try{await this.playback.play(e,t)}catch{this.appState.messageAudioErrors[e]=`Audio could not be played.`,this.renderApp()}}async saveMemory(e){let t=this.appState.currentChat?.id;if(!t)return;let n=(await this.editMemoryProposal(se(e.text)))?.trim();if(n){try{await this.client.proposeMemory(`chat`,t,n,e.id),this.appState.memories=(await this.client.memories()).items,this.appState.statusText=`Memory fact proposed for review`}catch{this.appState.uiError=`That memory fact could not be proposed.`}this.renderApp()}}};function rt(e){return e.charAt(0).toUpperCase()+e.slice(1)}function it(e){let t=/<think>([\s\S]*?)<\/think>/i.exec(e);return t?{thinking:t[1]?.trim()??``,visibleText:e.replace(t[0],``).trim()}:{thinking:``,visibleText:e}}function at(e){return(e.split(`/`).pop()??e).replace(/:latest$/,``).replace(/[-_]/g,` `)}function ot(e,t){let n=[...e.querySelectorAll(`.msg-inline-image, .attachment-image`)],r=n[n.length-1];!r||t[r.src]||(r.classList.add(`image-blurred`),r.title=`Tap to reveal image`,r.setAttribute(`aria-label`,`Reveal image`))}var st=class{renderApp;appState;stateMachine;client;openIdentitySetup;replanningRequestIds=new Set;constructor(e,t=y,n=b,i=r,a=()=>void 0){this.renderApp=e,this.appState=t,this.stateMachine=n,this.client=i,this.openIdentitySetup=a}node(e){let t=e.capability_key.endsWith(`generate_video`)?`video`:`image`,n=typeof e.arguments.prompt==`string`?e.arguments.prompt:``,r=typeof e.result?.text==`string`?e.result.text:``,a=fe(r),s=pe(r),c=e.media_plan,l=e.result?.identityConditioning,u=e.result?.identityWorkflow,d=c?.status===`blocked`,f=!!(d&&c.identity_conditioning?.status!==`unconditioned`&&c.requirements.required_features.includes(`identity_control`)),p=!!(f&&ut(c?.block?.code)),m=c?.identity_conditioning?.status===`unconditioned`,h=r?i(`div`,{class:`capability-result`,html:o(r)}):null;return h?.querySelectorAll(`img`).forEach(e=>{e.addEventListener(`click`,()=>{this.appState.chatImagePreview=e.src,this.renderApp()})}),i(`section`,{class:`capability-card capability-${e.status}`,"data-testid":`capability-request`},[i(`div`,{class:`capability-heading`},[i(`strong`,{textContent:`Requested ${t}`}),i(`span`,{class:`capability-status`,textContent:ct(e.status)})]),n?i(`p`,{class:`capability-prompt`,textContent:n}):null,c?i(`details`,{class:`capability-plan plan-${c.status}`},[i(`summary`,{textContent:`Details`}),c.selected_resources.length?i(`div`,{class:`meta`,textContent:`${c.selected_resources.map(e=>e.name).join(` + `)} · ${c.estimated_vram_mb||`unknown`} MB estimated VRAM`}):null,i(`div`,{class:`meta`,textContent:c.block?.message||c.explanation.summary}),c.identity_conditioning?i(`div`,{class:`meta`,textContent:lt(c.identity_conditioning.status)}):null,...c.explanation.warnings.map(e=>i(`div`,{class:`meta`,textContent:e})),c.status===`blocked`&&c.requirements.required_features.length?i(`div`,{class:`meta capability-block-detail`,textContent:`Required features: ${c.requirements.required_features.join(`, `)}`}):null,...c.status===`blocked`?c.explanation.rejected.flatMap(e=>e.reasons.map(t=>i(`div`,{class:`meta capability-block-detail`,textContent:`${e.name}: ${t}`}))):[]]):null,e.error?i(`p`,{class:`capability-error`,textContent:e.error.message}):null,l?i(`p`,{class:`meta`,textContent:l.status===`unconditioned`?`No persona identity reference was applied. Resemblance is not guaranteed; this result is explicitly unconditioned and unverified.`:l.claim_status===`verified`?`Persona identity verified${u?.attempts?` after ${u.attempts} attempt${u.attempts===1?``:`s`}`:``}.`:l.verification_status===`failed`?`Persona identity comparison did not pass; this result is explicitly unverified.`:`Persona reference conditioning was applied, but the verifier was unavailable or inconclusive.`}):null,h,s?i(`button`,{class:`pill-btn`,textContent:`Play video`,onclick:()=>{this.appState.chatVideoPreview=s,this.renderApp()}}):null,e.status===`pending_confirmation`&&(t===`video`||d)?i(`div`,{class:`capability-actions`},[d?i(`button`,{class:`send-btn`,textContent:p?`Review visual identity`:f?`Set up identity control`:`Try plan again`,"data-testid":`configure-capability`,disabled:this.replanningRequestIds.has(e.id),onclick:f?()=>this.openIdentitySetup(this.identitySetupIntent(e)):()=>void this.replan(e)}):t===`video`?i(`button`,{class:`send-btn`,textContent:m?`Generate ${t} without identity matching`:`Generate ${t}`,"data-testid":`approve-capability`,onclick:()=>void this.approve(e)}):null,f?i(`button`,{class:`pill-btn`,textContent:this.replanningRequestIds.has(e.id)?`Checking…`:`Try plan again`,disabled:this.replanningRequestIds.has(e.id),"data-testid":`retry-capability-plan`,onclick:()=>void this.replan(e)}):null,t===`video`||d?i(`button`,{class:`pill-btn`,textContent:`No thanks`,"data-testid":`deny-capability`,onclick:()=>void this.deny(e)}):null]):null,[`queued`,`running`].includes(e.status)?i(`button`,{class:`pill-btn`,textContent:`Cancel`,"data-testid":`cancel-capability`,onclick:()=>void this.cancel(e)}):null,a?i(`span`,{class:`sr-only`,textContent:`Generated image is ready.`}):null])}async approve(e){try{let t=await this.client.approveCapability(e.id);if(this.upsert(t),!t.job_id)throw Error(`The capability was approved without a job.`);for(await this.refreshChat(t.chat_id);;){let t=await this.client.capabilityRequest(e.id);if(this.upsert(t),![`queued`,`running`].includes(t.status))break;await this.refreshChat(t.chat_id),this.renderApp(),await new Promise(e=>window.setTimeout(e,350))}let n=await this.client.capabilityRequest(e.id);this.upsert(n),await this.refreshChat(n.chat_id)}catch(e){this.appState.uiError=p(e,`Unable to run the requested capability.`)}finally{this.renderApp()}}async replan(e){if(!this.replanningRequestIds.has(e.id)){this.replanningRequestIds.add(e.id),this.renderApp();try{let t=await this.client.replanCapability(e.id);this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(n=>n.id!==e.id&&n.id!==t.id),t].sort((e,t)=>e.requested_at-t.requested_at)}catch(e){this.appState.uiError=p(e,`Unable to check the image plan again.`)}finally{this.replanningRequestIds.delete(e.id),this.renderApp()}}}identitySetupIntent(e){return{capability_request_id:e.id,chat_id:e.chat_id,persona_id:e.media_plan?.identity_conditioning?.persona_id??this.appState.currentChat?.persona_id??null,prompt:typeof e.arguments.prompt==`string`?e.arguments.prompt:``,required_features:[...e.media_plan?.requirements.required_features??[]],block_code:e.media_plan?.block?.code??null}}async deny(e){try{this.upsert(await this.client.denyCapability(e.id))}catch(e){this.appState.uiError=p(e,`Unable to deny the capability request.`)}this.renderApp()}async cancel(e){try{this.upsert(await this.client.cancelCapability(e.id)),await this.refreshChat(e.chat_id)}catch(e){this.appState.uiError=p(e,`Unable to cancel the capability request.`)}this.renderApp()}upsert(e){this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(t=>t.id!==e.id),e].sort((e,t)=>e.requested_at-t.requested_at)}async refreshChat(e){if(!e||this.appState.currentChat?.id!==e)return;let t=await this.client.chat(e);this.appState.currentChat?.id===e&&(this.appState.currentChat=t.chat,this.appState.messages=t.messages)}};function ct(e){return{pending_confirmation:`Approval needed`,queued:`Queued`,running:`Generating`,completed:`Completed`,failed:`Failed`,cancelled:`Cancelled`,denied:`Declined`,expired:`Expired`}[e]}function lt(e){return e===`ready`||e===`conditioned`?`Uses the reviewed persona reference for conditioning; the result remains unverified until comparison.`:e===`unconditioned`?`No identity workflow will be applied. The image may not resemble the persona and will be labeled unconditioned.`:`Persona identity conditioning is not ready for this request.`}function ut(e){return[`identity_persona_required`,`identity_profile_unavailable`,`identity_reference_unavailable`,`identity_reference_changed`].includes(e??``)}function dt(e){return{busy:[`queued`,`thinking`,`transcribing`].includes(e),inputLocked:e===`transcribing`}}function ft(e,t,n,r){let a=r&&r.total>1?r:null,o=0,s=(e,t,n)=>i(`button`,{class:`icon-btn media-preview-step media-preview-step-${e<0?`previous`:`next`}`,textContent:n,title:t,"aria-label":t,"data-testid":`image-preview-${e<0?`previous`:`next`}`,onclick:t=>{t.stopPropagation(),a?.step(e)}});return i(`div`,{class:`modal-backdrop media-preview-backdrop`,"data-testid":`image-preview`,onclick:n},[i(`div`,{class:`media-preview-frame`,role:`dialog`,"aria-modal":`true`,"aria-label":`${t} preview`,onclick:e=>e.stopPropagation(),ontouchstart:e=>{o=e.changedTouches[0]?.clientX??0},ontouchend:e=>{let t=(e.changedTouches[0]?.clientX??0)-o;Math.abs(t)<45||a?.step(t<0?1:-1)}},[i(`button`,{class:`icon-btn media-preview-close`,textContent:`✕`,title:`Close preview`,"aria-label":`Close preview`,onclick:n}),...a?[s(-1,`Previous picture`,`‹`),s(1,`Next picture`,`›`)]:[],i(`img`,{class:`media-preview-image`,src:e,alt:t,title:`Close preview`,onclick:n}),...a?[i(`div`,{class:`meta media-preview-count`,"data-testid":`image-preview-count`,textContent:`${a.position+1} of ${a.total}`})]:[]])])}function pt(e,t){let n=e.chatImageGallery;if(n.length<2)return;let r=n.indexOf(e.chatImagePreview);if(r<0)return;let i=n[(r+t+n.length)%n.length];i&&(e.chatImagePreview=i,e.revealedImages[i]=!0)}function mt(e,t){let n=()=>{e.chatVideoPreview=``,t()};return i(`div`,{class:`modal-backdrop media-preview-backdrop`,"data-testid":`video-preview`,onclick:n},[i(`div`,{class:`media-preview-frame video-preview-frame`,role:`dialog`,"aria-modal":`true`,"aria-label":`Video preview`,onclick:e=>e.stopPropagation()},[i(`button`,{class:`icon-btn media-preview-close`,textContent:`✕`,title:`Close preview`,"aria-label":`Close preview`,onclick:n}),i(`video`,{class:`video-preview-media`,src:e.chatVideoPreview,controls:!0,autoplay:!0})])])}function ht(e){return e==null?`not measured`:e<1e3?`${Math.round(e)} ms`:`${(e/1e3).toFixed(2)} s`}function gt(e){return e?new Date(e*1e3).toLocaleString():`unknown`}function _t(e){let t=e.detail??{},n=Object.keys(t).length>0;return i(`li`,{class:`generation-log-stage stage-${e.status}`},[i(`div`,{class:`generation-log-stage-head`},[i(`span`,{class:`generation-log-stage-name`,textContent:e.stage}),i(`span`,{class:`generation-log-stage-status meta`,textContent:e.status}),i(`span`,{class:`generation-log-stage-duration meta`,textContent:ht(e.duration_ms)})]),e.summary?i(`p`,{class:`generation-log-stage-summary`,textContent:e.summary}):null,n?i(`details`,{class:`generation-log-detail`},[i(`summary`,{textContent:`Detail`}),i(`pre`,{textContent:JSON.stringify(t,null,2)})]):null])}function vt(e,t,n){return i(`div`,{class:`modal-backdrop generation-log-backdrop`,"data-testid":`generation-log`,onclick:n},[i(`div`,{class:`modal-card glass generation-log-card`,role:`dialog`,"aria-modal":`true`,"aria-label":`Generation log`,onclick:e=>e.stopPropagation()},[i(`button`,{class:`icon-btn generation-log-close`,textContent:`✕`,title:`Close log`,ariaLabel:`Close log`,onclick:n}),i(`h3`,{textContent:`Generation log`}),i(`p`,{class:`meta`,textContent:`${e.kind} · ${e.origin} · ${e.status}`}),i(`dl`,{class:`generation-log-summary`},[i(`dt`,{textContent:`Started`}),i(`dd`,{textContent:gt(e.started_at)}),i(`dt`,{textContent:`Took`}),i(`dd`,{textContent:ht(e.duration_ms)}),i(`dt`,{textContent:`Stages`}),i(`dd`,{textContent:String(e.stages.length)})]),e.error?i(`p`,{class:`generation-log-error`,textContent:`${e.error.code}: ${e.error.message}`}):null,i(`ol`,{class:`generation-log-stages`},e.stages.map(_t)),i(`p`,{class:`meta generation-log-privacy`},[`Credentials, provider addresses, and server paths are removed from this log, so it is safe to share with the image.`]),i(`a`,{class:`pill-btn generation-log-download`,href:t,download:`generation-journal-${e.id}.md`,textContent:`Download log`,"data-testid":`download-generation-log`})])])}function yt(e,t,n){return e?i(`section`,{class:`home-hero`,"data-testid":`home-hero`},[i(`img`,{class:`home-hero-avatar`,src:w(t?.name??`Conversation`,t?.avatar_url),onerror:Ke(t?.name??`Conversation`),alt:``,ariaHidden:!0}),i(`div`,{class:`home-hero-body`},[i(`p`,{class:`home-hero-eyebrow`,textContent:t?.name??`Conversation`}),i(`h2`,{class:`home-hero-title`,textContent:(e.title??``).trim()||`Untitled conversation`}),i(`p`,{class:`home-hero-meta`,textContent:`Last spoken ${d(e.updated_at)}`})]),i(`button`,{class:`send-btn home-hero-action`,textContent:`Continue`,"data-testid":`home-start-chat`,onclick:()=>n.openChat(e.id)})]):i(`section`,{class:`home-hero home-hero-empty`,"data-testid":`home-hero`},[i(`p`,{class:`home-hero-eyebrow`,textContent:`Nothing here yet`}),i(`h2`,{class:`home-hero-title`,textContent:`Start your first conversation`}),i(`button`,{class:`send-btn home-hero-action`,textContent:`Start a conversation`,"data-testid":`home-start-chat`,onclick:()=>n.startChatWith(null)})])}function bt(e,t){return e.length?i(`section`,{class:`home-card`,"data-testid":`home-personas`},[i(`h2`,{class:`home-card-title`,textContent:`Talk to`}),i(`div`,{class:`home-persona-strip`},e.map(e=>i(`button`,{class:`home-persona`,title:`Start a conversation with ${e.name}`,"aria-label":`Start a conversation with ${e.name}`,"data-testid":`home-persona-${e.id}`,onclick:()=>t.startChatWith(e.id)},[i(`img`,{class:`home-persona-avatar`,src:w(e.name,e.avatar_url),onerror:Ke(e.name),alt:``}),i(`span`,{class:`home-persona-name`,textContent:e.name})])))]):null}function xt(e,t,n){let r=e.map(e=>e.content_url);return i(`section`,{class:`home-card home-pictures-card`},[i(`h2`,{class:`home-card-title`,textContent:`Recent pictures`}),e.length?i(`div`,{class:`home-pictures`,"data-testid":`home-pictures`},e.map(e=>i(`button`,{class:`home-picture-button`,title:e.scene.subject||`Open picture`,"aria-label":e.scene.subject||`Open picture`,"data-testid":`home-picture-${e.id}`,onclick:()=>n.openPicture(e.content_url,r)},[i(`img`,{class:`home-picture`,src:e.content_url,alt:e.scene.subject||`A retained picture`,loading:`lazy`})]))):i(`p`,{class:`meta`,"data-testid":`home-pictures-empty`,textContent:t?`None kept yet. Ask a persona for a picture and it will be kept for reuse.`:`Checking…`})])}function St(e,t){return i(`section`,{class:`home-card`,"data-testid":`home-now`},[i(`h2`,{class:`home-card-title`,textContent:`Right now`}),i(`ul`,{class:`home-facts`},e.map(e=>i(`li`,{class:`home-fact`},[e.section?i(`button`,{class:`home-fact-button`,title:`Open ${e.section} settings`,"data-testid":`home-fact-${e.section}`,onclick:()=>t.openSettings(e.section)},[i(`span`,{class:`home-fact-label`,textContent:e.label}),i(`span`,{class:`home-fact-value`,textContent:e.value})]):i(`div`,{class:`home-fact-static`},[i(`span`,{class:`home-fact-label`,textContent:e.label}),i(`span`,{class:`home-fact-value`,textContent:e.value})])])))])}var Ct=0;function T(e,t=`More information`){Ct+=1;let n=`settings-info-${Ct}`;return i(`span`,{class:`info-tip`},[i(`button`,{class:`info-tip-trigger`,type:`button`,ariaLabel:t,"aria-describedby":n,textContent:`i`}),i(`span`,{class:`info-tip-content`,id:n,role:`tooltip`,textContent:e})])}function E(e,t,n=`h4`){return i(`div`,{class:`settings-heading-with-info`},[i(n,{textContent:e}),T(t,`About ${e}`)])}function D(e,t=``){return i(`div`,{class:`persona-card settings-card ${t}`.trim()},e)}function O(e,t,n,r,a={}){return i(`details`,{class:`persona-card operator-editor ${a.className??``}`.trim(),open:!!a.open,"data-testid":a.testId,ontoggle:e=>a.onToggle?.(e.currentTarget.open),oninput:a.onInput,onchange:a.onChange},[i(`summary`,{},[i(`div`,{class:`operator-editor-summary`},[i(`strong`,{textContent:e}),i(`span`,{class:`meta`,textContent:t})]),i(`span`,{class:`provider-status ${a.statusClass??`idle`}`,textContent:n})]),...r])}function k(e,t){return i(`div`,{class:`settings-intro`},[i(`strong`,{textContent:e}),i(`p`,{textContent:t})])}function A(e,t,n,r={}){return i(`details`,{class:`settings-advanced persona-card`,open:!!r.open,"data-testid":r.testId,ontoggle:e=>r.onToggle?.(e.currentTarget.open)},[i(`summary`,{},[i(`strong`,{textContent:e}),i(`span`,{class:`meta`,textContent:`Optional`})]),i(`p`,{class:`meta`,textContent:t}),...n])}function j(e,t,n,r){return i(`div`,{class:`settings-readiness-row`},[i(`span`,{class:`settings-readiness-dot ${n}`,ariaHidden:!0}),i(`div`,{},[r?E(e,r,`strong`):i(`strong`,{textContent:e}),i(`span`,{class:`meta`,textContent:t})])])}function M(e,t,n){return t&&!t.id&&(t.id=`setting-control-${++Ct}`),i(`div`,{class:`setting-row`},[i(`div`,{class:`setting-label-line`},[i(`label`,{textContent:e,htmlFor:t?.id??``}),n?T(n,`About ${e}`):null]),t])}function wt(e,t,n,r){return M(e,i(`textarea`,{value:t,onchange:e=>n(e.currentTarget.value)}),r)}function N(e,t,n=`text`){return i(`input`,{type:n,value:e,onchange:e=>t(e.currentTarget.value)})}function P(e,t,n,r=e=>e){return i(`select`,{onchange:e=>n(e.currentTarget.value)},t.map(t=>i(`option`,{value:t,selected:t===e,textContent:r(t)})))}function Tt(e,t,n,r){let i=Number(e);return Number.isFinite(i)?Math.min(n,Math.max(t,i)):r}function F(e){return e.replaceAll(`_`,` `).replace(/\b\w/g,e=>e.toUpperCase())}var I=0;function Et(e,t,n){return i(`div`,{class:`setting-label-line`},[i(`label`,{textContent:e,htmlFor:t}),n?T(n,`About ${e}`):null])}function L(e,t,n,r=`text`,a=!0,o){let s=`settings-control-${++I}`;return i(`div`,{class:`setting-row`},[Et(e,s,o),i(`input`,{id:s,class:`search-input`,type:r,value:t,oninput:e=>n(e.currentTarget.value),onchange:a?e=>n(e.currentTarget.value):void 0})])}function R(e,t,n,r=!0,a){let o=`settings-control-${++I}`;return i(`div`,{class:`setting-row`},[Et(e,o,a),i(`textarea`,{id:o,class:`search-input`,rows:3,value:t,oninput:e=>n(e.currentTarget.value),onchange:r?e=>n(e.currentTarget.value):void 0})])}function z(e,t,n,r,a,o=Dt,s=!0,c){let l=`settings-control-${++I}`;return i(`div`,{class:`setting-row`},[Et(e,l,c),i(`select`,{id:l,class:`chip-select`,value:t,"data-testid":a,onchange:e=>{r(e.currentTarget.value)}},n.map(e=>i(`option`,{value:e,selected:e===t,textContent:o(e)})))])}function B(e,t,n,r){let a=`settings-control-${++I}`;return i(`div`,{class:`setting-row setting-toggle-row`},[i(`label`,{class:`checkbox-row`,htmlFor:a},[i(`input`,{id:a,type:`checkbox`,checked:t,onchange:e=>n(e.currentTarget.checked)}),e]),r?T(r,`About ${e}`):null])}function Dt(e){return e?e.replace(/[-_]/g,` `).replace(/\b\w/g,e=>e.toUpperCase()):`None`}var Ot=class{appState;change;providerControl;providerPanel;constructor(e,t,n,r){this.appState=e,this.change=t,this.providerControl=n,this.providerPanel=r}nodes(e,t){return e===`General`?this.general(t):e===`TTS`?this.tts(t):e===`STT`?this.stt(t):e===`Image Generation`?this.image(t):e===`Video Generation`?this.video(t):this.user(t)}general(e){return[k(`Choose the everyday experience`,`Set the appearance, default model, and reply behavior most conversations should use.`),D([z(`Theme`,e.general_theme,[`dark`,`light`],e=>this.change(`general_theme`,e),void 0,H,!0,`Changes the interface colors for this Nice Assistant account.`),z(`Default model`,e.global_default_model,[``,...this.appState.models],e=>this.change(`global_default_model`,e),void 0,e=>e||`Automatic`,!0,`Used when a persona or chat has not selected a different model.`),B(`Speak assistant replies`,e.general_voice_responses,e=>this.change(`general_voice_responses`,e),`Automatically plays completed speech for assistant replies when TTS is configured.`),B(`Show the audio visualizer`,e.general_show_viz,e=>this.change(`general_show_viz`,e),`Displays the playback visualization while assistant audio is playing.`)]),A(`Interface, session, and connection details`,`Optional visibility, session-expiry, and provider-diagnostic controls.`,[D([B(`Show system and tool messages`,e.general_show_system_messages,e=>this.change(`general_show_system_messages`,e),`Shows technical messages that are normally hidden from the conversation.`),B(`Show model thinking by default`,e.general_show_thinking,e=>this.change(`general_show_thinking`,e),`Shows reasoning content only when the selected model and provider return it.`),B(`Expire inactive sessions automatically`,e.general_auto_logout,e=>this.change(`general_auto_logout`,e),`Ends an inactive browser session after the server-configured session lifetime.`)]),this.providerPanel()],{testId:`general-advanced-settings`})]}tts(e){let t=[z(`Speech provider`,e.tts_provider,[`disabled`,`local`,`openai`],e=>this.change(`tts_provider`,e),`tts-provider`,V,!0,`Local uses the configured Kokoro LAN service. OpenAI sends reply text to OpenAI for speech generation.`)],n=[z(`Completed audio format`,e.tts_format,[`wav`,`mp3`,`opus`,`aac`,`flac`],e=>this.change(`tts_format`,e),void 0,H,!0,`The format stored for completed playback. Live streaming speech is not implemented yet.`)];return e.tts_provider===`openai`?(t.push(L(`Voice`,e.tts_voice_openai,e=>this.change(`tts_voice_openai`,e),`text`,!0,`The OpenAI voice name used unless a persona overrides it.`),z(`Speech model`,e.tts_model_openai,[`gpt-4o-mini-tts`,`tts-1`,`tts-1-hd`],e=>this.change(`tts_model_openai`,e),void 0,e=>e,!0,`The OpenAI model that generates completed speech audio.`),L(`Speaking speed`,e.tts_speed_openai,e=>this.change(`tts_speed_openai`,e),`number`,!0,`A multiplier where 1 is the provider default.`)),n.push(R(`Voice direction`,e.tts_instructions_openai,e=>this.change(`tts_instructions_openai`,e),!0,`Optional performance guidance such as warmth, pacing, or emotional tone.`))):e.tts_provider===`local`&&(t.push(L(`Kokoro service address`,e.tts_local_base_url,e=>this.change(`tts_local_base_url`,e),`url`,!0,`The private-LAN address of the separately deployed Kokoro-compatible service.`),L(`Voice`,e.tts_voice_local,e=>this.change(`tts_voice_local`,e),`text`,!0,`The local service voice used unless a persona overrides it.`),L(`Speaking speed`,e.tts_speed_local,e=>this.change(`tts_speed_local`,e),`number`,!0,`A multiplier where 1 is the provider default.`)),n.push(L(`Local model name`,e.tts_model_local,e=>this.change(`tts_model_local`,e),`text`,!0,`Passed to the local speech service when it supports model selection.`))),[k(`Choose how replies sound`,`Speech currently uses completed-audio playback. Streaming and interruption remain future voice work.`),D(t),e.tts_provider===`disabled`?i(`div`,{class:`settings-empty-state`,textContent:`Speech playback is off.`}):D([E(`Connection check`,`Tests the selected service without changing saved settings.`),this.providerControl(e.tts_provider===`local`?`kokoro`:`openai`)]),A(`Speech file and provider details`,`Optional format and provider-specific controls.`,n,{testId:`tts-advanced-settings`})]}stt(e){return[k(`Choose how recorded speech becomes text`,`A local Whisper service keeps a recording on this network. OpenAI is the cloud alternative, and uploads every recording it transcribes.`),D([z(`Transcription provider`,e.stt_provider,[`disabled`,`local`,`openai`],e=>this.change(`stt_provider`,e),`stt-provider`,V,!0,`A local service transcribes on this network. OpenAI uploads each completed push-to-talk recording.`),z(`Language`,e.stt_language,[`auto`,`en`,`es`,`fr`,`de`],e=>this.change(`stt_language`,e),void 0,Mt,!0,`Automatic detection is convenient; a fixed language can improve consistency.`),...e.stt_provider===`local`?this.localTranscription(e):[]]),e.stt_provider===`disabled`?i(`div`,{class:`settings-empty-state`,textContent:`Hands-free listening needs a transcription provider.`}):D([E(`Hands-free listening`,`A tap starts listening and Nice Assistant decides when you have finished, instead of you holding the button down.`),B(`Decide when I have finished talking`,e.stt_hands_free,e=>this.change(`stt_hands_free`,e),`Holding the microphone button always works and is never guessed at. This is a judgement, so it can be wrong: it waits for a pause after you have actually spoken, and never ends a turn on silence alone.`),B(`Transcribe while I am still talking`,e.stt_streaming,e=>this.change(`stt_streaming`,e),`Starts transcribing at each natural pause, so the wait after you stop is one sentence rather than the whole turn. It transcribes more audio in total, so it suits a fast transcription model and not a large one on a busy machine.`)]),e.stt_provider===`disabled`?i(`div`,{class:`settings-empty-state`,textContent:`Voice transcription is off.`}):D([E(`Connection check`,`Tests whether the chosen transcription service is configured and reachable.`),this.providerControl(e.stt_provider===`local`?`whisper`:`openai`)]),A(`Recording retention`,`Optional storage behavior for source microphone recordings.`,[B(`Keep source recordings`,e.stt_store_recordings,e=>this.change(`stt_store_recordings`,e),`Keeps the original recording after transcription. Leave off for the more private default.`)],{testId:`stt-advanced-settings`})]}localTranscription(e){let t=e.stt_local_backend===`wyoming`;return[z(`How it connects`,e.stt_local_backend,[`openai_api`,`wyoming`],e=>this.change(`stt_local_backend`,e),`stt-local-backend`,jt,!0,`Wyoming is what Home Assistant voice uses. If you already run faster-whisper for it, choose that.`),t?L(`Service address`,e.stt_wyoming_address,e=>this.change(`stt_wyoming_address`,e),`text`,!0,`The private-LAN host and port of the Wyoming service, port 10300 unless it was changed. The model is whatever that service has loaded.`):L(`Service address`,e.stt_local_base_url,e=>this.change(`stt_local_base_url`,e),`url`,!0,`The private-LAN address of a Whisper service that speaks the OpenAI transcription API.`),...t?[]:[L(`Model`,e.stt_model_local,e=>this.change(`stt_model_local`,e),`text`,!0,`What to ask that service to load. Most accept whisper-1; some want their own identifier.`)]]}image(e){let t=[z(`Image provider`,e.image_provider,[`disabled`,`local`,`openai`],e=>this.change(`image_provider`,e),`image-provider`,V,!0,`Local uses Automatic1111 or ComfyUI on your LAN. OpenAI sends the prompt to OpenAI.`),B(`Blur pictures in chat`,e.chat_blur_images,e=>this.change(`chat_blur_images`,e),`When enabled, the first tap reveals a picture and the second opens the large preview. The default is off.`),L(`Resolution`,e.image_size,e=>this.change(`image_size`,e),`text`,!0,`Enter width × height, for example 1024x1024. Provider support still determines what can run.`),z(`Prompt enhancement quality`,e.image_quality,[`none`,`low`,`medium`,`high`,`auto`],e=>this.change(`image_quality`,e),void 0,H,!0,`Controls provider-specific prompt enhancement. None preserves the prompt most directly.`)],n=[];return e.image_provider===`local`&&(t.push(z(`Local image service`,e.image_local_backend,[`automatic1111`,`comfyui`],e=>this.change(`image_local_backend`,e),void 0,e=>e===`automatic1111`?`Automatic1111`:`ComfyUI`,!0,`Choose the API exposed by the local image container.`),L(`Service address`,e.image_local_base_url,e=>this.change(`image_local_base_url`,e),`url`,!0,`The private-LAN address of the selected image service.`),L(`Model or checkpoint`,e.image_local_model,e=>this.change(`image_local_model`,e),`text`,!0,`Used by direct image actions. Platform-planned persona images use the Media Catalog selection instead.`),B(`Allow explicit local prompts`,e.image_local_allow_nsfw,e=>this.change(`image_local_allow_nsfw`,e),`Allows explicit prompt content only for the self-hosted local image path.`)),n.push(L(`Basic authentication`,e.image_local_api_auth,e=>this.change(`image_local_api_auth`,e),`password`,!0,`Optional user:password credentials for the local image service.`),L(`Steps`,e.image_local_steps,e=>this.change(`image_local_steps`,e),`number`,!0,`Higher values may refine an image but take longer.`),L(`Sampler`,e.image_local_sampler_name,e=>this.change(`image_local_sampler_name`,e),`text`,!0,`Sampling algorithm passed to compatible local backends.`),L(`Scheduler`,e.image_local_scheduler,e=>this.change(`image_local_scheduler`,e),`text`,!0,`Optional scheduler name for compatible local backends.`),L(`CFG scale`,e.image_local_cfg_scale,e=>this.change(`image_local_cfg_scale`,e),`number`,!0,`Controls how strongly generation follows the prompt.`),L(`Seed`,e.image_local_seed,e=>this.change(`image_local_seed`,e),`text`,!0,`Reuse a seed for repeatability, or leave blank for a new result.`),R(`Additional JSON parameters`,e.image_local_additional_parameters,e=>this.change(`image_local_additional_parameters`,e),!0,`Advanced provider payload values. Invalid or unsupported fields can make generation fail.`))),[k(`Choose the default image path`,`These defaults power direct image actions. Persona-planned generation may select richer Media Catalog resources.`),D(t),this.appState.mediaReadiness?D([E(`Images readiness`,this.appState.mediaReadiness.basic_generation.message),i(`div`,{class:`settings-readiness-facts`,textContent:[`Provider: ${this.appState.mediaReadiness.provider.reachable?`reachable`:this.appState.mediaReadiness.provider.status}`,`Basic generation: ${this.appState.mediaReadiness.basic_generation.ready?`ready`:`not ready`}`,`Optional identity enhancement: ${this.appState.mediaReadiness.optional_identity.ready?`ready`:`not configured`}`].join(` · `)})]):null,e.image_provider===`disabled`?i(`div`,{class:`settings-empty-state`,textContent:`Image generation is off.`}):D([E(`Connection check`,`Tests the selected image service with the current unsaved values.`),this.providerControl(e.image_provider===`local`?e.image_local_backend:`openai`)]),e.image_provider===`local`?A(`Local generation tuning`,`Optional authentication and sampling controls for direct local image actions.`,n,{testId:`image-advanced-settings`}):null].filter(e=>e!==null)}video(e){return[k(`Choose the default video path`,`Video generation is optional and currently uses completed OpenAI jobs.`),D([z(`Video provider`,e.video_provider,[`disabled`,`openai`],e=>this.change(`video_provider`,e),`video-provider`,V,!0,`OpenAI sends the prompt to OpenAI and polls until the video is complete.`),z(`Model`,e.video_model,[`sora-2`,`sora-2-pro`],e=>{this.change(`video_model`,e,!1),this.change(`video_size`,Fe(e)[0]??x.video_size)},void 0,e=>e,!0,`The selected model determines the available sizes and provider cost.`),z(`Size`,e.video_size,[...Fe(e.video_model)],e=>this.change(`video_size`,e),void 0,e=>e,!0,`Output width × height. Portrait sizes are listed with the narrower dimension first.`),z(`Duration`,e.video_duration,[`4`,`8`,`12`],e=>this.change(`video_duration`,e),void 0,e=>`${e} seconds`,!0,`Longer videos take more time and may cost more.`)]),e.video_provider===`openai`?D([E(`Connection check`,`Tests whether OpenAI video generation is configured and reachable.`),this.providerControl(`openai`)]):i(`div`,{class:`settings-empty-state`,textContent:`Video generation is off.`})]}user(e){return[k(`Your account defaults`,`Set how your name and local time appear. Provider credentials remain server-side.`),D([L(`Display name`,e.user_display_name,e=>this.change(`user_display_name`,e),`text`,!0,`The friendly name Nice Assistant may use for this account.`),R(`About you`,e.user_profile,e=>this.change(`user_profile`,e),!0,`A few durable facts about you, sent with every message. Keep it short: it is always present, so it competes with the conversation itself.`),L(`Timezone`,e.user_timezone,e=>this.change(`user_timezone`,e),`text`,!0,`Use local for the browser timezone, or enter a standard timezone such as America/New_York.`)]),A(`Provider credentials`,`Credentials are encrypted at rest and are never returned to the browser in full.`,[L(`OpenAI API key`,e.openai_api_key,e=>this.change(`openai_api_key`,e),`password`,!0,`Used server-side for enabled OpenAI speech, transcription, image, and video features.`)],{testId:`user-advanced-settings`})]}},kt=new Set([`openai`,`openai-image`,`openai-video`]),At=new Set([`ollama`,`local`,`local-image`,`kokoro`,`compreface`]);function V(e){return e===`disabled`?`Off`:e===`local`?`Local service — on this machine`:kt.has(e)?`${H(e)} — leaves this machine`:At.has(e)?`${H(e)} — on this machine`:`${H(e)} — nobody has said where this runs`}function jt(e){return e===`wyoming`?`Wyoming — Home Assistant voice services`:`OpenAI-compatible — speaches, whisper.cpp, LocalAI`}function Mt(e){return{auto:`Detect automatically`,en:`English`,es:`Spanish`,fr:`French`,de:`German`}[e]??e}function H(e){return e?e.replace(/[-_]/g,` `).replace(/\b\w/g,e=>e.toUpperCase()):`None`}var Nt=Array.from({length:24},(e,t)=>t);function Pt(e){return`${String(e).padStart(2,`0`)}:00`}function Ft(e){return new Date(e*1e3).toLocaleDateString(void 0,{month:`short`,day:`numeric`})}var It=class{appState;client;renderApp;saving=!1;constructor(e,t,n){this.appState=e,this.client=t,this.renderApp=n}node(e,t){return i(`section`,{class:`home-card`,"data-testid":`home-controls`},[i(`h2`,{class:`home-card-title`,textContent:`Quick settings`}),this.chatModel(),this.images(),this.pregeneration(e,t),this.speech(),this.memory()])}chatModel(){let e=this.appState.settings,t=e?.global_default_model||``;return i(`div`,{class:`home-control-row`,"data-testid":`home-chat-model`},[i(`span`,{class:`meta`,textContent:`Chat model`}),i(`select`,{class:`chip-select`,"data-testid":`home-chat-model-select`,disabled:this.saving||!e||!this.appState.models.length,onchange:e=>{this.appState.settings&&(this.appState.settings.global_default_model=e.currentTarget.value,this.save())}},[i(`option`,{value:``,selected:!t,textContent:`Automatic`}),...this.appState.models.map(e=>i(`option`,{value:e,selected:e===t,textContent:e}))])])}images(){let e=this.appState.settings,t=e?.image_provider??`disabled`;return i(`div`,{class:`home-control-row`,"data-testid":`home-image-provider`},[i(`span`,{class:`meta`,textContent:`Pictures`}),i(`select`,{class:`chip-select`,"data-testid":`home-image-provider-select`,disabled:this.saving||!e,onchange:e=>{this.appState.settings&&(this.appState.settings.image_provider=e.currentTarget.value,this.save())}},[`disabled`,`local`,`openai`].map(e=>i(`option`,{value:e,selected:e===t,textContent:V(e)})))])}async save(){if(!(!this.appState.settings||this.saving)){this.saving=!0,this.renderApp();try{this.appState.settings=Oe(await this.client.updateSettings(S(this.appState.settings)))}catch(e){this.appState.uiError=p(e,`That setting could not be saved.`)}finally{this.saving=!1,this.renderApp()}}}pregeneration(e,t){let n=this.appState.settings,r=!!e?.deployment_forbids;return i(`div`,{class:`home-control`,"data-testid":`home-pregeneration`},[i(`label`,{class:`home-control-row`},[i(`input`,{type:`checkbox`,checked:!r&&!!(n?.pregeneration_enabled??e?.enabled??!1),disabled:r||this.saving||!n,"data-testid":`home-pregeneration-toggle`,onchange:e=>{this.appState.settings&&(this.appState.settings.pregeneration_enabled=e.currentTarget.checked,this.save())}}),i(`span`,{textContent:`Make pictures overnight`})]),r?i(`p`,{class:`meta`,"data-testid":`home-pregeneration-forbidden`,textContent:`Turned off for this deployment, so it cannot be switched on here.`}):i(`div`,{class:`home-control-row`},[i(`span`,{class:`meta`,textContent:`Between`}),this.hourSelect(`pregeneration_start_hour`,e?.start_hour??2),i(`span`,{class:`meta`,textContent:`and`}),this.hourSelect(`pregeneration_end_hour`,e?.end_hour??6)]),this.status(e,t)])}hourSelect(e,t){let n=this.appState.settings,r=Number(n?.[e]??t);return i(`select`,{class:`chip-select`,"data-testid":`home-${e.replace(/_/g,`-`)}`,disabled:this.saving||!n,onchange:t=>{this.appState.settings&&(this.appState.settings[e]=Number(t.currentTarget.value),this.save())}},Nt.map(e=>i(`option`,{value:String(e),selected:e===r,textContent:Pt(e)})))}status(e,t){if(!e)return i(`p`,{class:`meta`,textContent:`Not known — the readiness check did not answer.`});let n=e.approved_waiting?`${e.approved_waiting} ${e.approved_waiting===1?`scene`:`scenes`} waiting`:`Nothing waiting`,r=t?`last made ${Ft(t.updated_at)}`:`none made yet`,a=[`${n.charAt(0).toUpperCase()}${n.slice(1)} · ${r}.`];return e.inside_window&&e.reason&&a.push(e.reason),i(`div`,{class:`home-control-status`,"data-testid":`home-pregeneration-status`},a.map(e=>i(`p`,{class:`meta`,textContent:e})))}speech(){let e=this.appState.settings;return i(`label`,{class:`home-control-row`,"data-testid":`home-speech`},[i(`input`,{type:`checkbox`,checked:!!e?.general_voice_responses,disabled:this.saving||!e,"data-testid":`home-speech-toggle`,onchange:e=>{this.appState.settings&&(this.appState.settings.general_voice_responses=e.currentTarget.checked,this.save())}}),i(`span`,{textContent:`Speak replies aloud`})])}memory(){let e=this.appState.settings,t=e?.default_memory_mode===`off`?`off`:`saved`;return i(`div`,{class:`home-control-row`,"data-testid":`home-memory`},[i(`span`,{textContent:`Saved memory`}),i(`select`,{class:`chip-select`,disabled:this.saving||!e,"data-testid":`home-memory-mode`,onchange:e=>{if(!this.appState.settings)return;let t=e.currentTarget.value;this.appState.settings.default_memory_mode=t===`off`?`off`:`saved`,this.save()}},[i(`option`,{value:`saved`,selected:t===`saved`,textContent:`Use it in new chats`}),i(`option`,{value:`off`,selected:t===`off`,textContent:`Do not use it`})])])}},Lt=12;function Rt(e){return(e.title??``).trim()||`Untitled conversation`}function zt(e){let t=new Date(e.started_at*1e3).toLocaleDateString(void 0,{month:`short`,day:`numeric`});return e.status===`running`?`Running since ${t}`:e.status===`completed`?`${e.duration_ms?`${(e.duration_ms/1e3).toFixed(1)}s`:`done`} · ${t}`:`${e.status} · ${t}`}var Bt=class{appState;client;actions;renderApp;journals=[];pictures=[];production=null;produced=null;controls;locality=null;loaded=!1;failed=``;constructor(e,t,n,r){this.appState=e,this.client=t,this.actions=n,this.renderApp=r,this.controls=new It(e,t,r)}async refresh(){this.loaded=!1,this.failed=``;try{let[e,t,n,r,i]=await Promise.all([this.client.mediaJournals(5).catch(()=>({items:[]})),this.client.libraryEntries().catch(()=>({items:[]})),this.client.productionReadiness().catch(()=>null),this.client.sceneBacklog(`done`).catch(()=>({items:[]})),this.client.dataLocality().catch(()=>null)]);this.locality=i,this.journals=e.items,this.pictures=t.items.slice(0,Lt),this.production=n,this.produced=[...r.items].sort((e,t)=>t.updated_at-e.updated_at)[0]??null}catch{this.failed=`Some of this could not be loaded.`}finally{this.loaded=!0,this.renderApp()}}node(){let e=this.appState.chats.filter(e=>!e.hidden_in_ui)[0]??null;return i(`main`,{class:`home`,"data-testid":`home`},[this.header(),yt(e,this.appState.personas.find(t=>t.id===e?.persona_id),this.actions),xt(this.pictures,this.loaded,this.actions),i(`div`,{class:`home-columns`},[bt(this.appState.personas,this.actions),this.recentCard(),St(this.facts(),this.actions),this.localityCard(),this.controls.node(this.production,this.produced)]),this.failed?i(`p`,{class:`meta`,textContent:this.failed}):null])}facts(){return[{label:`New chat uses`,value:this.bindingLabel(),section:`Personas`},{label:`Last generation`,value:this.lastGenerationLabel()}]}header(){return i(`header`,{class:`home-header`},[i(`h1`,{class:`home-title`,textContent:`Nice Assistant`})])}localityCard(){let e=this.locality;return e?i(`section`,{class:`home-card`,"data-testid":`home-locality`},[i(`h2`,{class:`home-card-title`,textContent:`Where this goes`}),i(`p`,{class:`meta`,"data-testid":`home-locality-summary`,textContent:e.everything_local?`Everything switched on runs on this machine.`:`Some of this leaves this machine, or nobody has said whether it does.`}),i(`ul`,{class:`home-facts`},e.parts.map(e=>i(`li`,{class:`home-fact`,title:e.detail,"data-testid":`home-locality-${e.locality}`},[i(`span`,{class:`home-fact-label`,textContent:e.label}),i(`span`,{class:`home-fact-value locality-${e.locality}`,textContent:e.locality===`off`?`Off`:e.locality===`cloud`?`${e.provider} — leaves this machine`:e.locality===`unknown`?`${e.provider} — nobody has said where this runs`:`${e.provider} — on this machine`})])))]):null}fact(e,t){return i(`li`,{class:`home-fact`},[i(`span`,{class:`home-fact-label`,textContent:e}),i(`span`,{class:`home-fact-value`,textContent:t})])}bindingLabel(){let e=this.appState.selectedPersonaId??this.appState.personas[0]?.id??null,t=this.appState.personas.find(t=>t.id===e);if(!t)return`No persona yet — create one in Settings`;let n=t.workspace_id??t.workspace_ids[0],r=this.appState.workspaces.find(e=>e.id===n);return r?`${t.name} in ${r.name}`:t.name}chatModelLabel(){return this.appState.settings?.global_default_model||this.appState.models[0]||`No model installed — check the provider in Settings`}imagesLabel(){let e=this.appState.mediaReadiness;return e?e.basic_generation.ready?`Ready`:e.basic_generation.message:`Not known — the readiness check did not answer`}productionLabel(){if(!this.loaded)return`Checking…`;let e=this.production;return e?e.deployment_forbids?`Turned off for this deployment`:e.enabled?`On, ${e.window}`:`Off`:`Not known — the readiness check did not answer`}lastGenerationLabel(){if(!this.loaded)return`Checking…`;let e=this.journals[0];return e?zt(e):`Nothing generated yet`}recentCard(){let e=this.appState.chats.filter(e=>!e.hidden_in_ui).slice(1,7);return e.length?i(`section`,{class:`home-card`},[i(`h2`,{class:`home-card-title`,textContent:`Recent conversations`}),e.length?i(`ul`,{class:`home-list`,"data-testid":`home-recent`},e.map(e=>i(`li`,{},[i(`button`,{class:`home-list-row`,textContent:Rt(e),onclick:()=>this.actions.openChat(e.id)})]))):null]):null}};async function Vt(e,t,n,r,i){e.onboardingRunning=!0;try{let i=e.workspaces[0];if(!i){let r=await n.prompt(`Welcome to Nice Assistant`,`Name your first workspace.`,`Main Workspace`);if(!r?.trim())throw Error(`First-run setup needs a workspace.`);i=await t.createWorkspace(r.trim()),e.workspaces.push(i)}let a=e.personas[0];if(!a){let r=await n.prompt(`Create first persona`,`Give your assistant a persona name.`,`Assistant`);if(!r?.trim())throw Error(`First-run setup needs a persona.`);let o=await n.prompt(`Default personality`,`Set the initial persona instruction.`,`Be helpful and concise.`);a=await t.createPersona({workspace_id:i.id,workspace_ids:[i.id],name:r.trim(),system_prompt:o?.trim()||`Be helpful and concise.`,default_model:e.models[0]??null}),e.personas.push(a)}e.selectedPersonaId=a.id,e.newChatPersonaId=a.id,e.settings&&(e.settings.onboarding_done=!0,await t.updateSettings(S(e.settings))),r.transition(`idle`)}catch(t){e.uiError=p(t,`Unable to complete first-run setup.`),r.transition(`error`)}finally{e.onboardingRunning=!1,i()}}var Ht={mp3:`audio/mpeg`,aac:`audio/aac`};function Ut(e){let t=Ht[String(e||``).toLowerCase()];return t&&globalThis.MediaSource?.isTypeSupported?.(t)?t:null}var Wt=class{source=null;buffer=null;url=``;async open(e){let t=new MediaSource;return this.source=t,this.url=URL.createObjectURL(t),await new Promise(e=>{t.addEventListener(`sourceopen`,()=>e(),{once:!0})}),this.buffer=t.addSourceBuffer(e),this.url}async append(e){let t=this.buffer;t&&(await this.settled(t),t.appendBuffer(e),await this.settled(t))}async end(){let e=this.source;!e||e.readyState!==`open`||(this.buffer&&await this.settled(this.buffer),e.endOfStream())}close(){this.url&&URL.revokeObjectURL(this.url),this.url=``,this.buffer=null,this.source=null}settled(e){return e.updating?new Promise(t=>{e.addEventListener(`updateend`,()=>t(),{once:!0})}):Promise.resolve()}},Gt=`X-Nice-Assistant-Audio-Id`,Kt=class{audio;visualizer;appState;stateMachine;client;createSink;onChange=()=>void 0;sequence=0;activePlaybackToken=null;synthesis=null;constructor(e,t,n=y,i=b,a=r,o=()=>new Wt){this.audio=e,this.visualizer=t,this.appState=n,this.stateMachine=i,this.client=a,this.createSink=o,e.addEventListener(`ended`,this.finishActive),e.addEventListener(`error`,this.failActive)}setChangeHandler(e){this.onChange=e}async synthesize(e,t,n,r){let i=this.appState.settings,a=se(e);if(!i||i.tts_provider===`disabled`||!this.appState.voiceResponsesEnabled||!a)return;let o=i.tts_format||`wav`,s=Ut(o);if(s&&await this.speakWhileArriving(a,t,n,r,o,s))return;let c=this.begin(t),l=new AbortController;this.synthesis=l;let u;try{u=await this.client.synthesize({text:a,chat_id:n,persona_id:r,format:i.tts_format||`wav`},l.signal)}catch(e){if(l.signal.aborted)return;throw e}finally{this.synthesis===l&&(this.synthesis=null)}c===this.sequence&&(this.appState.messageAudioById[t]=u.audio_url,await this.playPrepared(t,u.audio_url,c))}async speakWhileArriving(e,t,n,r,i,a){let o=this.begin(t),s=new AbortController;this.synthesis=s;let c=this.createSink(),l=!1;try{let u=await this.client.streamSpeech({text:e,chat_id:n,persona_id:r,format:i},s.signal),d=u.body;if(!d)return!1;let f=u.headers.get(Gt),p=await c.open(a);if(o!==this.sequence)return!0;l=!0,this.playPrepared(t,p,o);let m=d.getReader();for(;;){let{done:e,value:t}=await m.read();if(e)break;if(o!==this.sequence)return!0;await c.append(t)}return await c.end(),f&&(this.appState.messageAudioById[t]=`/api/v1/audio/${f}`),!0}catch{return s.signal.aborted?!0:l}finally{c.close(),this.synthesis===s&&(this.synthesis=null)}}async play(e,t){let n=this.begin(e);await this.playPrepared(e,t,n)}stop(e=!0){this.sequence+=1,this.activePlaybackToken=null,this.synthesis?.abort(),this.synthesis=null,this.haltAudio(),this.appState.phase===`speaking`&&this.stateMachine.transition(`idle`),e&&this.onChange()}begin(e){return this.stop(!1),delete this.appState.messageAudioErrors[e],this.sequence}async playPrepared(e,t,n){if(n===this.sequence){this.visualizer.connectAudio(),this.audio.src=t,this.activePlaybackToken=n,this.appState.currentAudioMessageId=e;try{if(await this.audio.play(),n!==this.sequence||this.appState.phase!==`idle`){this.activePlaybackToken===n&&(this.activePlaybackToken=null,this.haltAudio());return}this.stateMachine.transition(`speaking`),this.onChange()}catch{if(n!==this.sequence)return;this.activePlaybackToken=null,this.haltAudio(),this.appState.phase===`speaking`&&this.stateMachine.transition(`idle`),this.appState.messageAudioErrors[e]=`Audio is ready. Use replay to listen.`,this.onChange()}}}haltAudio(){this.audio.pause(),this.audio.currentTime=0,this.appState.currentAudioMessageId=null}finishActive=()=>{this.activePlaybackToken!==null&&(this.sequence+=1,this.activePlaybackToken=null,this.haltAudio(),this.appState.phase===`speaking`&&this.stateMachine.transition(`idle`),this.onChange())};failActive=()=>{let e=this.appState.currentAudioMessageId;e&&(this.appState.messageAudioErrors[e]=`Audio could not be played.`),this.finishActive()}},qt={speechLevel:.035,silenceLevel:.015,silenceMs:900,maxRecordingMs:6e4},Jt=class{options;startedAt=0;heardSpeech=!1;quietSince=0;constructor(e={}){this.options={...qt,...e}}begin(e){this.startedAt=e,this.heardSpeech=!1,this.quietSince=0}get heard(){return this.heardSpeech}observe(e,t){return t-this.startedAt>=this.options.maxRecordingMs?`too_long`:e>=this.options.speechLevel?(this.heardSpeech=!0,this.quietSince=0,`speaking`):this.heardSpeech?e>this.options.silenceLevel?this.quietSince&&t-this.quietSince>=this.options.silenceMs?`ended`:`speaking`:(this.quietSince||=t,t-this.quietSince>=this.options.silenceMs?`ended`:`speaking`):`waiting`}},Yt=class{pauseMs;silenceLevel;speechLevel;heardSpeech=!1;quietSince=0;cutAlready=!1;constructor(e={}){this.pauseMs=e.pauseMs??450,this.silenceLevel=e.silenceLevel??qt.silenceLevel,this.speechLevel=e.speechLevel??qt.speechLevel}begin(){this.heardSpeech=!1,this.quietSince=0,this.cutAlready=!1}observe(e,t){return e>=this.speechLevel?(this.heardSpeech=!0,this.quietSince=0,this.cutAlready=!1,!1):!this.heardSpeech||e>this.silenceLevel||(this.quietSince||=t,this.cutAlready||t-this.quietSince<this.pauseMs)?!1:(this.cutAlready=!0,!0)}};function Xt(e){let t=globalThis.AudioContext??globalThis.webkitAudioContext;if(!t)return{level:()=>0,close:()=>void 0};let n=new t,r=n.createAnalyser();r.fftSize=1024;let i=n.createMediaStreamSource(e);i.connect(r);let a=new Float32Array(r.fftSize);return{level(){r.getFloatTimeDomainData(a);let e=0;for(let t of a)e+=t*t;return Math.sqrt(e/a.length)},close(){try{i.disconnect(),n.close()}catch{}}}}var Zt=class{pieces=[];pending=[];claimed=0;begin(){this.pieces=[],this.pending=[],this.claimed=0}claim(e,t){let n=this.claimed;this.claimed+=1,this.pending.push(e().then(e=>{this.pieces[n]=e.trim()}).catch(()=>{this.pieces[n]=``}).then(()=>{t(this.joined())}))}async finish(e){return this.pieces[this.claimed]=e.trim(),await Promise.all(this.pending),this.joined()}joined(){return this.pieces.filter(Boolean).join(` `).replace(/\s+/g,` `).trim()}get empty(){return this.claimed===0&&!this.joined()}},Qt=[`audio/webm;codecs=opus`,`audio/webm`,`audio/mp4`,`audio/ogg;codecs=opus`,`audio/ogg`],$t=class{appState;stateMachine;client;openMeter;now;recorder=null;stream=null;chunks=[];mimeType=``;onChange=()=>void 0;onTranscript=async()=>void 0;meter=null;listener=null;detector;pauses;segments=new Zt;constructor(e=y,t=b,n=r,i=Xt,a=()=>Date.now(),o={}){this.appState=e,this.stateMachine=t,this.client=n,this.openMeter=i,this.now=a,this.detector=new Jt(o),this.pauses=new Yt(o)}get streaming(){return!!this.appState.settings?.stt_streaming}configure(e,t){this.onChange=e,this.onTranscript=t}get recording(){return this.recorder?.state===`recording`}async start(e=!1){if(!this.recording){if(!this.appState.settings||this.appState.settings.stt_provider===`disabled`){this.appState.uiError=`Speech-to-text is disabled. Enable OpenAI STT in Settings.`,this.onChange();return}if(!navigator.mediaDevices?.getUserMedia||!window.MediaRecorder){this.appState.uiError=`This browser cannot record microphone audio.`,this.onChange();return}try{this.stream=await navigator.mediaDevices.getUserMedia({audio:!0}),this.mimeType=en(),this.chunks=[],this.recorder=this.mimeType?new MediaRecorder(this.stream,{mimeType:this.mimeType}):new MediaRecorder(this.stream),this.recorder.addEventListener(`dataavailable`,e=>{e.data.size&&this.chunks.push(e.data)}),this.recorder.start(250),this.segments.begin(),this.appState.partialTranscript=``,this.appState.recordingStartedAt=this.now(),this.stateMachine.transition(`recording`),e&&this.listenForTheEnd()}catch(e){this.cleanup(),this.appState.uiError=p(e,`Microphone access was denied or unavailable.`),this.stateMachine.transition(`error`)}this.onChange()}}listenForTheEnd(){let e=this.stream;e&&(this.meter=this.openMeter(e),this.detector.begin(this.now()),this.pauses.begin(),this.listener=setInterval(()=>{let e=this.meter;if(!e||!this.recording)return;let t=this.detector.observe(e.level(),this.now());if(t===`too_long`){this.appState.uiError=`Listening stopped after a minute. Hold the microphone button to record instead.`,this.stop();return}if(t===`ended`){this.stop();return}this.streaming&&this.pauses.observe(e.level(),this.now())&&this.cutSegment()},100))}async cutSegment(){let e=this.recorder;if(!e||e.state!==`recording`||!this.stream)return;let t=await this.closeRecorder(e);this.recording&&this.openRecorder(),t.size&&this.segments.claim(async()=>(await this.client.transcribe(t,tn(t.type))).text,e=>{this.appState.partialTranscript=e,this.onChange()})}openRecorder(){this.stream&&(this.chunks=[],this.recorder=this.mimeType?new MediaRecorder(this.stream,{mimeType:this.mimeType}):new MediaRecorder(this.stream),this.recorder.addEventListener(`dataavailable`,e=>{e.data.size&&this.chunks.push(e.data)}),this.recorder.start(250))}closeRecorder(e){let t=e.mimeType||this.mimeType||`audio/webm`,n=this.chunks;return new Promise(r=>{e.addEventListener(`stop`,()=>r(new Blob(n,{type:t})),{once:!0}),e.stop()})}async stop(){let e=this.recorder;if(!e||e.state!==`recording`)return;this.stopListening();let t=await new Promise(t=>{e.addEventListener(`stop`,()=>t(new Blob(this.chunks,{type:e.mimeType||this.mimeType||`audio/webm`})),{once:!0}),e.stop()});if(this.cleanup(),!t.size&&this.segments.empty){this.appState.partialTranscript=``,this.stateMachine.transition(`idle`),this.onChange();return}this.stateMachine.transition(`transcribing`),this.onChange();try{let e=await this.client.transcribe(t,tn(t.type)),n=await this.segments.finish(e.text);this.appState.partialTranscript=``,n?await this.onTranscript(n):this.appState.phase===`transcribing`&&this.stateMachine.transition(`idle`)}catch(e){this.appState.uiError=p(e,`Unable to transcribe this recording.`),this.stateMachine.transition(`error`)}finally{this.onChange()}}cancel(){this.recorder?.state===`recording`&&this.recorder.stop(),this.appState.partialTranscript=``,this.stopListening(),this.cleanup(),this.appState.phase===`recording`&&this.stateMachine.transition(`idle`),this.onChange()}stopListening(){this.listener!==null&&clearInterval(this.listener),this.listener=null,this.meter?.close(),this.meter=null}cleanup(){this.stopListening();for(let e of this.stream?.getTracks()??[])e.stop();this.stream=null,this.recorder=null,this.chunks=[],this.appState.recordingStartedAt=0}};function en(){return typeof MediaRecorder>`u`||typeof MediaRecorder.isTypeSupported!=`function`?``:Qt.find(e=>MediaRecorder.isTypeSupported(e))??``}function tn(e){return e.includes(`mp4`)?`audio.mp4`:e.includes(`ogg`)?`audio.ogg`:`audio.webm`}function nn(e,t,n){let r=!!y.settings?.stt_hands_free,a=Math.floor((Date.now()-y.recordingStartedAt)/1e3),o=y.phase===`recording`?`${r?`Listening`:`Recording`} ${a}s`:y.phase===`transcribing`?`Transcribing…`:r?`Tap to Talk`:`Hold to Talk`,s=i(`button`,{class:`talk-btn ${y.phase===`recording`?`active`:``}`,textContent:o,disabled:e&&y.phase!==`recording`,"data-testid":`talk-button`,title:rn()??`Speech is transcribed on this machine.`,...r?{onclick:()=>{if(y.phase===`recording`){n.stop();return}t(),n.start(!0)}}:{onpointerdown:()=>{t(),n.start()},onpointerup:()=>void n.stop(),onpointercancel:()=>void n.stop(),onpointerleave:e=>{e.buttons===1&&n.stop()}}}),c=rn();return c?i(`div`,{class:`talk-control`},[s,i(`span`,{class:`meta talk-destination`,"data-testid":`talk-destination`,textContent:c})]):s}function rn(){let e=y.settings?.stt_provider??`disabled`;return e===`disabled`||e===`local`?null:`Recordings are sent to OpenAI to be transcribed.`}var an=class{onRoute;listening=!1;constructor(e){this.onRoute=e}start(){this.listening||(this.listening=!0,window.addEventListener(`hashchange`,this.handleHash),this.onRoute(U(window.location.hash)))}stop(){this.listening&&(this.listening=!1,window.removeEventListener(`hashchange`,this.handleHash))}home(e=!1){this.go(`#/`,e)}chat(e,t=!1){this.go(`#/chats/${encodeURIComponent(e)}`,t)}settings(e=`General`,t=!1){this.go(`#/settings/${encodeURIComponent(e)}`,t)}handleHash=()=>{this.onRoute(U(window.location.hash))};go(e,t){if(window.location.hash===e){this.onRoute(U(e));return}t?window.history.replaceState(null,``,e):window.location.hash=e,t&&this.onRoute(U(e))}};function U(e){let[t,n]=e.replace(/^#\/?/,``).split(`/`,2);return t===`chats`&&n?{kind:`chat`,chatId:decodeURIComponent(n)}:t===`settings`?{kind:`settings`,section:decodeURIComponent(n||`General`)}:{kind:`home`}}function on(e){let t=xe(e.query),n=_e.map(e=>({...e,sections:e.sections.filter(e=>t.includes(e))})).filter(e=>e.sections.length);return i(`aside`,{class:`settings-nav glass`},[i(`input`,{class:`settings-search`,type:`search`,placeholder:`Search settings`,value:e.query,"aria-label":`Search settings`,"data-testid":`settings-search`,oninput:t=>e.onQuery(t.currentTarget.value),onkeydown:n=>{n.key!==`Enter`||!t.length||(n.preventDefault(),e.onOpen(t[0]))}}),i(`div`,{class:`settings-nav-list`},n.length?n.map(t=>i(`div`,{class:`settings-nav-group`},[i(`div`,{class:`settings-nav-group-title`,textContent:t.name}),...t.sections.map(t=>i(`button`,{class:`settings-nav-item ${t===e.section?`active`:``}`,textContent:ye(t),"data-testid":`settings-nav-${sn(t)}`,onclick:()=>e.onOpen(t)}))])):[i(`p`,{class:`meta settings-search-empty`,textContent:`Nothing matches that.`})])])}function sn(e){return e.toLowerCase().replace(/\s+/g,`-`)}var cn=class{renderApp;client;openPreview;items=[];mode=null;loading=!1;error=``;constructor(e,t,n=()=>void 0){this.renderApp=e,this.client=t,this.openPreview=n}isOpen(e){return this.mode===e}close(){this.mode=null}async open(e){this.mode=e,this.renderApp(),this.items.length||await this.load()}node(e){return i(`div`,{class:`identity-media-picker`,"data-testid":`identity-media-picker-${e.mode}`},[i(`div`,{class:`task-model-head`},[i(`strong`,{textContent:e.mode===`reference`?`Recent generated images`:`Choose an image`}),i(`button`,{class:`icon-btn`,textContent:`✕ Close`,onclick:()=>{this.close(),this.renderApp()}})]),e.blockedMessage?i(`div`,{class:`provider-check-message`,textContent:e.blockedMessage}):null,this.loading?i(`div`,{class:`meta`,textContent:`Loading images…`}):null,this.error?i(`div`,{class:`provider-check-message`,textContent:this.error}):null,!this.loading&&!this.error&&!this.items.length?i(`div`,{class:`settings-empty-state`,textContent:`No generated images are available yet.`}):null,i(`div`,{class:`identity-media-grid`},this.items.map(t=>i(`div`,{class:`identity-media-option`},[i(`button`,{class:`identity-media-preview-button`,title:`Open larger view`,"aria-label":`Open generated image preview`,onclick:()=>this.openPreview(t.content_url)},[i(`img`,{src:t.content_url,alt:`Generated image available for selection`,loading:`lazy`})]),i(`div`,{class:`meta`,textContent:d(t.created_at)}),i(`button`,{class:`pill-btn`,textContent:e.actionLabel,disabled:e.actionDisabled,onclick:()=>void e.onUse(t)})]))),i(`button`,{class:`pill-btn`,textContent:`Refresh images`,disabled:this.loading,onclick:()=>void this.load(!0)})])}async load(e=!1){if(!(this.loading||this.items.length&&!e)){this.loading=!0,this.error=``,this.renderApp();try{this.items=(await this.client.mediaLibrary(`image`,100)).items}catch(e){this.error=p(e,`Generated images could not be loaded.`)}finally{this.loading=!1,this.renderApp()}}}},ln=class{appState;client;renderApp;entries=[];presets=[];busy=!1;loadedPersonaId=``;constructor(e,t,n){this.appState=e,this.client=t,this.renderApp=n}async refresh(e){this.busy=!0,this.loadedPersonaId=e;try{this.entries=(await this.client.libraryEntries(e)).items,this.presets=(await this.client.mediaPresets()).items}catch(e){this.appState.settingsError=p(e,`Unable to load kept pictures.`)}finally{this.busy=!1,this.renderApp()}}node(e,t=null,n=async()=>void 0){let r=t?.preferred_preset_ids??[],a=r=>void this.savePreferred(e,t,r,n),o=e!==this.loadedPersonaId;return D([E(`Preferred recipes`,`Which presets are known to work for this persona, best first. Routing prefers them when a request does not call for something else.`),this.preferences(r,a),E(`Kept pictures (${o?0:this.entries.length})`,`Pictures kept for reuse, with the description they were kept under. A later request is matched against that description, never against prompt text.`),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:this.busy?`Loading…`:`Show kept pictures`,disabled:this.busy||!e,"data-testid":`library-refresh`,onclick:()=>void this.refresh(e)})]),o?i(`p`,{class:`meta`,textContent:`Choose a persona and show its kept pictures.`}):this.entries.length?i(`ul`,{class:`library-entries`,"data-testid":`library-entries`},this.entries.map(e=>this.entry(e))):i(`p`,{class:`meta`,textContent:`Nothing kept yet. Pictures are kept automatically once they are made with a description.`})])}async savePreferred(e,t,n,r){if(!(!e||!t)){t.preferred_preset_ids=n,this.renderApp();try{await this.client.updateVisualIdentity(e,{...t,preferred_preset_ids:n}),await r()}catch(e){this.appState.settingsError=p(e,`Unable to save preferred recipes.`),await r().catch(()=>void 0)}this.renderApp()}}preferences(e,t){let n=e=>this.presets.find(t=>t.id===e)?.name??e,r=this.presets.filter(t=>!e.includes(t.id));return i(`div`,{class:`preset-preferences`,"data-testid":`preset-preferences`},[e.length?i(`ol`,{class:`routing-shortlist`},e.map((r,a)=>i(`li`,{},[i(`span`,{class:`routing-shortlist-title`,textContent:n(r)}),i(`div`,{class:`chips`},[a?i(`button`,{class:`pill-btn`,textContent:`Move up`,onclick:()=>{let n=[...e];[n[a-1],n[a]]=[n[a],n[a-1]],t(n)}}):null,i(`button`,{class:`pill-btn danger`,textContent:`Remove`,"data-testid":`preference-remove-${r}`,onclick:()=>t(e.filter(e=>e!==r))})])]))):i(`p`,{class:`meta`,textContent:`No preferred recipe yet, so routing decides on its own.`}),r.length?i(`select`,{class:`search-input`,"data-testid":`preference-add`,onchange:n=>{let r=n.currentTarget.value;r&&t([...e,r])}},[i(`option`,{value:``,textContent:`Add a preferred recipe…`}),...r.map(e=>i(`option`,{value:e.id,textContent:e.name}))]):null])}entry(e){let t=e.scene??{},n=[t.subject,t.action,t.setting].filter(Boolean).join(`, `);return i(`li`,{class:`library-entry`},[i(`img`,{class:`library-thumb`,src:e.content_url,alt:n||`Kept picture`}),i(`div`,{class:`library-entry-body`},[i(`span`,{textContent:n||`No description recorded.`}),i(`span`,{class:`meta`,textContent:e.state===`retired`?`Retired: past the keep limit, so it will not be sent again. The picture itself is untouched.`:e.state===`served`?`Sent ${e.served_count} time${e.served_count===1?``:`s`}.`:`Ready to send.`})]),i(`button`,{class:`pill-btn danger`,textContent:`Forget`,title:`Stop reusing this picture. The picture itself stays.`,"data-testid":`library-forget-${e.id}`,onclick:()=>void this.forget(e)})])}async forget(e){this.busy=!0,this.renderApp();try{await this.client.deleteLibraryEntry(e.id),this.entries=this.entries.filter(t=>t.id!==e.id)}catch(e){this.appState.settingsError=p(e,`Unable to forget that picture.`)}finally{this.busy=!1,this.renderApp()}}},un={reference_adapter:`Condition generation on the reference image`,identity_pass:`Replace the face after generation`},dn=`How the persona’s face is produced. Conditioning applies the approved reference while the image is being made. A later pass generates the picture first and then replaces the face, which works with checkpoints no adapter can condition but cannot change pose or lighting. Both are configured in Media Catalog, and every picture records which one produced its face.`;function fn(e){let t=e.available_mechanisms??[],n=e.conditioning_mechanism??`reference_adapter`;return t.includes(n)?[...t]:[n,...t]}function pn(e,t,n,r,a){return i(`button`,{class:`identity-thumb-button`,title:`Open larger view`,"aria-label":t,onclick:()=>a(e)},[i(`img`,{class:r,src:e,alt:n})])}function mn(e){return i(`div`,{class:`persona-card`},[E(`Activity history`,`An owner-scoped audit of reference, profile, and comparison changes.`),e.length?i(`div`,{class:`identity-audit-list`},e.slice(0,30).map(e=>i(`div`,{class:`manager-row`},[i(`strong`,{textContent:F(e.action)}),i(`span`,{class:`meta`,textContent:d(e.created_at)})]))):i(`div`,{class:`meta`,textContent:`No visual identity activity has been recorded.`})])}function hn(e,t,n,r=()=>void 0,a=()=>void 0){let o=e.approved_reference_count>0,s=e.conditioning_fallback===`require_conditioning`;return i(`div`,{class:`persona-card identity-readiness-card`},[i(`div`,{class:`task-model-head`},[i(`div`,{},[i(`strong`,{textContent:`${t} visual identity`}),i(`div`,{class:`meta`,textContent:`A quick view of what is actually ready.`})]),i(`span`,{class:`provider-status ${n?`ok`:`fail`}`,textContent:n?`Enabled`:`Not enabled`})]),i(`div`,{class:`settings-readiness-list`},[j(`Reference image`,o?`${e.approved_reference_count} approved`:`Add and approve at least one image`,o?`ready`:`attention`,`A reviewed image that defines how this persona should look. References remain private protected media.`),j(`Reference-aware generation`,e.generation_workflow_configured?`An identity-capable ComfyUI workflow is configured`:`Not configured; ComfyUI needs an identity model plus a bound workflow in Media Catalog`,e.generation_workflow_configured?`ready`:`attention`,`Install and test an identity graph such as IPAdapter, InstantID, PuLID, or PhotoMaker in ComfyUI. Then add its API-format workflow in Media Catalog with feature identity_control and explicit identity_image_bindings.`),j(`Optional comparison`,e.verification_configured?`Verifier settings are configured`:`Off; generated images will remain unverified`,e.verification_configured?`ready`:`off`,`An optional verifier can compare a finished face with the reference. It cannot improve generation.`),j(`When identity control is unavailable`,s?`Block the request until reference-aware generation is ready`:`Allow a clearly labeled unconditioned image`,s?`attention`:`off`,`This controls pre-generation fallback when no compatible identity workflow can run. It is separate from face comparison after generation.`),j(`When comparison fails`,e.failure_policy===`block_claim`?`Hide the failed image`:`Show the image with an unverified label`,e.failure_policy===`block_claim`?`attention`:`off`,e.verification_configured?`This policy applies after the optional comparison service evaluates a generated image.`:`This saved policy will take effect only if the optional comparison service is configured later.`)]),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:e.generation_workflow_configured?`Review identity control setup`:`Set up identity control`,"data-testid":`identity-configure-generation`,onclick:r}),i(`button`,{class:`pill-btn`,textContent:e.verification_configured?`Review optional comparison`:`Configure optional comparison`,"data-testid":`identity-configure-comparison`,onclick:a})])])}function gn(e,t){let n=e.conditioning_mechanism??`reference_adapter`,r=fn(e);if(r.length<2)return M(`How the face is produced`,i(`span`,{class:`meta`,"data-testid":`identity-mechanism`,textContent:un[n]}),dn);let a=P(n,r,n=>{e.conditioning_mechanism=n,t()},e=>un[e]??e);return a.dataset.testid=`identity-mechanism`,M(`How the face is produced`,a,dn)}function _n(e,t,n,r=()=>void 0){let a={allow_unconditioned:`Generate and label an unconditioned image`,require_conditioning:`Block until identity control is ready`};return i(`div`,{class:`persona-card`},[E(`Identity generation behavior`,`How the persona’s face is produced, and what happens when that is not possible. What happens after generation, when the optional comparison service disagrees, is in the advanced section.`),gn(e,r),M(`When identity control is unavailable`,P(e.conditioning_fallback??`allow_unconditioned`,[`allow_unconditioned`,`require_conditioning`],t=>{e.conditioning_fallback=t},e=>a[e]??e),`Allowing fallback never claims a match: the resulting image is explicitly labeled unconditioned and may not resemble the persona.`),M(`Maximum generation attempts`,N(String(e.max_generation_attempts),t=>{e.max_generation_attempts=Math.round(Tt(t,1,10,e.max_generation_attempts))},`number`),`The maximum number of bounded generation or correction attempts for one request.`),i(`button`,{class:`pill-btn`,textContent:`Save identity behavior`,disabled:t,"data-testid":`identity-behavior-save`,onclick:n})])}function vn(e,t,n){let r={show_unverified:`Show the image with an “unverified” label`,block_claim:`Hide the image when comparison fails`};return i(`div`,{class:`persona-card`},[E(`Comparison outcome`,`What to do with a finished image when the optional comparison service scores it below the threshold. None of this runs unless a comparison service is configured.`),M(`When optional comparison fails`,P(e.failure_policy,[`show_unverified`,`block_claim`],t=>{e.failure_policy=t},e=>r[e]??e),`This applies only after a configured comparison service evaluates a generated image.`),M(`Comparison threshold`,N(String(e.acceptance_threshold),t=>{e.acceptance_threshold=Tt(t,0,1,e.acceptance_threshold)},`number`),`A higher score is stricter. Calibrate this with representative generated images before enabling blocking.`),i(`button`,{class:`pill-btn`,textContent:`Save comparison outcome`,disabled:t,"data-testid":`identity-comparison-policy-save`,onclick:n})])}function yn(e,t,n,r){return M(`Persona`,P(e,t,r,n),`Choose whose reference images, appearance guidance, kept pictures, and validation history you want to manage.`)}var bn=class{renderApp;appState;client;dialogs;openIdentitySetup;selectedFile=null;attested=!1;providerResult=``;mediaPicker;library;advancedOpen=!1;constructor(e,t,n,r,i=()=>void 0){this.renderApp=e,this.appState=t,this.client=n,this.dialogs=r,this.openIdentitySetup=i,this.mediaPicker=new cn(e,n,e=>this.openImage(e)),this.library=new ln(t,n,e)}async refresh(){this.appState.identitySelectedPersonaId??=this.appState.personas[0]?.id??null;let e=this.appState.identitySelectedPersonaId;this.appState.identityBusy=!0;try{this.appState.identitySettings=await this.client.identitySettings(),e&&await this.reloadPersona(e),this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`Visual identity settings could not be loaded.`)}finally{this.appState.identityBusy=!1,this.renderApp()}}nodes(){let e=this.appState.identitySelectedPersonaId,t=e?this.appState.identityProfiles[e]:null;return[k(`Everything about a persona's pictures`,`How it looks, the references that make it recognizable, and the pictures kept for reuse. Reference-aware generation is configured in Media Catalog before a reference can influence new pictures.`),this.personaSelector(),t?this.profileStack(t):i(`div`,{class:`settings-empty-state`,textContent:`Choose a persona to manage its appearance.`}),this.library.node(e??``,t,()=>this.reloadPersona(e??``))]}personaSelector(){return yn(this.appState.identitySelectedPersonaId??``,this.appState.personas.map(e=>e.id),e=>this.personaName(e),e=>{this.appState.identitySelectedPersonaId=e||null,this.mediaPicker.close(),this.selectedFile=null,this.attested=!1,this.refresh()})}profileStack(e){let t=e.consent_status===`granted`,n=this.personaName(e.persona_id),r=this.appState.identityValidations[e.persona_id]??[],a=this.appState.identityEvents[e.persona_id]??[];return i(`div`,{class:`identity-profile-stack`,"data-testid":`identity-profile-stack`},[hn(e,n,t,()=>this.openIdentitySetup(e.persona_id),()=>{this.advancedOpen=!0,this.renderApp()}),t?this.referenceManager(e,n):this.enablementCard(e.persona_id,n),t?this.appearanceCard(e,n):null,t?_n(e,this.appState.identityBusy,()=>void this.saveProfile(e),()=>this.renderApp()):null,A(`Advanced identity controls and diagnostics`,`These controls tune comparison and troubleshooting. They are not required to store ${n}’s reference image, and a verifier cannot make generated images look more like the reference.`,[this.providerCard(this.appState.identitySettings),t?vn(e,this.appState.identityBusy,()=>void this.saveProfile(e)):null,this.validationManager(e,r),mn(a),t?this.dangerCard(e.persona_id,n):null],{open:this.advancedOpen,testId:`identity-advanced-settings`,onToggle:e=>{this.advancedOpen=e}})])}enablementCard(e,t){return i(`div`,{class:`persona-card settings-action-card`},[E(`Set up ${t}’s appearance`,`Nice Assistant will privately store reference images you choose for ${t}. For a fictional AI persona, this confirms that you created the image or have permission to use it.`),i(`button`,{class:`send-btn`,textContent:`Enable visual identity for ${t}`,disabled:this.appState.identityBusy,"data-testid":`identity-enable`,onclick:()=>void this.enableIdentity(e,t)})])}referenceManager(e,t){let n=e.references.filter(e=>e.review_status!==`deleted`);return i(`div`,{class:`persona-card`,"data-testid":`identity-reference-manager`},[E(`${t}’s reference images`,`Use a clear image that represents how this persona should look. New images stay pending until you approve them.`),i(`label`,{class:`setting-row identity-file-row`},[i(`span`,{textContent:`Choose an image from this device`}),i(`input`,{type:`file`,accept:`image/png,image/jpeg,image/webp`,"data-testid":`identity-reference-file`,onchange:e=>{this.selectedFile=e.currentTarget.files?.[0]??null,this.renderApp()}})]),this.selectedFile?i(`div`,{class:`selected-file-note`,textContent:`Selected: ${this.selectedFile.name}`}):null,i(`label`,{class:`checkbox-row identity-attestation`},[i(`input`,{type:`checkbox`,checked:this.attested,onchange:e=>{this.attested=e.currentTarget.checked,this.renderApp()}}),`I created this image or have permission to use it.`]),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.appState.identityBusy?`Adding…`:`Add selected image`,disabled:!this.selectedFile||!this.attested||this.appState.identityBusy,"data-testid":`identity-reference-upload`,onclick:()=>void this.uploadReference(e.persona_id)}),i(`button`,{class:`pill-btn`,textContent:`Choose from generated images`,disabled:this.appState.identityBusy,"data-testid":`identity-reference-gallery-open`,onclick:()=>void this.mediaPicker.open(`reference`)})]),this.mediaPicker.isOpen(`reference`)?this.mediaPicker.node({mode:`reference`,actionLabel:`Use as reference`,actionDisabled:this.appState.identityBusy||!this.attested,blockedMessage:this.attested?void 0:`Confirm above that you created the image or have permission to use it.`,onUse:t=>this.referenceFromMedia(e.persona_id,t.id)}):null,n.length?i(`div`,{class:`identity-reference-list`},n.map(e=>this.referenceCard(e,t))):i(`div`,{class:`settings-empty-state`,textContent:`No reference images have been added for ${t}.`})])}appearanceCard(e,t){return i(`div`,{class:`persona-card`},[E(`Appearance guidance`,`Describe stable details that should remain recognizable as ${t}. This helps generation prompts but does not replace a reference-aware workflow.`),wt(`How ${t} should look`,e.appearance_description,t=>{e.appearance_description=t},`Include stable traits such as hair, eyes, facial features, body type, and other defining details.`),i(`button`,{class:`send-btn`,textContent:`Save appearance guidance`,disabled:this.appState.identityBusy,onclick:()=>void this.saveProfile(e)})])}providerCard(e){if(!e)return i(`div`,{class:`persona-card`,textContent:`Verifier settings are unavailable.`});let t=e.provider===`compreface`;return i(`div`,{class:`persona-card identity-provider-card`},[E(`Optional identity comparison service`,`A verifier compares a finished image with the approved reference. It does not improve generation, so leave it off until reference-aware generation is useful.`),M(`Comparison service`,P(e.provider,[`disabled`,`compreface`],t=>{e.provider=t,this.renderApp()},e=>e===`disabled`?`Off`:`CompreFace`),`CompreFace is a separately deployed LAN service used only for face comparison.`),t?M(`CompreFace service address`,N(e.base_url,t=>{e.base_url=t},`url`),`The private-LAN address of the CompreFace service.`):null,t?M(`CompreFace API key`,N(e.api_key,t=>{e.api_key=t},`password`),`A verification API key created in CompreFace and encrypted by Nice Assistant.`):null,t?M(`Stop waiting after (seconds)`,N(String(e.timeout_seconds),t=>{e.timeout_seconds=Tt(t,1,120,e.timeout_seconds)},`number`),`Bounds each comparison request so an unavailable verifier cannot hang generation indefinitely.`):null,i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.appState.identityBusy?`Saving…`:`Save comparison service`,disabled:this.appState.identityBusy,"data-testid":`identity-provider-save`,onclick:()=>void this.saveProvider()}),t?i(`button`,{class:`pill-btn`,textContent:this.appState.identityBusy?`Checking…`:`Test connection`,disabled:this.appState.identityBusy,onclick:()=>void this.checkProvider()}):null,this.providerResult?i(`span`,{class:`provider-check-message`,textContent:this.providerResult}):null])])}validationManager(e,t){let n=this.personaName(e.persona_id);return i(`div`,{class:`persona-card`},[E(`Manual comparison`,`Choose one of your generated images and compare its face with the approved reference without changing the image.`),i(`p`,{class:`meta`,textContent:e.validation_ready?`Choose a generated image to compare with ${n}’s approved reference.`:`Manual comparison becomes available after an approved reference and comparison service are configured.`}),i(`button`,{class:`pill-btn`,textContent:`Choose an image to compare`,disabled:!e.validation_ready||this.appState.identityBusy,"data-testid":`identity-validation-gallery-open`,onclick:()=>void this.mediaPicker.open(`validation`)}),this.mediaPicker.isOpen(`validation`)?this.mediaPicker.node({mode:`validation`,actionLabel:`Compare image`,actionDisabled:this.appState.identityBusy,onUse:t=>this.validateMedia(e.persona_id,t.id)}):null,t.length?i(`div`,{class:`identity-validation-list`},t.map(e=>i(`div`,{class:`identity-validation-card`},[pn(this.client.mediaUrl(e.candidate_media_id),`Open compared image for ${n}`,`Compared with ${n}`,`identity-validation-thumb`,e=>this.openImage(e)),i(`div`,{},[i(`strong`,{textContent:e.claim_status===`verified`?`Looks like the persona`:F(e.claim_status)}),i(`div`,{class:`meta`,textContent:`${d(e.created_at)}${e.score===null?``:` · ${(e.score*100).toFixed(1)}% match`}`}),e.error?i(`div`,{class:`provider-check-message`,textContent:e.error.message}):null])]))):i(`div`,{class:`meta`,textContent:`No images have been compared manually.`})])}referenceCard(e,t){let n=e.review_status===`approved`?e.is_primary?`Primary reference`:`Approved reference`:e.review_status===`pending`?`Needs your approval`:`Rejected reference`;return i(`div`,{class:`identity-reference-card`,"data-testid":`identity-reference-${e.id}`},[e.content_url?pn(e.content_url,`Open ${t} reference image`,`${t} reference`,`identity-reference-thumb`,e=>this.openImage(e)):i(`div`,{class:`identity-reference-thumb missing`,textContent:`Unavailable`}),i(`div`,{class:`identity-reference-detail`},[i(`strong`,{textContent:n}),i(`div`,{class:`meta`,textContent:`${e.width}×${e.height} · ${f(e.byte_size)}`}),e.review_status===`pending`?i(`div`,{class:`meta`,textContent:`Approve this only if it is a good representation of ${t}.`}):null,e.rejection_reason?i(`div`,{class:`provider-check-message`,textContent:e.rejection_reason}):null,i(`div`,{class:`chips`},[e.review_status===`pending`?i(`button`,{class:`send-btn`,textContent:`Approve as ${t}`,onclick:()=>void this.approveReference(e.id)}):null,e.review_status===`pending`?i(`button`,{class:`pill-btn`,textContent:`Not this persona`,onclick:()=>void this.rejectReference(e.id)}):null,i(`button`,{class:`icon-btn danger`,textContent:`Delete`,onclick:()=>void this.deleteReference(e.id)})])])])}dangerCard(e,t){return i(`div`,{class:`persona-card settings-danger-zone`},[i(`h4`,{textContent:`Remove visual identity data`}),i(`p`,{class:`meta`,textContent:`This permanently deletes ${t}’s stored reference files and cancels active comparisons.`}),i(`button`,{class:`pill-btn danger`,textContent:`Disable and delete ${t}’s references`,disabled:this.appState.identityBusy,onclick:()=>void this.disableIdentity(e,t)})])}async saveProvider(){let e=this.appState.identitySettings;e&&await this.run(async()=>{this.appState.identitySettings=await this.client.updateIdentitySettings(e),this.providerResult=e.provider===`disabled`?`Comparison is off.`:`Comparison service saved.`;let t=this.appState.identitySelectedPersonaId;t&&await this.reloadPersona(t)})}openImage(e){this.appState.chatImagePreview=e,this.renderApp()}async checkProvider(){await this.run(async()=>{let e=await this.client.checkIdentityProvider();this.providerResult=`${F(String(e.status))}: ${String(e.message??``)}`})}async saveProfile(e){await this.run(async()=>{try{this.appState.identityProfiles[e.persona_id]=await this.client.updateVisualIdentity(e.persona_id,e)}catch(t){throw await this.reloadPersona(e.persona_id).catch(()=>void 0),t}})}async enableIdentity(e,t){await this.dialogs.confirm(`Enable persistent visual identity`,`Nice Assistant will store reference images you choose for ${t} and may compare generated images with them. For fictional personas, this confirms your right to use the images; it does not claim the persona is a real person giving consent.`,`Enable visual identity`)&&await this.run(async()=>{this.appState.identityProfiles[e]=await this.client.grantIdentityConsent(e)})}async disableIdentity(e,t){await this.dialogs.confirm(`Disable visual identity and delete references`,`Permanently delete all stored reference files for ${t} and cancel active comparisons? The activity record remains, but the images cannot be restored.`,`Disable and delete`)&&await this.run(async()=>{this.appState.identityProfiles[e]=await this.client.withdrawIdentityConsent(e)})}async uploadReference(e){if(!this.selectedFile||!this.attested){this.appState.settingsError=`Choose an image and confirm that you have permission to use it.`,this.renderApp();return}await this.run(async()=>{await this.client.uploadIdentityReference(e,this.selectedFile,`user_upload`),this.selectedFile=null,this.attested=!1,await this.reloadPersona(e)})}async referenceFromMedia(e,t){this.attested&&await this.run(async()=>{await this.client.identityReferenceFromMedia(e,t),this.attested=!1,this.mediaPicker.close(),await this.reloadPersona(e)})}async approveReference(e){let t=this.appState.identitySelectedPersonaId;t&&await this.run(async()=>{await this.client.approveIdentityReference(e),await this.reloadPersona(t)})}async rejectReference(e){let t=this.appState.identitySelectedPersonaId;if(!t)return;let n=await this.dialogs.prompt(`Reject reference`,`Why is this not a good representation of the persona?`,`Does not represent this persona.`);n!==null&&await this.run(async()=>{await this.client.rejectIdentityReference(e,n),await this.reloadPersona(t)})}async deleteReference(e){let t=this.appState.identitySelectedPersonaId;t&&await this.dialogs.confirm(`Delete reference image`,`Permanently delete this stored reference image? The deletion will remain in the activity history.`,`Delete image`)&&await this.run(async()=>{await this.client.deleteIdentityReference(e),await this.reloadPersona(t)})}async validateMedia(e,t){await this.run(async()=>{let n=await this.client.validateIdentityMedia(e,t);this.mediaPicker.close(),await this.waitJob(n.job.id),await this.reloadPersona(e)})}async waitJob(e){let t=Date.now()+12e4;for(;Date.now()<t;){let t=await this.client.job(e);if([`completed`,`failed`,`cancelled`].includes(t.status))return;await new Promise(e=>window.setTimeout(e,250))}throw Error(`The comparison is still running. Reopen this section later to see the result.`)}async reloadPersona(e){let[t,n,r]=await Promise.all([this.client.visualIdentity(e),this.client.identityValidations(e),this.client.identityHistory(e)]);this.appState.identityProfiles[e]=t,this.appState.identityValidations[e]=n.items,this.appState.identityEvents[e]=r.items}async run(e){this.appState.identityBusy=!0,this.appState.settingsError=``,this.renderApp();try{await e()}catch(e){this.appState.settingsError=p(e,`Visual identity operation failed.`)}finally{this.appState.identityBusy=!1,this.renderApp()}}personaName(e){return this.appState.personas.find(t=>t.id===e)?.name??`Persona`}},xn=class{appState;client;renderApp;refreshCatalog;discovered=null;discoveryMessage=``;busy=!1;selected=new Set;constructor(e,t,n,r){this.appState=e,this.client=t,this.renderApp=n,this.refreshCatalog=r}node(e){return D([E(`Models — the look (${e.length} enabled)`,e.length===0?`No models yet, so nothing can be generated. Find the checkpoints ComfyUI already has below.`:e.length===1?`One model means every picture shares its look. Add more from ComfyUI and each becomes a recipe chats can pick.`:`Each model is a checkpoint file ComfyUI already has, and each one becomes a recipe chats can pick.`),e.length?i(`div`,{class:`chips`},e.map(e=>i(`span`,{class:`pill-tag`,textContent:e.name,title:e.external_id}))):null,i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.busy?`Asking ComfyUI…`:`Find models on ComfyUI`,disabled:this.busy,"data-testid":`catalog-discover-models`,onclick:()=>void this.discover()})]),this.discoveryMessage?i(`p`,{class:`meta`,"data-testid":`catalog-discovery-message`,textContent:this.discoveryMessage}):null,...this.discoveryList()])}discoveryList(){if(!this.discovered)return[];let e=this.discovered.filter(e=>!e.cataloged);return e.length?[i(`div`,{class:`catalog-discovery-list`,"data-testid":`catalog-discovery-list`},e.map(e=>i(`label`,{class:`catalog-discovery-row`},[i(`input`,{type:`checkbox`,checked:this.selected.has(e.name),"data-testid":`catalog-discovery-${e.name}`,onchange:t=>{t.currentTarget.checked?this.selected.add(e.name):this.selected.delete(e.name),this.renderApp()}}),i(`span`,{textContent:e.name})]))),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.selected.size?`Add ${this.selected.size} ${this.selected.size===1?`model`:`models`}`:`Add selected models`,disabled:this.busy||!this.selected.size,"data-testid":`catalog-add-selected`,onclick:()=>void this.addSelected()}),i(`button`,{class:`pill-btn`,textContent:`Select all`,disabled:this.busy,onclick:()=>{e.forEach(e=>this.selected.add(e.name)),this.renderApp()}})])]:[i(`p`,{class:`meta`,"data-testid":`catalog-discovery-complete`,textContent:`Every checkpoint ComfyUI reports is already in the catalog.`})]}async discover(){this.busy=!0,this.renderApp();try{let e=await this.client.comfyuiCheckpoints();this.discovered=e.ok?e.checkpoints:null,this.discoveryMessage=e.message,this.selected.clear()}catch(e){this.discovered=null,this.discoveryMessage=p(e,`ComfyUI could not be asked for its models.`)}finally{this.busy=!1,this.renderApp()}}async addSelected(){let e=[...this.selected];if(!e.length)return;this.busy=!0,this.renderApp();let t;try{t=await this.client.addModelsFromCheckpoints(e)}catch(e){this.appState.settingsError=p(e,`The models could not be added.`),this.busy=!1,this.renderApp();return}let n=t.skipped.map(e=>`${e.name}: ${e.reason}`).join(`; `),r=t.added.length?`Added ${t.added.length} ${t.added.length===1?`model`:`models`} — each has its own recipe now.`:`Nothing was added.`;this.discoveryMessage=n?`${r} Skipped ${n}.`:r,this.selected.clear();try{await this.refreshCatalog();let e=await this.client.comfyuiCheckpoints();e.ok&&(this.discovered=e.checkpoints)}catch{this.discoveryMessage+=` The list could not be refreshed — press the button again to update it.`}finally{this.busy=!1,this.renderApp()}}},Sn={reference_adapter:`Conditions generation on the reference`,identity_pass:`Replaces the face after generation`},Cn=class{renderApp;appState;client;refreshCatalog;dialogs;list=null;loadedModelId=``;busy=!1;checks={};presets=[];presetId=``;assetChoices={};constructor(e,t,n,r,i){this.renderApp=e,this.appState=t,this.client=n,this.refreshCatalog=r,this.dialogs=i}node(e,t){e&&e!==this.loadedModelId&&(this.loadedModelId=e,this.load(e));let n=this.list?.templates??[];return i(`div`,{class:`workflow-template-list`,"data-testid":`workflow-templates`},[E(`Start from a known-good workflow`,`These graphs ship with Nice Assistant, already wired to receive the request and the persona reference. Checking one asks ComfyUI whether the nodes and files it names are installed. Nothing here has been generation-tested on this deployment.`),this.list&&!this.list.model_architecture?i(`div`,{class:`meta`,"data-testid":`workflow-template-architecture-unknown`,textContent:`${t} has no declared model family, so every template is offered. Recording the family in the model's settings is what lets a mismatch be caught before it wastes a generation.`}):null,this.busy&&!n.length?i(`div`,{class:`meta`,textContent:`Loading templates…`}):n.length?i(`div`,{},n.map(t=>this.card(t,e))):i(`div`,{class:`settings-empty-state`,textContent:`No shipped workflow templates are available.`})])}card(e,t){let n=this.checks[e.id];return i(`div`,{class:`persona-card workflow-template-card`,"data-testid":`workflow-template-${e.id}`},[i(`div`,{class:`task-model-head`},[i(`div`,{},[i(`strong`,{textContent:e.name}),i(`div`,{class:`meta`,textContent:Sn[e.mechanism]??e.mechanism})]),i(`span`,{class:`provider-status ${e.installed_resource_id?`ok`:`idle`}`,"data-testid":`workflow-template-status-${e.id}`,textContent:e.installed_count>1?`Installed ✓ — ${e.installed_count} copies`:e.installed_resource_id?`Installed ✓`:`Not installed`})]),i(`p`,{class:`meta`,textContent:e.summary}),e.architecture_matches?null:i(`div`,{class:`settings-warning`,"data-testid":`workflow-template-mismatch-${e.id}`,textContent:`Built for ${e.architectures.join(`, `)} checkpoints, and this model is declared as ${this.list?.model_architecture}. It can still be installed, but likeness on a different family is unmeasured.`}),e.update_available?i(`div`,{class:`meta`,"data-testid":`workflow-template-update-${e.id}`,textContent:`A newer version of this template ships with Nice Assistant. Installing it adds a second workflow rather than rewriting the one you have, which may have been tuned.`}):null,i(`div`,{class:`meta`},[i(`strong`,{textContent:`You need to have installed:`}),i(`ul`,{},e.required_assets.map(e=>i(`li`,{textContent:e})))]),n?this.checkResult(n):null,...this.assetPickers(e,n),e.mechanism===`identity_pass`&&this.presets.length?M(`Add it to this recipe as a second pass`,this.presetSelect(),`The recipe generates the picture, and this pass replaces the face in it afterwards.`):null,i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:this.busy?`Checking…`:`Check against ComfyUI`,disabled:this.busy,"data-testid":`workflow-template-verify-${e.id}`,onclick:()=>void this.verify(e.id)}),i(`button`,{class:e.installed_resource_id?`pill-btn`:`send-btn`,textContent:this.busy?`Adding…`:e.installed_resource_id?`Install another copy`:`Add this workflow`,disabled:this.busy||!t,"data-testid":`workflow-template-install-${e.id}`,onclick:()=>void this.install(e,t)})])])}assetPickers(e,t){return(t?.asset_checks??[]).filter(e=>!e.available&&(e.options?.length??0)>0).map(t=>{let n=`${t.node_id}:${t.input_name}`,r=P(this.assetChoices[e.id]?.[n]??``,[``,...t.options??[]],t=>{this.assetChoices[e.id]={...this.assetChoices[e.id]??{},[n]:t}},e=>e||`Keep ${t.value}`);return r.dataset.testid=`workflow-template-asset-${e.id}-${t.input_name}`,M(`${t.node_type} needs a file for ${t.input_name}`,r,`The template names ${t.value}, which ComfyUI does not report. These are the files it does have for this input. Choosing one points the graph at your file instead of asking you to rename it.`)})}presetSelect(){let e=P(this.presetId,[``,...this.presets.map(e=>e.id)],e=>{this.presetId=e},e=>this.presets.find(t=>t.id===e)?.name??`Do not add it to a recipe yet`);return e.dataset.testid=`workflow-template-preset`,e}checkResult(e){let t=(e.asset_checks??[]).filter(e=>!e.available);return i(`div`,{class:`media-plan-preview plan-${e.provider_compatible?`ready`:`blocked`}`},[i(`strong`,{textContent:e.provider_compatible?`ComfyUI can run this`:F(e.status)}),i(`p`,{textContent:e.message}),e.missing_node_types?.length?i(`div`,{class:`meta capability-block-detail`,textContent:`Not installed: ${e.missing_node_types.join(`, `)}`}):null,...t.map(e=>i(`div`,{class:`meta capability-block-detail`,textContent:`${e.node_type} ${e.input_name}: ${e.value||`required file`} is not available`})),i(`div`,{class:`meta`,textContent:`This checks node types and the files nodes name. A model a node picks by device rather than by name cannot be checked from here, and no image has been generated.`})])}async load(e){this.busy=!0;try{let[t,n]=await Promise.all([this.client.workflowTemplates(e),this.client.mediaPresets()]);this.list=t,this.presets=n.items.filter(e=>e.kind===`image`)}catch(e){this.appState.settingsError=p(e,`Workflow templates could not be loaded.`)}finally{this.busy=!1,this.renderApp()}}async verify(e){this.busy=!0,this.appState.settingsError=``,this.renderApp();try{this.checks[e]=await this.client.verifyWorkflowTemplate(e)}catch(e){this.appState.settingsError=p(e,`ComfyUI could not be asked about this template.`)}finally{this.busy=!1,this.renderApp()}}async install(e,t){if(!(e.installed_resource_id&&!await this.dialogs.confirm(`Install another copy`,`"${e.name}" is already installed${e.installed_count>1?` (${e.installed_count} copies)`:``}. Install another separate copy?`,`Install another copy`))){this.busy=!0,this.appState.settingsError=``,this.renderApp();try{let n=e.mechanism===`identity_pass`?this.presetId:``,r=Object.entries(this.assetChoices[e.id]??{}).filter(([,e])=>e).map(([e,t])=>{let[n,r]=e.split(`:`);return{node_id:n??``,input_name:r??``,value:t}});await this.client.installWorkflowTemplate(e.id,t,``,n,r),this.appState.settingsSavedAt=Date.now(),await this.refreshCatalog(),this.loadedModelId=``}catch(e){this.appState.settingsError=p(e,`The workflow template could not be added.`)}finally{this.busy=!1,this.renderApp()}}}},wn=2e5,Tn=class{renderApp;appState;client;dialogs;finishSetup;refreshCatalog;setupOpen=!1;workflowJson=``;workflowPatch=null;inspection=null;binding=``;promptBinding=``;modelId=``;workflowName=`Identity control workflow`;inspectionResultNode=null;bindingFieldNode=null;promptBindingFieldNode=null;liveTestWarningNode=null;saveButton=null;templates;manualOpen=!1;constructor(e,t,n,r,i,a){this.renderApp=e,this.appState=t,this.client=n,this.dialogs=r,this.finishSetup=i,this.refreshCatalog=a,this.templates=new Cn(e,t,n,a,r)}open(){this.setupOpen=!0}node(){let e=this.appState.mediaCatalog;if(!e)return i(`div`);let t=e.resources.filter(e=>e.resource_type===`workflow`&&e.kind===`image`&&e.backend===`comfyui`&&e.features.includes(`identity_control`)).filter(e=>e.enabled&&e.compatible_model_ids.length>0&&Array.isArray(e.default_settings.identity_image_bindings)&&e.default_settings.identity_image_bindings.length>0),n=e.resources.filter(e=>e.enabled&&e.resource_type===`model`&&e.kind===`image`&&e.provider_key===`local-image`&&e.backend===`comfyui`);n.some(e=>e.id===this.modelId)||(this.modelId=n[0]?.id??``);let r=this.appState.mediaCatalogIdentitySetupIntent,a=r?.persona_id?this.appState.personas.find(e=>e.id===r.persona_id)?.name??`the selected persona`:`a selected persona`,o=this.setupOpen;return D([i(`div`,{class:`task-model-head`},[i(`div`,{},[i(`strong`,{textContent:`Identity control`}),i(`div`,{class:`meta`,textContent:`Reference-aware generation uses a real ComfyUI API workflow, not a filename or prompt-only identity claim.`})]),i(`span`,{class:`provider-status ${t.length?`ok`:`fail`}`,textContent:t.length?`Configured`:`Not configured`})]),r?.capability_request_id?i(`div`,{class:`settings-warning`,textContent:`The failed image request for ${a} requires identity_control. Import and check a compatible workflow here, then retry that image.`}):r?i(`div`,{class:`meta`,textContent:`Set up a reference-aware ComfyUI workflow for ${a}. No blocked image request is attached to this setup.`}):null,t.length?i(`div`,{class:`meta`,textContent:`${t.length} enabled identity workflow${t.length===1?``:`s`} can receive an approved persona reference.`}):i(`div`,{class:`settings-empty-state`,textContent:`No enabled identity_control workflow has an explicit reference-image binding and compatible ComfyUI base model.`}),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:o?`Hide identity setup`:t.length?`Review identity setup`:`Add identity control`,"data-testid":`identity-workflow-setup-toggle`,onclick:()=>{this.setupOpen=!o,this.renderApp()}}),r?.capability_request_id?i(`button`,{class:`send-btn`,textContent:this.appState.mediaCatalogBusy?`Starting retry…`:`Retry this image`,disabled:this.appState.mediaCatalogBusy,"data-testid":`identity-workflow-retry-plan`,onclick:()=>void this.retryImage()}):null]),...o?this.setupFields(n):[]],`identity-control-card`)}setupFields(e){let t=this.inspection,n=t?.identity_input_candidates??[],r=t?.request_input_candidates?.prompt??[],a=n.find(e=>W(e.node_id,e.input_name)===this.binding),o=r.find(e=>W(e.node_id,e.input_name)===this.promptBinding),s=!!(t?.provider_compatible&&this.workflowPatch&&a&&o&&this.modelId),c=R(`Or paste API workflow JSON`,this.workflowJson,e=>this.workflowChanged(e),!1,`Use ComfyUI API-format JSON. Browser-format workflow files cannot be executed by the provider API.`);c.querySelector(`textarea`)?.setAttribute(`data-testid`,`identity-workflow-json`),this.inspectionResultNode=t?this.inspectionResult(t):i(`div`,{class:`meta`,textContent:`No provider check has run. Saving metadata alone is not proof that ComfyUI can execute the workflow.`}),this.inspectionResultNode.dataset.testid=`identity-workflow-inspection-result`,this.bindingFieldNode=t&&n.length?z(`Persona reference image input`,this.binding,n.map(e=>W(e.node_id,e.input_name)),e=>{this.binding=e},`identity-workflow-binding`,e=>n.find(t=>W(t.node_id,t.input_name)===e)?.label||e,!1,`Nice Assistant uploads the approved reference only to this selected node and input. It does not infer custom-node bindings.`):null,this.promptBindingFieldNode=t&&r.length?z(`Prompt input`,this.promptBinding,r.map(e=>W(e.node_id,e.input_name)),e=>{this.promptBinding=e},`identity-workflow-prompt-binding`,e=>{let t=r.find(t=>W(t.node_id,t.input_name)===e);return t?`${t.label} — currently "${t.current_value}"`:e},!1,`The request is written into this input. Choose the positive prompt node; without it the workflow would render the text saved inside it and ignore what was asked for.`):t?i(`div`,{class:`settings-warning`,"data-testid":`identity-workflow-no-prompt-input`,textContent:`ComfyUI reports no text input that can receive the request. This workflow cannot be enabled, because it would render the text saved inside it instead of what was asked for.`}):null,this.liveTestWarningNode=t?.provider_compatible&&!t.live_tested?i(`div`,{class:`settings-warning`,textContent:`Provider-compatible, not generation-tested: no image has been generated yet. The first persona image request remains the live execution test.`}):null,this.saveButton=i(`button`,{class:`send-btn`,textContent:this.appState.mediaCatalogBusy?`Saving…`:`Save and enable identity control`,disabled:this.appState.mediaCatalogBusy||!s,"data-testid":`identity-workflow-save`,onclick:()=>void this.saveWorkflow()});let l=[L(`Workflow name`,this.workflowName,e=>{this.workflowName=e},`text`,!1,`A recognizable catalog name, such as Persona IPAdapter portrait workflow.`),i(`label`,{class:`setting-row identity-workflow-file-row`},[i(`span`,{textContent:`Import ComfyUI API workflow JSON`}),i(`input`,{type:`file`,accept:`application/json,.json`,"data-testid":`identity-workflow-file`,onchange:e=>void this.loadFile(e)})]),c,i(`button`,{class:`pill-btn`,textContent:this.appState.mediaCatalogBusy?`Checking provider…`:`Check workflow against ComfyUI`,disabled:this.appState.mediaCatalogBusy||e.length===0,"data-testid":`identity-workflow-inspect`,onclick:()=>void this.inspectWorkflow()}),this.inspectionResultNode,this.bindingFieldNode,this.promptBindingFieldNode,this.liveTestWarningNode,this.saveButton].filter(e=>!!e),u=e.find(e=>e.id===this.modelId);return[e.length?z(`Catalog base model to pair with this workflow`,this.modelId,e.map(e=>e.id),e=>{this.modelId=e,this.renderApp()},`identity-workflow-model`,t=>e.find(e=>e.id===t)?.name??t,!1,`This declares planning compatibility with the selected catalog model. Provider inspection does not verify that pairing; the first generation remains its live test.`):i(`div`,{class:`settings-warning`,textContent:`Add and enable a ComfyUI image base model before adding an identity workflow.`}),this.templates.node(this.modelId,u?.name??`This model`),A(`Import a workflow of your own instead`,`Export it from ComfyUI in API format. Nice Assistant checks the deployed nodes and named files, then asks which input receives the request and which receives the approved reference.`,l,{open:this.manualOpen,testId:`identity-workflow-manual`,onToggle:e=>{this.manualOpen=e}})].filter(e=>!!e)}inspectionResult(e){let t=(e.asset_checks??[]).filter(e=>!e.available);return i(`div`,{class:`media-plan-preview plan-${e.provider_compatible?`ready`:`blocked`}`},[i(`strong`,{textContent:e.provider_compatible?`Provider-compatible`:F(e.status)}),i(`p`,{textContent:e.message}),e.detected_node_types?.length?i(`div`,{class:`meta`,textContent:`Workflow node types: ${e.detected_node_types.join(`, `)}`}):null,e.missing_node_types?.length?i(`div`,{class:`meta capability-block-detail`,textContent:`Missing node types: ${e.missing_node_types.join(`, `)}`}):null,...t.map(e=>i(`div`,{class:`meta capability-block-detail`,textContent:`${e.node_type} ${e.input_name}: ${e.value||`required asset`} is not available`})),...(e.warnings??[]).map(e=>i(`div`,{class:`meta`,textContent:e}))])}async loadFile(e){let t=e.currentTarget.files?.[0];if(t){if(t.size>wn){this.appState.settingsError=`The ComfyUI workflow file is too large. Export a focused API workflow no larger than 200 KB.`,this.renderApp();return}try{this.workflowJson=await t.text(),this.workflowPatch=null,this.inspection=null,this.binding=``,this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`Unable to read the ComfyUI workflow file.`)}this.renderApp()}}parseWorkflow(){try{let e=JSON.parse(this.workflowJson||`{}`);if(!G(e))throw Error(`Workflow JSON must be an object.`);let t=G(e.prompt)?e.prompt:e;if(!Object.keys(t).length)throw Error(`Workflow JSON is empty.`);if(Dn(t)>wn)throw Error(`Workflow JSON must be no larger than 200 KB after parsing.`);return this.appState.settingsError=``,t}catch(e){return this.appState.settingsError=p(e,`The imported ComfyUI API workflow is not valid JSON.`),null}}async inspectWorkflow(){let e=this.parseWorkflow();if(!e){this.renderApp();return}this.appState.mediaCatalogBusy=!0,this.inspection=null,this.renderApp();try{let t=await this.client.inspectIdentityWorkflow(e);this.workflowPatch=e,this.inspection=t;let n=t.identity_input_candidates[0];this.binding=n?W(n.node_id,n.input_name):``;let r=t.request_input_candidates?.prompt?.[0];this.promptBinding=r?W(r.node_id,r.input_name):``}catch(e){this.appState.settingsError=p(e,`Unable to check the workflow against ComfyUI.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async saveWorkflow(){let e=this.inspection?.identity_input_candidates.find(e=>W(e.node_id,e.input_name)===this.binding),t=this.inspection?.request_input_candidates?.prompt?.find(e=>W(e.node_id,e.input_name)===this.promptBinding);if(!this.inspection?.provider_compatible||!this.workflowPatch||!e||!t||!this.modelId){this.appState.settingsError=`Check a provider-compatible workflow, choose its persona reference and prompt inputs, and select a base model before saving.`,this.renderApp();return}let n=this.inspection.request_input_candidates?.checkpoint??[],r=n.length===1?[{node_id:n[0].node_id,input_name:n[0].input_name}]:[];this.appState.mediaCatalogBusy=!0,this.appState.settingsError=``,this.renderApp();try{await this.client.createMediaCatalogResource({resource_type:`workflow`,kind:`image`,name:this.workflowName.trim()||`Identity control workflow`,provider_key:`local-image`,backend:`comfyui`,external_id:`identity-control-${Date.now().toString(36)}`,enabled:!0,priority:60,operations:[`generate`],domains:[`portrait`],content_tags:[],features:[`identity_control`],estimated_vram_mb:0,estimated_load_seconds:0,default_settings:{workflow_patch:this.workflowPatch,identity_image_bindings:[{node_id:e.node_id,input_name:e.input_name}],prompt_bindings:[{node_id:t.node_id,input_name:t.input_name}],...r.length?{checkpoint_bindings:r}:{}},notes:`Imported through guided identity control setup. Provider compatibility checked; live generation not yet tested.`,compatible_model_ids:[this.modelId]}),await this.refreshCatalog(),this.dialogs.info(`Identity control added`,`ComfyUI reported compatible nodes, configured workflow assets, and a reference input. ${r.length?`The graph will load the catalog model you paired it with, rather than the checkpoint it was saved with.`:`The graph keeps the checkpoint it was saved with, because it loads more than one; a preset that names a different base model will be refused.`} That pairing and generation are not live-tested until the next requested persona image runs.`)}catch(e){this.appState.settingsError=p(e,`Unable to save the identity workflow.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async retryImage(){let e=this.appState.mediaCatalogIdentitySetupIntent;if(e?.capability_request_id){this.appState.mediaCatalogBusy=!0,this.appState.settingsError=``,this.renderApp();try{let t=await this.client.retryCapability(e.capability_request_id);this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(n=>n.id!==e.capability_request_id&&n.id!==t.id),t].sort((e,t)=>e.requested_at-t.requested_at),[`queued`,`running`,`completed`].includes(t.status)?(this.appState.mediaCatalogIdentitySetupIntent=null,this.dialogs.info(`Image retry started`,`The image is now running under the current settings. Return to the chat to follow its compact progress.`),this.finishSetup()):this.appState.settingsError=t.error?.message||t.media_plan?.block?.message||`The image still cannot start. Review the identity control status below.`}catch(e){this.appState.settingsError=p(e,`Unable to retry the image.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}}workflowChanged(e){this.workflowJson=e,this.workflowPatch=null,this.inspection=null,this.binding=``;let t=En(e),n=t!==null&&t>wn?`This workflow is larger than the 200 KB catalog limit. Reduce it before checking the provider.`:`Workflow changed. Check it against ComfyUI again before saving.`;this.inspectionResultNode&&(this.inspectionResultNode.className=`meta`,this.inspectionResultNode.textContent=n),this.bindingFieldNode?.remove(),this.bindingFieldNode=null,this.promptBindingFieldNode?.remove(),this.promptBindingFieldNode=null,this.liveTestWarningNode?.remove(),this.liveTestWarningNode=null,this.saveButton&&(this.saveButton.disabled=!0)}};function W(e,t){return`${e}:${t}`}function G(e){return!!e&&typeof e==`object`&&!Array.isArray(e)}function En(e){try{let t=JSON.parse(e||`{}`);return G(t)?Dn(G(t.prompt)?t.prompt:t):null}catch{return null}}function Dn(e){return new TextEncoder().encode(JSON.stringify(e)).byteLength}var On=class{appState;client;renderApp;refreshCatalog;name=``;raw=``;message=``;busy=!1;pending=null;promptChoice=``;constructor(e,t,n,r){this.appState=e,this.client=t,this.renderApp=n,this.refreshCatalog=r}node(e){let t=e.filter(e=>e.backend===`comfyui`);return D([E(`Bring your own workflow`,`Paste a workflow exported from ComfyUI in API format: in ComfyUI, open the Workflow menu and choose Export (API). Ordinary saves, screenshots, and spreadsheets cannot be imported.`),L(`Workflow name`,this.name,e=>{this.name=e},`text`,!1,`Your label for this workflow in the catalog.`),R(`Workflow JSON (API format)`,this.raw,e=>{this.raw=e},!1,`The pasted graph is checked against ComfyUI before it is saved; nothing runs during the check.`),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.busy?`Checking with ComfyUI…`:`Check workflow`,disabled:this.busy||!t.length,"data-testid":`workflow-import-submit`,onclick:()=>void this.check()})]),...this.landingSpot(t),t.length?null:i(`p`,{class:`meta`,textContent:`Add a ComfyUI model first — a workflow needs a model to run on.`}),this.message?i(`p`,{class:`meta`,"data-testid":`workflow-import-message`,textContent:this.message}):null])}landingSpot(e){let t=this.pending;if(!t)return[];let n=t.inspection.request_input_candidates?.prompt??[];return[i(`div`,{class:`setting-row`},[i(`label`,{textContent:`Where should what the chat asks for land?`}),i(`select`,{class:`chip-select`,"data-testid":`workflow-import-prompt-choice`,onchange:e=>{this.promptChoice=e.currentTarget.value,this.renderApp()}},n.map(e=>{let t=`${e.node_id}:${e.input_name}`,n=String(e.current_value??``).slice(0,60);return i(`option`,{value:t,selected:t===this.promptChoice,textContent:n?`${e.label} — now "${n}"`:e.label})})),i(`p`,{class:`meta`,textContent:`The saved text shown beside each input is the best clue: pick the one holding the positive prompt.`})]),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.busy?`Adding…`:`Add "${t.name}"`,disabled:this.busy,"data-testid":`workflow-import-confirm`,onclick:()=>void this.create(e)}),i(`button`,{class:`pill-btn`,textContent:`Cancel`,disabled:this.busy,onclick:()=>{this.pending=null,this.message=``,this.renderApp()}})])]}async check(){let e=this.name.trim();if(!e){this.message=`Give the workflow a name first.`,this.renderApp();return}let t;try{if(t=JSON.parse(this.raw),!t||typeof t!=`object`||Array.isArray(t))throw Error(`not an object`)}catch{this.message=`That is not JSON. In ComfyUI use Workflow → Export (API), then paste the whole file.`,this.renderApp();return}this.busy=!0,this.pending=null,this.renderApp();try{let n=await this.client.inspectIdentityWorkflow(t,{},`general`),r=n.request_input_candidates?.prompt??[];if(!n.provider_compatible||!r.length){this.message=n.message||`ComfyUI could not accept this workflow.`,this.renderApp();return}let i=r[0];this.pending={name:e,patch:t,inspection:n},this.promptChoice=`${i.node_id}:${i.input_name}`,this.message=r.length>1?`ComfyUI accepted the graph and found ${r.length} text inputs. Choose where the prompt lands.`:`ComfyUI accepted the graph. Confirm to add it.`}catch(e){this.message=p(e,`The workflow could not be checked.`)}finally{this.busy=!1,this.renderApp()}}async create(e){let t=this.pending;if(!t)return;let[n,r]=this.promptChoice.split(`:`);if(!n||!r)return;let i=t.inspection.request_input_candidates?.seed?.[0],a=t.inspection.request_input_candidates?.checkpoint?.[0];this.busy=!0,this.renderApp();try{await this.client.createMediaCatalogResource({resource_type:`workflow`,kind:`image`,name:t.name,provider_key:`local-image`,backend:`comfyui`,external_id:`imported-${Date.now().toString(36)}`,enabled:!0,priority:50,operations:[`generate`],domains:[],content_tags:[],features:[],estimated_vram_mb:0,estimated_load_seconds:0,default_settings:{workflow_patch:t.patch,prompt_bindings:[{node_id:n,input_name:r}],...i?{seed_bindings:[{node_id:i.node_id,input_name:i.input_name}]}:{},...a?{checkpoint_bindings:[{node_id:a.node_id,input_name:a.input_name}]}:{}},notes:`Imported by pasting a ComfyUI API-format export.`,compatible_model_ids:a?e.map(e=>e.id):e.filter(e=>e.external_id===String(kn(t.patch)??``)).map(e=>e.id)});let o=t.inspection.request_input_candidates?.prompt?.find(e=>`${e.node_id}:${e.input_name}`===this.promptChoice);this.message=`"${t.name}" was added. The prompt lands on ${o?.label??`the chosen input`}`+(a?`, and presets will run their own model through it.`:`.`),this.name=``,this.raw=``,this.pending=null,await this.refreshCatalog()}catch(e){this.message=p(e,`The workflow could not be added.`)}finally{this.busy=!1,this.renderApp()}}};function kn(e){for(let t of Object.values(e)){if(!t||typeof t!=`object`)continue;let e=t.inputs?.ckpt_name;if(typeof e==`string`&&e)return e}return null}var An=[`natural_language`,`booru`,`hybrid`],jn=[`prefix`,`suffix`];function Mn(e){return e===`natural_language`?`Natural language`:e===`booru`?`Booru tags`:`Hybrid`}var Nn=class{appState;client;renderApp;presets=[];signals=[];pendingExport=null;pendingImport=null;openIds=new Set;dirtyIds=new Set;busy=!1;constructor(e,t,n){this.appState=e,this.client=t,this.renderApp=n}async refresh(){this.busy=!0;try{this.presets=(await this.client.mediaPresets()).items,this.signals=(await this.client.presetSignals()).items}catch(e){this.appState.settingsError=p(e,`Unable to load generation presets.`)}finally{this.busy=!1,this.renderApp()}}async clearSignals(e){try{await this.client.clearPresetSignals(e),this.signals=this.signals.filter(t=>t.preset_id!==e)}catch(e){this.appState.settingsError=p(e,`Unable to reset those counts.`)}this.renderApp()}async prepareExport(e){try{this.pendingExport=await this.client.exportPreset(e.id)}catch(e){this.appState.settingsError=p(e,`Unable to prepare that export.`)}this.renderApp()}saveExport(){let e=this.pendingExport;if(!e)return;let t=new Blob([JSON.stringify(e.bundle,null,2)],{type:`application/json`}),n=URL.createObjectURL(t),r=document.createElement(`a`);r.href=n,r.download=e.filename,r.click(),URL.revokeObjectURL(n),this.pendingExport=null,this.renderApp()}exportPreviewCard(){let e=this.pendingExport;return e?D([E(`What will be in ${e.filename}`,`Everything that leaves, field by field. Nothing is written until you save it.`),i(`ul`,{class:`settings-list`,"data-testid":`export-preview`},e.preview.map(e=>i(`li`,{class:`settings-list-row`},[i(`span`,{class:`settings-list-name`,textContent:e.label}),i(`span`,{class:`settings-list-detail`,textContent:e.value})]))),e.requirements.length?i(`div`,{},[i(`p`,{class:`meta`,textContent:`This recipe also needs things a file cannot carry. They are named in it so whoever imports it knows:`}),i(`ul`,{class:`settings-list`},e.requirements.map(e=>i(`li`,{class:`settings-list-row`},[i(`span`,{class:`settings-list-detail`,textContent:e})])))]):null,i(`p`,{class:`meta`,textContent:`Deliberately not included: ${e.withheld.join(`; `)}.`}),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Save the file`,"data-testid":`export-save`,onclick:()=>this.saveExport()}),i(`button`,{class:`pill-btn`,textContent:`Cancel`,onclick:()=>{this.pendingExport=null,this.renderApp()}})])]):null}async chooseImportFile(e){if(e){try{let t=JSON.parse(await e.text());this.pendingImport={bundle:t,preview:await this.client.previewPresetImport(t)}}catch(e){this.pendingImport=null,this.appState.settingsError=p(e,`That file could not be read as a preset bundle.`)}this.renderApp()}}async confirmImport(){let e=this.pendingImport;if(e)try{await this.client.importPresets(e.bundle),this.pendingImport=null,await this.refresh()}catch(e){this.appState.settingsError=p(e,`Nothing was imported.`),this.renderApp()}}importCard(){let e=this.pendingImport;return D([E(`Import a preset file`,`A file somebody exported from their own installation. Choosing one shows what it would do here; nothing is installed until you confirm.`),i(`input`,{type:`file`,accept:`application/json,.json`,"data-testid":`import-file`,onchange:e=>{let t=e.currentTarget;this.chooseImportFile(t.files?.[0]??null)}}),...e?[...e.preview.warnings.map(e=>i(`p`,{class:`meta warning`,textContent:e})),i(`ul`,{class:`settings-list`,"data-testid":`import-preview`},e.preview.presets.map(e=>i(`li`,{class:`settings-list-row`},[i(`span`,{class:`settings-list-name`,textContent:e.name}),i(`span`,{class:`settings-list-detail`,textContent:e.installable?e.requirements.length?`Will install. Also needs: ${e.requirements.join(`; `)}`:`Will install`:e.blockers.join(`; `)})]))),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:e.preview.installable?`Import these presets`:`Cannot import this file`,disabled:!e.preview.installable,"data-testid":`import-confirm`,onclick:()=>void this.confirmImport()}),i(`button`,{class:`pill-btn`,textContent:`Cancel`,onclick:()=>{this.pendingImport=null,this.renderApp()}})])]:[]])}signalsCard(){return D([E(`What has happened to the pictures`,`Counted when you keep a picture, when one is sent again, or when you remove one. Making a picture is not counted, because the platform chose the preset. These counts can move a preset up the order; they can never make one eligible that does not already fit the request.`),this.signals.length?i(`ul`,{class:`settings-list`,"data-testid":`preset-signals`},this.signals.map(e=>i(`li`,{class:`settings-list-row`},[i(`span`,{class:`settings-list-name`,textContent:e.preset_name}),i(`span`,{class:`settings-list-detail`,textContent:e.summary}),i(`span`,{class:`settings-list-detail`,textContent:`Score ${e.weight>0?`+`:``}${e.weight}`}),i(`button`,{class:`pill-btn`,textContent:`Reset`,title:`Forget the counts for this preset`,onclick:()=>void this.clearSignals(e.preset_id)})]))):i(`p`,{class:`settings-empty`,textContent:`Nothing counted yet. Keep, reuse, or remove a picture and it will appear here.`})])}node(){return[D([E(`Generation presets (${this.presets.length})`,`A preset is a tested recipe: which model, which workflow, which settings, and how its prompts are written. Planning chooses between presets rather than assembling one.`),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:this.busy?`Loading…`:`Refresh presets`,disabled:this.busy,"data-testid":`presets-refresh`,onclick:()=>void this.refresh()})]),this.presets.length?null:i(`p`,{class:`meta`,textContent:`No presets yet. Enable an image model, or install a starter preset below.`})]),...this.presets.map(e=>this.editor(e)),this.exportPreviewCard(),this.importCard(),this.signalsCard()].filter(e=>e!==null)}editor(e){let t=e.definition??{},n=t.prompt_dialect??{},r=t.sampler??{},a=(this.appState.mediaCatalog?.resources??[]).filter(t=>t.resource_type===`model`&&t.kind===e.kind),o=e.enabled?`Enabled`:`Disabled`;return O(e.name,e.routing_card||`No routing card yet, so this can only be chosen by tags and priority.`,o,[L(`Name`,e.name,t=>{e.name=t,this.markDirty(e)}),R(`When should this be used?`,e.routing_card,t=>{e.routing_card=t,this.markDirty(e)},!1,`Plain language. This is what routing reads when deciding between presets, so describe the pictures it is for.`),B(`Enabled`,e.enabled,t=>{e.enabled=t,this.markDirty(e)}),L(`Priority`,String(e.priority),t=>{e.priority=Number(t)||0,this.markDirty(e)},`number`,!1,`Breaks ties when several presets fit equally well.`),a.length?z(`Base model`,String(t.base_model_resource_id??``),a.map(e=>e.id),n=>{t.base_model_resource_id=n,this.markDirty(e)},void 0,e=>a.find(t=>t.id===e)?.name??e,!1):null,i(`h4`,{class:`settings-subheading`,textContent:`Prompt dialect`}),z(`Prompt style`,String(n.style??`natural_language`),An,t=>{n.style=t,this.markDirty(e)},void 0,Mn,!1,`How this model wants prompts written. Booru means comma-separated tags; natural language means a sentence.`),L(`Prompt prefix`,String(n.prefix??``),t=>{n.prefix=t,this.markDirty(e)},`text`,!1,`Put score or quality tags here if this model family expects them. Leave empty when it does not.`),L(`Prompt suffix`,String(n.suffix??``),t=>{n.suffix=t,this.markDirty(e)}),B(`This model accepts a negative prompt`,n.supports_negative!==!1,t=>{n.supports_negative=t,this.markDirty(e)}),n.supports_negative===!1?i(`p`,{class:`meta`,textContent:`No negative prompt is sent, and the platform safety negative cannot be carried either.`}):R(`Negative prompt`,String(n.negative_prompt??``),t=>{n.negative_prompt=t,this.markDirty(e)},!1,`The safety negative applied when adult output is off is separate from this and is added by the platform.`),z(`LoRA trigger words go`,String(n.trigger_placement??`suffix`),jn,t=>{n.trigger_placement=t,this.markDirty(e)},void 0,e=>e===`prefix`?`Before the description`:`After the description`,!1),i(`h4`,{class:`settings-subheading`,textContent:`Sampling`}),L(`Steps`,String(r.steps??``),t=>{r.steps=Number(t)||void 0,this.markDirty(e)},`number`),L(`Guidance (CFG)`,String(r.cfg_scale??``),t=>{r.cfg_scale=Number(t)||void 0,this.markDirty(e)},`number`),L(`Sampler`,String(r.sampler_name??``),t=>{r.sampler_name=t,this.markDirty(e)}),L(`Scheduler`,String(r.scheduler??``),t=>{r.scheduler=t,this.markDirty(e)}),L(`Dimensions`,(t.dimensions??[]).join(`, `),n=>{t.dimensions=n.split(`,`).map(e=>e.trim()).filter(Boolean),this.markDirty(e)},`text`,!1,`Comma separated, widest first. The first is used unless a request needs another.`),A(`Raw definition`,`Everything above, plus slots and stages.`,[R(`Definition JSON`,JSON.stringify(t,null,2),t=>{try{let n=JSON.parse(t);n&&typeof n==`object`&&(e.definition=n,this.markDirty(e))}catch{}})]),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.dirtyIds.has(e.id)?`Save preset`:`Saved`,disabled:!this.dirtyIds.has(e.id)||this.busy,"data-testid":`preset-save-${e.id}`,onclick:()=>void this.save(e)}),i(`button`,{class:`pill-btn`,textContent:`Export`,title:`See what a shareable file would contain, before writing one`,"data-testid":`preset-export-${e.id}`,onclick:()=>void this.prepareExport(e)}),i(`button`,{class:`pill-btn danger`,textContent:`Delete`,"data-testid":`preset-delete-${e.id}`,onclick:()=>void this.remove(e)})])],{open:this.openIds.has(e.id),onToggle:t=>{t?this.openIds.add(e.id):this.openIds.delete(e.id)},testId:`preset-${e.id}`})}markDirty(e){this.dirtyIds.add(e.id)}async save(e){this.busy=!0,this.appState.settingsError=``,this.renderApp();try{await this.client.updateMediaPreset(e.id,{name:e.name,kind:e.kind,enabled:e.enabled,priority:e.priority,routing_card:e.routing_card,operations:e.operations,domains:e.domains,content_tags:e.content_tags,features:e.features,definition:e.definition,estimated_vram_mb:e.estimated_vram_mb,notes:e.notes}),this.dirtyIds.delete(e.id),await this.refresh()}catch(e){this.appState.settingsError=p(e,`Unable to save that preset.`)}finally{this.busy=!1,this.renderApp()}}async remove(e){this.busy=!0,this.renderApp();try{await this.client.deleteMediaPreset(e.id),await this.refresh()}catch(e){this.appState.settingsError=p(e,`Unable to delete that preset.`)}finally{this.busy=!1,this.renderApp()}}},Pn=class{appState;client;renderApp;text=``;constructor(e,t,n){this.appState=e,this.client=t,this.renderApp=n}node(){let e=this.appState.routingPreview;return D([E(`Routing tester`,`Paste a message and see which presets were offered, which one routing chose, and why. This is a diagnostic and is expected to be removed once routing is stable.`),A(`Test routing`,`Runs the real shortlist, task model, and planner for one message. Nothing is generated.`,[R(`Message to test`,this.text,e=>{this.text=e},!1,`The same shortlist, task model, and planner a real turn would use.`),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:this.appState.mediaCatalogBusy?`Testing…`:`Test routing`,disabled:this.appState.mediaCatalogBusy||!this.text.trim(),"data-testid":`routing-tester-run`,onclick:()=>void this.run()})]),e?this.result(e):null],{testId:`routing-tester`})])}result(e){let t=e.plan?.explanation?.preset;return i(`div`,{class:`routing-preview`,"data-testid":`routing-tester-result`},[i(`p`,{class:`meta`,textContent:`Presets offered: ${e.shortlist.length}`}),i(`ul`,{class:`routing-shortlist`},e.shortlist.map(e=>i(`li`,{},[i(`span`,{class:`routing-shortlist-title`,textContent:e.title}),i(`span`,{class:`meta`,textContent:e.routing_card||`No routing card, so this can only be chosen by tags and priority.`})]))),e.task_model.error?i(`p`,{class:`settings-warning`,textContent:e.task_model.error}):null,!e.requested&&!e.task_model.error?i(`p`,{textContent:`No image would be requested for this message.`}):null,t?i(`div`,{class:`routing-outcome`},[i(`p`,{textContent:`Chosen: ${t.name}`}),i(`p`,{class:`meta`,textContent:`${t.source===`task_model`?`Task model chose it`:`Deterministic score chose it`} — ${t.reason}`})]):null,e.plan&&e.plan.status!==`ready`?i(`p`,{class:`settings-warning`,textContent:e.plan.block?.message||`No preset could serve this request.`}):null,...(e.plan?.explanation?.warnings??[]).map(e=>i(`p`,{class:`settings-warning`,textContent:e}))])}async run(){this.appState.mediaCatalogBusy=!0,this.appState.settingsError=``,this.renderApp();try{this.appState.routingPreview=await this.client.previewMediaRouting(this.text)}catch(e){this.appState.settingsError=p(e,`Unable to test routing.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}},Fn=class{appState;client;renderApp;afterInstall;starters=null;busy=!1;summary=``;constructor(e,t,n,r){this.appState=e,this.client=t,this.renderApp=n,this.afterInstall=r}node(){return D([E(`Starter presets`,`Published settings for common model families: sampler, steps, guidance, dimensions, and prompt style. They are a starting point, not a measurement — nothing here has been tested on this deployment.`),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:this.busy?`Checking…`:`Check starter presets`,disabled:this.busy,"data-testid":`starter-presets-check`,onclick:()=>void this.check()}),this.starters?.some(e=>e.installable)?i(`button`,{class:`pill-btn`,textContent:this.busy?`Installing…`:`Install available starters`,disabled:this.busy,"data-testid":`starter-presets-install`,onclick:()=>void this.install()}):null]),this.summary?i(`p`,{class:`meta`,"data-testid":`starter-presets-summary`,textContent:this.summary}):null,this.starters?this.list(this.starters):null])}list(e){return i(`ul`,{class:`routing-shortlist`,"data-testid":`starter-presets-list`},e.map(e=>i(`li`,{},[i(`span`,{class:`routing-shortlist-title`,textContent:e.name}),i(`span`,{class:`meta`,textContent:e.routing_card}),e.already_present?i(`span`,{class:`meta`,textContent:`Already in your presets — it will not be overwritten.`}):e.missing_assets.length?i(`span`,{class:`meta`,textContent:`Needs a model this catalog does not have: ${e.missing_assets.join(`, `)}`}):i(`span`,{class:`meta`,textContent:`Ready to install.`})])))}async check(){this.busy=!0,this.renderApp();try{this.starters=(await this.client.starterPresets()).presets,this.summary=`${this.starters.filter(e=>e.installable).length} of ${this.starters.length} can be installed now.`}catch(e){this.appState.settingsError=p(e,`Unable to read the starter presets.`)}finally{this.busy=!1,this.renderApp()}}async install(){this.busy=!0,this.renderApp();try{let e=await this.client.installStarterPresets();this.summary=e.installed.length?`Installed ${e.installed.map(e=>e.name).join(`, `)}.`:`Nothing was installed.`,e.skipped.length&&(this.summary+=` Skipped: ${e.skipped.map(e=>`${e.name} (${e.reason})`).join(`; `)}`),this.starters=(await this.client.starterPresets()).presets,await this.afterInstall()}catch(e){this.appState.settingsError=p(e,`Unable to install the starter presets.`)}finally{this.busy=!1,this.renderApp()}}},In=class{renderApp;appState;client;dialogs;finishIdentitySetup;async refresh(){let e=this.settingsVersion,t=new Map(this.resourceVersions);this.appState.mediaCatalogBusy=!0;try{let n=await this.client.mediaCatalog();this.presets.refresh(),this.appState.mediaCatalog=this.mergeSnapshot(n,e,t)}catch(e){this.appState.settingsError=p(e,`Unable to load the media catalog.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}settingsDirty=!1;operatorToolsOpen=!1;settingsVersion=0;dirtyResourceIds=new Set;resourceVersions=new Map;openResourceIds=new Set;identitySetup;routingTester;presets;starterPresets;modelsView;importView;requirements={kind:`image`,operation:`generate`,domains:[],content_tags:[],required_features:[]};constructor(e,t,n,r,i=()=>void 0){this.renderApp=e,this.appState=t,this.client=n,this.dialogs=r,this.finishIdentitySetup=i,this.identitySetup=new Tn(e,t,n,r,i,()=>this.refresh()),this.routingTester=new Pn(t,n,e),this.presets=new Nn(t,n,e),this.starterPresets=new Fn(t,n,e,()=>this.refresh()),this.modelsView=new xn(t,n,e,()=>this.refresh()),this.importView=new On(t,n,e,()=>this.refresh())}openIdentitySetup(){this.identitySetup.open()}nodes(){let e=this.appState.mediaCatalog;if(!e)return[k(`Teach the media coordinator what is available`,`The catalog is currently unavailable, so Nice Assistant cannot inspect or change coordinated media resources.`),i(`div`,{class:`settings-empty-state`,textContent:`No media catalog was returned. Retry the request, then check server logs if it remains unavailable.`}),i(`button`,{class:`pill-btn`,textContent:`Retry catalog`,onclick:()=>void this.refresh()})];let t=e.resources.filter(e=>e.enabled),n=t.filter(e=>e.resource_type===`model`),r=t.filter(e=>e.resource_type===`workflow`),a=t.filter(e=>e.resource_type===`lora`);return[k(`How pictures get made`,`A chat picks one of your presets. A preset pairs a model (the look) with a workflow (the method), and the note on each preset is how the chat knows when to pick it. More presets means more variety.`),i(`div`,{class:`settings-readiness-list`},[j(`Models`,`${n.length} enabled`,n.length>1?`ready`:`attention`,n.length===0?`Nothing can be generated until a model is enabled. Find models below.`:n.length===1?`One model means every picture shares its look. Find more below.`:`Each enabled model gives its recipes a different look.`),j(`Workflows`,`${r.length} enabled`,r.length?`ready`:`off`,`A workflow is the method: plain generation, identity conditioning, face swap, correction.`),j(`LoRAs`,`${a.length} enabled`,a.length?`ready`:`off`,`LoRAs adjust a compatible model and join a recipe when their metadata matches the request.`)]),this.modelsView.node(n),D([E(`Workflows — the method`,`Start from a shipped, known-good workflow below, or paste your own export. Identity workflows keep a persona recognisable; the guided setup walks that end to end.`)]),this.identitySetup.node(),this.importView.node(n),...this.presets.node(),A(`Operator tools`,`The machinery behind the sections above: raw inventory, manual adds, starter bundles, limits, and planner diagnostics.`,[D([E(`Inventory (${e.resources.length})`,`Every cataloged part. Open one to edit compatibility, strengths, estimates, or the provider payload — or to delete duplicate copies.`),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Add model manually`,onclick:()=>void this.addResource(`model`)}),i(`button`,{class:`pill-btn`,textContent:`Add LoRA`,onclick:()=>void this.addResource(`lora`)}),i(`button`,{class:`pill-btn`,textContent:`Add workflow`,onclick:()=>void this.addResource(`workflow`)}),i(`button`,{class:`pill-btn`,textContent:`Refresh catalog`,onclick:()=>void this.refresh()})]),...e.resources.length?e.resources.map(e=>this.resourceCard(e)):[i(`div`,{class:`settings-empty-state`,textContent:`Nothing is cataloged yet. Find models on ComfyUI above to begin.`})]]),this.policyCard(),this.starterPresets.node(),this.routingTester.node(),this.planPreview()],{testId:`catalog-inventory`,open:this.operatorToolsOpen,onToggle:e=>{this.operatorToolsOpen=e}})]}policyCard(){let e=this.appState.mediaCatalog;return e?D([E(`Coordinator limits`,`Planning limits prevent a single request from selecting an unbounded estimated VRAM load or LoRA chain.`),i(`div`,{class:`settings-grid`},[L(`Shared VRAM budget (MB)`,String(e.settings.vram_budget_mb),t=>{e.settings.vram_budget_mb=q(t,0,131072,e.settings.vram_budget_mb),this.markSettingsDirty()},`number`,!1,`Set 0 to disable the catalog estimate limit. This does not disable live GPU admission checks.`),L(`Maximum selected LoRAs`,String(e.settings.max_loras),t=>{e.settings.max_loras=q(t,0,8,e.settings.max_loras),this.markSettingsDirty()},`number`,!1,`Caps how many compatible LoRAs one coordinated plan may select.`)]),i(`button`,{class:`send-btn`,textContent:this.appState.mediaCatalogBusy?`Saving…`:`Save coordinator limits`,disabled:this.appState.mediaCatalogBusy,"data-testid":`media-catalog-save-policy`,onclick:()=>void this.saveSettings()})]):i(`div`)}resourceCard(e){let t=(this.appState.mediaCatalog?.resources??[]).filter(t=>t.resource_type===`model`&&t.kind===e.kind&&t.provider_key===e.provider_key&&t.backend===e.backend&&t.id!==e.id),n=e.kind===`video`?[`openai-video`]:e.resource_type===`model`?[`local-image`,`openai-image`]:[`local-image`],r=e.provider_key===`local-image`?e.resource_type===`workflow`?[`comfyui`]:[`automatic1111`,`comfyui`]:[`openai`],a=t.filter(t=>e.compatible_model_ids.includes(t.id)),o=e.enabled?`Enabled`:`Draft`,s=`${F(e.resource_type)} · ${e.backend} · revision ${e.revision}`;return O(e.name||`Unnamed resource`,s,o,[B(`Enabled for planning`,e.enabled,t=>{e.enabled=t},`Disabled resources remain editable drafts and are never selected for new plans.`),i(`div`,{class:`settings-grid`},[L(`Name`,e.name,t=>{e.name=t},`text`,!1,`Human-readable name shown in plans and operator pickers.`),z(`Resource type`,e.resource_type,[`model`,`lora`,`workflow`],t=>{e.resource_type=t},void 0,F,!1,`Models generate; LoRAs specialize a compatible model; workflows declare an executable ComfyUI operation.`),z(`Media kind`,e.kind,[`image`,`video`],t=>{e.kind=t},void 0,F,!1,`The output family this resource can produce or modify.`),z(`Provider adapter`,e.provider_key,n,t=>{e.provider_key=t},void 0,F,!1,`The Nice Assistant provider contract used to execute this resource.`),z(`Backend`,e.backend,r,t=>{e.backend=t},void 0,F,!1,`The actual service that owns the model, LoRA, or workflow.`),L(e.resource_type===`workflow`?`Catalog workflow ID`:`Provider resource ID or filename`,e.external_id,t=>{e.external_id=t},`text`,!1,e.resource_type===`workflow`?`An operator-facing catalog identifier. The executable workflow patch is stored in Advanced resource metadata.`:`Exact provider identifier or checkpoint filename. Selection still depends on explicit metadata, not this name.`)]),e.resource_type===`model`?null:i(`div`,{class:`compatibility-list`},[E(`Compatible base models`,`Only checked models can be paired with this resource. Compatibility is exact and same-provider/backend.`,`strong`),t.length?i(`div`,{class:`chips`},t.map(t=>i(`label`,{class:`checkbox-row`},[i(`input`,{type:`checkbox`,checked:e.compatible_model_ids.includes(t.id),onchange:n=>{e.compatible_model_ids=n.currentTarget.checked?[...new Set([...e.compatible_model_ids,t.id])]:e.compatible_model_ids.filter(e=>e!==t.id)}}),t.name]))):i(`div`,{class:`settings-empty-state`,textContent:`No same-provider, same-backend base model is available.`}),a.length?i(`span`,{class:`meta`,textContent:`${a.length} compatible model${a.length===1?``:`s`} selected`}):null]),A(`Selection metadata and provider payload`,`Expert metadata used by deterministic planning and provider execution.`,[i(`div`,{class:`settings-grid`},[L(`Priority (0–100)`,String(e.priority),t=>{e.priority=q(t,0,100,e.priority)},`number`,!1,`Breaks otherwise equal compatible choices; higher numbers are preferred.`),L(`Estimated VRAM (MB)`,String(e.estimated_vram_mb),t=>{e.estimated_vram_mb=q(t,0,131072,e.estimated_vram_mb)},`number`,!1,`Operator estimate used by planning. Set 0 when unknown rather than inventing capacity.`),L(`Estimated load seconds`,String(e.estimated_load_seconds),t=>{e.estimated_load_seconds=Ln(t,0,3600,e.estimated_load_seconds)},`number`,!1,`Expected cold-load time used for explanation and future scheduling decisions.`),L(`Operations`,e.operations.join(`, `),t=>{e.operations=K(t)},`text`,!1,`Comma-separated executable operations such as generate, inpaint, outpaint, or image_to_image.`),L(`Domain strengths`,e.domains.join(`, `),t=>{e.domains=K(t)},`text`,!1,`Comma-separated subject strengths such as fantasy, portrait, or photorealism.`),L(`Content strengths`,e.content_tags.join(`, `),t=>{e.content_tags=K(t)},`text`,!1,`Comma-separated content categories that this resource is intentionally allowed and suited to handle.`),L(`Features`,e.features.join(`, `),t=>{e.features=K(t)},`text`,!1,`Hard capability flags such as text_to_image or identity_control.`)]),R(`Default settings JSON`,JSON.stringify(e.default_settings,null,2),t=>{try{let n=JSON.parse(t||`{}`);n&&typeof n==`object`&&!Array.isArray(n)&&(e.default_settings=n),this.appState.settingsError=``}catch{this.appState.settingsError=`Default settings for ${e.name||`resource`} are not valid JSON.`}},!1,`Provider-specific defaults. Invalid or unsupported values can block execution.`),e.resource_type===`workflow`?i(`div`,{class:`settings-warning`,textContent:`Workflows stay safest as disabled drafts until their inline patch, exact bindings, compatible base model, and declared features have been reviewed.`}):null,R(`Operator notes`,e.notes,t=>{e.notes=t},!1,`Private operational context for future catalog maintenance.`)],{testId:`media-resource-advanced-${e.id}`}),i(`div`,{class:`operator-actions`},[i(`button`,{class:`send-btn`,textContent:this.appState.mediaCatalogBusy?`Saving…`:`Save resource`,disabled:this.appState.mediaCatalogBusy,"data-testid":`media-resource-save-${e.id}`,onclick:()=>void this.saveResource(e)}),i(`button`,{class:`pill-btn danger`,textContent:`Delete resource`,disabled:this.appState.mediaCatalogBusy,onclick:()=>void this.deleteResource(e)})])],{open:this.openResourceIds.has(e.id),onToggle:t=>t?this.openResourceIds.add(e.id):this.openResourceIds.delete(e.id),testId:`media-resource-${e.id}`,className:`media-resource-card`,statusClass:e.enabled?`ok`:`idle`,onInput:()=>this.markResourceDirty(e.id),onChange:()=>this.markResourceDirty(e.id)})}planPreview(){let e=this.appState.mediaPlanPreview;return D([E(`Preview coordinator selection`,`Tests deterministic metadata selection without storing or sending prompt content. This does not generate media.`),i(`div`,{class:`settings-grid`},[z(`Media kind`,this.requirements.kind,[`image`,`video`],e=>{this.requirements.kind=e},void 0,F,!1,`Limits selection to image or video resources.`),z(`Operation`,this.requirements.operation,[`generate`,`inpaint`,`outpaint`,`image_to_image`],e=>{this.requirements.operation=e},void 0,F,!1,`Hard operation requirement. Editing operations also require exact protected source/mask bindings at execution time.`),L(`Preferred domains`,this.requirements.domains.join(`, `),e=>{this.requirements.domains=K(e)},`text`,!1,`Soft semantic strengths such as fantasy, portrait, or photorealism.`),L(`Required content tags`,this.requirements.content_tags.join(`, `),e=>{this.requirements.content_tags=K(e)},`text`,!1,`Content categories the selected resources must explicitly support.`),L(`Required features`,this.requirements.required_features.join(`, `),e=>{this.requirements.required_features=K(e)},`text`,!1,`Hard features such as identity_control.`)]),i(`button`,{class:`pill-btn`,textContent:this.appState.mediaCatalogBusy?`Planning…`:`Preview selection`,disabled:this.appState.mediaCatalogBusy,"data-testid":`media-plan-preview`,onclick:()=>void this.previewPlan()}),e?i(`div`,{class:`media-plan-preview plan-${e.status}`},[i(`strong`,{textContent:`${F(e.status)} · ${e.estimated_vram_mb||`unknown`} MB estimated VRAM`}),i(`p`,{textContent:e.block?.message||e.explanation.summary}),e.selected_resources.length?i(`ul`,{},e.selected_resources.map(e=>i(`li`,{textContent:`${F(e.resource_type)}: ${e.name}`}))):null,e.identity_conditioning?i(`div`,{class:`meta`,textContent:e.identity_conditioning.status===`ready`?`Persona reference conditioning is ready; configured validation runs after generation and may trigger bounded correction attempts.`:`A real persona chat and active reviewed reference are required before this identity workflow can run.`}):null,...e.explanation.warnings.map(e=>i(`div`,{class:`meta`,textContent:e}))]):i(`div`,{class:`meta`,textContent:`No preview has been run with the current requirements.`})])}markSettingsDirty(){this.settingsDirty=!0,this.settingsVersion+=1}markResourceDirty(e){this.dirtyResourceIds.add(e),this.resourceVersions.set(e,(this.resourceVersions.get(e)??0)+1)}mergeSnapshot(e,t=this.settingsVersion,n=new Map(this.resourceVersions)){let r=this.appState.mediaCatalog;if(!r)return e;let i=this.settingsDirty||this.settingsVersion!==t,a=new Map(r.resources.map(e=>[e.id,e])),o=new Set(e.resources.map(e=>e.id)),s=e.resources.map(e=>{let t=a.get(e.id),r=(this.resourceVersions.get(e.id)??0)!==(n.get(e.id)??0);return t&&(this.dirtyResourceIds.has(e.id)||r)?t:e});return s.push(...r.resources.filter(e=>this.dirtyResourceIds.has(e.id)&&!o.has(e.id))),{...e,settings:i?r.settings:e.settings,resources:s}}async saveSettings(){let e=this.appState.mediaCatalog;if(e){this.appState.mediaCatalogBusy=!0,this.appState.settingsError=``,this.renderApp();try{e.settings=await this.client.updateMediaCatalogSettings(e.settings),this.settingsVersion+=1,this.settingsDirty=!1}catch(e){this.appState.settingsError=p(e,`Unable to save the media catalog policy.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}}async addResource(e){let t=this.appState.mediaCatalog;if(!t)return;let n=await this.dialogs.prompt(`Add ${e}`,`Choose the operator-facing resource name.`);if(!n?.trim())return;let r=await this.dialogs.prompt(`Add ${e}`,e===`workflow`?`Choose a catalog workflow ID. The executable patch is reviewed after creation.`:`Enter the exact provider model or resource ID.`,e===`model`?`provider-default`:``);if(!r?.trim())return;let i=`automatic1111`,a=[];if(e!==`model`){let n=t.resources.filter(t=>t.resource_type===`model`&&t.kind===`image`&&t.provider_key===`local-image`&&(e!==`workflow`||t.backend===`comfyui`));if(!n.length){this.dialogs.info(`Base model required`,e===`workflow`?`Add a ComfyUI base model before adding a workflow.`:`Add a local image base model before adding a LoRA.`);return}let r=n[0];if(!r)return;i=e===`workflow`?`comfyui`:r.backend,a=[n.find(e=>e.backend===i)?.id??r.id]}this.appState.mediaCatalogBusy=!0,this.renderApp();try{await this.client.createMediaCatalogResource({resource_type:e,kind:`image`,name:n.trim(),provider_key:`local-image`,backend:i,external_id:r.trim(),enabled:e!==`workflow`,priority:50,operations:[`generate`],domains:[],content_tags:e===`model`?[`general`]:[],features:e===`model`?[`text_to_image`]:[],estimated_vram_mb:0,estimated_load_seconds:0,default_settings:e===`lora`?{weight:1,trigger_words:[]}:e===`workflow`?{workflow_patch:{}}:{},notes:``,compatible_model_ids:a}),this.appState.mediaCatalog=this.mergeSnapshot(await this.client.mediaCatalog())}catch(t){this.appState.settingsError=p(t,`Unable to add ${e}.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async saveResource(e){this.appState.mediaCatalogBusy=!0,this.appState.settingsError=``,this.renderApp();try{let t=await this.client.updateMediaCatalogResource(e);this.appState.mediaCatalog&&(this.appState.mediaCatalog.resources=this.appState.mediaCatalog.resources.map(e=>e.id===t.id?t:e),this.resourceVersions.set(t.id,(this.resourceVersions.get(t.id)??0)+1),this.dirtyResourceIds.delete(t.id),this.appState.mediaCatalog.vocabulary=(await this.client.mediaCatalog()).vocabulary)}catch(t){this.appState.settingsError=p(t,`Unable to save ${e.name}.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async deleteResource(e){if(await this.dialogs.confirm(`Delete media resource`,`Delete ${e.name}? Existing plans remain auditable but cannot run.`,`Delete`)){this.appState.mediaCatalogBusy=!0,this.renderApp();try{await this.client.deleteMediaCatalogResource(e.id),this.dirtyResourceIds.delete(e.id),this.resourceVersions.set(e.id,(this.resourceVersions.get(e.id)??0)+1),this.openResourceIds.delete(e.id),this.appState.mediaCatalog=this.mergeSnapshot(await this.client.mediaCatalog())}catch(t){this.appState.settingsError=p(t,`Unable to delete ${e.name}.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}}async previewPlan(){this.appState.mediaCatalogBusy=!0,this.appState.settingsError=``,this.renderApp();try{this.appState.mediaPlanPreview=await this.client.previewMediaPlan(this.requirements)}catch(e){this.appState.settingsError=p(e,`Unable to preview media selection.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}};function K(e){return[...new Set(e.split(`,`).map(e=>e.trim().toLowerCase()).filter(Boolean))]}function q(e,t,n,r){let i=Number.parseInt(e,10);return Number.isFinite(i)?Math.max(t,Math.min(n,i)):r}function Ln(e,t,n,r){let i=Number(e);return Number.isFinite(i)?Math.max(t,Math.min(n,i)):r}var Rn=[[`temperature`,`Temperature`],[`top_p`,`Top P`],[`num_predict`,`Maximum output tokens`],[`context_window_tokens`,`Context window tokens`],[`presence_penalty`,`Presence penalty`],[`frequency_penalty`,`Frequency penalty`]],zn=class{appState;change;renderApp;providerControl;selectedOverrideModel=``;constructor(e,t,n,r){this.appState=e,this.change=t,this.renderApp=n,this.providerControl=r}nodes(e){let t=e.global_default_model||this.appState.models[0]||``,n=Ae(e,t),r=this.appState.models.length;return[k(`Set the default conversation behavior`,`These values apply to conversations unless a persona, chat, or per-model customization is more specific.`),i(`div`,{class:`settings-readiness-list`},[j(`Default model`,t||`Automatic; the provider chooses from installed models`,t||r?`ready`:`attention`,`A persona or chat may still select a different model.`),j(`Installed models`,r?`${r} reported by Ollama`:`No installed models reported`,r?`ready`:`attention`,`This list comes from Ollama and is refreshed when Nice Assistant loads provider data.`),j(`Effective context window`,`${n.context_window_tokens} tokens for ${t||`the automatic model`}`,`ready`,`Nice Assistant budgets instructions, history, memories, output, and safety room inside this limit.`),j(`Per-model customizations`,`${Object.keys(e.model_overrides).length} saved`,Object.keys(e.model_overrides).length?`ready`:`off`,`A customization changes only the named model and takes precedence over the account defaults below.`)]),D([z(`Default model`,e.global_default_model,[``,...this.appState.models],e=>this.change(`global_default_model`,e),void 0,e=>e||`Automatic`,!0,`Used when neither the persona nor chat chooses a different model.`),L(`Temperature`,e.models_temperature,e=>this.change(`models_temperature`,e),`number`,!0,`Higher values make replies less predictable; 0.7 is a balanced default.`),L(`Maximum output tokens`,e.models_num_predict,e=>this.change(`models_num_predict`,e),`number`,!0,`Reserves this many tokens for the reply inside the context window.`),L(`Context window tokens`,e.models_context_window_tokens,e=>this.change(`models_context_window_tokens`,e),`number`,!0,`Must not exceed what the selected model and Ollama configuration can actually support.`)]),A(`Sampling and repetition controls`,`Optional generation controls for experienced model operators.`,[L(`Top P`,e.models_top_p,e=>this.change(`models_top_p`,e),`number`,!0,`Limits token choices by cumulative probability.`),L(`Presence penalty`,e.models_presence_penalty,e=>this.change(`models_presence_penalty`,e),`number`,!0,`Positive values encourage introducing topics not already present.`),L(`Frequency penalty`,e.models_frequency_penalty,e=>this.change(`models_frequency_penalty`,e),`number`,!0,`Positive values discourage repeatedly using the same tokens.`)],{testId:`models-advanced-settings`}),this.overrideEditor(e),D([E(`Ollama connection`,`Checks whether Ollama is reachable and reports models without changing saved settings.`),this.providerControl()])]}overrideEditor(e){let t=this.appState.models;(!this.selectedOverrideModel||!t.includes(this.selectedOverrideModel))&&(this.selectedOverrideModel=e.global_default_model||t[0]||``);let n=this.selectedOverrideModel,r=n?e.model_overrides[n]:void 0,a=n?Ae(e,n):null,o=[z(`Model to customize`,n,t,e=>{this.selectedOverrideModel=e,this.renderApp()},`model-override-model`,e=>e,!0,`Only installed models are listed. The customization is stored by exact model name.`)];return n?r?o.push(i(`div`,{class:`settings-grid`},Rn.map(([t,i])=>L(i,String(r[t]??a?.[t]??``),r=>this.updateOverride(e,n,t,r),`number`,!1,`Overrides the account ${i.toLowerCase()} only when ${n} is selected.`))),i(`button`,{class:`pill-btn danger`,textContent:`Use account defaults for this model`,onclick:()=>this.removeOverride(e,n)})):o.push(i(`div`,{class:`meta`,textContent:`Using account defaults: ${a?.context_window_tokens??0} context tokens, temperature ${a?.temperature??0}.`}),i(`button`,{class:`pill-btn`,textContent:`Customize ${n}`,onclick:()=>this.createOverride(e,n)})):o.push(i(`div`,{class:`settings-empty-state`,textContent:`Install or expose an Ollama model before creating a model-specific customization.`})),A(`Per-model customizations`,`Optional values that take precedence only when a specific installed model runs.`,o,{testId:`model-overrides-settings`})}createOverride(e,t){let n=Ae(e,t);e.model_overrides[t]={...n},this.change(`model_overrides`,{...e.model_overrides})}updateOverride(e,t,n,r){let i=r.trim()===``?null:Number(r);i!==null&&!Number.isFinite(i)||(je(e,t,n,i),this.change(`model_overrides`,{...e.model_overrides},!1))}removeOverride(e,t){delete e.model_overrides[t],this.change(`model_overrides`,{...e.model_overrides})}},Bn=class{renderApp;appState;client;dialogs;openEndpoints=new Set;constructor(e,t,n,r){this.renderApp=e,this.appState=t,this.client=n,this.dialogs=r}gpuNodes(){if(!this.appState.session?.is_admin)return[k(`Coordinate shared GPU work`,`This tab changes installation-wide provider scheduling and requires the administrator account.`),i(`div`,{class:`settings-empty-state`,textContent:`Sign in with the administrator account to inspect or change GPU coordination.`})];let e=this.appState.resourceCoordination;if(!e)return[k(`Coordinate shared GPU work`,`Nice Assistant can observe measured capacity and release only explicitly authorized exclusive endpoints.`),i(`div`,{class:`settings-empty-state`,textContent:this.appState.resourceCoordinationBusy?`Loading provider capacity and authorization…`:`GPU coordination is unavailable. Retry, then check provider addresses and server logs.`}),i(`button`,{class:`pill-btn`,textContent:`Retry GPU status`,disabled:this.appState.resourceCoordinationBusy,onclick:()=>void this.refreshCoordination()})];let t=e.endpoints.filter(e=>e.snapshot?.status===`known`),n=e.endpoints.filter(e=>e.capabilities.supports_release),r=e.endpoints.filter(e=>e.authorization.allow_release);return[k(`Coordinate shared GPU work`,`Observe mode waits for measured capacity. Managed mode may release only endpoints you explicitly attest are exclusive to Nice Assistant.`),i(`div`,{class:`settings-readiness-list`},[j(`Coordination mode`,F(e.settings.mode),e.settings.mode===`disabled`?`off`:`ready`,`Disabled preserves provider behavior. Observe waits without unloading. Managed adds verified release controls.`),j(`Measured capacity`,`${t.length} of ${e.endpoints.length} providers known`,t.length===e.endpoints.length?`ready`:`attention`,`Unknown capacity is never presented as free VRAM.`),j(`Release-capable providers`,`${n.length} reported`,n.length?`ready`:`off`,`Provider capability means an adapter exposes a supported release API; it does not grant permission to use it.`),j(`Authorized release`,`${r.length} explicitly allowed`,r.length?`attention`:`off`,`Authorization must match the current endpoint fingerprint and is invalidated when the address changes.`)]),D([E(`Coordination policy`,`Choose the least powerful mode that meets the needs of this shared GPU.`),z(`Mode`,e.settings.mode,[`disabled`,`observe`,`managed`],t=>{e.settings.mode=t,this.renderApp()},`resource-coordination-mode`,Vn,!0,`Managed mode can invoke release controls only for separately authorized endpoints.`),e.settings.mode===`managed`?i(`div`,{class:`settings-warning`,textContent:`Managed mode can unload models or checkpoints on authorized endpoints. Authorize only services used exclusively by Nice Assistant; shared providers must remain unauthorized.`}):null,i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:this.appState.resourceCoordinationBusy?`Saving…`:`Save coordination`,disabled:this.appState.resourceCoordinationBusy,"data-testid":`resource-coordination-save`,onclick:()=>void this.saveCoordination()}),i(`button`,{class:`pill-btn`,textContent:this.appState.resourceCoordinationBusy?`Checking…`:`Refresh telemetry`,disabled:this.appState.resourceCoordinationBusy,onclick:()=>void this.checkCoordination()})])]),A(`Capacity timing and reserve`,`Expert scheduling bounds used while waiting for enough measured GPU capacity.`,[L(`Reserved VRAM (MB)`,String(e.settings.reserve_vram_mb),t=>{e.settings.reserve_vram_mb=Hn(t,0,131072,1024)},`number`,!1,`Capacity kept unused after admitting estimated demand.`),L(`Maximum capacity wait (seconds)`,String(e.settings.max_wait_seconds),t=>{e.settings.max_wait_seconds=Hn(t,1,3600,300)},`number`,!1,`Fails an admission attempt safely after this wait rather than hanging indefinitely.`),L(`Telemetry interval (seconds)`,String(e.settings.poll_interval_seconds),t=>{e.settings.poll_interval_seconds=Un(t,.25,60,2)},`number`,!1,`How often Nice Assistant refreshes capacity while a job waits.`)],{testId:`gpu-advanced-settings`}),D([E(`Provider endpoints`,`Open an endpoint to review its measured status, adapter capabilities, and release authorization.`)]),...e.endpoints.map(e=>this.endpointCard(e)),this.coordinationEvents()]}dataNodes(){return this.appState.session?.is_admin?[k(`Protect and inspect this installation`,`Create recoverable snapshots, verify them before relying on them, and download redacted diagnostic logs when troubleshooting.`),i(`div`,{class:`settings-readiness-list`},[j(`Available backups`,`${this.appState.backupItems.length} archives`,this.appState.backupItems.length?`ready`:`attention`,`A backup is not proven usable until its database integrity and migration compatibility are verified.`),j(`Backup verification`,`Available for every listed archive`,`ready`,`Verification runs a temporary restore drill without replacing the live database.`),j(`Diagnostic logs`,`Redacted download available`,`ready`,`Logs omit configured secrets but may still contain operational timing and safe error context.`),j(`Media coverage`,`Chosen per backup`,`ready`,`Database-only snapshots are smaller. Full backups also include regular protected media files.`)]),D([E(`Create a backup`,`Backups are written to the configured archive directory and should be copied to independent storage.`),i(`div`,{class:`operator-action-grid`},[i(`button`,{class:`send-btn`,textContent:this.appState.backupActionRunning?`Creating…`:`Create database backup`,disabled:this.appState.backupActionRunning,onclick:()=>void this.createBackup(!1)}),i(`button`,{class:`pill-btn`,textContent:this.appState.backupActionRunning?`Creating…`:`Create backup with media`,disabled:this.appState.backupActionRunning,onclick:()=>void this.createBackup(!0)}),i(`button`,{class:`pill-btn`,textContent:`Download diagnostic log`,onclick:()=>window.open(this.client.diagnosticLogUrl(),`_blank`,`noopener`)}),i(`button`,{class:`pill-btn`,textContent:this.appState.backupsLoading?`Refreshing…`:`Refresh backups`,disabled:this.appState.backupsLoading,onclick:()=>void this.refreshBackups()})])]),D([E(`Backup archives (${this.appState.backupItems.length})`,`Verify an archive before treating it as a recovery point. Deleting an archive cannot be undone.`)]),...this.appState.backupItems.length?this.appState.backupItems.map(e=>O(e.name,`${f(e.size)} · ${d(e.created_at)}`,e.include_media?`Database + media`:`Database`,[i(`div`,{class:`operator-actions`},[i(`button`,{class:`pill-btn`,textContent:`Download`,onclick:()=>window.open(this.client.backupDownloadUrl(e.name),`_blank`,`noopener`)}),i(`button`,{class:`pill-btn`,textContent:this.appState.backupActionRunning?`Verifying…`:`Verify restore`,disabled:this.appState.backupActionRunning,onclick:()=>void this.verifyBackup(e.name)}),i(`button`,{class:`pill-btn danger`,textContent:`Delete archive`,onclick:()=>void this.deleteBackup(e.name)})])],{testId:`backup-${e.name}`,className:`backup-editor`,statusClass:`idle`})):[i(`div`,{class:`settings-empty-state`,textContent:`No backups are available yet. Create and verify one before making risky deployment or migration changes.`})]]:[k(`Protect and inspect this installation`,`Backups and diagnostic logs contain installation-wide operational data and require the administrator account.`),i(`div`,{class:`settings-empty-state`,textContent:`Sign in with the administrator account to manage backups and diagnostic logs.`})]}async refreshCoordination(){if(!(!this.appState.session?.is_admin||this.appState.resourceCoordinationBusy)){this.appState.resourceCoordinationBusy=!0,this.renderApp();try{let[e,t]=await Promise.all([this.client.resourceCoordination(),this.client.resourceCoordinationEvents()]);this.appState.resourceCoordination=e,this.appState.resourceCoordinationEvents=t.items}catch(e){this.appState.settingsError=p(e,`Unable to load GPU coordination.`)}finally{this.appState.resourceCoordinationBusy=!1,this.renderApp()}}}async refreshBackups(){if(this.appState.session?.is_admin){this.appState.backupsLoading=!0,this.renderApp();try{this.appState.backupItems=(await this.client.backups()).items}catch(e){this.appState.settingsError=p(e,`Unable to load backups.`)}finally{this.appState.backupsLoading=!1,this.renderApp()}}}endpointCard(e){let t=e.snapshot,n=t?.free_vram_mb==null?F(t?.status??`not checked`):`${t.free_vram_mb} MB free of ${t.total_vram_mb??`unknown`} MB`,r=t?.status===`known`?`Measured`:F(t?.status??`Not checked`);return O(F(e.provider),`${e.endpoint_label} · ${n}`,r,[i(`div`,{class:`settings-readiness-list`},[j(`Capacity reporting`,e.capabilities.reports_capacity?`Supported`:`Unavailable`,e.capabilities.reports_capacity?`ready`:`off`,`Determines whether Nice Assistant can use measured free VRAM instead of unknown capacity.`),j(`Queue reporting`,e.capabilities.reports_queue?`Supported`:`Unavailable`,e.capabilities.reports_queue?`ready`:`off`,`Queue depth helps explain whether the external provider is already busy.`),j(`Release control`,e.capabilities.supports_release?`Adapter supports release`:`Not supported`,e.capabilities.supports_release?`attention`:`off`,`Support does not authorize release. Exclusive control and allow-release must both be explicitly enabled.`),j(`Precise cancellation`,e.capabilities.supports_precise_cancel?`Supported`:`Cooperative or unavailable`,e.capabilities.supports_precise_cancel?`ready`:`off`,`Providers without precise cancellation may finish work whose late result Nice Assistant discards.`)]),t?.message?i(`div`,{class:`meta`,textContent:t.message}):null,B(`This endpoint is exclusively managed by Nice Assistant`,e.authorization.exclusive_control,t=>{e.authorization.exclusive_control=t,t||(e.authorization.allow_release=!1),this.renderApp()},`Enable only if no other application or person uses this exact provider endpoint.`),B(`Allow verified release controls`,e.authorization.allow_release,t=>{e.authorization.allow_release=t&&e.authorization.exclusive_control,this.renderApp()},`Requires exclusive control. Managed mode verifies provider state after every release attempt and records the result.`)],{open:this.openEndpoints.has(e.provider),onToggle:t=>t?this.openEndpoints.add(e.provider):this.openEndpoints.delete(e.provider),testId:`resource-endpoint-${e.provider}`,className:`resource-endpoint-card`,statusClass:t?.status===`known`?`ok`:t?.status===`unavailable`?`fail`:`idle`})}coordinationEvents(){let e=this.appState.resourceCoordinationEvents.length?this.appState.resourceCoordinationEvents.slice(0,20).map(e=>i(`div`,{class:`task-run-row`},[i(`div`,{},[i(`strong`,{textContent:`${F(e.provider)} · ${F(e.action)}`}),i(`div`,{class:`meta`,textContent:`${F(e.outcome)} · ${d(e.created_at)}`})])])):[i(`div`,{class:`settings-empty-state`,textContent:`No coordination events have been recorded yet.`})];return A(`Recent coordination events (${this.appState.resourceCoordinationEvents.length})`,`Content-free operational records of waits, admissions, release attempts, verification, and safe failures.`,e,{testId:`gpu-coordination-events`})}async saveCoordination(){let e=this.appState.resourceCoordination;if(!(!this.appState.session?.is_admin||!e)){this.appState.resourceCoordinationBusy=!0,this.renderApp();try{this.appState.resourceCoordination=await this.client.saveResourceCoordination(e),this.appState.resourceCoordinationEvents=(await this.client.resourceCoordinationEvents()).items}catch(e){this.appState.settingsError=p(e,`Unable to save GPU coordination.`)}finally{this.appState.resourceCoordinationBusy=!1,this.renderApp()}}}async checkCoordination(){if(this.appState.session?.is_admin){this.appState.resourceCoordinationBusy=!0,this.renderApp();try{this.appState.resourceCoordination=await this.client.checkResourceCoordination()}catch(e){this.appState.settingsError=p(e,`Unable to refresh GPU telemetry.`)}finally{this.appState.resourceCoordinationBusy=!1,this.renderApp()}}}async createBackup(e){this.appState.backupActionRunning=!0,this.renderApp();try{await this.client.createBackup(e),await this.refreshBackups()}catch(e){this.appState.settingsError=p(e,`Unable to create the backup.`)}finally{this.appState.backupActionRunning=!1,this.renderApp()}}async deleteBackup(e){if(await this.dialogs.confirm(`Delete backup`,`Permanently delete ${e}? This archive cannot be recovered from Nice Assistant.`,`Delete archive`))try{await this.client.deleteBackup(e),await this.refreshBackups()}catch(e){this.appState.settingsError=p(e,`Unable to delete the backup.`),this.renderApp()}}async verifyBackup(e){this.appState.backupActionRunning=!0,this.renderApp();try{let t=await this.client.verifyBackup(e);this.dialogs.info(`Backup verified`,`${t.name}\nDatabase integrity: ${t.database_integrity}\nMigration: ${t.migration_revision}\nArchive entries: ${t.entry_count}\nIncludes media: ${t.include_media?`yes`:`no`}`)}catch(e){this.appState.settingsError=p(e,`Backup verification failed.`)}finally{this.appState.backupActionRunning=!1,this.renderApp()}}};function Vn(e){return{disabled:`Disabled — preserve provider behavior`,observe:`Observe — wait for measured capacity`,managed:`Managed — allow authorized release controls`}[e]??F(e)}function Hn(e,t,n,r){let i=Number.parseInt(e,10);return Number.isFinite(i)?Math.max(t,Math.min(n,i)):r}function Un(e,t,n,r){let i=Number(e);return Number.isFinite(i)?Math.max(t,Math.min(n,i)):r}var J=[`card_definition`,`card_personality`,`card_style`,`card_behavior`],Wn=[...J,`card_example_dialogue`],Gn={card_definition:`Character definition (facts about who this persona is)`,card_personality:`Character personality (disposition, values, flaws, fears)`,card_style:`Character style (how this persona speaks)`,card_behavior:`Character behavior (how this persona acts)`},Kn={card_definition:`Definition`,card_personality:`Personality`,card_style:`Style`,card_behavior:`Behavior`},qn={card_definition:`Facts about this persona: age, work, living situation, history.`,card_personality:`Disposition, values, flaws, and fears.`,card_style:`Speech patterns, vocabulary, rhythm, and verbal tics.`,card_behavior:`How this persona acts: initiative, humor, conflict, affection.`},Jn=`<START>`,Yn=`{{user}}`,Xn=`{{char}}`,Zn=`User`;function Qn(e){let t=[],n=[];for(let r of String(e??``).split(`
-`)){if(r.trim()===`<START>`){n.some(e=>e.trim())&&t.push(n.join(`
-`).trim()),n=[];continue}n.push(r)}return n.some(e=>e.trim())&&t.push(n.join(`
-`).trim()),t}function $n(e,t){return e.split(Xn).join(t||`Assistant`).split(Yn).join(Zn)}function er(e,t,n){let r=[];for(let i of Qn(e)){let e=[...r,$n(i,t)];if(rr(e.join(`
+`)}if(g)break}}};function os(a){if(!a||a.startsWith(":"))return null;let e=null,t="message",i=[];for(let r of a.split(`
+`))r.startsWith("id:")?e=Number(r.slice(3).trim()):r.startsWith("event:")?t=r.slice(6).trim():r.startsWith("data:")&&i.push(r.slice(5).trimStart());if(!i.length)return null;let n=JSON.parse(i.join(`
+`));return{id:Number.isFinite(e)?e:null,event:t,data:typeof n=="object"&&n!==null?n:{value:n}}}var _=new lt;function s(a,e={},t=[]){let i=document.createElement(a);for(let[r,d]of Object.entries(e))d==null||d===!1||(r==="class"?i.className=String(d):r==="html"?i.innerHTML=String(d):r==="ariaLabel"?i.setAttribute("aria-label",String(d)):r==="ariaHidden"?i.setAttribute("aria-hidden",String(d)):r.startsWith("on")&&typeof d=="function"?i.addEventListener(r.slice(2),d):r==="style"&&typeof d=="object"?Object.assign(i.style,d):r in i?Reflect.set(i,r,d):i.setAttribute(r,String(d)));let n=Array.isArray(t)?t:[t];for(let r of n)r==null||r===!1||i.append(r instanceof Node?r:document.createTextNode(String(r)));return i}function Lt(a){return a.replace(/[&<>"']/g,e=>({"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#39;"})[e]??e)}function ne(a=""){let e=[],t=a.replace(/```([\s\S]*?)```/g,(i,n)=>(e.push(`<pre><code>${Lt(n.trim())}</code></pre>`),`__CODE_${e.length-1}__`));return t=Lt(t).replace(/!\[(.*?)\]\(([^\s)]+)\)/g,'<img src="$2" alt="$1" class="msg-inline-image" loading="lazy" />').replace(/\[(.*?)\]\((https?:\/\/[^\s)]+)\)/g,'<a href="$2" target="_blank" rel="noreferrer">$1</a>').replace(/`([^`]+)`/g,"<code>$1</code>").replace(/^\s*[-*]\s+(.+)$/gm,"<li>$1</li>"),t=t.replace(/(<li>.*<\/li>)/gs,"<ul>$1</ul>"),t=t.split(/\n{2,}/).map(i=>i.startsWith("<")?i:`<p>${i.replace(/\n/g,"<br/>")}</p>`).join(""),e.forEach((i,n)=>{t=t.replace(`__CODE_${n}__`,i)}),t}function $t(a){let e=document.querySelector(a);return e?e.scrollTop:null}function qt(a,e){if(e===null||e<=0)return;let t=document.querySelector(a);t&&(t.scrollTop=e)}function Nt(a){let e=document.activeElement;if(!(e instanceof HTMLInputElement||e instanceof HTMLTextAreaElement)||!a.contains(e))return null;let i=[...a.querySelectorAll("input, textarea")].indexOf(e);return i<0?null:{selector:"input, textarea",index:i,start:e.selectionStart,end:e.selectionEnd}}function dt(a,e,t){if(!e||t)return;let n=a.querySelectorAll(e.selector).item(e.index);!n||n.disabled||(n.focus(),e.start!==null&&e.end!==null&&n.setSelectionRange(e.start,e.end))}function I(a){return a?new Date(a*1e3).toLocaleString([],{month:"short",day:"numeric",hour:"2-digit",minute:"2-digit"}):""}function ue(a=0){if(!a)return"0 B";let e=["B","KB","MB","GB","TB"],t=Math.min(e.length-1,Math.floor(Math.log(a)/Math.log(1024)));return`${(a/1024**t).toFixed(t?1:0)} ${e[t]??"B"}`}function h(a,e){return a instanceof Error&&a.message?a.message:e}async function Ot(a){if(navigator.clipboard?.writeText){await navigator.clipboard.writeText(a);return}let e=document.createElement("textarea");e.value=a,e.style.position="fixed",e.style.opacity="0",document.body.append(e),e.select();try{if(!document.execCommand("copy"))throw new Error("Copy is unavailable.")}finally{e.remove()}}function ct(a,e){let t=document.createElement("a");t.href=a,t.download=e,t.rel="noopener",document.body.append(t),t.click(),t.remove()}var ls={signed_out:new Set(["onboarding","idle","error"]),onboarding:new Set(["idle","signed_out","error"]),idle:new Set(["loading_chat","queued","recording","speaking","signed_out","error"]),loading_chat:new Set(["idle","signed_out","error"]),queued:new Set(["thinking","idle","signed_out","error"]),thinking:new Set(["idle","speaking","signed_out","error"]),recording:new Set(["transcribing","idle","signed_out","error"]),transcribing:new Set(["queued","idle","signed_out","error"]),speaking:new Set(["idle","recording","signed_out","error"]),error:new Set(["idle","signed_out","loading_chat","onboarding"])};function ds(){return{session:null,phase:"signed_out",phaseBeforeError:"signed_out",chats:[],currentChat:null,messages:[],olderMessagesBefore:null,loadingOlderMessages:!1,capabilityRequests:[],personas:[],workspaces:[],settings:null,models:[],memories:[],taskModels:[],taskModelRuns:[],taskModelChecks:{},taskModelBusy:{},mediaCatalog:null,mediaReadiness:null,mediaCatalogBusy:!1,mediaPlanPreview:null,mediaCatalogIdentitySetupIntent:null,identitySettings:null,identityProfiles:{},identityValidations:{},identityEvents:{},identitySelectedPersonaId:null,identityBusy:!1,route:{kind:"home"},statusText:"Signed out",uiError:"",authError:"",settingsError:"",drawerOpen:!1,chatSearch:"",stickMessagesToBottom:!0,showJumpBottom:!1,showSettings:!1,settingsSection:"General",modal:null,generationLog:null,routingPreview:null,selectedPersonaId:null,selectedModel:null,selectedMemoryMode:null,draftMessage:"",showChatControlsMenu:!1,showSystemMessages:!1,showThinkingByDefault:!1,thinkingExpanded:{},showViz:!1,voiceResponsesEnabled:!0,currentAudioMessageId:null,messageAudioById:{},messageAudioErrors:{},pendingRequest:null,recordingStartedAt:0,settingsSaving:!1,settingsSavedAt:0,providerChecks:{},providerChecksRunning:{},backupItems:[],backupsLoading:!1,backupActionRunning:!1,resourceCoordination:null,resourceCoordinationEvents:[],resourceCoordinationBusy:!1,memorySections:{active:!1,pending:!1,activeGlobal:!1,activeWorkspace:!1,activePersona:!1,activeChat:!1,pendingGlobal:!1,pendingWorkspace:!1,pendingPersona:!1,pendingChat:!1,history:!1},personaAvatarPreview:"",chatImagePreview:"",partialTranscript:"",expandedMessageNotes:{},chatImageGallery:[],chatVideoPreview:"",revealedImages:{},showNewChatPersonaModal:!1,newChatPersonaId:null,onboardingRunning:!1,sessionTimer:null,lastActivityAt:Date.now()}}function me(a){a.mediaCatalogIdentitySetupIntent=null}function ht(a,e){let t=a.mediaCatalogIdentitySetupIntent;t&&t.chat_id!==e&&me(a)}var H=100;function F(a,e){let t=a.currentChat?.id===e.chat.id?a.messages:[],i=e.messages[0],n=i?t.findIndex(d=>d.id===i.id):-1,r=n>0?t.slice(0,n):[];a.currentChat=e.chat,a.messages=[...r,...e.messages],a.olderMessagesBefore=r.length?a.olderMessagesBefore:e.next_before??null}var pt=class{constructor(e){this.state=e}state;transition(e,t){if(e===this.state.phase){t&&(this.state.statusText=t);return}if(!ls[this.state.phase].has(e))throw new Error(`Illegal client transition: ${this.state.phase} -> ${e}`);e==="error"&&(this.state.phaseBeforeError=this.state.phase),this.state.phase=e,this.state.statusText=t??cs(e)}recover(){let e=this.state.session?"idle":"signed_out";this.state.phase!==e&&this.transition(e)}};function cs(a){return{signed_out:"Signed out",onboarding:"Setup",idle:"Idle",loading_chat:"Loading",queued:"Queued",thinking:"Thinking",recording:"Listening",transcribing:"Transcribing",speaking:"Speaking",error:"Error"}[a]}var o=ds(),A=new pt(o);var ge=class{constructor(e,t,i=o,n=_){this.authenticated=e;this.renderApp=t;this.appState=i;this.client=n}authenticated;renderApp;appState;client;node(){return s("div",{class:"main-pane glass auth-pane","data-testid":"auth-view"},[s("h2",{textContent:"Nice Assistant Login"}),this.appState.authError?s("div",{class:"error-banner",textContent:this.appState.authError}):null,this.appState.settingsSavedAt?s("div",{class:"success-banner",textContent:"Account created. Please sign in."}):null,s("input",{id:"username",class:"search-input",placeholder:"username",autocomplete:"username","data-testid":"auth-username"}),s("input",{id:"password",class:"search-input",placeholder:"password",type:"password",autocomplete:"current-password","data-testid":"auth-password"}),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Create account","data-testid":"auth-create",onclick:()=>{this.createAccount()}}),s("button",{class:"send-btn",textContent:"Login","data-testid":"auth-login",onclick:()=>{this.login()}})])])}credentials(){return{username:(document.querySelector("#username")?.value??"").trim(),password:document.querySelector("#password")?.value??""}}async createAccount(){let{username:e,password:t}=this.credentials();this.appState.authError="";try{await this.client.createUser(e,t),this.appState.settingsSavedAt=Date.now()}catch(i){this.appState.authError=h(i,"Unable to create account.")}this.renderApp()}async login(){let{username:e,password:t}=this.credentials();this.appState.authError="";try{await this.authenticated(await this.client.login(e,t))}catch(i){this.appState.authError=h(i,"Wrong username and/or password."),this.renderApp()}}};var Ht=0;function ps(a){let e=a.getRandomValues(new Uint8Array(16));e[6]=e[6]&15|64,e[8]=e[8]&63|128;let t=Array.from(e,i=>i.toString(16).padStart(2,"0")).join("");return`${t.slice(0,8)}-${t.slice(8,12)}-${t.slice(12,16)}-${t.slice(16,20)}-${t.slice(20)}`}function ut(a,e=globalThis.crypto){return typeof e?.randomUUID=="function"?`${a}-${e.randomUUID()}`:typeof e?.getRandomValues=="function"?`${a}-${ps(e)}`:(Ht+=1,`${a}-${Date.now().toString(36)}-${Ht.toString(36)}`)}function X(a){return a.replace(/<think>[\s\S]*?<\/think>/gi," ").replace(/```[\s\S]*?```/g," ").replace(/!\[[^\]]*\]\([^)]+\)/g," ").replace(/\[([^\]]+)\]\([^)]+\)/g,"$1").replace(/`([^`]+)`/g,"$1").replace(/<[^>]+>/g," ").replace(/[`*_>#~-]/g," ").replace(/\s+/g," ").trim()}var hs=/!\[[^\]]*\]\(([^)]+)\)/i,Bt=/\[[^\]]*(?:video|download)[^\]]*\]\(([^)]+)\)/i,fe=class{constructor(e=o,t=A,i=_){this.appState=e;this.stateMachine=t;this.client=i}appState;stateMachine;client;onChange=()=>{};setChangeHandler(e){this.onChange=e}async generateImage(e,t,i){let n=this.requiredSettings(),r={prompt:e.trim(),...i?.trim()?{illustrate_text:i.trim()}:{},chat_id:t,provider:n.image_provider,size:n.image_size,quality:n.image_quality,backend:n.image_local_backend,base_url:n.image_local_base_url};return this.generate("image",r)}async generateVideo(e,t){let i=this.requiredSettings();return this.generate("video",{prompt:e.trim(),chat_id:t,provider:i.video_provider,model:i.video_model,size:i.video_size,seconds:i.video_duration})}async generate(e,t){if(!t.prompt)throw new Error(`${e} prompt is required`);let i=null;try{let n=e==="image"?await this.client.imageJob(t):await this.client.videoJob(t);for(i=await this.client.capabilityRequest(n.capability_request_id),await this.refreshChat(t.chat_id??null),this.upsert(i),this.onChange();["queued","running"].includes(i.status);){await new Promise(l=>window.setTimeout(l,350));let r=await this.client.capabilityRequest(i.id),d=r.status!==i.status;i=r,this.upsert(r),d&&(await this.refreshChat(t.chat_id??null,!1),this.onChange())}return await this.refreshChat(t.chat_id??null),i.status!=="completed"?null:this.appState.messages.find(r=>r.attachments?.some(d=>d.capability_request_id===i?.id))??null}catch(n){if(!i)throw this.appState.uiError=h(n,`${e} generation could not start.`),n;return await this.refreshChat(t.chat_id??null).catch(()=>{}),null}finally{this.onChange()}}upsert(e){this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(t=>t.id!==e.id),e].sort((t,i)=>t.requested_at-i.requested_at)}async refreshChat(e,t=!0){if(!e||this.appState.currentChat?.id!==e)return;let[i,n]=await Promise.all([this.client.chat(e,{limit:H}),t?this.client.capabilityRequests(e):Promise.resolve(null)]);this.appState.currentChat?.id===e&&(F(this.appState,i),n&&(this.appState.capabilityRequests=n.items))}requiredSettings(){if(!this.appState.settings)throw new Error("Settings are unavailable.");return this.appState.settings}};async function mt(a,e,t,i=350){for(;;){let n=await a.job(e);if(t?.(n),["completed","failed","cancelled"].includes(n.status))return n;await new Promise(r=>window.setTimeout(r,i))}}function ve(a){return hs.exec(a)?.[1]??""}function ye(a){return Bt.exec(a)?.[1]??""}function Ut(a){return a.replace(Bt,"").trim()}function Dt(a){return X(a.text).slice(0,4e3)}var q={global_default_model:"",default_memory_mode:"saved",stt_provider:"disabled",tts_provider:"disabled",tts_format:"wav",openai_api_key:"",onboarding_done:!1,general_theme:"dark",general_show_system_messages:!1,general_show_thinking:!1,general_auto_logout:!0,general_voice_responses:!0,general_show_viz:!1,tts_voice_openai:"marin",tts_model_openai:"gpt-4o-mini-tts",tts_speed_openai:"1",tts_instructions_openai:"",tts_voice_local:"af_heart",tts_model_local:"kokoro",tts_speed_local:"1",tts_local_base_url:"",stt_streaming:!1,stt_local_base_url:"",stt_local_backend:"openai_api",stt_wyoming_address:"",stt_model_local:"",tts_voice_filter_regions:[],tts_voice_filter_genders:[],tts_voice_filter_query:"",stt_language:"auto",stt_store_recordings:!1,stt_hands_free:!1,image_provider:"disabled",chat_blur_images:!1,pregeneration_enabled:!1,pregeneration_start_hour:2,pregeneration_end_hour:6,image_size:"1024x1024",image_quality:"none",image_local_allow_nsfw:!1,image_local_backend:"automatic1111",image_local_base_url:"",image_local_api_auth:"",image_local_model:"",image_local_steps:"28",image_local_sampler_name:"DPM++ 2M Karras",image_local_scheduler:"",image_local_cfg_scale:"7",image_local_seed:"",image_local_additional_parameters:"",video_provider:"disabled",video_model:"sora-2",video_size:"720x1280",video_duration:"4",models_context_window_tokens:"8192",user_display_name:"",user_profile:"",user_timezone:"local",personas_default_system_prompt:"Be helpful and concise.",workspaces_default_workspace_id:"",models_temperature:"0.7",models_top_p:"1",models_num_predict:"512",models_presence_penalty:"0",models_frequency_penalty:"0",model_overrides:{}},be=["General","TTS","STT","Image Generation","Video Generation","Memory","User","Personas","Workspaces","Models","Task Models","Media Catalog","Persona Pictures","GPU Coordination","Data"],Wt=[{name:"Conversation",sections:["General","Models","Memory"]},{name:"Voice",sections:["TTS","STT"]},{name:"Pictures",sections:["Image Generation","Video Generation","Media Catalog","Persona Pictures"]},{name:"Personas",sections:["Personas","Workspaces","User"]},{name:"System",sections:["Task Models","GPU Coordination","Data"]}],us={TTS:"Spoken replies",STT:"Transcription",User:"Your profile","Task Models":"Background models"};function oe(a){return us[a]??a}var ms={General:["theme","dark","appearance","thinking","system messages","sign out","logout","default model"],Models:["context","tokens","temperature","reply length","output","ollama","sampling","window"],Memory:["remember","forget","semantic","recall","saved","delete memories"],TTS:["voice","speech","speak","read aloud","kokoro","audio","speed","hear"],STT:["microphone","transcribe","whisper","wyoming","dictation","hands-free","talk","recording"],"Image Generation":["pictures","blur","size","quality","comfyui","provider","nsfw","generate"],"Video Generation":["video","clips","duration"],"Media Catalog":["presets","workflows","checkpoints","lora","recipes","templates"],"Persona Pictures":["identity","face","reference photos","likeness","overnight","scenes","pregeneration"],Personas:["character","card","lore","avatar","personality","voice preferences"],Workspaces:["organize","separate","spaces"],User:["profile","about me","name","owner"],"Task Models":["titles","summaries","extraction","capability","scene","helper models"],"GPU Coordination":["vram","gpu","contention","graphics"],Data:["backup","restore","export","retention","recordings","archive"]};function jt(a){let e=a.trim().toLowerCase();return e?be.filter(t=>[t,oe(t),...ms[t]].some(n=>n.toLowerCase().includes(e))):[...be]}var gs={General:["general_theme","general_show_system_messages","general_show_thinking","general_auto_logout","global_default_model"],TTS:["tts_provider","tts_format","tts_voice_openai","tts_model_openai","tts_speed_openai","tts_instructions_openai","tts_voice_local","tts_model_local","tts_speed_local","tts_local_base_url"],STT:["stt_provider","stt_language","stt_hands_free","stt_store_recordings","stt_local_base_url","stt_model_local","stt_streaming","stt_local_backend","stt_wyoming_address"],"Image Generation":["image_provider","chat_blur_images","image_size","image_quality","image_local_allow_nsfw","image_local_backend","image_local_base_url","image_local_api_auth","image_local_model","image_local_steps","image_local_sampler_name","image_local_scheduler","image_local_cfg_scale","image_local_seed","image_local_additional_parameters"],"Video Generation":["video_provider","video_model","video_size","video_duration"],Memory:["default_memory_mode"],User:["user_display_name","user_timezone"],Personas:["personas_default_system_prompt"],Workspaces:["workspaces_default_workspace_id"],Models:["global_default_model","models_temperature","models_top_p","models_num_predict","models_context_window_tokens","models_presence_penalty","models_frequency_penalty","model_overrides"],"Task Models":[],"Media Catalog":[],"Persona Pictures":[],"GPU Coordination":[],Data:[]},fs=new Set(["none","low","medium","high","auto"]),vs=new Set(["1024x1024","1024x1536","1536x1024","auto"]),ys=new Set(["sora-2","sora-2-pro"]),bs=new Set(["4","8","12"]),Vt={"sora-2":["720x1280","1280x720"],"sora-2-pro":["720x1280","1280x720","1024x1792","1792x1024"]};function le(a){let e={...a.preferences};delete e.image_prompt_generation,delete e.image_confirmation_policy;let t=String(e.image_provider??"").trim().toLowerCase();t==="local/automatic1111"?(e.image_provider="local",e.image_local_backend="automatic1111"):t==="local/comfyui"&&(e.image_provider="local",e.image_local_backend="comfyui");let i={...q,...e,global_default_model:a.global_default_model??"",default_memory_mode:a.default_memory_mode==="off"?"off":"saved",stt_provider:a.stt_provider||"disabled",tts_provider:a.tts_provider||"disabled",tts_format:a.tts_format||"wav",openai_api_key:a.openai_api_key??"",onboarding_done:!!a.onboarding_done};return i.image_quality=Xt(i.image_quality),i.image_size=Kt(i.image_size),i.image_local_backend=["automatic1111","comfyui"].includes(String(i.image_local_backend).toLowerCase())?String(i.image_local_backend).toLowerCase():q.image_local_backend,i.video_model=gt(i.video_model),i.video_duration=Qt(i.video_duration),i.video_size=Yt(i.video_model,i.video_size),i.tts_voice_filter_regions=Ft(i.tts_voice_filter_regions),i.tts_voice_filter_genders=Ft(i.tts_voice_filter_genders),i.model_overrides=ws(i.model_overrides)?i.model_overrides:{},i}function z(a){let e={},t=new Set(["global_default_model","default_memory_mode","stt_provider","tts_provider","tts_format","openai_api_key","onboarding_done"]);for(let[i,n]of Object.entries(a))t.has(i)||(e[i]=n);return e.image_size=Kt(a.image_size),e.image_quality=Xt(a.image_quality),e.video_model=gt(a.video_model),e.video_size=Yt(a.video_model,a.video_size),e.video_duration=Qt(a.video_duration),{global_default_model:a.global_default_model||null,default_memory_mode:a.default_memory_mode,stt_provider:a.stt_provider,tts_provider:a.tts_provider,tts_format:a.tts_format,openai_api_key:a.openai_api_key||null,onboarding_done:!!a.onboarding_done,preferences:e}}function Jt(a,e){for(let t of gs[e])a[t]=structuredClone(q[t])}function Z(a,e){let t=a.model_overrides[e]??{};return{temperature:re(t.temperature??a.models_temperature,.7),top_p:re(t.top_p??a.models_top_p,1),num_predict:zt(t.num_predict??a.models_num_predict,512),presence_penalty:re(t.presence_penalty??a.models_presence_penalty,0),frequency_penalty:re(t.frequency_penalty??a.models_frequency_penalty,0),context_window_tokens:zt(t.context_window_tokens??a.models_context_window_tokens,8192)}}function Gt(a,e,t,i){a.model_overrides[e]={...a.model_overrides[e]??{},[t]:i}}function Kt(a){let e=String(a??"").trim().toLowerCase();return vs.has(e)||/^\d{2,5}x\d{2,5}$/.test(e)?e:q.image_size}function Xt(a){let e=String(a??"").trim().toLowerCase(),t=e==="standard"?"medium":e==="hd"?"high":e;return fs.has(t)?t:q.image_quality}function gt(a){let e=String(a??"").trim().toLowerCase();return ys.has(e)?e:q.video_model}function we(a){return Vt[gt(a)]??Vt["sora-2"]??[]}function Yt(a,e){let t=we(a),i=String(e??"").trim().toLowerCase();return t.includes(i)?i:t[0]??q.video_size}function Qt(a){let e=String(a??"").trim();return bs.has(e)?e:q.video_duration}function Ft(a){return Array.isArray(a)?a.map(String):[]}function re(a,e){let t=Number(a);return Number.isFinite(t)?t:e}function zt(a,e){return Math.round(re(a,e))}function ws(a){return typeof a=="object"&&a!==null&&!Array.isArray(a)}var _e=class{constructor(e,t=o,i=A,n=_){this.playback=e;this.appState=t;this.stateMachine=i;this.client=n}playback;appState;stateMachine;client;onChange=()=>{};onNavigate=()=>{};streamAbort=null;capabilityPolls=new Set;configure(e){this.onChange=e.onChange,this.onNavigate=e.onNavigate}async open(e){if(this.appState.currentChat?.id!==e&&(this.appState.revealedImages={}),!(this.appState.currentChat?.id===e&&this.appState.messages.length)&&(this.appState.phase==="error"&&this.stateMachine.recover(),this.appState.phase==="idle")){this.stateMachine.transition("loading_chat"),this.onChange();try{let[t,i]=await Promise.all([this.client.chat(e,{limit:H}),this.client.capabilityRequests(e)]);ht(this.appState,t.chat.id),this.appState.currentChat=t.chat,this.appState.messages=t.messages,this.appState.olderMessagesBefore=t.next_before??null,this.appState.capabilityRequests=i.items,this.appState.selectedPersonaId=t.chat.persona_id,this.appState.selectedModel=t.chat.model_override,this.appState.selectedMemoryMode=t.chat.memory_mode,this.appState.uiError="",this.stateMachine.transition("idle"),this.resumeCapabilities(t.chat.id,i.items)}catch(t){this.appState.uiError=h(t,"Unable to open this chat."),this.stateMachine.transition("error")}finally{this.onChange()}}}async loadOlder(){let e=this.appState.currentChat?.id,t=this.appState.olderMessagesBefore;if(!(!e||!t||this.appState.loadingOlderMessages)){this.appState.loadingOlderMessages=!0,this.onChange();try{let i=await this.client.chat(e,{before:t,limit:H});if(this.appState.currentChat?.id!==e||this.appState.olderMessagesBefore!==t)return;let n=new Set(this.appState.messages.map(r=>r.id));this.appState.messages=[...i.messages.filter(r=>!n.has(r.id)),...this.appState.messages],this.appState.olderMessagesBefore=i.next_before??null,this.appState.stickMessagesToBottom=!1}catch(i){this.appState.uiError=h(i,"Earlier messages could not be loaded.")}finally{this.appState.loadingOlderMessages=!1,this.onChange()}}}async create(e){let t=this.appState.personas.find(r=>r.id===(e??this.appState.selectedPersonaId)),i=this.requiredSettings(),n=await this.client.createChat({workspace_id:t?.workspace_id??this.appState.workspaces[0]?.id??null,persona_id:t?.id??null,model:t?.default_model??(i.global_default_model||null),memory_mode:i.default_memory_mode,title:"New chat"});return this.appState.chats=[n,...this.appState.chats.filter(r=>r.id!==n.id)],ht(this.appState,n.id),this.appState.currentChat=n,this.appState.messages=[],this.appState.olderMessagesBefore=null,this.appState.capabilityRequests=[],this.appState.selectedPersonaId=n.persona_id,this.appState.selectedModel=n.model_override,this.appState.selectedMemoryMode=n.memory_mode,this.onNavigate(n.id),this.onChange(),n}async send(e){let t=e.trim();if(!t||(this.appState.phase==="speaking"&&this.playback.stop(!1),this.appState.pendingRequest)||(this.appState.phase==="error"&&this.stateMachine.recover(),!["idle","transcribing"].includes(this.appState.phase)))return;let i=this.appState.currentChat??await this.create(this.appState.selectedPersonaId),n=this.requiredSettings(),r=this.appState.personas.find(y=>y.id===i.persona_id),d=this.appState.selectedModel??i.model_override??r?.default_model??n.global_default_model,l=this.appState.selectedMemoryMode??i.memory_mode??n.default_memory_mode,c={id:ut("local-user"),role:"user",text:t,created_at:Math.floor(Date.now()/1e3)},p={id:ut("typing"),role:"assistant",text:"",created_at:c.created_at,isTyping:!0};this.appState.messages.push(c,p),this.appState.draftMessage="",this.appState.uiError="",this.stateMachine.transition("queued"),this.onChange();let g=null,u=null;try{let y=await this.client.createTurn(i.id,{text:t,model:d||null,memory_mode:l,model_settings:Z(n,d||"")});c.id=y.turn.user_message_id,p.id=`typing-${y.turn.id}`;let S=new AbortController;g=y.job.id,u=S,this.streamAbort=S,this.appState.pendingRequest={jobId:y.job.id,turnId:y.turn.id,progress:y.job.progress||"Queued",cancel:async()=>{S.abort(),await this.client.cancelJob(y.job.id)}},this.reconcileAcceptedTitle(i.id),await this.consumeTurn(y.turn.id,y.job.id,p,S.signal);let T=await this.client.job(y.job.id);if(T.status!=="completed")throw new Error(T.error||`Turn ${T.status}`);let L=await this.reconcileChat(i.id);this.releaseRequest(g,u),this.stateMachine.transition("idle"),this.onChange(),(Array.isArray(T.result?.followup_job_ids)?T.result.followup_job_ids.filter(O=>typeof O=="string"&&!!O):typeof T.result?.followup_job_id=="string"&&T.result.followup_job_id?[T.result.followup_job_id]:[]).forEach(O=>{this.reconcileFollowup(i.id,O)});let V=[...L.messages].reverse().find(O=>O.role==="assistant");if(V?.text.trim())try{await this.playback.synthesize(V.text,V.id,i.id,i.persona_id)}catch(O){let se=h(O,"Audio could not be played.");this.appState.messageAudioErrors[V.id]=se;try{await this.client.clientEvent("tts.playback_error",se)}catch{}this.onChange()}}catch(y){let S=u?.signal.aborted||y instanceof DOMException&&y.name==="AbortError";this.appState.messages=this.appState.messages.filter(T=>T!==p);try{await this.reconcileChat(i.id)}catch{}S?this.appState.phase!=="idle"&&this.stateMachine.transition("idle"):(this.appState.uiError=h(y,"The conversation turn failed."),this.stateMachine.transition("error"))}finally{this.releaseRequest(g,u),this.onChange()}}async cancel(){let e=this.appState.pendingRequest;if(e){try{await e.cancel(),this.streamAbort?.abort(),this.appState.pendingRequest?.jobId===e.jobId&&(this.appState.pendingRequest=null),["queued","thinking"].includes(this.appState.phase)&&this.stateMachine.transition("idle")}catch(t){this.appState.uiError=h(t,"The current reply could not be canceled.")}this.onChange()}}async hide(e){await this.client.hideChat(e.id),this.appState.chats=this.appState.chats.filter(t=>t.id!==e.id),this.appState.currentChat?.id===e.id&&(this.appState.currentChat=null,this.appState.messages=[],this.appState.capabilityRequests=[]),this.onChange()}async rename(e,t){let i=await this.client.updateChat(e.id,{title:t.trim()});this.mergeChat(i),this.appState.currentChat?.id===i.id&&(this.appState.currentChat=i),this.onChange()}async consumeTurn(e,t,i,n){try{await this.client.streamTurn(e,r=>{this.applyTurnEvent(r,i),this.onChange()},n)}catch(r){if(n.aborted)throw r;let d=await mt(this.client,t,l=>{this.appState.pendingRequest&&(this.appState.pendingRequest.progress=l.progress),this.onChange()});if(d.status!=="completed")throw new Error(d.error||`Turn ${d.status}`)}}applyTurnEvent(e,t){if(e.event==="turn.snapshot"){let i=e.data.accumulated_text;typeof i=="string"&&(t.text=i),e.data.status==="running"&&this.appState.phase==="queued"&&this.stateMachine.transition("thinking")}else if(e.event==="turn.started")this.appState.phase==="queued"&&this.stateMachine.transition("thinking"),this.appState.pendingRequest&&(this.appState.pendingRequest.progress="Thinking\u2026");else if(e.event==="assistant.delta"){let i=e.data.text;typeof i=="string"&&(t.text+=i),t.isTyping=!0}else if(e.event==="turn.failed"){let i=e.data.error;if(typeof i=="object"&&i!==null&&"message"in i)throw new Error(String(i.message))}}mergeChat(e){this.appState.chats=[e,...this.appState.chats.filter(t=>t.id!==e.id)].sort((t,i)=>i.updated_at-t.updated_at)}async reconcileChat(e){let t=await this.client.chat(e,{limit:H});this.appState.currentChat?.id===e&&F(this.appState,t),this.mergeChat(t.chat);try{let i=await this.client.capabilityRequests(e);this.appState.currentChat?.id===e&&(this.appState.capabilityRequests=i.items,this.resumeCapabilities(e,i.items))}catch{}return t}async reconcileAcceptedTitle(e){try{let t=await this.client.chat(e,{limit:1});this.appState.currentChat?.id===e&&(this.appState.currentChat=t.chat),this.mergeChat(t.chat),this.onChange()}catch{}}async reconcileFollowup(e,t){try{await mt(this.client,t),await this.reconcileChat(e),this.onChange()}catch{}}releaseRequest(e,t){e&&this.appState.pendingRequest?.jobId===e&&(this.appState.pendingRequest=null),t&&this.streamAbort===t&&(this.streamAbort=null)}resumeCapabilities(e,t){t.filter(i=>i.attachment&&["queued","running"].includes(i.status)).forEach(i=>{this.capabilityPolls.has(i.id)||(this.capabilityPolls.add(i.id),this.pollCapability(e,i.id))})}async pollCapability(e,t){try{for(;this.appState.currentChat?.id===e;){let i=await this.client.capabilityRequest(t);this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(r=>r.id!==i.id),i].sort((r,d)=>r.requested_at-d.requested_at);let n=await this.client.chat(e,{limit:H});if(this.appState.currentChat?.id!==e||(F(this.appState,n),this.onChange(),!["queued","running"].includes(i.status)))break;await new Promise(r=>window.setTimeout(r,500))}}catch{}finally{this.capabilityPolls.delete(t)}}requiredSettings(){if(!this.appState.settings)throw new Error("Settings are unavailable.");return this.appState.settings}};var Zt=[["#42e8ff","#2b7fd9"],["#a470ff","#6d3fd4"],["#ff7998","#d9436e"],["#ffb45e","#e07f2e"],["#5ee8a4","#2eb877"],["#7f9dff","#4a63d9"],["#ff8fd8","#c957a5"],["#e8d75e","#b8a52e"]];function _s(a){return String(a||"").trim().split(/\s+/).filter(Boolean).slice(0,2).map(i=>i[0]?.toUpperCase()??"").join("")||"?"}function Ss(a){let e=0;for(let t of String(a||""))e=e*31+t.codePointAt(0)>>>0;return e%Zt.length}function ei(a){let[e,t]=Zt[Ss(a)],i=_s(a),n=`<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 96 96'><defs><linearGradient id='g' x1='0' y1='0' x2='1' y2='1'><stop stop-color='${e}'/><stop offset='1' stop-color='${t}'/></linearGradient></defs><rect width='96' height='96' fill='url(#g)'/><text x='48' y='48' dy='0.36em' text-anchor='middle' font-family='Inter, -apple-system, sans-serif' font-size='${i.length>1?34:42}' font-weight='600' fill='rgba(255,255,255,0.94)'>${i}</text></svg>`;return`data:image/svg+xml;utf8,${encodeURIComponent(n)}`}function J(a,e){return(e||"").trim()||ei(a)}function de(a){return e=>{let t=e.currentTarget;t.dataset.monogram||(t.dataset.monogram="true",t.src=ei(a))}}function ti(a){let e=a.target;return e instanceof Element?!e.closest("[data-drawer-toggle]"):!0}var Se=class{constructor(e,t,i,n,r){this.appState=e;this.client=t;this.chat=i;this.dialogs=n;this.callbacks=r}appState;client;chat;dialogs;callbacks;selectedIds=new Set;selectionMode=!1;node(){let e=this.appState.chats.filter(i=>(i.title??"").toLowerCase().includes(this.appState.chatSearch.toLowerCase())),t=e.map(i=>this.row(i));return s("aside",{class:`drawer glass ${this.appState.drawerOpen?"open":""}`},[s("div",{class:"drawer-head"},[s("strong",{textContent:"Chats"}),s("div",{class:"chips"},[s("button",{class:"icon-btn",textContent:this.selectionMode?"Done":"Manage",disabled:this.appState.chats.length===0,"data-testid":"manage-chats",onclick:()=>{this.selectionMode=!this.selectionMode,this.selectionMode||this.selectedIds.clear(),this.callbacks.render()}}),s("button",{class:"icon-btn",textContent:"\u2715",onclick:()=>{this.appState.drawerOpen=!1,this.callbacks.render()}})])]),s("button",{class:"send-btn",textContent:"+ New Chat","data-testid":"new-chat",onclick:this.callbacks.openNewChat}),s("input",{class:"search-input",placeholder:"Search chats\u2026",value:this.appState.chatSearch,oninput:i=>{this.appState.chatSearch=i.currentTarget.value,this.callbacks.render()}}),this.selectionMode?this.bulkBar(e):null,s("div",{class:"drawer-list"},t.length?t:s("div",{class:"meta",textContent:"No chats yet."}))])}reset(){this.selectedIds.clear(),this.selectionMode=!1}row(e){return s("div",{class:`chat-row ${e.id===this.appState.currentChat?.id?"active":""} ${this.selectionMode?"selecting":""}`,onclick:()=>{if(this.selectionMode){this.toggle(e.id);return}this.appState.drawerOpen=!1,this.callbacks.openChat(e.id)}},[this.selectionMode?s("input",{type:"checkbox",checked:this.selectedIds.has(e.id),ariaLabel:`Select ${e.title||"chat"}`,onclick:t=>t.stopPropagation(),onchange:t=>{t.currentTarget.checked?this.selectedIds.add(e.id):this.selectedIds.delete(e.id),this.callbacks.render()}}):null,s("div",{class:"title",textContent:e.title||"Untitled chat"}),s("div",{class:"meta",textContent:I(e.updated_at||e.created_at)}),this.selectionMode?null:s("div",{class:"chat-actions"},[s("button",{class:"icon-btn",textContent:"\u270E",title:"Rename chat",onclick:t=>{t.stopPropagation(),this.rename(e)}}),s("button",{class:"icon-btn",textContent:"Hide",title:"Hide chat",onclick:t=>{t.stopPropagation(),this.hide(e)}})])])}bulkBar(e){return s("div",{class:"chat-bulk-bar","data-testid":"chat-bulk-actions"},[s("div",{class:"meta",textContent:`${this.selectedIds.size} selected`}),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Select visible",disabled:e.length===0,onclick:()=>{e.forEach(t=>this.selectedIds.add(t.id)),this.callbacks.render()}}),s("button",{class:"pill-btn",textContent:"Clear",disabled:this.selectedIds.size===0,onclick:()=>{this.selectedIds.clear(),this.callbacks.render()}}),s("button",{class:"pill-btn",textContent:"Hide",disabled:this.selectedIds.size===0,onclick:()=>{this.bulkAction("hide")}}),s("button",{class:"pill-btn danger",textContent:"Delete",disabled:this.selectedIds.size===0,onclick:()=>{this.bulkAction("delete")}})])])}toggle(e){this.selectedIds.has(e)?this.selectedIds.delete(e):this.selectedIds.add(e),this.callbacks.render()}async rename(e){let t=await this.dialogs.prompt("Rename chat","Choose a new title.",e.title??"");t?.trim()&&await this.chat.rename(e,t)}async hide(e){if(!await this.dialogs.confirm("Hide chat",`Hide ${e.title||"this chat"}?`,"Hide"))return;let t=this.appState.currentChat?.id===e.id;if(await this.chat.hide(e),!t)return;let i=this.appState.chats[0];i?this.callbacks.openChat(i.id):this.callbacks.goHome()}async bulkAction(e){let t=[...this.selectedIds];if(!(!t.length||!(e==="delete"?await this.dialogs.confirm("Permanently delete chats",`Permanently delete ${t.length} selected ${t.length===1?"chat":"chats"} and their transcripts? This cannot be undone. Generated media and completed job records are retained.`,"Delete permanently"):await this.dialogs.confirm("Hide chats",`Hide ${t.length} selected ${t.length===1?"chat":"chats"} from the chat list?`,"Hide")))){try{await this.client.bulkChatAction(e,t);let n=new Set(t);this.appState.chats=this.appState.chats.filter(r=>!n.has(r.id)),this.reset(),this.appState.currentChat&&n.has(this.appState.currentChat.id)&&(this.appState.currentChat=null,this.appState.messages=[],this.appState.capabilityRequests=[],this.callbacks.goHome())}catch(n){this.appState.uiError=h(n,`Unable to ${e} the selected chats.`)}this.callbacks.render()}}};var ii="reply_truncated",ks={summary:"the conversation summary",memory:"saved memories",lore:"this persona's background notes",example_dialogue:"this persona's voice examples"};function si(a){return a.length<=1?a[0]??"":a.length===2?`${a[0]} and ${a[1]}`:`${a.slice(0,-1).join(", ")}, and ${a[a.length-1]}`}function Cs(a){let e=a.trim();if(!e)return null;if(e.startsWith("history_floor_dropped:")){let t=e.slice(22).split(",").map(i=>ks[i.trim()]).filter(i=>!!i);return t.length?`${si(t)} left out to keep recent messages in view.`:"Some saved context was left out to keep recent messages."}return e==="summary_provider_failed"?"the conversation summary could not be updated, so an older one was used.":e==="summary_catchup_limited"?"the conversation summary is still catching up on earlier messages.":e===ii?"this reply reached its length limit and stopped early.":null}function ai(a){if(!a)return null;let e=a.split(";").map(i=>Cs(i)).filter(i=>!!i);return e.length?`Replied with less context than usual: ${si(e)}`:null}function ni(a){return!!(a&&a.split(";").some(e=>e.trim()===ii))}function ri(a){return!!(a&&a.includes("history_floor_dropped:"))}var ke=class{constructor(e,t,i,n=o,r=_,d=async l=>l){this.media=e;this.playback=t;this.renderApp=i;this.appState=n;this.client=r;this.editMemoryProposal=d}media;playback;renderApp;appState;client;editMemoryProposal;message(e,t){let i=e.role==="user";if(!this.appState.showSystemMessages&&["system","tool"].includes(e.role))return null;let{thinking:n,visibleText:r}=xs(e.text),d=!!n&&e.role==="assistant",l=this.appState.showThinkingByDefault||!!this.appState.thinkingExpanded[e.id],c=this.appState.personas.find(ae=>ae.id===(t??this.appState.selectedPersonaId)),p=c?.name??"assistant",g=i?"You":e.role==="assistant"?p:e.role,u=r||e.text,y=ve(u),S=ye(u),T=S?Ut(u):u,L=s("div",{html:ne(T)}),G=(e.attachments??[]).filter(ae=>this.appState.capabilityRequests.find(rs=>rs.id===ae.capability_request_id)?.status!=="pending_confirmation").map(ae=>this.attachmentNode(ae)),V=s("div",{class:"chat-attachments"},G),O=e.role==="assistant"?ai(e.degraded_reason):null;this.bindImagePreviews(L),this.bindImagePreviews(V);let se=this.appState.messageAudioById[e.id],Rt=this.appState.messageAudioErrors[e.id];return s("div",{class:`msg-wrap ${i?"user":""}`,"data-testid":`message-${e.role}`},[!i&&e.role==="assistant"?s("button",{class:"image-preview-trigger msg-avatar-trigger",type:"button",title:`View ${p}'s full-size avatar`,"aria-label":`View ${p}'s full-size avatar`,onclick:()=>{this.appState.personaAvatarPreview=J(p,c?.avatar_url),this.renderApp()}},[s("img",{class:"msg-avatar",src:J(p,c?.avatar_url),onerror:de(p),alt:`${p} avatar`})]):null,s("article",{class:`msg ${i?"user":"assistant"}`},[s("small",{textContent:g}),e.isTyping?s("button",{class:`typing-indicator ${this.appState.pendingRequest?"clickable":""}`,textContent:this.appState.pendingRequest?.progress||"typing\u2026",disabled:!this.appState.pendingRequest,onclick:()=>{this.appState.pendingRequest?.cancel()}}):null,d&&l?s("details",{class:"think-block",open:!0},[s("summary",{textContent:"Model thinking"}),s("div",{class:"think-content",html:ne(n)})]):null,e.isTyping&&!e.text?null:L,G.length?V:null,O?this.quietNote(e,O):null,Rt?s("p",{class:"message-audio-error",textContent:Rt}):null,S?s("button",{class:"msg-video-preview",onclick:()=>{this.appState.chatVideoPreview=S,this.renderApp()}},[s("video",{class:"msg-inline-video",src:S,preload:"metadata",muted:!0,playsInline:!0}),s("span",{class:"msg-video-play",textContent:"\u25B6"}),s("span",{class:"msg-video-label",textContent:"Play video"})]):null,e.isTyping?null:s("div",{class:"msg-actions"},[e.role==="assistant"&&e.text.trim()?s("button",{class:"icon-btn",textContent:"\u{1F5BC}",title:"Generate an image from this reply",onclick:()=>{this.generateImage(e)}}):null,d?s("button",{class:"icon-btn",textContent:l?"\u{1F648}":"\u{1F4AD}",title:l?"Hide thinking":"Show thinking",onclick:()=>{this.appState.thinkingExpanded[e.id]=!l,this.renderApp()}}):null,s("button",{class:"icon-btn",textContent:"\u29C9",title:"Copy",onclick:()=>{Ot(r||e.text)}}),y?s("button",{class:"icon-btn",textContent:"\u2B07",title:"Save image",onclick:()=>ct(y,`nice-assistant-image-${Date.now()}.png`)}):null,S?s("button",{class:"icon-btn",textContent:"\u2B07",title:"Save video",onclick:()=>ct(S,`nice-assistant-video-${Date.now()}.mp4`)}):null,se?s("button",{class:"icon-btn",textContent:"\u27F2",title:"Replay response audio",onclick:()=>{this.replayAudio(e.id,se)}}):null,this.appState.currentAudioMessageId===e.id?s("button",{class:"icon-btn",textContent:"\u25A0",title:"Stop audio",onclick:()=>this.playback.stop()}):null,s("button",{class:"icon-btn",textContent:"\u{1F9E0}",title:"Propose a memory fact",onclick:()=>{this.saveMemory(e)}})])])])}syntheticSystemMessage(e){let t=this.appState.personas.find(i=>i.id===e);return t?.system_prompt?[{id:`system-${t.id}`,role:"system",text:t.system_prompt,created_at:t.created_at}]:[]}quietNote(e,t){let i=!!this.appState.expandedMessageNotes[e.id],n=ri(e.degraded_reason)?" Raise the model context allocation in Settings to fit more.":"",r=ni(e.degraded_reason);return s("div",{class:"msg-note"},[s("button",{class:`msg-note-mark ${r?"truncated":""}`,type:"button",textContent:r?"\u2026":"\xB7",title:`${t}${n}`,"aria-label":`${t}${n}`,"aria-expanded":String(i),"data-testid":`context-notice-${e.id}`,onclick:()=>{this.appState.expandedMessageNotes[e.id]=!i,this.renderApp()}}),i?s("p",{class:"msg-note-detail","data-testid":`context-notice-detail-${e.id}`,textContent:`${t}${n}`}):null])}bindImagePreviews(e){let t=[...e.querySelectorAll(".msg-inline-image")],i=t.map(n=>n.src);t.forEach(n=>{let r=n.src,d=!!this.appState.settings?.chat_blur_images,l=()=>{if(n.classList.contains("image-blurred")){this.appState.revealedImages[r]=!0,n.classList.remove("image-blurred"),n.title="Open image preview",n.setAttribute("aria-label","Open image preview");return}this.appState.chatImagePreview=r,this.appState.chatImageGallery=i,this.renderApp()};n.tabIndex=0,n.setAttribute("role","button"),d&&!this.appState.revealedImages[r]?(n.classList.add("image-blurred"),n.title="Tap to reveal image",n.setAttribute("aria-label","Reveal image")):(n.title="Open image preview",n.setAttribute("aria-label","Open image preview")),n.addEventListener("click",l),n.addEventListener("keydown",c=>{(c.key==="Enter"||c.key===" ")&&(c.preventDefault(),l())})})}attachmentNode(e){let t=this.appState.capabilityRequests.find(n=>n.id===e.capability_request_id),i=e.kind==="image"?"picture":"video";if(e.status==="completed"&&e.content_url){let n=e.kind==="image"?s("img",{class:"msg-inline-image attachment-image",src:e.content_url,alt:"Generated picture"}):s("button",{class:"msg-video-preview",onclick:()=>{this.appState.chatVideoPreview=e.content_url??"",this.renderApp()}},[s("video",{class:"msg-inline-video",src:e.content_url,preload:"metadata",muted:!0,playsInline:!0}),s("span",{class:"msg-video-play",textContent:"\u25B6"}),s("span",{class:"msg-video-label",textContent:"Play video"})]),r=e.kind==="image"?e.frames??[]:[];return s("section",{class:"chat-attachment attachment-completed","data-testid":"chat-attachment"},[n,r.length?s("div",{class:"attachment-frames","data-testid":"attachment-frames"},r.map(d=>s("img",{class:"msg-inline-image attachment-image attachment-frame",src:d.content_url,alt:`Frame ${(d.frame_index??0)+1} of the same set`}))):null,e.identity_state==="unconditioned"?s("p",{class:"attachment-identity",textContent:"No identity reference was applied \xB7 unverified"}):e.identity_state==="verified"?s("p",{class:"attachment-identity",textContent:"Identity match verified"}):e.identity_state==="unverified"?s("p",{class:"attachment-identity",textContent:"Identity match unverified"}):null,e.media_id?s("button",{class:"pill-btn attachment-action attachment-log",textContent:"Generation log",title:"See exactly how this was made","data-testid":"open-generation-log",onclick:()=>{this.openGenerationLog(e.media_id)}}):null,this.attachmentDetails(t)])}return e.status==="failed"?s("section",{class:"chat-attachment attachment-failed","data-testid":"chat-attachment"},[s("span",{textContent:e.safe_error||`That ${i} could not be made.`}),e.retry_available?s("button",{class:"pill-btn attachment-action",textContent:"Retry","data-testid":"retry-chat-attachment",onclick:()=>{this.retryAttachment(e)}}):null,this.attachmentDetails(t)]):e.status==="cancelled"?s("section",{class:"chat-attachment attachment-cancelled","data-testid":"chat-attachment"},[s("span",{textContent:`${ft(i)} canceled.`}),e.retry_available?s("button",{class:"pill-btn attachment-action",textContent:"Retry",onclick:()=>{this.retryAttachment(e)}}):null]):e.status==="retried"?s("section",{class:"chat-attachment attachment-retried",textContent:`${ft(i)} retry started.`}):s("section",{class:"chat-attachment attachment-progress","data-testid":"chat-attachment"},[s("span",{class:"attachment-spinner","aria-hidden":"true"}),s("span",{textContent:e.status==="running"?`Making that ${i}\u2026`:`${ft(i)} queued\u2026`}),t&&["queued","running"].includes(t.status)?s("button",{class:"pill-btn attachment-action",textContent:"Cancel","data-testid":"cancel-chat-attachment",onclick:()=>{this.cancelAttachment(t)}}):null,this.attachmentDetails(t)])}async openGenerationLog(e){try{this.appState.generationLog=await this.client.mediaJournalForMedia(e)}catch{this.appState.uiError="No generation log was recorded for that picture."}this.renderApp()}attachmentDetails(e){if(!e)return null;let i=(e.media_plan?.selected_resources??[]).find(n=>n.resource_type==="model");return s("details",{class:"attachment-details"},[s("summary",{textContent:"Details"}),e.arguments.prompt?s("p",{textContent:String(e.arguments.prompt)}):null,i?s("p",{class:"meta",textContent:`Made with ${i.name} (${i.backend})`}):null])}async cancelAttachment(e){try{await this.client.cancelCapability(e.id),await this.refreshCurrentChat()}catch{this.appState.uiError="That picture could not be canceled."}this.renderApp()}async retryAttachment(e){try{await this.client.retryCapability(e.capability_request_id),await this.refreshCurrentChat()}catch{this.appState.uiError="That picture could not be retried."}this.renderApp()}async refreshCurrentChat(){let e=this.appState.currentChat?.id;if(!e)return;let[t,i]=await Promise.all([this.client.chat(e,{limit:H}),this.client.capabilityRequests(e)]);this.appState.currentChat?.id===e&&(F(this.appState,t),this.appState.capabilityRequests=i.items)}async generateImage(e){let t=Dt(e);await this.media.generateImage(t||"a picture for this conversation",this.appState.currentChat?.id??null,t)}async replayAudio(e,t){try{await this.playback.play(e,t)}catch{this.appState.messageAudioErrors[e]="Audio could not be played.",this.renderApp()}}async saveMemory(e){let t=this.appState.currentChat?.id;if(!t)return;let n=(await this.editMemoryProposal(X(e.text)))?.trim();if(n){try{await this.client.proposeMemory("chat",t,n,e.id),this.appState.memories=(await this.client.memories()).items,this.appState.statusText="Memory fact proposed for review"}catch{this.appState.uiError="That memory fact could not be proposed."}this.renderApp()}}};function ft(a){return a.charAt(0).toUpperCase()+a.slice(1)}function xs(a){let e=/<think>([\s\S]*?)<\/think>/i.exec(a);return e?{thinking:e[1]?.trim()??"",visibleText:a.replace(e[0],"").trim()}:{thinking:"",visibleText:a}}function oi(a){return(a.split("/").pop()??a).replace(/:latest$/,"").replace(/[-_]/g," ")}function li(a,e){let t=[...a.querySelectorAll(".msg-inline-image, .attachment-image")],i=t[t.length-1];!i||e[i.src]||(i.classList.add("image-blurred"),i.title="Tap to reveal image",i.setAttribute("aria-label","Reveal image"))}function di(a,e){return!a.currentChat||!a.olderMessagesBefore?null:s("button",{class:"pill-btn older-messages",textContent:a.loadingOlderMessages?"Loading earlier messages\u2026":"Load earlier messages",disabled:a.loadingOlderMessages,"data-testid":"load-older-messages",onclick:e})}var Ce=class{constructor(e,t=o,i=A,n=_,r=()=>{}){this.renderApp=e;this.appState=t;this.stateMachine=i;this.client=n;this.openIdentitySetup=r}renderApp;appState;stateMachine;client;openIdentitySetup;replanningRequestIds=new Set;node(e){let t=e.capability_key.endsWith("generate_video")?"video":"image",i=typeof e.arguments.prompt=="string"?e.arguments.prompt:"",n=typeof e.result?.text=="string"?e.result.text:"",r=ve(n),d=ye(n),l=e.media_plan,c=e.result?.identityConditioning,p=e.result?.identityWorkflow,g=l?.status==="blocked",u=!!(g&&l.identity_conditioning?.status!=="unconditioned"&&l.requirements.required_features.includes("identity_control")),y=!!(u&&Es(l?.block?.code)),S=l?.identity_conditioning?.status==="unconditioned",T=n?s("div",{class:"capability-result",html:ne(n)}):null;return T?.querySelectorAll("img").forEach(L=>{L.addEventListener("click",()=>{this.appState.chatImagePreview=L.src,this.renderApp()})}),s("section",{class:`capability-card capability-${e.status}`,"data-testid":"capability-request"},[s("div",{class:"capability-heading"},[s("strong",{textContent:`Requested ${t}`}),s("span",{class:"capability-status",textContent:Ps(e.status)})]),i?s("p",{class:"capability-prompt",textContent:i}):null,l?s("details",{class:`capability-plan plan-${l.status}`},[s("summary",{textContent:"Details"}),l.selected_resources.length?s("div",{class:"meta",textContent:`${l.selected_resources.map(L=>L.name).join(" + ")} \xB7 ${l.estimated_vram_mb||"unknown"} MB estimated VRAM`}):null,s("div",{class:"meta",textContent:l.block?.message||l.explanation.summary}),l.identity_conditioning?s("div",{class:"meta",textContent:Ms(l.identity_conditioning.status)}):null,...l.explanation.warnings.map(L=>s("div",{class:"meta",textContent:L})),l.status==="blocked"&&l.requirements.required_features.length?s("div",{class:"meta capability-block-detail",textContent:`Required features: ${l.requirements.required_features.join(", ")}`}):null,...l.status==="blocked"?l.explanation.rejected.flatMap(L=>L.reasons.map(G=>s("div",{class:"meta capability-block-detail",textContent:`${L.name}: ${G}`}))):[]]):null,e.error?s("p",{class:"capability-error",textContent:e.error.message}):null,c?s("p",{class:"meta",textContent:c.status==="unconditioned"?"No persona identity reference was applied. Resemblance is not guaranteed; this result is explicitly unconditioned and unverified.":c.claim_status==="verified"?`Persona identity verified${p?.attempts?` after ${p.attempts} attempt${p.attempts===1?"":"s"}`:""}.`:c.verification_status==="failed"?"Persona identity comparison did not pass; this result is explicitly unverified.":"Persona reference conditioning was applied, but the verifier was unavailable or inconclusive."}):null,T,d?s("button",{class:"pill-btn",textContent:"Play video",onclick:()=>{this.appState.chatVideoPreview=d,this.renderApp()}}):null,e.status==="pending_confirmation"&&(t==="video"||g)?s("div",{class:"capability-actions"},[g?s("button",{class:"send-btn",textContent:y?"Review visual identity":u?"Set up identity control":"Try plan again","data-testid":"configure-capability",disabled:this.replanningRequestIds.has(e.id),onclick:u?()=>this.openIdentitySetup(this.identitySetupIntent(e)):()=>{this.replan(e)}}):t==="video"?s("button",{class:"send-btn",textContent:S?`Generate ${t} without identity matching`:`Generate ${t}`,"data-testid":"approve-capability",onclick:()=>{this.approve(e)}}):null,u?s("button",{class:"pill-btn",textContent:this.replanningRequestIds.has(e.id)?"Checking\u2026":"Try plan again",disabled:this.replanningRequestIds.has(e.id),"data-testid":"retry-capability-plan",onclick:()=>{this.replan(e)}}):null,t==="video"||g?s("button",{class:"pill-btn",textContent:"No thanks","data-testid":"deny-capability",onclick:()=>{this.deny(e)}}):null]):null,["queued","running"].includes(e.status)?s("button",{class:"pill-btn",textContent:"Cancel","data-testid":"cancel-capability",onclick:()=>{this.cancel(e)}}):null,r?s("span",{class:"sr-only",textContent:"Generated image is ready."}):null])}async approve(e){try{let t=await this.client.approveCapability(e.id);if(this.upsert(t),!t.job_id)throw new Error("The capability was approved without a job.");for(await this.refreshChat(t.chat_id);;){let n=await this.client.capabilityRequest(e.id);if(this.upsert(n),!["queued","running"].includes(n.status))break;await this.refreshChat(n.chat_id),this.renderApp(),await new Promise(r=>window.setTimeout(r,350))}let i=await this.client.capabilityRequest(e.id);this.upsert(i),await this.refreshChat(i.chat_id)}catch(t){this.appState.uiError=h(t,"Unable to run the requested capability.")}finally{this.renderApp()}}async replan(e){if(!this.replanningRequestIds.has(e.id)){this.replanningRequestIds.add(e.id),this.renderApp();try{let t=await this.client.replanCapability(e.id);this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(i=>i.id!==e.id&&i.id!==t.id),t].sort((i,n)=>i.requested_at-n.requested_at)}catch(t){this.appState.uiError=h(t,"Unable to check the image plan again.")}finally{this.replanningRequestIds.delete(e.id),this.renderApp()}}}identitySetupIntent(e){return{capability_request_id:e.id,chat_id:e.chat_id,persona_id:e.media_plan?.identity_conditioning?.persona_id??this.appState.currentChat?.persona_id??null,prompt:typeof e.arguments.prompt=="string"?e.arguments.prompt:"",required_features:[...e.media_plan?.requirements.required_features??[]],block_code:e.media_plan?.block?.code??null}}async deny(e){try{this.upsert(await this.client.denyCapability(e.id))}catch(t){this.appState.uiError=h(t,"Unable to deny the capability request.")}this.renderApp()}async cancel(e){try{this.upsert(await this.client.cancelCapability(e.id)),await this.refreshChat(e.chat_id)}catch(t){this.appState.uiError=h(t,"Unable to cancel the capability request.")}this.renderApp()}upsert(e){this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(t=>t.id!==e.id),e].sort((t,i)=>t.requested_at-i.requested_at)}async refreshChat(e){if(!e||this.appState.currentChat?.id!==e)return;let t=await this.client.chat(e,{limit:H});this.appState.currentChat?.id===e&&F(this.appState,t)}};function Ps(a){return{pending_confirmation:"Approval needed",queued:"Queued",running:"Generating",completed:"Completed",failed:"Failed",cancelled:"Cancelled",denied:"Declined",expired:"Expired"}[a]}function Ms(a){return a==="ready"||a==="conditioned"?"Uses the reviewed persona reference for conditioning; the result remains unverified until comparison.":a==="unconditioned"?"No identity workflow will be applied. The image may not resemble the persona and will be labeled unconditioned.":"Persona identity conditioning is not ready for this request."}function Es(a){return["identity_persona_required","identity_profile_unavailable","identity_reference_unavailable","identity_reference_changed"].includes(a??"")}function ci(a){return{busy:["queued","thinking","transcribing"].includes(a),inputLocked:a==="transcribing"}}function vt(a,e,t,i){let n=i&&i.total>1?i:null,r=0,d=(l,c,p)=>s("button",{class:`icon-btn media-preview-step media-preview-step-${l<0?"previous":"next"}`,textContent:p,title:c,"aria-label":c,"data-testid":`image-preview-${l<0?"previous":"next"}`,onclick:g=>{g.stopPropagation(),n?.step(l)}});return s("div",{class:"modal-backdrop media-preview-backdrop","data-testid":"image-preview",onclick:t},[s("div",{class:"media-preview-frame",role:"dialog","aria-modal":"true","aria-label":`${e} preview`,onclick:l=>l.stopPropagation(),ontouchstart:l=>{r=l.changedTouches[0]?.clientX??0},ontouchend:l=>{let p=(l.changedTouches[0]?.clientX??0)-r;Math.abs(p)<45||n?.step(p<0?1:-1)}},[s("button",{class:"icon-btn media-preview-close",textContent:"\u2715",title:"Close preview","aria-label":"Close preview",onclick:t}),...n?[d(-1,"Previous picture","\u2039"),d(1,"Next picture","\u203A")]:[],s("img",{class:"media-preview-image",src:a,alt:e,title:"Close preview",onclick:t}),...n?[s("div",{class:"meta media-preview-count","data-testid":"image-preview-count",textContent:`${n.position+1} of ${n.total}`})]:[]])])}function yt(a,e){let t=a.chatImageGallery;if(t.length<2)return;let i=t.indexOf(a.chatImagePreview);if(i<0)return;let n=t[(i+e+t.length)%t.length];n&&(a.chatImagePreview=n,a.revealedImages[n]=!0)}function pi(a,e){let t=()=>{a.chatVideoPreview="",e()};return s("div",{class:"modal-backdrop media-preview-backdrop","data-testid":"video-preview",onclick:t},[s("div",{class:"media-preview-frame video-preview-frame",role:"dialog","aria-modal":"true","aria-label":"Video preview",onclick:i=>i.stopPropagation()},[s("button",{class:"icon-btn media-preview-close",textContent:"\u2715",title:"Close preview","aria-label":"Close preview",onclick:t}),s("video",{class:"video-preview-media",src:a.chatVideoPreview,controls:!0,autoplay:!0})])])}function hi(a){return a==null?"not measured":a<1e3?`${Math.round(a)} ms`:`${(a/1e3).toFixed(2)} s`}function Ts(a){return a?new Date(a*1e3).toLocaleString():"unknown"}function As(a){let e=a.detail??{},t=Object.keys(e).length>0;return s("li",{class:`generation-log-stage stage-${a.status}`},[s("div",{class:"generation-log-stage-head"},[s("span",{class:"generation-log-stage-name",textContent:a.stage}),s("span",{class:"generation-log-stage-status meta",textContent:a.status}),s("span",{class:"generation-log-stage-duration meta",textContent:hi(a.duration_ms)})]),a.summary?s("p",{class:"generation-log-stage-summary",textContent:a.summary}):null,t?s("details",{class:"generation-log-detail"},[s("summary",{textContent:"Detail"}),s("pre",{textContent:JSON.stringify(e,null,2)})]):null])}function ui(a,e,t){return s("div",{class:"modal-backdrop generation-log-backdrop","data-testid":"generation-log",onclick:t},[s("div",{class:"modal-card glass generation-log-card",role:"dialog","aria-modal":"true","aria-label":"Generation log",onclick:i=>i.stopPropagation()},[s("button",{class:"icon-btn generation-log-close",textContent:"\u2715",title:"Close log",ariaLabel:"Close log",onclick:t}),s("h3",{textContent:"Generation log"}),s("p",{class:"meta",textContent:`${a.kind} \xB7 ${a.origin} \xB7 ${a.status}`}),s("dl",{class:"generation-log-summary"},[s("dt",{textContent:"Started"}),s("dd",{textContent:Ts(a.started_at)}),s("dt",{textContent:"Took"}),s("dd",{textContent:hi(a.duration_ms)}),s("dt",{textContent:"Stages"}),s("dd",{textContent:String(a.stages.length)})]),a.error?s("p",{class:"generation-log-error",textContent:`${a.error.code}: ${a.error.message}`}):null,s("ol",{class:"generation-log-stages"},a.stages.map(As)),s("p",{class:"meta generation-log-privacy"},["Credentials, provider addresses, and server paths are removed from this log, so it is safe to share with the image."]),s("a",{class:"pill-btn generation-log-download",href:e,download:`generation-journal-${a.id}.md`,textContent:"Download log","data-testid":"download-generation-log"})])])}function mi(a,e,t){return a?s("section",{class:"home-hero","data-testid":"home-hero"},[s("img",{class:"home-hero-avatar",src:J(e?.name??"Conversation",e?.avatar_url),onerror:de(e?.name??"Conversation"),alt:"",ariaHidden:!0}),s("div",{class:"home-hero-body"},[s("p",{class:"home-hero-eyebrow",textContent:e?.name??"Conversation"}),s("h2",{class:"home-hero-title",textContent:(a.title??"").trim()||"Untitled conversation"}),s("p",{class:"home-hero-meta",textContent:`Last spoken ${I(a.updated_at)}`})]),s("button",{class:"send-btn home-hero-action",textContent:"Continue","data-testid":"home-start-chat",onclick:()=>t.openChat(a.id)})]):s("section",{class:"home-hero home-hero-empty","data-testid":"home-hero"},[s("p",{class:"home-hero-eyebrow",textContent:"Nothing here yet"}),s("h2",{class:"home-hero-title",textContent:"Start your first conversation"}),s("button",{class:"send-btn home-hero-action",textContent:"Start a conversation","data-testid":"home-start-chat",onclick:()=>t.startChatWith(null)})])}function gi(a,e){return a.length?s("section",{class:"home-card","data-testid":"home-personas"},[s("h2",{class:"home-card-title",textContent:"Talk to"}),s("div",{class:"home-persona-strip"},a.map(t=>s("button",{class:"home-persona",title:`Start a conversation with ${t.name}`,"aria-label":`Start a conversation with ${t.name}`,"data-testid":`home-persona-${t.id}`,onclick:()=>e.startChatWith(t.id)},[s("img",{class:"home-persona-avatar",src:J(t.name,t.avatar_url),onerror:de(t.name),alt:""}),s("span",{class:"home-persona-name",textContent:t.name})])))]):null}function fi(a,e,t){let i=a.map(n=>n.content_url);return s("section",{class:"home-card home-pictures-card"},[s("h2",{class:"home-card-title",textContent:"Recent pictures"}),a.length?s("div",{class:"home-pictures","data-testid":"home-pictures"},a.map(n=>s("button",{class:"home-picture-button",title:n.scene.subject||"Open picture","aria-label":n.scene.subject||"Open picture","data-testid":`home-picture-${n.id}`,onclick:()=>t.openPicture(n.content_url,i)},[s("img",{class:"home-picture",src:n.content_url,alt:n.scene.subject||"A retained picture",loading:"lazy"})]))):s("p",{class:"meta","data-testid":"home-pictures-empty",textContent:e?"None kept yet. Ask a persona for a picture and it will be kept for reuse.":"Checking\u2026"})])}function vi(a,e){return s("section",{class:"home-card","data-testid":"home-now"},[s("h2",{class:"home-card-title",textContent:"Right now"}),s("ul",{class:"home-facts"},a.map(t=>s("li",{class:"home-fact"},[t.section?s("button",{class:"home-fact-button",title:`Open ${t.section} settings`,"data-testid":`home-fact-${t.section}`,onclick:()=>e.openSettings(t.section)},[s("span",{class:"home-fact-label",textContent:t.label}),s("span",{class:"home-fact-value",textContent:t.value})]):s("div",{class:"home-fact-static"},[s("span",{class:"home-fact-label",textContent:t.label}),s("span",{class:"home-fact-value",textContent:t.value})])])))])}var bt=0;function W(a,e="More information"){bt+=1;let t=`settings-info-${bt}`;return s("span",{class:"info-tip"},[s("button",{class:"info-tip-trigger",type:"button",ariaLabel:e,"aria-describedby":t,textContent:"i"}),s("span",{class:"info-tip-content",id:t,role:"tooltip",textContent:a})])}function f(a,e,t="h4"){return s("div",{class:"settings-heading-with-info"},[s(t,{textContent:a}),W(e,`About ${a}`)])}function v(a,e=""){return s("div",{class:`persona-card settings-card ${e}`.trim()},a)}function j(a,e,t,i,n={}){return s("details",{class:`persona-card operator-editor ${n.className??""}`.trim(),open:!!n.open,"data-testid":n.testId,ontoggle:r=>n.onToggle?.(r.currentTarget.open),oninput:n.onInput,onchange:n.onChange},[s("summary",{},[s("div",{class:"operator-editor-summary"},[s("strong",{textContent:a}),s("span",{class:"meta",textContent:e})]),s("span",{class:`provider-status ${n.statusClass??"idle"}`,textContent:t})]),...i])}function E(a,e){return s("div",{class:"settings-intro"},[s("strong",{textContent:a}),s("p",{textContent:e})])}function C(a,e,t,i={}){return s("details",{class:"settings-advanced persona-card",open:!!i.open,"data-testid":i.testId,ontoggle:r=>i.onToggle?.(r.currentTarget.open)},[s("summary",{},[s("strong",{textContent:a}),s("span",{class:"meta",textContent:"Optional"})]),s("p",{class:"meta",textContent:e}),...t])}function x(a,e,t,i){return s("div",{class:"settings-readiness-row"},[s("span",{class:`settings-readiness-dot ${t}`,ariaHidden:!0}),s("div",{},[i?f(a,i,"strong"):s("strong",{textContent:a}),s("span",{class:"meta",textContent:e})])])}function R(a,e,t){return e&&!e.id&&(e.id=`setting-control-${++bt}`),s("div",{class:"setting-row"},[s("div",{class:"setting-label-line"},[s("label",{textContent:a,htmlFor:e?.id??""}),t?W(t,`About ${a}`):null]),e])}function yi(a,e,t,i){return R(a,s("textarea",{value:e,onchange:n=>t(n.currentTarget.value)}),i)}function Y(a,e,t="text"){return s("input",{type:t,value:a,onchange:i=>e(i.currentTarget.value)})}function U(a,e,t,i=n=>n){return s("select",{onchange:n=>t(n.currentTarget.value)},e.map(n=>s("option",{value:n,selected:n===a,textContent:i(n)})))}function ce(a,e,t,i){let n=Number(a);return Number.isFinite(n)?Math.min(t,Math.max(e,n)):i}function k(a){return a.replaceAll("_"," ").replace(/\b\w/g,e=>e.toUpperCase())}var xe=0;function wt(a,e,t){return s("div",{class:"setting-label-line"},[s("label",{textContent:a,htmlFor:e}),t?W(t,`About ${a}`):null])}function m(a,e,t,i="text",n=!0,r){let d=`settings-control-${++xe}`;return s("div",{class:"setting-row"},[wt(a,d,r),s("input",{id:d,class:"search-input",type:i,value:e,oninput:l=>t(l.currentTarget.value),onchange:n?l=>t(l.currentTarget.value):void 0})])}function P(a,e,t,i=!0,n){let r=`settings-control-${++xe}`;return s("div",{class:"setting-row"},[wt(a,r,n),s("textarea",{id:r,class:"search-input",rows:3,value:e,oninput:d=>t(d.currentTarget.value),onchange:i?d=>t(d.currentTarget.value):void 0})])}function w(a,e,t,i,n,r=Is,d=!0,l){let c=`settings-control-${++xe}`;return s("div",{class:"setting-row"},[wt(a,c,l),s("select",{id:c,class:"chip-select",value:e,"data-testid":n,onchange:p=>{i(p.currentTarget.value)}},t.map(p=>s("option",{value:p,selected:p===e,textContent:r(p)})))])}function M(a,e,t,i){let n=`settings-control-${++xe}`;return s("div",{class:"setting-row setting-toggle-row"},[s("label",{class:"checkbox-row",htmlFor:n},[s("input",{id:n,type:"checkbox",checked:e,onchange:r=>t(r.currentTarget.checked)}),a]),i?W(i,`About ${a}`):null])}function Is(a){return a?a.replace(/[-_]/g," ").replace(/\b\w/g,e=>e.toUpperCase()):"None"}var Pe=class{constructor(e,t,i,n){this.appState=e;this.change=t;this.providerControl=i;this.providerPanel=n}appState;change;providerControl;providerPanel;nodes(e,t){return e==="General"?this.general(t):e==="TTS"?this.tts(t):e==="STT"?this.stt(t):e==="Image Generation"?this.image(t):e==="Video Generation"?this.video(t):this.user(t)}general(e){return[E("Choose the everyday experience","Set the appearance, default model, and reply behavior most conversations should use."),v([w("Theme",e.general_theme,["dark","light"],t=>this.change("general_theme",t),void 0,te,!0,"Changes the interface colors for this Nice Assistant account."),w("Default model",e.global_default_model,["",...this.appState.models],t=>this.change("global_default_model",t),void 0,t=>t||"Automatic",!0,"Used when a persona or chat has not selected a different model."),M("Speak assistant replies",e.general_voice_responses,t=>this.change("general_voice_responses",t),"Automatically plays completed speech for assistant replies when TTS is configured."),M("Show the audio visualizer",e.general_show_viz,t=>this.change("general_show_viz",t),"Displays the playback visualization while assistant audio is playing.")]),C("Interface, session, and connection details","Optional visibility, session-expiry, and provider-diagnostic controls.",[v([M("Show system and tool messages",e.general_show_system_messages,t=>this.change("general_show_system_messages",t),"Shows technical messages that are normally hidden from the conversation."),M("Show model thinking by default",e.general_show_thinking,t=>this.change("general_show_thinking",t),"Shows reasoning content only when the selected model and provider return it."),M("Expire inactive sessions automatically",e.general_auto_logout,t=>this.change("general_auto_logout",t),"Ends an inactive browser session after the server-configured session lifetime.")]),this.providerPanel()],{testId:"general-advanced-settings"})]}tts(e){let t=[w("Speech provider",e.tts_provider,["disabled","local","openai"],n=>this.change("tts_provider",n),"tts-provider",ee,!0,"Local uses the configured Kokoro LAN service. OpenAI sends reply text to OpenAI for speech generation.")],i=[w("Completed audio format",e.tts_format,["wav","mp3","opus","aac","flac"],n=>this.change("tts_format",n),void 0,te,!0,"The format stored for completed playback. Live streaming speech is not implemented yet.")];return e.tts_provider==="openai"?(t.push(m("Voice",e.tts_voice_openai,n=>this.change("tts_voice_openai",n),"text",!0,"The OpenAI voice name used unless a persona overrides it."),w("Speech model",e.tts_model_openai,["gpt-4o-mini-tts","tts-1","tts-1-hd"],n=>this.change("tts_model_openai",n),void 0,n=>n,!0,"The OpenAI model that generates completed speech audio."),m("Speaking speed",e.tts_speed_openai,n=>this.change("tts_speed_openai",n),"number",!0,"A multiplier where 1 is the provider default.")),i.push(P("Voice direction",e.tts_instructions_openai,n=>this.change("tts_instructions_openai",n),!0,"Optional performance guidance such as warmth, pacing, or emotional tone."))):e.tts_provider==="local"&&(t.push(m("Kokoro service address",e.tts_local_base_url,n=>this.change("tts_local_base_url",n),"url",!0,"The private-LAN address of the separately deployed Kokoro-compatible service."),m("Voice",e.tts_voice_local,n=>this.change("tts_voice_local",n),"text",!0,"The local service voice used unless a persona overrides it."),m("Speaking speed",e.tts_speed_local,n=>this.change("tts_speed_local",n),"number",!0,"A multiplier where 1 is the provider default.")),i.push(m("Local model name",e.tts_model_local,n=>this.change("tts_model_local",n),"text",!0,"Passed to the local speech service when it supports model selection."))),[E("Choose how replies sound","Speech currently uses completed-audio playback. Streaming and interruption remain future voice work."),v(t),e.tts_provider==="disabled"?s("div",{class:"settings-empty-state",textContent:"Speech playback is off."}):v([f("Connection check","Tests the selected service without changing saved settings."),this.providerControl(e.tts_provider==="local"?"kokoro":"openai")]),C("Speech file and provider details","Optional format and provider-specific controls.",i,{testId:"tts-advanced-settings"})]}stt(e){return[E("Choose how recorded speech becomes text","A local Whisper service keeps a recording on this network. OpenAI is the cloud alternative, and uploads every recording it transcribes."),v([w("Transcription provider",e.stt_provider,["disabled","local","openai"],t=>this.change("stt_provider",t),"stt-provider",ee,!0,"A local service transcribes on this network. OpenAI uploads each completed push-to-talk recording."),w("Language",e.stt_language,["auto","en","es","fr","de"],t=>this.change("stt_language",t),void 0,qs,!0,"Automatic detection is convenient; a fixed language can improve consistency."),...e.stt_provider==="local"?this.localTranscription(e):[]]),e.stt_provider!=="disabled"?v([f("Hands-free listening","A tap starts listening and Nice Assistant decides when you have finished, instead of you holding the button down."),M("Decide when I have finished talking",e.stt_hands_free,t=>this.change("stt_hands_free",t),"Holding the microphone button always works and is never guessed at. This is a judgement, so it can be wrong: it waits for a pause after you have actually spoken, and never ends a turn on silence alone."),M("Transcribe while I am still talking",e.stt_streaming,t=>this.change("stt_streaming",t),"Starts transcribing at each natural pause, so the wait after you stop is one sentence rather than the whole turn. It transcribes more audio in total, so it suits a fast transcription model and not a large one on a busy machine.")]):s("div",{class:"settings-empty-state",textContent:"Hands-free listening needs a transcription provider."}),e.stt_provider!=="disabled"?v([f("Connection check","Tests whether the chosen transcription service is configured and reachable."),this.providerControl(e.stt_provider==="local"?"whisper":"openai")]):s("div",{class:"settings-empty-state",textContent:"Voice transcription is off."}),C("Recording retention","Optional storage behavior for source microphone recordings.",[M("Keep source recordings",e.stt_store_recordings,t=>this.change("stt_store_recordings",t),"Keeps the original recording after transcription. Leave off for the more private default.")],{testId:"stt-advanced-settings"})]}localTranscription(e){let t=e.stt_local_backend==="wyoming";return[w("How it connects",e.stt_local_backend,["openai_api","wyoming"],i=>this.change("stt_local_backend",i),"stt-local-backend",$s,!0,"Wyoming is what Home Assistant voice uses. If you already run faster-whisper for it, choose that."),t?m("Service address",e.stt_wyoming_address,i=>this.change("stt_wyoming_address",i),"text",!0,"The private-LAN host and port of the Wyoming service, port 10300 unless it was changed. The model is whatever that service has loaded."):m("Service address",e.stt_local_base_url,i=>this.change("stt_local_base_url",i),"url",!0,"The private-LAN address of a Whisper service that speaks the OpenAI transcription API."),...t?[]:[m("Model",e.stt_model_local,i=>this.change("stt_model_local",i),"text",!0,"What to ask that service to load. Most accept whisper-1; some want their own identifier.")]]}image(e){let t=[w("Image provider",e.image_provider,["disabled","local","openai"],n=>this.change("image_provider",n),"image-provider",ee,!0,"Local uses Automatic1111 or ComfyUI on your LAN. OpenAI sends the prompt to OpenAI."),M("Blur pictures in chat",e.chat_blur_images,n=>this.change("chat_blur_images",n),"When enabled, the first tap reveals a picture and the second opens the large preview. The default is off."),m("Resolution",e.image_size,n=>this.change("image_size",n),"text",!0,"Enter width \xD7 height, for example 1024x1024. Provider support still determines what can run."),w("Prompt enhancement quality",e.image_quality,["none","low","medium","high","auto"],n=>this.change("image_quality",n),void 0,te,!0,"Controls provider-specific prompt enhancement. None preserves the prompt most directly.")],i=[];return e.image_provider==="local"&&(t.push(w("Local image service",e.image_local_backend,["automatic1111","comfyui"],n=>this.change("image_local_backend",n),void 0,n=>n==="automatic1111"?"Automatic1111":"ComfyUI",!0,"Choose the API exposed by the local image container."),m("Service address",e.image_local_base_url,n=>this.change("image_local_base_url",n),"url",!0,"The private-LAN address of the selected image service."),m("Model or checkpoint",e.image_local_model,n=>this.change("image_local_model",n),"text",!0,"Used by direct image actions. Platform-planned persona images use the Media Catalog selection instead."),M("Allow explicit local prompts",e.image_local_allow_nsfw,n=>this.change("image_local_allow_nsfw",n),"Allows explicit prompt content only for the self-hosted local image path.")),i.push(m("Basic authentication",e.image_local_api_auth,n=>this.change("image_local_api_auth",n),"password",!0,"Optional user:password credentials for the local image service."),m("Steps",e.image_local_steps,n=>this.change("image_local_steps",n),"number",!0,"Higher values may refine an image but take longer."),m("Sampler",e.image_local_sampler_name,n=>this.change("image_local_sampler_name",n),"text",!0,"Sampling algorithm passed to compatible local backends."),m("Scheduler",e.image_local_scheduler,n=>this.change("image_local_scheduler",n),"text",!0,"Optional scheduler name for compatible local backends."),m("CFG scale",e.image_local_cfg_scale,n=>this.change("image_local_cfg_scale",n),"number",!0,"Controls how strongly generation follows the prompt."),m("Seed",e.image_local_seed,n=>this.change("image_local_seed",n),"text",!0,"Reuse a seed for repeatability, or leave blank for a new result."),P("Additional JSON parameters",e.image_local_additional_parameters,n=>this.change("image_local_additional_parameters",n),!0,"Advanced provider payload values. Invalid or unsupported fields can make generation fail."))),[E("Choose the default image path","These defaults power direct image actions. Persona-planned generation may select richer Media Catalog resources."),v(t),this.appState.mediaReadiness?v([f("Images readiness",this.appState.mediaReadiness.basic_generation.message),s("div",{class:"settings-readiness-facts",textContent:[`Provider: ${this.appState.mediaReadiness.provider.reachable?"reachable":this.appState.mediaReadiness.provider.status}`,`Basic generation: ${this.appState.mediaReadiness.basic_generation.ready?"ready":"not ready"}`,`Optional identity enhancement: ${this.appState.mediaReadiness.optional_identity.ready?"ready":"not configured"}`].join(" \xB7 ")})]):null,e.image_provider==="disabled"?s("div",{class:"settings-empty-state",textContent:"Image generation is off."}):v([f("Connection check","Tests the selected image service with the current unsaved values."),this.providerControl(e.image_provider==="local"?e.image_local_backend:"openai")]),e.image_provider==="local"?C("Local generation tuning","Optional authentication and sampling controls for direct local image actions.",i,{testId:"image-advanced-settings"}):null].filter(n=>n!==null)}video(e){return[E("Choose the default video path","Video generation is optional and currently uses completed OpenAI jobs."),v([w("Video provider",e.video_provider,["disabled","openai"],t=>this.change("video_provider",t),"video-provider",ee,!0,"OpenAI sends the prompt to OpenAI and polls until the video is complete."),w("Model",e.video_model,["sora-2","sora-2-pro"],t=>{this.change("video_model",t,!1),this.change("video_size",we(t)[0]??q.video_size)},void 0,t=>t,!0,"The selected model determines the available sizes and provider cost."),w("Size",e.video_size,[...we(e.video_model)],t=>this.change("video_size",t),void 0,t=>t,!0,"Output width \xD7 height. Portrait sizes are listed with the narrower dimension first."),w("Duration",e.video_duration,["4","8","12"],t=>this.change("video_duration",t),void 0,t=>`${t} seconds`,!0,"Longer videos take more time and may cost more.")]),e.video_provider==="openai"?v([f("Connection check","Tests whether OpenAI video generation is configured and reachable."),this.providerControl("openai")]):s("div",{class:"settings-empty-state",textContent:"Video generation is off."})]}user(e){return[E("Your account defaults","Set how your name and local time appear. Provider credentials remain server-side."),v([m("Display name",e.user_display_name,t=>this.change("user_display_name",t),"text",!0,"The friendly name Nice Assistant may use for this account."),P("About you",e.user_profile,t=>this.change("user_profile",t),!0,"A few durable facts about you, sent with every message. Keep it short: it is always present, so it competes with the conversation itself."),m("Timezone",e.user_timezone,t=>this.change("user_timezone",t),"text",!0,"Use local for the browser timezone, or enter a standard timezone such as America/New_York.")]),C("Provider credentials","Credentials are encrypted at rest and are never returned to the browser in full.",[m("OpenAI API key",e.openai_api_key,t=>this.change("openai_api_key",t),"password",!0,"Used server-side for enabled OpenAI speech, transcription, image, and video features.")],{testId:"user-advanced-settings"})]}},Rs=new Set(["openai","openai-image","openai-video"]),Ls=new Set(["ollama","local","local-image","kokoro","compreface"]);function ee(a){return a==="disabled"?"Off":a==="local"?"Local service \u2014 on this machine":Rs.has(a)?`${te(a)} \u2014 leaves this machine`:Ls.has(a)?`${te(a)} \u2014 on this machine`:`${te(a)} \u2014 nobody has said where this runs`}function $s(a){return a==="wyoming"?"Wyoming \u2014 Home Assistant voice services":"OpenAI-compatible \u2014 speaches, whisper.cpp, LocalAI"}function qs(a){return{auto:"Detect automatically",en:"English",es:"Spanish",fr:"French",de:"German"}[a]??a}function te(a){return a?a.replace(/[-_]/g," ").replace(/\b\w/g,e=>e.toUpperCase()):"None"}var Ns=Array.from({length:24},(a,e)=>e);function Os(a){return`${String(a).padStart(2,"0")}:00`}function Hs(a){return new Date(a*1e3).toLocaleDateString(void 0,{month:"short",day:"numeric"})}var Me=class{constructor(e,t,i){this.appState=e;this.client=t;this.renderApp=i}appState;client;renderApp;saving=!1;node(e,t){return s("section",{class:"home-card","data-testid":"home-controls"},[s("h2",{class:"home-card-title",textContent:"Quick settings"}),this.chatModel(),this.images(),this.pregeneration(e,t),this.speech(),this.memory()])}chatModel(){let e=this.appState.settings,t=e?.global_default_model||"";return s("div",{class:"home-control-row","data-testid":"home-chat-model"},[s("span",{class:"meta",textContent:"Chat model"}),s("select",{class:"chip-select","data-testid":"home-chat-model-select",disabled:this.saving||!e||!this.appState.models.length,onchange:i=>{this.appState.settings&&(this.appState.settings.global_default_model=i.currentTarget.value,this.save())}},[s("option",{value:"",selected:!t,textContent:"Automatic"}),...this.appState.models.map(i=>s("option",{value:i,selected:i===t,textContent:i}))])])}images(){let e=this.appState.settings,t=e?.image_provider??"disabled";return s("div",{class:"home-control-row","data-testid":"home-image-provider"},[s("span",{class:"meta",textContent:"Pictures"}),s("select",{class:"chip-select","data-testid":"home-image-provider-select",disabled:this.saving||!e,onchange:i=>{this.appState.settings&&(this.appState.settings.image_provider=i.currentTarget.value,this.save())}},["disabled","local","openai"].map(i=>s("option",{value:i,selected:i===t,textContent:ee(i)})))])}async save(){if(!(!this.appState.settings||this.saving)){this.saving=!0,this.renderApp();try{this.appState.settings=le(await this.client.updateSettings(z(this.appState.settings)))}catch(e){this.appState.uiError=h(e,"That setting could not be saved.")}finally{this.saving=!1,this.renderApp()}}}pregeneration(e,t){let i=this.appState.settings,n=!!e?.deployment_forbids,r=n?!1:!!(i?.pregeneration_enabled??e?.enabled??!1);return s("div",{class:"home-control","data-testid":"home-pregeneration"},[s("label",{class:"home-control-row"},[s("input",{type:"checkbox",checked:r,disabled:n||this.saving||!i,"data-testid":"home-pregeneration-toggle",onchange:d=>{this.appState.settings&&(this.appState.settings.pregeneration_enabled=d.currentTarget.checked,this.save())}}),s("span",{textContent:"Make pictures overnight"})]),n?s("p",{class:"meta","data-testid":"home-pregeneration-forbidden",textContent:"Turned off for this deployment, so it cannot be switched on here."}):s("div",{class:"home-control-row"},[s("span",{class:"meta",textContent:"Between"}),this.hourSelect("pregeneration_start_hour",e?.start_hour??2),s("span",{class:"meta",textContent:"and"}),this.hourSelect("pregeneration_end_hour",e?.end_hour??6)]),this.status(e,t)])}hourSelect(e,t){let i=this.appState.settings,n=Number(i?.[e]??t);return s("select",{class:"chip-select","data-testid":`home-${e.replace(/_/g,"-")}`,disabled:this.saving||!i,onchange:r=>{this.appState.settings&&(this.appState.settings[e]=Number(r.currentTarget.value),this.save())}},Ns.map(r=>s("option",{value:String(r),selected:r===n,textContent:Os(r)})))}status(e,t){if(!e)return s("p",{class:"meta",textContent:"Not known \u2014 the readiness check did not answer."});let i=e.approved_waiting?`${e.approved_waiting} ${e.approved_waiting===1?"scene":"scenes"} waiting`:"Nothing waiting",n=t?`last made ${Hs(t.updated_at)}`:"none made yet",r=[`${i.charAt(0).toUpperCase()}${i.slice(1)} \xB7 ${n}.`];return e.inside_window&&e.reason&&r.push(e.reason),s("div",{class:"home-control-status","data-testid":"home-pregeneration-status"},r.map(d=>s("p",{class:"meta",textContent:d})))}speech(){let e=this.appState.settings;return s("label",{class:"home-control-row","data-testid":"home-speech"},[s("input",{type:"checkbox",checked:!!e?.general_voice_responses,disabled:this.saving||!e,"data-testid":"home-speech-toggle",onchange:t=>{this.appState.settings&&(this.appState.settings.general_voice_responses=t.currentTarget.checked,this.save())}}),s("span",{textContent:"Speak replies aloud"})])}memory(){let e=this.appState.settings,t=e?.default_memory_mode==="off"?"off":"saved";return s("div",{class:"home-control-row","data-testid":"home-memory"},[s("span",{textContent:"Saved memory"}),s("select",{class:"chip-select",disabled:this.saving||!e,"data-testid":"home-memory-mode",onchange:i=>{if(!this.appState.settings)return;let n=i.currentTarget.value;this.appState.settings.default_memory_mode=n==="off"?"off":"saved",this.save()}},[s("option",{value:"saved",selected:t==="saved",textContent:"Use it in new chats"}),s("option",{value:"off",selected:t==="off",textContent:"Do not use it"})])])}};var Bs=6,Us=12;function Ds(a){return(a.title??"").trim()||"Untitled conversation"}function Vs(a){let e=new Date(a.started_at*1e3).toLocaleDateString(void 0,{month:"short",day:"numeric"});return a.status==="running"?`Running since ${e}`:a.status!=="completed"?`${a.status} \xB7 ${e}`:`${a.duration_ms?`${(a.duration_ms/1e3).toFixed(1)}s`:"done"} \xB7 ${e}`}var Ee=class{constructor(e,t,i,n){this.appState=e;this.client=t;this.actions=i;this.renderApp=n;this.controls=new Me(e,t,n)}appState;client;actions;renderApp;journals=[];pictures=[];production=null;produced=null;controls;locality=null;loaded=!1;failed="";async refresh(){this.loaded=!1,this.failed="";try{let[e,t,i,n,r]=await Promise.all([this.client.mediaJournals(5).catch(()=>({items:[]})),this.client.libraryEntries().catch(()=>({items:[]})),this.client.productionReadiness().catch(()=>null),this.client.sceneBacklog("done").catch(()=>({items:[]})),this.client.dataLocality().catch(()=>null)]);this.locality=r,this.journals=e.items,this.pictures=t.items.slice(0,Us),this.production=i,this.produced=[...n.items].sort((d,l)=>l.updated_at-d.updated_at)[0]??null}catch{this.failed="Some of this could not be loaded."}finally{this.loaded=!0,this.renderApp()}}node(){let t=this.appState.chats.filter(i=>!i.hidden_in_ui)[0]??null;return s("main",{class:"home","data-testid":"home"},[this.header(),mi(t,this.appState.personas.find(i=>i.id===t?.persona_id),this.actions),fi(this.pictures,this.loaded,this.actions),s("div",{class:"home-columns"},[gi(this.appState.personas,this.actions),this.recentCard(),vi(this.facts(),this.actions),this.localityCard(),this.controls.node(this.production,this.produced)]),this.failed?s("p",{class:"meta",textContent:this.failed}):null])}facts(){return[{label:"New chat uses",value:this.bindingLabel(),section:"Personas"},{label:"Last generation",value:this.lastGenerationLabel()}]}header(){return s("header",{class:"home-header"},[s("h1",{class:"home-title",textContent:"Nice Assistant"})])}localityCard(){let e=this.locality;return e?s("section",{class:"home-card","data-testid":"home-locality"},[s("h2",{class:"home-card-title",textContent:"Where this goes"}),s("p",{class:"meta","data-testid":"home-locality-summary",textContent:e.everything_local?"Everything switched on runs on this machine.":"Some of this leaves this machine, or nobody has said whether it does."}),s("ul",{class:"home-facts"},e.parts.map(t=>s("li",{class:"home-fact",title:t.detail,"data-testid":`home-locality-${t.locality}`},[s("span",{class:"home-fact-label",textContent:t.label}),s("span",{class:`home-fact-value locality-${t.locality}`,textContent:t.locality==="off"?"Off":t.locality==="cloud"?`${t.provider} \u2014 leaves this machine`:t.locality==="unknown"?`${t.provider} \u2014 nobody has said where this runs`:`${t.provider} \u2014 on this machine`})])))]):null}fact(e,t){return s("li",{class:"home-fact"},[s("span",{class:"home-fact-label",textContent:e}),s("span",{class:"home-fact-value",textContent:t})])}bindingLabel(){let e=this.appState.selectedPersonaId??this.appState.personas[0]?.id??null,t=this.appState.personas.find(r=>r.id===e);if(!t)return"No persona yet \u2014 create one in Settings";let i=t.workspace_id??t.workspace_ids[0],n=this.appState.workspaces.find(r=>r.id===i);return n?`${t.name} in ${n.name}`:t.name}chatModelLabel(){let e=this.appState.settings?.global_default_model||this.appState.models[0];return e||"No model installed \u2014 check the provider in Settings"}imagesLabel(){let e=this.appState.mediaReadiness;return e?e.basic_generation.ready?"Ready":e.basic_generation.message:"Not known \u2014 the readiness check did not answer"}productionLabel(){if(!this.loaded)return"Checking\u2026";let e=this.production;return e?e.deployment_forbids?"Turned off for this deployment":e.enabled?`On, ${e.window}`:"Off":"Not known \u2014 the readiness check did not answer"}lastGenerationLabel(){if(!this.loaded)return"Checking\u2026";let e=this.journals[0];return e?Vs(e):"Nothing generated yet"}recentCard(){let e=this.appState.chats.filter(t=>!t.hidden_in_ui).slice(1,Bs+1);return e.length?s("section",{class:"home-card"},[s("h2",{class:"home-card-title",textContent:"Recent conversations"}),e.length?s("ul",{class:"home-list","data-testid":"home-recent"},e.map(t=>s("li",{},[s("button",{class:"home-list-row",textContent:Ds(t),onclick:()=>this.actions.openChat(t.id)})]))):null]):null}};async function bi(a,e,t,i,n){a.onboardingRunning=!0;try{let r=a.workspaces[0];if(!r){let l=await t.prompt("Welcome to Nice Assistant","Name your first workspace.","Main Workspace");if(!l?.trim())throw new Error("First-run setup needs a workspace.");r=await e.createWorkspace(l.trim()),a.workspaces.push(r)}let d=a.personas[0];if(!d){let l=await t.prompt("Create first persona","Give your assistant a persona name.","Assistant");if(!l?.trim())throw new Error("First-run setup needs a persona.");let c=await t.prompt("Default personality","Set the initial persona instruction.","Be helpful and concise.");d=await e.createPersona({workspace_id:r.id,workspace_ids:[r.id],name:l.trim(),system_prompt:c?.trim()||"Be helpful and concise.",default_model:a.models[0]??null}),a.personas.push(d)}a.selectedPersonaId=d.id,a.newChatPersonaId=d.id,a.settings&&(a.settings.onboarding_done=!0,await e.updateSettings(z(a.settings))),i.transition("idle")}catch(r){a.uiError=h(r,"Unable to complete first-run setup."),i.transition("error")}finally{a.onboardingRunning=!1,n()}}var Fs={mp3:"audio/mpeg",aac:"audio/aac"};function wi(a){let e=Fs[String(a||"").toLowerCase()];return e&&globalThis.MediaSource?.isTypeSupported?.(e)?e:null}var Te=class{source=null;buffer=null;url="";async open(e){let t=new MediaSource;return this.source=t,this.url=URL.createObjectURL(t),await new Promise(i=>{t.addEventListener("sourceopen",()=>i(),{once:!0})}),this.buffer=t.addSourceBuffer(e),this.url}async append(e){let t=this.buffer;t&&(await this.settled(t),t.appendBuffer(e),await this.settled(t))}async end(){let e=this.source;!e||e.readyState!=="open"||(this.buffer&&await this.settled(this.buffer),e.endOfStream())}close(){this.url&&URL.revokeObjectURL(this.url),this.url="",this.buffer=null,this.source=null}settled(e){return e.updating?new Promise(t=>{e.addEventListener("updateend",()=>t(),{once:!0})}):Promise.resolve()}};var zs="X-Nice-Assistant-Audio-Id",Ae=class{constructor(e,t,i=o,n=A,r=_,d=()=>new Te){this.audio=e;this.visualizer=t;this.appState=i;this.stateMachine=n;this.client=r;this.createSink=d;e.addEventListener("ended",this.finishActive),e.addEventListener("error",this.failActive)}audio;visualizer;appState;stateMachine;client;createSink;onChange=()=>{};sequence=0;activePlaybackToken=null;synthesis=null;setChangeHandler(e){this.onChange=e}async synthesize(e,t,i,n){let r=this.appState.settings,d=X(e);if(!r||r.tts_provider==="disabled"||!this.appState.voiceResponsesEnabled||!d)return;let l=r.tts_format||"wav",c=wi(l);if(c&&await this.speakWhileArriving(d,t,i,n,l,c))return;let p=this.begin(t),g=new AbortController;this.synthesis=g;let u;try{u=await this.client.synthesize({text:d,chat_id:i,persona_id:n,format:r.tts_format||"wav"},g.signal)}catch(y){if(g.signal.aborted)return;throw y}finally{this.synthesis===g&&(this.synthesis=null)}p===this.sequence&&(this.appState.messageAudioById[t]=u.audio_url,await this.playPrepared(t,u.audio_url,p))}async speakWhileArriving(e,t,i,n,r,d){let l=this.begin(t),c=new AbortController;this.synthesis=c;let p=this.createSink(),g=!1;try{let u=await this.client.streamSpeech({text:e,chat_id:i,persona_id:n,format:r},c.signal),y=u.body;if(!y)return!1;let S=u.headers.get(zs),T=await p.open(d);if(l!==this.sequence)return!0;g=!0,this.playPrepared(t,T,l);let L=y.getReader();for(;;){let{done:G,value:V}=await L.read();if(G)break;if(l!==this.sequence)return!0;await p.append(V)}return await p.end(),S&&(this.appState.messageAudioById[t]=`/api/v1/audio/${S}`),!0}catch{return c.signal.aborted?!0:g}finally{p.close(),this.synthesis===c&&(this.synthesis=null)}}async play(e,t){let i=this.begin(e);await this.playPrepared(e,t,i)}stop(e=!0){this.sequence+=1,this.activePlaybackToken=null,this.synthesis?.abort(),this.synthesis=null,this.haltAudio(),this.appState.phase==="speaking"&&this.stateMachine.transition("idle"),e&&this.onChange()}begin(e){return this.stop(!1),delete this.appState.messageAudioErrors[e],this.sequence}async playPrepared(e,t,i){if(i===this.sequence){this.visualizer.connectAudio(),this.audio.src=t,this.activePlaybackToken=i,this.appState.currentAudioMessageId=e;try{if(await this.audio.play(),i!==this.sequence||this.appState.phase!=="idle"){this.activePlaybackToken===i&&(this.activePlaybackToken=null,this.haltAudio());return}this.stateMachine.transition("speaking"),this.onChange()}catch{if(i!==this.sequence)return;this.activePlaybackToken=null,this.haltAudio(),this.appState.phase==="speaking"&&this.stateMachine.transition("idle"),this.appState.messageAudioErrors[e]="Audio is ready. Use replay to listen.",this.onChange()}}}haltAudio(){this.audio.pause(),this.audio.currentTime=0,this.appState.currentAudioMessageId=null}finishActive=()=>{this.activePlaybackToken!==null&&(this.sequence+=1,this.activePlaybackToken=null,this.haltAudio(),this.appState.phase==="speaking"&&this.stateMachine.transition("idle"),this.onChange())};failActive=()=>{let e=this.appState.currentAudioMessageId;e&&(this.appState.messageAudioErrors[e]="Audio could not be played."),this.finishActive()}};var _i="nice-assistant-pcm",Ws=`
+class PcmPieces extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.pending = new Int16Array(Math.round(sampleRate / 4));
+    this.filled = 0;
+    this.port.onmessage = () => {
+      const last = this.pending.slice(0, this.filled);
+      this.filled = 0;
+      this.port.postMessage({ last: last.buffer }, [last.buffer]);
+    };
+  }
 
-`))>n)break;r.length=0,r.push(...e)}return r}function tr(e){return J.reduce((t,n)=>(t[n]=(e[n]??``).trim(),t),{})}function nr(e){let t=tr(e);return J.filter(e=>t[e]).map(e=>`${Gn[e]}: ${t[e]}`).join(`
-`)}function rr(e){return e?Math.max(1,Math.ceil(new TextEncoder().encode(e).length/3)):0}function ir(e){return rr(nr(e))}function ar(e,t){let n=(e[t]??``).trim();return n?rr(`${Gn[t]}: ${n}`):0}function or(e){let t=e.card_cap_tokens??0,n=e.card_prompt_budget_tokens??0,r=ir(e);return{used:r,cap:t,promptBudget:n,contextWindow:e.card_context_window_tokens??0,remainingForHistory:Math.max(0,Math.round(n*.65)-r),overBy:Math.max(0,r-t),over:r>t}}function sr(e){let t=Qn(e.card_example_dialogue).length;if(!t)return`No example exchanges yet. Separate each one with a ${Jn} line.`;let n=e.example_budget_tokens??0,r=er(e.card_example_dialogue,e.name,n).length,i=t===1?`exchange`:`exchanges`;return r>=t?`${t} ${i}, all of which fit in the ${n}-token allowance.`:`${t} ${i}; the first ${r} fit in the ${n}-token allowance and the rest are left out. Shorten them, or raise the model context allocation in Settings.`}var cr=class{renderApp;appState;client;constructor(e,t=y,n=r){this.renderApp=e,this.appState=t,this.client=n}node(e){let t=i(`div`,{class:`meta character-card-meter`,"data-testid":`character-card-meter-${e.id}`}),n=i(`div`,{class:`meta character-card-meter`,"data-testid":`character-card-example-meter-${e.id}`}),r=new Map,a=()=>{let i=or(e);for(let[t,n]of r)n.textContent=`${ar(e,t)} tokens`;t.textContent=i.over?`${i.used} of ${i.cap} tokens — ${i.overBy} over the limit. Saving this card will be rejected.`:`${i.used} of ${i.cap} tokens · about ${i.remainingForHistory} tokens left for conversation history.`,t.classList.toggle(`settings-warning`,i.over),n.textContent=sr(e)},o=J.map(t=>{let n=i(`span`,{class:`meta`,"data-testid":`character-card-count-${t}-${e.id}`});return r.set(t,n),i(`div`,{class:`character-card-field`},[R(Kn[t],e[t]??``,n=>{e[t]=n,a()},!1,qn[t]),n])}),s=i(`div`,{class:`character-card-field`},[R(`Example dialogue`,e.card_example_dialogue??``,t=>{e.card_example_dialogue=t,a()},!1,`Sample exchanges that show how this persona talks. Separate each one with a ${Jn} line, and write ${Xn} for the persona and ${Yn} for whoever is talking to them.`)]);return a(),A(`Character card`,`Durable character material sent with every turn. The card is never dropped to make room, so it is capped when you save it. Example dialogue is optional context: it yields before the conversation does.`,[...o,t,s,n,i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Save character card`,"data-testid":`character-card-save-${e.id}`,onclick:()=>void this.save(e)})])],{testId:`character-card-${e.id}`})}async save(e){let t=Wn.reduce((t,n)=>(t[n]=e[n]??``,t),{});try{let n=await this.client.updatePersonaCard(e.id,t);this.appState.personas=this.appState.personas.map(e=>e.id===n.id?n:e),this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`The character card could not be saved.`)}this.renderApp()}},lr=class{renderApp;onCopied;appState;client;groups=new Map;constructor(e,t,n=y,i=r){this.renderApp=e,this.onCopied=t,this.appState=n,this.client=i}node(e){let t=this.groups.get(e.id)??[];return A(`Take from another persona`,t.length?`Copy an entry a persona in this workspace already has.`:`Nothing to take yet. Open to look.`,t.length?[this.warning(e),...t.map(t=>this.group(e,t))]:[],{testId:`lore-copy-${e.id}`,onToggle:t=>{t&&this.load(e.id)}})}warning(e){return i(`div`,{class:`meta`,"data-testid":`lore-copy-warning-${e.id}`,textContent:`A copy is its own entry from then on. Editing the original later does not change it, and editing this one does not change the original.`})}group(e,t){return D([i(`div`,{class:`settings-heading`,textContent:t.persona_name}),i(`div`,{class:`chips`},t.entries.map(t=>i(`button`,{class:`pill-btn`,textContent:`Copy "${t.title}"`,"data-testid":`lore-copy-${t.id}`,onclick:()=>void this.copy(e,t.id)})))])}async load(e){try{this.groups.set(e,(await this.client.copyablePersonaLore(e)).groups)}catch(e){this.appState.settingsError=p(e,`Nearby personas could not be listed.`)}this.renderApp()}async copy(e,t){try{this.onCopied(e,await this.client.copyPersonaLore(e.id,t)),this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`The entry could not be copied.`)}await this.load(e.id)}},ur=class{renderApp;appState;client;entries=new Map;previews=new Map;previewText=new Map;loaded=new Set;copyView;constructor(e,t=y,n=r){this.renderApp=e,this.appState=t,this.client=n,this.copyView=new lr(e,(e,t)=>this.adopt(e,t),t,n)}adopt(e,t){let n=this.entries.get(e.id)??[];n.push(t),this.entries.set(e.id,n)}node(e){let t=this.entries.get(e.id)??[];return A(`Lorebook`,`Background detail added to a turn only when the conversation mentions one of its keywords. Entries are matched by the platform, never by the model, and injected text is not itself scanned.`,[i(`div`,{class:`settings-primary-actions`},[i(`button`,{class:`send-btn`,textContent:`+ New entry`,"data-testid":`lore-add-${e.id}`,onclick:()=>void this.create(e)}),i(`span`,{class:`meta`,textContent:`${t.length} ${t.length===1?`entry`:`entries`}`})]),...t.map(t=>this.entryEditor(e,t)),this.copyView.node(e),this.previewBox(e)],{testId:`lore-${e.id}`,onToggle:t=>{t&&this.load(e.id)}})}entryEditor(e,t){let n=this.previews.get(e.id)?.items.find(e=>e.id===t.id);return A(`${t.title}${t.enabled?``:` (off)`}`,t.always_on?`Always included, regardless of keywords.`:`Fires on: ${t.keys.join(`, `)||`nothing yet`}`,[L(`Title`,t.title,e=>{t.title=e},`text`,!1,`Your label for this entry. It is never sent to the model.`),R(`Content`,t.content,e=>{t.content=e},!1,`The text injected when this entry fires.`),L(`Keywords`,t.keys.join(`, `),e=>{t.keys=dr(e)},`text`,!1,`Comma separated. Matched as whole words, never as patterns.`),L(`Also requires`,t.secondary_keys.join(`, `),e=>{t.secondary_keys=dr(e)},`text`,!1,`Optional. When set, one of these must appear as well before the entry fires.`),L(`Priority`,String(t.priority),e=>{t.priority=fr(e)},`number`,!1,`Higher entries win when the allowance runs out. 0 to 100.`),B(`Always include`,t.always_on,e=>{t.always_on=e},`Include this entry on every turn instead of matching keywords.`),B(`Match case`,t.case_sensitive,e=>{t.case_sensitive=e},`Off means Bakery and bakery both match.`),B(`Match plurals`,t.match_word_forms,e=>{t.match_word_forms=e},`On means a keyword of sister also fires on sisters, and bakery on bakeries.`),B(`Enabled`,t.enabled,e=>{t.enabled=e},`Turn off to keep the entry without sending it.`),i(`div`,{class:`meta`,"data-testid":`lore-entry-meta-${t.id}`,textContent:n?`${t.token_estimate} tokens · fires on the preview text${n.included?``:`, but does not fit`}`:`${t.token_estimate} tokens of the ${t.budget_tokens}-token lorebook allowance`}),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Save entry`,"data-testid":`lore-save-${t.id}`,onclick:()=>void this.save(e,t)}),i(`button`,{class:`icon-btn danger`,textContent:`Delete`,"data-testid":`lore-delete-${t.id}`,onclick:()=>void this.remove(e,t)})])],{testId:`lore-entry-${t.id}`})}previewBox(e){let t=this.previews.get(e.id);return D([R(`Preview`,this.previewText.get(e.id)??``,t=>{this.previewText.set(e.id,t)},!1,`Paste a message to see which entries it fires, before a real conversation depends on it.`),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Check what fires`,"data-testid":`lore-preview-${e.id}`,onclick:()=>void this.preview(e)})]),i(`div`,{class:`meta`,"data-testid":`lore-preview-result-${e.id}`,textContent:mr(t)}),...(t?.items??[]).map(e=>i(`div`,{class:`meta`,textContent:`${e.included?`✓`:`✕`} ${e.title}${e.fired_keys.length?` · on "${e.fired_keys.join(`", "`)}"`:` · always included`} · ${e.token_estimate} tokens${e.included?``:` · left out, over the allowance`}`}))])}async load(e){if(!this.loaded.has(e)){this.loaded.add(e);try{this.entries.set(e,(await this.client.personaLore(e)).items)}catch(t){this.loaded.delete(e),this.appState.settingsError=p(t,`The lorebook could not be loaded.`)}this.renderApp()}}async create(e){await this.load(e.id),await this.write(e,()=>this.client.createPersonaLore(e.id,{title:`New entry`,content:`Background detail this persona knows.`,keys:[],secondary_keys:[],always_on:!0,case_sensitive:!1,match_word_forms:!0,priority:50,enabled:!0}))}async save(e,t){await this.write(e,()=>this.client.updatePersonaLore(e.id,t.id,pr(t)))}async write(e,t){try{let n=await t(),r=this.entries.get(e.id)??[],i=r.findIndex(e=>e.id===n.id);i===-1?r.push(n):r[i]=n,this.entries.set(e.id,r),this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`The lore entry could not be saved.`)}this.renderApp()}async remove(e,t){try{await this.client.deletePersonaLore(e.id,t.id),this.entries.set(e.id,(this.entries.get(e.id)??[]).filter(e=>e.id!==t.id)),this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`The lore entry could not be deleted.`)}this.renderApp()}async preview(e){let t=(this.previewText.get(e.id)??``).trim();if(t){try{this.previews.set(e.id,await this.client.previewPersonaLore(e.id,t)),this.appState.settingsError=``}catch(e){this.appState.settingsError=p(e,`The preview could not be run.`)}this.renderApp()}}};function dr(e){return e.split(`,`).map(e=>e.trim()).filter(Boolean)}function fr(e){let t=Number.parseInt(e,10);return Number.isNaN(t)?50:Math.min(100,Math.max(0,t))}function pr(e){return{title:e.title,content:e.content,keys:e.keys,secondary_keys:e.secondary_keys,always_on:e.always_on,case_sensitive:e.case_sensitive,match_word_forms:e.match_word_forms,priority:e.priority,enabled:e.enabled}}function mr(e){if(!e)return`Paste a message above to see which entries it fires.`;if(!e.items.length)return`Nothing fires on that message.`;let t=e.items.filter(e=>e.included).length,n=e.items.length===1?`entry fires`:`entries fire`;return`${e.items.length} ${n}; ${t} fit, using ${e.used_tokens} of ${e.budget_tokens} tokens.`}var hr={title_generation:`Creates short chat titles after conversation turns.`,conversation_summary:`Compresses older conversation history when the context budget requires it.`,memory_extraction:`Proposes reviewable memory candidates without automatically approving them.`,capability_planning:`Chooses a typed assistant capability. Media models, workflows, LoRAs, and identity controls are selected later by the media coordinator.`},gr=class{renderApp;appState;client;dirtyRoles=new Set;versions=new Map;openRoles=new Set;constructor(e,t,n){this.renderApp=e,this.appState=t,this.client=n}nodes(){let e=this.appState.taskModels.filter(e=>e.enabled),t=e.filter(e=>this.appState.taskModelChecks[e.role]?.ready),n=e.filter(e=>this.appState.taskModelChecks[e.role]),r=[k(`Configure background intelligence`,`Task Models handle platform work separate from persona behavior and share the interactive Ollama lane with chat. Capability planning does not choose media workflows, LoRAs, and identity controls; the media coordinator handles those later.`),i(`div`,{class:`settings-readiness-list`},[j(`Configured roles`,`${e.length} of ${this.appState.taskModels.length} enabled`,e.length?`ready`:`attention`,`Disabled roles use their documented fallback behavior and never silently borrow the persona model.`),j(`Readiness checks`,n.length?`${t.length} of ${n.length} checked roles ready`:`Not checked in this browser session`,n.length&&t.length===n.length?`ready`:n.length?`attention`:`off`,`A readiness check confirms the adapter is installed, that any credential it needs is configured for this account, and that the chosen model exists. It sends no request, so it never proves the provider answers, and it does not judge output quality.`),j(`GPU scheduling`,`Shares the interactive lane with persona chat`,`ready`,`The default single interactive worker prevents background inference from overlapping chat on a shared GPU.`),j(`Recent audits`,`${this.appState.taskModelRuns.length} content-free run records loaded`,this.appState.taskModelRuns.length?`ready`:`off`,`Audits retain role, model, timing, token estimates, and safe errors—not prompts or generated task content.`)]),D([E(`Task roles`,`Open a role to choose its model, fallback, limits, and failure behavior.`),i(`button`,{class:`pill-btn`,textContent:`Refresh roles and audits`,onclick:()=>void this.refresh()})])];return this.appState.taskModels.length?r.push(...this.appState.taskModels.map(e=>this.profileCard(e))):r.push(i(`div`,{class:`settings-empty-state`,textContent:`No Task Model profiles were returned. Refresh the page, then check the server logs if the profiles remain unavailable.`})),r.push(this.runAudit()),r}async refresh(){let e=new Map(this.versions);try{let[t,n]=await Promise.all([this.client.taskModels(),this.client.taskModelRuns(void 0,20)]),r=new Map(this.appState.taskModels.map(e=>[e.role,e]));this.appState.taskModels=t.items.map(t=>{let n=r.get(t.role),i=(this.versions.get(t.role)??0)!==(e.get(t.role)??0);return n&&(this.dirtyRoles.has(t.role)||i)?n:t}),this.appState.taskModelRuns=n.items}catch(e){this.appState.settingsError=p(e,`Unable to load Task Models.`)}this.renderApp()}profileCard(e){let t=this.appState.taskModelChecks[e.role],n=!!this.appState.taskModelBusy[e.role],r=[``,...this.appState.models],a=e=>e||`Automatic (first installed model)`,o=e.role===`title_generation`?[`deterministic`,`skip`,`fail`]:[`skip`,`fail`],s=e.enabled?t?t.ready?`Ready`:F(t.status):`Not checked`:`Disabled`,c=e.enabled?t?.ready?`ok`:t?`fail`:`idle`:`idle`;return O(e.title,e.enabled?`${e.model||`Automatic model`} · ${e.fallback_policy} fallback policy`:`This background role is disabled`,s,[E(`Execution path`,hr[e.role]),B(`Enable this role`,e.enabled,t=>this.change(e.role,`enabled`,t,!1),`Disabled roles follow the selected failure behavior instead of running a model.`),z(`Provider`,e.provider,[`ollama`],t=>this.change(e.role,`provider`,t,!1),void 0,F,!1,`Only providers implementing the structured Task Model contract appear here. An adapter existing in the codebase is not the same as a provider offered here.`),z(`Primary model`,e.model??``,r,t=>this.change(e.role,`model`,t||null,!1),void 0,a,!1,`Automatic uses the first installed Ollama model. An explicit choice is more predictable.`),z(`Fallback model`,e.fallback_model??``,r,t=>{this.change(e.role,`fallback_model`,t||null,!1),this.change(e.role,`fallback_provider`,t?e.provider:null,!1)},void 0,a,!1,`Tried only after the primary execution fails and before the role failure policy is applied.`),A(`Budgets and failure behavior`,`Bounds keep background work from consuming unbounded context, time, or output.`,[L(`Maximum input tokens`,String(e.max_input_tokens),t=>this.changeNumber(e.role,`max_input_tokens`,t),`number`,!1,`The maximum estimated input size sent to this role.`),L(`Maximum output tokens`,String(e.max_output_tokens),t=>this.changeNumber(e.role,`max_output_tokens`,t),`number`,!1,`The maximum structured output size accepted from this role.`),L(`Timeout seconds`,String(e.timeout_seconds),t=>this.changeNumber(e.role,`timeout_seconds`,t),`number`,!1,`Stops waiting for this background task after the limit.`),L(`Temperature`,String(e.temperature),t=>this.changeNumber(e.role,`temperature`,t),`number`,!1,`Low values are recommended for deterministic platform work.`),z(`Failure behavior`,e.fallback_policy,o,t=>this.change(e.role,`fallback_policy`,t,!1),void 0,F,!1,`Determines whether the product skips the task, fails it, or uses a narrow deterministic fallback.`)],{testId:`task-model-advanced-${e.role}`}),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:n?`Saving…`:`Save role`,disabled:n,"data-testid":`task-model-save-${e.role}`,onclick:()=>void this.save(e.role)}),i(`button`,{class:`pill-btn`,textContent:n?`Checking…`:`Check readiness`,disabled:n,onclick:()=>void this.check(e.role)}),t?i(`span`,{class:`provider-status ${t.ready?`ok`:`fail`}`,textContent:`${F(t.status)}: ${t.message}`}):null])],{open:this.openRoles.has(e.role),onToggle:t=>t?this.openRoles.add(e.role):this.openRoles.delete(e.role),testId:`task-model-${e.role}`,className:`task-model-card`,statusClass:c})}runAudit(){let e=this.appState.taskModelRuns.length?this.appState.taskModelRuns.map(e=>i(`div`,{class:`task-run-row`},[i(`div`,{},[i(`strong`,{textContent:F(e.role)}),i(`div`,{class:`meta`,textContent:`${e.executed_provider??e.requested_provider??`No provider`} / ${e.executed_model??e.requested_model??`automatic`} · ${d(e.started_at)}`})]),i(`div`,{class:`task-run-metrics`},[i(`span`,{class:`provider-status ${_r(e.status)}`,textContent:F(e.status)}),i(`span`,{class:`meta`,textContent:`${e.latency_ms??0} ms · ~${e.input_tokens_estimated} in / ~${e.output_tokens_estimated??0} out`}),e.error?i(`span`,{class:`provider-check-message`,textContent:`${e.error.code}: ${e.error.message}`}):null])])):[i(`div`,{class:`settings-empty-state`,textContent:`No Task Model runs have been recorded yet.`})];return A(`Recent Task Model audits (${this.appState.taskModelRuns.length})`,`Prompts and generated task output are not stored. These records contain only role, provider/model, timing, token estimates, status, and safe errors.`,e,{testId:`task-model-run-audits`})}change(e,t,n,r=!0){let i=this.appState.taskModels.find(t=>t.role===e);i&&(i[t]=n,this.dirtyRoles.add(e),this.bumpVersion(e),delete this.appState.taskModelChecks[e],r&&this.renderApp())}changeNumber(e,t,n){let r=Number(n);Number.isFinite(r)&&this.change(e,t,r,!1)}bumpVersion(e){this.versions.set(e,(this.versions.get(e)??0)+1)}async save(e){let t=this.appState.taskModels.find(t=>t.role===e);if(t){this.appState.taskModelBusy[e]=!0,this.appState.settingsError=``,this.renderApp();try{let n=await this.client.updateTaskModel(t);this.appState.taskModels=this.appState.taskModels.map(t=>t.role===e?n:t),this.bumpVersion(e),this.dirtyRoles.delete(e);try{this.appState.taskModelChecks[e]=await this.client.checkTaskModel(e)}catch(e){this.appState.settingsError=p(e,`${n.title} was saved, but readiness could not be checked.`)}}catch(e){this.appState.settingsError=p(e,`Unable to save ${t.title}.`)}finally{this.appState.taskModelBusy[e]=!1,this.renderApp()}}}async check(e){this.appState.taskModelBusy[e]=!0,this.renderApp();try{this.appState.taskModelChecks[e]=await this.client.checkTaskModel(e)}catch(e){this.appState.settingsError=p(e,`Unable to check Task Model readiness.`)}finally{this.appState.taskModelBusy[e]=!1,this.renderApp()}}};function _r(e){return e===`completed`?`ok`:e===`running`?`checking`:e===`fallback`?`idle`:`fail`}var vr=[[`ollama`,`Ollama`],[`openai`,`OpenAI`],[`kokoro`,`Kokoro`],[`automatic1111`,`Automatic1111`],[`comfyui`,`ComfyUI`]],yr=class{renderApp;close;dialogs;appState;client;navigateSettings;searchQuery=``;identityView;everydayView;modelView;taskModelView;mediaCatalogView;operationsView;personaCardView;personaLoreView;selectedMemoryIds=new Set;memoryActionBusy=!1;constructor(e,t,n,i=y,a=r,o=t=>{i.settingsSection=t,e()}){this.renderApp=e,this.close=t,this.dialogs=n,this.appState=i,this.client=a,this.navigateSettings=o,this.mediaCatalogView=new In(e,i,a,n,t),this.identityView=new bn(e,i,a,n,e=>this.startIdentitySetup({capability_request_id:null,chat_id:i.currentChat?.id??null,persona_id:e,prompt:``,required_features:[`identity_control`],block_code:null})),this.everydayView=new Ot(i,(e,t,n)=>this.set(e,t,n),e=>this.providerControl(e),()=>this.providerPanel()),this.modelView=new zn(i,(e,t,n)=>this.set(e,t,n),e,()=>this.providerControl(`ollama`)),this.taskModelView=new gr(e,i,a),this.personaCardView=new cr(e,i,a),this.personaLoreView=new ur(e,i,a),this.operationsView=new Bn(e,i,a,n)}startIdentitySetup(e){if(Tr(e.block_code)){this.appState.mediaCatalogIdentitySetupIntent=null,e.persona_id&&this.appState.personas.some(t=>t.id===e.persona_id)&&(this.appState.identitySelectedPersonaId=e.persona_id),this.navigateSettings(`Persona Pictures`),this.identityView.refresh();return}this.appState.mediaCatalogIdentitySetupIntent=e,this.mediaCatalogView.openIdentitySetup(),this.navigateSettings(`Media Catalog`),this.mediaCatalogView.refresh()}node(){let e=this.appState.settings;if(!e)return i(`div`,{class:`settings-screen`,textContent:`Settings are unavailable.`});let t=wr(this.appState.settingsSection),n=[`Data`,`Task Models`,`Media Catalog`,`Persona Pictures`,`GPU Coordination`].includes(t);return this.appState.settingsSection=t,t===`Persona Pictures`&&!this.appState.identitySettings&&!this.appState.identityBusy&&this.identityView.refresh(),t===`GPU Coordination`&&this.appState.session?.is_admin&&!this.appState.resourceCoordination&&!this.appState.resourceCoordinationBusy&&this.operationsView.refreshCoordination(),i(`div`,{class:`settings-screen`,"data-testid":`settings-screen`},[i(`div`,{class:`settings-header`},[i(`h2`,{textContent:`Settings`}),this.appState.settingsSavedAt?i(`div`,{class:`success-banner`,textContent:`Settings saved`}):null,i(`div`,{class:`chips`},[i(`button`,{class:`icon-btn`,textContent:`✕ Close`,onclick:this.close}),n?null:i(`button`,{class:`send-btn`,textContent:this.appState.settingsSaving?`Saving…`:`Save settings`,disabled:this.appState.settingsSaving,"data-testid":`settings-save`,onclick:()=>void this.persist()})])]),this.appState.settingsError?i(`div`,{class:`error-banner`,textContent:this.appState.settingsError}):null,i(`div`,{class:`settings-layout`},[on({section:t,query:this.searchQuery,onQuery:e=>{this.searchQuery=e,this.renderApp()},onOpen:e=>this.openSection(e)}),i(`section`,{class:`settings-detail glass`},[i(`div`,{class:`settings-section-head`},[i(`h3`,{textContent:ye(t)}),n?null:i(`button`,{class:`pill-btn`,textContent:`Reset to Default`,onclick:()=>{ke(e,t),this.renderApp()}})]),...this.section(t,e)])])])}openSection(e){this.appState.settingsSection=e,e===`Memory`&&this.refreshMemories(),e===`Task Models`&&this.taskModelView.refresh(),e===`Media Catalog`&&this.mediaCatalogView.refresh(),e===`Persona Pictures`&&this.identityView.refresh(),e===`GPU Coordination`&&this.appState.session?.is_admin&&this.operationsView.refreshCoordination(),e===`Data`&&this.appState.session?.is_admin&&this.operationsView.refreshBackups(),this.renderApp()}section(e,t){return[`General`,`TTS`,`STT`,`Image Generation`,`Video Generation`,`User`].includes(e)?this.everydayView.nodes(e,t):e===`Memory`?this.memory(t):e===`Personas`?this.personas(t):e===`Workspaces`?this.workspaces(t):e===`Models`?this.modelView.nodes(t):e===`Task Models`?this.taskModelView.nodes():e===`Media Catalog`?this.mediaCatalogView.nodes():e===`Persona Pictures`?this.identityView.nodes():e===`GPU Coordination`?this.operationsView.gpuNodes():this.operationsView.dataNodes()}memory(e){let t=Sr(this.appState.memories),n=this.appState.memories.filter(e=>this.selectedMemoryIds.has(e.id)),r=n.filter(e=>[`pending`,`active`].includes(e.status));return[k(`Control what carries between conversations`,`Only approved active memories enter prompts. Review, forget, or permanently delete them here.`),D([z(`Default memory mode`,e.default_memory_mode,[`saved`,`off`],e=>this.set(`default_memory_mode`,e===`off`?`off`:`saved`),void 0,e=>e===`saved`?`Use approved memories`:`Do not use saved memories`,!0,`Controls new chats by default. Individual chats can still choose a different memory mode.`),i(`div`,{class:`settings-concept-strip`},[Er(`Pending`,`A proposed memory that does not enter prompts until you approve it.`),Er(`Forget`,`Stops using the memory while preserving history so the action can be undone.`),Er(`Delete`,`Permanently removes the memory and its history. This cannot be undone.`)])]),i(`div`,{class:`memory-bulk-bar persona-card`,"data-testid":`memory-bulk-actions`},[i(`div`,{class:`settings-heading-with-info`},[i(`strong`,{textContent:`${n.length} of ${this.appState.memories.length} selected`}),T(`Bulk actions apply atomically to the selected memories. Permanent delete cannot be undone.`,`About memory bulk actions`)]),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Select all`,disabled:this.memoryActionBusy||this.appState.memories.length===0,onclick:()=>this.selectMemories(this.appState.memories,!0)}),i(`button`,{class:`pill-btn`,textContent:`Clear selection`,disabled:this.memoryActionBusy||n.length===0,onclick:()=>{this.selectedMemoryIds.clear(),this.renderApp()}}),i(`button`,{class:`pill-btn`,textContent:`Forget eligible (${r.length})`,disabled:this.memoryActionBusy||r.length===0,onclick:()=>void this.bulkMemoryAction(`forget`,r.map(e=>e.id))}),i(`button`,{class:`pill-btn danger`,textContent:`Delete permanently (${n.length})`,disabled:this.memoryActionBusy||n.length===0,"data-testid":`memory-bulk-delete`,onclick:()=>void this.bulkMemoryAction(`delete`,n.map(e=>e.id))}),i(`button`,{class:`pill-btn`,textContent:`Refresh`,disabled:this.memoryActionBusy,onclick:()=>void this.refreshMemories()})])]),this.memoryGroup(`Pending review`,t.pending,`pending`),this.memoryGroup(`Active`,t.active,`active`),this.memoryGroup(`History`,t.history,`history`),i(`div`,{class:`persona-card`},[E(`Add a manual memory`,`Manual memories are global, immediately active facts you intentionally want the assistant to remember.`,`strong`),i(`button`,{class:`pill-btn`,textContent:`Add global memory`,"data-testid":`memory-add`,onclick:()=>void this.addMemory()})])]}personas(e){return[k(`Manage the people you talk with`,`Create personas and open one only when you want to change its model, appearance source, or behavior.`),i(`div`,{class:`settings-primary-actions`},[i(`button`,{class:`send-btn`,textContent:`+ New persona`,onclick:()=>void this.addPersona()}),i(`span`,{class:`meta`,textContent:`${this.appState.personas.length} ${this.appState.personas.length===1?`persona`:`personas`}`})]),A(`New-persona default instructions`,`Applied only when a new persona is created; existing personas keep their own instructions.`,[R(`Default system prompt`,e.personas_default_system_prompt,e=>this.set(`personas_default_system_prompt`,e),!0,`Starting system instructions for newly created personas.`)],{testId:`personas-advanced-settings`}),...this.appState.personas.map(e=>this.personaCard(e))]}workspaces(e){return[k(`Organize personas and conversations`,`Workspaces are private organizational groups. They do not create separate user accounts or provider environments.`),D([z(`Default workspace`,e.workspaces_default_workspace_id,[``,...this.appState.workspaces.map(e=>e.id)],e=>this.set(`workspaces_default_workspace_id`,e),void 0,e=>this.appState.workspaces.find(t=>t.id===e)?.name??`None`,!0,`Used as the initial workspace when a feature needs one and no more specific choice exists.`),i(`button`,{class:`send-btn`,textContent:`+ New workspace`,onclick:()=>void this.addWorkspace()})]),...this.appState.workspaces.map(e=>i(`div`,{class:`persona-card workspace-card`},[i(`strong`,{textContent:e.name}),i(`div`,{class:`chips`},[i(`button`,{class:`pill-btn`,textContent:`Rename`,onclick:()=>void this.renameWorkspace(e.id,e.name)}),i(`button`,{class:`icon-btn danger`,textContent:`Delete`,onclick:()=>void this.deleteWorkspace(e.id,e.name)})])]))]}personaCard(e){let t=new Set(e.workspace_ids.length?e.workspace_ids:[e.workspace_id]);return i(`details`,{class:`persona-card persona-editor`,"data-testid":`persona-${e.id}`},[i(`summary`,{},[i(`div`,{},[i(`strong`,{textContent:e.name}),i(`div`,{class:`meta`,textContent:e.default_model?`Model: ${e.default_model}`:`Automatic model`})]),i(`span`,{class:`meta`,textContent:`Edit`})]),e.avatar_url?i(`button`,{class:`persona-avatar-preview-button`,type:`button`,title:`View ${e.name}'s full-size avatar`,"aria-label":`View ${e.name}'s full-size avatar`,onclick:()=>{this.appState.personaAvatarPreview=e.avatar_url??``,this.renderApp()}},[i(`img`,{class:`persona-avatar-preview`,src:e.avatar_url,alt:`${e.name} avatar`})]):null,L(`Name`,e.name,t=>{e.name=t},`text`,!1,`The name shown in chat and persona selectors.`),L(`Avatar image URL`,e.avatar_url??``,t=>{e.avatar_url=t},`url`,!1,`Paste any image URL; the picture is copied and kept, so it keeps working if the source moves or goes away.`),B(`Allow persona to send images`,e.allow_image_sends!==!1,t=>{e.allow_image_sends=t},`Controls pictures requested through this persona’s conversation. Direct image actions remain available.`),z(`Default model`,e.default_model??``,[``,...this.appState.models],t=>{e.default_model=t},void 0,e=>e||`Automatic`,!1,`Overrides the account default model for this persona.`),i(`div`,{class:`setting-row`},[i(`div`,{class:`setting-label-line`},[i(`label`,{textContent:`Workspaces`}),T(`Choose every workspace where this persona should be available.`,`About persona workspaces`)]),...this.appState.workspaces.map(n=>i(`label`,{class:`checkbox-row`},[i(`input`,{type:`checkbox`,checked:t.has(n.id),onchange:r=>{r.currentTarget.checked?t.add(n.id):t.delete(n.id),e.workspace_ids=[...t],e.workspace_id=e.workspace_ids[0]??e.workspace_id}}),n.name]))]),A(`Personality instructions`,`These instructions strongly influence persona behavior. Change them deliberately.`,[R(`Personality details`,e.personality_details??``,t=>{e.personality_details=t},!1,`Descriptive traits and background used to support this persona’s behavior.`),R(`System prompt`,e.system_prompt??``,t=>{e.system_prompt=t},!1,`Highest-priority persona instructions sent with each conversation turn.`)],{testId:`persona-advanced-${e.id}`}),this.personaCardView.node(e),this.personaLoreView.node(e),i(`div`,{class:`chips`},[i(`button`,{class:`send-btn`,textContent:`Save persona`,onclick:()=>void this.savePersona(e)}),i(`button`,{class:`icon-btn danger`,textContent:`Delete`,onclick:()=>void this.deletePersona(e)})])])}memoryGroup(e,t,n){let r=!!this.appState.memorySections[n],a=t.filter(e=>this.selectedMemoryIds.has(e.id)).length;return i(`div`,{class:`memory-section`},[i(`div`,{class:`memory-section-head`},[i(`button`,{class:`memory-section-toggle`,textContent:`${r?`▾`:`▸`} ${e} (${t.length})`,onclick:()=>{this.appState.memorySections[n]=!r,this.renderApp()}}),i(`button`,{class:`pill-btn`,textContent:a===t.length&&t.length?`Clear group`:`Select group (${t.length})`,disabled:this.memoryActionBusy||t.length===0,onclick:()=>this.selectMemories(t,!(a===t.length&&t.length>0))})]),...r?t.map(e=>this.memoryRow(e)):[]])}memoryRow(e){return i(`div`,{class:`memory-row persona-card`,"data-testid":`memory-${e.id}`},[i(`label`,{class:`checkbox-row memory-select`},[i(`input`,{type:`checkbox`,checked:this.selectedMemoryIds.has(e.id),disabled:this.memoryActionBusy,onchange:t=>{t.currentTarget.checked?this.selectedMemoryIds.add(e.id):this.selectedMemoryIds.delete(e.id),this.renderApp()}}),`Select`]),R(`Memory`,e.content,t=>{e.content=t},!1),i(`div`,{class:`meta`,textContent:`${e.status} · ${e.scope}${e.confidence===null?``:` · ${Math.round(e.confidence*100)}% confidence`} · ${e.source_type}`}),i(`div`,{class:`chips`},[e.status===`pending`?i(`button`,{class:`pill-btn`,textContent:`Approve`,onclick:()=>void this.memoryAction(e,`approve`)}):null,e.status===`pending`?i(`button`,{class:`pill-btn`,textContent:`Reject`,onclick:()=>void this.memoryAction(e,`reject`)}):null,[`pending`,`active`].includes(e.status)?i(`button`,{class:`pill-btn`,textContent:`Forget`,onclick:()=>void this.memoryAction(e,`forget`)}):null,[`superseded`].includes(e.status)?null:i(`button`,{class:`pill-btn`,textContent:`Save edit`,onclick:()=>void this.saveMemory(e)}),e.can_undo?i(`button`,{class:`pill-btn`,textContent:`Undo`,onclick:()=>void this.memoryAction(e,`undo`)}):null,i(`button`,{class:`icon-btn`,textContent:`History`,onclick:()=>void this.memoryHistory(e)}),i(`button`,{class:`icon-btn danger`,textContent:`Delete`,onclick:()=>void this.deleteMemory(e)})])])}providerPanel(){return i(`div`,{class:`provider-readiness-panel persona-card`},[i(`strong`,{textContent:`Provider readiness`}),...vr.map(([e])=>this.providerControl(e))])}providerControl(e){let t=vr.find(([t])=>t===e)?.[1]??e,n=!!this.appState.providerChecksRunning[e],r=this.appState.providerChecks[e];return i(`div`,{class:`provider-check-row`},[i(`button`,{class:`pill-btn`,textContent:n?`Testing ${t}…`:`Test ${t}`,disabled:n,onclick:()=>void this.testProvider(e)}),i(`span`,{class:`provider-status ${br(r,n)}`,textContent:n?`Testing…`:xr(r)}),r?.message?i(`span`,{class:`provider-check-message`,textContent:String(r.message)}):null])}set(e,t,n=!0){let r=this.appState.settings;r&&(r[e]=t,this.appState.settingsSavedAt=0,e===`general_theme`&&(document.documentElement.dataset.theme=String(t)),e===`general_show_system_messages`&&(this.appState.showSystemMessages=!!t),e===`general_show_thinking`&&(this.appState.showThinkingByDefault=!!t),e===`general_voice_responses`&&(this.appState.voiceResponsesEnabled=!!t),e===`general_show_viz`&&(this.appState.showViz=!!t),n&&this.renderApp())}async persist(){let e=this.appState.settings;if(e){this.appState.settingsSaving=!0,this.appState.settingsError=``,this.renderApp();try{let t=await this.client.updateSettings(S(e));Object.assign(e,t.preferences,{global_default_model:t.global_default_model??``,default_memory_mode:t.default_memory_mode,stt_provider:t.stt_provider,tts_provider:t.tts_provider,tts_format:t.tts_format,openai_api_key:t.openai_api_key??e.openai_api_key,onboarding_done:t.onboarding_done}),this.appState.settingsSavedAt=Date.now()}catch(e){this.appState.settingsError=p(e,`Unable to save settings.`)}finally{this.appState.settingsSaving=!1,this.renderApp()}}}async testProvider(e){let t=this.appState.settings;if(t){this.appState.providerChecksRunning[e]=!0,this.renderApp();try{this.appState.providerChecks[e]=await this.client.providerCheck(e,S(t))}catch(t){this.appState.providerChecks[e]={provider:e,status:`error`,message:p(t,`Provider check failed.`),ready:!1}}finally{this.appState.providerChecksRunning[e]=!1,this.renderApp()}}}async refreshMemories(){try{this.appState.memories=(await this.client.memories()).items;let e=new Set(this.appState.memories.map(e=>e.id));for(let t of this.selectedMemoryIds)e.has(t)||this.selectedMemoryIds.delete(t)}catch(e){this.appState.settingsError=p(e,`Unable to refresh memory.`)}this.renderApp()}async addMemory(){let e=await this.dialogs.prompt(`Add memory`,`Save an explicit global memory.`);e?.trim()&&(await this.client.createMemory(`global`,null,e.trim()),await this.refreshMemories())}async saveMemory(e){await this.client.updateMemory(e.id,e.scope,e.scope_id,e.content),await this.refreshMemories()}async memoryAction(e,t){t===`forget`&&!await this.dialogs.confirm(`Forget memory`,`Remove this memory from future context while retaining its history?`,`Forget`)||(await this.client.memoryAction(e.id,t),await this.refreshMemories())}selectMemories(e,t){for(let n of e)t?this.selectedMemoryIds.add(n.id):this.selectedMemoryIds.delete(n.id);this.renderApp()}async bulkMemoryAction(e,t){if(t.length&&(e===`delete`?await this.dialogs.confirm(`Permanently delete memories`,`Permanently delete ${t.length} selected ${t.length===1?`memory`:`memories`} and all associated history? This cannot be undone.`,`Delete permanently`):await this.dialogs.confirm(`Forget memories`,`Forget ${t.length} selected ${t.length===1?`memory`:`memories`}? They will stop entering prompts, but their history can still be restored.`,`Forget`))){this.memoryActionBusy=!0,this.appState.settingsError=``,this.renderApp();try{await this.client.bulkMemoryAction(e,t),t.forEach(e=>this.selectedMemoryIds.delete(e)),await this.refreshMemories()}catch(t){this.appState.settingsError=p(t,`Unable to ${e} the selected memories.`)}finally{this.memoryActionBusy=!1,this.renderApp()}}}async deleteMemory(e){if(await this.dialogs.confirm(`Permanently delete memory`,`Permanently delete this memory and all associated history? This cannot be undone.`,`Delete permanently`)){this.memoryActionBusy=!0,this.renderApp();try{await this.client.deleteMemory(e.id),this.selectedMemoryIds.delete(e.id),await this.refreshMemories()}catch(e){this.appState.settingsError=p(e,`Unable to permanently delete the memory.`)}finally{this.memoryActionBusy=!1,this.renderApp()}}}async memoryHistory(e){let t=await this.client.memoryHistory(e.id);this.dialogs.info(`Memory history`,t.events.map(e=>`${d(e.created_at)} — ${e.action}${e.undone_at?` (undone)`:``}`).join(`
-`)||`No events.`)}async addPersona(){let e=this.appState.workspaces[0];if(!e){this.appState.settingsError=`Create a workspace before adding a persona.`,this.renderApp();return}let t=await this.dialogs.prompt(`New persona`,`Choose a persona name.`);if(!t?.trim())return;let n=await this.client.createPersona({workspace_id:e.id,workspace_ids:[e.id],name:t.trim(),system_prompt:this.appState.settings?.personas_default_system_prompt??x.personas_default_system_prompt,default_model:this.appState.models[0]??null});this.appState.personas.push(n),this.renderApp()}async savePersona(e){let t=Cr(e),n=await this.client.updatePersona(e.id,t);this.appState.personas=this.appState.personas.map(e=>e.id===n.id?n:e),this.renderApp()}async deletePersona(e){await this.dialogs.confirm(`Delete persona`,`Delete ${e.name}?`,`Delete`)&&(await this.client.deletePersona(e.id),this.appState.personas=this.appState.personas.filter(t=>t.id!==e.id),this.renderApp())}async addWorkspace(){let e=await this.dialogs.prompt(`New workspace`,`Choose a workspace name.`);e?.trim()&&(this.appState.workspaces.push(await this.client.createWorkspace(e.trim())),this.renderApp())}async renameWorkspace(e,t){let n=await this.dialogs.prompt(`Rename workspace`,`Choose a new name.`,t);if(!n?.trim())return;let r=await this.client.updateWorkspace(e,n.trim());this.appState.workspaces=this.appState.workspaces.map(t=>t.id===e?r:t),this.renderApp()}async deleteWorkspace(e,t){if(await this.dialogs.confirm(`Delete workspace`,`Delete ${t}? It must not contain personas or chats.`,`Delete`)){try{await this.client.deleteWorkspace(e),this.appState.workspaces=this.appState.workspaces.filter(t=>t.id!==e)}catch(e){this.appState.settingsError=p(e,`Unable to delete workspace.`)}this.renderApp()}}};function br(e,t){return t?`checking`:e?e.ready||e.status===`ready`?`ok`:`fail`:`idle`}function xr(e){return e?F(e.status||(e.ready?`ready`:`error`)):`Not checked`}function Sr(e){return{pending:e.filter(e=>e.status===`pending`),active:e.filter(e=>e.status===`active`),history:e.filter(e=>[`rejected`,`forgotten`,`superseded`].includes(e.status))}}function Cr(e){let t=e.workspace_ids.length?e.workspace_ids:[e.workspace_id];return{workspace_id:t[0]??e.workspace_id,workspace_ids:t,name:e.name,avatar_url:e.avatar_url,allow_image_sends:e.allow_image_sends!==!1,system_prompt:e.system_prompt,personality_details:e.personality_details,traits:e.traits,default_model:e.default_model,voice_preferences:e.voice_preferences??{}}}function wr(e){return ge.includes(e)?e:`General`}function Tr(e){return[`identity_persona_required`,`identity_profile_unavailable`,`identity_reference_unavailable`,`identity_reference_changed`].includes(e??``)}function Er(e,t){return i(`span`,{class:`settings-concept`},[i(`span`,{textContent:e}),T(t,`About ${e}`)])}var Dr=class{audio;context=null;analyser=null;frequencies=new Uint8Array;canvas=null;enabled=!1;frame=0;stars=Array.from({length:140},()=>({x:Math.random(),y:Math.random(),size:.4+Math.random()*1.6,phase:Math.random()*Math.PI*2}));constructor(e){this.audio=e}setEnabled(e){this.enabled=e,e&&this.start()}connectAudio(){if(this.context)return;let e=window.AudioContext??window.webkitAudioContext;if(!e)return;this.context=new e;let t=this.context.createMediaElementSource(this.audio);this.analyser=this.context.createAnalyser(),this.analyser.fftSize=512,this.frequencies=new Uint8Array(this.analyser.frequencyBinCount),t.connect(this.analyser),this.analyser.connect(this.context.destination)}node(){let e=document.createElement(`canvas`);return e.id=`vizCanvas`,this.canvas=e,this.resize(),this.start(),e}dispose(){cancelAnimationFrame(this.frame),this.frame=0,this.canvas=null}start(){if(this.frame)return;let e=t=>{this.frame=requestAnimationFrame(e),this.enabled&&this.draw(t)};this.frame=requestAnimationFrame(e)}resize(){if(!this.canvas)return;let e=Math.min(2,Math.max(1,window.devicePixelRatio||1)),t=window.visualViewport?.width??window.innerWidth,n=window.visualViewport?.height??window.innerHeight;this.canvas.width=Math.floor(t*e),this.canvas.height=Math.floor(n*e),this.canvas.style.width=`${t}px`,this.canvas.style.height=`${n}px`}draw(e){let t=this.canvas;if(!t||!t.isConnected)return;let n=t.getContext(`2d`);if(!n)return;this.resize();let r=Math.min(2,Math.max(1,window.devicePixelRatio||1)),i=t.width/r,a=t.height/r;n.setTransform(r,0,0,r,0,0),n.clearRect(0,0,i,a);let o=.03;this.analyser&&this.frequencies.length&&(this.analyser.getByteFrequencyData(this.frequencies),o=this.frequencies.reduce((e,t)=>e+t/255,0)/this.frequencies.length);let s=n.createLinearGradient(0,0,i,a);s.addColorStop(0,`rgba(2, 8, 20, .88)`),s.addColorStop(.5,`rgba(5, 16, 38, .68)`),s.addColorStop(1,`rgba(2, 8, 20, .9)`),n.fillStyle=s,n.fillRect(0,0,i,a);for(let t of this.stars)n.fillStyle=`rgba(140, 255, 245, ${.08+Math.max(0,Math.sin(e*.001+t.phase))*.18+o*.35})`,n.beginPath(),n.arc(t.x*i,t.y*a,t.size,0,Math.PI*2),n.fill();let c=i/2,l=a/2,u=Math.min(i,a)*(.18+o*.08),d=n.createRadialGradient(c,l,u*.1,c,l,u*1.8);d.addColorStop(0,`rgba(166, 252, 255, ${.28+o*.3})`),d.addColorStop(.45,`rgba(82, 162, 255, ${.14+o*.2})`),d.addColorStop(1,`rgba(26, 56, 118, 0)`),n.fillStyle=d,n.beginPath(),n.arc(c,l,u*1.8,0,Math.PI*2),n.fill(),n.strokeStyle=`rgba(114, 248, 255, ${.18+o*.5})`,n.lineWidth=1.5,n.beginPath(),n.arc(c,l,u,0,Math.PI*2),n.stroke()}},Y=fi(`app`),Or=fi(`ttsAudio`),kr=new Dr(Or),X=new Kt(Or,kr),Ar=new ue,Z=new Ve(X),jr=new $t,Mr=ei(),Q=new an(e=>void Br(e)),Nr=new yr($,Zr,Mr,y,r,e=>Q.settings(e)),Pr=new re(zr,$),Fr=new nt(Ar,X,$,y,r,e=>Mr.prompt(`Propose a memory fact`,`Edit this into one specific fact. It will stay pending until you approve it in Memory settings.`,e)),Ir=new st($,y,b,r,e=>Nr.startIdentitySetup(e)),Lr=new Je(y,r,Z,Mr,{render:$,openChat:e=>Q.chat(e),openNewChat:()=>{y.showNewChatPersonaModal=!0,y.newChatPersonaId=y.selectedPersonaId??y.personas[0]?.id??null,$()},goHome:()=>Q.home(!0)});Z.configure({onChange:$,onNavigate:e=>Q.chat(e)}),Ar.setChangeHandler($),X.setChangeHandler($),jr.configure($,e=>Z.send(e)),window.addEventListener(`nice:unauthorized`,()=>void Qr(`Your session ended. Please sign in again.`)),window.addEventListener(`unhandledrejection`,e=>{e.preventDefault(),di(e.reason)}),window.addEventListener(`error`,e=>di(e.error??e.message)),window.addEventListener(`pointerdown`,ci,{passive:!0}),window.addEventListener(`keydown`,si),window.visualViewport?.addEventListener(`resize`,ui),window.addEventListener(`resize`,ui),ui(),Q.start(),Rr();async function Rr(){try{await zr(await r.session(),!1)}catch(t){t instanceof e&&t.status===401||(y.authError=p(t,`Unable to contact Nice Assistant.`)),$()}}async function zr(e,t=!0){y.session=e;let[n,i,a,o,s,c,l,u,d,f]=await Promise.all([r.models().catch(()=>({models:[]})),r.workspaces(),r.personas(),r.chats(),r.settings(),r.memories(),r.taskModels().catch(()=>({items:[]})),r.taskModelRuns(void 0,20).catch(()=>({items:[]})),r.mediaCatalog().catch(()=>null),r.mediaReadiness().catch(()=>null)]);y.models=n.models,y.workspaces=i.items,y.personas=a.items,y.chats=o.items,y.settings=Oe(s),y.memories=c.items,y.taskModels=l.items,y.taskModelRuns=u.items,y.mediaCatalog=d,y.mediaReadiness=f,y.showSystemMessages=y.settings.general_show_system_messages,y.showThinkingByDefault=y.settings.general_show_thinking,y.voiceResponsesEnabled=y.settings.general_voice_responses,y.showViz=y.settings.general_show_viz,document.documentElement.dataset.theme=y.settings.general_theme,y.lastActivityAt=Date.now(),li(),(!y.settings.onboarding_done||!y.workspaces.length||!y.personas.length)&&t?(b.transition(`onboarding`),$(),await Vt(y,r,Mr,b,$)):(y.phase===`signed_out`||y.phase===`onboarding`)&&b.transition(`idle`),y.selectedPersonaId=y.selectedPersonaId??y.personas[0]?.id??null,y.newChatPersonaId=y.newChatPersonaId??y.selectedPersonaId,await Vr(),$()}async function Br(e){y.route=e,y.session&&(await Vr(),$())}async function Vr(){if(y.session){if(y.route.kind===`settings`){y.showSettings=!0,y.settingsSection=y.route.section??`General`;return}if(y.showSettings=!1,y.route.kind===`chat`&&y.route.chatId){await Z.open(y.route.chatId);return}y.currentChat=null,y.messages=[],y.capabilityRequests=[],Hr.refresh()}}var Hr=new Bt(y,r,{startChat:()=>{let e=y.chats[0];e?Q.chat(e.id):Z.create(y.selectedPersonaId)},startChatWith:e=>{e&&(y.selectedPersonaId=e),Z.create(e??y.selectedPersonaId)},openChat:e=>Q.chat(e),openSettings:e=>Q.settings(e),openPicture:(e,t)=>{y.chatImagePreview=e,y.chatImageGallery=t,$()}},$);function $(){let e=l(Y),t=s(ti);if(kr.setEnabled(y.showViz),Y.replaceChildren(),!y.session){Y.append(Pr.node()),u(Y,e,!!y.modal);return}y.showSettings?Y.append(Nr.node()):y.route.kind===`home`?Y.append(Hr.node()):Y.append(Ur()),y.showNewChatPersonaModal&&Y.append(Jr()),y.personaAvatarPreview&&Y.append(ft(y.personaAvatarPreview,`Persona avatar`,()=>{y.personaAvatarPreview=``,$()})),y.chatImagePreview&&Y.append(ft(y.chatImagePreview,`Image`,()=>{y.chatImagePreview=``,$()},{total:y.chatImageGallery.length,position:Math.max(0,y.chatImageGallery.indexOf(y.chatImagePreview)),step:e=>{pt(y,e),$()}})),y.generationLog&&Y.append(vt(y.generationLog,r.mediaJournalExportUrl(y.generationLog.id),()=>{y.generationLog=null,$()})),y.chatVideoPreview&&Y.append(mt(y,$)),y.modal&&Y.append(Xr(y.modal)),u(Y,e,!!y.modal);let n=document.querySelector(ti);n&&ot(n,y.revealedImages),requestAnimationFrame(()=>ii(t))}function Ur(){let e=y.selectedPersonaId??y.currentChat?.persona_id??y.personas[0]?.id??null,t=y.personas.find(t=>t.id===e),n=y.currentChat?.workspace_id??t?.workspace_id??t?.workspace_ids[0],r=y.workspaces.find(e=>e.id===n)?.name??`Workspace`,a=y.selectedModel??y.currentChat?.model_override??t?.default_model??y.settings?.global_default_model??y.models[0]??``,o=y.selectedMemoryMode??y.currentChat?.memory_mode??y.settings?.default_memory_mode??`saved`,s=[...y.showSystemMessages?Fr.syntheticSystemMessage(e):[],...y.messages],c=s.flatMap(t=>{let n=Fr.message(t,e);return n?[n,...y.capabilityRequests.filter(e=>e.permission_mode===`confirm`&&e.status===`pending_confirmation`&&e.capability_key!==`media.generate_image`&&e.assistant_message_id===t.id).map(e=>Ir.node(e))]:[]}),l=y.capabilityRequests.filter(e=>e.permission_mode===`confirm`&&e.status===`pending_confirmation`&&e.capability_key!==`media.generate_image`&&!s.some(t=>t.id===e.assistant_message_id)).map(e=>Ir.node(e)),u=i(`section`,{id:`messagesPane`,class:`message-pane glass`,onscroll:ri,"data-testid":`message-pane`},[...c,...l]);return i(`div`,{class:`app-shell`},[Lr.node(),i(`main`,{class:`main-pane glass`,onclick:e=>{!y.drawerOpen||!qe(e)||(y.drawerOpen=!1,$())}},[Wr(t?.name??`Persona`,w(t?.name??`Persona`,t?.avatar_url)),y.showChatControlsMenu?Gr(r,a,o):null,u,y.showJumpBottom?i(`button`,{id:`jumpBtn`,class:`jump-bottom show`,textContent:`↓`,title:`Go to the newest message`,"aria-label":`Go to the newest message`,onclick:()=>ai(!0)}):null,y.uiError?i(`div`,{class:`error-banner`},[y.uiError,i(`button`,{class:`icon-btn`,textContent:`Dismiss`,onclick:()=>{y.uiError=``,y.phase===`error`&&b.recover(),$()}})]):null,i(`div`,{class:`record-indicator`,textContent:y.phase===`recording`?`● Recording… ${Math.floor((Date.now()-y.recordingStartedAt)/1e3)}s`:`Ready`}),qr()]),i(`div`,{class:`viz-wrap ${y.showViz?`show`:``}`},kr.node())])}function Wr(e,t){return i(`div`,{class:`topbar`},[i(`a`,{class:`topbar-home`,href:`#/`,title:`Nice Assistant home`,"aria-label":`Nice Assistant home`,"data-testid":`topbar-home`},[i(`img`,{class:`topbar-home-mark`,src:`/favicon.svg`,alt:``})]),i(`button`,{class:`icon-btn`,textContent:`☰`,title:`Chats`,"aria-label":`Open the chat list`,"data-drawer-toggle":`true`,"data-testid":`drawer-toggle`,onclick:()=>{y.drawerOpen=!y.drawerOpen,$()}}),i(`div`,{class:`header-meta`},[i(`button`,{class:`image-preview-trigger topbar-avatar-trigger`,type:`button`,title:`View ${e}'s full-size avatar`,"aria-label":`View ${e}'s full-size avatar`,onclick:()=>{y.personaAvatarPreview=t,$()}},[i(`img`,{class:`topbar-avatar`,src:t,alt:`${e} avatar`})]),i(`div`,{class:`header-title`,textContent:y.currentChat?.title||`New conversation`}),i(`span`,{class:`chip persona-chip`,textContent:e})]),i(`span`,{class:`sr-only`,textContent:y.statusText,"data-testid":`client-phase`}),i(`button`,{class:`icon-btn`,textContent:`⋯`,title:`Chat controls and details`,"aria-expanded":y.showChatControlsMenu,onclick:()=>{y.showChatControlsMenu=!y.showChatControlsMenu,$()}}),i(`button`,{class:`icon-btn`,textContent:`⚙`,title:`Settings`,"data-testid":`open-settings`,onclick:()=>Q.settings(y.settingsSection)}),i(`button`,{class:`icon-btn`,textContent:`↪`,title:`Log out`,"data-testid":`logout`,onclick:()=>void $r()})])}function Gr(e,t,n){return i(`div`,{class:`chat-controls-menu glass`},[i(`button`,{class:`pill-btn`,textContent:y.voiceResponsesEnabled?`Voice replies: On`:`Voice replies: Off`,onclick:()=>{y.voiceResponsesEnabled=!y.voiceResponsesEnabled,$()}}),i(`button`,{class:`pill-btn ${y.settings?.chat_blur_images?`active`:``}`,textContent:y.settings?.chat_blur_images?`Blur images: On`:`Blur images: Off`,"aria-pressed":!!y.settings?.chat_blur_images,"data-testid":`toggle-chat-image-blur`,onclick:()=>void Kr()}),y.currentAudioMessageId?i(`button`,{class:`pill-btn`,textContent:`Stop audio`,onclick:()=>X.stop()}):null,i(`details`,{class:`chat-control-details`},[i(`summary`,{textContent:`Chat details`}),i(`p`,{class:`meta`,textContent:`Workspace: ${e}`}),i(`label`,{textContent:`Model`}),i(`select`,{class:`chip-select`,value:t,onchange:e=>{y.selectedModel=e.currentTarget.value}},y.models.map(e=>i(`option`,{value:e,selected:e===t,textContent:at(e)}))),i(`label`,{textContent:`Memory mode`}),i(`select`,{class:`chip-select`,value:n,onchange:e=>{y.selectedMemoryMode=e.currentTarget.value===`off`?`off`:`saved`}},[i(`option`,{value:`saved`,selected:n!==`off`,textContent:`Use saved memory`}),i(`option`,{value:`off`,selected:n===`off`,textContent:`Do not use saved memory`})]),i(`div`,{class:`status-pill ${ni()}`,textContent:y.statusText}),i(`button`,{class:`pill-btn`,textContent:y.showSystemMessages?`Hide system/tool`:`Show system/tool`,onclick:()=>{y.showSystemMessages=!y.showSystemMessages,$()}}),i(`button`,{class:`pill-btn`,textContent:y.showThinkingByDefault?`Hide thinking`:`Show thinking`,onclick:()=>{y.showThinkingByDefault=!y.showThinkingByDefault,$()}}),i(`button`,{class:`pill-btn ${y.showViz?`active`:``}`,textContent:y.showViz?`Visualizer: On`:`Visualizer: Off`,onclick:()=>{y.showViz=!y.showViz,y.settings&&(y.settings.general_show_viz=y.showViz),$()}})])])}async function Kr(){if(!y.settings||y.settingsSaving)return;let e=y.settings.chat_blur_images;y.settings.chat_blur_images=!e,y.settingsSaving=!0,$();try{y.settings=Oe(await r.updateSettings(S(y.settings)))}catch(t){y.settings.chat_blur_images=e,y.uiError=p(t,`The image blur preference could not be saved.`)}finally{y.settingsSaving=!1,$()}}function qr(){let{busy:e,inputLocked:t}=dt(y.phase),n=y.pendingRequest&&[`queued`,`thinking`].includes(y.phase);return i(`div`,{class:`composer`},[i(`textarea`,{id:`chatInput`,rows:1,class:`composer-input`,value:y.draftMessage,placeholder:`Ask anything… (Shift+Enter for new line)`,disabled:t,"data-testid":`chat-input`,oninput:e=>{let t=e.currentTarget;y.draftMessage=t.value,oi(t)},onkeydown:e=>{e.key===`Enter`&&!e.shiftKey&&(e.preventDefault(),Z.send(e.currentTarget.value))}}),n?i(`button`,{class:`send-btn`,textContent:`Cancel`,"data-testid":`chat-cancel`,onclick:()=>void Z.cancel()}):i(`button`,{class:`send-btn`,textContent:`Send`,disabled:e,"data-testid":`chat-send`,onclick:()=>void Z.send(y.draftMessage)}),nn(e,()=>X.stop(!1),jr)])}function Jr(){return i(`div`,{class:`modal-backdrop`},[i(`div`,{class:`modal-card glass`,role:`dialog`,"aria-modal":`true`},[i(`h3`,{textContent:`Start a new chat`}),i(`label`,{textContent:`Persona`}),i(`select`,{class:`chip-select`,value:y.newChatPersonaId??``,"data-testid":`new-chat-persona`,onchange:e=>{y.newChatPersonaId=e.currentTarget.value||null}},y.personas.map(e=>i(`option`,{value:e.id,selected:e.id===y.newChatPersonaId,textContent:e.name}))),i(`div`,{class:`modal-actions`},[i(`button`,{class:`pill-btn`,textContent:`Cancel`,onclick:()=>{y.showNewChatPersonaModal=!1,$()}}),i(`button`,{class:`send-btn`,textContent:`Create chat`,"data-testid":`new-chat-confirm`,onclick:()=>void Yr()})])])])}async function Yr(){y.showNewChatPersonaModal=!1,await Z.create(y.newChatPersonaId),$()}function Xr(e){return i(`div`,{class:`modal-backdrop`},[i(`div`,{class:`modal-card glass`,role:`dialog`,"aria-modal":`true`,"aria-label":e.title},[i(`h3`,{textContent:e.title}),e.message?i(`div`,{class:`meta modal-message`,textContent:e.message}):null,e.inputValue===void 0?null:i(`input`,{class:`search-input`,value:e.inputValue,placeholder:e.inputPlaceholder??``,autofocus:!0,oninput:e=>{y.modal&&(y.modal.inputValue=e.currentTarget.value)}}),i(`div`,{class:`modal-actions`},e.actions.map(e=>i(`button`,{class:e.kind===`primary`?`send-btn`:e.kind===`danger`?`send-btn danger`:`pill-btn`,textContent:e.label,onclick:()=>void e.run(y.modal?.inputValue??``)})))])])}function Zr(){_(y),y.showSettings=!1,y.currentChat?Q.chat(y.currentChat.id):Q.home()}async function Qr(e=``){X.stop(!1),jr.cancel(),Lr.reset(),y.session=null,y.currentChat=null,y.messages=[],y.capabilityRequests=[],_(y),y.mediaCatalog=null,y.mediaPlanPreview=null,y.resourceCoordination=null,y.resourceCoordinationEvents=[],y.pendingRequest=null,y.authError=e,y.modal=null,y.phase!==`signed_out`&&b.transition(`signed_out`),Q.home(!0),$()}async function $r(){try{await r.logout()}finally{await Qr()}}function ei(){return{prompt(e,t,n=``){return new Promise(r=>{y.modal={title:e,message:t,inputValue:n,actions:[{label:`Cancel`,run:()=>{y.modal=null,r(null),$()}},{label:`Continue`,kind:`primary`,run:e=>{y.modal=null,r(e),$()}}]},$()})},confirm(e,t,n=`Confirm`){return new Promise(r=>{y.modal={title:e,message:t,actions:[{label:`Cancel`,run:()=>{y.modal=null,r(!1),$()}},{label:n,kind:`danger`,run:()=>{y.modal=null,r(!0),$()}}]},$()})},info(e,t){y.modal={title:e,message:t,actions:[{label:`Close`,kind:`primary`,run:()=>{y.modal=null,$()}}]},$()}}}var ti=`#messagesPane`;function ni(){return y.phase===`recording`?`status-recording`:y.phase===`speaking`?`status-speaking`:[`queued`,`thinking`,`transcribing`].includes(y.phase)?`status-thinking`:`status-idle`}function ri(e){let t=e.currentTarget;y.showJumpBottom=t.scrollTop+t.clientHeight<t.scrollHeight-8,y.stickMessagesToBottom=!y.showJumpBottom}function ii(e){if(y.stickMessagesToBottom){ai(!1);return}c(ti,e)}function ai(e){let t=document.querySelector(ti);t?.scrollTo({top:t.scrollHeight,behavior:e?`smooth`:`auto`}),y.stickMessagesToBottom=!0,y.showJumpBottom=!1}function oi(e){e.style.height=`auto`,e.style.height=`${Math.min(180,e.scrollHeight)}px`}function si(e){if(y.chatImagePreview&&(e.key===`ArrowLeft`||e.key===`ArrowRight`)){e.preventDefault(),pt(y,e.key===`ArrowLeft`?-1:1),$();return}if(e.key===`Escape`)if(y.modal){let e=y.modal.actions.find(e=>e.label===`Cancel`)??y.modal.actions[0];e&&e.run(y.modal.inputValue??``)}else y.showNewChatPersonaModal?(y.showNewChatPersonaModal=!1,$()):y.chatImagePreview||y.chatVideoPreview||y.personaAvatarPreview?(y.chatImagePreview=``,y.chatImageGallery=[],y.chatVideoPreview=``,y.personaAvatarPreview=``,$()):y.showSettings&&Zr()}function ci(){y.lastActivityAt=Date.now()}function li(){y.sessionTimer!==null&&window.clearInterval(y.sessionTimer),y.sessionTimer=window.setInterval(()=>{!y.session||!y.settings?.general_auto_logout||Date.now()-y.lastActivityAt>=y.session.ttl_seconds*1e3&&$r()},15e3)}function ui(){let e=window.visualViewport?.height??window.innerHeight;document.documentElement.style.setProperty(`--app-viewport-height`,`${Math.round(e)}px`)}function di(e){let t=p(e,`The browser encountered an unexpected error.`);y.uiError=t,b.transition(`error`,`Error`),r.clientEvent(`browser.unhandled`,t),$()}function fi(e){let t=document.getElementById(e);if(!(t instanceof HTMLElement))throw Error(`Missing #${e}`);return t}
\ No newline at end of file
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (!channel) return true;
+    for (let index = 0; index < channel.length; index += 1) {
+      const sample = Math.max(-1, Math.min(1, channel[index]));
+      this.pending[this.filled] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+      this.filled += 1;
+      if (this.filled === this.pending.length) {
+        const piece = this.pending;
+        this.pending = new Int16Array(piece.length);
+        this.filled = 0;
+        this.port.postMessage(piece.buffer, [piece.buffer]);
+      }
+    }
+    return true;
+  }
+}
+registerProcessor('${_i}', PcmPieces);
+`;async function Ie(a,e){let t=globalThis.AudioContext;if(!t||typeof AudioWorkletNode>"u")return null;let i;try{i=new t({sampleRate:16e3})}catch{i=new t}let n=URL.createObjectURL(new Blob([Ws],{type:"text/javascript"}));try{await i.audioWorklet.addModule(n)}catch{return i.close(),null}finally{URL.revokeObjectURL(n)}let r=i.createMediaStreamSource(a),d=new AudioWorkletNode(i,_i,{numberOfInputs:1,numberOfOutputs:1,channelCount:1}),l=null;return d.port.onmessage=c=>{let p=c.data;if(p instanceof ArrayBuffer){e(p);return}p.last.byteLength&&e(p.last),l?.()},r.connect(d),d.connect(i.destination),{rate:i.sampleRate,async close(){await new Promise(c=>{l=c,d.port.postMessage("flush"),setTimeout(c,1e3)}),d.port.onmessage=null;try{r.disconnect(),d.disconnect(),await i.close()}catch{}}}}var pe=class a{constructor(e,t){this.client=e;this.onPartial=t;this.sending=new Promise(i=>{this.opened=i})}client;onPartial;capture=null;id=null;failed=!1;sending;opened=()=>{};static hears(e){return e?.stt_provider==="local"&&e.stt_local_backend==="wyoming"}static async open(e,t,i,n=Ie){let r=new a(t,i);try{r.capture=await n(e,d=>r.feed(d))}catch{r.capture=null}return r.capture?(t.openTranscriptionStream(r.capture.rate).then(d=>{r.id=d.id},()=>{r.failed=!0}).finally(r.opened),r):null}release(){this.onPartial=()=>{};let e=this.capture;return this.capture=null,e?e.close():Promise.resolve()}async finish(){if(await this.release(),await this.sending,!this.id||this.failed)return this.abandon(),null;try{return(await this.client.finishTranscriptionStream(this.id)).text}catch{return null}}abandon(){this.failed=!0,this.release(),this.sending.then(()=>{this.id&&this.client.cancelTranscriptionStream(this.id).catch(()=>{})})}feed(e){this.sending=this.sending.then(async()=>{if(!(this.failed||!this.id))try{let{partial:t}=await this.client.sendTranscriptionAudio(this.id,e);t&&this.onPartial(t)}catch{this.failed=!0}})}};var _t={speechLevel:.035,silenceLevel:.015,silenceMs:900,maxRecordingMs:6e4},Re=class{options;startedAt=0;heardSpeech=!1;quietSince=0;constructor(e={}){this.options={..._t,...e}}begin(e){this.startedAt=e,this.heardSpeech=!1,this.quietSince=0}get heard(){return this.heardSpeech}observe(e,t){return t-this.startedAt>=this.options.maxRecordingMs?"too_long":e>=this.options.speechLevel?(this.heardSpeech=!0,this.quietSince=0,"speaking"):this.heardSpeech?e>this.options.silenceLevel?this.quietSince&&t-this.quietSince>=this.options.silenceMs?"ended":"speaking":(this.quietSince||(this.quietSince=t),t-this.quietSince>=this.options.silenceMs?"ended":"speaking"):"waiting"}},Le=class{pauseMs;silenceLevel;speechLevel;heardSpeech=!1;quietSince=0;cutAlready=!1;constructor(e={}){this.pauseMs=e.pauseMs??450,this.silenceLevel=e.silenceLevel??_t.silenceLevel,this.speechLevel=e.speechLevel??_t.speechLevel}begin(){this.heardSpeech=!1,this.quietSince=0,this.cutAlready=!1}observe(e,t){return e>=this.speechLevel?(this.heardSpeech=!0,this.quietSince=0,this.cutAlready=!1,!1):!this.heardSpeech||e>this.silenceLevel||(this.quietSince||(this.quietSince=t),this.cutAlready||t-this.quietSince<this.pauseMs)?!1:(this.cutAlready=!0,!0)}};function Si(a){let e=globalThis.AudioContext??globalThis.webkitAudioContext;if(!e)return{level:()=>0,close:()=>{}};let t=new e,i=t.createAnalyser();i.fftSize=1024;let n=t.createMediaStreamSource(a);n.connect(i);let r=new Float32Array(i.fftSize);return{level(){i.getFloatTimeDomainData(r);let d=0;for(let l of r)d+=l*l;return Math.sqrt(d/r.length)},close(){try{n.disconnect(),t.close()}catch{}}}}var $e=class{pieces=[];pending=[];claimed=0;begin(){this.pieces=[],this.pending=[],this.claimed=0}claim(e,t){let i=this.claimed;this.claimed+=1,this.pending.push(e().then(n=>{this.pieces[i]=n.trim()}).catch(()=>{this.pieces[i]=""}).then(()=>{t(this.joined())}))}async finish(e){return this.pieces[this.claimed]=e.trim(),await Promise.all(this.pending),this.joined()}joined(){return this.pieces.filter(Boolean).join(" ").replace(/\s+/g," ").trim()}get empty(){return this.claimed===0&&!this.joined()}};var js=100,Js=["audio/webm;codecs=opus","audio/webm","audio/mp4","audio/ogg;codecs=opus","audio/ogg"],qe=class{constructor(e=o,t=A,i=_,n=Si,r=()=>Date.now(),d={},l=Ie){this.appState=e;this.stateMachine=t;this.client=i;this.openMeter=n;this.now=r;this.openCapture=l;this.detector=new Re(d),this.pauses=new Le(d)}appState;stateMachine;client;openMeter;now;openCapture;recorder=null;stream=null;chunks=[];mimeType="";onChange=()=>{};onTranscript=async()=>{};showPartial=e=>{this.appState.partialTranscript=e,this.onChange()};meter=null;listener=null;live=null;detector;pauses;segments=new $e;get streaming(){return!!this.appState.settings?.stt_streaming}configure(e,t){this.onChange=e,this.onTranscript=t}get recording(){return this.recorder?.state==="recording"}async start(e=!1){if(!this.recording){if(!this.appState.settings||this.appState.settings.stt_provider==="disabled"){this.appState.uiError="Speech-to-text is disabled. Enable OpenAI STT in Settings.",this.onChange();return}if(!navigator.mediaDevices?.getUserMedia||!window.MediaRecorder){this.appState.uiError="This browser cannot record microphone audio.",this.onChange();return}try{this.stream=await navigator.mediaDevices.getUserMedia({audio:!0}),this.mimeType=Gs(),this.chunks=[],this.recorder=this.mimeType?new MediaRecorder(this.stream,{mimeType:this.mimeType}):new MediaRecorder(this.stream),this.recorder.addEventListener("dataavailable",t=>{t.data.size&&this.chunks.push(t.data)}),this.recorder.start(250),this.segments.begin(),this.appState.partialTranscript="",this.appState.recordingStartedAt=this.now(),this.stateMachine.transition("recording"),e&&this.listenForTheEnd(),pe.hears(this.appState.settings)&&this.goLive(this.stream,this.recorder)}catch(t){this.cleanup(),this.appState.uiError=h(t,"Microphone access was denied or unavailable."),this.stateMachine.transition("error")}this.onChange()}}listenForTheEnd(){let e=this.stream;e&&(this.meter=this.openMeter(e),this.detector.begin(this.now()),this.pauses.begin(),this.listener=setInterval(()=>{let t=this.meter;if(!t||!this.recording)return;let i=this.detector.observe(t.level(),this.now());if(i==="too_long"){this.appState.uiError="Listening stopped after a minute. Hold the microphone button to record instead.",this.stop();return}if(i==="ended"){this.stop();return}this.streaming&&!this.live&&this.pauses.observe(t.level(),this.now())&&this.cutSegment()},js))}async cutSegment(){let e=this.recorder;if(!e||e.state!=="recording"||!this.stream)return;let t=await this.closeRecorder(e);this.recording&&this.openRecorder(),t.size&&this.segments.claim(async()=>(await this.client.transcribe(t,ki(t.type))).text,this.showPartial)}goLive(e,t){pe.open(e,this.client,this.showPartial,this.openCapture).then(i=>{this.recorder===t&&t.state==="recording"?this.live=i:i?.abandon()})}openRecorder(){this.stream&&(this.chunks=[],this.recorder=this.mimeType?new MediaRecorder(this.stream,{mimeType:this.mimeType}):new MediaRecorder(this.stream),this.recorder.addEventListener("dataavailable",e=>{e.data.size&&this.chunks.push(e.data)}),this.recorder.start(250))}closeRecorder(e){let t=e.mimeType||this.mimeType||"audio/webm",i=this.chunks;return new Promise(n=>{e.addEventListener("stop",()=>n(new Blob(i,{type:t})),{once:!0}),e.stop()})}async stop(){let e=this.recorder;if(!e||e.state!=="recording")return;let t=this.live;this.live=null,this.stopListening();let i=await new Promise(n=>{e.addEventListener("stop",()=>n(new Blob(this.chunks,{type:e.mimeType||this.mimeType||"audio/webm"})),{once:!0}),e.stop()});if(this.cleanup(),!i.size&&this.segments.empty){t?.abandon(),this.appState.partialTranscript="",this.stateMachine.transition("idle"),this.onChange();return}this.stateMachine.transition("transcribing"),this.onChange();try{let r=(t?await t.finish():null)??(await this.client.transcribe(i,ki(i.type))).text,d=await this.segments.finish(r);this.appState.partialTranscript="",d?await this.onTranscript(d):this.appState.phase==="transcribing"&&this.stateMachine.transition("idle")}catch(n){this.appState.uiError=h(n,"Unable to transcribe this recording."),this.stateMachine.transition("error")}finally{this.onChange()}}cancel(){this.recorder?.state==="recording"&&this.recorder.stop(),this.appState.partialTranscript="",this.stopListening(),this.cleanup(),this.appState.phase==="recording"&&this.stateMachine.transition("idle"),this.onChange()}stopListening(){this.listener!==null&&clearInterval(this.listener),this.listener=null,this.meter?.close(),this.meter=null}cleanup(){this.live?.abandon(),this.live=null,this.stopListening();for(let e of this.stream?.getTracks()??[])e.stop();this.stream=null,this.recorder=null,this.chunks=[],this.appState.recordingStartedAt=0}};function Gs(){return typeof MediaRecorder>"u"||typeof MediaRecorder.isTypeSupported!="function"?"":Js.find(a=>MediaRecorder.isTypeSupported(a))??""}function ki(a){return a.includes("mp4")?"audio.mp4":a.includes("ogg")?"audio.ogg":"audio.webm"}function xi(a,e,t){let i=!!o.settings?.stt_hands_free,n=Math.floor((Date.now()-o.recordingStartedAt)/1e3),r=o.phase==="recording"?`${i?"Listening":"Recording"} ${n}s`:o.phase==="transcribing"?"Transcribing\u2026":i?"Tap to Talk":"Hold to Talk",d={onpointerdown:()=>{e(),t.start()},onpointerup:()=>{t.stop()},onpointercancel:()=>{t.stop()},onpointerleave:g=>{g.buttons===1&&t.stop()}},l={onclick:()=>{if(o.phase==="recording"){t.stop();return}e(),t.start(!0)}},c=s("button",{class:`talk-btn ${o.phase==="recording"?"active":""}`,textContent:r,disabled:a&&o.phase!=="recording","data-testid":"talk-button",title:Ci()??"Speech is transcribed on this machine.",...i?l:d}),p=Ci();return p?s("div",{class:"talk-control"},[c,s("span",{class:"meta talk-destination","data-testid":"talk-destination",textContent:p})]):c}function Ci(){let a=o.settings?.stt_provider??"disabled";return a==="disabled"||a==="local"?null:"Recordings are sent to OpenAI to be transcribed."}var Oe=class{constructor(e){this.onRoute=e}onRoute;listening=!1;start(){this.listening||(this.listening=!0,window.addEventListener("hashchange",this.handleHash),this.onRoute(Ne(window.location.hash)))}stop(){this.listening&&(this.listening=!1,window.removeEventListener("hashchange",this.handleHash))}home(e=!1){this.go("#/",e)}chat(e,t=!1){this.go(`#/chats/${encodeURIComponent(e)}`,t)}settings(e="General",t=!1){this.go(`#/settings/${encodeURIComponent(e)}`,t)}handleHash=()=>{this.onRoute(Ne(window.location.hash))};go(e,t){if(window.location.hash===e){this.onRoute(Ne(e));return}t?window.history.replaceState(null,"",e):window.location.hash=e,t&&this.onRoute(Ne(e))}};function Ne(a){let e=a.replace(/^#\/?/,""),[t,i]=e.split("/",2);return t==="chats"&&i?{kind:"chat",chatId:decodeURIComponent(i)}:t==="settings"?{kind:"settings",section:decodeURIComponent(i||"General")}:{kind:"home"}}function Pi(a){let e=jt(a.query),t=Wt.map(i=>({...i,sections:i.sections.filter(n=>e.includes(n))})).filter(i=>i.sections.length);return s("aside",{class:"settings-nav glass"},[s("input",{class:"settings-search",type:"search",placeholder:"Search settings",value:a.query,"aria-label":"Search settings","data-testid":"settings-search",oninput:i=>a.onQuery(i.currentTarget.value),onkeydown:i=>{i.key!=="Enter"||!e.length||(i.preventDefault(),a.onOpen(e[0]))}}),s("div",{class:"settings-nav-list"},t.length?t.map(i=>s("div",{class:"settings-nav-group"},[s("div",{class:"settings-nav-group-title",textContent:i.name}),...i.sections.map(n=>s("button",{class:`settings-nav-item ${n===a.section?"active":""}`,textContent:oe(n),"data-testid":`settings-nav-${Ks(n)}`,onclick:()=>a.onOpen(n)}))])):[s("p",{class:"meta settings-search-empty",textContent:"Nothing matches that."})])])}function Ks(a){return a.toLowerCase().replace(/\s+/g,"-")}var He=class{constructor(e,t,i=()=>{}){this.renderApp=e;this.client=t;this.openPreview=i}renderApp;client;openPreview;items=[];mode=null;loading=!1;error="";isOpen(e){return this.mode===e}close(){this.mode=null}async open(e){this.mode=e,this.renderApp(),this.items.length||await this.load()}node(e){return s("div",{class:"identity-media-picker","data-testid":`identity-media-picker-${e.mode}`},[s("div",{class:"task-model-head"},[s("strong",{textContent:e.mode==="reference"?"Recent generated images":"Choose an image"}),s("button",{class:"icon-btn",textContent:"\u2715 Close",onclick:()=>{this.close(),this.renderApp()}})]),e.blockedMessage?s("div",{class:"provider-check-message",textContent:e.blockedMessage}):null,this.loading?s("div",{class:"meta",textContent:"Loading images\u2026"}):null,this.error?s("div",{class:"provider-check-message",textContent:this.error}):null,!this.loading&&!this.error&&!this.items.length?s("div",{class:"settings-empty-state",textContent:"No generated images are available yet."}):null,s("div",{class:"identity-media-grid"},this.items.map(t=>s("div",{class:"identity-media-option"},[s("button",{class:"identity-media-preview-button",title:"Open larger view","aria-label":"Open generated image preview",onclick:()=>this.openPreview(t.content_url)},[s("img",{src:t.content_url,alt:"Generated image available for selection",loading:"lazy"})]),s("div",{class:"meta",textContent:I(t.created_at)}),s("button",{class:"pill-btn",textContent:e.actionLabel,disabled:e.actionDisabled,onclick:()=>{e.onUse(t)}})]))),s("button",{class:"pill-btn",textContent:"Refresh images",disabled:this.loading,onclick:()=>{this.load(!0)}})])}async load(e=!1){if(!(this.loading||this.items.length&&!e)){this.loading=!0,this.error="",this.renderApp();try{this.items=(await this.client.mediaLibrary("image",100)).items}catch(t){this.error=h(t,"Generated images could not be loaded.")}finally{this.loading=!1,this.renderApp()}}}};var Be=class{constructor(e,t,i){this.appState=e;this.client=t;this.renderApp=i}appState;client;renderApp;entries=[];presets=[];busy=!1;loadedPersonaId="";async refresh(e){this.busy=!0,this.loadedPersonaId=e;try{this.entries=(await this.client.libraryEntries(e)).items,this.presets=(await this.client.mediaPresets()).items}catch(t){this.appState.settingsError=h(t,"Unable to load kept pictures.")}finally{this.busy=!1,this.renderApp()}}node(e,t=null,i=async()=>{}){let n=t?.preferred_preset_ids??[],r=l=>{this.savePreferred(e,t,l,i)},d=e!==this.loadedPersonaId;return v([f("Preferred recipes","Which presets are known to work for this persona, best first. Routing prefers them when a request does not call for something else."),this.preferences(n,r),f(`Kept pictures (${d?0:this.entries.length})`,"Pictures kept for reuse, with the description they were kept under. A later request is matched against that description, never against prompt text."),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:this.busy?"Loading\u2026":"Show kept pictures",disabled:this.busy||!e,"data-testid":"library-refresh",onclick:()=>{this.refresh(e)}})]),d?s("p",{class:"meta",textContent:"Choose a persona and show its kept pictures."}):this.entries.length?s("ul",{class:"library-entries","data-testid":"library-entries"},this.entries.map(l=>this.entry(l))):s("p",{class:"meta",textContent:"Nothing kept yet. Pictures are kept automatically once they are made with a description."})])}async savePreferred(e,t,i,n){if(!(!e||!t)){t.preferred_preset_ids=i,this.renderApp();try{await this.client.updateVisualIdentity(e,{...t,preferred_preset_ids:i}),await n()}catch(r){this.appState.settingsError=h(r,"Unable to save preferred recipes."),await n().catch(()=>{})}this.renderApp()}}preferences(e,t){let i=r=>this.presets.find(d=>d.id===r)?.name??r,n=this.presets.filter(r=>!e.includes(r.id));return s("div",{class:"preset-preferences","data-testid":"preset-preferences"},[e.length?s("ol",{class:"routing-shortlist"},e.map((r,d)=>s("li",{},[s("span",{class:"routing-shortlist-title",textContent:i(r)}),s("div",{class:"chips"},[d?s("button",{class:"pill-btn",textContent:"Move up",onclick:()=>{let l=[...e];[l[d-1],l[d]]=[l[d],l[d-1]],t(l)}}):null,s("button",{class:"pill-btn danger",textContent:"Remove","data-testid":`preference-remove-${r}`,onclick:()=>t(e.filter(l=>l!==r))})])]))):s("p",{class:"meta",textContent:"No preferred recipe yet, so routing decides on its own."}),n.length?s("select",{class:"search-input","data-testid":"preference-add",onchange:r=>{let d=r.currentTarget.value;d&&t([...e,d])}},[s("option",{value:"",textContent:"Add a preferred recipe\u2026"}),...n.map(r=>s("option",{value:r.id,textContent:r.name}))]):null])}entry(e){let t=e.scene??{},i=[t.subject,t.action,t.setting].filter(Boolean).join(", ");return s("li",{class:"library-entry"},[s("img",{class:"library-thumb",src:e.content_url,alt:i||"Kept picture"}),s("div",{class:"library-entry-body"},[s("span",{textContent:i||"No description recorded."}),s("span",{class:"meta",textContent:e.state==="retired"?"Retired: past the keep limit, so it will not be sent again. The picture itself is untouched.":e.state==="served"?`Sent ${e.served_count} time${e.served_count===1?"":"s"}.`:"Ready to send."})]),s("button",{class:"pill-btn danger",textContent:"Forget",title:"Stop reusing this picture. The picture itself stays.","data-testid":`library-forget-${e.id}`,onclick:()=>{this.forget(e)}})])}async forget(e){this.busy=!0,this.renderApp();try{await this.client.deleteLibraryEntry(e.id),this.entries=this.entries.filter(t=>t.id!==e.id)}catch(t){this.appState.settingsError=h(t,"Unable to forget that picture.")}finally{this.busy=!1,this.renderApp()}}};var Mi={reference_adapter:"Condition generation on the reference image",identity_pass:"Replace the face after generation"},Ei="How the persona\u2019s face is produced. Conditioning applies the approved reference while the image is being made. A later pass generates the picture first and then replaces the face, which works with checkpoints no adapter can condition but cannot change pose or lighting. Both are configured in Media Catalog, and every picture records which one produced its face.";function Xs(a){let e=a.available_mechanisms??[],t=a.conditioning_mechanism??"reference_adapter";return e.includes(t)?[...e]:[t,...e]}function St(a,e,t,i,n){return s("button",{class:"identity-thumb-button",title:"Open larger view","aria-label":e,onclick:()=>n(a)},[s("img",{class:i,src:a,alt:t})])}function Ti(a){return s("div",{class:"persona-card"},[f("Activity history","An owner-scoped audit of reference, profile, and comparison changes."),a.length?s("div",{class:"identity-audit-list"},a.slice(0,30).map(e=>s("div",{class:"manager-row"},[s("strong",{textContent:k(e.action)}),s("span",{class:"meta",textContent:I(e.created_at)})]))):s("div",{class:"meta",textContent:"No visual identity activity has been recorded."})])}function Ai(a,e,t,i=()=>{},n=()=>{}){let r=a.approved_reference_count>0,d=a.conditioning_fallback==="require_conditioning";return s("div",{class:"persona-card identity-readiness-card"},[s("div",{class:"task-model-head"},[s("div",{},[s("strong",{textContent:`${e} visual identity`}),s("div",{class:"meta",textContent:"A quick view of what is actually ready."})]),s("span",{class:`provider-status ${t?"ok":"fail"}`,textContent:t?"Enabled":"Not enabled"})]),s("div",{class:"settings-readiness-list"},[x("Reference image",r?`${a.approved_reference_count} approved`:"Add and approve at least one image",r?"ready":"attention","A reviewed image that defines how this persona should look. References remain private protected media."),x("Reference-aware generation",a.generation_workflow_configured?"An identity-capable ComfyUI workflow is configured":"Not configured; ComfyUI needs an identity model plus a bound workflow in Media Catalog",a.generation_workflow_configured?"ready":"attention","Install and test an identity graph such as IPAdapter, InstantID, PuLID, or PhotoMaker in ComfyUI. Then add its API-format workflow in Media Catalog with feature identity_control and explicit identity_image_bindings."),x("Optional comparison",a.verification_configured?"Verifier settings are configured":"Off; generated images will remain unverified",a.verification_configured?"ready":"off","An optional verifier can compare a finished face with the reference. It cannot improve generation."),x("When identity control is unavailable",d?"Block the request until reference-aware generation is ready":"Allow a clearly labeled unconditioned image",d?"attention":"off","This controls pre-generation fallback when no compatible identity workflow can run. It is separate from face comparison after generation."),x("When comparison fails",a.failure_policy==="block_claim"?"Hide the failed image":"Show the image with an unverified label",a.failure_policy==="block_claim"?"attention":"off",a.verification_configured?"This policy applies after the optional comparison service evaluates a generated image.":"This saved policy will take effect only if the optional comparison service is configured later.")]),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:a.generation_workflow_configured?"Review identity control setup":"Set up identity control","data-testid":"identity-configure-generation",onclick:i}),s("button",{class:"pill-btn",textContent:a.verification_configured?"Review optional comparison":"Configure optional comparison","data-testid":"identity-configure-comparison",onclick:n})])])}function Ys(a,e){let t=a.conditioning_mechanism??"reference_adapter",i=Xs(a);if(i.length<2)return R("How the face is produced",s("span",{class:"meta","data-testid":"identity-mechanism",textContent:Mi[t]}),Ei);let n=U(t,i,r=>{a.conditioning_mechanism=r,e()},r=>Mi[r]??r);return n.dataset.testid="identity-mechanism",R("How the face is produced",n,Ei)}function Ii(a,e,t,i=()=>{}){let n={allow_unconditioned:"Generate and label an unconditioned image",require_conditioning:"Block until identity control is ready"};return s("div",{class:"persona-card"},[f("Identity generation behavior","How the persona\u2019s face is produced, and what happens when that is not possible. What happens after generation, when the optional comparison service disagrees, is in the advanced section."),Ys(a,i),R("When identity control is unavailable",U(a.conditioning_fallback??"allow_unconditioned",["allow_unconditioned","require_conditioning"],r=>{a.conditioning_fallback=r},r=>n[r]??r),"Allowing fallback never claims a match: the resulting image is explicitly labeled unconditioned and may not resemble the persona."),R("Maximum generation attempts",Y(String(a.max_generation_attempts),r=>{a.max_generation_attempts=Math.round(ce(r,1,10,a.max_generation_attempts))},"number"),"The maximum number of bounded generation or correction attempts for one request."),s("button",{class:"pill-btn",textContent:"Save identity behavior",disabled:e,"data-testid":"identity-behavior-save",onclick:t})])}function Ri(a,e,t){let i={show_unverified:"Show the image with an \u201Cunverified\u201D label",block_claim:"Hide the image when comparison fails"};return s("div",{class:"persona-card"},[f("Comparison outcome","What to do with a finished image when the optional comparison service scores it below the threshold. None of this runs unless a comparison service is configured."),R("When optional comparison fails",U(a.failure_policy,["show_unverified","block_claim"],n=>{a.failure_policy=n},n=>i[n]??n),"This applies only after a configured comparison service evaluates a generated image."),R("Comparison threshold",Y(String(a.acceptance_threshold),n=>{a.acceptance_threshold=ce(n,0,1,a.acceptance_threshold)},"number"),"A higher score is stricter. Calibrate this with representative generated images before enabling blocking."),s("button",{class:"pill-btn",textContent:"Save comparison outcome",disabled:e,"data-testid":"identity-comparison-policy-save",onclick:t})])}function Li(a,e,t,i){return R("Persona",U(a,e,i,t),"Choose whose reference images, appearance guidance, kept pictures, and validation history you want to manage.")}var Ue=class{constructor(e,t,i,n,r=()=>{}){this.renderApp=e;this.appState=t;this.client=i;this.dialogs=n;this.openIdentitySetup=r;this.mediaPicker=new He(e,i,d=>this.openImage(d)),this.library=new Be(t,i,e)}renderApp;appState;client;dialogs;openIdentitySetup;selectedFile=null;attested=!1;providerResult="";mediaPicker;library;advancedOpen=!1;async refresh(){this.appState.identitySelectedPersonaId??=this.appState.personas[0]?.id??null;let e=this.appState.identitySelectedPersonaId;this.appState.identityBusy=!0;try{this.appState.identitySettings=await this.client.identitySettings(),e&&await this.reloadPersona(e),this.appState.settingsError=""}catch(t){this.appState.settingsError=h(t,"Visual identity settings could not be loaded.")}finally{this.appState.identityBusy=!1,this.renderApp()}}nodes(){let e=this.appState.identitySelectedPersonaId,t=e?this.appState.identityProfiles[e]:null;return[E("Everything about a persona's pictures","How it looks, the references that make it recognizable, and the pictures kept for reuse. Reference-aware generation is configured in Media Catalog before a reference can influence new pictures."),this.personaSelector(),t?this.profileStack(t):s("div",{class:"settings-empty-state",textContent:"Choose a persona to manage its appearance."}),this.library.node(e??"",t,()=>this.reloadPersona(e??""))]}personaSelector(){return Li(this.appState.identitySelectedPersonaId??"",this.appState.personas.map(e=>e.id),e=>this.personaName(e),e=>{this.appState.identitySelectedPersonaId=e||null,this.mediaPicker.close(),this.selectedFile=null,this.attested=!1,this.refresh()})}profileStack(e){let t=e.consent_status==="granted",i=this.personaName(e.persona_id),n=this.appState.identityValidations[e.persona_id]??[],r=this.appState.identityEvents[e.persona_id]??[];return s("div",{class:"identity-profile-stack","data-testid":"identity-profile-stack"},[Ai(e,i,t,()=>this.openIdentitySetup(e.persona_id),()=>{this.advancedOpen=!0,this.renderApp()}),t?this.referenceManager(e,i):this.enablementCard(e.persona_id,i),t?this.appearanceCard(e,i):null,t?Ii(e,this.appState.identityBusy,()=>{this.saveProfile(e)},()=>this.renderApp()):null,C("Advanced identity controls and diagnostics",`These controls tune comparison and troubleshooting. They are not required to store ${i}\u2019s reference image, and a verifier cannot make generated images look more like the reference.`,[this.providerCard(this.appState.identitySettings),t?Ri(e,this.appState.identityBusy,()=>{this.saveProfile(e)}):null,this.validationManager(e,n),Ti(r),t?this.dangerCard(e.persona_id,i):null],{open:this.advancedOpen,testId:"identity-advanced-settings",onToggle:d=>{this.advancedOpen=d}})])}enablementCard(e,t){return s("div",{class:"persona-card settings-action-card"},[f(`Set up ${t}\u2019s appearance`,`Nice Assistant will privately store reference images you choose for ${t}. For a fictional AI persona, this confirms that you created the image or have permission to use it.`),s("button",{class:"send-btn",textContent:`Enable visual identity for ${t}`,disabled:this.appState.identityBusy,"data-testid":"identity-enable",onclick:()=>{this.enableIdentity(e,t)}})])}referenceManager(e,t){let i=e.references.filter(n=>n.review_status!=="deleted");return s("div",{class:"persona-card","data-testid":"identity-reference-manager"},[f(`${t}\u2019s reference images`,"Use a clear image that represents how this persona should look. New images stay pending until you approve them."),s("label",{class:"setting-row identity-file-row"},[s("span",{textContent:"Choose an image from this device"}),s("input",{type:"file",accept:"image/png,image/jpeg,image/webp","data-testid":"identity-reference-file",onchange:n=>{this.selectedFile=n.currentTarget.files?.[0]??null,this.renderApp()}})]),this.selectedFile?s("div",{class:"selected-file-note",textContent:`Selected: ${this.selectedFile.name}`}):null,s("label",{class:"checkbox-row identity-attestation"},[s("input",{type:"checkbox",checked:this.attested,onchange:n=>{this.attested=n.currentTarget.checked,this.renderApp()}}),"I created this image or have permission to use it."]),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.appState.identityBusy?"Adding\u2026":"Add selected image",disabled:!this.selectedFile||!this.attested||this.appState.identityBusy,"data-testid":"identity-reference-upload",onclick:()=>{this.uploadReference(e.persona_id)}}),s("button",{class:"pill-btn",textContent:"Choose from generated images",disabled:this.appState.identityBusy,"data-testid":"identity-reference-gallery-open",onclick:()=>{this.mediaPicker.open("reference")}})]),this.mediaPicker.isOpen("reference")?this.mediaPicker.node({mode:"reference",actionLabel:"Use as reference",actionDisabled:this.appState.identityBusy||!this.attested,blockedMessage:this.attested?void 0:"Confirm above that you created the image or have permission to use it.",onUse:n=>this.referenceFromMedia(e.persona_id,n.id)}):null,i.length?s("div",{class:"identity-reference-list"},i.map(n=>this.referenceCard(n,t))):s("div",{class:"settings-empty-state",textContent:`No reference images have been added for ${t}.`})])}appearanceCard(e,t){return s("div",{class:"persona-card"},[f("Appearance guidance",`Describe stable details that should remain recognizable as ${t}. This helps generation prompts but does not replace a reference-aware workflow.`),yi(`How ${t} should look`,e.appearance_description,i=>{e.appearance_description=i},"Include stable traits such as hair, eyes, facial features, body type, and other defining details."),s("button",{class:"send-btn",textContent:"Save appearance guidance",disabled:this.appState.identityBusy,onclick:()=>{this.saveProfile(e)}})])}providerCard(e){if(!e)return s("div",{class:"persona-card",textContent:"Verifier settings are unavailable."});let t=e.provider==="compreface";return s("div",{class:"persona-card identity-provider-card"},[f("Optional identity comparison service","A verifier compares a finished image with the approved reference. It does not improve generation, so leave it off until reference-aware generation is useful."),R("Comparison service",U(e.provider,["disabled","compreface"],i=>{e.provider=i,this.renderApp()},i=>i==="disabled"?"Off":"CompreFace"),"CompreFace is a separately deployed LAN service used only for face comparison."),t?R("CompreFace service address",Y(e.base_url,i=>{e.base_url=i},"url"),"The private-LAN address of the CompreFace service."):null,t?R("CompreFace API key",Y(e.api_key,i=>{e.api_key=i},"password"),"A verification API key created in CompreFace and encrypted by Nice Assistant."):null,t?R("Stop waiting after (seconds)",Y(String(e.timeout_seconds),i=>{e.timeout_seconds=ce(i,1,120,e.timeout_seconds)},"number"),"Bounds each comparison request so an unavailable verifier cannot hang generation indefinitely."):null,s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.appState.identityBusy?"Saving\u2026":"Save comparison service",disabled:this.appState.identityBusy,"data-testid":"identity-provider-save",onclick:()=>{this.saveProvider()}}),t?s("button",{class:"pill-btn",textContent:this.appState.identityBusy?"Checking\u2026":"Test connection",disabled:this.appState.identityBusy,onclick:()=>{this.checkProvider()}}):null,this.providerResult?s("span",{class:"provider-check-message",textContent:this.providerResult}):null])])}validationManager(e,t){let i=this.personaName(e.persona_id);return s("div",{class:"persona-card"},[f("Manual comparison","Choose one of your generated images and compare its face with the approved reference without changing the image."),s("p",{class:"meta",textContent:e.validation_ready?`Choose a generated image to compare with ${i}\u2019s approved reference.`:"Manual comparison becomes available after an approved reference and comparison service are configured."}),s("button",{class:"pill-btn",textContent:"Choose an image to compare",disabled:!e.validation_ready||this.appState.identityBusy,"data-testid":"identity-validation-gallery-open",onclick:()=>{this.mediaPicker.open("validation")}}),this.mediaPicker.isOpen("validation")?this.mediaPicker.node({mode:"validation",actionLabel:"Compare image",actionDisabled:this.appState.identityBusy,onUse:n=>this.validateMedia(e.persona_id,n.id)}):null,t.length?s("div",{class:"identity-validation-list"},t.map(n=>s("div",{class:"identity-validation-card"},[St(this.client.mediaUrl(n.candidate_media_id),`Open compared image for ${i}`,`Compared with ${i}`,"identity-validation-thumb",r=>this.openImage(r)),s("div",{},[s("strong",{textContent:n.claim_status==="verified"?"Looks like the persona":k(n.claim_status)}),s("div",{class:"meta",textContent:`${I(n.created_at)}${n.score===null?"":` \xB7 ${(n.score*100).toFixed(1)}% match`}`}),n.error?s("div",{class:"provider-check-message",textContent:n.error.message}):null])]))):s("div",{class:"meta",textContent:"No images have been compared manually."})])}referenceCard(e,t){let i=e.review_status==="approved"?e.is_primary?"Primary reference":"Approved reference":e.review_status==="pending"?"Needs your approval":"Rejected reference";return s("div",{class:"identity-reference-card","data-testid":`identity-reference-${e.id}`},[e.content_url?St(e.content_url,`Open ${t} reference image`,`${t} reference`,"identity-reference-thumb",n=>this.openImage(n)):s("div",{class:"identity-reference-thumb missing",textContent:"Unavailable"}),s("div",{class:"identity-reference-detail"},[s("strong",{textContent:i}),s("div",{class:"meta",textContent:`${e.width}\xD7${e.height} \xB7 ${ue(e.byte_size)}`}),e.review_status==="pending"?s("div",{class:"meta",textContent:`Approve this only if it is a good representation of ${t}.`}):null,e.rejection_reason?s("div",{class:"provider-check-message",textContent:e.rejection_reason}):null,s("div",{class:"chips"},[e.review_status==="pending"?s("button",{class:"send-btn",textContent:`Approve as ${t}`,onclick:()=>{this.approveReference(e.id)}}):null,e.review_status==="pending"?s("button",{class:"pill-btn",textContent:"Not this persona",onclick:()=>{this.rejectReference(e.id)}}):null,s("button",{class:"icon-btn danger",textContent:"Delete",onclick:()=>{this.deleteReference(e.id)}})])])])}dangerCard(e,t){return s("div",{class:"persona-card settings-danger-zone"},[s("h4",{textContent:"Remove visual identity data"}),s("p",{class:"meta",textContent:`This permanently deletes ${t}\u2019s stored reference files and cancels active comparisons.`}),s("button",{class:"pill-btn danger",textContent:`Disable and delete ${t}\u2019s references`,disabled:this.appState.identityBusy,onclick:()=>{this.disableIdentity(e,t)}})])}async saveProvider(){let e=this.appState.identitySettings;e&&await this.run(async()=>{this.appState.identitySettings=await this.client.updateIdentitySettings(e),this.providerResult=e.provider==="disabled"?"Comparison is off.":"Comparison service saved.";let t=this.appState.identitySelectedPersonaId;t&&await this.reloadPersona(t)})}openImage(e){this.appState.chatImagePreview=e,this.renderApp()}async checkProvider(){await this.run(async()=>{let e=await this.client.checkIdentityProvider();this.providerResult=`${k(String(e.status))}: ${String(e.message??"")}`})}async saveProfile(e){await this.run(async()=>{try{this.appState.identityProfiles[e.persona_id]=await this.client.updateVisualIdentity(e.persona_id,e)}catch(t){throw await this.reloadPersona(e.persona_id).catch(()=>{}),t}})}async enableIdentity(e,t){await this.dialogs.confirm("Enable persistent visual identity",`Nice Assistant will store reference images you choose for ${t} and may compare generated images with them. For fictional personas, this confirms your right to use the images; it does not claim the persona is a real person giving consent.`,"Enable visual identity")&&await this.run(async()=>{this.appState.identityProfiles[e]=await this.client.grantIdentityConsent(e)})}async disableIdentity(e,t){await this.dialogs.confirm("Disable visual identity and delete references",`Permanently delete all stored reference files for ${t} and cancel active comparisons? The activity record remains, but the images cannot be restored.`,"Disable and delete")&&await this.run(async()=>{this.appState.identityProfiles[e]=await this.client.withdrawIdentityConsent(e)})}async uploadReference(e){if(!this.selectedFile||!this.attested){this.appState.settingsError="Choose an image and confirm that you have permission to use it.",this.renderApp();return}await this.run(async()=>{await this.client.uploadIdentityReference(e,this.selectedFile,"user_upload"),this.selectedFile=null,this.attested=!1,await this.reloadPersona(e)})}async referenceFromMedia(e,t){this.attested&&await this.run(async()=>{await this.client.identityReferenceFromMedia(e,t),this.attested=!1,this.mediaPicker.close(),await this.reloadPersona(e)})}async approveReference(e){let t=this.appState.identitySelectedPersonaId;t&&await this.run(async()=>{await this.client.approveIdentityReference(e),await this.reloadPersona(t)})}async rejectReference(e){let t=this.appState.identitySelectedPersonaId;if(!t)return;let i=await this.dialogs.prompt("Reject reference","Why is this not a good representation of the persona?","Does not represent this persona.");i!==null&&await this.run(async()=>{await this.client.rejectIdentityReference(e,i),await this.reloadPersona(t)})}async deleteReference(e){let t=this.appState.identitySelectedPersonaId;!t||!await this.dialogs.confirm("Delete reference image","Permanently delete this stored reference image? The deletion will remain in the activity history.","Delete image")||await this.run(async()=>{await this.client.deleteIdentityReference(e),await this.reloadPersona(t)})}async validateMedia(e,t){await this.run(async()=>{let i=await this.client.validateIdentityMedia(e,t);this.mediaPicker.close(),await this.waitJob(i.job.id),await this.reloadPersona(e)})}async waitJob(e){let t=Date.now()+12e4;for(;Date.now()<t;){let i=await this.client.job(e);if(["completed","failed","cancelled"].includes(i.status))return;await new Promise(n=>window.setTimeout(n,250))}throw new Error("The comparison is still running. Reopen this section later to see the result.")}async reloadPersona(e){let[t,i,n]=await Promise.all([this.client.visualIdentity(e),this.client.identityValidations(e),this.client.identityHistory(e)]);this.appState.identityProfiles[e]=t,this.appState.identityValidations[e]=i.items,this.appState.identityEvents[e]=n.items}async run(e){this.appState.identityBusy=!0,this.appState.settingsError="",this.renderApp();try{await e()}catch(t){this.appState.settingsError=h(t,"Visual identity operation failed.")}finally{this.appState.identityBusy=!1,this.renderApp()}}personaName(e){return this.appState.personas.find(t=>t.id===e)?.name??"Persona"}};var De=class{constructor(e,t,i,n){this.appState=e;this.client=t;this.renderApp=i;this.refreshCatalog=n}appState;client;renderApp;refreshCatalog;discovered=null;discoveryMessage="";busy=!1;selected=new Set;node(e){return v([f(`Models \u2014 the look (${e.length} enabled)`,e.length===0?"No models yet, so nothing can be generated. Find the checkpoints ComfyUI already has below.":e.length===1?"One model means every picture shares its look. Add more from ComfyUI and each becomes a recipe chats can pick.":"Each model is a checkpoint file ComfyUI already has, and each one becomes a recipe chats can pick."),e.length?s("div",{class:"chips"},e.map(t=>s("span",{class:"pill-tag",textContent:t.name,title:t.external_id}))):null,s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.busy?"Asking ComfyUI\u2026":"Find models on ComfyUI",disabled:this.busy,"data-testid":"catalog-discover-models",onclick:()=>{this.discover()}})]),this.discoveryMessage?s("p",{class:"meta","data-testid":"catalog-discovery-message",textContent:this.discoveryMessage}):null,...this.discoveryList()])}discoveryList(){if(!this.discovered)return[];let e=this.discovered.filter(t=>!t.cataloged);return e.length?[s("div",{class:"catalog-discovery-list","data-testid":"catalog-discovery-list"},e.map(t=>s("label",{class:"catalog-discovery-row"},[s("input",{type:"checkbox",checked:this.selected.has(t.name),"data-testid":`catalog-discovery-${t.name}`,onchange:i=>{i.currentTarget.checked?this.selected.add(t.name):this.selected.delete(t.name),this.renderApp()}}),s("span",{textContent:t.name})]))),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.selected.size?`Add ${this.selected.size} ${this.selected.size===1?"model":"models"}`:"Add selected models",disabled:this.busy||!this.selected.size,"data-testid":"catalog-add-selected",onclick:()=>{this.addSelected()}}),s("button",{class:"pill-btn",textContent:"Select all",disabled:this.busy,onclick:()=>{e.forEach(t=>this.selected.add(t.name)),this.renderApp()}})])]:[s("p",{class:"meta","data-testid":"catalog-discovery-complete",textContent:"Every checkpoint ComfyUI reports is already in the catalog."})]}async discover(){this.busy=!0,this.renderApp();try{let e=await this.client.comfyuiCheckpoints();this.discovered=e.ok?e.checkpoints:null,this.discoveryMessage=e.message,this.selected.clear()}catch(e){this.discovered=null,this.discoveryMessage=h(e,"ComfyUI could not be asked for its models.")}finally{this.busy=!1,this.renderApp()}}async addSelected(){let e=[...this.selected];if(!e.length)return;this.busy=!0,this.renderApp();let t;try{t=await this.client.addModelsFromCheckpoints(e)}catch(r){this.appState.settingsError=h(r,"The models could not be added."),this.busy=!1,this.renderApp();return}let i=t.skipped.map(r=>`${r.name}: ${r.reason}`).join("; "),n=t.added.length?`Added ${t.added.length} ${t.added.length===1?"model":"models"} \u2014 each has its own recipe now.`:"Nothing was added.";this.discoveryMessage=i?`${n} Skipped ${i}.`:n,this.selected.clear();try{await this.refreshCatalog();let r=await this.client.comfyuiCheckpoints();r.ok&&(this.discovered=r.checkpoints)}catch{this.discoveryMessage+=" The list could not be refreshed \u2014 press the button again to update it."}finally{this.busy=!1,this.renderApp()}}};var Qs={reference_adapter:"Conditions generation on the reference",identity_pass:"Replaces the face after generation"},Ve=class{constructor(e,t,i,n,r){this.renderApp=e;this.appState=t;this.client=i;this.refreshCatalog=n;this.dialogs=r}renderApp;appState;client;refreshCatalog;dialogs;list=null;loadedModelId="";busy=!1;checks={};presets=[];presetId="";assetChoices={};node(e,t){e&&e!==this.loadedModelId&&(this.loadedModelId=e,this.load(e));let i=this.list?.templates??[];return s("div",{class:"workflow-template-list","data-testid":"workflow-templates"},[f("Start from a known-good workflow","These graphs ship with Nice Assistant, already wired to receive the request and the persona reference. Checking one asks ComfyUI whether the nodes and files it names are installed. Nothing here has been generation-tested on this deployment."),this.list&&!this.list.model_architecture?s("div",{class:"meta","data-testid":"workflow-template-architecture-unknown",textContent:`${t} has no declared model family, so every template is offered. Recording the family in the model's settings is what lets a mismatch be caught before it wastes a generation.`}):null,this.busy&&!i.length?s("div",{class:"meta",textContent:"Loading templates\u2026"}):i.length?s("div",{},i.map(n=>this.card(n,e))):s("div",{class:"settings-empty-state",textContent:"No shipped workflow templates are available."})])}card(e,t){let i=this.checks[e.id];return s("div",{class:"persona-card workflow-template-card","data-testid":`workflow-template-${e.id}`},[s("div",{class:"task-model-head"},[s("div",{},[s("strong",{textContent:e.name}),s("div",{class:"meta",textContent:Qs[e.mechanism]??e.mechanism})]),s("span",{class:`provider-status ${e.installed_resource_id?"ok":"idle"}`,"data-testid":`workflow-template-status-${e.id}`,textContent:e.installed_count>1?`Installed \u2713 \u2014 ${e.installed_count} copies`:e.installed_resource_id?"Installed \u2713":"Not installed"})]),s("p",{class:"meta",textContent:e.summary}),e.architecture_matches?null:s("div",{class:"settings-warning","data-testid":`workflow-template-mismatch-${e.id}`,textContent:`Built for ${e.architectures.join(", ")} checkpoints, and this model is declared as ${this.list?.model_architecture}. It can still be installed, but likeness on a different family is unmeasured.`}),e.update_available?s("div",{class:"meta","data-testid":`workflow-template-update-${e.id}`,textContent:"A newer version of this template ships with Nice Assistant. Installing it adds a second workflow rather than rewriting the one you have, which may have been tuned."}):null,s("div",{class:"meta"},[s("strong",{textContent:"You need to have installed:"}),s("ul",{},e.required_assets.map(n=>s("li",{textContent:n})))]),i?this.checkResult(i):null,...this.assetPickers(e,i),e.mechanism==="identity_pass"&&this.presets.length?R("Add it to this recipe as a second pass",this.presetSelect(),"The recipe generates the picture, and this pass replaces the face in it afterwards."):null,s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:this.busy?"Checking\u2026":"Check against ComfyUI",disabled:this.busy,"data-testid":`workflow-template-verify-${e.id}`,onclick:()=>{this.verify(e.id)}}),s("button",{class:e.installed_resource_id?"pill-btn":"send-btn",textContent:this.busy?"Adding\u2026":e.installed_resource_id?"Install another copy":"Add this workflow",disabled:this.busy||!t,"data-testid":`workflow-template-install-${e.id}`,onclick:()=>{this.install(e,t)}})])])}assetPickers(e,t){return(t?.asset_checks??[]).filter(n=>!n.available&&(n.options?.length??0)>0).map(n=>{let r=`${n.node_id}:${n.input_name}`,d=this.assetChoices[e.id]?.[r]??"",l=U(d,["",...n.options??[]],c=>{this.assetChoices[e.id]={...this.assetChoices[e.id]??{},[r]:c}},c=>c||`Keep ${n.value}`);return l.dataset.testid=`workflow-template-asset-${e.id}-${n.input_name}`,R(`${n.node_type} needs a file for ${n.input_name}`,l,`The template names ${n.value}, which ComfyUI does not report. These are the files it does have for this input. Choosing one points the graph at your file instead of asking you to rename it.`)})}presetSelect(){let e=U(this.presetId,["",...this.presets.map(t=>t.id)],t=>{this.presetId=t},t=>this.presets.find(i=>i.id===t)?.name??"Do not add it to a recipe yet");return e.dataset.testid="workflow-template-preset",e}checkResult(e){let t=(e.asset_checks??[]).filter(i=>!i.available);return s("div",{class:`media-plan-preview plan-${e.provider_compatible?"ready":"blocked"}`},[s("strong",{textContent:e.provider_compatible?"ComfyUI can run this":k(e.status)}),s("p",{textContent:e.message}),e.missing_node_types?.length?s("div",{class:"meta capability-block-detail",textContent:`Not installed: ${e.missing_node_types.join(", ")}`}):null,...t.map(i=>s("div",{class:"meta capability-block-detail",textContent:`${i.node_type} ${i.input_name}: ${i.value||"required file"} is not available`})),s("div",{class:"meta",textContent:"This checks node types and the files nodes name. A model a node picks by device rather than by name cannot be checked from here, and no image has been generated."})])}async load(e){this.busy=!0;try{let[t,i]=await Promise.all([this.client.workflowTemplates(e),this.client.mediaPresets()]);this.list=t,this.presets=i.items.filter(n=>n.kind==="image")}catch(t){this.appState.settingsError=h(t,"Workflow templates could not be loaded.")}finally{this.busy=!1,this.renderApp()}}async verify(e){this.busy=!0,this.appState.settingsError="",this.renderApp();try{this.checks[e]=await this.client.verifyWorkflowTemplate(e)}catch(t){this.appState.settingsError=h(t,"ComfyUI could not be asked about this template.")}finally{this.busy=!1,this.renderApp()}}async install(e,t){if(!(e.installed_resource_id&&!await this.dialogs.confirm("Install another copy",`"${e.name}" is already installed${e.installed_count>1?` (${e.installed_count} copies)`:""}. Install another separate copy?`,"Install another copy"))){this.busy=!0,this.appState.settingsError="",this.renderApp();try{let i=e.mechanism==="identity_pass"?this.presetId:"",n=Object.entries(this.assetChoices[e.id]??{}).filter(([,r])=>r).map(([r,d])=>{let[l,c]=r.split(":");return{node_id:l??"",input_name:c??"",value:d}});await this.client.installWorkflowTemplate(e.id,t,"",i,n),this.appState.settingsSavedAt=Date.now(),await this.refreshCatalog(),this.loadedModelId=""}catch(i){this.appState.settingsError=h(i,"The workflow template could not be added.")}finally{this.busy=!1,this.renderApp()}}}};var kt=2e5,Fe=class{constructor(e,t,i,n,r,d){this.renderApp=e;this.appState=t;this.client=i;this.dialogs=n;this.finishSetup=r;this.refreshCatalog=d;this.templates=new Ve(e,t,i,d,n)}renderApp;appState;client;dialogs;finishSetup;refreshCatalog;setupOpen=!1;workflowJson="";workflowPatch=null;inspection=null;binding="";promptBinding="";modelId="";workflowName="Identity control workflow";inspectionResultNode=null;bindingFieldNode=null;promptBindingFieldNode=null;liveTestWarningNode=null;saveButton=null;templates;manualOpen=!1;open(){this.setupOpen=!0}node(){let e=this.appState.mediaCatalog;if(!e)return s("div");let i=e.resources.filter(c=>c.resource_type==="workflow"&&c.kind==="image"&&c.backend==="comfyui"&&c.features.includes("identity_control")).filter(c=>c.enabled&&c.compatible_model_ids.length>0&&Array.isArray(c.default_settings.identity_image_bindings)&&c.default_settings.identity_image_bindings.length>0),n=e.resources.filter(c=>c.enabled&&c.resource_type==="model"&&c.kind==="image"&&c.provider_key==="local-image"&&c.backend==="comfyui");n.some(c=>c.id===this.modelId)||(this.modelId=n[0]?.id??"");let r=this.appState.mediaCatalogIdentitySetupIntent,d=r?.persona_id?this.appState.personas.find(c=>c.id===r.persona_id)?.name??"the selected persona":"a selected persona",l=this.setupOpen;return v([s("div",{class:"task-model-head"},[s("div",{},[s("strong",{textContent:"Identity control"}),s("div",{class:"meta",textContent:"Reference-aware generation uses a real ComfyUI API workflow, not a filename or prompt-only identity claim."})]),s("span",{class:`provider-status ${i.length?"ok":"fail"}`,textContent:i.length?"Configured":"Not configured"})]),r?.capability_request_id?s("div",{class:"settings-warning",textContent:`The failed image request for ${d} requires identity_control. Import and check a compatible workflow here, then retry that image.`}):r?s("div",{class:"meta",textContent:`Set up a reference-aware ComfyUI workflow for ${d}. No blocked image request is attached to this setup.`}):null,i.length?s("div",{class:"meta",textContent:`${i.length} enabled identity workflow${i.length===1?"":"s"} can receive an approved persona reference.`}):s("div",{class:"settings-empty-state",textContent:"No enabled identity_control workflow has an explicit reference-image binding and compatible ComfyUI base model."}),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:l?"Hide identity setup":i.length?"Review identity setup":"Add identity control","data-testid":"identity-workflow-setup-toggle",onclick:()=>{this.setupOpen=!l,this.renderApp()}}),r?.capability_request_id?s("button",{class:"send-btn",textContent:this.appState.mediaCatalogBusy?"Starting retry\u2026":"Retry this image",disabled:this.appState.mediaCatalogBusy,"data-testid":"identity-workflow-retry-plan",onclick:()=>{this.retryImage()}}):null]),...l?this.setupFields(n):[]],"identity-control-card")}setupFields(e){let t=this.inspection,i=t?.identity_input_candidates??[],n=t?.request_input_candidates?.prompt??[],r=i.find(u=>D(u.node_id,u.input_name)===this.binding),d=n.find(u=>D(u.node_id,u.input_name)===this.promptBinding),l=!!(t?.provider_compatible&&this.workflowPatch&&r&&d&&this.modelId),c=P("Or paste API workflow JSON",this.workflowJson,u=>this.workflowChanged(u),!1,"Use ComfyUI API-format JSON. Browser-format workflow files cannot be executed by the provider API.");c.querySelector("textarea")?.setAttribute("data-testid","identity-workflow-json"),this.inspectionResultNode=t?this.inspectionResult(t):s("div",{class:"meta",textContent:"No provider check has run. Saving metadata alone is not proof that ComfyUI can execute the workflow."}),this.inspectionResultNode.dataset.testid="identity-workflow-inspection-result",this.bindingFieldNode=t&&i.length?w("Persona reference image input",this.binding,i.map(u=>D(u.node_id,u.input_name)),u=>{this.binding=u},"identity-workflow-binding",u=>i.find(y=>D(y.node_id,y.input_name)===u)?.label||u,!1,"Nice Assistant uploads the approved reference only to this selected node and input. It does not infer custom-node bindings."):null,this.promptBindingFieldNode=t&&n.length?w("Prompt input",this.promptBinding,n.map(u=>D(u.node_id,u.input_name)),u=>{this.promptBinding=u},"identity-workflow-prompt-binding",u=>{let y=n.find(S=>D(S.node_id,S.input_name)===u);return y?`${y.label} \u2014 currently "${y.current_value}"`:u},!1,"The request is written into this input. Choose the positive prompt node; without it the workflow would render the text saved inside it and ignore what was asked for."):t?s("div",{class:"settings-warning","data-testid":"identity-workflow-no-prompt-input",textContent:"ComfyUI reports no text input that can receive the request. This workflow cannot be enabled, because it would render the text saved inside it instead of what was asked for."}):null,this.liveTestWarningNode=t?.provider_compatible&&!t.live_tested?s("div",{class:"settings-warning",textContent:"Provider-compatible, not generation-tested: no image has been generated yet. The first persona image request remains the live execution test."}):null,this.saveButton=s("button",{class:"send-btn",textContent:this.appState.mediaCatalogBusy?"Saving\u2026":"Save and enable identity control",disabled:this.appState.mediaCatalogBusy||!l,"data-testid":"identity-workflow-save",onclick:()=>{this.saveWorkflow()}});let p=[m("Workflow name",this.workflowName,u=>{this.workflowName=u},"text",!1,"A recognizable catalog name, such as Persona IPAdapter portrait workflow."),s("label",{class:"setting-row identity-workflow-file-row"},[s("span",{textContent:"Import ComfyUI API workflow JSON"}),s("input",{type:"file",accept:"application/json,.json","data-testid":"identity-workflow-file",onchange:u=>{this.loadFile(u)}})]),c,s("button",{class:"pill-btn",textContent:this.appState.mediaCatalogBusy?"Checking provider\u2026":"Check workflow against ComfyUI",disabled:this.appState.mediaCatalogBusy||e.length===0,"data-testid":"identity-workflow-inspect",onclick:()=>{this.inspectWorkflow()}}),this.inspectionResultNode,this.bindingFieldNode,this.promptBindingFieldNode,this.liveTestWarningNode,this.saveButton].filter(u=>!!u),g=e.find(u=>u.id===this.modelId);return[e.length?w("Catalog base model to pair with this workflow",this.modelId,e.map(u=>u.id),u=>{this.modelId=u,this.renderApp()},"identity-workflow-model",u=>e.find(y=>y.id===u)?.name??u,!1,"This declares planning compatibility with the selected catalog model. Provider inspection does not verify that pairing; the first generation remains its live test."):s("div",{class:"settings-warning",textContent:"Add and enable a ComfyUI image base model before adding an identity workflow."}),this.templates.node(this.modelId,g?.name??"This model"),C("Import a workflow of your own instead","Export it from ComfyUI in API format. Nice Assistant checks the deployed nodes and named files, then asks which input receives the request and which receives the approved reference.",p,{open:this.manualOpen,testId:"identity-workflow-manual",onToggle:u=>{this.manualOpen=u}})].filter(u=>!!u)}inspectionResult(e){let t=(e.asset_checks??[]).filter(i=>!i.available);return s("div",{class:`media-plan-preview plan-${e.provider_compatible?"ready":"blocked"}`},[s("strong",{textContent:e.provider_compatible?"Provider-compatible":k(e.status)}),s("p",{textContent:e.message}),e.detected_node_types?.length?s("div",{class:"meta",textContent:`Workflow node types: ${e.detected_node_types.join(", ")}`}):null,e.missing_node_types?.length?s("div",{class:"meta capability-block-detail",textContent:`Missing node types: ${e.missing_node_types.join(", ")}`}):null,...t.map(i=>s("div",{class:"meta capability-block-detail",textContent:`${i.node_type} ${i.input_name}: ${i.value||"required asset"} is not available`})),...(e.warnings??[]).map(i=>s("div",{class:"meta",textContent:i}))])}async loadFile(e){let t=e.currentTarget.files?.[0];if(t){if(t.size>kt){this.appState.settingsError="The ComfyUI workflow file is too large. Export a focused API workflow no larger than 200 KB.",this.renderApp();return}try{this.workflowJson=await t.text(),this.workflowPatch=null,this.inspection=null,this.binding="",this.appState.settingsError=""}catch(i){this.appState.settingsError=h(i,"Unable to read the ComfyUI workflow file.")}this.renderApp()}}parseWorkflow(){try{let e=JSON.parse(this.workflowJson||"{}");if(!ze(e))throw new Error("Workflow JSON must be an object.");let t=ze(e.prompt)?e.prompt:e;if(!Object.keys(t).length)throw new Error("Workflow JSON is empty.");if($i(t)>kt)throw new Error("Workflow JSON must be no larger than 200 KB after parsing.");return this.appState.settingsError="",t}catch(e){return this.appState.settingsError=h(e,"The imported ComfyUI API workflow is not valid JSON."),null}}async inspectWorkflow(){let e=this.parseWorkflow();if(!e){this.renderApp();return}this.appState.mediaCatalogBusy=!0,this.inspection=null,this.renderApp();try{let t=await this.client.inspectIdentityWorkflow(e);this.workflowPatch=e,this.inspection=t;let i=t.identity_input_candidates[0];this.binding=i?D(i.node_id,i.input_name):"";let n=t.request_input_candidates?.prompt?.[0];this.promptBinding=n?D(n.node_id,n.input_name):""}catch(t){this.appState.settingsError=h(t,"Unable to check the workflow against ComfyUI.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async saveWorkflow(){let e=this.inspection?.identity_input_candidates.find(r=>D(r.node_id,r.input_name)===this.binding),t=this.inspection?.request_input_candidates?.prompt?.find(r=>D(r.node_id,r.input_name)===this.promptBinding);if(!this.inspection?.provider_compatible||!this.workflowPatch||!e||!t||!this.modelId){this.appState.settingsError="Check a provider-compatible workflow, choose its persona reference and prompt inputs, and select a base model before saving.",this.renderApp();return}let i=this.inspection.request_input_candidates?.checkpoint??[],n=i.length===1?[{node_id:i[0].node_id,input_name:i[0].input_name}]:[];this.appState.mediaCatalogBusy=!0,this.appState.settingsError="",this.renderApp();try{await this.client.createMediaCatalogResource({resource_type:"workflow",kind:"image",name:this.workflowName.trim()||"Identity control workflow",provider_key:"local-image",backend:"comfyui",external_id:`identity-control-${Date.now().toString(36)}`,enabled:!0,priority:60,operations:["generate"],domains:["portrait"],content_tags:[],features:["identity_control"],estimated_vram_mb:0,estimated_load_seconds:0,default_settings:{workflow_patch:this.workflowPatch,identity_image_bindings:[{node_id:e.node_id,input_name:e.input_name}],prompt_bindings:[{node_id:t.node_id,input_name:t.input_name}],...n.length?{checkpoint_bindings:n}:{}},notes:"Imported through guided identity control setup. Provider compatibility checked; live generation not yet tested.",compatible_model_ids:[this.modelId]}),await this.refreshCatalog(),this.dialogs.info("Identity control added",`ComfyUI reported compatible nodes, configured workflow assets, and a reference input. ${n.length?"The graph will load the catalog model you paired it with, rather than the checkpoint it was saved with.":"The graph keeps the checkpoint it was saved with, because it loads more than one; a preset that names a different base model will be refused."} That pairing and generation are not live-tested until the next requested persona image runs.`)}catch(r){this.appState.settingsError=h(r,"Unable to save the identity workflow.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async retryImage(){let e=this.appState.mediaCatalogIdentitySetupIntent;if(e?.capability_request_id){this.appState.mediaCatalogBusy=!0,this.appState.settingsError="",this.renderApp();try{let t=await this.client.retryCapability(e.capability_request_id);this.appState.capabilityRequests=[...this.appState.capabilityRequests.filter(i=>i.id!==e.capability_request_id&&i.id!==t.id),t].sort((i,n)=>i.requested_at-n.requested_at),["queued","running","completed"].includes(t.status)?(this.appState.mediaCatalogIdentitySetupIntent=null,this.dialogs.info("Image retry started","The image is now running under the current settings. Return to the chat to follow its compact progress."),this.finishSetup()):this.appState.settingsError=t.error?.message||t.media_plan?.block?.message||"The image still cannot start. Review the identity control status below."}catch(t){this.appState.settingsError=h(t,"Unable to retry the image.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}}workflowChanged(e){this.workflowJson=e,this.workflowPatch=null,this.inspection=null,this.binding="";let t=Zs(e),i=t!==null&&t>kt?"This workflow is larger than the 200 KB catalog limit. Reduce it before checking the provider.":"Workflow changed. Check it against ComfyUI again before saving.";this.inspectionResultNode&&(this.inspectionResultNode.className="meta",this.inspectionResultNode.textContent=i),this.bindingFieldNode?.remove(),this.bindingFieldNode=null,this.promptBindingFieldNode?.remove(),this.promptBindingFieldNode=null,this.liveTestWarningNode?.remove(),this.liveTestWarningNode=null,this.saveButton&&(this.saveButton.disabled=!0)}};function D(a,e){return`${a}:${e}`}function ze(a){return!!a&&typeof a=="object"&&!Array.isArray(a)}function Zs(a){try{let e=JSON.parse(a||"{}");return ze(e)?$i(ze(e.prompt)?e.prompt:e):null}catch{return null}}function $i(a){return new TextEncoder().encode(JSON.stringify(a)).byteLength}var We=class{constructor(e,t,i,n){this.appState=e;this.client=t;this.renderApp=i;this.refreshCatalog=n}appState;client;renderApp;refreshCatalog;name="";raw="";message="";busy=!1;pending=null;promptChoice="";node(e){let t=e.filter(i=>i.backend==="comfyui");return v([f("Bring your own workflow","Paste a workflow exported from ComfyUI in API format: in ComfyUI, open the Workflow menu and choose Export (API). Ordinary saves, screenshots, and spreadsheets cannot be imported."),m("Workflow name",this.name,i=>{this.name=i},"text",!1,"Your label for this workflow in the catalog."),P("Workflow JSON (API format)",this.raw,i=>{this.raw=i},!1,"The pasted graph is checked against ComfyUI before it is saved; nothing runs during the check."),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.busy?"Checking with ComfyUI\u2026":"Check workflow",disabled:this.busy||!t.length,"data-testid":"workflow-import-submit",onclick:()=>{this.check()}})]),...this.landingSpot(t),t.length?null:s("p",{class:"meta",textContent:"Add a ComfyUI model first \u2014 a workflow needs a model to run on."}),this.message?s("p",{class:"meta","data-testid":"workflow-import-message",textContent:this.message}):null])}landingSpot(e){let t=this.pending;if(!t)return[];let i=t.inspection.request_input_candidates?.prompt??[];return[s("div",{class:"setting-row"},[s("label",{textContent:"Where should what the chat asks for land?"}),s("select",{class:"chip-select","data-testid":"workflow-import-prompt-choice",onchange:n=>{this.promptChoice=n.currentTarget.value,this.renderApp()}},i.map(n=>{let r=`${n.node_id}:${n.input_name}`,d=String(n.current_value??"").slice(0,60);return s("option",{value:r,selected:r===this.promptChoice,textContent:d?`${n.label} \u2014 now "${d}"`:n.label})})),s("p",{class:"meta",textContent:"The saved text shown beside each input is the best clue: pick the one holding the positive prompt."})]),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.busy?"Adding\u2026":`Add "${t.name}"`,disabled:this.busy,"data-testid":"workflow-import-confirm",onclick:()=>{this.create(e)}}),s("button",{class:"pill-btn",textContent:"Cancel",disabled:this.busy,onclick:()=>{this.pending=null,this.message="",this.renderApp()}})])]}async check(){let e=this.name.trim();if(!e){this.message="Give the workflow a name first.",this.renderApp();return}let t;try{if(t=JSON.parse(this.raw),!t||typeof t!="object"||Array.isArray(t))throw new Error("not an object")}catch{this.message="That is not JSON. In ComfyUI use Workflow \u2192 Export (API), then paste the whole file.",this.renderApp();return}this.busy=!0,this.pending=null,this.renderApp();try{let i=await this.client.inspectIdentityWorkflow(t,{},"general"),n=i.request_input_candidates?.prompt??[];if(!i.provider_compatible||!n.length){this.message=i.message||"ComfyUI could not accept this workflow.",this.renderApp();return}let r=n[0];this.pending={name:e,patch:t,inspection:i},this.promptChoice=`${r.node_id}:${r.input_name}`,this.message=n.length>1?`ComfyUI accepted the graph and found ${n.length} text inputs. Choose where the prompt lands.`:"ComfyUI accepted the graph. Confirm to add it."}catch(i){this.message=h(i,"The workflow could not be checked.")}finally{this.busy=!1,this.renderApp()}}async create(e){let t=this.pending;if(!t)return;let[i,n]=this.promptChoice.split(":");if(!i||!n)return;let r=t.inspection.request_input_candidates?.seed?.[0],d=t.inspection.request_input_candidates?.checkpoint?.[0];this.busy=!0,this.renderApp();try{await this.client.createMediaCatalogResource({resource_type:"workflow",kind:"image",name:t.name,provider_key:"local-image",backend:"comfyui",external_id:`imported-${Date.now().toString(36)}`,enabled:!0,priority:50,operations:["generate"],domains:[],content_tags:[],features:[],estimated_vram_mb:0,estimated_load_seconds:0,default_settings:{workflow_patch:t.patch,prompt_bindings:[{node_id:i,input_name:n}],...r?{seed_bindings:[{node_id:r.node_id,input_name:r.input_name}]}:{},...d?{checkpoint_bindings:[{node_id:d.node_id,input_name:d.input_name}]}:{}},notes:"Imported by pasting a ComfyUI API-format export.",compatible_model_ids:d?e.map(c=>c.id):e.filter(c=>c.external_id===String(ea(t.patch)??"")).map(c=>c.id)});let l=t.inspection.request_input_candidates?.prompt?.find(c=>`${c.node_id}:${c.input_name}`===this.promptChoice);this.message=`"${t.name}" was added. The prompt lands on ${l?.label??"the chosen input"}`+(d?", and presets will run their own model through it.":"."),this.name="",this.raw="",this.pending=null,await this.refreshCatalog()}catch(l){this.message=h(l,"The workflow could not be added.")}finally{this.busy=!1,this.renderApp()}}};function ea(a){for(let e of Object.values(a)){if(!e||typeof e!="object")continue;let i=e.inputs?.ckpt_name;if(typeof i=="string"&&i)return i}return null}var ta=["natural_language","booru","hybrid"],ia=["prefix","suffix"];function sa(a){return a==="natural_language"?"Natural language":a==="booru"?"Booru tags":"Hybrid"}var je=class{constructor(e,t,i){this.appState=e;this.client=t;this.renderApp=i}appState;client;renderApp;presets=[];signals=[];pendingExport=null;pendingImport=null;openIds=new Set;dirtyIds=new Set;busy=!1;async refresh(){this.busy=!0;try{this.presets=(await this.client.mediaPresets()).items,this.signals=(await this.client.presetSignals()).items}catch(e){this.appState.settingsError=h(e,"Unable to load generation presets.")}finally{this.busy=!1,this.renderApp()}}async clearSignals(e){try{await this.client.clearPresetSignals(e),this.signals=this.signals.filter(t=>t.preset_id!==e)}catch(t){this.appState.settingsError=h(t,"Unable to reset those counts.")}this.renderApp()}async prepareExport(e){try{this.pendingExport=await this.client.exportPreset(e.id)}catch(t){this.appState.settingsError=h(t,"Unable to prepare that export.")}this.renderApp()}saveExport(){let e=this.pendingExport;if(!e)return;let t=new Blob([JSON.stringify(e.bundle,null,2)],{type:"application/json"}),i=URL.createObjectURL(t),n=document.createElement("a");n.href=i,n.download=e.filename,n.click(),URL.revokeObjectURL(i),this.pendingExport=null,this.renderApp()}exportPreviewCard(){let e=this.pendingExport;return e?v([f(`What will be in ${e.filename}`,"Everything that leaves, field by field. Nothing is written until you save it."),s("ul",{class:"settings-list","data-testid":"export-preview"},e.preview.map(t=>s("li",{class:"settings-list-row"},[s("span",{class:"settings-list-name",textContent:t.label}),s("span",{class:"settings-list-detail",textContent:t.value})]))),e.requirements.length?s("div",{},[s("p",{class:"meta",textContent:"This recipe also needs things a file cannot carry. They are named in it so whoever imports it knows:"}),s("ul",{class:"settings-list"},e.requirements.map(t=>s("li",{class:"settings-list-row"},[s("span",{class:"settings-list-detail",textContent:t})])))]):null,s("p",{class:"meta",textContent:`Deliberately not included: ${e.withheld.join("; ")}.`}),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Save the file","data-testid":"export-save",onclick:()=>this.saveExport()}),s("button",{class:"pill-btn",textContent:"Cancel",onclick:()=>{this.pendingExport=null,this.renderApp()}})])]):null}async chooseImportFile(e){if(e){try{let t=JSON.parse(await e.text());this.pendingImport={bundle:t,preview:await this.client.previewPresetImport(t)}}catch(t){this.pendingImport=null,this.appState.settingsError=h(t,"That file could not be read as a preset bundle.")}this.renderApp()}}async confirmImport(){let e=this.pendingImport;if(e)try{await this.client.importPresets(e.bundle),this.pendingImport=null,await this.refresh()}catch(t){this.appState.settingsError=h(t,"Nothing was imported."),this.renderApp()}}importCard(){let e=this.pendingImport;return v([f("Import a preset file","A file somebody exported from their own installation. Choosing one shows what it would do here; nothing is installed until you confirm."),s("input",{type:"file",accept:"application/json,.json","data-testid":"import-file",onchange:t=>{let i=t.currentTarget;this.chooseImportFile(i.files?.[0]??null)}}),...e?[...e.preview.warnings.map(t=>s("p",{class:"meta warning",textContent:t})),s("ul",{class:"settings-list","data-testid":"import-preview"},e.preview.presets.map(t=>s("li",{class:"settings-list-row"},[s("span",{class:"settings-list-name",textContent:t.name}),s("span",{class:"settings-list-detail",textContent:t.installable?t.requirements.length?`Will install. Also needs: ${t.requirements.join("; ")}`:"Will install":t.blockers.join("; ")})]))),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:e.preview.installable?"Import these presets":"Cannot import this file",disabled:!e.preview.installable,"data-testid":"import-confirm",onclick:()=>{this.confirmImport()}}),s("button",{class:"pill-btn",textContent:"Cancel",onclick:()=>{this.pendingImport=null,this.renderApp()}})])]:[]])}signalsCard(){return v([f("What has happened to the pictures","Counted when you keep a picture, when one is sent again, or when you remove one. Making a picture is not counted, because the platform chose the preset. These counts can move a preset up the order; they can never make one eligible that does not already fit the request."),this.signals.length?s("ul",{class:"settings-list","data-testid":"preset-signals"},this.signals.map(e=>s("li",{class:"settings-list-row"},[s("span",{class:"settings-list-name",textContent:e.preset_name}),s("span",{class:"settings-list-detail",textContent:e.summary}),s("span",{class:"settings-list-detail",textContent:`Score ${e.weight>0?"+":""}${e.weight}`}),s("button",{class:"pill-btn",textContent:"Reset",title:"Forget the counts for this preset",onclick:()=>{this.clearSignals(e.preset_id)}})]))):s("p",{class:"settings-empty",textContent:"Nothing counted yet. Keep, reuse, or remove a picture and it will appear here."})])}node(){return[v([f(`Generation presets (${this.presets.length})`,"A preset is a tested recipe: which model, which workflow, which settings, and how its prompts are written. Planning chooses between presets rather than assembling one."),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:this.busy?"Loading\u2026":"Refresh presets",disabled:this.busy,"data-testid":"presets-refresh",onclick:()=>{this.refresh()}})]),this.presets.length?null:s("p",{class:"meta",textContent:"No presets yet. Enable an image model, or install a starter preset below."})]),...this.presets.map(e=>this.editor(e)),this.exportPreviewCard(),this.importCard(),this.signalsCard()].filter(e=>e!==null)}editor(e){let t=e.definition??{},i=t.prompt_dialect??{},n=t.sampler??{},r=(this.appState.mediaCatalog?.resources??[]).filter(l=>l.resource_type==="model"&&l.kind===e.kind),d=e.enabled?"Enabled":"Disabled";return j(e.name,e.routing_card||"No routing card yet, so this can only be chosen by tags and priority.",d,[m("Name",e.name,l=>{e.name=l,this.markDirty(e)}),P("When should this be used?",e.routing_card,l=>{e.routing_card=l,this.markDirty(e)},!1,"Plain language. This is what routing reads when deciding between presets, so describe the pictures it is for."),M("Enabled",e.enabled,l=>{e.enabled=l,this.markDirty(e)}),m("Priority",String(e.priority),l=>{e.priority=Number(l)||0,this.markDirty(e)},"number",!1,"Breaks ties when several presets fit equally well."),r.length?w("Base model",String(t.base_model_resource_id??""),r.map(l=>l.id),l=>{t.base_model_resource_id=l,this.markDirty(e)},void 0,l=>r.find(c=>c.id===l)?.name??l,!1):null,s("h4",{class:"settings-subheading",textContent:"Prompt dialect"}),w("Prompt style",String(i.style??"natural_language"),ta,l=>{i.style=l,this.markDirty(e)},void 0,sa,!1,"How this model wants prompts written. Booru means comma-separated tags; natural language means a sentence."),m("Prompt prefix",String(i.prefix??""),l=>{i.prefix=l,this.markDirty(e)},"text",!1,"Put score or quality tags here if this model family expects them. Leave empty when it does not."),m("Prompt suffix",String(i.suffix??""),l=>{i.suffix=l,this.markDirty(e)}),M("This model accepts a negative prompt",i.supports_negative!==!1,l=>{i.supports_negative=l,this.markDirty(e)}),i.supports_negative!==!1?P("Negative prompt",String(i.negative_prompt??""),l=>{i.negative_prompt=l,this.markDirty(e)},!1,"The safety negative applied when adult output is off is separate from this and is added by the platform."):s("p",{class:"meta",textContent:"No negative prompt is sent, and the platform safety negative cannot be carried either."}),w("LoRA trigger words go",String(i.trigger_placement??"suffix"),ia,l=>{i.trigger_placement=l,this.markDirty(e)},void 0,l=>l==="prefix"?"Before the description":"After the description",!1),s("h4",{class:"settings-subheading",textContent:"Sampling"}),m("Steps",String(n.steps??""),l=>{n.steps=Number(l)||void 0,this.markDirty(e)},"number"),m("Guidance (CFG)",String(n.cfg_scale??""),l=>{n.cfg_scale=Number(l)||void 0,this.markDirty(e)},"number"),m("Sampler",String(n.sampler_name??""),l=>{n.sampler_name=l,this.markDirty(e)}),m("Scheduler",String(n.scheduler??""),l=>{n.scheduler=l,this.markDirty(e)}),m("Dimensions",(t.dimensions??[]).join(", "),l=>{t.dimensions=l.split(",").map(c=>c.trim()).filter(Boolean),this.markDirty(e)},"text",!1,"Comma separated, widest first. The first is used unless a request needs another."),C("Raw definition","Everything above, plus slots and stages.",[P("Definition JSON",JSON.stringify(t,null,2),l=>{try{let c=JSON.parse(l);c&&typeof c=="object"&&(e.definition=c,this.markDirty(e))}catch{}})]),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.dirtyIds.has(e.id)?"Save preset":"Saved",disabled:!this.dirtyIds.has(e.id)||this.busy,"data-testid":`preset-save-${e.id}`,onclick:()=>{this.save(e)}}),s("button",{class:"pill-btn",textContent:"Export",title:"See what a shareable file would contain, before writing one","data-testid":`preset-export-${e.id}`,onclick:()=>{this.prepareExport(e)}}),s("button",{class:"pill-btn danger",textContent:"Delete","data-testid":`preset-delete-${e.id}`,onclick:()=>{this.remove(e)}})])],{open:this.openIds.has(e.id),onToggle:l=>{l?this.openIds.add(e.id):this.openIds.delete(e.id)},testId:`preset-${e.id}`})}markDirty(e){this.dirtyIds.add(e.id)}async save(e){this.busy=!0,this.appState.settingsError="",this.renderApp();try{await this.client.updateMediaPreset(e.id,{name:e.name,kind:e.kind,enabled:e.enabled,priority:e.priority,routing_card:e.routing_card,operations:e.operations,domains:e.domains,content_tags:e.content_tags,features:e.features,definition:e.definition,estimated_vram_mb:e.estimated_vram_mb,notes:e.notes}),this.dirtyIds.delete(e.id),await this.refresh()}catch(t){this.appState.settingsError=h(t,"Unable to save that preset.")}finally{this.busy=!1,this.renderApp()}}async remove(e){this.busy=!0,this.renderApp();try{await this.client.deleteMediaPreset(e.id),await this.refresh()}catch(t){this.appState.settingsError=h(t,"Unable to delete that preset.")}finally{this.busy=!1,this.renderApp()}}};var Je=class{constructor(e,t,i){this.appState=e;this.client=t;this.renderApp=i}appState;client;renderApp;text="";node(){let e=this.appState.routingPreview;return v([f("Routing tester","Paste a message and see which presets were offered, which one routing chose, and why. This is a diagnostic and is expected to be removed once routing is stable."),C("Test routing","Runs the real shortlist, task model, and planner for one message. Nothing is generated.",[P("Message to test",this.text,t=>{this.text=t},!1,"The same shortlist, task model, and planner a real turn would use."),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:this.appState.mediaCatalogBusy?"Testing\u2026":"Test routing",disabled:this.appState.mediaCatalogBusy||!this.text.trim(),"data-testid":"routing-tester-run",onclick:()=>{this.run()}})]),e?this.result(e):null],{testId:"routing-tester"})])}result(e){let t=e.plan?.explanation?.preset;return s("div",{class:"routing-preview","data-testid":"routing-tester-result"},[s("p",{class:"meta",textContent:`Presets offered: ${e.shortlist.length}`}),s("ul",{class:"routing-shortlist"},e.shortlist.map(i=>s("li",{},[s("span",{class:"routing-shortlist-title",textContent:i.title}),s("span",{class:"meta",textContent:i.routing_card||"No routing card, so this can only be chosen by tags and priority."})]))),e.task_model.error?s("p",{class:"settings-warning",textContent:e.task_model.error}):null,!e.requested&&!e.task_model.error?s("p",{textContent:"No image would be requested for this message."}):null,t?s("div",{class:"routing-outcome"},[s("p",{textContent:`Chosen: ${t.name}`}),s("p",{class:"meta",textContent:`${t.source==="task_model"?"Task model chose it":"Deterministic score chose it"} \u2014 ${t.reason}`})]):null,e.plan&&e.plan.status!=="ready"?s("p",{class:"settings-warning",textContent:e.plan.block?.message||"No preset could serve this request."}):null,...(e.plan?.explanation?.warnings??[]).map(i=>s("p",{class:"settings-warning",textContent:i}))])}async run(){this.appState.mediaCatalogBusy=!0,this.appState.settingsError="",this.renderApp();try{this.appState.routingPreview=await this.client.previewMediaRouting(this.text)}catch(e){this.appState.settingsError=h(e,"Unable to test routing.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}};var Ge=class{constructor(e,t,i,n){this.appState=e;this.client=t;this.renderApp=i;this.afterInstall=n}appState;client;renderApp;afterInstall;starters=null;busy=!1;summary="";node(){return v([f("Starter presets","Published settings for common model families: sampler, steps, guidance, dimensions, and prompt style. They are a starting point, not a measurement \u2014 nothing here has been tested on this deployment."),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:this.busy?"Checking\u2026":"Check starter presets",disabled:this.busy,"data-testid":"starter-presets-check",onclick:()=>{this.check()}}),this.starters?.some(e=>e.installable)?s("button",{class:"pill-btn",textContent:this.busy?"Installing\u2026":"Install available starters",disabled:this.busy,"data-testid":"starter-presets-install",onclick:()=>{this.install()}}):null]),this.summary?s("p",{class:"meta","data-testid":"starter-presets-summary",textContent:this.summary}):null,this.starters?this.list(this.starters):null])}list(e){return s("ul",{class:"routing-shortlist","data-testid":"starter-presets-list"},e.map(t=>s("li",{},[s("span",{class:"routing-shortlist-title",textContent:t.name}),s("span",{class:"meta",textContent:t.routing_card}),t.already_present?s("span",{class:"meta",textContent:"Already in your presets \u2014 it will not be overwritten."}):t.missing_assets.length?s("span",{class:"meta",textContent:`Needs a model this catalog does not have: ${t.missing_assets.join(", ")}`}):s("span",{class:"meta",textContent:"Ready to install."})])))}async check(){this.busy=!0,this.renderApp();try{this.starters=(await this.client.starterPresets()).presets,this.summary=`${this.starters.filter(e=>e.installable).length} of ${this.starters.length} can be installed now.`}catch(e){this.appState.settingsError=h(e,"Unable to read the starter presets.")}finally{this.busy=!1,this.renderApp()}}async install(){this.busy=!0,this.renderApp();try{let e=await this.client.installStarterPresets();this.summary=e.installed.length?`Installed ${e.installed.map(t=>t.name).join(", ")}.`:"Nothing was installed.",e.skipped.length&&(this.summary+=` Skipped: ${e.skipped.map(t=>`${t.name} (${t.reason})`).join("; ")}`),this.starters=(await this.client.starterPresets()).presets,await this.afterInstall()}catch(e){this.appState.settingsError=h(e,"Unable to install the starter presets.")}finally{this.busy=!1,this.renderApp()}}};var Xe=class{constructor(e,t,i,n,r=()=>{}){this.renderApp=e;this.appState=t;this.client=i;this.dialogs=n;this.finishIdentitySetup=r;this.identitySetup=new Fe(e,t,i,n,r,()=>this.refresh()),this.routingTester=new Je(t,i,e),this.presets=new je(t,i,e),this.starterPresets=new Ge(t,i,e,()=>this.refresh()),this.modelsView=new De(t,i,e,()=>this.refresh()),this.importView=new We(t,i,e,()=>this.refresh())}renderApp;appState;client;dialogs;finishIdentitySetup;async refresh(){let e=this.settingsVersion,t=new Map(this.resourceVersions);this.appState.mediaCatalogBusy=!0;try{let i=await this.client.mediaCatalog();this.presets.refresh(),this.appState.mediaCatalog=this.mergeSnapshot(i,e,t)}catch(i){this.appState.settingsError=h(i,"Unable to load the media catalog.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}settingsDirty=!1;operatorToolsOpen=!1;settingsVersion=0;dirtyResourceIds=new Set;resourceVersions=new Map;openResourceIds=new Set;identitySetup;routingTester;presets;starterPresets;modelsView;importView;requirements={kind:"image",operation:"generate",domains:[],content_tags:[],required_features:[]};openIdentitySetup(){this.identitySetup.open()}nodes(){let e=this.appState.mediaCatalog;if(!e)return[E("Teach the media coordinator what is available","The catalog is currently unavailable, so Nice Assistant cannot inspect or change coordinated media resources."),s("div",{class:"settings-empty-state",textContent:"No media catalog was returned. Retry the request, then check server logs if it remains unavailable."}),s("button",{class:"pill-btn",textContent:"Retry catalog",onclick:()=>{this.refresh()}})];let t=e.resources.filter(d=>d.enabled),i=t.filter(d=>d.resource_type==="model"),n=t.filter(d=>d.resource_type==="workflow"),r=t.filter(d=>d.resource_type==="lora");return[E("How pictures get made","A chat picks one of your presets. A preset pairs a model (the look) with a workflow (the method), and the note on each preset is how the chat knows when to pick it. More presets means more variety."),s("div",{class:"settings-readiness-list"},[x("Models",`${i.length} enabled`,i.length>1?"ready":"attention",i.length===0?"Nothing can be generated until a model is enabled. Find models below.":i.length===1?"One model means every picture shares its look. Find more below.":"Each enabled model gives its recipes a different look."),x("Workflows",`${n.length} enabled`,n.length?"ready":"off","A workflow is the method: plain generation, identity conditioning, face swap, correction."),x("LoRAs",`${r.length} enabled`,r.length?"ready":"off","LoRAs adjust a compatible model and join a recipe when their metadata matches the request.")]),this.modelsView.node(i),v([f("Workflows \u2014 the method","Start from a shipped, known-good workflow below, or paste your own export. Identity workflows keep a persona recognisable; the guided setup walks that end to end.")]),this.identitySetup.node(),this.importView.node(i),...this.presets.node(),C("Operator tools","The machinery behind the sections above: raw inventory, manual adds, starter bundles, limits, and planner diagnostics.",[v([f(`Inventory (${e.resources.length})`,"Every cataloged part. Open one to edit compatibility, strengths, estimates, or the provider payload \u2014 or to delete duplicate copies."),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Add model manually",onclick:()=>{this.addResource("model")}}),s("button",{class:"pill-btn",textContent:"Add LoRA",onclick:()=>{this.addResource("lora")}}),s("button",{class:"pill-btn",textContent:"Add workflow",onclick:()=>{this.addResource("workflow")}}),s("button",{class:"pill-btn",textContent:"Refresh catalog",onclick:()=>{this.refresh()}})]),...e.resources.length?e.resources.map(d=>this.resourceCard(d)):[s("div",{class:"settings-empty-state",textContent:"Nothing is cataloged yet. Find models on ComfyUI above to begin."})]]),this.policyCard(),this.starterPresets.node(),this.routingTester.node(),this.planPreview()],{testId:"catalog-inventory",open:this.operatorToolsOpen,onToggle:d=>{this.operatorToolsOpen=d}})]}policyCard(){let e=this.appState.mediaCatalog;return e?v([f("Coordinator limits","Planning limits prevent a single request from selecting an unbounded estimated VRAM load or LoRA chain."),s("div",{class:"settings-grid"},[m("Shared VRAM budget (MB)",String(e.settings.vram_budget_mb),t=>{e.settings.vram_budget_mb=Ke(t,0,131072,e.settings.vram_budget_mb),this.markSettingsDirty()},"number",!1,"Set 0 to disable the catalog estimate limit. This does not disable live GPU admission checks."),m("Maximum selected LoRAs",String(e.settings.max_loras),t=>{e.settings.max_loras=Ke(t,0,8,e.settings.max_loras),this.markSettingsDirty()},"number",!1,"Caps how many compatible LoRAs one coordinated plan may select.")]),s("button",{class:"send-btn",textContent:this.appState.mediaCatalogBusy?"Saving\u2026":"Save coordinator limits",disabled:this.appState.mediaCatalogBusy,"data-testid":"media-catalog-save-policy",onclick:()=>{this.saveSettings()}})]):s("div")}resourceCard(e){let t=(this.appState.mediaCatalog?.resources??[]).filter(c=>c.resource_type==="model"&&c.kind===e.kind&&c.provider_key===e.provider_key&&c.backend===e.backend&&c.id!==e.id),i=e.kind==="video"?["openai-video"]:e.resource_type==="model"?["local-image","openai-image"]:["local-image"],n=e.provider_key==="local-image"?e.resource_type==="workflow"?["comfyui"]:["automatic1111","comfyui"]:["openai"],r=t.filter(c=>e.compatible_model_ids.includes(c.id)),d=e.enabled?"Enabled":"Draft",l=`${k(e.resource_type)} \xB7 ${e.backend} \xB7 revision ${e.revision}`;return j(e.name||"Unnamed resource",l,d,[M("Enabled for planning",e.enabled,c=>{e.enabled=c},"Disabled resources remain editable drafts and are never selected for new plans."),s("div",{class:"settings-grid"},[m("Name",e.name,c=>{e.name=c},"text",!1,"Human-readable name shown in plans and operator pickers."),w("Resource type",e.resource_type,["model","lora","workflow"],c=>{e.resource_type=c},void 0,k,!1,"Models generate; LoRAs specialize a compatible model; workflows declare an executable ComfyUI operation."),w("Media kind",e.kind,["image","video"],c=>{e.kind=c},void 0,k,!1,"The output family this resource can produce or modify."),w("Provider adapter",e.provider_key,i,c=>{e.provider_key=c},void 0,k,!1,"The Nice Assistant provider contract used to execute this resource."),w("Backend",e.backend,n,c=>{e.backend=c},void 0,k,!1,"The actual service that owns the model, LoRA, or workflow."),m(e.resource_type==="workflow"?"Catalog workflow ID":"Provider resource ID or filename",e.external_id,c=>{e.external_id=c},"text",!1,e.resource_type==="workflow"?"An operator-facing catalog identifier. The executable workflow patch is stored in Advanced resource metadata.":"Exact provider identifier or checkpoint filename. Selection still depends on explicit metadata, not this name.")]),e.resource_type!=="model"?s("div",{class:"compatibility-list"},[f("Compatible base models","Only checked models can be paired with this resource. Compatibility is exact and same-provider/backend.","strong"),t.length?s("div",{class:"chips"},t.map(c=>s("label",{class:"checkbox-row"},[s("input",{type:"checkbox",checked:e.compatible_model_ids.includes(c.id),onchange:p=>{let g=p.currentTarget.checked;e.compatible_model_ids=g?[...new Set([...e.compatible_model_ids,c.id])]:e.compatible_model_ids.filter(u=>u!==c.id)}}),c.name]))):s("div",{class:"settings-empty-state",textContent:"No same-provider, same-backend base model is available."}),r.length?s("span",{class:"meta",textContent:`${r.length} compatible model${r.length===1?"":"s"} selected`}):null]):null,C("Selection metadata and provider payload","Expert metadata used by deterministic planning and provider execution.",[s("div",{class:"settings-grid"},[m("Priority (0\u2013100)",String(e.priority),c=>{e.priority=Ke(c,0,100,e.priority)},"number",!1,"Breaks otherwise equal compatible choices; higher numbers are preferred."),m("Estimated VRAM (MB)",String(e.estimated_vram_mb),c=>{e.estimated_vram_mb=Ke(c,0,131072,e.estimated_vram_mb)},"number",!1,"Operator estimate used by planning. Set 0 when unknown rather than inventing capacity."),m("Estimated load seconds",String(e.estimated_load_seconds),c=>{e.estimated_load_seconds=aa(c,0,3600,e.estimated_load_seconds)},"number",!1,"Expected cold-load time used for explanation and future scheduling decisions."),m("Operations",e.operations.join(", "),c=>{e.operations=Q(c)},"text",!1,"Comma-separated executable operations such as generate, inpaint, outpaint, or image_to_image."),m("Domain strengths",e.domains.join(", "),c=>{e.domains=Q(c)},"text",!1,"Comma-separated subject strengths such as fantasy, portrait, or photorealism."),m("Content strengths",e.content_tags.join(", "),c=>{e.content_tags=Q(c)},"text",!1,"Comma-separated content categories that this resource is intentionally allowed and suited to handle."),m("Features",e.features.join(", "),c=>{e.features=Q(c)},"text",!1,"Hard capability flags such as text_to_image or identity_control.")]),P("Default settings JSON",JSON.stringify(e.default_settings,null,2),c=>{try{let p=JSON.parse(c||"{}");p&&typeof p=="object"&&!Array.isArray(p)&&(e.default_settings=p),this.appState.settingsError=""}catch{this.appState.settingsError=`Default settings for ${e.name||"resource"} are not valid JSON.`}},!1,"Provider-specific defaults. Invalid or unsupported values can block execution."),e.resource_type==="workflow"?s("div",{class:"settings-warning",textContent:"Workflows stay safest as disabled drafts until their inline patch, exact bindings, compatible base model, and declared features have been reviewed."}):null,P("Operator notes",e.notes,c=>{e.notes=c},!1,"Private operational context for future catalog maintenance.")],{testId:`media-resource-advanced-${e.id}`}),s("div",{class:"operator-actions"},[s("button",{class:"send-btn",textContent:this.appState.mediaCatalogBusy?"Saving\u2026":"Save resource",disabled:this.appState.mediaCatalogBusy,"data-testid":`media-resource-save-${e.id}`,onclick:()=>{this.saveResource(e)}}),s("button",{class:"pill-btn danger",textContent:"Delete resource",disabled:this.appState.mediaCatalogBusy,onclick:()=>{this.deleteResource(e)}})])],{open:this.openResourceIds.has(e.id),onToggle:c=>c?this.openResourceIds.add(e.id):this.openResourceIds.delete(e.id),testId:`media-resource-${e.id}`,className:"media-resource-card",statusClass:e.enabled?"ok":"idle",onInput:()=>this.markResourceDirty(e.id),onChange:()=>this.markResourceDirty(e.id)})}planPreview(){let e=this.appState.mediaPlanPreview;return v([f("Preview coordinator selection","Tests deterministic metadata selection without storing or sending prompt content. This does not generate media."),s("div",{class:"settings-grid"},[w("Media kind",this.requirements.kind,["image","video"],t=>{this.requirements.kind=t},void 0,k,!1,"Limits selection to image or video resources."),w("Operation",this.requirements.operation,["generate","inpaint","outpaint","image_to_image"],t=>{this.requirements.operation=t},void 0,k,!1,"Hard operation requirement. Editing operations also require exact protected source/mask bindings at execution time."),m("Preferred domains",this.requirements.domains.join(", "),t=>{this.requirements.domains=Q(t)},"text",!1,"Soft semantic strengths such as fantasy, portrait, or photorealism."),m("Required content tags",this.requirements.content_tags.join(", "),t=>{this.requirements.content_tags=Q(t)},"text",!1,"Content categories the selected resources must explicitly support."),m("Required features",this.requirements.required_features.join(", "),t=>{this.requirements.required_features=Q(t)},"text",!1,"Hard features such as identity_control.")]),s("button",{class:"pill-btn",textContent:this.appState.mediaCatalogBusy?"Planning\u2026":"Preview selection",disabled:this.appState.mediaCatalogBusy,"data-testid":"media-plan-preview",onclick:()=>{this.previewPlan()}}),e?s("div",{class:`media-plan-preview plan-${e.status}`},[s("strong",{textContent:`${k(e.status)} \xB7 ${e.estimated_vram_mb||"unknown"} MB estimated VRAM`}),s("p",{textContent:e.block?.message||e.explanation.summary}),e.selected_resources.length?s("ul",{},e.selected_resources.map(t=>s("li",{textContent:`${k(t.resource_type)}: ${t.name}`}))):null,e.identity_conditioning?s("div",{class:"meta",textContent:e.identity_conditioning.status==="ready"?"Persona reference conditioning is ready; configured validation runs after generation and may trigger bounded correction attempts.":"A real persona chat and active reviewed reference are required before this identity workflow can run."}):null,...e.explanation.warnings.map(t=>s("div",{class:"meta",textContent:t}))]):s("div",{class:"meta",textContent:"No preview has been run with the current requirements."})])}markSettingsDirty(){this.settingsDirty=!0,this.settingsVersion+=1}markResourceDirty(e){this.dirtyResourceIds.add(e),this.resourceVersions.set(e,(this.resourceVersions.get(e)??0)+1)}mergeSnapshot(e,t=this.settingsVersion,i=new Map(this.resourceVersions)){let n=this.appState.mediaCatalog;if(!n)return e;let r=this.settingsDirty||this.settingsVersion!==t,d=new Map(n.resources.map(p=>[p.id,p])),l=new Set(e.resources.map(p=>p.id)),c=e.resources.map(p=>{let g=d.get(p.id),u=(this.resourceVersions.get(p.id)??0)!==(i.get(p.id)??0);return g&&(this.dirtyResourceIds.has(p.id)||u)?g:p});return c.push(...n.resources.filter(p=>this.dirtyResourceIds.has(p.id)&&!l.has(p.id))),{...e,settings:r?n.settings:e.settings,resources:c}}async saveSettings(){let e=this.appState.mediaCatalog;if(e){this.appState.mediaCatalogBusy=!0,this.appState.settingsError="",this.renderApp();try{e.settings=await this.client.updateMediaCatalogSettings(e.settings),this.settingsVersion+=1,this.settingsDirty=!1}catch(t){this.appState.settingsError=h(t,"Unable to save the media catalog policy.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}}async addResource(e){let t=this.appState.mediaCatalog;if(!t)return;let i=await this.dialogs.prompt(`Add ${e}`,"Choose the operator-facing resource name.");if(!i?.trim())return;let n=await this.dialogs.prompt(`Add ${e}`,e==="workflow"?"Choose a catalog workflow ID. The executable patch is reviewed after creation.":"Enter the exact provider model or resource ID.",e==="model"?"provider-default":"");if(!n?.trim())return;let r="automatic1111",d=[];if(e!=="model"){let l=t.resources.filter(p=>p.resource_type==="model"&&p.kind==="image"&&p.provider_key==="local-image"&&(e!=="workflow"||p.backend==="comfyui"));if(!l.length){this.dialogs.info("Base model required",e==="workflow"?"Add a ComfyUI base model before adding a workflow.":"Add a local image base model before adding a LoRA.");return}let c=l[0];if(!c)return;r=e==="workflow"?"comfyui":c.backend,d=[l.find(p=>p.backend===r)?.id??c.id]}this.appState.mediaCatalogBusy=!0,this.renderApp();try{await this.client.createMediaCatalogResource({resource_type:e,kind:"image",name:i.trim(),provider_key:"local-image",backend:r,external_id:n.trim(),enabled:e!=="workflow",priority:50,operations:["generate"],domains:[],content_tags:e==="model"?["general"]:[],features:e==="model"?["text_to_image"]:[],estimated_vram_mb:0,estimated_load_seconds:0,default_settings:e==="lora"?{weight:1,trigger_words:[]}:e==="workflow"?{workflow_patch:{}}:{},notes:"",compatible_model_ids:d}),this.appState.mediaCatalog=this.mergeSnapshot(await this.client.mediaCatalog())}catch(l){this.appState.settingsError=h(l,`Unable to add ${e}.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async saveResource(e){this.appState.mediaCatalogBusy=!0,this.appState.settingsError="",this.renderApp();try{let t=await this.client.updateMediaCatalogResource(e);this.appState.mediaCatalog&&(this.appState.mediaCatalog.resources=this.appState.mediaCatalog.resources.map(i=>i.id===t.id?t:i),this.resourceVersions.set(t.id,(this.resourceVersions.get(t.id)??0)+1),this.dirtyResourceIds.delete(t.id),this.appState.mediaCatalog.vocabulary=(await this.client.mediaCatalog()).vocabulary)}catch(t){this.appState.settingsError=h(t,`Unable to save ${e.name}.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}async deleteResource(e){if(await this.dialogs.confirm("Delete media resource",`Delete ${e.name}? Existing plans remain auditable but cannot run.`,"Delete")){this.appState.mediaCatalogBusy=!0,this.renderApp();try{await this.client.deleteMediaCatalogResource(e.id),this.dirtyResourceIds.delete(e.id),this.resourceVersions.set(e.id,(this.resourceVersions.get(e.id)??0)+1),this.openResourceIds.delete(e.id),this.appState.mediaCatalog=this.mergeSnapshot(await this.client.mediaCatalog())}catch(t){this.appState.settingsError=h(t,`Unable to delete ${e.name}.`)}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}}async previewPlan(){this.appState.mediaCatalogBusy=!0,this.appState.settingsError="",this.renderApp();try{this.appState.mediaPlanPreview=await this.client.previewMediaPlan(this.requirements)}catch(e){this.appState.settingsError=h(e,"Unable to preview media selection.")}finally{this.appState.mediaCatalogBusy=!1,this.renderApp()}}};function Q(a){return[...new Set(a.split(",").map(e=>e.trim().toLowerCase()).filter(Boolean))]}function Ke(a,e,t,i){let n=Number.parseInt(a,10);return Number.isFinite(n)?Math.max(e,Math.min(t,n)):i}function aa(a,e,t,i){let n=Number(a);return Number.isFinite(n)?Math.max(e,Math.min(t,n)):i}var na=[["temperature","Temperature"],["top_p","Top P"],["num_predict","Maximum output tokens"],["context_window_tokens","Context window tokens"],["presence_penalty","Presence penalty"],["frequency_penalty","Frequency penalty"]],Ye=class{constructor(e,t,i,n){this.appState=e;this.change=t;this.renderApp=i;this.providerControl=n}appState;change;renderApp;providerControl;selectedOverrideModel="";nodes(e){let t=e.global_default_model||this.appState.models[0]||"",i=Z(e,t),n=this.appState.models.length;return[E("Set the default conversation behavior","These values apply to conversations unless a persona, chat, or per-model customization is more specific."),s("div",{class:"settings-readiness-list"},[x("Default model",t||"Automatic; the provider chooses from installed models",t||n?"ready":"attention","A persona or chat may still select a different model."),x("Installed models",n?`${n} reported by Ollama`:"No installed models reported",n?"ready":"attention","This list comes from Ollama and is refreshed when Nice Assistant loads provider data."),x("Effective context window",`${i.context_window_tokens} tokens for ${t||"the automatic model"}`,"ready","Nice Assistant budgets instructions, history, memories, output, and safety room inside this limit."),x("Per-model customizations",`${Object.keys(e.model_overrides).length} saved`,Object.keys(e.model_overrides).length?"ready":"off","A customization changes only the named model and takes precedence over the account defaults below.")]),v([w("Default model",e.global_default_model,["",...this.appState.models],r=>this.change("global_default_model",r),void 0,r=>r||"Automatic",!0,"Used when neither the persona nor chat chooses a different model."),m("Temperature",e.models_temperature,r=>this.change("models_temperature",r),"number",!0,"Higher values make replies less predictable; 0.7 is a balanced default."),m("Maximum output tokens",e.models_num_predict,r=>this.change("models_num_predict",r),"number",!0,"Reserves this many tokens for the reply inside the context window."),m("Context window tokens",e.models_context_window_tokens,r=>this.change("models_context_window_tokens",r),"number",!0,"Must not exceed what the selected model and Ollama configuration can actually support.")]),C("Sampling and repetition controls","Optional generation controls for experienced model operators.",[m("Top P",e.models_top_p,r=>this.change("models_top_p",r),"number",!0,"Limits token choices by cumulative probability."),m("Presence penalty",e.models_presence_penalty,r=>this.change("models_presence_penalty",r),"number",!0,"Positive values encourage introducing topics not already present."),m("Frequency penalty",e.models_frequency_penalty,r=>this.change("models_frequency_penalty",r),"number",!0,"Positive values discourage repeatedly using the same tokens.")],{testId:"models-advanced-settings"}),this.overrideEditor(e),v([f("Ollama connection","Checks whether Ollama is reachable and reports models without changing saved settings."),this.providerControl()])]}overrideEditor(e){let t=this.appState.models;(!this.selectedOverrideModel||!t.includes(this.selectedOverrideModel))&&(this.selectedOverrideModel=e.global_default_model||t[0]||"");let i=this.selectedOverrideModel,n=i?e.model_overrides[i]:void 0,r=i?Z(e,i):null,d=[w("Model to customize",i,t,l=>{this.selectedOverrideModel=l,this.renderApp()},"model-override-model",l=>l,!0,"Only installed models are listed. The customization is stored by exact model name.")];return i?n?d.push(s("div",{class:"settings-grid"},na.map(([l,c])=>m(c,String(n[l]??r?.[l]??""),p=>this.updateOverride(e,i,l,p),"number",!1,`Overrides the account ${c.toLowerCase()} only when ${i} is selected.`))),s("button",{class:"pill-btn danger",textContent:"Use account defaults for this model",onclick:()=>this.removeOverride(e,i)})):d.push(s("div",{class:"meta",textContent:`Using account defaults: ${r?.context_window_tokens??0} context tokens, temperature ${r?.temperature??0}.`}),s("button",{class:"pill-btn",textContent:`Customize ${i}`,onclick:()=>this.createOverride(e,i)})):d.push(s("div",{class:"settings-empty-state",textContent:"Install or expose an Ollama model before creating a model-specific customization."})),C("Per-model customizations","Optional values that take precedence only when a specific installed model runs.",d,{testId:"model-overrides-settings"})}createOverride(e,t){let i=Z(e,t);e.model_overrides[t]={...i},this.change("model_overrides",{...e.model_overrides})}updateOverride(e,t,i,n){let r=n.trim()===""?null:Number(n);r!==null&&!Number.isFinite(r)||(Gt(e,t,i,r),this.change("model_overrides",{...e.model_overrides},!1))}removeOverride(e,t){delete e.model_overrides[t],this.change("model_overrides",{...e.model_overrides})}};var Qe=class{constructor(e,t,i,n){this.renderApp=e;this.appState=t;this.client=i;this.dialogs=n}renderApp;appState;client;dialogs;openEndpoints=new Set;gpuNodes(){if(!this.appState.session?.is_admin)return[E("Coordinate shared GPU work","This tab changes installation-wide provider scheduling and requires the administrator account."),s("div",{class:"settings-empty-state",textContent:"Sign in with the administrator account to inspect or change GPU coordination."})];let e=this.appState.resourceCoordination;if(!e)return[E("Coordinate shared GPU work","Nice Assistant can observe measured capacity and release only explicitly authorized exclusive endpoints."),s("div",{class:"settings-empty-state",textContent:this.appState.resourceCoordinationBusy?"Loading provider capacity and authorization\u2026":"GPU coordination is unavailable. Retry, then check provider addresses and server logs."}),s("button",{class:"pill-btn",textContent:"Retry GPU status",disabled:this.appState.resourceCoordinationBusy,onclick:()=>{this.refreshCoordination()}})];let t=e.endpoints.filter(r=>r.snapshot?.status==="known"),i=e.endpoints.filter(r=>r.capabilities.supports_release),n=e.endpoints.filter(r=>r.authorization.allow_release);return[E("Coordinate shared GPU work","Observe mode waits for measured capacity. Managed mode may release only endpoints you explicitly attest are exclusive to Nice Assistant."),s("div",{class:"settings-readiness-list"},[x("Coordination mode",k(e.settings.mode),e.settings.mode==="disabled"?"off":"ready","Disabled preserves provider behavior. Observe waits without unloading. Managed adds verified release controls."),x("Measured capacity",`${t.length} of ${e.endpoints.length} providers known`,t.length===e.endpoints.length?"ready":"attention","Unknown capacity is never presented as free VRAM."),x("Release-capable providers",`${i.length} reported`,i.length?"ready":"off","Provider capability means an adapter exposes a supported release API; it does not grant permission to use it."),x("Authorized release",`${n.length} explicitly allowed`,n.length?"attention":"off","Authorization must match the current endpoint fingerprint and is invalidated when the address changes.")]),v([f("Coordination policy","Choose the least powerful mode that meets the needs of this shared GPU."),w("Mode",e.settings.mode,["disabled","observe","managed"],r=>{e.settings.mode=r,this.renderApp()},"resource-coordination-mode",ra,!0,"Managed mode can invoke release controls only for separately authorized endpoints."),e.settings.mode==="managed"?s("div",{class:"settings-warning",textContent:"Managed mode can unload models or checkpoints on authorized endpoints. Authorize only services used exclusively by Nice Assistant; shared providers must remain unauthorized."}):null,s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:this.appState.resourceCoordinationBusy?"Saving\u2026":"Save coordination",disabled:this.appState.resourceCoordinationBusy,"data-testid":"resource-coordination-save",onclick:()=>{this.saveCoordination()}}),s("button",{class:"pill-btn",textContent:this.appState.resourceCoordinationBusy?"Checking\u2026":"Refresh telemetry",disabled:this.appState.resourceCoordinationBusy,onclick:()=>{this.checkCoordination()}})])]),C("Capacity timing and reserve","Expert scheduling bounds used while waiting for enough measured GPU capacity.",[m("Reserved VRAM (MB)",String(e.settings.reserve_vram_mb),r=>{e.settings.reserve_vram_mb=qi(r,0,131072,1024)},"number",!1,"Capacity kept unused after admitting estimated demand."),m("Maximum capacity wait (seconds)",String(e.settings.max_wait_seconds),r=>{e.settings.max_wait_seconds=qi(r,1,3600,300)},"number",!1,"Fails an admission attempt safely after this wait rather than hanging indefinitely."),m("Telemetry interval (seconds)",String(e.settings.poll_interval_seconds),r=>{e.settings.poll_interval_seconds=oa(r,.25,60,2)},"number",!1,"How often Nice Assistant refreshes capacity while a job waits.")],{testId:"gpu-advanced-settings"}),v([f("Provider endpoints","Open an endpoint to review its measured status, adapter capabilities, and release authorization.")]),...e.endpoints.map(r=>this.endpointCard(r)),this.coordinationEvents()]}dataNodes(){return this.appState.session?.is_admin?[E("Protect and inspect this installation","Create recoverable snapshots, verify them before relying on them, and download redacted diagnostic logs when troubleshooting."),s("div",{class:"settings-readiness-list"},[x("Available backups",`${this.appState.backupItems.length} archives`,this.appState.backupItems.length?"ready":"attention","A backup is not proven usable until its database integrity and migration compatibility are verified."),x("Backup verification","Available for every listed archive","ready","Verification runs a temporary restore drill without replacing the live database."),x("Diagnostic logs","Redacted download available","ready","Logs omit configured secrets but may still contain operational timing and safe error context."),x("Media coverage","Chosen per backup","ready","Database-only snapshots are smaller. Full backups also include regular protected media files.")]),v([f("Create a backup","Backups are written to the configured archive directory and should be copied to independent storage."),s("div",{class:"operator-action-grid"},[s("button",{class:"send-btn",textContent:this.appState.backupActionRunning?"Creating\u2026":"Create database backup",disabled:this.appState.backupActionRunning,onclick:()=>{this.createBackup(!1)}}),s("button",{class:"pill-btn",textContent:this.appState.backupActionRunning?"Creating\u2026":"Create backup with media",disabled:this.appState.backupActionRunning,onclick:()=>{this.createBackup(!0)}}),s("button",{class:"pill-btn",textContent:"Download diagnostic log",onclick:()=>window.open(this.client.diagnosticLogUrl(),"_blank","noopener")}),s("button",{class:"pill-btn",textContent:this.appState.backupsLoading?"Refreshing\u2026":"Refresh backups",disabled:this.appState.backupsLoading,onclick:()=>{this.refreshBackups()}})])]),v([f(`Backup archives (${this.appState.backupItems.length})`,"Verify an archive before treating it as a recovery point. Deleting an archive cannot be undone.")]),...this.appState.backupItems.length?this.appState.backupItems.map(e=>j(e.name,`${ue(e.size)} \xB7 ${I(e.created_at)}`,e.include_media?"Database + media":"Database",[s("div",{class:"operator-actions"},[s("button",{class:"pill-btn",textContent:"Download",onclick:()=>window.open(this.client.backupDownloadUrl(e.name),"_blank","noopener")}),s("button",{class:"pill-btn",textContent:this.appState.backupActionRunning?"Verifying\u2026":"Verify restore",disabled:this.appState.backupActionRunning,onclick:()=>{this.verifyBackup(e.name)}}),s("button",{class:"pill-btn danger",textContent:"Delete archive",onclick:()=>{this.deleteBackup(e.name)}})])],{testId:`backup-${e.name}`,className:"backup-editor",statusClass:"idle"})):[s("div",{class:"settings-empty-state",textContent:"No backups are available yet. Create and verify one before making risky deployment or migration changes."})]]:[E("Protect and inspect this installation","Backups and diagnostic logs contain installation-wide operational data and require the administrator account."),s("div",{class:"settings-empty-state",textContent:"Sign in with the administrator account to manage backups and diagnostic logs."})]}async refreshCoordination(){if(!(!this.appState.session?.is_admin||this.appState.resourceCoordinationBusy)){this.appState.resourceCoordinationBusy=!0,this.renderApp();try{let[e,t]=await Promise.all([this.client.resourceCoordination(),this.client.resourceCoordinationEvents()]);this.appState.resourceCoordination=e,this.appState.resourceCoordinationEvents=t.items}catch(e){this.appState.settingsError=h(e,"Unable to load GPU coordination.")}finally{this.appState.resourceCoordinationBusy=!1,this.renderApp()}}}async refreshBackups(){if(this.appState.session?.is_admin){this.appState.backupsLoading=!0,this.renderApp();try{this.appState.backupItems=(await this.client.backups()).items}catch(e){this.appState.settingsError=h(e,"Unable to load backups.")}finally{this.appState.backupsLoading=!1,this.renderApp()}}}endpointCard(e){let t=e.snapshot,i=t?.free_vram_mb==null?k(t?.status??"not checked"):`${t.free_vram_mb} MB free of ${t.total_vram_mb??"unknown"} MB`,n=t?.status==="known"?"Measured":k(t?.status??"Not checked");return j(k(e.provider),`${e.endpoint_label} \xB7 ${i}`,n,[s("div",{class:"settings-readiness-list"},[x("Capacity reporting",e.capabilities.reports_capacity?"Supported":"Unavailable",e.capabilities.reports_capacity?"ready":"off","Determines whether Nice Assistant can use measured free VRAM instead of unknown capacity."),x("Queue reporting",e.capabilities.reports_queue?"Supported":"Unavailable",e.capabilities.reports_queue?"ready":"off","Queue depth helps explain whether the external provider is already busy."),x("Release control",e.capabilities.supports_release?"Adapter supports release":"Not supported",e.capabilities.supports_release?"attention":"off","Support does not authorize release. Exclusive control and allow-release must both be explicitly enabled."),x("Precise cancellation",e.capabilities.supports_precise_cancel?"Supported":"Cooperative or unavailable",e.capabilities.supports_precise_cancel?"ready":"off","Providers without precise cancellation may finish work whose late result Nice Assistant discards.")]),t?.message?s("div",{class:"meta",textContent:t.message}):null,M("This endpoint is exclusively managed by Nice Assistant",e.authorization.exclusive_control,r=>{e.authorization.exclusive_control=r,r||(e.authorization.allow_release=!1),this.renderApp()},"Enable only if no other application or person uses this exact provider endpoint."),M("Allow verified release controls",e.authorization.allow_release,r=>{e.authorization.allow_release=r&&e.authorization.exclusive_control,this.renderApp()},"Requires exclusive control. Managed mode verifies provider state after every release attempt and records the result.")],{open:this.openEndpoints.has(e.provider),onToggle:r=>r?this.openEndpoints.add(e.provider):this.openEndpoints.delete(e.provider),testId:`resource-endpoint-${e.provider}`,className:"resource-endpoint-card",statusClass:t?.status==="known"?"ok":t?.status==="unavailable"?"fail":"idle"})}coordinationEvents(){let e=this.appState.resourceCoordinationEvents.length?this.appState.resourceCoordinationEvents.slice(0,20).map(t=>s("div",{class:"task-run-row"},[s("div",{},[s("strong",{textContent:`${k(t.provider)} \xB7 ${k(t.action)}`}),s("div",{class:"meta",textContent:`${k(t.outcome)} \xB7 ${I(t.created_at)}`})])])):[s("div",{class:"settings-empty-state",textContent:"No coordination events have been recorded yet."})];return C(`Recent coordination events (${this.appState.resourceCoordinationEvents.length})`,"Content-free operational records of waits, admissions, release attempts, verification, and safe failures.",e,{testId:"gpu-coordination-events"})}async saveCoordination(){let e=this.appState.resourceCoordination;if(!(!this.appState.session?.is_admin||!e)){this.appState.resourceCoordinationBusy=!0,this.renderApp();try{this.appState.resourceCoordination=await this.client.saveResourceCoordination(e),this.appState.resourceCoordinationEvents=(await this.client.resourceCoordinationEvents()).items}catch(t){this.appState.settingsError=h(t,"Unable to save GPU coordination.")}finally{this.appState.resourceCoordinationBusy=!1,this.renderApp()}}}async checkCoordination(){if(this.appState.session?.is_admin){this.appState.resourceCoordinationBusy=!0,this.renderApp();try{this.appState.resourceCoordination=await this.client.checkResourceCoordination()}catch(e){this.appState.settingsError=h(e,"Unable to refresh GPU telemetry.")}finally{this.appState.resourceCoordinationBusy=!1,this.renderApp()}}}async createBackup(e){this.appState.backupActionRunning=!0,this.renderApp();try{await this.client.createBackup(e),await this.refreshBackups()}catch(t){this.appState.settingsError=h(t,"Unable to create the backup.")}finally{this.appState.backupActionRunning=!1,this.renderApp()}}async deleteBackup(e){if(await this.dialogs.confirm("Delete backup",`Permanently delete ${e}? This archive cannot be recovered from Nice Assistant.`,"Delete archive"))try{await this.client.deleteBackup(e),await this.refreshBackups()}catch(t){this.appState.settingsError=h(t,"Unable to delete the backup."),this.renderApp()}}async verifyBackup(e){this.appState.backupActionRunning=!0,this.renderApp();try{let t=await this.client.verifyBackup(e);this.dialogs.info("Backup verified",`${t.name}
+Database integrity: ${t.database_integrity}
+Migration: ${t.migration_revision}
+Archive entries: ${t.entry_count}
+Includes media: ${t.include_media?"yes":"no"}`)}catch(t){this.appState.settingsError=h(t,"Backup verification failed.")}finally{this.appState.backupActionRunning=!1,this.renderApp()}}};function ra(a){return{disabled:"Disabled \u2014 preserve provider behavior",observe:"Observe \u2014 wait for measured capacity",managed:"Managed \u2014 allow authorized release controls"}[a]??k(a)}function qi(a,e,t,i){let n=Number.parseInt(a,10);return Number.isFinite(n)?Math.max(e,Math.min(t,n)):i}function oa(a,e,t,i){let n=Number(a);return Number.isFinite(n)?Math.max(e,Math.min(t,n)):i}var he=["card_definition","card_personality","card_style","card_behavior"],Ni=[...he,"card_example_dialogue"],Oi={card_definition:"Character definition (facts about who this persona is)",card_personality:"Character personality (disposition, values, flaws, fears)",card_style:"Character style (how this persona speaks)",card_behavior:"Character behavior (how this persona acts)"},Hi={card_definition:"Definition",card_personality:"Personality",card_style:"Style",card_behavior:"Behavior"},Bi={card_definition:"Facts about this persona: age, work, living situation, history.",card_personality:"Disposition, values, flaws, and fears.",card_style:"Speech patterns, vocabulary, rhythm, and verbal tics.",card_behavior:"How this persona acts: initiative, humor, conflict, affection."},Ze="<START>",Ct="{{user}}",xt="{{char}}",la="User";function Pt(a){let e=[],t=[];for(let i of String(a??"").split(`
+`)){if(i.trim()===Ze){t.some(n=>n.trim())&&e.push(t.join(`
+`).trim()),t=[];continue}t.push(i)}return t.some(i=>i.trim())&&e.push(t.join(`
+`).trim()),e}function da(a,e){return a.split(xt).join(e||"Assistant").split(Ct).join(la)}function Ui(a,e,t){let i=[];for(let n of Pt(a)){let r=[...i,da(n,e)];if(Mt(r.join(`
+
+`))>t)break;i.length=0,i.push(...r)}return i}function ca(a){return he.reduce((e,t)=>(e[t]=(a[t]??"").trim(),e),{})}function pa(a){let e=ca(a);return he.filter(t=>e[t]).map(t=>`${Oi[t]}: ${e[t]}`).join(`
+`)}function Mt(a){return a?Math.max(1,Math.ceil(new TextEncoder().encode(a).length/3)):0}function ha(a){return Mt(pa(a))}function Di(a,e){let t=(a[e]??"").trim();return t?Mt(`${Oi[e]}: ${t}`):0}function Vi(a){let e=a.card_cap_tokens??0,t=a.card_prompt_budget_tokens??0,i=ha(a);return{used:i,cap:e,promptBudget:t,contextWindow:a.card_context_window_tokens??0,remainingForHistory:Math.max(0,Math.round(t*.65)-i),overBy:Math.max(0,i-e),over:i>e}}function ua(a){let e=Pt(a.card_example_dialogue).length;if(!e)return`No example exchanges yet. Separate each one with a ${Ze} line.`;let t=a.example_budget_tokens??0,i=Ui(a.card_example_dialogue,a.name,t).length,n=e===1?"exchange":"exchanges";return i>=e?`${e} ${n}, all of which fit in the ${t}-token allowance.`:`${e} ${n}; the first ${i} fit in the ${t}-token allowance and the rest are left out. Shorten them, or raise the model context allocation in Settings.`}var et=class{constructor(e,t=o,i=_){this.renderApp=e;this.appState=t;this.client=i}renderApp;appState;client;node(e){let t=s("div",{class:"meta character-card-meter","data-testid":`character-card-meter-${e.id}`}),i=s("div",{class:"meta character-card-meter","data-testid":`character-card-example-meter-${e.id}`}),n=new Map,r=()=>{let c=Vi(e);for(let[p,g]of n)g.textContent=`${Di(e,p)} tokens`;t.textContent=c.over?`${c.used} of ${c.cap} tokens \u2014 ${c.overBy} over the limit. Saving this card will be rejected.`:`${c.used} of ${c.cap} tokens \xB7 about ${c.remainingForHistory} tokens left for conversation history.`,t.classList.toggle("settings-warning",c.over),i.textContent=ua(e)},d=he.map(c=>{let p=s("span",{class:"meta","data-testid":`character-card-count-${c}-${e.id}`});return n.set(c,p),s("div",{class:"character-card-field"},[P(Hi[c],e[c]??"",g=>{e[c]=g,r()},!1,Bi[c]),p])}),l=s("div",{class:"character-card-field"},[P("Example dialogue",e.card_example_dialogue??"",c=>{e.card_example_dialogue=c,r()},!1,`Sample exchanges that show how this persona talks. Separate each one with a ${Ze} line, and write ${xt} for the persona and ${Ct} for whoever is talking to them.`)]);return r(),C("Character card","Durable character material sent with every turn. The card is never dropped to make room, so it is capped when you save it. Example dialogue is optional context: it yields before the conversation does.",[...d,t,l,i,s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Save character card","data-testid":`character-card-save-${e.id}`,onclick:()=>{this.save(e)}})])],{testId:`character-card-${e.id}`})}async save(e){let t=Ni.reduce((i,n)=>(i[n]=e[n]??"",i),{});try{let i=await this.client.updatePersonaCard(e.id,t);this.appState.personas=this.appState.personas.map(n=>n.id===i.id?i:n),this.appState.settingsError=""}catch(i){this.appState.settingsError=h(i,"The character card could not be saved.")}this.renderApp()}};var tt=class{constructor(e,t,i=o,n=_){this.renderApp=e;this.onCopied=t;this.appState=i;this.client=n}renderApp;onCopied;appState;client;groups=new Map;node(e){let t=this.groups.get(e.id)??[];return C("Take from another persona",t.length?"Copy an entry a persona in this workspace already has.":"Nothing to take yet. Open to look.",t.length?[this.warning(e),...t.map(i=>this.group(e,i))]:[],{testId:`lore-copy-${e.id}`,onToggle:i=>{i&&this.load(e.id)}})}warning(e){return s("div",{class:"meta","data-testid":`lore-copy-warning-${e.id}`,textContent:"A copy is its own entry from then on. Editing the original later does not change it, and editing this one does not change the original."})}group(e,t){return v([s("div",{class:"settings-heading",textContent:t.persona_name}),s("div",{class:"chips"},t.entries.map(i=>s("button",{class:"pill-btn",textContent:`Copy "${i.title}"`,"data-testid":`lore-copy-${i.id}`,onclick:()=>{this.copy(e,i.id)}})))])}async load(e){try{this.groups.set(e,(await this.client.copyablePersonaLore(e)).groups)}catch(t){this.appState.settingsError=h(t,"Nearby personas could not be listed.")}this.renderApp()}async copy(e,t){try{this.onCopied(e,await this.client.copyPersonaLore(e.id,t)),this.appState.settingsError=""}catch(i){this.appState.settingsError=h(i,"The entry could not be copied.")}await this.load(e.id)}};var it=class{constructor(e,t=o,i=_){this.renderApp=e;this.appState=t;this.client=i;this.copyView=new tt(e,(n,r)=>this.adopt(n,r),t,i)}renderApp;appState;client;entries=new Map;previews=new Map;previewText=new Map;loaded=new Set;copyView;adopt(e,t){let i=this.entries.get(e.id)??[];i.push(t),this.entries.set(e.id,i)}node(e){let t=this.entries.get(e.id)??[];return C("Lorebook","Background detail added to a turn only when the conversation mentions one of its keywords. Entries are matched by the platform, never by the model, and injected text is not itself scanned.",[s("div",{class:"settings-primary-actions"},[s("button",{class:"send-btn",textContent:"+ New entry","data-testid":`lore-add-${e.id}`,onclick:()=>{this.create(e)}}),s("span",{class:"meta",textContent:`${t.length} ${t.length===1?"entry":"entries"}`})]),...t.map(i=>this.entryEditor(e,i)),this.copyView.node(e),this.previewBox(e)],{testId:`lore-${e.id}`,onToggle:i=>{i&&this.load(e.id)}})}entryEditor(e,t){let i=this.previews.get(e.id)?.items.find(n=>n.id===t.id);return C(`${t.title}${t.enabled?"":" (off)"}`,t.always_on?"Always included, regardless of keywords.":`Fires on: ${t.keys.join(", ")||"nothing yet"}`,[m("Title",t.title,n=>{t.title=n},"text",!1,"Your label for this entry. It is never sent to the model."),P("Content",t.content,n=>{t.content=n},!1,"The text injected when this entry fires."),m("Keywords",t.keys.join(", "),n=>{t.keys=Fi(n)},"text",!1,"Comma separated. Matched as whole words, never as patterns."),m("Also requires",t.secondary_keys.join(", "),n=>{t.secondary_keys=Fi(n)},"text",!1,"Optional. When set, one of these must appear as well before the entry fires."),m("Priority",String(t.priority),n=>{t.priority=ma(n)},"number",!1,"Higher entries win when the allowance runs out. 0 to 100."),M("Always include",t.always_on,n=>{t.always_on=n},"Include this entry on every turn instead of matching keywords."),M("Match case",t.case_sensitive,n=>{t.case_sensitive=n},"Off means Bakery and bakery both match."),M("Match plurals",t.match_word_forms,n=>{t.match_word_forms=n},"On means a keyword of sister also fires on sisters, and bakery on bakeries."),M("Enabled",t.enabled,n=>{t.enabled=n},"Turn off to keep the entry without sending it."),s("div",{class:"meta","data-testid":`lore-entry-meta-${t.id}`,textContent:i?`${t.token_estimate} tokens \xB7 fires on the preview text${i.included?"":", but does not fit"}`:`${t.token_estimate} tokens of the ${t.budget_tokens}-token lorebook allowance`}),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Save entry","data-testid":`lore-save-${t.id}`,onclick:()=>{this.save(e,t)}}),s("button",{class:"icon-btn danger",textContent:"Delete","data-testid":`lore-delete-${t.id}`,onclick:()=>{this.remove(e,t)}})])],{testId:`lore-entry-${t.id}`})}previewBox(e){let t=this.previews.get(e.id);return v([P("Preview",this.previewText.get(e.id)??"",i=>{this.previewText.set(e.id,i)},!1,"Paste a message to see which entries it fires, before a real conversation depends on it."),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Check what fires","data-testid":`lore-preview-${e.id}`,onclick:()=>{this.preview(e)}})]),s("div",{class:"meta","data-testid":`lore-preview-result-${e.id}`,textContent:fa(t)}),...(t?.items??[]).map(i=>s("div",{class:"meta",textContent:`${i.included?"\u2713":"\u2715"} ${i.title}${i.fired_keys.length?` \xB7 on "${i.fired_keys.join('", "')}"`:" \xB7 always included"} \xB7 ${i.token_estimate} tokens${i.included?"":" \xB7 left out, over the allowance"}`}))])}async load(e){if(!this.loaded.has(e)){this.loaded.add(e);try{this.entries.set(e,(await this.client.personaLore(e)).items)}catch(t){this.loaded.delete(e),this.appState.settingsError=h(t,"The lorebook could not be loaded.")}this.renderApp()}}async create(e){await this.load(e.id),await this.write(e,()=>this.client.createPersonaLore(e.id,{title:"New entry",content:"Background detail this persona knows.",keys:[],secondary_keys:[],always_on:!0,case_sensitive:!1,match_word_forms:!0,priority:50,enabled:!0}))}async save(e,t){await this.write(e,()=>this.client.updatePersonaLore(e.id,t.id,ga(t)))}async write(e,t){try{let i=await t(),n=this.entries.get(e.id)??[],r=n.findIndex(d=>d.id===i.id);r===-1?n.push(i):n[r]=i,this.entries.set(e.id,n),this.appState.settingsError=""}catch(i){this.appState.settingsError=h(i,"The lore entry could not be saved.")}this.renderApp()}async remove(e,t){try{await this.client.deletePersonaLore(e.id,t.id),this.entries.set(e.id,(this.entries.get(e.id)??[]).filter(i=>i.id!==t.id)),this.appState.settingsError=""}catch(i){this.appState.settingsError=h(i,"The lore entry could not be deleted.")}this.renderApp()}async preview(e){let t=(this.previewText.get(e.id)??"").trim();if(t){try{this.previews.set(e.id,await this.client.previewPersonaLore(e.id,t)),this.appState.settingsError=""}catch(i){this.appState.settingsError=h(i,"The preview could not be run.")}this.renderApp()}}};function Fi(a){return a.split(",").map(e=>e.trim()).filter(Boolean)}function ma(a){let e=Number.parseInt(a,10);return Number.isNaN(e)?50:Math.min(100,Math.max(0,e))}function ga(a){return{title:a.title,content:a.content,keys:a.keys,secondary_keys:a.secondary_keys,always_on:a.always_on,case_sensitive:a.case_sensitive,match_word_forms:a.match_word_forms,priority:a.priority,enabled:a.enabled}}function fa(a){if(!a)return"Paste a message above to see which entries it fires.";if(!a.items.length)return"Nothing fires on that message.";let e=a.items.filter(i=>i.included).length,t=a.items.length===1?"entry fires":"entries fire";return`${a.items.length} ${t}; ${e} fit, using ${a.used_tokens} of ${a.budget_tokens} tokens.`}var va={title_generation:"Creates short chat titles after conversation turns.",conversation_summary:"Compresses older conversation history when the context budget requires it.",memory_extraction:"Proposes reviewable memory candidates without automatically approving them.",capability_planning:"Chooses a typed assistant capability. Media models, workflows, LoRAs, and identity controls are selected later by the media coordinator."},st=class{constructor(e,t,i){this.renderApp=e;this.appState=t;this.client=i}renderApp;appState;client;dirtyRoles=new Set;versions=new Map;openRoles=new Set;nodes(){let e=this.appState.taskModels.filter(r=>r.enabled),t=e.filter(r=>this.appState.taskModelChecks[r.role]?.ready),i=e.filter(r=>this.appState.taskModelChecks[r.role]),n=[E("Configure background intelligence","Task Models handle platform work separate from persona behavior and share the interactive Ollama lane with chat. Capability planning does not choose media workflows, LoRAs, and identity controls; the media coordinator handles those later."),s("div",{class:"settings-readiness-list"},[x("Configured roles",`${e.length} of ${this.appState.taskModels.length} enabled`,e.length?"ready":"attention","Disabled roles use their documented fallback behavior and never silently borrow the persona model."),x("Readiness checks",i.length?`${t.length} of ${i.length} checked roles ready`:"Not checked in this browser session",i.length&&t.length===i.length?"ready":i.length?"attention":"off","A readiness check confirms the adapter is installed, that any credential it needs is configured for this account, and that the chosen model exists. It sends no request, so it never proves the provider answers, and it does not judge output quality."),x("GPU scheduling","Shares the interactive lane with persona chat","ready","The default single interactive worker prevents background inference from overlapping chat on a shared GPU."),x("Recent audits",`${this.appState.taskModelRuns.length} content-free run records loaded`,this.appState.taskModelRuns.length?"ready":"off","Audits retain role, model, timing, token estimates, and safe errors\u2014not prompts or generated task content.")]),v([f("Task roles","Open a role to choose its model, fallback, limits, and failure behavior."),s("button",{class:"pill-btn",textContent:"Refresh roles and audits",onclick:()=>{this.refresh()}})])];return this.appState.taskModels.length?n.push(...this.appState.taskModels.map(r=>this.profileCard(r))):n.push(s("div",{class:"settings-empty-state",textContent:"No Task Model profiles were returned. Refresh the page, then check the server logs if the profiles remain unavailable."})),n.push(this.runAudit()),n}async refresh(){let e=new Map(this.versions);try{let[t,i]=await Promise.all([this.client.taskModels(),this.client.taskModelRuns(void 0,20)]),n=new Map(this.appState.taskModels.map(r=>[r.role,r]));this.appState.taskModels=t.items.map(r=>{let d=n.get(r.role),l=(this.versions.get(r.role)??0)!==(e.get(r.role)??0);return d&&(this.dirtyRoles.has(r.role)||l)?d:r}),this.appState.taskModelRuns=i.items}catch(t){this.appState.settingsError=h(t,"Unable to load Task Models.")}this.renderApp()}profileCard(e){let t=this.appState.taskModelChecks[e.role],i=!!this.appState.taskModelBusy[e.role],n=["",...this.appState.models],r=p=>p||"Automatic (first installed model)",d=e.role==="title_generation"?["deterministic","skip","fail"]:["skip","fail"],l=e.enabled?t?t.ready?"Ready":k(t.status):"Not checked":"Disabled",c=e.enabled?t?.ready?"ok":t?"fail":"idle":"idle";return j(e.title,e.enabled?`${e.model||"Automatic model"} \xB7 ${e.fallback_policy} fallback policy`:"This background role is disabled",l,[f("Execution path",va[e.role]),M("Enable this role",e.enabled,p=>this.change(e.role,"enabled",p,!1),"Disabled roles follow the selected failure behavior instead of running a model."),w("Provider",e.provider,["ollama"],p=>this.change(e.role,"provider",p,!1),void 0,k,!1,"Only providers implementing the structured Task Model contract appear here. An adapter existing in the codebase is not the same as a provider offered here."),w("Primary model",e.model??"",n,p=>this.change(e.role,"model",p||null,!1),void 0,r,!1,"Automatic uses the first installed Ollama model. An explicit choice is more predictable."),w("Fallback model",e.fallback_model??"",n,p=>{this.change(e.role,"fallback_model",p||null,!1),this.change(e.role,"fallback_provider",p?e.provider:null,!1)},void 0,r,!1,"Tried only after the primary execution fails and before the role failure policy is applied."),C("Budgets and failure behavior","Bounds keep background work from consuming unbounded context, time, or output.",[m("Maximum input tokens",String(e.max_input_tokens),p=>this.changeNumber(e.role,"max_input_tokens",p),"number",!1,"The maximum estimated input size sent to this role."),m("Maximum output tokens",String(e.max_output_tokens),p=>this.changeNumber(e.role,"max_output_tokens",p),"number",!1,"The maximum structured output size accepted from this role."),m("Timeout seconds",String(e.timeout_seconds),p=>this.changeNumber(e.role,"timeout_seconds",p),"number",!1,"Stops waiting for this background task after the limit."),m("Temperature",String(e.temperature),p=>this.changeNumber(e.role,"temperature",p),"number",!1,"Low values are recommended for deterministic platform work."),w("Failure behavior",e.fallback_policy,d,p=>this.change(e.role,"fallback_policy",p,!1),void 0,k,!1,"Determines whether the product skips the task, fails it, or uses a narrow deterministic fallback.")],{testId:`task-model-advanced-${e.role}`}),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:i?"Saving\u2026":"Save role",disabled:i,"data-testid":`task-model-save-${e.role}`,onclick:()=>{this.save(e.role)}}),s("button",{class:"pill-btn",textContent:i?"Checking\u2026":"Check readiness",disabled:i,onclick:()=>{this.check(e.role)}}),t?s("span",{class:`provider-status ${t.ready?"ok":"fail"}`,textContent:`${k(t.status)}: ${t.message}`}):null])],{open:this.openRoles.has(e.role),onToggle:p=>p?this.openRoles.add(e.role):this.openRoles.delete(e.role),testId:`task-model-${e.role}`,className:"task-model-card",statusClass:c})}runAudit(){let e=this.appState.taskModelRuns.length?this.appState.taskModelRuns.map(t=>s("div",{class:"task-run-row"},[s("div",{},[s("strong",{textContent:k(t.role)}),s("div",{class:"meta",textContent:`${t.executed_provider??t.requested_provider??"No provider"} / ${t.executed_model??t.requested_model??"automatic"} \xB7 ${I(t.started_at)}`})]),s("div",{class:"task-run-metrics"},[s("span",{class:`provider-status ${ya(t.status)}`,textContent:k(t.status)}),s("span",{class:"meta",textContent:`${t.latency_ms??0} ms \xB7 ~${t.input_tokens_estimated} in / ~${t.output_tokens_estimated??0} out`}),t.error?s("span",{class:"provider-check-message",textContent:`${t.error.code}: ${t.error.message}`}):null])])):[s("div",{class:"settings-empty-state",textContent:"No Task Model runs have been recorded yet."})];return C(`Recent Task Model audits (${this.appState.taskModelRuns.length})`,"Prompts and generated task output are not stored. These records contain only role, provider/model, timing, token estimates, status, and safe errors.",e,{testId:"task-model-run-audits"})}change(e,t,i,n=!0){let r=this.appState.taskModels.find(d=>d.role===e);r&&(r[t]=i,this.dirtyRoles.add(e),this.bumpVersion(e),delete this.appState.taskModelChecks[e],n&&this.renderApp())}changeNumber(e,t,i){let n=Number(i);Number.isFinite(n)&&this.change(e,t,n,!1)}bumpVersion(e){this.versions.set(e,(this.versions.get(e)??0)+1)}async save(e){let t=this.appState.taskModels.find(i=>i.role===e);if(t){this.appState.taskModelBusy[e]=!0,this.appState.settingsError="",this.renderApp();try{let i=await this.client.updateTaskModel(t);this.appState.taskModels=this.appState.taskModels.map(n=>n.role===e?i:n),this.bumpVersion(e),this.dirtyRoles.delete(e);try{this.appState.taskModelChecks[e]=await this.client.checkTaskModel(e)}catch(n){this.appState.settingsError=h(n,`${i.title} was saved, but readiness could not be checked.`)}}catch(i){this.appState.settingsError=h(i,`Unable to save ${t.title}.`)}finally{this.appState.taskModelBusy[e]=!1,this.renderApp()}}}async check(e){this.appState.taskModelBusy[e]=!0,this.renderApp();try{this.appState.taskModelChecks[e]=await this.client.checkTaskModel(e)}catch(t){this.appState.settingsError=h(t,"Unable to check Task Model readiness.")}finally{this.appState.taskModelBusy[e]=!1,this.renderApp()}}};function ya(a){return a==="completed"?"ok":a==="running"?"checking":a==="fallback"?"idle":"fail"}var zi=[["ollama","Ollama"],["openai","OpenAI"],["kokoro","Kokoro"],["automatic1111","Automatic1111"],["comfyui","ComfyUI"]],at=class{constructor(e,t,i,n=o,r=_,d=l=>{n.settingsSection=l,e()}){this.renderApp=e;this.close=t;this.dialogs=i;this.appState=n;this.client=r;this.navigateSettings=d;this.mediaCatalogView=new Xe(e,n,r,i,t),this.identityView=new Ue(e,n,r,i,l=>this.startIdentitySetup({capability_request_id:null,chat_id:n.currentChat?.id??null,persona_id:l,prompt:"",required_features:["identity_control"],block_code:null})),this.everydayView=new Pe(n,(l,c,p)=>this.set(l,c,p),l=>this.providerControl(l),()=>this.providerPanel()),this.modelView=new Ye(n,(l,c,p)=>this.set(l,c,p),e,()=>this.providerControl("ollama")),this.taskModelView=new st(e,n,r),this.personaCardView=new et(e,n,r),this.personaLoreView=new it(e,n,r),this.operationsView=new Qe(e,n,r,i)}renderApp;close;dialogs;appState;client;navigateSettings;searchQuery="";identityView;everydayView;modelView;taskModelView;mediaCatalogView;operationsView;personaCardView;personaLoreView;selectedMemoryIds=new Set;memoryActionBusy=!1;startIdentitySetup(e){if(Ca(e.block_code)){this.appState.mediaCatalogIdentitySetupIntent=null,e.persona_id&&this.appState.personas.some(t=>t.id===e.persona_id)&&(this.appState.identitySelectedPersonaId=e.persona_id),this.navigateSettings("Persona Pictures"),this.identityView.refresh();return}this.appState.mediaCatalogIdentitySetupIntent=e,this.mediaCatalogView.openIdentitySetup(),this.navigateSettings("Media Catalog"),this.mediaCatalogView.refresh()}node(){let e=this.appState.settings;if(!e)return s("div",{class:"settings-screen",textContent:"Settings are unavailable."});let t=ka(this.appState.settingsSection),i=["Data","Task Models","Media Catalog","Persona Pictures","GPU Coordination"].includes(t);return this.appState.settingsSection=t,t==="Persona Pictures"&&!this.appState.identitySettings&&!this.appState.identityBusy&&this.identityView.refresh(),t==="GPU Coordination"&&this.appState.session?.is_admin&&!this.appState.resourceCoordination&&!this.appState.resourceCoordinationBusy&&this.operationsView.refreshCoordination(),s("div",{class:"settings-screen","data-testid":"settings-screen"},[s("div",{class:"settings-header"},[s("h2",{textContent:"Settings"}),this.appState.settingsSavedAt?s("div",{class:"success-banner",textContent:"Settings saved"}):null,s("div",{class:"chips"},[s("button",{class:"icon-btn",textContent:"\u2715 Close",onclick:this.close}),i?null:s("button",{class:"send-btn",textContent:this.appState.settingsSaving?"Saving\u2026":"Save settings",disabled:this.appState.settingsSaving,"data-testid":"settings-save",onclick:()=>{this.persist()}})])]),this.appState.settingsError?s("div",{class:"error-banner",textContent:this.appState.settingsError}):null,s("div",{class:"settings-layout"},[Pi({section:t,query:this.searchQuery,onQuery:n=>{this.searchQuery=n,this.renderApp()},onOpen:n=>this.openSection(n)}),s("section",{class:"settings-detail glass"},[s("div",{class:"settings-section-head"},[s("h3",{textContent:oe(t)}),i?null:s("button",{class:"pill-btn",textContent:"Reset to Default",onclick:()=>{Jt(e,t),this.renderApp()}})]),...this.section(t,e)])])])}openSection(e){this.appState.settingsSection=e,e==="Memory"&&this.refreshMemories(),e==="Task Models"&&this.taskModelView.refresh(),e==="Media Catalog"&&this.mediaCatalogView.refresh(),e==="Persona Pictures"&&this.identityView.refresh(),e==="GPU Coordination"&&this.appState.session?.is_admin&&this.operationsView.refreshCoordination(),e==="Data"&&this.appState.session?.is_admin&&this.operationsView.refreshBackups(),this.renderApp()}section(e,t){return["General","TTS","STT","Image Generation","Video Generation","User"].includes(e)?this.everydayView.nodes(e,t):e==="Memory"?this.memory(t):e==="Personas"?this.personas(t):e==="Workspaces"?this.workspaces(t):e==="Models"?this.modelView.nodes(t):e==="Task Models"?this.taskModelView.nodes():e==="Media Catalog"?this.mediaCatalogView.nodes():e==="Persona Pictures"?this.identityView.nodes():e==="GPU Coordination"?this.operationsView.gpuNodes():this.operationsView.dataNodes()}memory(e){let t=_a(this.appState.memories),i=this.appState.memories.filter(r=>this.selectedMemoryIds.has(r.id)),n=i.filter(r=>["pending","active"].includes(r.status));return[E("Control what carries between conversations","Only approved active memories enter prompts. Review, forget, or permanently delete them here."),v([w("Default memory mode",e.default_memory_mode,["saved","off"],r=>this.set("default_memory_mode",r==="off"?"off":"saved"),void 0,r=>r==="saved"?"Use approved memories":"Do not use saved memories",!0,"Controls new chats by default. Individual chats can still choose a different memory mode."),s("div",{class:"settings-concept-strip"},[Et("Pending","A proposed memory that does not enter prompts until you approve it."),Et("Forget","Stops using the memory while preserving history so the action can be undone."),Et("Delete","Permanently removes the memory and its history. This cannot be undone.")])]),s("div",{class:"memory-bulk-bar persona-card","data-testid":"memory-bulk-actions"},[s("div",{class:"settings-heading-with-info"},[s("strong",{textContent:`${i.length} of ${this.appState.memories.length} selected`}),W("Bulk actions apply atomically to the selected memories. Permanent delete cannot be undone.","About memory bulk actions")]),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Select all",disabled:this.memoryActionBusy||this.appState.memories.length===0,onclick:()=>this.selectMemories(this.appState.memories,!0)}),s("button",{class:"pill-btn",textContent:"Clear selection",disabled:this.memoryActionBusy||i.length===0,onclick:()=>{this.selectedMemoryIds.clear(),this.renderApp()}}),s("button",{class:"pill-btn",textContent:`Forget eligible (${n.length})`,disabled:this.memoryActionBusy||n.length===0,onclick:()=>{this.bulkMemoryAction("forget",n.map(r=>r.id))}}),s("button",{class:"pill-btn danger",textContent:`Delete permanently (${i.length})`,disabled:this.memoryActionBusy||i.length===0,"data-testid":"memory-bulk-delete",onclick:()=>{this.bulkMemoryAction("delete",i.map(r=>r.id))}}),s("button",{class:"pill-btn",textContent:"Refresh",disabled:this.memoryActionBusy,onclick:()=>{this.refreshMemories()}})])]),this.memoryGroup("Pending review",t.pending,"pending"),this.memoryGroup("Active",t.active,"active"),this.memoryGroup("History",t.history,"history"),s("div",{class:"persona-card"},[f("Add a manual memory","Manual memories are global, immediately active facts you intentionally want the assistant to remember.","strong"),s("button",{class:"pill-btn",textContent:"Add global memory","data-testid":"memory-add",onclick:()=>{this.addMemory()}})])]}personas(e){return[E("Manage the people you talk with","Create personas and open one only when you want to change its model, appearance source, or behavior."),s("div",{class:"settings-primary-actions"},[s("button",{class:"send-btn",textContent:"+ New persona",onclick:()=>{this.addPersona()}}),s("span",{class:"meta",textContent:`${this.appState.personas.length} ${this.appState.personas.length===1?"persona":"personas"}`})]),C("New-persona default instructions","Applied only when a new persona is created; existing personas keep their own instructions.",[P("Default system prompt",e.personas_default_system_prompt,t=>this.set("personas_default_system_prompt",t),!0,"Starting system instructions for newly created personas.")],{testId:"personas-advanced-settings"}),...this.appState.personas.map(t=>this.personaCard(t))]}workspaces(e){return[E("Organize personas and conversations","Workspaces are private organizational groups. They do not create separate user accounts or provider environments."),v([w("Default workspace",e.workspaces_default_workspace_id,["",...this.appState.workspaces.map(t=>t.id)],t=>this.set("workspaces_default_workspace_id",t),void 0,t=>this.appState.workspaces.find(i=>i.id===t)?.name??"None",!0,"Used as the initial workspace when a feature needs one and no more specific choice exists."),s("button",{class:"send-btn",textContent:"+ New workspace",onclick:()=>{this.addWorkspace()}})]),...this.appState.workspaces.map(t=>s("div",{class:"persona-card workspace-card"},[s("strong",{textContent:t.name}),s("div",{class:"chips"},[s("button",{class:"pill-btn",textContent:"Rename",onclick:()=>{this.renameWorkspace(t.id,t.name)}}),s("button",{class:"icon-btn danger",textContent:"Delete",onclick:()=>{this.deleteWorkspace(t.id,t.name)}})])]))]}personaCard(e){let t=new Set(e.workspace_ids.length?e.workspace_ids:[e.workspace_id]);return s("details",{class:"persona-card persona-editor","data-testid":`persona-${e.id}`},[s("summary",{},[s("div",{},[s("strong",{textContent:e.name}),s("div",{class:"meta",textContent:e.default_model?`Model: ${e.default_model}`:"Automatic model"})]),s("span",{class:"meta",textContent:"Edit"})]),e.avatar_url?s("button",{class:"persona-avatar-preview-button",type:"button",title:`View ${e.name}'s full-size avatar`,"aria-label":`View ${e.name}'s full-size avatar`,onclick:()=>{this.appState.personaAvatarPreview=e.avatar_url??"",this.renderApp()}},[s("img",{class:"persona-avatar-preview",src:e.avatar_url,alt:`${e.name} avatar`})]):null,m("Name",e.name,i=>{e.name=i},"text",!1,"The name shown in chat and persona selectors."),m("Avatar image URL",e.avatar_url??"",i=>{e.avatar_url=i},"url",!1,"Paste any image URL; the picture is copied and kept, so it keeps working if the source moves or goes away."),M("Allow persona to send images",e.allow_image_sends!==!1,i=>{e.allow_image_sends=i},"Controls pictures requested through this persona\u2019s conversation. Direct image actions remain available."),w("Default model",e.default_model??"",["",...this.appState.models],i=>{e.default_model=i},void 0,i=>i||"Automatic",!1,"Overrides the account default model for this persona."),s("div",{class:"setting-row"},[s("div",{class:"setting-label-line"},[s("label",{textContent:"Workspaces"}),W("Choose every workspace where this persona should be available.","About persona workspaces")]),...this.appState.workspaces.map(i=>s("label",{class:"checkbox-row"},[s("input",{type:"checkbox",checked:t.has(i.id),onchange:n=>{n.currentTarget.checked?t.add(i.id):t.delete(i.id),e.workspace_ids=[...t],e.workspace_id=e.workspace_ids[0]??e.workspace_id}}),i.name]))]),C("Personality instructions","These instructions strongly influence persona behavior. Change them deliberately.",[P("Personality details",e.personality_details??"",i=>{e.personality_details=i},!1,"Descriptive traits and background used to support this persona\u2019s behavior."),P("System prompt",e.system_prompt??"",i=>{e.system_prompt=i},!1,"Highest-priority persona instructions sent with each conversation turn.")],{testId:`persona-advanced-${e.id}`}),this.personaCardView.node(e),this.personaLoreView.node(e),s("div",{class:"chips"},[s("button",{class:"send-btn",textContent:"Save persona",onclick:()=>{this.savePersona(e)}}),s("button",{class:"icon-btn danger",textContent:"Delete",onclick:()=>{this.deletePersona(e)}})])])}memoryGroup(e,t,i){let n=!!this.appState.memorySections[i],r=t.filter(d=>this.selectedMemoryIds.has(d.id)).length;return s("div",{class:"memory-section"},[s("div",{class:"memory-section-head"},[s("button",{class:"memory-section-toggle",textContent:`${n?"\u25BE":"\u25B8"} ${e} (${t.length})`,onclick:()=>{this.appState.memorySections[i]=!n,this.renderApp()}}),s("button",{class:"pill-btn",textContent:r===t.length&&t.length?"Clear group":`Select group (${t.length})`,disabled:this.memoryActionBusy||t.length===0,onclick:()=>this.selectMemories(t,!(r===t.length&&t.length>0))})]),...n?t.map(d=>this.memoryRow(d)):[]])}memoryRow(e){return s("div",{class:"memory-row persona-card","data-testid":`memory-${e.id}`},[s("label",{class:"checkbox-row memory-select"},[s("input",{type:"checkbox",checked:this.selectedMemoryIds.has(e.id),disabled:this.memoryActionBusy,onchange:t=>{t.currentTarget.checked?this.selectedMemoryIds.add(e.id):this.selectedMemoryIds.delete(e.id),this.renderApp()}}),"Select"]),P("Memory",e.content,t=>{e.content=t},!1),s("div",{class:"meta",textContent:`${e.status} \xB7 ${e.scope}${e.confidence===null?"":` \xB7 ${Math.round(e.confidence*100)}% confidence`} \xB7 ${e.source_type}`}),s("div",{class:"chips"},[e.status==="pending"?s("button",{class:"pill-btn",textContent:"Approve",onclick:()=>{this.memoryAction(e,"approve")}}):null,e.status==="pending"?s("button",{class:"pill-btn",textContent:"Reject",onclick:()=>{this.memoryAction(e,"reject")}}):null,["pending","active"].includes(e.status)?s("button",{class:"pill-btn",textContent:"Forget",onclick:()=>{this.memoryAction(e,"forget")}}):null,["superseded"].includes(e.status)?null:s("button",{class:"pill-btn",textContent:"Save edit",onclick:()=>{this.saveMemory(e)}}),e.can_undo?s("button",{class:"pill-btn",textContent:"Undo",onclick:()=>{this.memoryAction(e,"undo")}}):null,s("button",{class:"icon-btn",textContent:"History",onclick:()=>{this.memoryHistory(e)}}),s("button",{class:"icon-btn danger",textContent:"Delete",onclick:()=>{this.deleteMemory(e)}})])])}providerPanel(){return s("div",{class:"provider-readiness-panel persona-card"},[s("strong",{textContent:"Provider readiness"}),...zi.map(([e])=>this.providerControl(e))])}providerControl(e){let t=zi.find(([r])=>r===e)?.[1]??e,i=!!this.appState.providerChecksRunning[e],n=this.appState.providerChecks[e];return s("div",{class:"provider-check-row"},[s("button",{class:"pill-btn",textContent:i?`Testing ${t}\u2026`:`Test ${t}`,disabled:i,onclick:()=>{this.testProvider(e)}}),s("span",{class:`provider-status ${ba(n,i)}`,textContent:i?"Testing\u2026":wa(n)}),n?.message?s("span",{class:"provider-check-message",textContent:String(n.message)}):null])}set(e,t,i=!0){let n=this.appState.settings;n&&(n[e]=t,this.appState.settingsSavedAt=0,e==="general_theme"&&(document.documentElement.dataset.theme=String(t)),e==="general_show_system_messages"&&(this.appState.showSystemMessages=!!t),e==="general_show_thinking"&&(this.appState.showThinkingByDefault=!!t),e==="general_voice_responses"&&(this.appState.voiceResponsesEnabled=!!t),e==="general_show_viz"&&(this.appState.showViz=!!t),i&&this.renderApp())}async persist(){let e=this.appState.settings;if(e){this.appState.settingsSaving=!0,this.appState.settingsError="",this.renderApp();try{let t=await this.client.updateSettings(z(e));Object.assign(e,t.preferences,{global_default_model:t.global_default_model??"",default_memory_mode:t.default_memory_mode,stt_provider:t.stt_provider,tts_provider:t.tts_provider,tts_format:t.tts_format,openai_api_key:t.openai_api_key??e.openai_api_key,onboarding_done:t.onboarding_done}),this.appState.settingsSavedAt=Date.now()}catch(t){this.appState.settingsError=h(t,"Unable to save settings.")}finally{this.appState.settingsSaving=!1,this.renderApp()}}}async testProvider(e){let t=this.appState.settings;if(t){this.appState.providerChecksRunning[e]=!0,this.renderApp();try{this.appState.providerChecks[e]=await this.client.providerCheck(e,z(t))}catch(i){this.appState.providerChecks[e]={provider:e,status:"error",message:h(i,"Provider check failed."),ready:!1}}finally{this.appState.providerChecksRunning[e]=!1,this.renderApp()}}}async refreshMemories(){try{this.appState.memories=(await this.client.memories()).items;let e=new Set(this.appState.memories.map(t=>t.id));for(let t of this.selectedMemoryIds)e.has(t)||this.selectedMemoryIds.delete(t)}catch(e){this.appState.settingsError=h(e,"Unable to refresh memory.")}this.renderApp()}async addMemory(){let e=await this.dialogs.prompt("Add memory","Save an explicit global memory.");e?.trim()&&(await this.client.createMemory("global",null,e.trim()),await this.refreshMemories())}async saveMemory(e){await this.client.updateMemory(e.id,e.scope,e.scope_id,e.content),await this.refreshMemories()}async memoryAction(e,t){t==="forget"&&!await this.dialogs.confirm("Forget memory","Remove this memory from future context while retaining its history?","Forget")||(await this.client.memoryAction(e.id,t),await this.refreshMemories())}selectMemories(e,t){for(let i of e)t?this.selectedMemoryIds.add(i.id):this.selectedMemoryIds.delete(i.id);this.renderApp()}async bulkMemoryAction(e,t){if(!(!t.length||!(e==="delete"?await this.dialogs.confirm("Permanently delete memories",`Permanently delete ${t.length} selected ${t.length===1?"memory":"memories"} and all associated history? This cannot be undone.`,"Delete permanently"):await this.dialogs.confirm("Forget memories",`Forget ${t.length} selected ${t.length===1?"memory":"memories"}? They will stop entering prompts, but their history can still be restored.`,"Forget")))){this.memoryActionBusy=!0,this.appState.settingsError="",this.renderApp();try{await this.client.bulkMemoryAction(e,t),t.forEach(n=>this.selectedMemoryIds.delete(n)),await this.refreshMemories()}catch(n){this.appState.settingsError=h(n,`Unable to ${e} the selected memories.`)}finally{this.memoryActionBusy=!1,this.renderApp()}}}async deleteMemory(e){if(await this.dialogs.confirm("Permanently delete memory","Permanently delete this memory and all associated history? This cannot be undone.","Delete permanently")){this.memoryActionBusy=!0,this.renderApp();try{await this.client.deleteMemory(e.id),this.selectedMemoryIds.delete(e.id),await this.refreshMemories()}catch(t){this.appState.settingsError=h(t,"Unable to permanently delete the memory.")}finally{this.memoryActionBusy=!1,this.renderApp()}}}async memoryHistory(e){let t=await this.client.memoryHistory(e.id);this.dialogs.info("Memory history",t.events.map(i=>`${I(i.created_at)} \u2014 ${i.action}${i.undone_at?" (undone)":""}`).join(`
+`)||"No events.")}async addPersona(){let e=this.appState.workspaces[0];if(!e){this.appState.settingsError="Create a workspace before adding a persona.",this.renderApp();return}let t=await this.dialogs.prompt("New persona","Choose a persona name.");if(!t?.trim())return;let i=await this.client.createPersona({workspace_id:e.id,workspace_ids:[e.id],name:t.trim(),system_prompt:this.appState.settings?.personas_default_system_prompt??q.personas_default_system_prompt,default_model:this.appState.models[0]??null});this.appState.personas.push(i),this.renderApp()}async savePersona(e){let t=Sa(e),i=await this.client.updatePersona(e.id,t);this.appState.personas=this.appState.personas.map(n=>n.id===i.id?i:n),this.renderApp()}async deletePersona(e){await this.dialogs.confirm("Delete persona",`Delete ${e.name}?`,"Delete")&&(await this.client.deletePersona(e.id),this.appState.personas=this.appState.personas.filter(t=>t.id!==e.id),this.renderApp())}async addWorkspace(){let e=await this.dialogs.prompt("New workspace","Choose a workspace name.");e?.trim()&&(this.appState.workspaces.push(await this.client.createWorkspace(e.trim())),this.renderApp())}async renameWorkspace(e,t){let i=await this.dialogs.prompt("Rename workspace","Choose a new name.",t);if(!i?.trim())return;let n=await this.client.updateWorkspace(e,i.trim());this.appState.workspaces=this.appState.workspaces.map(r=>r.id===e?n:r),this.renderApp()}async deleteWorkspace(e,t){if(await this.dialogs.confirm("Delete workspace",`Delete ${t}? It must not contain personas or chats.`,"Delete")){try{await this.client.deleteWorkspace(e),this.appState.workspaces=this.appState.workspaces.filter(i=>i.id!==e)}catch(i){this.appState.settingsError=h(i,"Unable to delete workspace.")}this.renderApp()}}};function ba(a,e){return e?"checking":a?a.ready||a.status==="ready"?"ok":"fail":"idle"}function wa(a){return a?k(a.status||(a.ready?"ready":"error")):"Not checked"}function _a(a){return{pending:a.filter(e=>e.status==="pending"),active:a.filter(e=>e.status==="active"),history:a.filter(e=>["rejected","forgotten","superseded"].includes(e.status))}}function Sa(a){let e=a.workspace_ids.length?a.workspace_ids:[a.workspace_id];return{workspace_id:e[0]??a.workspace_id,workspace_ids:e,name:a.name,avatar_url:a.avatar_url,allow_image_sends:a.allow_image_sends!==!1,system_prompt:a.system_prompt,personality_details:a.personality_details,traits:a.traits,default_model:a.default_model,voice_preferences:a.voice_preferences??{}}}function ka(a){return be.includes(a)?a:"General"}function Ca(a){return["identity_persona_required","identity_profile_unavailable","identity_reference_unavailable","identity_reference_changed"].includes(a??"")}function Et(a,e){return s("span",{class:"settings-concept"},[s("span",{textContent:a}),W(e,`About ${a}`)])}var nt=class{constructor(e){this.audio=e}audio;context=null;analyser=null;frequencies=new Uint8Array(0);canvas=null;enabled=!1;frame=0;stars=Array.from({length:140},()=>({x:Math.random(),y:Math.random(),size:.4+Math.random()*1.6,phase:Math.random()*Math.PI*2}));setEnabled(e){this.enabled=e,e&&this.start()}connectAudio(){if(this.context)return;let e=window.AudioContext??window.webkitAudioContext;if(!e)return;this.context=new e;let t=this.context.createMediaElementSource(this.audio);this.analyser=this.context.createAnalyser(),this.analyser.fftSize=512,this.frequencies=new Uint8Array(this.analyser.frequencyBinCount),t.connect(this.analyser),this.analyser.connect(this.context.destination)}node(){let e=document.createElement("canvas");return e.id="vizCanvas",this.canvas=e,this.resize(),this.start(),e}dispose(){cancelAnimationFrame(this.frame),this.frame=0,this.canvas=null}start(){if(this.frame)return;let e=t=>{this.frame=requestAnimationFrame(e),this.enabled&&this.draw(t)};this.frame=requestAnimationFrame(e)}resize(){if(!this.canvas)return;let e=Math.min(2,Math.max(1,window.devicePixelRatio||1)),t=window.visualViewport?.width??window.innerWidth,i=window.visualViewport?.height??window.innerHeight;this.canvas.width=Math.floor(t*e),this.canvas.height=Math.floor(i*e),this.canvas.style.width=`${t}px`,this.canvas.style.height=`${i}px`}draw(e){let t=this.canvas;if(!t||!t.isConnected)return;let i=t.getContext("2d");if(!i)return;this.resize();let n=Math.min(2,Math.max(1,window.devicePixelRatio||1)),r=t.width/n,d=t.height/n;i.setTransform(n,0,0,n,0,0),i.clearRect(0,0,r,d);let l=.03;this.analyser&&this.frequencies.length&&(this.analyser.getByteFrequencyData(this.frequencies),l=this.frequencies.reduce((S,T)=>S+T/255,0)/this.frequencies.length);let c=i.createLinearGradient(0,0,r,d);c.addColorStop(0,"rgba(2, 8, 20, .88)"),c.addColorStop(.5,"rgba(5, 16, 38, .68)"),c.addColorStop(1,"rgba(2, 8, 20, .9)"),i.fillStyle=c,i.fillRect(0,0,r,d);for(let S of this.stars){let T=.08+Math.max(0,Math.sin(e*.001+S.phase))*.18+l*.35;i.fillStyle=`rgba(140, 255, 245, ${T})`,i.beginPath(),i.arc(S.x*r,S.y*d,S.size,0,Math.PI*2),i.fill()}let p=r/2,g=d/2,u=Math.min(r,d)*(.18+l*.08),y=i.createRadialGradient(p,g,u*.1,p,g,u*1.8);y.addColorStop(0,`rgba(166, 252, 255, ${.28+l*.3})`),y.addColorStop(.45,`rgba(82, 162, 255, ${.14+l*.2})`),y.addColorStop(1,"rgba(26, 56, 118, 0)"),i.fillStyle=y,i.beginPath(),i.arc(p,g,u*1.8,0,Math.PI*2),i.fill(),i.strokeStyle=`rgba(114, 248, 255, ${.18+l*.5})`,i.lineWidth=1.5,i.beginPath(),i.arc(p,g,u,0,Math.PI*2),i.stroke()}};var $=ns("app"),Ji=ns("ttsAudio"),Tt=new nt(Ji),ie=new Ae(Ji,Tt),Gi=new fe,B=new _e(ie),At=new qe,ot=Na(),N=new Oe(a=>{Ma(a)}),Ki=new at(b,es,ot,o,_,a=>N.settings(a)),xa=new ge(Yi,b),Wi=new ke(Gi,ie,b,o,_,a=>ot.prompt("Propose a memory fact","Edit this into one specific fact. It will stay pending until you approve it in Memory settings.",a)),ji=new Ce(b,o,A,_,a=>Ki.startIdentitySetup(a)),Xi=new Se(o,_,B,ot,{render:b,openChat:a=>N.chat(a),openNewChat:()=>{o.showNewChatPersonaModal=!0,o.newChatPersonaId=o.selectedPersonaId??o.personas[0]?.id??null,b()},goHome:()=>N.home(!0)});B.configure({onChange:b,onNavigate:a=>N.chat(a)});Gi.setChangeHandler(b);ie.setChangeHandler(b);At.configure(b,a=>B.send(a));window.addEventListener("nice:unauthorized",()=>{ts("Your session ended. Please sign in again.")});window.addEventListener("unhandledrejection",a=>{a.preventDefault(),as(a.reason)});window.addEventListener("error",a=>as(a.error??a.message));window.addEventListener("pointerdown",Va,{passive:!0});window.addEventListener("keydown",Da);window.visualViewport?.addEventListener("resize",It);window.addEventListener("resize",It);It();N.start();Pa();async function Pa(){try{await Yi(await _.session(),!1)}catch(a){a instanceof K&&a.status===401||(o.authError=h(a,"Unable to contact Nice Assistant.")),b()}}async function Yi(a,e=!0){o.session=a;let[t,i,n,r,d,l,c,p,g,u]=await Promise.all([_.models().catch(()=>({models:[]})),_.workspaces(),_.personas(),_.chats(),_.settings(),_.memories(),_.taskModels().catch(()=>({items:[]})),_.taskModelRuns(void 0,20).catch(()=>({items:[]})),_.mediaCatalog().catch(()=>null),_.mediaReadiness().catch(()=>null)]);o.models=t.models,o.workspaces=i.items,o.personas=n.items,o.chats=r.items,o.settings=le(d),o.memories=l.items,o.taskModels=c.items,o.taskModelRuns=p.items,o.mediaCatalog=g,o.mediaReadiness=u,o.showSystemMessages=o.settings.general_show_system_messages,o.showThinkingByDefault=o.settings.general_show_thinking,o.voiceResponsesEnabled=o.settings.general_voice_responses,o.showViz=o.settings.general_show_viz,document.documentElement.dataset.theme=o.settings.general_theme,o.lastActivityAt=Date.now(),Fa(),(!o.settings.onboarding_done||!o.workspaces.length||!o.personas.length)&&e?(A.transition("onboarding"),b(),await bi(o,_,ot,A,b)):(o.phase==="signed_out"||o.phase==="onboarding")&&A.transition("idle"),o.selectedPersonaId=o.selectedPersonaId??o.personas[0]?.id??null,o.newChatPersonaId=o.newChatPersonaId??o.selectedPersonaId,await Qi(),b()}async function Ma(a){o.route=a,o.session&&(await Qi(),b())}async function Qi(){if(o.session){if(o.route.kind==="settings"){o.showSettings=!0,o.settingsSection=o.route.section??"General";return}if(o.showSettings=!1,o.route.kind==="chat"&&o.route.chatId){await B.open(o.route.chatId);return}o.currentChat=null,o.messages=[],o.capabilityRequests=[],Zi.refresh()}}var Zi=new Ee(o,_,{startChat:()=>{let a=o.chats[0];a?N.chat(a.id):B.create(o.selectedPersonaId)},startChatWith:a=>{a&&(o.selectedPersonaId=a),B.create(a??o.selectedPersonaId)},openChat:a=>N.chat(a),openSettings:a=>N.settings(a),openPicture:(a,e)=>{o.chatImagePreview=a,o.chatImageGallery=e,b()}},b);function b(){let a=Nt($),e=$t(rt);if(Tt.setEnabled(o.showViz),$.replaceChildren(),!o.session){$.append(xa.node()),dt($,a,!!o.modal);return}o.showSettings?$.append(Ki.node()):o.route.kind==="home"?$.append(Zi.node()):$.append(Ea()),o.showNewChatPersonaModal&&$.append(La()),o.personaAvatarPreview&&$.append(vt(o.personaAvatarPreview,"Persona avatar",()=>{o.personaAvatarPreview="",b()})),o.chatImagePreview&&$.append(vt(o.chatImagePreview,"Image",()=>{o.chatImagePreview="",b()},{total:o.chatImageGallery.length,position:Math.max(0,o.chatImageGallery.indexOf(o.chatImagePreview)),step:i=>{yt(o,i),b()}})),o.generationLog&&$.append(ui(o.generationLog,_.mediaJournalExportUrl(o.generationLog.id),()=>{o.generationLog=null,b()})),o.chatVideoPreview&&$.append(pi(o,b)),o.modal&&$.append(qa(o.modal)),dt($,a,!!o.modal);let t=document.querySelector(rt);t&&li(t,o.revealedImages),requestAnimationFrame(()=>Ba(e))}function Ea(){let a=o.selectedPersonaId??o.currentChat?.persona_id??o.personas[0]?.id??null,e=o.personas.find(g=>g.id===a),t=o.currentChat?.workspace_id??e?.workspace_id??e?.workspace_ids[0],i=o.workspaces.find(g=>g.id===t)?.name??"Workspace",n=o.selectedModel??o.currentChat?.model_override??e?.default_model??o.settings?.global_default_model??o.models[0]??"",r=o.selectedMemoryMode??o.currentChat?.memory_mode??o.settings?.default_memory_mode??"saved",d=[...o.showSystemMessages?Wi.syntheticSystemMessage(a):[],...o.messages],l=d.flatMap(g=>{let u=Wi.message(g,a);if(!u)return[];let y=o.capabilityRequests.filter(S=>S.permission_mode==="confirm"&&S.status==="pending_confirmation"&&S.capability_key!=="media.generate_image"&&S.assistant_message_id===g.id).map(S=>ji.node(S));return[u,...y]}),c=o.capabilityRequests.filter(g=>g.permission_mode==="confirm"&&g.status==="pending_confirmation"&&g.capability_key!=="media.generate_image"&&!d.some(u=>u.id===g.assistant_message_id)).map(g=>ji.node(g)),p=s("section",{id:"messagesPane",class:"message-pane glass",onscroll:Ha,"data-testid":"message-pane"},[di(o,()=>{B.loadOlder()}),...l,...c]);return s("div",{class:"app-shell"},[Xi.node(),s("main",{class:"main-pane glass",onclick:g=>{!o.drawerOpen||!ti(g)||(o.drawerOpen=!1,b())}},[Ta(e?.name??"Persona",J(e?.name??"Persona",e?.avatar_url)),o.showChatControlsMenu?Aa(i,n,r):null,p,o.showJumpBottom?s("button",{id:"jumpBtn",class:"jump-bottom show",textContent:"\u2193",title:"Go to the newest message","aria-label":"Go to the newest message",onclick:()=>ss(!0)}):null,o.uiError?s("div",{class:"error-banner"},[o.uiError,s("button",{class:"icon-btn",textContent:"Dismiss",onclick:()=>{o.uiError="",o.phase==="error"&&A.recover(),b()}})]):null,s("div",{class:"record-indicator",textContent:o.phase==="recording"?`\u25CF Recording\u2026 ${Math.floor((Date.now()-o.recordingStartedAt)/1e3)}s`:"Ready"}),Ra()]),s("div",{class:`viz-wrap ${o.showViz?"show":""}`},Tt.node())])}function Ta(a,e){return s("div",{class:"topbar"},[s("a",{class:"topbar-home",href:"#/",title:"Nice Assistant home","aria-label":"Nice Assistant home","data-testid":"topbar-home"},[s("img",{class:"topbar-home-mark",src:"/favicon.svg",alt:""})]),s("button",{class:"icon-btn",textContent:"\u2630",title:"Chats","aria-label":"Open the chat list","data-drawer-toggle":"true","data-testid":"drawer-toggle",onclick:()=>{o.drawerOpen=!o.drawerOpen,b()}}),s("div",{class:"header-meta"},[s("button",{class:"image-preview-trigger topbar-avatar-trigger",type:"button",title:`View ${a}'s full-size avatar`,"aria-label":`View ${a}'s full-size avatar`,onclick:()=>{o.personaAvatarPreview=e,b()}},[s("img",{class:"topbar-avatar",src:e,alt:`${a} avatar`})]),s("div",{class:"header-title",textContent:o.currentChat?.title||"New conversation"}),s("span",{class:"chip persona-chip",textContent:a})]),s("span",{class:"sr-only",textContent:o.statusText,"data-testid":"client-phase"}),s("button",{class:"icon-btn",textContent:"\u22EF",title:"Chat controls and details","aria-expanded":o.showChatControlsMenu,onclick:()=>{o.showChatControlsMenu=!o.showChatControlsMenu,b()}}),s("button",{class:"icon-btn",textContent:"\u2699",title:"Settings","data-testid":"open-settings",onclick:()=>N.settings(o.settingsSection)}),s("button",{class:"icon-btn",textContent:"\u21AA",title:"Log out","data-testid":"logout",onclick:()=>{is()}})])}function Aa(a,e,t){return s("div",{class:"chat-controls-menu glass"},[s("button",{class:"pill-btn",textContent:o.voiceResponsesEnabled?"Voice replies: On":"Voice replies: Off",onclick:()=>{o.voiceResponsesEnabled=!o.voiceResponsesEnabled,b()}}),s("button",{class:`pill-btn ${o.settings?.chat_blur_images?"active":""}`,textContent:o.settings?.chat_blur_images?"Blur images: On":"Blur images: Off","aria-pressed":!!o.settings?.chat_blur_images,"data-testid":"toggle-chat-image-blur",onclick:()=>{Ia()}}),o.currentAudioMessageId?s("button",{class:"pill-btn",textContent:"Stop audio",onclick:()=>ie.stop()}):null,s("details",{class:"chat-control-details"},[s("summary",{textContent:"Chat details"}),s("p",{class:"meta",textContent:`Workspace: ${a}`}),s("label",{textContent:"Model"}),s("select",{class:"chip-select",value:e,onchange:i=>{o.selectedModel=i.currentTarget.value}},o.models.map(i=>s("option",{value:i,selected:i===e,textContent:oi(i)}))),s("label",{textContent:"Memory mode"}),s("select",{class:"chip-select",value:t,onchange:i=>{o.selectedMemoryMode=i.currentTarget.value==="off"?"off":"saved"}},[s("option",{value:"saved",selected:t!=="off",textContent:"Use saved memory"}),s("option",{value:"off",selected:t==="off",textContent:"Do not use saved memory"})]),s("div",{class:`status-pill ${Oa()}`,textContent:o.statusText}),s("button",{class:"pill-btn",textContent:o.showSystemMessages?"Hide system/tool":"Show system/tool",onclick:()=>{o.showSystemMessages=!o.showSystemMessages,b()}}),s("button",{class:"pill-btn",textContent:o.showThinkingByDefault?"Hide thinking":"Show thinking",onclick:()=>{o.showThinkingByDefault=!o.showThinkingByDefault,b()}}),s("button",{class:`pill-btn ${o.showViz?"active":""}`,textContent:o.showViz?"Visualizer: On":"Visualizer: Off",onclick:()=>{o.showViz=!o.showViz,o.settings&&(o.settings.general_show_viz=o.showViz),b()}})])])}async function Ia(){if(!o.settings||o.settingsSaving)return;let a=o.settings.chat_blur_images;o.settings.chat_blur_images=!a,o.settingsSaving=!0,b();try{o.settings=le(await _.updateSettings(z(o.settings)))}catch(e){o.settings.chat_blur_images=a,o.uiError=h(e,"The image blur preference could not be saved.")}finally{o.settingsSaving=!1,b()}}function Ra(){let{busy:a,inputLocked:e}=ci(o.phase),t=o.pendingRequest&&["queued","thinking"].includes(o.phase);return s("div",{class:"composer"},[s("textarea",{id:"chatInput",rows:1,class:"composer-input",value:o.draftMessage,placeholder:"Ask anything\u2026 (Shift+Enter for new line)",disabled:e,"data-testid":"chat-input",oninput:i=>{let n=i.currentTarget;o.draftMessage=n.value,Ua(n)},onkeydown:i=>{i.key==="Enter"&&!i.shiftKey&&(i.preventDefault(),B.send(i.currentTarget.value))}}),t?s("button",{class:"send-btn",textContent:"Cancel","data-testid":"chat-cancel",onclick:()=>{B.cancel()}}):s("button",{class:"send-btn",textContent:"Send",disabled:a,"data-testid":"chat-send",onclick:()=>{B.send(o.draftMessage)}}),xi(a,()=>ie.stop(!1),At)])}function La(){return s("div",{class:"modal-backdrop"},[s("div",{class:"modal-card glass",role:"dialog","aria-modal":"true"},[s("h3",{textContent:"Start a new chat"}),s("label",{textContent:"Persona"}),s("select",{class:"chip-select",value:o.newChatPersonaId??"","data-testid":"new-chat-persona",onchange:a=>{o.newChatPersonaId=a.currentTarget.value||null}},o.personas.map(a=>s("option",{value:a.id,selected:a.id===o.newChatPersonaId,textContent:a.name}))),s("div",{class:"modal-actions"},[s("button",{class:"pill-btn",textContent:"Cancel",onclick:()=>{o.showNewChatPersonaModal=!1,b()}}),s("button",{class:"send-btn",textContent:"Create chat","data-testid":"new-chat-confirm",onclick:()=>{$a()}})])])])}async function $a(){o.showNewChatPersonaModal=!1,await B.create(o.newChatPersonaId),b()}function qa(a){return s("div",{class:"modal-backdrop"},[s("div",{class:"modal-card glass",role:"dialog","aria-modal":"true","aria-label":a.title},[s("h3",{textContent:a.title}),a.message?s("div",{class:"meta modal-message",textContent:a.message}):null,a.inputValue!==void 0?s("input",{class:"search-input",value:a.inputValue,placeholder:a.inputPlaceholder??"",autofocus:!0,oninput:e=>{o.modal&&(o.modal.inputValue=e.currentTarget.value)}}):null,s("div",{class:"modal-actions"},a.actions.map(e=>s("button",{class:e.kind==="primary"?"send-btn":e.kind==="danger"?"send-btn danger":"pill-btn",textContent:e.label,onclick:()=>{e.run(o.modal?.inputValue??"")}})))])])}function es(){me(o),o.showSettings=!1,o.currentChat?N.chat(o.currentChat.id):N.home()}async function ts(a=""){ie.stop(!1),At.cancel(),Xi.reset(),o.session=null,o.currentChat=null,o.messages=[],o.capabilityRequests=[],me(o),o.mediaCatalog=null,o.mediaPlanPreview=null,o.resourceCoordination=null,o.resourceCoordinationEvents=[],o.pendingRequest=null,o.authError=a,o.modal=null,o.phase!=="signed_out"&&A.transition("signed_out"),N.home(!0),b()}async function is(){try{await _.logout()}finally{await ts()}}function Na(){return{prompt(a,e,t=""){return new Promise(i=>{o.modal={title:a,message:e,inputValue:t,actions:[{label:"Cancel",run:()=>{o.modal=null,i(null),b()}},{label:"Continue",kind:"primary",run:n=>{o.modal=null,i(n),b()}}]},b()})},confirm(a,e,t="Confirm"){return new Promise(i=>{o.modal={title:a,message:e,actions:[{label:"Cancel",run:()=>{o.modal=null,i(!1),b()}},{label:t,kind:"danger",run:()=>{o.modal=null,i(!0),b()}}]},b()})},info(a,e){o.modal={title:a,message:e,actions:[{label:"Close",kind:"primary",run:()=>{o.modal=null,b()}}]},b()}}}var rt="#messagesPane";function Oa(){return o.phase==="recording"?"status-recording":o.phase==="speaking"?"status-speaking":["queued","thinking","transcribing"].includes(o.phase)?"status-thinking":"status-idle"}function Ha(a){let e=a.currentTarget;o.showJumpBottom=e.scrollTop+e.clientHeight<e.scrollHeight-8,o.stickMessagesToBottom=!o.showJumpBottom}function Ba(a){if(o.stickMessagesToBottom){ss(!1);return}qt(rt,a)}function ss(a){let e=document.querySelector(rt);e?.scrollTo({top:e.scrollHeight,behavior:a?"smooth":"auto"}),o.stickMessagesToBottom=!0,o.showJumpBottom=!1}function Ua(a){a.style.height="auto",a.style.height=`${Math.min(180,a.scrollHeight)}px`}function Da(a){if(o.chatImagePreview&&(a.key==="ArrowLeft"||a.key==="ArrowRight")){a.preventDefault(),yt(o,a.key==="ArrowLeft"?-1:1),b();return}if(a.key==="Escape")if(o.modal){let e=o.modal.actions.find(t=>t.label==="Cancel")??o.modal.actions[0];e&&e.run(o.modal.inputValue??"")}else o.showNewChatPersonaModal?(o.showNewChatPersonaModal=!1,b()):o.chatImagePreview||o.chatVideoPreview||o.personaAvatarPreview?(o.chatImagePreview="",o.chatImageGallery=[],o.chatVideoPreview="",o.personaAvatarPreview="",b()):o.showSettings&&es()}function Va(){o.lastActivityAt=Date.now()}function Fa(){o.sessionTimer!==null&&window.clearInterval(o.sessionTimer),o.sessionTimer=window.setInterval(()=>{!o.session||!o.settings?.general_auto_logout||Date.now()-o.lastActivityAt>=o.session.ttl_seconds*1e3&&is()},15e3)}function It(){let a=window.visualViewport?.height??window.innerHeight;document.documentElement.style.setProperty("--app-viewport-height",`${Math.round(a)}px`)}function as(a){let e=h(a,"The browser encountered an unexpected error.");o.uiError=e,A.transition("error","Error"),_.clientEvent("browser.unhandled",e),b()}function ns(a){let e=document.getElementById(a);if(!(e instanceof HTMLElement))throw new Error(`Missing #${a}`);return e}